@@ -7,6 +7,9 @@ from decimal import Decimal
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from .models import  *
+from .budget_analytics import invalidate as invalidate_budget_analytics
+from .compliance import refresh_supplier
+from .plan_consumption import recalculate, recalculate_for_requisitions
 
 
 # ============================================================================
@@ -75,6 +78,22 @@ class AuditLogAdmin(admin.ModelAdmin):
         return False
 
 
+@admin.register(AuditActivitySummary)
+class AuditActivitySummaryAdmin(admin.ModelAdmin):
+    list_display = ['user', 'date', 'total_actions', 'first_activity', 'last_activity', 'distinct_ip_count']
+    list_filter = ['date']
+    search_fields = ['user__username']
+    readonly_fields = ['user', 'date', 'total_actions', 'action_counts', 'first_activity', 'last_activity', 'ip_addresses', 'updated_at']
+    ordering = ['-date']
+    date_hierarchy = 'date'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 # ============================================================================
 # 2. ORGANIZATIONAL STRUCTURE
 # ============================================================================
@@ -225,6 +244,11 @@ class BudgetAdmin(admin.ModelAdmin):
         
         return format_html('{}', formatted_value)
 
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        # Bulk deletes bypass Budget.delete()
+        invalidate_budget_analytics()
+
 
 
 @admin.register(BudgetReallocation)
@@ -275,11 +299,11 @@ class SupplierPerformanceInline(admin.TabularInline):
 
 @admin.register(Supplier)
 class SupplierAdmin(admin.ModelAdmin):
-    list_display = ['supplier_number', 'user', 'name', 'email', 'phone_number', 'status', 'rating', 'created_at']
-    list_filter = ['status', 'created_at']
+    list_display = ['supplier_number', 'user', 'name', 'email', 'phone_number', 'status', 'compliance_status', 'rating', 'created_at']
+    list_filter = ['status', 'compliance_status', 'created_at']
     search_fields = ['name', 'supplier_number', 'email', 'registration_number']
     ordering = ['name']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['created_at', 'updated_at', 'compliance_status', 'compliance_expiry_date', 'compliance_checked_at']
     inlines = [SupplierDocumentInline, SupplierPerformanceInline]
     
     fieldsets = (
@@ -297,7 +321,8 @@ class SupplierAdmin(admin.ModelAdmin):
             'fields': ('categories', 'status', 'rating')
         }),
         ('Compliance', {
-            'fields': ('tax_compliance_expiry', 'registration_expiry')
+            'fields': ('tax_compliance_expiry', 'registration_expiry',
+                      'compliance_status', 'compliance_expiry_date', 'compliance_checked_at')
         }),
         ('Additional Information', {
             'fields': ('notes', 'created_by')
@@ -309,6 +334,11 @@ class SupplierAdmin(admin.ModelAdmin):
     )
     
     filter_horizontal = ['categories']
+    
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Expiry dates or inline documents may have changed
+        refresh_supplier(form.instance)
 
 
 @admin.register(SupplierDocument)
@@ -318,6 +348,10 @@ class SupplierDocumentAdmin(admin.ModelAdmin):
     search_fields = ['supplier__name', 'document_name']
     ordering = ['-uploaded_at']
     readonly_fields = ['uploaded_at', 'verified_at']
+    
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        refresh_supplier(obj.supplier)
 
 
 @admin.register(SupplierPerformance)
@@ -416,14 +450,24 @@ class RequisitionAdmin(admin.ModelAdmin):
     
     def approve_requisitions(self, request, queryset):
         updated = queryset.update(status='APPROVED')
+        # Bulk updates bypass Requisition.save(), so rebuild plan usage
+        recalculate_for_requisitions(queryset)
         self.message_user(request, f'{updated} requisition(s) approved successfully.')
     approve_requisitions.short_description = 'Approve selected requisitions'
     
     def reject_requisitions(self, request, queryset):
         updated = queryset.update(status='REJECTED')
+        recalculate_for_requisitions(queryset)
         self.message_user(request, f'{updated} requisition(s) rejected.')
     reject_requisitions.short_description = 'Reject selected requisitions'
     
+    def delete_queryset(self, request, queryset):
+        plan_items = list(
+            queryset.exclude(procurement_plan_item=None).values_list('procurement_plan_item', flat=True)
+        )
+        super().delete_queryset(request, queryset)
+        recalculate(ProcurementPlanItem.objects.filter(pk__in=plan_items))
+    
     def approve_emergency(self, request, queryset):
         from django.utils import timezone
         updated = queryset.filter(is_emergency=True).update(
@@ -1611,6 +1655,11 @@ class PaymentAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+    
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        # Bulk deletes bypass Payment.delete()
+        invalidate_budget_analytics()
 
 
 # ============================================================================
@@ -1629,6 +1678,38 @@ class ProcurementReportAdmin(admin.ModelAdmin):
         return False
 
 
+@admin.register(Finding)
+class FindingAdmin(admin.ModelAdmin):
+    list_display = ['rule_code', 'title', 'severity', 'score', 'status', 'is_active', 'department', 'supplier', 'last_detected_at']
+    list_filter = ['rule_code', 'severity', 'status', 'category', 'is_active']
+    search_fields = ['title', 'description', 'object_id']
+    ordering = ['-score', '-last_detected_at']
+    readonly_fields = [
+        'rule_code', 'fingerprint', 'title', 'description', 'category', 'severity', 'score',
+        'model_name', 'object_id', 'related_objects', 'evidence', 'amount', 'department',
+        'supplier', 'is_active', 'first_detected_at', 'last_detected_at'
+    ]
+    
+    fieldsets = (
+        ('Finding', {
+            'fields': ('rule_code', 'title', 'description', 'category', 'severity', 'score', 'amount')
+        }),
+        ('Subject', {
+            'fields': ('model_name', 'object_id', 'department', 'supplier', 'related_objects', 'evidence')
+        }),
+        ('Review', {
+            'fields': ('status', 'reviewed_by', 'reviewed_at', 'resolution_notes')
+        }),
+        ('Detection', {
+            'fields': ('fingerprint', 'is_active', 'first_detected_at', 'last_detected_at'),
+            'classes': ('collapse',)
+        }),
+    )
+    
+    def has_add_permission(self, request):
+        return False
+
+
 # ============================================================================
 # 14. NOTIFICATIONS & COMMUNICATIONS
 # ============================================================================
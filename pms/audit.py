@@ -0,0 +1,319 @@
+"""
+Buffered audit log writer.
+
+record_audit() replaces direct AuditLog.objects.create() calls. Within a
+request the entries are held in a per-request buffer and written with a
+single bulk INSERT when the response is ready (AuditBufferMiddleware).
+Entries recorded inside a transaction only join the buffer once that
+transaction commits, so rolled-back work leaves no audit trail behind.
+
+Sensitive actions can pass ``durable=True`` (or be listed in
+AUDIT_LOG_DURABLE_ACTIONS) to be inserted immediately in the caller's
+transaction. With AUDIT_LOG_BACKGROUND_FLUSH enabled, request buffers are
+handed to a daemon thread that batches them across requests; entries
+still queued when the process is killed are lost, so leave it off where
+every row matters.
+
+Every flush also folds the new entries into AuditActivitySummary (one row
+per user per day) so auditor activity pages never aggregate the raw log.
+Summary rows are locked in (user, date) order and the update is retried
+on lock conflicts; if it still fails, the affected rows are flagged and
+backfill_audit_summaries --pending recounts those days from AuditLog.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, time as dt_time, timedelta
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, connection, transaction
+from django.db.models import Count, Max, Min
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from pms.models import AuditActivitySummary, AuditLog
+
+
+logger = logging.getLogger(__name__)
+
+BULK_BATCH_SIZE = 500
+
+# Attempts at a summary update that hits a deadlock or lock timeout
+SUMMARY_ATTEMPTS = 3
+SUMMARY_RETRY_DELAY = 0.05
+
+_request_buffer = ContextVar('pms_audit_buffer', default=None)
+
+
+def _durable_actions():
+    return getattr(settings, 'AUDIT_LOG_DURABLE_ACTIONS', ())
+
+
+def _build_entry(fields):
+    fields.setdefault('timestamp', timezone.now())
+    fields['object_id'] = str(fields.get('object_id', ''))
+    fields['object_repr'] = str(fields.get('object_repr', ''))[:500]
+    return AuditLog(**fields)
+
+
+def write_entries(entries):
+    """Insert audit entries in batches; failures are logged, never raised"""
+    if not entries:
+        return
+    try:
+        AuditLog.objects.bulk_create(entries, batch_size=BULK_BATCH_SIZE)
+    except Exception:
+        logger.exception('Failed to write %d audit log entries', len(entries))
+        return
+    update_activity_summaries(entries)
+
+
+def record_audit(durable=False, **fields):
+    """
+    Record an audit entry. Accepts the same keyword arguments as AuditLog.
+
+    Returns the (possibly not yet saved) AuditLog instance.
+    """
+    entry = _build_entry(fields)
+
+    if durable or entry.action in _durable_actions():
+        entry.save(force_insert=True)
+        transaction.on_commit(lambda: update_activity_summaries([entry]))
+        return entry
+
+    buffer = _request_buffer.get()
+    if buffer is None:
+        # Outside a request (management commands, shell): write once committed
+        transaction.on_commit(lambda: write_entries([entry]))
+    elif connection.in_atomic_block:
+        transaction.on_commit(lambda: buffer.append(entry))
+    else:
+        buffer.append(entry)
+    return entry
+
+
+# ----------------------------------------------------------------------------
+# Activity summaries
+# ----------------------------------------------------------------------------
+
+SUMMARY_FIELDS = [
+    'total_actions', 'action_counts', 'first_activity', 'last_activity',
+    'ip_addresses', 'updated_at',
+]
+
+
+def _merge_into_summary(summary, entries):
+    counts = dict(summary.action_counts or {})
+    ip_addresses = list(summary.ip_addresses or [])
+    for entry in entries:
+        summary.total_actions += 1
+        counts[entry.action] = counts.get(entry.action, 0) + 1
+        if summary.first_activity is None or entry.timestamp < summary.first_activity:
+            summary.first_activity = entry.timestamp
+        if summary.last_activity is None or entry.timestamp > summary.last_activity:
+            summary.last_activity = entry.timestamp
+        if entry.ip_address and entry.ip_address not in ip_addresses:
+            ip_addresses.append(entry.ip_address)
+    summary.action_counts = counts
+    summary.ip_addresses = ip_addresses
+    summary.updated_at = timezone.now()
+
+
+def _merge_summaries(groups):
+    with transaction.atomic():
+        # Make sure every row exists, then lock them all in key order before
+        # merging so concurrent flushes for the same users and days serialise
+        # instead of deadlocking
+        AuditActivitySummary.objects.bulk_create(
+            [AuditActivitySummary(user_id=user_id, date=day) for user_id, day in sorted(groups)],
+            ignore_conflicts=True,
+        )
+        summaries = AuditActivitySummary.objects.select_for_update().filter(
+            user_id__in={user_id for user_id, _ in groups},
+            date__in={day for _, day in groups},
+        ).order_by('user_id', 'date')
+        changed = []
+        for summary in summaries:
+            new_entries = groups.get((summary.user_id, summary.date))
+            if new_entries:
+                _merge_into_summary(summary, new_entries)
+                changed.append(summary)
+        AuditActivitySummary.objects.bulk_update(
+            changed, SUMMARY_FIELDS, batch_size=BULK_BATCH_SIZE
+        )
+
+
+def _flag_for_rebuild(groups):
+    """Mark the summaries of ``groups`` for backfill_audit_summaries --pending"""
+    try:
+        AuditActivitySummary.objects.bulk_create(
+            [
+                AuditActivitySummary(user_id=user_id, date=day, needs_rebuild=True)
+                for user_id, day in sorted(groups)
+            ],
+            update_conflicts=True,
+            unique_fields=['user', 'date'],
+            update_fields=['needs_rebuild'],
+        )
+    except Exception:
+        logger.exception(
+            'Failed to flag %d audit activity summaries for rebuild: %s',
+            len(groups), sorted({day.isoformat() for _, day in groups}),
+        )
+
+
+def update_activity_summaries(entries):
+    """Fold freshly written audit entries into the per user per day summaries"""
+    groups = {}
+    for entry in entries:
+        if entry.user_id is None:
+            continue
+        key = (entry.user_id, timezone.localdate(entry.timestamp))
+        groups.setdefault(key, []).append(entry)
+    if not groups:
+        return
+
+    for attempt in range(1, SUMMARY_ATTEMPTS + 1):
+        try:
+            _merge_summaries(groups)
+            return
+        except OperationalError:
+            if attempt == SUMMARY_ATTEMPTS:
+                logger.exception('Failed to update audit activity summaries')
+            else:
+                time.sleep(SUMMARY_RETRY_DELAY * attempt)
+        except Exception:
+            logger.exception('Failed to update audit activity summaries')
+            break
+    # Runs straight away outside a transaction
+    transaction.on_commit(lambda: _flag_for_rebuild(groups))
+
+
+def rebuild_activity_summaries(start_date, end_date):
+    """
+    Recompute the summaries for ``start_date``..``end_date`` (inclusive)
+    from AuditLog, replacing whatever is stored. Returns the rows written.
+    """
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(start_date, dt_time.min), tz)
+    end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), dt_time.min), tz)
+
+    logs = AuditLog.objects.filter(
+        timestamp__gte=start, timestamp__lt=end, user__isnull=False
+    ).annotate(day=TruncDate('timestamp')).order_by()
+
+    summaries = {}
+    for row in logs.values('user_id', 'day', 'action').annotate(
+        count=Count('id'), first=Min('timestamp'), last=Max('timestamp')
+    ):
+        key = (row['user_id'], row['day'])
+        summary = summaries.get(key)
+        if summary is None:
+            summary = summaries[key] = AuditActivitySummary(
+                user_id=row['user_id'], date=row['day'], action_counts={}, ip_addresses=[],
+                first_activity=row['first'], last_activity=row['last'],
+            )
+        summary.total_actions += row['count']
+        summary.action_counts[row['action']] = row['count']
+        summary.first_activity = min(summary.first_activity, row['first'])
+        summary.last_activity = max(summary.last_activity, row['last'])
+
+    for user_id, day, ip_address in logs.exclude(ip_address__isnull=True).values_list(
+        'user_id', 'day', 'ip_address'
+    ).distinct():
+        summaries[(user_id, day)].ip_addresses.append(ip_address)
+
+    with transaction.atomic():
+        AuditActivitySummary.objects.filter(date__gte=start_date, date__lte=end_date).delete()
+        AuditActivitySummary.objects.bulk_create(summaries.values(), batch_size=BULK_BATCH_SIZE)
+    return len(summaries)
+
+
+class BackgroundFlusher:
+    """Daemon thread that batches audit entries across requests"""
+
+    def __init__(self, interval, batch_size=BULK_BATCH_SIZE):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='audit-log-flusher', daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.drain)
+
+    def enqueue(self, entries):
+        self._ensure_started()
+        for entry in entries:
+            self._queue.put(entry)
+
+    def _take_batch(self, wait):
+        batch = []
+        deadline = time.monotonic() + wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch(self.interval)
+            if batch:
+                close_old_connections()
+                write_entries(batch)
+
+    def drain(self):
+        """Write everything still queued (called at interpreter exit)"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        write_entries(batch)
+
+
+flusher = BackgroundFlusher(
+    interval=getattr(settings, 'AUDIT_LOG_FLUSH_INTERVAL', 2)
+)
+
+
+def dispatch(entries):
+    """Persist a finished request's buffer, inline or via the background flusher"""
+    if not entries:
+        return
+    if getattr(settings, 'AUDIT_LOG_BACKGROUND_FLUSH', False):
+        flusher.enqueue(entries)
+    else:
+        write_entries(entries)
+
+
+class AuditBufferMiddleware:
+    """Collect audit entries for the duration of a request and flush once"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        buffer = []
+        token = _request_buffer.set(buffer)
+        try:
+            return self.get_response(request)
+        finally:
+            _request_buffer.reset(token)
+            dispatch(buffer)
@@ -0,0 +1,345 @@
+"""
+Audit log storage: monthly partitions and archiving.
+
+On PostgreSQL, audit_logs is range-partitioned by month on "timestamp"
+(migration 0012). Rows outside any monthly partition land in
+audit_logs_default; create_audit_partitions creates the monthly tables
+ahead of time and moves any matching rows out of the default partition.
+
+archive_audit_logs writes whole months to gzip-compressed JSONL files,
+records them in a manifest and then drops the partition. On other
+databases the same command deletes the archived rows instead.
+
+Auditor views should always bound their queries with audit_window() so
+PostgreSQL only scans the partitions inside the requested range.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+from pms.models import AuditLog
+
+
+TABLE = 'audit_logs'
+DEFAULT_PARTITION = 'audit_logs_default'
+PARTITION_PATTERN = re.compile(r'^audit_logs_(\d{4})_(\d{2})$')
+
+MANIFEST_NAME = 'manifest.json'
+EXPORT_CHUNK_SIZE = 2000
+DELETE_CHUNK_SIZE = 5000
+
+DEFAULT_WINDOW_DAYS = 90
+
+
+# ----------------------------------------------------------------------------
+# Month arithmetic
+# ----------------------------------------------------------------------------
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_bounds(month):
+    """Aware [start, end) datetimes covering ``month``"""
+    start = datetime.combine(month, time.min, tzinfo=dt_timezone.utc)
+    end = datetime.combine(add_months(month, 1), time.min, tzinfo=dt_timezone.utc)
+    return start, end
+
+
+def partition_name(month):
+    return f'{TABLE}_{month:%Y_%m}'
+
+
+# ----------------------------------------------------------------------------
+# Date-bounded queries
+# ----------------------------------------------------------------------------
+
+def _parse_date(value):
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def audit_window(date_from=None, date_to=None, default_days=DEFAULT_WINDOW_DAYS):
+    """
+    Resolve optional YYYY-MM-DD strings into an aware [start, end) range.
+
+    ``date_to`` is inclusive of the whole day. Missing values default to
+    the last ``default_days`` days so queries never span every partition.
+    """
+    today = timezone.now().date()
+    end_date = _parse_date(date_to) or today
+    start_date = _parse_date(date_from) or end_date - timedelta(days=default_days)
+    if start_date > end_date:
+        start_date, end_date = end_date, start_date
+
+    start = datetime.combine(start_date, time.min, tzinfo=dt_timezone.utc)
+    end = datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=dt_timezone.utc)
+    return start, end
+
+
+def logs_between(start, end, queryset=None):
+    """Restrict an AuditLog queryset to [start, end) on the partition key"""
+    if queryset is None:
+        queryset = AuditLog.objects.all()
+    return queryset.filter(timestamp__gte=start, timestamp__lt=end)
+
+
+# ----------------------------------------------------------------------------
+# PostgreSQL partitions
+# ----------------------------------------------------------------------------
+
+def is_partitioned():
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions():
+    """Monthly partitions as a sorted list of (month, table name)"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)",
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            partitions.append((date(int(match.group(1)), int(match.group(2)), 1), name))
+    return sorted(partitions)
+
+
+def _bound_literal(value):
+    return f"'{value:%Y-%m-%d %H:%M:%S}+00'"
+
+
+def create_partition(month):
+    """
+    Create the partition for ``month``, moving any rows for that month out
+    of the default partition first. Returns False if it already exists.
+    """
+    name = partition_name(month)
+    if any(existing == name for _, existing in list_partitions()):
+        return False
+
+    start, end = month_bounds(month)
+    quote = connection.ops.quote_name
+    bounds = f'FOR VALUES FROM ({_bound_literal(start)}) TO ({_bound_literal(end)})'
+    in_range = f'"timestamp" >= {_bound_literal(start)} AND "timestamp" < {_bound_literal(end)}'
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT EXISTS (SELECT 1 FROM {quote(DEFAULT_PARTITION)} WHERE {in_range})'
+        )
+        has_rows = cursor.fetchone()[0]
+
+        if not has_rows:
+            cursor.execute(f'CREATE TABLE {quote(name)} PARTITION OF {quote(TABLE)} {bounds}')
+            return True
+
+        cursor.execute(f'CREATE TABLE {quote(name)} (LIKE {quote(TABLE)} INCLUDING DEFAULTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {quote(DEFAULT_PARTITION)} WHERE {in_range} RETURNING *) '
+            f'INSERT INTO {quote(name)} SELECT * FROM moved'
+        )
+        cursor.execute(f'ALTER TABLE {quote(TABLE)} ATTACH PARTITION {quote(name)} {bounds}')
+    return True
+
+
+def earliest_unpartitioned_month():
+    """Month of the oldest row sitting in the default partition, if any"""
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT MIN("timestamp") FROM {quote(DEFAULT_PARTITION)}')
+        oldest = cursor.fetchone()[0]
+    return month_start(oldest) if oldest else None
+
+
+def ensure_partitions(months_ahead=3, start=None):
+    """
+    Create monthly partitions from ``start`` (default: the oldest month in
+    the default partition, or the current month) up to ``months_ahead``
+    months from now. Returns the names of the partitions created.
+    """
+    current = month_start(timezone.now().date())
+    month = month_start(start) if start else (earliest_unpartitioned_month() or current)
+    month = min(month, current)
+    last = add_months(current, months_ahead)
+
+    created = []
+    while month <= last:
+        if create_partition(month):
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+# ----------------------------------------------------------------------------
+# Archiving
+# ----------------------------------------------------------------------------
+
+ARCHIVE_FIELDS = (
+    'id', 'user_id', 'action', 'model_name', 'object_id', 'object_repr',
+    'changes', 'ip_address', 'user_agent', 'timestamp',
+)
+
+
+def archive_dir():
+    return Path(getattr(settings, 'AUDIT_ARCHIVE_DIR', os.path.join(settings.BASE_DIR, 'audit_archive')))
+
+
+def load_manifest(directory):
+    path = directory / MANIFEST_NAME
+    if not path.exists():
+        return {'table': TABLE, 'archives': []}
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def _save_manifest(directory, manifest):
+    path = directory / MANIFEST_NAME
+    tmp_path = path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w') as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def export_month(month, directory):
+    """Write one month of audit entries to <partition>.jsonl.gz; returns (path, rows)"""
+    start, end = month_bounds(month)
+    path = directory / f'{partition_name(month)}.jsonl.gz'
+    tmp_path = path.with_suffix('.gz.tmp')
+
+    rows = logs_between(start, end).order_by('timestamp').values_list(*ARCHIVE_FIELDS)
+    count = 0
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as handle:
+        for values in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            handle.write(json.dumps(dict(zip(ARCHIVE_FIELDS, values)), cls=DjangoJSONEncoder))
+            handle.write('\n')
+            count += 1
+    with open(tmp_path, 'rb') as handle:
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+    return path, count
+
+
+def _drop_month(month):
+    """Remove a month that has been archived; returns rows removed"""
+    start, end = month_bounds(month)
+
+    if is_partitioned():
+        name = partition_name(month)
+        quote = connection.ops.quote_name
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {quote(name)}')
+            removed = cursor.fetchone()[0]
+            cursor.execute(f'ALTER TABLE {quote(TABLE)} DETACH PARTITION {quote(name)}')
+            cursor.execute(f'DROP TABLE {quote(name)}')
+        return removed
+
+    removed = 0
+    while True:
+        ids = list(logs_between(start, end).values_list('id', flat=True)[:DELETE_CHUNK_SIZE])
+        if not ids:
+            return removed
+        removed += AuditLog.objects.filter(id__in=ids).delete()[0]
+
+
+def archivable_months(before):
+    """Months wholly before ``before`` that still hold audit entries"""
+    cutoff = month_start(before)
+
+    if is_partitioned():
+        return [month for month, _ in list_partitions() if month < cutoff]
+
+    oldest = AuditLog.objects.order_by('timestamp').values_list('timestamp', flat=True).first()
+    if oldest is None:
+        return []
+    months = []
+    month = month_start(oldest)
+    while month < cutoff:
+        start, end = month_bounds(month)
+        if logs_between(start, end).exists():
+            months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def archive_month(month, directory=None):
+    """
+    Export a month to disk, record it in the manifest and drop it from the
+    database. The rows are only removed once the file and manifest are
+    written and the exported row count matches the table.
+    """
+    directory = Path(directory or archive_dir())
+    directory.mkdir(parents=True, exist_ok=True)
+
+    start, end = month_bounds(month)
+    expected = logs_between(start, end).count()
+    path, rows = export_month(month, directory)
+    if rows != expected:
+        raise RuntimeError(
+            f'{partition_name(month)}: exported {rows} rows but table holds {expected}; '
+            f'nothing was dropped'
+        )
+
+    entry = {
+        'partition': partition_name(month),
+        'range_start': start.isoformat(),
+        'range_end': end.isoformat(),
+        'file': path.name,
+        'rows': rows,
+        'sha256': _sha256(path),
+        'archived_at': timezone.now().isoformat(),
+    }
+    manifest = load_manifest(directory)
+    manifest['archives'] = [
+        archive for archive in manifest['archives']
+        if archive['partition'] != entry['partition']
+    ] + [entry]
+    manifest['archives'].sort(key=lambda archive: archive['range_start'])
+    _save_manifest(directory, manifest)
+
+    _drop_month(month)
+    return entry
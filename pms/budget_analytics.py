@@ -0,0 +1,225 @@
+"""
+Budget analytics cube.
+
+The budget reports slice one budget year by department, budget category,
+budget type and month. Instead of one aggregate query per slice, a year
+is loaded once as a cube at its finest grain:
+
+- one row per budget line (department, category, type) with its
+  allocated, committed and spent amounts
+- completed payments grouped by department x budget category x month,
+  attributed through invoice -> purchase order -> requisition
+
+These are two queries, cached per budget year. Every total, drill-down
+and ranking the reports need is then rolled up from the cached rows in
+memory.
+
+Budget and Payment saves and deletes, and the bulk paths that bypass
+them, call invalidate(), which swaps the cache version once the
+transaction commits so the next request rebuilds the cube. Changes
+outside those paths (renamed departments, cascaded deletes) show up
+after BUDGET_ANALYTICS_CACHE_TTL seconds at most.
+
+The cube is always built from the primary database, even in views
+pinned to the read replica: a lagging replica could otherwise cache
+pre-change figures under the new version for the whole TTL. The version
+swap only reaches other workers through a shared cache, so without one
+(CACHE_SHARED) the cube is rebuilt on every request instead of cached.
+"""
+
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from pms.models import Budget, Payment
+
+
+VERSION_KEY = 'pms:budget_analytics:version'
+CUBE_KEY = 'pms:budget_analytics:cube:{}:{}'
+
+MEASURES = ('allocated', 'committed', 'spent')
+
+# How a budget line is labelled at each drill level, as (id, name, code)
+LEVELS = {
+    'department': ('department_id', 'department_name', 'department_code'),
+    'category': ('category_id', 'category_name', 'category_code'),
+    'budget_type': ('budget_type', 'budget_type_display', 'budget_type'),
+}
+
+ZERO = Decimal('0')
+
+
+def _cache_ttl():
+    return getattr(settings, 'BUDGET_ANALYTICS_CACHE_TTL', 900)
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _bump_version():
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def invalidate():
+    """Discard every cached cube once the current transaction commits"""
+    transaction.on_commit(_bump_version)
+
+
+def _rates(row):
+    allocated = row['allocated']
+    row['available'] = allocated - row['committed'] - row['spent']
+    row['utilization'] = (row['spent'] / allocated) * 100 if allocated > 0 else 0
+    row['commitment_rate'] = (row['committed'] / allocated) * 100 if allocated > 0 else 0
+    row['total_utilization'] = ((row['committed'] + row['spent']) / allocated) * 100 if allocated > 0 else 0
+    return row
+
+
+def _matches(value, wanted):
+    return wanted is None or str(value) == str(wanted)
+
+
+class BudgetCube:
+    """Cached budget lines and monthly payments of one budget year"""
+
+    def __init__(self, data):
+        self.start_date = data['start_date']
+        self.end_date = data['end_date']
+        self.built_at = data['built_at']
+        self._lines = data['lines']
+        self._payments = data['payments']
+
+    @classmethod
+    def empty(cls):
+        return cls({'start_date': None, 'end_date': None, 'built_at': None, 'lines': [], 'payments': []})
+
+    def lines(self, department_id=None, category_id=None):
+        """Budget lines of the slice, each with available balance and rates"""
+        return [
+            _rates(dict(line))
+            for line in self._lines
+            if _matches(line['department_id'], department_id) and _matches(line['category_id'], category_id)
+        ]
+
+    def total(self, department_id=None, category_id=None):
+        """Totals of the slice with count, available balance and rates"""
+        total = {measure: ZERO for measure in MEASURES}
+        total['count'] = 0
+        for line in self.lines(department_id, category_id):
+            for measure in MEASURES:
+                total[measure] += line[measure]
+            total['count'] += 1
+        return _rates(total)
+
+    def rollup(self, level, department_id=None, category_id=None):
+        """
+        Rows grouped by ``level`` (a LEVELS key) with totals and rates,
+        largest allocation first
+        """
+        id_field, name_field, code_field = LEVELS[level]
+        groups = {}
+        for line in self.lines(department_id, category_id):
+            key = line[id_field]
+            if key not in groups:
+                groups[key] = {
+                    'id': key, 'name': line[name_field], 'code': line[code_field], 'count': 0,
+                    **{measure: ZERO for measure in MEASURES},
+                }
+            group = groups[key]
+            group['count'] += 1
+            for measure in MEASURES:
+                group[measure] += line[measure]
+        return sorted(
+            (_rates(group) for group in groups.values()),
+            key=lambda group: (-group['allocated'], group['name'] or ''),
+        )
+
+    def covers(self, start_date, end_date):
+        """
+        Whether whole cached months add up to exactly ``start_date`` to
+        ``end_date``
+        """
+        if self.start_date is None:
+            return False
+        return (
+            self.start_date <= start_date and end_date <= self.end_date
+            and (start_date == self.start_date or start_date.day == 1)
+            and (end_date == self.end_date or (end_date + timedelta(days=1)).day == 1)
+        )
+
+    def monthly(self, start_date=None, end_date=None, department_id=None, category_id=None):
+        """Completed payments per month of the slice, oldest first"""
+        months = defaultdict(lambda: {'amount': ZERO, 'count': 0})
+        for row in self._payments:
+            month = row['month']
+            if start_date and month < start_date.replace(day=1):
+                continue
+            if end_date and month > end_date:
+                continue
+            if not (_matches(row['department_id'], department_id) and _matches(row['category_id'], category_id)):
+                continue
+            months[month]['amount'] += row['amount']
+            months[month]['count'] += row['count']
+        return [{'month': month, **months[month]} for month in sorted(months)]
+
+
+def _build(budget_year):
+    budget_types = dict(Budget.BUDGET_TYPE)
+    lines = []
+    for line in Budget.objects.using(DEFAULT_DB_ALIAS).filter(budget_year=budget_year).values(
+        'id', 'budget_type', 'department_id', 'category_id',
+        department_name=F('department__name'), department_code=F('department__code'),
+        category_name=F('category__name'), category_code=F('category__code'),
+        allocated=F('allocated_amount'), committed=F('committed_amount'), spent=F('actual_spent'),
+    ):
+        line['budget_type_display'] = budget_types.get(line['budget_type'], line['budget_type'])
+        for measure in MEASURES:
+            line[measure] = line[measure] or ZERO
+        lines.append(line)
+
+    payments = list(
+        Payment.objects.using(DEFAULT_DB_ALIAS).filter(
+            status='COMPLETED',
+            payment_date__gte=budget_year.start_date,
+            payment_date__lte=budget_year.end_date,
+        ).order_by().values(
+            month=TruncMonth('payment_date'),
+            department_id=F('invoice__purchase_order__requisition__department_id'),
+            category_id=F('invoice__purchase_order__requisition__budget__category_id'),
+        ).annotate(amount=Sum('payment_amount'), count=Count('id'))
+    )
+
+    return {
+        'start_date': budget_year.start_date,
+        'end_date': budget_year.end_date,
+        'built_at': timezone.now(),
+        'lines': lines,
+        'payments': payments,
+    }
+
+
+def budget_cube(budget_year):
+    """The BudgetCube of ``budget_year``, built and cached on first use when the cache is shared"""
+    if budget_year is None:
+        return BudgetCube.empty()
+    if not getattr(settings, 'CACHE_SHARED', False):
+        return BudgetCube(_build(budget_year))
+
+    key = CUBE_KEY.format(budget_year.pk, _version())
+    data = cache.get(key)
+    if data is None:
+        data = _build(budget_year)
+        cache.set(key, data, _cache_ttl())
+    return BudgetCube(data)
@@ -0,0 +1,314 @@
+"""
+Helpers for inserting large volumes of generated rows.
+
+Used by generate_load_dataset and the --fast mode of the seed commands.
+Objects are built in memory with explicit primary keys (so foreign keys
+can be wired without reading anything back) and inserted in chunks with
+bulk_create, or with COPY on PostgreSQL. Model.save() is bypassed, so
+document numbers are pre-allocated with next_numbers() and timestamps
+are supplied by the caller inside keep_timestamps().
+
+BulkCreator lets the seed commands keep a single code path: create()
+saves immediately in normal mode, and in fast mode prepares the instance
+the way save() would (document number, derived totals, timestamps) and
+holds it until flush().
+"""
+
+import io
+import json
+import uuid
+from contextlib import contextmanager
+from decimal import Decimal
+from functools import lru_cache
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models
+from django.utils import timezone
+
+from pms.duplicates import invoice_duplicate_key, payment_duplicate_key
+from pms.models import (
+    Bid, BidEvaluation, BidItem, Contract, EvaluationCommittee, EvaluationReport,
+    GoodsReceivedNote, Invoice, InvoiceItem, Payment, ProcurementPlan,
+    ProcurementPlanAmendment, PurchaseOrder, PurchaseOrderItem, Requisition,
+    RequisitionItem, StockIssue, SupplierPerformance, Tender,
+)
+
+
+def stable_uuid(seed, kind, index):
+    """Deterministic UUID for the ``index``-th generated ``kind`` row"""
+    return uuid.uuid5(uuid.NAMESPACE_URL, f'pms-load/{seed}/{kind}/{index}')
+
+
+@lru_cache(maxsize=None)
+def shared_password(raw_password):
+    """Hash a seed password once and reuse the hash for every seeded user"""
+    return make_password(raw_password)
+
+
+def first_free_number(model, field, prefix):
+    last = (
+        model.objects.filter(**{f'{field}__startswith': prefix})
+        .order_by(f'-{field}')
+        .values_list(field, flat=True)
+        .first()
+    )
+    return int(last[len(prefix):]) + 1 if last else 1
+
+
+def next_numbers(model, field, prefix, count, width=6):
+    """
+    Reserve ``count`` sequential document numbers ``{prefix}{n:0{width}d}``
+    following the highest existing one, matching the numbering done in the
+    models' save() methods.
+    """
+    start = first_free_number(model, field, prefix)
+    return [f'{prefix}{number:0{width}d}' for number in range(start, start + count)]
+
+
+@contextmanager
+def keep_timestamps(*model_classes):
+    """
+    Disable auto_now/auto_now_add on the given models so generated rows keep
+    the created_at/updated_at values set on them (spread over the past
+    instead of all stamped with the current time).
+    """
+    saved = []
+    for model in model_classes:
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.DateField) and (field.auto_now or field.auto_now_add):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ----------------------------------------------------------------------------
+# COPY (PostgreSQL)
+# ----------------------------------------------------------------------------
+
+def _copy_value(field, obj, connection):
+    value = field.pre_save(obj, True)
+    if value is None:
+        return ''
+    if isinstance(field, models.JSONField):
+        value = json.dumps(value, cls=DjangoJSONEncoder)
+    elif isinstance(value, bool):
+        value = 't' if value else 'f'
+    else:
+        value = field.get_db_prep_save(value, connection)
+        if value is None:
+            return ''
+    # CSV: quoted values are literals, an unquoted empty field is NULL
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def copy_insert(model, objects, using='default'):
+    """Insert model instances with COPY ... FROM STDIN (PostgreSQL only)"""
+    connection = connections[using]
+    fields = model._meta.concrete_fields
+    buffer = io.StringIO()
+    for obj in objects:
+        buffer.write(','.join(_copy_value(field, obj, connection) for field in fields))
+        buffer.write('\n')
+    buffer.seek(0)
+
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    with connection.cursor() as cursor:
+        cursor.cursor.copy_expert(
+            f'COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) '
+            f'FROM STDIN WITH (FORMAT csv)',
+            buffer,
+        )
+
+
+def insert(model, objects, batch_size=5000, use_copy=None, using='default'):
+    """
+    Insert an iterable of unsaved instances in chunks of ``batch_size``.
+    COPY is used on PostgreSQL unless ``use_copy`` is False. Returns the
+    number of rows inserted.
+    """
+    if use_copy is None:
+        use_copy = connections[using].vendor == 'postgresql'
+
+    total = 0
+    for chunk in chunks(objects, batch_size):
+        if use_copy:
+            copy_insert(model, chunk, using=using)
+        else:
+            model.objects.using(using).bulk_create(chunk, batch_size=batch_size)
+        total += len(chunk)
+    return total
+
+
+# ----------------------------------------------------------------------------
+# Deferred creation for the seed commands
+# ----------------------------------------------------------------------------
+
+def _yearly(code):
+    return lambda obj: f'{code}-{timezone.now().year}-'
+
+
+# model -> (number field, prefix for the instance, digits), as assigned in save()
+DOCUMENT_NUMBERS = {
+    Requisition: ('requisition_number', _yearly('REQ'), 6),
+    Tender: ('tender_number', _yearly('TND'), 6),
+    Bid: ('bid_number', _yearly('BID'), 6),
+    EvaluationCommittee: ('committee_number', _yearly('EC'), 4),
+    EvaluationReport: ('report_number', _yearly('ER'), 4),
+    PurchaseOrder: ('po_number', _yearly('PO'), 6),
+    Contract: ('contract_number', _yearly('CNT'), 6),
+    GoodsReceivedNote: ('grn_number', _yearly('GRN'), 6),
+    StockIssue: ('issue_number', _yearly('ISS'), 6),
+    Invoice: ('invoice_number', _yearly('INV'), 6),
+    Payment: ('payment_number', _yearly('PAY'), 6),
+    ProcurementPlan: ('plan_number', lambda obj: f"PP-{obj.budget_year.name.replace('/', '-')}-", 4),
+    ProcurementPlanAmendment: ('amendment_number', lambda obj: f'{obj.procurement_plan.plan_number}-AMD-', 3),
+}
+
+
+def _derive_requisition_item(obj):
+    obj.estimated_total = obj.quantity * obj.estimated_unit_price
+
+
+def _derive_bid_item(obj):
+    obj.quoted_total = obj.requisition_item.quantity * obj.quoted_unit_price
+
+
+def _derive_bid_evaluation(obj):
+    obj.total_score = (obj.technical_score * Decimal('0.7')) + (obj.financial_score * Decimal('0.3'))
+
+
+def _derive_po_item(obj):
+    obj.total_price = obj.quantity * obj.unit_price
+    obj.quantity_pending = obj.quantity - obj.quantity_delivered
+
+
+def _derive_invoice(obj):
+    obj.duplicate_key = invoice_duplicate_key(
+        obj.supplier_id, obj.supplier_invoice_number, obj.total_amount, obj.invoice_date
+    )
+
+
+def _derive_invoice_item(obj):
+    obj.total_price = obj.quantity * obj.unit_price
+    obj.tax_amount = obj.total_price * (obj.tax_rate / 100)
+
+
+def _derive_payment(obj):
+    obj.duplicate_key = payment_duplicate_key(obj.payment_reference)
+
+
+def _derive_supplier_performance(obj):
+    obj.overall_rating = (obj.quality_rating + obj.delivery_rating + obj.service_rating) / 3
+
+
+# model -> function computing the fields save() derives
+DERIVED_FIELDS = {
+    RequisitionItem: _derive_requisition_item,
+    BidItem: _derive_bid_item,
+    BidEvaluation: _derive_bid_evaluation,
+    PurchaseOrderItem: _derive_po_item,
+    Invoice: _derive_invoice,
+    InvoiceItem: _derive_invoice_item,
+    Payment: _derive_payment,
+    SupplierPerformance: _derive_supplier_performance,
+}
+
+
+class BulkCreator:
+    """
+    Model.objects.create() replacement for the seed commands.
+
+    With fast=False every call saves immediately. With fast=True, instances
+    are prepared as save() would prepare them and written by flush() with
+    one bulk_create per model, in the order each model was first seen. Run
+    fast mode inside transaction.atomic() so foreign keys between pending
+    rows are only checked at commit.
+    """
+
+    def __init__(self, fast=False, batch_size=1000):
+        self.fast = fast
+        self.batch_size = batch_size
+        self.pending = {}
+        self._pending_keys = set()
+        self._numbers = {}
+        self._now = timezone.now()
+
+    def create(self, model, **fields):
+        if not self.fast:
+            return model.objects.create(**fields)
+
+        obj = model(**fields)
+        self._prepare(obj)
+        self.pending.setdefault(model, []).append(obj)
+        self._pending_keys.add((model, obj.pk))
+        return obj
+
+    def save(self, obj):
+        """Save changes to an instance; pending instances are written at flush()"""
+        if self.fast and (type(obj), obj.pk) in self._pending_keys:
+            return
+        obj.save()
+
+    def add(self, manager, *objs):
+        """Many-to-many add(); fast mode queues rows for the through table"""
+        if not self.fast:
+            manager.add(*objs)
+            return
+        through = manager.through
+        for obj in objs:
+            self.pending.setdefault(through, []).append(through(**{
+                f'{manager.source_field_name}_id': manager.instance.pk,
+                f'{manager.target_field_name}_id': obj.pk,
+            }))
+
+    def number(self, model, field, prefix, width):
+        key = (model, prefix)
+        if key not in self._numbers:
+            self._numbers[key] = first_free_number(model, field, prefix)
+        value = self._numbers[key]
+        self._numbers[key] += 1
+        return f'{prefix}{value:0{width}d}'
+
+    def _prepare(self, obj):
+        model = type(obj)
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.DateField) and (field.auto_now or field.auto_now_add):
+                if getattr(obj, field.attname) is None:
+                    now = self._now if isinstance(field, models.DateTimeField) else self._now.date()
+                    setattr(obj, field.attname, now)
+
+        if model in DERIVED_FIELDS:
+            DERIVED_FIELDS[model](obj)
+
+        if model in DOCUMENT_NUMBERS:
+            field, prefix, width = DOCUMENT_NUMBERS[model]
+            if not getattr(obj, field):
+                setattr(obj, field, self.number(model, field, prefix(obj), width))
+
+    def flush(self):
+        """Write pending instances; returns {model name: rows}"""
+        counts = {}
+        if not self.fast:
+            return counts
+        with keep_timestamps(*self.pending):
+            for model, objs in self.pending.items():
+                model.objects.bulk_create(objs, batch_size=self.batch_size)
+                counts[model.__name__] = counts.get(model.__name__, 0) + len(objs)
+        self.pending = {}
+        self._pending_keys = set()
+        return counts
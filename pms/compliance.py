@@ -0,0 +1,306 @@
+"""
+Supplier compliance engine.
+
+Computes the denormalised Supplier.compliance_status flag from tax,
+registration and document expiry dates so that compliance pages read a
+single indexed column instead of comparing dates on every request. Run it
+daily via the refresh_supplier_compliance management command.
+
+A supplier without a tax or registration expiry on file is UNKNOWN, not
+COMPLIANT. refresh_supplier() recomputes one supplier straight away and
+is called when documents are uploaded or verified and when expiry dates
+are edited, so a renewal does not wait for the nightly run. Bid
+submission checks the live dates through supplier_status().
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from pms.models import Supplier, SupplierDocument, User, Notification, EmailLog
+from pms.notifications import bulk_notify
+
+
+DEFAULT_WARNING_DAYS = 30
+
+# Statuses that warrant a notification when a supplier moves into them
+ALERT_STATUSES = ('EXPIRING', 'NON_COMPLIANT')
+
+UPDATE_CHUNK_SIZE = 1000
+
+# Suppliers without a tax or registration expiry on file
+MISSING_EXPIRY = Q(tax_compliance_expiry__isnull=True) | Q(registration_expiry__isnull=True)
+
+
+def _earliest(expiries, supplier_id, expiry_date):
+    current = expiries.get(supplier_id)
+    if current is None or expiry_date < current:
+        expiries[supplier_id] = expiry_date
+
+
+def collect_expiries(horizon):
+    """
+    Return {supplier_id: earliest expiry date} for every supplier with
+    something expiring on or before ``horizon``.
+
+    Each lookup is a range scan on an indexed date column. For documents,
+    only the latest expiry per document type counts, so a renewed
+    certificate supersedes the one it replaced.
+    """
+    expiries = {}
+
+    for supplier_id, expiry in Supplier.objects.filter(
+        tax_compliance_expiry__lte=horizon
+    ).values_list('id', 'tax_compliance_expiry'):
+        _earliest(expiries, supplier_id, expiry)
+
+    for supplier_id, expiry in Supplier.objects.filter(
+        registration_expiry__lte=horizon
+    ).values_list('id', 'registration_expiry'):
+        _earliest(expiries, supplier_id, expiry)
+
+    candidate_ids = set(
+        SupplierDocument.objects.filter(
+            expiry_date__lte=horizon
+        ).values_list('supplier_id', flat=True)
+    )
+    if candidate_ids:
+        latest_per_type = SupplierDocument.objects.filter(
+            supplier_id__in=candidate_ids,
+            expiry_date__isnull=False,
+        ).values('supplier_id', 'document_type').annotate(
+            latest_expiry=Max('expiry_date')
+        ).filter(latest_expiry__lte=horizon)
+
+        for row in latest_per_type:
+            _earliest(expiries, row['supplier_id'], row['latest_expiry'])
+
+    return expiries
+
+
+def classify(expiry_date, today):
+    """Map an earliest expiry date inside the warning window to a compliance status"""
+    if expiry_date is None:
+        return 'UNKNOWN'
+    if expiry_date < today:
+        return 'NON_COMPLIANT'
+    return 'EXPIRING'
+
+
+def supplier_status(supplier, warning_days=DEFAULT_WARNING_DAYS, today=None):
+    """
+    (status, earliest expiry inside the window) of one supplier from its
+    live tax, registration and latest per-type document expiry dates
+    """
+    today = today or timezone.now().date()
+    horizon = today + timedelta(days=warning_days)
+
+    expiries = [supplier.tax_compliance_expiry, supplier.registration_expiry]
+    expiries += SupplierDocument.objects.filter(
+        supplier=supplier,
+        expiry_date__isnull=False,
+    ).values('document_type').annotate(
+        latest_expiry=Max('expiry_date')
+    ).values_list('latest_expiry', flat=True)
+
+    earliest = min(
+        (expiry for expiry in expiries if expiry is not None and expiry <= horizon),
+        default=None,
+    )
+    if earliest is not None:
+        return classify(earliest, today), earliest
+    if supplier.tax_compliance_expiry is None or supplier.registration_expiry is None:
+        return 'UNKNOWN', None
+    return 'COMPLIANT', None
+
+
+def refresh_supplier(supplier, warning_days=DEFAULT_WARNING_DAYS, today=None):
+    """
+    Recompute and store the compliance status of one supplier, e.g.
+    after a document upload or verification. Returns the new status.
+    """
+    status, expiry_date = supplier_status(supplier, warning_days, today)
+    supplier.compliance_status = status
+    supplier.compliance_expiry_date = expiry_date
+    supplier.compliance_checked_at = timezone.now()
+    Supplier.objects.filter(pk=supplier.pk).update(
+        compliance_status=status,
+        compliance_expiry_date=expiry_date,
+        compliance_checked_at=supplier.compliance_checked_at,
+    )
+    return status
+
+
+def _chunks(values, size=UPDATE_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _build_alerts(transitions, today):
+    """Build (unsaved) Notification and EmailLog rows for status transitions"""
+    notifications = []
+    emails = []
+
+    suppliers = Supplier.objects.filter(
+        id__in=list(transitions)
+    ).select_related('user').only(
+        'id', 'name', 'email', 'supplier_number', 'user'
+    )
+
+    for supplier in suppliers:
+        status, expiry_date = transitions[supplier.id]
+        if status == 'NON_COMPLIANT':
+            title = 'Compliance documents expired'
+            message = (
+                f'Your compliance documentation expired on {expiry_date:%d %b %Y}. '
+                f'You cannot submit bids until updated documents are verified.'
+            )
+            priority = 'URGENT'
+        else:
+            days_left = (expiry_date - today).days
+            title = 'Compliance documents expiring soon'
+            message = (
+                f'Your compliance documentation expires on {expiry_date:%d %b %Y} '
+                f'({days_left} days). Please upload renewed documents.'
+            )
+            priority = 'HIGH'
+
+        if supplier.user_id:
+            notifications.append(Notification(
+                user_id=supplier.user_id,
+                notification_type='ALERT',
+                priority=priority,
+                title=title,
+                message=message,
+                link_url='/supplier/documents/',
+            ))
+
+        if supplier.email:
+            emails.append(EmailLog(
+                recipient=supplier.email,
+                subject=f'{title} - {supplier.supplier_number}',
+                body=f'Dear {supplier.name},\n\n{message}\n\nProcurement Office',
+            ))
+
+    newly_non_compliant = sum(
+        1 for status, _ in transitions.values() if status == 'NON_COMPLIANT'
+    )
+    newly_expiring = len(transitions) - newly_non_compliant
+
+    officer_ids = User.objects.filter(
+        role='PROCUREMENT', is_active=True
+    ).values_list('id', flat=True)
+    for officer_id in officer_ids:
+        notifications.append(Notification(
+            user_id=officer_id,
+            notification_type='ALERT',
+            priority='HIGH' if newly_non_compliant else 'MEDIUM',
+            title='Supplier compliance update',
+            message=(
+                f'{newly_non_compliant} supplier(s) became non-compliant and '
+                f'{newly_expiring} supplier(s) have documents expiring soon.'
+            ),
+            link_url='/vendors/compliance/',
+        ))
+
+    return notifications, emails
+
+
+def refresh_supplier_compliance(warning_days=DEFAULT_WARNING_DAYS, today=None, notify=True):
+    """
+    Recompute Supplier.compliance_status and queue alerts for suppliers
+    whose status changed into EXPIRING or NON_COMPLIANT.
+
+    Returns a dict of counters describing the run.
+    """
+    today = today or timezone.now().date()
+    horizon = today + timedelta(days=warning_days)
+    now = timezone.now()
+
+    expiries = collect_expiries(horizon)
+    unknown_ids = list(
+        Supplier.objects.filter(MISSING_EXPIRY).exclude(id__in=list(expiries)).values_list('id', flat=True)
+    )
+
+    statuses = {
+        supplier_id: classify(expiry_date, today)
+        for supplier_id, expiry_date in expiries.items()
+    }
+    by_status = {}
+    for supplier_id, status in statuses.items():
+        by_status.setdefault(status, []).append(supplier_id)
+
+    current = dict(
+        Supplier.objects.filter(id__in=list(expiries)).values_list('id', 'compliance_status')
+    )
+    transitions = {
+        supplier_id: (status, expiries[supplier_id])
+        for supplier_id, status in statuses.items()
+        if status in ALERT_STATUSES and current.get(supplier_id) != status
+    }
+
+    stats = {
+        'expiring': len(by_status.get('EXPIRING', [])),
+        'non_compliant': len(by_status.get('NON_COMPLIANT', [])),
+        'unknown': len(unknown_ids),
+        'cleared': 0,
+        'notifications': 0,
+        'emails': 0,
+    }
+
+    with transaction.atomic():
+        for status, supplier_ids in by_status.items():
+            for chunk in _chunks(supplier_ids):
+                # Group by expiry date so each UPDATE sets a single value
+                per_date = {}
+                for supplier_id in chunk:
+                    per_date.setdefault(expiries[supplier_id], []).append(supplier_id)
+                for expiry_date, ids in per_date.items():
+                    Supplier.objects.filter(id__in=ids).update(
+                        compliance_status=status,
+                        compliance_expiry_date=expiry_date,
+                        compliance_checked_at=now,
+                    )
+
+        for chunk in _chunks(unknown_ids):
+            Supplier.objects.filter(id__in=chunk).update(
+                compliance_status='UNKNOWN',
+                compliance_expiry_date=None,
+                compliance_checked_at=now,
+            )
+
+        # Anyone else outside the warning window is compliant again
+        stats['cleared'] = Supplier.objects.exclude(
+            id__in=list(expiries)
+        ).exclude(
+            MISSING_EXPIRY
+        ).exclude(
+            compliance_status='COMPLIANT'
+        ).update(
+            compliance_status='COMPLIANT',
+            compliance_expiry_date=None,
+            compliance_checked_at=now,
+        )
+
+        if notify and transitions:
+            notifications, emails = _build_alerts(transitions, today)
+            bulk_notify(notifications)
+            EmailLog.objects.bulk_create(emails, batch_size=UPDATE_CHUNK_SIZE)
+            stats['notifications'] = len(notifications)
+            stats['emails'] = len(emails)
+
+    return stats
+
+
+def compliance_summary(status='APPROVED'):
+    """Counts per compliance status for suppliers with the given status"""
+    return Supplier.objects.filter(status=status).aggregate(
+        total=Count('id'),
+        compliant=Count('id', filter=Q(compliance_status='COMPLIANT')),
+        expiring=Count('id', filter=Q(compliance_status='EXPIRING')),
+        non_compliant=Count('id', filter=Q(compliance_status='NON_COMPLIANT')),
+        unchecked=Count('id', filter=Q(compliance_status='UNKNOWN')),
+    )
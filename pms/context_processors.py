@@ -0,0 +1,13 @@
+from django.utils.functional import SimpleLazyObject
+
+from pms.notifications import unread_count
+
+
+def notifications(request):
+    """Unread notification count for the header badge (served from cache)"""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {
+        'unread_notification_count': SimpleLazyObject(lambda: unread_count(user)),
+    }
@@ -0,0 +1,172 @@
+"""
+Read replica routing.
+
+ReplicaRouter sends reads to the replica alias (settings.REPLICA_DATABASE)
+only while the current request, or a ``with use_replica():`` block, is
+pinned to it. Everything else, and every write and migration, uses the
+default alias, so transactional views never see replication lag.
+
+Read-only views are pinned with the @read_replica decorator, or by listing
+their URL names in settings.REPLICA_VIEWS (ReplicaRoutingMiddleware); only
+GET and HEAD requests are pinned. Before pinning, the replica's replication
+lag is checked (at most every REPLICA_LAG_CHECK_SECONDS per process); when
+it is behind by more than REPLICA_MAX_LAG_SECONDS, or cannot be reached,
+reads stay on the primary. When no replica is configured, pinning does
+nothing and all queries go to the default database.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+
+logger = logging.getLogger(__name__)
+
+
+_read_alias = ContextVar('pms_read_alias', default=None)
+
+# Sessions are written at login and read on the very next request, so a
+# lagging replica would log users out
+PRIMARY_ONLY_APPS = frozenset({'sessions'})
+
+
+def replica_alias():
+    """The configured replica alias, or None when there is none"""
+    alias = getattr(settings, 'REPLICA_DATABASE', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+def pinned_alias():
+    """The alias reads are currently routed to (None means default)"""
+    return _read_alias.get()
+
+
+# ----------------------------------------------------------------------------
+# Replication lag
+# ----------------------------------------------------------------------------
+
+# Seconds since the last replayed transaction, or 0 when the standby has
+# replayed everything it received (an idle primary is not lag)
+POSTGRES_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+_lag_checks = {}
+
+
+def measure_lag(alias):
+    """Replication lag of ``alias`` in seconds, or None if it cannot be reached"""
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0.0
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(POSTGRES_LAG_SQL)
+            return float(cursor.fetchone()[0])
+    except DatabaseError:
+        logger.warning('Replica %s is unreachable; reading from the primary', alias, exc_info=True)
+        return None
+
+
+def replication_lag(alias):
+    """measure_lag(), cached for REPLICA_LAG_CHECK_SECONDS"""
+    interval = getattr(settings, 'REPLICA_LAG_CHECK_SECONDS', 5)
+    now = time.monotonic()
+    checked = _lag_checks.get(alias)
+    if checked is None or now - checked[0] >= interval:
+        checked = _lag_checks[alias] = (now, measure_lag(alias))
+    return checked[1]
+
+
+def usable_replica():
+    """The replica alias if it is configured and fresh enough, else None"""
+    alias = replica_alias()
+    if alias is None:
+        return None
+    lag = replication_lag(alias)
+    max_lag = getattr(settings, 'REPLICA_MAX_LAG_SECONDS', 30)
+    if lag is None or lag > max_lag:
+        if lag is not None:
+            logger.info('Replica %s is %.1fs behind (limit %ss); reading from the primary', alias, lag, max_lag)
+        return None
+    return alias
+
+
+@contextmanager
+def use_replica():
+    """Route reads inside the block to the replica, if there is a usable one"""
+    token = _read_alias.set(usable_replica())
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def read_replica(view_func):
+    """Serve GET/HEAD requests for a read-only view from the replica"""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view_func(request, *args, **kwargs)
+        with use_replica():
+            return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+# ----------------------------------------------------------------------------
+# Router and middleware
+# ----------------------------------------------------------------------------
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return None
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # Objects read from the replica are still saved to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica is a copy of the primary, so rows from either relate
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == replica_alias():
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Pin read-only requests for the views in REPLICA_VIEWS to the replica"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.views = frozenset(getattr(settings, 'REPLICA_VIEWS', ()))
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            token = getattr(request, '_replica_token', None)
+            if token is not None:
+                _read_alias.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in ('GET', 'HEAD') or not replica_alias():
+            return None
+        if request.resolver_match.view_name in self.views:
+            request._replica_token = _read_alias.set(usable_replica())
+        return None
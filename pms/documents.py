@@ -0,0 +1,1170 @@
+"""
+Printable documents (PDF, rendered with reportlab).
+
+Each document type (purchase orders, GRNs, invoices, payment vouchers and
+the HOD budget overview) is a Document subclass registered with @register.
+A document is rendered from its data(): a snapshot of every value it
+prints, in plain Python types, taken with all related rows loaded up front.
+
+Rendered files are cached under PDF_CACHE_DIR/<kind>/<object id>/, named
+by a hash of that snapshot. Downloading or e-mailing an unchanged document
+reads the file instead of rendering it again; any change to what it
+prints changes the hash, and the superseded file is removed when the new
+version is written.
+
+Batches (month-end printing) are selected with Document.select(). The
+documents not cached yet are rendered in a pool of PDF_RENDER_WORKERS
+processes, and the batch is streamed back as a ZIP or built as one
+concatenated PDF.
+
+reportlab is imported inside the rendering functions so that workers only
+load it when they first render a document, and the paragraph and table
+styles are built once per process.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from multiprocessing import get_context
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max, Q
+from django.utils.text import slugify
+
+from pms.models import Budget, GoodsReceivedNote, Invoice, Payment, PurchaseOrder
+
+
+# Bump when a layout changes so that cached files are rendered again
+RENDERER_VERSION = 2
+
+# Smaller batches are rendered in the calling process; starting the pool costs more
+POOL_MIN_DOCUMENTS = 8
+
+DOCUMENTS = {}
+
+
+def register(document_class):
+    """Class decorator adding a document type"""
+    DOCUMENTS[document_class.kind] = document_class
+    return document_class
+
+
+def get_document(kind):
+    """The document type registered as ``kind`` (KeyError if there is none)"""
+    return DOCUMENTS[kind]()
+
+
+# ----------------------------------------------------------------------------
+# Cache
+# ----------------------------------------------------------------------------
+
+def cache_dir():
+    return Path(getattr(settings, 'PDF_CACHE_DIR', os.path.join(settings.BASE_DIR, 'pdf_cache')))
+
+
+def fingerprint(*parts):
+    """Content hash of the printable values of a document"""
+    payload = json.dumps([RENDERER_VERSION, *parts], cls=DjangoJSONEncoder, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def cached_pdf_path(kind, object_id, key):
+    return cache_dir() / kind / str(object_id) / f'{key}.pdf'
+
+
+def store_pdf(kind, object_id, key, content):
+    """Write one rendered version and remove the versions it supersedes"""
+    path = cached_pdf_path(kind, object_id, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{key}.{os.getpid()}.tmp')
+    with open(tmp_path, 'wb') as handle:
+        handle.write(content)
+    os.replace(tmp_path, path)
+    for old in path.parent.glob('*.pdf'):
+        if old != path:
+            old.unlink(missing_ok=True)
+    return path
+
+
+def open_cached_pdf(kind, object_id, key, render):
+    """
+    Open the cached PDF of one document for reading, calling ``render()``
+    (which returns the PDF bytes) and storing the result when this version
+    has not been rendered yet.
+    """
+    path = cached_pdf_path(kind, object_id, key)
+    try:
+        return open(path, 'rb')
+    except FileNotFoundError:
+        pass
+    content = render()
+    store_pdf(kind, object_id, key, content)
+    try:
+        return open(path, 'rb')
+    except FileNotFoundError:
+        # A concurrent render of a newer version pruned it already
+        return BytesIO(content)
+
+
+# ----------------------------------------------------------------------------
+# Styles
+# ----------------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def document_styles():
+    """Paragraph styles shared by every document, built once per process"""
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+    styles = getSampleStyleSheet()
+    return {
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=colors.HexColor('#2563EB'),
+            spaceAfter=12,
+            alignment=TA_CENTER,
+        ),
+        'heading': ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=14,
+            textColor=colors.HexColor('#1E293B'),
+            spaceAfter=10,
+            spaceBefore=10,
+        ),
+        'normal': ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontSize=10,
+            textColor=colors.HexColor('#334155'),
+        ),
+        'small': ParagraphStyle(
+            'CustomSmall',
+            parent=styles['Normal'],
+            fontSize=8,
+            textColor=colors.HexColor('#64748B'),
+        ),
+    }
+
+
+@lru_cache(maxsize=None)
+def table_styles():
+    """Table styles shared by every document, built once per process"""
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    return {
+        'header': TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ]),
+        'details': TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (2, 0), (2, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#475569')),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ]),
+        'panel': TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#475569')),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#F8FAFC')),
+            ('BOX', (0, 0), (-1, -1), 0.5, colors.HexColor('#E2E8F0')),
+            ('LEFTPADDING', (0, 0), (-1, -1), 8),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ]),
+        'totals': TableStyle([
+            ('FONTNAME', (5, 0), (5, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (6, 0), (6, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('ALIGN', (5, 0), (-1, -1), 'RIGHT'),
+            ('LINEABOVE', (5, -1), (-1, -1), 2, colors.HexColor('#2563EB')),
+            ('BACKGROUND', (5, -1), (-1, -1), colors.HexColor('#EFF6FF')),
+            ('TOPPADDING', (0, 0), (-1, -1), 4),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+        ]),
+        'note': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#F8FAFC')),
+            ('BOX', (0, 0), (-1, -1), 0.5, colors.HexColor('#E2E8F0')),
+            ('LEFTPADDING', (0, 0), (-1, -1), 10),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+            ('TOPPADDING', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+        ]),
+        'highlight': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#FEF3C7')),
+            ('BOX', (0, 0), (-1, -1), 0.5, colors.HexColor('#FDE68A')),
+            ('LEFTPADDING', (0, 0), (-1, -1), 10),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+            ('TOPPADDING', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+        ]),
+        'signatures': TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('TOPPADDING', (0, 0), (-1, -1), 4),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ]),
+        'footer': TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('TOPPADDING', (0, 0), (-1, -1), 10),
+            ('LINEABOVE', (0, 0), (-1, -1), 0.5, colors.HexColor('#E2E8F0')),
+        ]),
+    }
+
+
+@lru_cache(maxsize=None)
+def line_table_style(numbers_from):
+    """Style of a line-item table whose columns from ``numbers_from`` on hold numbers"""
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    return TableStyle([
+        # Header
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2563EB')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+        # Body
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ('ALIGN', (0, 1), (0, -1), 'CENTER'),  # Row numbers
+        ('ALIGN', (numbers_from, 1), (-1, -1), 'RIGHT'),  # Numbers
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        # Grid
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#E2E8F0')),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F8FAFC')]),
+        # Padding
+        ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ])
+
+
+# ----------------------------------------------------------------------------
+# Layout helpers
+# ----------------------------------------------------------------------------
+
+def _truncate(text, length):
+    return text[:length] + ('...' if len(text) > length else '')
+
+
+def _multiline(text):
+    return text.replace('\n', '<br/>')
+
+
+def _date(value):
+    return value.strftime('%B %d, %Y') if value else 'N/A'
+
+
+def _money(value):
+    return f'KES {value:,.2f}'
+
+
+def _name(user):
+    return user.get_full_name() if user else None
+
+
+def _supplier(supplier):
+    return {
+        'name': supplier.name,
+        'supplier_number': supplier.supplier_number,
+        'tax_id': supplier.tax_id,
+        'contact_person': supplier.contact_person,
+        'email': supplier.email,
+        'phone_number': supplier.phone_number,
+        'physical_address': supplier.physical_address,
+        'bank_name': supplier.bank_name,
+        'bank_branch': supplier.bank_branch,
+        'account_name': supplier.account_name,
+        'account_number': supplier.account_number,
+    }
+
+
+def _title_block(subtitle, number_label, number):
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, Table
+
+    styles = document_styles()
+    table = Table([
+        [Paragraph('<b>UNIVERSITY PROCUREMENT SYSTEM</b>', styles['title'])],
+        [Paragraph(subtitle, styles['heading'])],
+        [Paragraph(f'{number_label}: <b>{number}</b>', styles['normal'])],
+    ], colWidths=[6.5*inch])
+    table.setStyle(table_styles()['header'])
+    return table
+
+
+def _details(rows):
+    """Two label/value pairs per row"""
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Table
+
+    table = Table(rows, colWidths=[1.2*inch, 2*inch, 1.2*inch, 2*inch])
+    table.setStyle(table_styles()['details'])
+    return table
+
+
+def _panel(heading, rows):
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, Table
+
+    table = Table(rows, colWidths=[1.5*inch, 5*inch])
+    table.setStyle(table_styles()['panel'])
+    return [Paragraph(heading, document_styles()['heading']), table]
+
+
+def _text_box(heading, text, style='note'):
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, Table
+
+    styles = document_styles()
+    table = Table([[Paragraph(_multiline(text), styles['normal'])]], colWidths=[6.5*inch])
+    table.setStyle(table_styles()[style])
+    return [Paragraph(heading, styles['heading']), table]
+
+
+def _totals(rows):
+    """(label, amount) rows under the last two columns of a line-item table"""
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Table
+
+    table = Table(
+        [['', '', '', '', '', label, _money(amount)] for label, amount in rows],
+        colWidths=[0.3*inch, 1.8*inch, 1.5*inch, 0.6*inch, 0.6*inch, 1*inch, 1*inch],
+    )
+    table.setStyle(table_styles()['totals'])
+    return table
+
+
+def _signatures(signatories):
+    """Signature blocks, one column per (role, name, date)"""
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, Table
+
+    styles = document_styles()
+    table = Table([
+        [Paragraph(f'<b>{role}</b>', styles['normal']) for role, _, _ in signatories],
+        [name or 'N/A' for _, name, _ in signatories],
+        [date for _, _, date in signatories],
+        ['_______________________'] * len(signatories),
+        [Paragraph('Signature', styles['small'])] * len(signatories),
+    ], colWidths=[6*inch / len(signatories)] * len(signatories))
+    table.setStyle(table_styles()['signatures'])
+    return table
+
+
+# No render time in the footer: the file is cached and served again until its data changes
+def _generated_footer():
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, Spacer, Table
+
+    doc_footer = Paragraph(
+        '<i>This is a computer-generated document.</i>',
+        document_styles()['small']
+    )
+    footer_final_table = Table([[doc_footer]], colWidths=[6.5*inch])
+    footer_final_table.setStyle(table_styles()['footer'])
+    return [Spacer(1, 0.2*inch), footer_final_table]
+
+
+def _build(story):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5*inch, bottomMargin=0.5*inch)
+    doc.build(story)
+    return buffer.getvalue()
+
+
+# ----------------------------------------------------------------------------
+# Document types
+# ----------------------------------------------------------------------------
+
+class Document:
+    kind = ''
+    title = ''
+    # Roles allowed to print batches of this document (none: not batch-printable)
+    roles = ()
+    date_field = ''
+    ordering = ()
+    # Selection parameter -> field lookup
+    filters = {}
+    search_fields = ()
+
+    def queryset(self):
+        """Objects with every related row data() reads"""
+        raise NotImplementedError
+
+    def data(self, obj):
+        """
+        Everything the document prints, as plain Python values. The cache
+        key is computed from it and it is what render workers receive, so
+        it must not hold model instances.
+        """
+        raise NotImplementedError
+
+    def story(self, data):
+        """reportlab flowables for one document"""
+        raise NotImplementedError
+
+    def filename(self, data):
+        raise NotImplementedError
+
+    def key(self, data):
+        return fingerprint(self.kind, data)
+
+    def render(self, data):
+        return _build(self.story(data) + _generated_footer())
+
+    def open(self, data):
+        """The document as an open binary file, rendered only if not cached yet"""
+        return open_cached_pdf(self.kind, data['id'], self.key(data), lambda: self.render(data))
+
+    def select(self, ids=None, date_from=None, date_to=None, search=None, **filters):
+        """The queryset narrowed down to a batch"""
+        queryset = self.queryset()
+        if ids:
+            queryset = queryset.filter(pk__in=ids)
+        if date_from:
+            queryset = queryset.filter(**{f'{self.date_field}__gte': date_from})
+        if date_to:
+            queryset = queryset.filter(**{f'{self.date_field}__lte': date_to})
+        for name, value in filters.items():
+            if value and name in self.filters:
+                queryset = queryset.filter(**{self.filters[name]: value})
+        if search:
+            condition = Q()
+            for field in self.search_fields:
+                condition |= Q(**{f'{field}__icontains': search})
+            queryset = queryset.filter(condition)
+        return queryset.order_by(*self.ordering)
+
+
+@register
+class PurchaseOrderDocument(Document):
+    kind = 'purchase_orders'
+    title = 'Purchase Orders'
+    roles = ('PROCUREMENT', 'ADMIN')
+    date_field = 'po_date'
+    ordering = ('po_date', 'po_number')
+    filters = {
+        'status': 'status',
+        'supplier': 'supplier_id',
+        'department': 'requisition__department_id',
+    }
+    search_fields = ('po_number', 'supplier__name', 'requisition__requisition_number')
+
+    def queryset(self):
+        return PurchaseOrder.objects.select_related(
+            'supplier', 'requisition__department__hod', 'created_by', 'approved_by',
+        ).prefetch_related('items').annotate(
+            amendment_count=Count('amendments'),
+            last_amended_at=Max('amendments__created_at'),
+            last_amendment_approved_at=Max('amendments__approved_at'),
+        )
+
+    def data(self, po):
+        return {
+            'id': str(po.pk),
+            'po_number': po.po_number,
+            'po_date': po.po_date,
+            'delivery_date': po.delivery_date,
+            'delivery_address': po.delivery_address,
+            'status': po.get_status_display(),
+            'requisition_number': po.requisition.requisition_number,
+            'department': po.requisition.department.name,
+            'created_by': _name(po.created_by),
+            'supplier': _supplier(po.supplier),
+            'subtotal': po.subtotal,
+            'tax_amount': po.tax_amount,
+            'total_amount': po.total_amount,
+            'payment_terms': po.payment_terms,
+            'special_instructions': po.special_instructions,
+            'approved_by': _name(po.approved_by),
+            'approved_at': po.approved_at,
+            'items': [
+                {
+                    'description': item.item_description,
+                    'specifications': item.specifications,
+                    'quantity': item.quantity,
+                    'unit_of_measure': item.unit_of_measure,
+                    'unit_price': item.unit_price,
+                    'total_price': item.total_price,
+                }
+                for item in po.items.all()
+            ],
+            # Not printed: included so that amending the PO renders it again
+            'amendments': [
+                getattr(po, 'amendment_count', None),
+                getattr(po, 'last_amended_at', None),
+                getattr(po, 'last_amendment_approved_at', None),
+            ],
+        }
+
+    def filename(self, data):
+        return f"PO_{data['po_number']}.pdf"
+
+    def story(self, data):
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Paragraph, Spacer, Table
+
+        styles = document_styles()
+        normal_style, small_style = styles['normal'], styles['small']
+        supplier = data['supplier']
+
+        elements = [
+            _title_block('Purchase Order', 'PO Number', data['po_number']),
+            Spacer(1, 0.3*inch),
+            _details([
+                ['PO Date:', _date(data['po_date']), 'Delivery Date:', _date(data['delivery_date'])],
+                ['Requisition:', data['requisition_number'], 'Department:', data['department']],
+                ['Status:', data['status'], 'Created By:', data['created_by'] or ''],
+            ]),
+            Spacer(1, 0.2*inch),
+            *_panel('Supplier Information', [
+                ['Supplier Name:', supplier['name']],
+                ['Contact Person:', supplier['contact_person']],
+                ['Email:', supplier['email']],
+                ['Phone:', supplier['phone_number']],
+                ['Address:', supplier['physical_address']],
+            ]),
+            Spacer(1, 0.2*inch),
+            *_panel('Delivery Information', [
+                ['Delivery Address:', Paragraph(_multiline(data['delivery_address']), normal_style)],
+                ['Expected Delivery:', _date(data['delivery_date'])],
+            ]),
+            Spacer(1, 0.3*inch),
+            Paragraph('Order Items', styles['heading']),
+        ]
+
+        items_data = [
+            ['#', 'Description', 'Specifications', 'Qty', 'Unit', 'Unit Price', 'Total']
+        ]
+        for idx, item in enumerate(data['items'], 1):
+            items_data.append([
+                str(idx),
+                Paragraph(_truncate(item['description'], 60), small_style),
+                Paragraph(_truncate(item['specifications'], 40), small_style),
+                f"{item['quantity']:,.2f}",
+                item['unit_of_measure'],
+                _money(item['unit_price']),
+                _money(item['total_price']),
+            ])
+        items_table = Table(items_data, colWidths=[0.3*inch, 1.8*inch, 1.5*inch, 0.6*inch, 0.6*inch, 1*inch, 1*inch])
+        items_table.setStyle(line_table_style(3))
+        elements += [items_table, Spacer(1, 0.2*inch)]
+
+        tax_rate = data['tax_amount'] / data['subtotal'] * 100 if data['subtotal'] else 0
+        elements += [
+            _totals([
+                ('Subtotal:', data['subtotal']),
+                (f'Tax ({tax_rate:.0f}%):', data['tax_amount']),
+                ('Total Amount:', data['total_amount']),
+            ]),
+            Spacer(1, 0.3*inch),
+            *_text_box('Payment Terms', data['payment_terms']),
+        ]
+        if data['special_instructions']:
+            elements += [
+                Spacer(1, 0.2*inch),
+                *_text_box('Special Instructions', data['special_instructions'], 'highlight'),
+            ]
+
+        # Approval and signature
+        footer_table = Table([
+            [Paragraph('<b>Approved By:</b>', normal_style), Paragraph('<b>Date:</b>', normal_style)],
+            [data['approved_by'] or 'N/A', _date(data['approved_at'])],
+            ['', ''],
+            ['_______________________', '_______________________'],
+            [Paragraph('Signature', small_style), Paragraph('Date', small_style)],
+        ], colWidths=[3*inch, 3*inch])
+        footer_table.setStyle(table_styles()['signatures'])
+        elements += [Spacer(1, 0.4*inch), footer_table]
+        return elements
+
+
+@register
+class GoodsReceivedNoteDocument(Document):
+    kind = 'grns'
+    title = 'Goods Received Notes'
+    roles = ('STORES', 'PROCUREMENT', 'ADMIN')
+    date_field = 'received_date'
+    ordering = ('received_date', 'grn_number')
+    filters = {
+        'status': 'status',
+        'store': 'store_id',
+        'supplier': 'purchase_order__supplier_id',
+    }
+    search_fields = (
+        'grn_number', 'delivery_note_number', 'purchase_order__po_number',
+        'purchase_order__supplier__name',
+    )
+
+    def queryset(self):
+        return GoodsReceivedNote.objects.select_related(
+            'purchase_order__supplier', 'store', 'received_by', 'inspected_by',
+        ).prefetch_related('items__po_item')
+
+    def data(self, grn):
+        return {
+            'id': str(grn.pk),
+            'grn_number': grn.grn_number,
+            'po_number': grn.purchase_order.po_number,
+            'supplier': grn.purchase_order.supplier.name,
+            'store': str(grn.store),
+            'delivery_note_number': grn.delivery_note_number,
+            'delivery_date': grn.delivery_date,
+            'received_date': grn.received_date,
+            'status': grn.get_status_display(),
+            'received_by': _name(grn.received_by),
+            'inspected_by': _name(grn.inspected_by),
+            'inspection_date': grn.inspection_date,
+            'general_condition': grn.general_condition,
+            'rejection_reason': grn.rejection_reason,
+            'notes': grn.notes,
+            'items': [
+                {
+                    'description': item.po_item.item_description,
+                    'unit_of_measure': item.po_item.unit_of_measure,
+                    'status': item.get_item_status_display(),
+                    'ordered': item.quantity_ordered,
+                    'delivered': item.quantity_delivered,
+                    'accepted': item.quantity_accepted,
+                    'rejected': item.quantity_rejected,
+                    'remarks': item.remarks,
+                }
+                for item in grn.items.all()
+            ],
+        }
+
+    def filename(self, data):
+        return f"{data['grn_number']}.pdf"
+
+    def story(self, data):
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Paragraph, Spacer, Table
+
+        styles = document_styles()
+        elements = [
+            _title_block('Goods Received Note', 'GRN Number', data['grn_number']),
+            Spacer(1, 0.3*inch),
+            _details([
+                ['Received:', _date(data['received_date']), 'Delivered:', _date(data['delivery_date'])],
+                ['PO Number:', data['po_number'], 'Delivery Note:', data['delivery_note_number']],
+                ['Store:', data['store'], 'Status:', data['status']],
+            ]),
+            Spacer(1, 0.2*inch),
+            *_panel('Supplier Information', [['Supplier Name:', data['supplier']]]),
+            Spacer(1, 0.3*inch),
+            Paragraph('Items Received', styles['heading']),
+        ]
+
+        items_data = [
+            ['#', 'Description', 'Status', 'Ordered', 'Delivered', 'Accepted', 'Rejected']
+        ]
+        for idx, item in enumerate(data['items'], 1):
+            description = _truncate(item['description'], 60)
+            if item['remarks']:
+                description += f"<br/><i>{_truncate(item['remarks'], 60)}</i>"
+            items_data.append([
+                str(idx),
+                Paragraph(description, styles['small']),
+                item['status'],
+                f"{item['ordered']:,.2f} {item['unit_of_measure']}",
+                f"{item['delivered']:,.2f}",
+                f"{item['accepted']:,.2f}",
+                f"{item['rejected']:,.2f}",
+            ])
+        items_table = Table(items_data, colWidths=[0.3*inch, 2.3*inch, 0.9*inch, 1*inch, 0.8*inch, 0.8*inch, 0.7*inch])
+        items_table.setStyle(line_table_style(3))
+        elements.append(items_table)
+
+        for heading, text, style in (
+            ('General Condition', data['general_condition'], 'note'),
+            ('Rejection Reason', data['rejection_reason'], 'highlight'),
+            ('Notes', data['notes'], 'note'),
+        ):
+            if text:
+                elements += [Spacer(1, 0.2*inch), *_text_box(heading, text, style)]
+
+        elements += [
+            Spacer(1, 0.4*inch),
+            _signatures([
+                ('Received By:', data['received_by'], _date(data['received_date'])),
+                ('Inspected By:', data['inspected_by'], _date(data['inspection_date'])),
+            ]),
+        ]
+        return elements
+
+
+@register
+class InvoiceDocument(Document):
+    kind = 'invoices'
+    title = 'Invoices'
+    roles = ('FINANCE', 'ADMIN')
+    date_field = 'invoice_date'
+    ordering = ('invoice_date', 'invoice_number')
+    filters = {
+        'status': 'status',
+        'supplier': 'supplier_id',
+    }
+    search_fields = ('invoice_number', 'supplier_invoice_number', 'supplier__name', 'purchase_order__po_number')
+
+    def queryset(self):
+        return Invoice.objects.select_related(
+            'supplier', 'purchase_order', 'grn', 'verified_by', 'approved_by',
+        ).prefetch_related('items')
+
+    def data(self, invoice):
+        return {
+            'id': str(invoice.pk),
+            'invoice_number': invoice.invoice_number,
+            'supplier_invoice_number': invoice.supplier_invoice_number,
+            'invoice_date': invoice.invoice_date,
+            'due_date': invoice.due_date,
+            'po_number': invoice.purchase_order.po_number,
+            'grn_number': invoice.grn.grn_number if invoice.grn else None,
+            'status': invoice.get_status_display(),
+            'matched': invoice.is_three_way_matched,
+            'supplier': _supplier(invoice.supplier),
+            'subtotal': invoice.subtotal,
+            'tax_amount': invoice.tax_amount,
+            'other_charges': invoice.other_charges,
+            'total_amount': invoice.total_amount,
+            'amount_paid': invoice.amount_paid,
+            'balance_due': invoice.balance_due,
+            'notes': invoice.notes,
+            'verified_by': _name(invoice.verified_by),
+            'verified_at': invoice.verified_at,
+            'approved_by': _name(invoice.approved_by),
+            'approved_at': invoice.approved_at,
+            'items': [
+                {
+                    'description': item.description,
+                    'quantity': item.quantity,
+                    'unit_price': item.unit_price,
+                    'tax_rate': item.tax_rate,
+                    'tax_amount': item.tax_amount,
+                    'total_price': item.total_price,
+                }
+                for item in invoice.items.all()
+            ],
+        }
+
+    def filename(self, data):
+        return f"{data['invoice_number']}.pdf"
+
+    def story(self, data):
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Paragraph, Spacer, Table
+
+        styles = document_styles()
+        supplier = data['supplier']
+        elements = [
+            _title_block('Supplier Invoice', 'Invoice Number', data['invoice_number']),
+            Spacer(1, 0.3*inch),
+            _details([
+                ['Invoice Date:', _date(data['invoice_date']), 'Due Date:', _date(data['due_date'])],
+                ['Supplier Ref:', data['supplier_invoice_number'], 'Status:', data['status']],
+                ['PO Number:', data['po_number'], 'GRN Number:', data['grn_number'] or 'N/A'],
+                ['3-Way Match:', 'Yes' if data['matched'] else 'No', '', ''],
+            ]),
+            Spacer(1, 0.2*inch),
+            *_panel('Supplier Information', [
+                ['Supplier Name:', supplier['name']],
+                ['Supplier No.:', supplier['supplier_number']],
+                ['Tax ID:', supplier['tax_id']],
+                ['Email:', supplier['email']],
+                ['Address:', supplier['physical_address']],
+            ]),
+            Spacer(1, 0.3*inch),
+            Paragraph('Invoice Items', styles['heading']),
+        ]
+
+        items_data = [
+            ['#', 'Description', 'Tax Rate', 'Qty', 'Unit Price', 'Tax', 'Total']
+        ]
+        for idx, item in enumerate(data['items'], 1):
+            items_data.append([
+                str(idx),
+                Paragraph(_truncate(item['description'], 80), styles['small']),
+                f"{item['tax_rate']:.0f}%",
+                f"{item['quantity']:,.2f}",
+                _money(item['unit_price']),
+                _money(item['tax_amount']),
+                _money(item['total_price']),
+            ])
+        items_table = Table(items_data, colWidths=[0.3*inch, 2.4*inch, 0.6*inch, 0.6*inch, 1*inch, 0.9*inch, 1*inch])
+        items_table.setStyle(line_table_style(3))
+        elements += [
+            items_table,
+            Spacer(1, 0.2*inch),
+            _totals([
+                ('Subtotal:', data['subtotal']),
+                ('Tax:', data['tax_amount']),
+                ('Other Charges:', data['other_charges']),
+                ('Paid:', data['amount_paid']),
+                ('Balance Due:', data['balance_due']),
+                ('Total Amount:', data['total_amount']),
+            ]),
+        ]
+        if data['notes']:
+            elements += [Spacer(1, 0.3*inch), *_text_box('Notes', data['notes'])]
+
+        elements += [
+            Spacer(1, 0.4*inch),
+            _signatures([
+                ('Verified By:', data['verified_by'], _date(data['verified_at'])),
+                ('Approved By:', data['approved_by'], _date(data['approved_at'])),
+            ]),
+        ]
+        return elements
+
+
+@register
+class PaymentVoucherDocument(Document):
+    kind = 'payment_vouchers'
+    title = 'Payment Vouchers'
+    roles = ('FINANCE', 'ADMIN')
+    date_field = 'payment_date'
+    ordering = ('payment_date', 'payment_number')
+    filters = {
+        'status': 'status',
+        'method': 'payment_method',
+        'supplier': 'invoice__supplier_id',
+    }
+    search_fields = ('payment_number', 'payment_reference', 'invoice__supplier__name')
+
+    def queryset(self):
+        return Payment.objects.select_related(
+            'invoice__supplier', 'invoice__purchase_order', 'processed_by', 'approved_by',
+        )
+
+    def data(self, payment):
+        invoice = payment.invoice
+        return {
+            'id': str(payment.pk),
+            'payment_number': payment.payment_number,
+            'payment_date': payment.payment_date,
+            'payment_amount': payment.payment_amount,
+            'payment_method': payment.get_payment_method_display(),
+            'payment_reference': payment.payment_reference,
+            'bank_name': payment.bank_name,
+            'cheque_number': payment.cheque_number,
+            'status': payment.get_status_display(),
+            'notes': payment.notes,
+            'invoice_number': invoice.invoice_number,
+            'supplier_invoice_number': invoice.supplier_invoice_number,
+            'po_number': invoice.purchase_order.po_number,
+            'invoice_total': invoice.total_amount,
+            'invoice_balance': invoice.balance_due,
+            'supplier': _supplier(invoice.supplier),
+            'processed_by': _name(payment.processed_by),
+            'approved_by': _name(payment.approved_by),
+        }
+
+    def filename(self, data):
+        return f"{data['payment_number']}.pdf"
+
+    def story(self, data):
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Spacer
+
+        supplier = data['supplier']
+        elements = [
+            _title_block('Payment Voucher', 'Voucher Number', data['payment_number']),
+            Spacer(1, 0.3*inch),
+            _details([
+                ['Payment Date:', _date(data['payment_date']), 'Status:', data['status']],
+                ['Method:', data['payment_method'], 'Reference:', data['payment_reference']],
+                ['Bank:', data['bank_name'] or 'N/A', 'Cheque No.:', data['cheque_number'] or 'N/A'],
+            ]),
+            Spacer(1, 0.2*inch),
+            *_panel('Payee', [
+                ['Supplier Name:', supplier['name']],
+                ['Supplier No.:', supplier['supplier_number']],
+                ['Tax ID:', supplier['tax_id']],
+                ['Bank:', f"{supplier['bank_name']}, {supplier['bank_branch']}"],
+                ['Account Name:', supplier['account_name']],
+                ['Account No.:', supplier['account_number']],
+            ]),
+            Spacer(1, 0.2*inch),
+            *_panel('Invoice', [
+                ['Invoice Number:', data['invoice_number']],
+                ['Supplier Ref:', data['supplier_invoice_number']],
+                ['PO Number:', data['po_number']],
+                ['Invoice Total:', _money(data['invoice_total'])],
+                ['Balance Due:', _money(data['invoice_balance'])],
+            ]),
+            Spacer(1, 0.3*inch),
+            *_text_box('Amount Payable', f"<b>{_money(data['payment_amount'])}</b>", 'highlight'),
+        ]
+        if data['notes']:
+            elements += [Spacer(1, 0.2*inch), *_text_box('Notes', data['notes'])]
+
+        elements += [
+            Spacer(1, 0.4*inch),
+            _signatures([
+                ('Prepared By:', data['processed_by'], ''),
+                ('Approved By:', data['approved_by'], ''),
+                ('Received By:', '', ''),
+            ]),
+        ]
+        return elements
+
+
+@register
+class BudgetOverviewDocument(Document):
+    """One department's budget lines for a budget year (HOD export)"""
+    kind = 'budget_overview'
+    title = 'Budget Overview'
+
+    def data(self, department, budget_year):
+        budgets = Budget.objects.filter(
+            department=department,
+            budget_year=budget_year,
+            is_active=True
+        ).select_related('category').order_by('category__code')
+
+        lines = []
+        for budget in budgets:
+            allocated = budget.allocated_amount or 0
+            spent = budget.actual_spent or 0
+            lines.append({
+                'code': budget.category.code,
+                'category': budget.category.name,
+                'allocated': allocated,
+                'committed': budget.committed_amount or 0,
+                'spent': spent,
+                'available': budget.available_balance,
+                'utilization': spent / allocated * 100 if allocated > 0 else 0,
+            })
+        allocated = sum(line['allocated'] for line in lines)
+        spent = sum(line['spent'] for line in lines)
+        return {
+            'id': f'{department.pk}-{budget_year.pk}',
+            'department': department.name,
+            'budget_year': budget_year.name,
+            'start_date': budget_year.start_date,
+            'end_date': budget_year.end_date,
+            'lines': lines,
+            'allocated': allocated,
+            'committed': sum(line['committed'] for line in lines),
+            'spent': spent,
+            'available': sum(line['available'] for line in lines),
+            'utilization': spent / allocated * 100 if allocated > 0 else 0,
+        }
+
+    def filename(self, data):
+        return f"budget_overview_{slugify(data['department'])}_{slugify(data['budget_year'])}.pdf"
+
+    def story(self, data):
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Paragraph, Spacer, Table
+
+        styles = document_styles()
+        elements = [
+            _title_block('Departmental Budget Overview', 'Budget Year', data['budget_year']),
+            Spacer(1, 0.3*inch),
+            _details([
+                ['Department:', data['department'], 'Period:',
+                 f"{data['start_date']:%d %b %Y} - {data['end_date']:%d %b %Y}"],
+            ]),
+            Spacer(1, 0.2*inch),
+            *_panel('Summary', [
+                ['Allocated:', _money(data['allocated'])],
+                ['Committed:', _money(data['committed'])],
+                ['Spent:', _money(data['spent'])],
+                ['Available:', _money(data['available'])],
+                ['Utilization:', f"{data['utilization']:.1f}%"],
+            ]),
+            Spacer(1, 0.3*inch),
+            Paragraph('Budget Lines', styles['heading']),
+        ]
+
+        lines_data = [
+            ['Code', 'Category', 'Allocated', 'Committed', 'Spent', 'Available', 'Used']
+        ]
+        for line in data['lines']:
+            lines_data.append([
+                line['code'],
+                Paragraph(_truncate(line['category'], 50), styles['small']),
+                f"{line['allocated']:,.2f}",
+                f"{line['committed']:,.2f}",
+                f"{line['spent']:,.2f}",
+                f"{line['available']:,.2f}",
+                f"{line['utilization']:.0f}%",
+            ])
+        lines_data.append([
+            '', 'Total',
+            f"{data['allocated']:,.2f}",
+            f"{data['committed']:,.2f}",
+            f"{data['spent']:,.2f}",
+            f"{data['available']:,.2f}",
+            f"{data['utilization']:.0f}%",
+        ])
+        lines_table = Table(lines_data, colWidths=[0.7*inch, 1.7*inch, 1*inch, 0.95*inch, 0.95*inch, 1*inch, 0.5*inch])
+        lines_table.setStyle(line_table_style(2))
+        elements.append(lines_table)
+        return elements
+
+
+# ----------------------------------------------------------------------------
+# Batches
+# ----------------------------------------------------------------------------
+
+def _render_document(kind, data):
+    """Render one document in a pool worker (module level, so it can be pickled)"""
+    return get_document(kind).render(data)
+
+
+def render_batch(document, rows):
+    """
+    (data, PDF bytes) for each of ``rows``, in order. Cached versions are
+    read from disk; the rest are rendered in a process pool (in this
+    process for small batches) and added to the cache.
+
+    The database is only read here, before the returned generator starts,
+    so its output can be streamed.
+    """
+    snapshots = [document.data(row) for row in rows]
+    keys = [document.key(data) for data in snapshots]
+    missing = [
+        index for index, (data, key) in enumerate(zip(snapshots, keys))
+        if not cached_pdf_path(document.kind, data['id'], key).exists()
+    ]
+    return _render_batch(document, snapshots, keys, missing)
+
+
+def _render_batch(document, snapshots, keys, missing):
+    pending = [snapshots[index] for index in missing]
+    workers = min(getattr(settings, 'PDF_RENDER_WORKERS', None) or os.cpu_count() or 1, len(pending))
+    pool = None
+    if workers > 1 and len(pending) >= POOL_MIN_DOCUMENTS:
+        # spawn, not fork: the web process may be running other threads
+        pool = ProcessPoolExecutor(workers, mp_context=get_context('spawn'), initializer=django.setup)
+        rendered = pool.map(
+            _render_document, [document.kind] * len(pending), pending,
+            chunksize=max(1, len(pending) // (workers * 4)),
+        )
+    else:
+        rendered = map(document.render, pending)
+
+    missing = set(missing)
+    try:
+        for index, (data, key) in enumerate(zip(snapshots, keys)):
+            if index in missing:
+                content = next(rendered)
+                store_pdf(document.kind, data['id'], key, content)
+            else:
+                try:
+                    content = cached_pdf_path(document.kind, data['id'], key).read_bytes()
+                except FileNotFoundError:
+                    # Superseded by a newer version since the batch was planned
+                    content = document.render(data)
+            yield data, content
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+class _StreamBuffer:
+    """Unseekable file that hands what zipfile writes to a generator"""
+
+    def __init__(self):
+        self.chunks = []
+        self.offset = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.offset
+
+    def flush(self):
+        pass
+
+    def take(self):
+        content = b''.join(self.chunks)
+        self.chunks = []
+        return content
+
+
+def stream_zip(document, rows):
+    """ZIP archive of one PDF per row, as a generator of chunks"""
+    documents = render_batch(document, rows)
+
+    def chunks():
+        buffer = _StreamBuffer()
+        # PDFs are compressed already
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+            for data, content in documents:
+                archive.writestr(document.filename(data), content)
+                yield buffer.take()
+        yield buffer.take()
+
+    return chunks()
+
+
+def combined_pdf(document, rows):
+    """
+    One PDF of every row, each starting on a new page, as an open temporary
+    file. The pages are laid out in one pass in this process.
+    """
+    from reportlab.platypus import PageBreak
+
+    story = []
+    for row in rows:
+        if story:
+            story.append(PageBreak())
+        story += document.story(document.data(row)) + _generated_footer()
+
+    handle = tempfile.TemporaryFile()
+    handle.write(_build(story))
+    handle.seek(0)
+    return handle
+
+
+# ----------------------------------------------------------------------------
+# Purchase orders
+# ----------------------------------------------------------------------------
+
+def purchase_orders_for_print():
+    """Purchase orders with every row the PDF and the PO e-mail read"""
+    return get_document('purchase_orders').queryset()
+
+
+def open_purchase_order_pdf(po):
+    """
+    The purchase order PDF as an open binary file, rendered only if this
+    version is not cached yet. ``po`` should come from
+    purchase_orders_for_print() so that nothing is loaded lazily.
+    """
+    document = get_document('purchase_orders')
+    return document.open(document.data(po))
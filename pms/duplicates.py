@@ -0,0 +1,235 @@
+"""
+Duplicate invoice and payment detection.
+
+Every Invoice and Payment stores a hashed ``duplicate_key`` (computed in
+save()) so that a new submission is checked against history with a
+single indexed lookup:
+
+    invoice: supplier | normalised invoice number | amount | date bucket
+    payment: normalised payment reference
+
+Invoice dates are bucketed into DUPLICATE_DATE_BUCKET_DAYS-day buckets and
+the neighbouring buckets are checked too, so a resubmission dated a few
+days later still matches. Stored keys embed the bucket, so after changing
+the setting run the rebuild_duplicate_keys command.
+
+near_duplicate_invoices() is the batch counterpart: it finds invoice
+numbers that differ by a small edit distance (INV-1023 vs INV-1032) using
+sorted-neighbourhood blocking, comparing each invoice only with its
+neighbours in a few sort orders instead of with every other invoice.
+"""
+
+import hashlib
+import re
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Q
+
+
+MIN_REFERENCE_LENGTH = 4
+
+_NON_ALPHANUMERIC = re.compile(r'[^0-9A-Z]')
+_LEADING_ZEROS = re.compile(r'(?<![0-9])0+(?=[0-9])')
+
+
+def normalise_reference(value):
+    """
+    Canonical form of a supplier or bank reference: upper case, separators
+    removed and leading zeros dropped from numbers ("inv-0012" -> "INV12").
+    """
+    value = _NON_ALPHANUMERIC.sub('', str(value or '').upper())
+    return _LEADING_ZEROS.sub('', value)
+
+
+def _bucket_days():
+    return getattr(settings, 'DUPLICATE_DATE_BUCKET_DAYS', 7)
+
+
+def _as_date(value):
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+
+def date_bucket(value):
+    return _as_date(value).toordinal() // _bucket_days()
+
+
+def _digest(*parts):
+    return hashlib.sha256('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _amount(value):
+    return Decimal(value or 0).quantize(Decimal('0.01'))
+
+
+# ----------------------------------------------------------------------------
+# Keys
+# ----------------------------------------------------------------------------
+
+def invoice_duplicate_key(supplier_id, invoice_number, amount, invoice_date, bucket_offset=0):
+    number = normalise_reference(invoice_number)
+    if not (supplier_id and number and invoice_date):
+        return ''
+    return _digest(
+        'invoice', supplier_id, number, _amount(amount), date_bucket(invoice_date) + bucket_offset
+    )
+
+
+def payment_duplicate_key(reference):
+    reference = normalise_reference(reference)
+    if len(reference) < MIN_REFERENCE_LENGTH:
+        return ''
+    return _digest('payment', reference)
+
+
+KEY_BATCH_SIZE = 1000
+
+
+def rebuild_duplicate_keys():
+    """
+    Recompute every stored invoice and payment key, e.g. after changing
+    DUPLICATE_DATE_BUCKET_DAYS. Returns (invoices, payments) updated.
+    """
+    from pms.models import Invoice, Payment
+
+    invoices = []
+    for invoice in Invoice.objects.only(
+        'id', 'supplier_id', 'supplier_invoice_number', 'total_amount', 'invoice_date', 'duplicate_key'
+    ).iterator(chunk_size=2000):
+        key = invoice_duplicate_key(
+            invoice.supplier_id, invoice.supplier_invoice_number, invoice.total_amount, invoice.invoice_date
+        )
+        if key != invoice.duplicate_key:
+            invoice.duplicate_key = key
+            invoices.append(invoice)
+    Invoice.objects.bulk_update(invoices, ['duplicate_key'], batch_size=KEY_BATCH_SIZE)
+
+    payments = []
+    for payment in Payment.objects.only('id', 'payment_reference', 'duplicate_key').iterator(chunk_size=2000):
+        key = payment_duplicate_key(payment.payment_reference)
+        if key != payment.duplicate_key:
+            payment.duplicate_key = key
+            payments.append(payment)
+    Payment.objects.bulk_update(payments, ['duplicate_key'], batch_size=KEY_BATCH_SIZE)
+
+    return len(invoices), len(payments)
+
+
+# ----------------------------------------------------------------------------
+# Submission-time checks
+# ----------------------------------------------------------------------------
+
+def find_duplicate_invoice(supplier_id, invoice_number, amount, invoice_date, exclude_id=None):
+    """Earlier non-rejected invoice with the same key (this or an adjacent date bucket)"""
+    from pms.models import Invoice
+
+    keys = [
+        invoice_duplicate_key(supplier_id, invoice_number, amount, invoice_date, offset)
+        for offset in (-1, 0, 1)
+    ]
+    if not keys[1]:
+        return None
+
+    matches = Invoice.objects.filter(duplicate_key__in=keys).exclude(status='REJECTED')
+    if exclude_id:
+        matches = matches.exclude(pk=exclude_id)
+    return matches.order_by('created_at').first()
+
+
+def find_duplicate_payment(reference, invoice_id=None, amount=None, payment_date=None, exclude_id=None):
+    """
+    Live payment with the same reference, or with the same invoice and
+    amount within one date bucket.
+    """
+    from pms.models import Payment
+
+    condition = Q()
+    key = payment_duplicate_key(reference)
+    if key:
+        condition |= Q(duplicate_key=key)
+    if invoice_id and amount is not None and payment_date:
+        payment_date = _as_date(payment_date)
+        window = timedelta(days=_bucket_days())
+        condition |= Q(
+            invoice_id=invoice_id,
+            payment_amount=_amount(amount),
+            payment_date__range=(payment_date - window, payment_date + window),
+        )
+    if not condition:
+        return None
+
+    matches = Payment.objects.filter(condition).exclude(status__in=['FAILED', 'CANCELLED'])
+    if exclude_id:
+        matches = matches.exclude(pk=exclude_id)
+    return matches.order_by('created_at').first()
+
+
+# ----------------------------------------------------------------------------
+# Batch fuzzy matching
+# ----------------------------------------------------------------------------
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance, or limit + 1 as soon as it must exceed ``limit``"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) < len(b):
+        a, b = b, a
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def near_duplicate_invoices(invoices, max_distance=2, window=5, amount_tolerance=0.01):
+    """
+    Yield (invoice_a, invoice_b, distance) for invoices from the same
+    supplier whose normalised numbers are within ``max_distance`` edits and
+    whose amounts differ by at most ``amount_tolerance`` (a fraction).
+
+    ``invoices`` is an iterable of objects with id, supplier_id,
+    supplier_invoice_number and total_amount. Within each supplier the
+    invoices are sorted by number, by reversed number and by amount; each
+    invoice is compared only with the next ``window`` invoices in each
+    order.
+    """
+    blocks = {}
+    for invoice in invoices:
+        number = normalise_reference(invoice.supplier_invoice_number)
+        if number:
+            blocks.setdefault(invoice.supplier_id, []).append((number, invoice))
+
+    seen = set()
+    for rows in blocks.values():
+        orders = (
+            sorted(rows, key=lambda row: row[0]),
+            sorted(rows, key=lambda row: row[0][::-1]),
+            sorted(rows, key=lambda row: row[1].total_amount),
+        )
+        for ordered in orders:
+            for index, (number, invoice) in enumerate(ordered):
+                for other_number, other in ordered[index + 1:index + 1 + window]:
+                    pair = tuple(sorted((str(invoice.id), str(other.id))))
+                    if pair in seen:
+                        continue
+
+                    largest = max(invoice.total_amount, other.total_amount)
+                    if largest and abs(invoice.total_amount - other.total_amount) > largest * Decimal(str(amount_tolerance)):
+                        continue
+
+                    distance = edit_distance(number, other_number, max_distance)
+                    if distance <= max_distance:
+                        seen.add(pair)
+                        yield invoice, other, distance
@@ -0,0 +1,111 @@
+"""
+In-process publish/subscribe bus for live browser updates.
+
+Server-sent event streams (live_events_stream in pms/views/common.py)
+subscribe per user; the notification service and the approval workflow publish to
+it after their transactions commit. Publishing is thread-safe so sync
+views running in the ASGI thread pool can wake streams waiting on the
+event loop.
+
+The bus only reaches subscribers in the same process. Streams therefore
+also poll the database every SSE_FALLBACK_POLL_SECONDS, which picks up
+changes made by other workers, management commands or cron jobs.
+"""
+
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class Subscription:
+    """A single stream's queue, bound to the event loop it was created on"""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def _put(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # A slow client falls back to the database poll to catch up
+            pass
+
+    def deliver(self, event, data):
+        try:
+            self.loop.call_soon_threadsafe(self._put, (event, data))
+        except RuntimeError:
+            # Event loop already closed; the stream is gone
+            pass
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class EventBus:
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        subscription = Subscription(str(user_id))
+        with self._lock:
+            self._subscribers[subscription.user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def publish(self, user_ids, event, data=None):
+        """Deliver ``event`` to every open stream of the given users"""
+        with self._lock:
+            targets = [
+                subscription
+                for user_id in {str(user_id) for user_id in user_ids if user_id}
+                for subscription in self._subscribers.get(user_id, ())
+            ]
+        for subscription in targets:
+            subscription.deliver(event, data)
+        return len(targets)
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+bus = EventBus()
+
+
+def publish_notifications(rows_by_user):
+    """Push freshly created notifications ({user_id: [payload, ...]})"""
+    for user_id, rows in rows_by_user.items():
+        bus.publish([user_id], 'notification', rows)
+
+
+def publish_counts_changed(user_ids):
+    """Tell streams to resend unread/approval counters"""
+    bus.publish(user_ids, 'counts')
+
+
+def approvals_changed(requisition, *extra_user_ids):
+    """
+    Notify everyone whose pending-approval count may have moved because
+    of a change to ``requisition``'s approval workflow.
+    """
+    user_ids = set(
+        requisition.approvals.values_list('approver_id', flat=True)
+    )
+    user_ids.add(requisition.requested_by_id)
+    user_ids.update(extra_user_ids)
+    transaction.on_commit(lambda: publish_counts_changed(user_ids))
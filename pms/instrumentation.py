@@ -0,0 +1,261 @@
+"""
+Per-view query count and latency instrumentation.
+
+QueryInstrumentationMiddleware records, for every request, the number of
+SQL queries, the time spent in SQL, the time spent rendering templates and
+the total time, keyed by the resolved URL name. The last
+INSTRUMENTATION_SAMPLES requests per URL name are kept in memory, per
+process; metrics() summarises them (mean, p50, p95, max and a latency
+histogram) for the admin-only api/performance/metrics/ endpoint.
+
+Views can declare a query budget with @query_budget(n), or through the
+QUERY_BUDGETS setting ({'url_name': n}); QUERY_BUDGET_DEFAULT applies to
+everything else. A request over budget is logged as a warning, or raises
+QueryBudgetExceeded when QUERY_BUDGET_RAISE is set (use this in tests so
+regressions fail the build).
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+HISTOGRAM_BOUNDS_MS = (50, 100, 250, 500, 1000, 2500, 5000)
+UNRESOLVED = '<unresolved>'
+
+_current = ContextVar('pms_request_metrics', default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(limit):
+    """Declare the maximum number of SQL queries a view may issue per request"""
+    def decorator(view_func):
+        view_func.query_budget = limit
+        return view_func
+    return decorator
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'sql_ms', 'template_ms', 'total_ms')
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.total_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Installed with connection.execute_wrapper()
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_ms += (time.perf_counter() - start) * 1000
+
+
+# ----------------------------------------------------------------------------
+# Template render timing
+# ----------------------------------------------------------------------------
+
+_template_timing_installed = False
+
+
+def install_template_timing():
+    """
+    Wrap the Django template backend's render() so top-level renders
+    (render(), render_to_string(), TemplateResponse) add to the current
+    request's template_ms. Included templates render inside that call.
+    """
+    global _template_timing_installed
+    if _template_timing_installed:
+        return
+
+    from django.template.backends.django import Template
+
+    original_render = Template.render
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return original_render(self, context, request)
+        start = time.perf_counter()
+        try:
+            return original_render(self, context, request)
+        finally:
+            metrics.template_ms += (time.perf_counter() - start) * 1000
+
+    Template.render = render
+    _template_timing_installed = True
+
+
+# ----------------------------------------------------------------------------
+# Rolling statistics
+# ----------------------------------------------------------------------------
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return 0
+    return ordered[min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def _summary(values):
+    ordered = sorted(values)
+    return {
+        'mean': round(sum(ordered) / len(ordered), 2) if ordered else 0,
+        'p50': round(_percentile(ordered, 0.50), 2),
+        'p95': round(_percentile(ordered, 0.95), 2),
+        'max': round(ordered[-1], 2) if ordered else 0,
+    }
+
+
+def _histogram(values):
+    counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    for value in values:
+        for index, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+            if value <= bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-1] += 1
+    labels = [f'<={bound}ms' for bound in HISTOGRAM_BOUNDS_MS] + [f'>{HISTOGRAM_BOUNDS_MS[-1]}ms']
+    return dict(zip(labels, counts))
+
+
+class ViewStats:
+    def __init__(self, size):
+        self.samples = deque(maxlen=size)
+        self.requests = 0
+        self.over_budget = 0
+        self.budget = None
+
+    def add(self, metrics, budget):
+        self.samples.append((metrics.queries, metrics.sql_ms, metrics.template_ms, metrics.total_ms))
+        self.requests += 1
+        self.budget = budget
+        if budget is not None and metrics.queries > budget:
+            self.over_budget += 1
+
+    def snapshot(self):
+        queries, sql_ms, template_ms, total_ms = zip(*self.samples) if self.samples else ((), (), (), ())
+        return {
+            'requests': self.requests,
+            'window': len(self.samples),
+            'query_budget': self.budget,
+            'over_budget': self.over_budget,
+            'queries': _summary(queries),
+            'sql_ms': _summary(sql_ms),
+            'template_ms': _summary(template_ms),
+            'total_ms': _summary(total_ms),
+            'histogram': _histogram(total_ms),
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+        self.started_at = timezone.now()
+
+    def record(self, name, metrics, budget):
+        size = getattr(settings, 'INSTRUMENTATION_SAMPLES', 500)
+        with self._lock:
+            stats = self._views.get(name)
+            if stats is None:
+                stats = self._views[name] = ViewStats(size)
+            stats.add(metrics, budget)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: stats.snapshot() for name, stats in self._views.items()}
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+            self.started_at = timezone.now()
+
+
+registry = MetricsRegistry()
+
+
+def metrics(sort='total_ms', limit=None):
+    """Per-view summaries, slowest (by p95 of ``sort``) first"""
+    views = registry.snapshot()
+    if sort not in ('queries', 'sql_ms', 'template_ms', 'total_ms'):
+        sort = 'total_ms'
+    ordered = sorted(views.items(), key=lambda item: item[1][sort]['p95'], reverse=True)
+    if limit:
+        ordered = ordered[:limit]
+    return {
+        'since': registry.started_at.isoformat(),
+        'sort': sort,
+        'views': dict(ordered),
+    }
+
+
+# ----------------------------------------------------------------------------
+# Budgets and middleware
+# ----------------------------------------------------------------------------
+
+def budget_for(name, view_func):
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is None:
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(name)
+    if budget is None:
+        budget = getattr(settings, 'QUERY_BUDGET_DEFAULT', None)
+    return budget
+
+
+class QueryInstrumentationMiddleware:
+    """Record query count and timings for each request by URL name"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'INSTRUMENTATION_ENABLED', True)
+        if self.enabled:
+            install_template_timing()
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        metrics.total_ms = (time.perf_counter() - start) * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        name = (match.view_name if match else None) or UNRESOLVED
+        budget = budget_for(name, match.func if match else None)
+        registry.record(name, metrics, budget)
+
+        if budget is not None and metrics.queries > budget:
+            message = (
+                f'{name} issued {metrics.queries} queries (budget {budget}) '
+                f'for {request.method} {request.path}'
+            )
+            if getattr(settings, 'QUERY_BUDGET_RAISE', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
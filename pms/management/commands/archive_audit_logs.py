@@ -0,0 +1,79 @@
+"""
+Management command to archive old audit log months to compressed files
+File location: pms/management/commands/archive_audit_logs.py
+
+Each month is written to <AUDIT_ARCHIVE_DIR>/audit_logs_YYYY_MM.jsonl.gz,
+recorded in manifest.json (row count and SHA-256) and then dropped from
+the database. Intended to run monthly from cron:
+    0 3 1 * * python manage.py archive_audit_logs
+"""
+
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from pms.audit_storage import (
+    add_months, archivable_months, archive_dir, archive_month, month_start, partition_name,
+)
+
+
+class Command(BaseCommand):
+    help = 'Moves audit log months older than the retention period to compressed JSONL files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-months',
+            type=int,
+            default=getattr(settings, 'AUDIT_RETENTION_MONTHS', 24),
+            help='Archive months older than this many months (default: AUDIT_RETENTION_MONTHS)',
+        )
+        parser.add_argument(
+            '--before',
+            help='Archive months before YYYY-MM (overrides --older-than-months)',
+        )
+        parser.add_argument(
+            '--output-dir',
+            help='Archive directory (default: AUDIT_ARCHIVE_DIR)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the months that would be archived without changing anything',
+        )
+
+    def handle(self, *args, **options):
+        if options['before']:
+            try:
+                cutoff = date.fromisoformat(f"{options['before']}-01")
+            except ValueError:
+                raise CommandError('--before must be in YYYY-MM format')
+        else:
+            current = month_start(timezone.now().date())
+            cutoff = add_months(current, -options['older_than_months'])
+
+        directory = options['output_dir'] or archive_dir()
+        months = archivable_months(cutoff)
+
+        if not months:
+            self.stdout.write(f'No audit log months before {cutoff:%Y-%m} to archive')
+            return
+
+        if options['dry_run']:
+            for month in months:
+                self.stdout.write(f'  Would archive {partition_name(month)}')
+            return
+
+        total = 0
+        for month in months:
+            try:
+                entry = archive_month(month, directory)
+            except RuntimeError as exc:
+                raise CommandError(str(exc))
+            total += entry['rows']
+            self.stdout.write(f"  {entry['partition']}: {entry['rows']} rows -> {entry['file']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {total} audit log entries from {len(months)} month(s) to {directory}'
+        ))
@@ -0,0 +1,96 @@
+"""
+Management command to rebuild per user per day audit activity summaries
+File location: pms/management/commands/backfill_audit_summaries.py
+
+Summaries are normally maintained as audit entries are flushed; run this
+once after upgrading, or to repair a date range. --pending recounts only
+the days whose summary updates failed; run it hourly:
+    python manage.py backfill_audit_summaries --from 2025-01-01
+    0 * * * * python manage.py backfill_audit_summaries --pending
+"""
+
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from pms.audit import rebuild_activity_summaries
+from pms.models import AuditActivitySummary, AuditLog
+
+
+CHUNK_DAYS = 31
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds AuditActivitySummary rows from the audit log'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--from',
+            dest='date_from',
+            help='First day to rebuild as YYYY-MM-DD (default: oldest audit entry)',
+        )
+        parser.add_argument(
+            '--to',
+            dest='date_to',
+            help='Last day to rebuild as YYYY-MM-DD (default: today)',
+        )
+        parser.add_argument(
+            '--pending',
+            action='store_true',
+            help='Only rebuild days flagged after a failed summary update',
+        )
+
+    def _parse(self, value, option):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f'{option} must be in YYYY-MM-DD format')
+
+    def _rebuild_pending(self):
+        days = list(
+            AuditActivitySummary.objects.filter(needs_rebuild=True).order_by('date').values_list(
+                'date', flat=True
+            ).distinct()
+        )
+        total = 0
+        for day in days:
+            rows = rebuild_activity_summaries(day, day)
+            total += rows
+            self.stdout.write(f'  {day}: {rows} summaries')
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {total} activity summaries for {len(days)} pending day(s)'
+        ))
+
+    def handle(self, *args, **options):
+        if options['pending']:
+            self._rebuild_pending()
+            return
+
+        oldest = AuditLog.objects.order_by('timestamp').values_list('timestamp', flat=True).first()
+        if oldest is None:
+            self.stdout.write('Audit log is empty; nothing to rebuild')
+            return
+
+        # Never reach back before the oldest stored entry: earlier months may
+        # have been archived and their summaries are all that is left
+        oldest_day = timezone.localdate(oldest)
+        start = self._parse(options['date_from'], '--from') if options['date_from'] else oldest_day
+        start = max(start, oldest_day)
+        end = self._parse(options['date_to'], '--to') if options['date_to'] else timezone.localdate()
+
+        if start > end:
+            raise CommandError('--from must not be after --to')
+
+        total = 0
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(chunk_start + timedelta(days=CHUNK_DAYS - 1), end)
+            rows = rebuild_activity_summaries(chunk_start, chunk_end)
+            total += rows
+            self.stdout.write(f'  {chunk_start} to {chunk_end}: {rows} summaries')
+            chunk_start = chunk_end + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {total} activity summaries from {start} to {end}'
+        ))
@@ -0,0 +1,200 @@
+"""
+Management command to measure worker start-up time and memory
+File location: pms/management/commands/benchmark_startup.py
+
+Each run starts a fresh interpreter that loads the WSGI application and the
+URLconf (which imports every view module), the work a gunicorn worker does
+before serving its first request. The median times, the peak RSS and any
+heavy library imported on the way are reported:
+    python manage.py benchmark_startup --runs 5 --output benchmarks/startup.json
+    python manage.py benchmark_startup --compare benchmarks/startup.json --fail-on-regression
+
+--import-times N lists the N slowest imports (python -X importtime), and
+--fail-on-heavy fails when openpyxl, reportlab or dateutil is imported at
+start-up instead of inside the export and PDF views that use them.
+"""
+
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+
+# Only needed by exports and PDFs; importing them at start-up costs every worker
+HEAVY_MODULES = ('openpyxl', 'reportlab', 'dateutil')
+
+STARTUP_SCRIPT = """
+import json, resource, sys, time
+started = time.perf_counter()
+from procurement_mis.wsgi import application
+loaded = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+resolved = time.perf_counter()
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    'setup_ms': (loaded - started) * 1000,
+    'urls_ms': (resolved - loaded) * 1000,
+    'total_ms': (resolved - started) * 1000,
+    'rss_mb': rss / (1024 * 1024 if sys.platform == 'darwin' else 1024),
+    'modules': len(sys.modules),
+    'heavy': sorted(name for name in %r if name in sys.modules),
+}))
+""" % (HEAVY_MODULES,)
+
+# import time: self [us] | cumulative | imported package
+IMPORT_TIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+
+
+def _median(values):
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+class Command(BaseCommand):
+    help = 'Measures how long a fresh worker takes to load the application and how much memory it uses'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=5,
+            help='Fresh interpreters to start (default: 5)',
+        )
+        parser.add_argument(
+            '--import-times',
+            type=int,
+            default=0,
+            metavar='N',
+            help='Also list the N slowest imports',
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results to this JSON file',
+        )
+        parser.add_argument(
+            '--compare',
+            help='Compare against a JSON file written by --output',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=20.0,
+            help='Percentage increase in start-up time or memory counted as a regression (default: 20)',
+        )
+        parser.add_argument(
+            '--fail-on-regression',
+            action='store_true',
+            help='Exit with an error if --compare finds regressions',
+        )
+        parser.add_argument(
+            '--fail-on-heavy',
+            action='store_true',
+            help='Exit with an error if a heavy library is imported at start-up',
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as handle:
+                    baseline = json.load(handle)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read baseline {options['compare']}: {exc}")
+
+        samples = [self.start() for _ in range(max(options['runs'], 1))]
+        results = {
+            key: round(_median([sample[key] for sample in samples]), 1)
+            for key in ('setup_ms', 'urls_ms', 'total_ms', 'rss_mb')
+        }
+        results['modules'] = samples[-1]['modules']
+        heavy = samples[-1]['heavy']
+
+        self.stdout.write(
+            f"Start-up over {len(samples)} run(s): {results['total_ms']:.0f} ms "
+            f"(WSGI application {results['setup_ms']:.0f} ms, URLconf and views {results['urls_ms']:.0f} ms), "
+            f"{results['rss_mb']:.1f} MB peak RSS, {results['modules']} modules"
+        )
+        if heavy:
+            self.stdout.write(self.style.WARNING(f"  heavy libraries imported at start-up: {', '.join(heavy)}"))
+        else:
+            self.stdout.write(self.style.SUCCESS('  no heavy libraries imported at start-up'))
+
+        if options['import_times']:
+            self.report_import_times(options['import_times'])
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'debug': settings.DEBUG,
+            'runs': len(samples),
+            'heavy': heavy,
+            'results': results,
+        }
+
+        if options['output']:
+            directory = os.path.dirname(options['output'])
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        regressions = self.compare(baseline, results, options['threshold']) if baseline else []
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f'{len(regressions)} regression(s): {", ".join(regressions)}')
+        if heavy and options['fail_on_heavy']:
+            raise CommandError(f"Heavy libraries imported at start-up: {', '.join(heavy)}")
+
+    def run_python(self, *flags):
+        completed = subprocess.run(
+            [sys.executable, *flags, '-c', STARTUP_SCRIPT],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode:
+            raise CommandError(f'Start-up failed:\n{completed.stderr[-2000:]}')
+        return completed
+
+    def start(self):
+        completed = self.run_python()
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    def report_import_times(self, limit):
+        """The slowest top-level imports, by cumulative time"""
+        completed = self.run_python('-X', 'importtime')
+        imports = []
+        for line in completed.stderr.splitlines():
+            match = IMPORT_TIME_LINE.match(line)
+            # Nested imports are indented; their time is in their parent's cumulative time
+            if match and len(match.group(3)) == 1:
+                imports.append((int(match.group(2)), match.group(4)))
+        self.stdout.write('\nSlowest imports (cumulative):')
+        for cumulative, name in sorted(imports, reverse=True)[:limit]:
+            self.stdout.write(f'  {cumulative / 1000:>9.1f} ms  {name}')
+
+    def compare(self, baseline, results, threshold):
+        regressions = []
+        previous = baseline.get('results', {})
+        self.stdout.write(f"\nCompared with baseline from {baseline.get('generated_at', '?')}:")
+        for key in ('total_ms', 'urls_ms', 'rss_mb'):
+            before = previous.get(key)
+            if not before:
+                continue
+            change = (results[key] - before) / before * 100
+            flag = ''
+            if change > threshold:
+                regressions.append(key)
+                flag = '  REGRESSION'
+            self.stdout.write(f'  {key:10} {before:>9.1f} -> {results[key]:>9.1f} ({change:+.0f}%){flag}')
+        return regressions
@@ -0,0 +1,50 @@
+"""
+Management command to create monthly audit log partitions
+File location: pms/management/commands/create_audit_partitions.py
+
+Run monthly from cron so partitions always exist ahead of time:
+    0 1 1 * * python manage.py create_audit_partitions --ahead 3
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pms.audit_storage import ensure_partitions, is_partitioned, list_partitions
+
+
+class Command(BaseCommand):
+    help = 'Creates monthly audit_logs partitions and moves matching rows out of the default partition'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ahead',
+            type=int,
+            default=3,
+            help='Number of future months to create (default: 3)',
+        )
+        parser.add_argument(
+            '--start',
+            help='First month to create as YYYY-MM (default: oldest unpartitioned month)',
+        )
+
+    def handle(self, *args, **options):
+        if not is_partitioned():
+            raise CommandError(
+                'audit_logs is not partitioned; partitioning requires PostgreSQL and migration 0012'
+            )
+
+        start = None
+        if options['start']:
+            try:
+                start = date.fromisoformat(f"{options['start']}-01")
+            except ValueError:
+                raise CommandError('--start must be in YYYY-MM format')
+
+        created = ensure_partitions(months_ahead=options['ahead'], start=start)
+
+        for name in created:
+            self.stdout.write(f'  Created {name}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {len(created)} partition(s); {len(list_partitions())} monthly partitions in total'
+        ))
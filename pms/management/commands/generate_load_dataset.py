@@ -0,0 +1,532 @@
+"""
+Management command to generate a large synthetic dataset for load testing
+File location: pms/management/commands/generate_load_dataset.py
+
+Run against an empty (migrated) database. The defaults produce a
+production-sized dataset; use --scale to shrink or grow every volume:
+    python manage.py generate_load_dataset --scale 0.01 --seed 42
+
+Rows are built in memory and written in chunks with bulk_create, or COPY
+on PostgreSQL. The same --seed always produces the same data.
+"""
+
+import random
+import time
+import uuid
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from pms.bulk_seed import insert, keep_timestamps, next_numbers, stable_uuid
+from pms.models import (
+    AuditLog, Budget, BudgetCategory, BudgetYear, Department, Faculty, Item,
+    ItemCategory, PurchaseOrder, PurchaseOrderItem, Requisition, RequisitionItem,
+    StockItem, StockMovement, Store, Supplier, User,
+)
+
+
+VOLUMES = {
+    'departments': 200,
+    'suppliers': 50000,
+    'items': 5000,
+    'requisitions': 1000000,
+    'stock_movements': 5000000,
+    'audit_logs': 10000000,
+}
+
+CENTRAL_USERS = {'PROCUREMENT': 20, 'FINANCE': 15, 'STORES': 10, 'AUDITOR': 5, 'ADMIN': 2}
+
+UNITS = ['Pieces', 'Boxes', 'Reams', 'Litres', 'Kilograms', 'Sets', 'Units', 'Packets']
+AUDIT_ACTIONS = (
+    ['UPDATE'] * 30 + ['CREATE'] * 20 + ['LOGIN'] * 20 + ['APPROVE'] * 10
+    + ['SUBMIT'] * 10 + ['LOGOUT'] * 5 + ['REJECT'] * 3 + ['CANCEL'] + ['DELETE']
+)
+MOVEMENT_TYPES = ['RECEIPT'] * 40 + ['ISSUE'] * 50 + ['ADJUSTMENT'] * 5 + ['RETURN'] * 3 + ['TRANSFER'] * 2
+
+GENERATED_MODELS = (
+    Faculty, Department, User, ItemCategory, Item, BudgetYear, BudgetCategory, Budget,
+    Supplier, Requisition, RequisitionItem, PurchaseOrder, PurchaseOrderItem,
+    Store, StockItem, StockMovement, AuditLog,
+)
+
+
+class Command(BaseCommand):
+    help = 'Generates a large deterministic synthetic dataset for load testing'
+
+    def add_arguments(self, parser):
+        for name, default in VOLUMES.items():
+            parser.add_argument(
+                f"--{name.replace('_', '-')}",
+                type=int,
+                default=default,
+                help=f'Number of {name.replace("_", " ")} before scaling (default: {default})',
+            )
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help='Multiply every volume by this factor (default: 1.0)',
+        )
+        parser.add_argument(
+            '--items-per-requisition',
+            type=int,
+            default=3,
+            help='Average line items per requisition (default: 3)',
+        )
+        parser.add_argument(
+            '--users-per-department',
+            type=int,
+            default=6,
+            help='Users per department, one of them the HOD (default: 6)',
+        )
+        parser.add_argument(
+            '--po-ratio',
+            type=float,
+            default=0.6,
+            help='Share of approved requisitions that have a purchase order (default: 0.6)',
+        )
+        parser.add_argument(
+            '--years',
+            type=int,
+            default=3,
+            help='Spread the data over this many past years (default: 3)',
+        )
+        parser.add_argument(
+            '--as-of',
+            help='Date the dataset ends at, YYYY-MM-DD (default: now); fix it for identical reruns',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed; the same seed reproduces the same dataset (default: 42)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows per INSERT/COPY (default: 5000)',
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Use bulk_create even on PostgreSQL',
+        )
+
+    def handle(self, *args, **options):
+        if Faculty.objects.filter(code='LF001').exists():
+            raise CommandError('A load dataset is already present; run this against a fresh database')
+
+        self.options = options
+        self.seed = options['seed']
+        self.rng = random.Random(self.seed)
+        self.volumes = {
+            name: max(1 if name in ('departments', 'suppliers', 'items') else 0,
+                      int(options[name] * options['scale']))
+            for name in VOLUMES
+        }
+        self.end = timezone.now()
+        if options['as_of']:
+            try:
+                as_of = date.fromisoformat(options['as_of'])
+            except ValueError:
+                raise CommandError('--as-of must be in YYYY-MM-DD format')
+            self.end = timezone.make_aware(datetime.combine(as_of, dt_time.max.replace(microsecond=0)))
+        self.start = self.end - timedelta(days=365 * options['years'])
+        self.use_copy = False if options['no_copy'] else None
+
+        self.stdout.write('Generating: ' + ', '.join(f'{k}={v:,}' for k, v in self.volumes.items()))
+        started = time.monotonic()
+
+        with keep_timestamps(*GENERATED_MODELS):
+            with transaction.atomic():
+                self.create_organisation()
+                self.create_catalogue()
+                self.create_budgets()
+            self.create_suppliers()
+            self.create_requisitions()
+            self.create_stores()
+            self.create_stock_movements()
+            self.create_audit_logs()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Load dataset generated in {time.monotonic() - started:.1f}s. '
+            f'Run create_audit_partitions and backfill_audit_summaries next.'
+        ))
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def uid(self, kind, index):
+        return stable_uuid(self.seed, kind, index)
+
+    def random_uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def moment(self, index, total):
+        """Timestamp for the index-th of total rows, evenly spread and in order"""
+        span = (self.end - self.start).total_seconds()
+        step = span / max(total, 1)
+        return self.start + timedelta(seconds=index * step + self.rng.random() * step)
+
+    def amount(self, low, high):
+        return Decimal(self.rng.randint(low * 100, high * 100)) / 100
+
+    def write(self, model, objects):
+        started = time.monotonic()
+        count = insert(model, objects, self.options['batch_size'], use_copy=self.use_copy)
+        elapsed = time.monotonic() - started
+        rate = count / elapsed if elapsed else 0
+        self.stdout.write(f'  {model.__name__}: {count:,} rows in {elapsed:.1f}s ({rate:,.0f}/s)')
+        return count
+
+    @staticmethod
+    def fiscal_year(day):
+        return day.year if day.month >= 7 else day.year - 1
+
+    # ------------------------------------------------------------------
+    # Organisation
+    # ------------------------------------------------------------------
+
+    def create_organisation(self):
+        departments = self.volumes['departments']
+        per_department = max(self.options['users_per_department'], 1)
+        faculty_count = max(1, departments // 10)
+        password = make_password('LoadTest@123')
+        created = self.start
+
+        self.write(Faculty, (
+            Faculty(
+                id=self.uid('faculty', i), name=f'Load Faculty {i + 1:03d}', code=f'LF{i + 1:03d}',
+                description='', created_at=created, updated_at=created,
+            )
+            for i in range(faculty_count)
+        ))
+        self.department_ids = [self.uid('department', d) for d in range(departments)]
+        self.write(Department, (
+            Department(
+                id=self.department_ids[d], faculty_id=self.uid('faculty', d % faculty_count),
+                name=f'Load Department {d + 1:04d}', code=f'LD{d + 1:04d}',
+                department_type=('ACADEMIC', 'ADMINISTRATIVE', 'SUPPORT')[d % 3],
+                hod_id=self.uid('user', d * per_department), description='',
+                created_at=created, updated_at=created,
+            )
+            for d in range(departments)
+        ))
+
+        # Department users first (index d * per_department is the HOD), then central roles
+        roles = []
+        for d in range(departments):
+            roles += [('HOD', d)] + [('STAFF', d)] * (per_department - 1)
+        for role, count in CENTRAL_USERS.items():
+            roles += [(role, None)] * count
+
+        self.staff_by_department = [
+            [self.uid('user', d * per_department + offset) for offset in range(1, per_department)]
+            or [self.uid('user', d * per_department)]
+            for d in range(departments)
+        ]
+        self.user_ids = [self.uid('user', i) for i in range(len(roles))]
+        self.users_by_role = {}
+        for index, (role, _) in enumerate(roles):
+            self.users_by_role.setdefault(role, []).append(self.user_ids[index])
+
+        self.write(User, (
+            User(
+                id=self.user_ids[i], username=f'load.{role.lower()}.{i + 1}', password=password,
+                first_name=role.title(), last_name=f'User {i + 1}', email=f'load.user{i + 1}@example.edu',
+                employee_id=f'LD{i + 1:07d}', role=role, phone_number='',
+                department_id=self.department_ids[d] if d is not None else None,
+                date_joined=created, created_at=created, updated_at=created,
+            )
+            for i, (role, d) in enumerate(roles)
+        ))
+
+    def create_catalogue(self):
+        categories = 20
+        self.write(ItemCategory, (
+            ItemCategory(
+                id=self.uid('category', c), name=f'Load Category {c + 1:02d}', code=f'LC{c + 1:02d}',
+                category_type=('GOODS', 'GOODS', 'SERVICES', 'WORKS')[c % 4], description='',
+                created_at=self.start,
+            )
+            for c in range(categories)
+        ))
+        self.category_ids = [self.uid('category', c) for c in range(categories)]
+
+        self.items = []
+        for i in range(self.volumes['items']):
+            self.items.append((self.uid('item', i), self.amount(50, 50000), self.rng.choice(UNITS), f'Load Item {i + 1:06d}'))
+        self.write(Item, (
+            Item(
+                id=item_id, category_id=self.category_ids[i % categories], name=name,
+                code=f'LI{i + 1:06d}', description=f'Synthetic catalogue item {i + 1}',
+                unit_of_measure=unit, standard_price=price, specifications='',
+                created_at=self.start, updated_at=self.start,
+            )
+            for i, (item_id, price, unit, name) in enumerate(self.items)
+        ))
+
+    def create_budgets(self):
+        self.budget_categories = 8
+        self.write(BudgetCategory, (
+            BudgetCategory(
+                id=self.uid('budget-category', c), name=f'Load Budget Category {c + 1}',
+                code=f'LBC-{c + 1:03d}', description='', created_at=self.start,
+            )
+            for c in range(self.budget_categories)
+        ))
+
+        self.budget_years = {}
+        for year in range(self.fiscal_year(self.start.date()), self.fiscal_year(self.end.date()) + 1):
+            budget_year, _ = BudgetYear.objects.get_or_create(
+                name=f'FY {year}/{year + 1}',
+                defaults={
+                    'start_date': date(year, 7, 1), 'end_date': date(year + 1, 6, 30),
+                    'created_at': self.start, 'updated_at': self.start,
+                },
+            )
+            self.budget_years[year] = budget_year.id
+
+        admin = self.users_by_role['ADMIN'][0]
+        self.write(Budget, (
+            Budget(
+                id=self.uid('budget', f'{year}:{d}:{c}'), budget_year_id=year_id,
+                department_id=self.department_ids[d], category_id=self.uid('budget-category', c),
+                budget_type='DEPARTMENTAL', allocated_amount=Decimal(self.rng.randint(1, 50) * 1000000),
+                reference_number='', description='', created_by_id=admin,
+                created_at=self.start, updated_at=self.start,
+            )
+            for year, year_id in self.budget_years.items()
+            for d in range(len(self.department_ids))
+            for c in range(self.budget_categories)
+        ))
+
+    # ------------------------------------------------------------------
+    # Suppliers
+    # ------------------------------------------------------------------
+
+    def create_suppliers(self):
+        total = self.volumes['suppliers']
+        self.supplier_ids = [self.uid('supplier', s) for s in range(total)]
+        creator = self.users_by_role['PROCUREMENT'][0]
+        numbers = next_numbers(Supplier, 'supplier_number', 'SUP-LD-', total, width=7)
+
+        def suppliers():
+            for s in range(total):
+                name = f'Load Supplier {s + 1:06d} Ltd'
+                email = f'supplier{s + 1}@load.example.com'
+                created = self.moment(s, total) - timedelta(days=365)
+                yield Supplier(
+                    id=self.supplier_ids[s], supplier_number=numbers[s], name=name,
+                    registration_number=f'LDREG{s + 1:08d}', tax_id=f'P{s + 1:09d}L',
+                    email=email, phone_number=f'+2547{s:08d}', physical_address='Nairobi',
+                    contact_person='Contact Person', contact_person_phone=f'+2547{s:08d}',
+                    contact_person_email=email, bank_name='Kenya Commercial Bank',
+                    bank_branch='Nairobi Branch', account_number=f'{1000000000 + s}', account_name=name,
+                    status=self.rng.choice(['APPROVED'] * 17 + ['PENDING', 'SUSPENDED', 'BLACKLISTED']),
+                    rating=Decimal(self.rng.randint(250, 500)) / 100, notes='', created_by_id=creator,
+                    created_at=created, updated_at=created,
+                )
+
+        self.write(Supplier, suppliers())
+
+        Through = Supplier.categories.through
+        self.write(Through, (
+            Through(supplier_id=supplier_id, itemcategory_id=self.category_ids[(s + offset) % len(self.category_ids)])
+            for s, supplier_id in enumerate(self.supplier_ids)
+            for offset in range(1 + s % 2)
+        ))
+
+    # ------------------------------------------------------------------
+    # Requisitions and purchase orders
+    # ------------------------------------------------------------------
+
+    def requisition_status(self, age_days):
+        if age_days > 180:
+            return self.rng.choice(['APPROVED'] * 8 + ['REJECTED', 'CANCELLED'])
+        if age_days > 60:
+            return self.rng.choice(['APPROVED', 'APPROVED', 'PROCUREMENT_APPROVED', 'BUDGET_APPROVED', 'HOD_APPROVED'])
+        return self.rng.choice(['DRAFT', 'SUBMITTED', 'SUBMITTED', 'HOD_APPROVED', 'APPROVED'])
+
+    def create_requisitions(self):
+        total = self.volumes['requisitions']
+        average_items = max(self.options['items_per_requisition'], 1)
+        approver = self.users_by_role['PROCUREMENT']
+        counters = {}
+
+        requisitions, requisition_items, orders, order_items = [], [], [], []
+        counts = {Requisition: 0, RequisitionItem: 0, PurchaseOrder: 0, PurchaseOrderItem: 0}
+        started = time.monotonic()
+
+        def number(model, prefix, year):
+            key = (model, year)
+            if key not in counters:
+                field = 'requisition_number' if model is Requisition else 'po_number'
+                counters[key] = int(next_numbers(model, field, f'{prefix}-{year}-', 1)[0].split('-')[-1])
+            value = f'{prefix}-{year}-{counters[key]:06d}'
+            counters[key] += 1
+            return value
+
+        def flush():
+            for model, rows in ((Requisition, requisitions), (RequisitionItem, requisition_items),
+                                (PurchaseOrder, orders), (PurchaseOrderItem, order_items)):
+                counts[model] += insert(model, rows, self.options['batch_size'], use_copy=self.use_copy)
+                rows.clear()
+
+        for r in range(total):
+            created = self.moment(r, total)
+            age_days = (self.end - created).days
+            status = self.requisition_status(age_days)
+            d = self.rng.randrange(len(self.department_ids))
+            requisition_id = self.uid('requisition', r)
+            budget_id = self.uid('budget', f'{self.fiscal_year(created.date())}:{d}:{self.rng.randrange(self.budget_categories)}')
+
+            lines = []
+            for line in range(self.rng.randint(1, 2 * average_items - 1)):
+                item_id, price, unit, name = self.items[self.rng.randrange(len(self.items))]
+                quantity = Decimal(self.rng.randint(1, 50))
+                lines.append(RequisitionItem(
+                    id=self.uid('requisition-item', f'{r}:{line}'), requisition_id=requisition_id,
+                    item_id=item_id, item_description=name, specifications='Standard specification',
+                    quantity=quantity, unit_of_measure=unit, estimated_unit_price=price,
+                    estimated_total=quantity * price, notes='', created_at=created,
+                ))
+            estimated = sum(line.estimated_total for line in lines)
+
+            requisitions.append(Requisition(
+                id=requisition_id, requisition_number=number(Requisition, 'REQ', created.year),
+                title=f'Procurement of {lines[0].item_description}', department_id=self.department_ids[d],
+                budget_id=budget_id, requested_by_id=self.rng.choice(self.staff_by_department[d]),
+                status=status, priority=self.rng.choice(['LOW', 'MEDIUM', 'MEDIUM', 'HIGH', 'URGENT']),
+                justification='Required for departmental operations', estimated_amount=estimated,
+                required_date=(created + timedelta(days=30)).date(), notes='', rejection_reason='',
+                emergency_justification='', submitted_at=None if status == 'DRAFT' else created,
+                created_at=created, updated_at=created,
+            ))
+            requisition_items.extend(lines)
+
+            if status == 'APPROVED' and self.rng.random() < self.options['po_ratio']:
+                ordered = created + timedelta(days=self.rng.randint(3, 21))
+                if ordered < self.end:
+                    po_id = self.uid('purchase-order', r)
+                    tax = (estimated * Decimal('0.16')).quantize(Decimal('0.01'))
+                    age = (self.end - ordered).days
+                    orders.append(PurchaseOrder(
+                        id=po_id, po_number=number(PurchaseOrder, 'PO', ordered.year),
+                        requisition_id=requisition_id, supplier_id=self.rng.choice(self.supplier_ids),
+                        po_date=ordered.date(), delivery_date=(ordered + timedelta(days=30)).date(),
+                        delivery_address='Main Stores', subtotal=estimated, tax_amount=tax,
+                        total_amount=estimated + tax, payment_terms='Net 30 days', warranty_terms='',
+                        special_instructions='',
+                        status='CLOSED' if age > 120 else 'DELIVERED' if age > 45 else self.rng.choice(['APPROVED', 'SENT', 'ACKNOWLEDGED']),
+                        approved_by_id=self.rng.choice(approver), approved_at=ordered,
+                        created_by_id=self.rng.choice(approver), created_at=ordered, updated_at=ordered,
+                    ))
+                    order_items.extend(
+                        PurchaseOrderItem(
+                            id=self.uid('purchase-order-item', f'{r}:{line}'), purchase_order_id=po_id,
+                            requisition_item_id=item.id, item_description=item.item_description,
+                            specifications=item.specifications, quantity=item.quantity,
+                            unit_of_measure=item.unit_of_measure, unit_price=item.estimated_unit_price,
+                            total_price=item.estimated_total, quantity_pending=item.quantity, notes='',
+                        )
+                        for line, item in enumerate(lines)
+                    )
+
+            if len(requisition_items) >= self.options['batch_size']:
+                flush()
+        flush()
+
+        elapsed = time.monotonic() - started
+        for model, count in counts.items():
+            self.stdout.write(f'  {model.__name__}: {count:,} rows')
+        self.stdout.write(f'  (requisitions and purchase orders in {elapsed:.1f}s)')
+
+    # ------------------------------------------------------------------
+    # Stores and stock movements
+    # ------------------------------------------------------------------
+
+    def create_stores(self):
+        keepers = self.users_by_role['STORES']
+        store_count = 1 + len(self.department_ids) // 10
+        stocked = self.items[:min(len(self.items), 500)]
+
+        self.write(Store, (
+            Store(
+                id=self.uid('store', s), name=f'Load Store {s + 1:03d}', code=f'LS{s + 1:03d}',
+                store_type='MAIN' if s == 0 else 'DEPARTMENTAL',
+                department_id=None if s == 0 else self.department_ids[s * 10 - 1],
+                location='Campus', store_keeper_id=keepers[s % len(keepers)], created_at=self.start,
+            )
+            for s in range(store_count)
+        ))
+
+        self.stock_items = []
+        for s in range(store_count):
+            for i, (item_id, price, _, _) in enumerate(stocked):
+                self.stock_items.append((self.uid('stock-item', f'{s}:{i}'), self.uid('store', s), item_id, price))
+
+        def stock_items():
+            for stock_id, store_id, item_id, price in self.stock_items:
+                quantity = Decimal(self.rng.randint(0, 500))
+                yield StockItem(
+                    id=stock_id, store_id=store_id, item_id=item_id, quantity_on_hand=quantity,
+                    reorder_level=Decimal(20), average_unit_cost=price, total_value=quantity * price,
+                    created_at=self.start, updated_at=self.end,
+                )
+
+        self.write(StockItem, stock_items())
+
+    def create_stock_movements(self):
+        total = self.volumes['stock_movements']
+        keepers = self.users_by_role['STORES']
+
+        def movements():
+            for m in range(total):
+                stock_id, store_id, _, price = self.stock_items[self.rng.randrange(len(self.stock_items))]
+                movement_type = self.rng.choice(MOVEMENT_TYPES)
+                quantity = Decimal(self.rng.randint(1, 100))
+                before = Decimal(self.rng.randint(0, 1000))
+                after = before + quantity if movement_type in ('RECEIPT', 'RETURN') else max(before - quantity, Decimal(0))
+                yield StockMovement(
+                    id=self.random_uuid(), stock_item_id=stock_id, movement_type=movement_type,
+                    reference_number=f'LD-MOV-{m + 1:08d}',
+                    reference_type='GRN' if movement_type == 'RECEIPT' else 'ISSUE',
+                    quantity=quantity, unit_cost=price, balance_before=before, balance_after=after,
+                    remarks='', performed_by_id=self.rng.choice(keepers),
+                    movement_date=self.moment(m, total),
+                )
+
+        self.write(StockMovement, movements())
+
+    # ------------------------------------------------------------------
+    # Audit log
+    # ------------------------------------------------------------------
+
+    def create_audit_logs(self):
+        total = self.volumes['audit_logs']
+        requisitions = self.volumes['requisitions']
+
+        def entries():
+            for a in range(total):
+                action = self.rng.choice(AUDIT_ACTIONS)
+                user_id = self.rng.choice(self.user_ids)
+                if action in ('LOGIN', 'LOGOUT') or not requisitions:
+                    model_name, object_id = 'User', str(user_id)
+                else:
+                    model_name = 'Requisition'
+                    object_id = str(self.uid('requisition', self.rng.randrange(requisitions)))
+                yield AuditLog(
+                    id=self.random_uuid(), user_id=user_id, action=action,
+                    model_name=model_name, object_id=object_id, object_repr=f'{model_name} {object_id[:8]}',
+                    ip_address=f'10.{self.rng.randint(0, 255)}.{self.rng.randint(0, 255)}.{self.rng.randint(1, 254)}',
+                    user_agent='Mozilla/5.0 (load test)', timestamp=self.moment(a, total),
+                )
+
+        self.write(AuditLog, entries())
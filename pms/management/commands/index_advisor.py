@@ -0,0 +1,254 @@
+"""
+Management command to find full table scans in the queries the views issue
+File location: pms/management/commands/index_advisor.py
+
+Replays the SELECTs captured by run_benchmarks --capture-queries through
+EXPLAIN (PostgreSQL) or EXPLAIN QUERY PLAN (SQLite) and reports sequential
+scans of tables with at least --min-rows rows, together with the columns
+the scan filtered on as a starting point for a models.Index:
+    python manage.py run_benchmarks --capture-queries benchmarks/queries.jsonl
+    python manage.py index_advisor benchmarks/queries.jsonl --min-rows 10000
+
+Run it against a database loaded by generate_load_dataset (and ANALYZEd on
+PostgreSQL); on a small database the planner rightly prefers scans.
+
+On PostgreSQL, scans of partitions (the monthly audit_logs_YYYY_MM tables)
+are reported against their partitioned parent, whose row count is the sum
+over its partitions.
+"""
+
+import json
+import re
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections
+
+
+# A column compared in a PostgreSQL filter, e.g. ((status)::text = 'PAID'::text)
+PG_FILTER_COLUMN = re.compile(
+    r'\(*"?(\w+)"?\)*(?:::[\w ]+?)?\s*(?:=|<>|!=|<=|>=|<|>|~~\*?|IS\b)'
+)
+
+
+def _table_models():
+    return {model._meta.db_table: model for model in apps.get_models()}
+
+
+def _where_clause(sql):
+    match = re.search(r'\bWHERE\b(.*?)(?:\bGROUP BY\b|\bORDER BY\b|\bLIMIT\b|$)', sql, re.S | re.I)
+    return match.group(1) if match else ''
+
+
+def _pg_seq_scans(plan):
+    """(table, alias, filter) for every Seq Scan node of a JSON plan"""
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if node.get('Node Type') == 'Seq Scan':
+            yield node['Relation Name'], node.get('Alias'), node.get('Filter', '')
+        stack.extend(node.get('Plans', []))
+
+
+class Command(BaseCommand):
+    help = 'Replays captured queries through EXPLAIN and reports sequential scans on large tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'queries',
+            help='JSON lines file written by run_benchmarks --capture-queries',
+        )
+        parser.add_argument(
+            '--database',
+            help='Explain against this alias instead of the one each query was captured on',
+        )
+        parser.add_argument(
+            '--min-rows',
+            type=int,
+            default=10000,
+            help='Only report scans of tables with at least this many rows (default: 10000)',
+        )
+        parser.add_argument(
+            '--output',
+            help='Also write the findings to this JSON file',
+        )
+        parser.add_argument(
+            '--fail-on-findings',
+            action='store_true',
+            help='Exit with an error if any sequential scan is reported',
+        )
+
+    def handle(self, *args, **options):
+        queries = self.load(options['queries'], options['database'])
+        self.models = _table_models()
+        self.row_counts = {}
+        self.parents = {}
+
+        # (table, columns) -> finding
+        findings = {}
+        explained = skipped = 0
+        for (alias, sql), (params, benchmarks) in queries.items():
+            try:
+                # A query scanning several partitions counts once per table
+                scans = list(dict.fromkeys(self.scans(alias, sql, params)))
+            except DatabaseError as exc:
+                skipped += 1
+                self.stdout.write(self.style.WARNING(f'  skipped ({exc.__class__.__name__}: {exc}): {sql[:100]}'))
+                continue
+            explained += 1
+
+            for table, columns in scans:
+                if table not in self.models:
+                    continue
+                rows = self.rows(alias, table)
+                if rows < options['min_rows']:
+                    continue
+                finding = findings.setdefault((table, columns), {
+                    'table': table,
+                    'model': self.models[table].__name__,
+                    'rows': rows,
+                    'columns': list(columns),
+                    'queries': 0,
+                    'benchmarks': set(),
+                    'example': sql,
+                })
+                finding['queries'] += 1
+                finding['benchmarks'].update(benchmarks)
+
+        self.report(findings, explained, skipped)
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(
+                    [dict(finding, benchmarks=sorted(finding['benchmarks'])) for finding in findings.values()],
+                    handle, indent=2,
+                )
+            self.stdout.write(self.style.SUCCESS(f"Findings written to {options['output']}"))
+
+        if findings and options['fail_on_findings']:
+            raise CommandError(f'{len(findings)} sequential scan(s) on large tables')
+
+    def load(self, path, database):
+        """Unique (alias, sql) -> (first params seen, benchmarks issuing it)"""
+        queries = {}
+        try:
+            with open(path) as handle:
+                for line in handle:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    alias = database or entry.get('database', 'default')
+                    if alias not in connections:
+                        raise CommandError(f'Unknown database alias {alias!r}; use --database')
+                    key = (alias, entry['sql'])
+                    if key not in queries:
+                        queries[key] = (entry.get('params') or [], set())
+                    queries[key][1].add(entry.get('benchmark', '?'))
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f'Cannot read captured queries from {path}: {exc}')
+        return queries
+
+    def scans(self, alias, sql, params):
+        """(table, filtered columns) for each full table scan in the plan"""
+        connection = connections[alias]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            for table, _alias, condition in _pg_seq_scans(plan[0]['Plan']):
+                table = self.partition_parent(alias, table)
+                yield table, self.columns(table, PG_FILTER_COLUMN.findall(condition))
+        elif connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                details = [row[-1] for row in cursor.fetchall()]
+            # Subquery tables are aliased (U0, T3, ...)
+            aliases = dict((name, table) for table, name in re.findall(r'"(\w+)" (\w+)', sql))
+            where = _where_clause(sql)
+            for detail in details:
+                match = re.match(r'SCAN (\w+)$', detail)
+                if not match:
+                    continue
+                name = match.group(1)
+                table = aliases.get(name, name)
+                referenced = re.findall(rf'(?:"{table}"|\b{name})\."(\w+)"', where)
+                yield table, self.columns(table, referenced)
+        else:
+            raise CommandError(f'index_advisor does not support {connection.vendor}')
+
+    def partition_parent(self, alias, table):
+        """The top-level partitioned table ``table`` belongs to, or ``table`` itself"""
+        if alias not in self.parents:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(
+                    'SELECT child.relname, parent.relname FROM pg_inherits '
+                    'JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+                    'JOIN pg_class parent ON parent.oid = pg_inherits.inhparent'
+                )
+                self.parents[alias] = dict(cursor.fetchall())
+        parents = self.parents[alias]
+        while table in parents:
+            table = parents[table]
+        return table
+
+    def columns(self, table, names):
+        """The names that are columns of ``table``, as model field names, in order"""
+        model = self.models.get(table)
+        if model is None:
+            return ()
+        # The primary key is always indexed
+        fields = {
+            field.column: field.name for field in model._meta.concrete_fields if not field.primary_key
+        }
+        seen = []
+        for name in names:
+            if name in fields and fields[name] not in seen:
+                seen.append(fields[name])
+        return tuple(seen)
+
+    def rows(self, alias, table):
+        key = (alias, table)
+        if key not in self.row_counts:
+            connection = connections[alias]
+            with connection.cursor() as cursor:
+                if connection.vendor == 'postgresql':
+                    # Planner estimate; run ANALYZE after loading data. A
+                    # partitioned table holds no rows itself, so sum its partitions
+                    cursor.execute(
+                        'WITH RECURSIVE tree(oid) AS ('
+                        "  SELECT oid FROM pg_class WHERE relname = %s AND relkind IN ('r', 'p')"
+                        '  UNION ALL'
+                        '  SELECT pg_inherits.inhrelid FROM pg_inherits JOIN tree ON pg_inherits.inhparent = tree.oid'
+                        ') '
+                        'SELECT COALESCE(SUM(GREATEST(pg_class.reltuples, 0)), 0)::bigint '
+                        "FROM pg_class JOIN tree ON pg_class.oid = tree.oid WHERE pg_class.relkind = 'r'",
+                        [table],
+                    )
+                else:
+                    cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+                row = cursor.fetchone()
+            self.row_counts[key] = row[0] if row else 0
+        return self.row_counts[key]
+
+    def report(self, findings, explained, skipped):
+        self.stdout.write(f'Explained {explained} distinct queries ({skipped} skipped)')
+        if not findings:
+            self.stdout.write(self.style.SUCCESS('No sequential scans on large tables'))
+            return
+
+        ordered = sorted(findings.values(), key=lambda f: (-f['rows'], -f['queries']))
+        for finding in ordered:
+            self.stdout.write(self.style.WARNING(
+                f"\n{finding['table']} ({finding['rows']:,} rows): sequential scan in "
+                f"{finding['queries']} quer{'y' if finding['queries'] == 1 else 'ies'} "
+                f"from {', '.join(sorted(finding['benchmarks']))}"
+            ))
+            if finding['columns']:
+                fields = ', '.join(repr(column) for column in finding['columns'])
+                self.stdout.write(f"  filters on: {', '.join(finding['columns'])}")
+                self.stdout.write(f"  consider:   models.Index(fields=[{fields}]) on {finding['model']}")
+            else:
+                self.stdout.write('  no filter on this table (full read, join or aggregate)')
+            self.stdout.write(f"  example:    {finding['example'][:200]}")
@@ -0,0 +1,25 @@
+"""
+Management command to recompute the stored duplicate invoice/payment keys
+File location: pms/management/commands/rebuild_duplicate_keys.py
+
+Invoice keys embed the date bucket, so run this after changing
+DUPLICATE_DATE_BUCKET_DAYS (or after upgrading with a non-default value);
+otherwise new submissions stop matching earlier ones:
+    python manage.py rebuild_duplicate_keys
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from pms.duplicates import rebuild_duplicate_keys
+
+
+class Command(BaseCommand):
+    help = 'Recomputes duplicate detection keys of every invoice and payment'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            invoices, payments = rebuild_duplicate_keys()
+        self.stdout.write(self.style.SUCCESS(
+            f'Updated keys of {invoices} invoice(s) and {payments} payment(s)'
+        ))
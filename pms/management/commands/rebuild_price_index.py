@@ -0,0 +1,26 @@
+"""
+Management command to rebuild the item price benchmarks
+File location: pms/management/commands/rebuild_price_index.py
+
+Approvals and bid submissions keep the benchmarks current; rebuild after
+upgrading, after bulk imports, and weekly to drop prices of orders and
+bids cancelled or disqualified since (see pms.price_index):
+    python manage.py rebuild_price_index
+    0 4 * * 0 python manage.py rebuild_price_index
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from pms.price_index import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the rolling price statistics of every catalogue item from PO and bid history'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        indexed = rebuild()
+        self.stdout.write(f'{indexed} items indexed in {time.perf_counter() - started:.2f}s')
+        self.stdout.write(self.style.SUCCESS('Price index is up to date'))
@@ -0,0 +1,39 @@
+"""
+Management command to rebuild procurement plan item usage
+File location: pms/management/commands/recalculate_plan_consumption.py
+
+Recomputes quantity_requisitioned and amount_committed from the submitted
+and approved requisitions linked to each plan item (see
+pms.plan_consumption). Run once after upgrading, since drafts no longer
+hold plan budget, and after any bulk data fix:
+    python manage.py recalculate_plan_consumption
+    python manage.py recalculate_plan_consumption --plan <plan id>
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from pms.models import ProcurementPlanItem
+from pms.plan_consumption import recalculate
+
+
+class Command(BaseCommand):
+    help = 'Recomputes procurement plan item quantity requisitioned and amount committed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--plan',
+            action='append',
+            dest='plans',
+            help='Only this procurement plan (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        plan_items = ProcurementPlanItem.objects.all()
+        if options['plans']:
+            plan_items = plan_items.filter(procurement_plan_id__in=options['plans'])
+
+        with transaction.atomic():
+            updated = recalculate(plan_items)
+
+        self.stdout.write(self.style.SUCCESS(f'Recalculated usage of {updated} plan items'))
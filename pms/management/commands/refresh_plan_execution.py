@@ -0,0 +1,65 @@
+"""
+Management command to refresh the plan-vs-actual execution figures
+File location: pms/management/commands/refresh_plan_execution.py
+
+Incremental refreshes only recompute plan items whose requisitions, POs,
+GRNs, invoices or payments changed since the last run; run them often and
+a full refresh nightly:
+    */15 * * * * python manage.py refresh_plan_execution
+    30 2 * * * python manage.py refresh_plan_execution --full --all-years
+"""
+
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from pms.models import BudgetYear
+from pms.plan_execution import refresh
+
+
+class Command(BaseCommand):
+    help = 'Recomputes planned/requisitioned/ordered/received/invoiced/paid figures per plan item'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--budget-year',
+            help='Budget year name or id (default: the active year)',
+        )
+        parser.add_argument(
+            '--all-years',
+            action='store_true',
+            help='Refresh every budget year',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Recompute every plan item instead of only changed ones',
+        )
+
+    def handle(self, *args, **options):
+        if options['all_years']:
+            budget_years = list(BudgetYear.objects.order_by('start_date'))
+        elif options['budget_year']:
+            budget_year = BudgetYear.objects.filter(name=options['budget_year']).first()
+            if budget_year is None:
+                try:
+                    budget_year = BudgetYear.objects.filter(pk=options['budget_year']).first()
+                except ValidationError:
+                    budget_year = None
+            if budget_year is None:
+                raise CommandError(f"Unknown budget year: {options['budget_year']}")
+            budget_years = [budget_year]
+        else:
+            budget_years = list(BudgetYear.objects.filter(is_active=True))
+            if not budget_years:
+                raise CommandError('No active budget year; pass --budget-year or --all-years')
+
+        for budget_year in budget_years:
+            started = time.perf_counter()
+            updated = refresh(budget_year, full=options['full'])
+            self.stdout.write(
+                f'{budget_year.name}: {updated} plan items refreshed '
+                f'in {time.perf_counter() - started:.2f}s'
+            )
+        self.stdout.write(self.style.SUCCESS('Plan execution figures are up to date'))
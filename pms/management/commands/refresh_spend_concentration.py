@@ -0,0 +1,59 @@
+"""
+Management command to refresh the supplier spend concentration analysis
+File location: pms/management/commands/refresh_spend_concentration.py
+
+Recomputes the supplier/item ABC classes, cumulative spend curve and
+category HHI shown on the procurement reports page; run it nightly:
+    15 3 * * * python manage.py refresh_spend_concentration
+    python manage.py refresh_spend_concentration --all-years
+"""
+
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from pms.models import BudgetYear
+from pms.spend_concentration import refresh
+
+
+class Command(BaseCommand):
+    help = 'Recomputes spend concentration (ABC classes, HHI, tail spend) per budget year'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--budget-year',
+            help='Budget year name or id (default: the active year)',
+        )
+        parser.add_argument(
+            '--all-years',
+            action='store_true',
+            help='Refresh every budget year',
+        )
+
+    def handle(self, *args, **options):
+        if options['all_years']:
+            budget_years = list(BudgetYear.objects.order_by('start_date'))
+        elif options['budget_year']:
+            budget_year = BudgetYear.objects.filter(name=options['budget_year']).first()
+            if budget_year is None:
+                try:
+                    budget_year = BudgetYear.objects.filter(pk=options['budget_year']).first()
+                except ValidationError:
+                    budget_year = None
+            if budget_year is None:
+                raise CommandError(f"Unknown budget year: {options['budget_year']}")
+            budget_years = [budget_year]
+        else:
+            budget_years = list(BudgetYear.objects.filter(is_active=True))
+            if not budget_years:
+                raise CommandError('No active budget year; pass --budget-year or --all-years')
+
+        for budget_year in budget_years:
+            started = time.perf_counter()
+            written = refresh(budget_year)
+            self.stdout.write(
+                f'{budget_year.name}: {written} suppliers, items and categories ranked '
+                f'in {time.perf_counter() - started:.2f}s'
+            )
+        self.stdout.write(self.style.SUCCESS('Spend concentration is up to date'))
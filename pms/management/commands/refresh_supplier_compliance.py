@@ -0,0 +1,46 @@
+"""
+Management command to refresh the denormalised supplier compliance status
+File location: pms/management/commands/refresh_supplier_compliance.py
+
+Intended to run daily from cron:
+    0 2 * * * python manage.py refresh_supplier_compliance --days 30
+"""
+
+from django.core.management.base import BaseCommand
+
+from pms.compliance import DEFAULT_WARNING_DAYS, refresh_supplier_compliance
+
+
+class Command(BaseCommand):
+    help = 'Recomputes supplier compliance status and alerts suppliers with expiring documents'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=DEFAULT_WARNING_DAYS,
+            help=f'Warning window in days (default: {DEFAULT_WARNING_DAYS})',
+        )
+        parser.add_argument(
+            '--no-notify',
+            action='store_true',
+            help='Update statuses without creating notifications or email logs',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Checking supplier compliance ({options['days']}-day window)...")
+
+        stats = refresh_supplier_compliance(
+            warning_days=options['days'],
+            notify=not options['no_notify'],
+        )
+
+        self.stdout.write(
+            f"Expiring: {stats['expiring']}, "
+            f"non-compliant: {stats['non_compliant']}, "
+            f"no expiry on file: {stats['unknown']}, "
+            f"cleared: {stats['cleared']}"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Queued {stats['notifications']} notifications and {stats['emails']} emails"
+        ))
@@ -0,0 +1,157 @@
+"""
+Management command to roll a closing budget year over into the next one
+File location: pms/management/commands/rollover_budget_year.py
+
+Clones budget lines, carries open purchase order commitments and
+unfinished plan items forward, and prints a reconciliation per
+department. Preview first, then run for real:
+    python manage.py rollover_budget_year --from 2025/2026 --to 2026/2027 --dry-run
+    python manage.py rollover_budget_year --from 2025/2026 --to 2026/2027 --allocation-factor 1.05 --report rollover.csv
+"""
+
+import csv
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from pms.models import BudgetYear
+from pms.rollover import rollover
+
+
+REPORT_COLUMNS = (
+    ('Department', 'department'),
+    ('Budget lines', 'budget_lines'),
+    ('Old allocated', 'old_allocated'),
+    ('Old spent', 'old_spent'),
+    ('Old committed', 'old_committed'),
+    ('Old closing committed', 'old_closing_committed'),
+    ('Old unspent', 'old_unspent'),
+    ('POs carried', 'purchase_orders_carried'),
+    ('PO commitments carried', 'commitments_carried'),
+    ('Plan items carried', 'plan_items_carried'),
+    ('Plan value carried', 'plan_value_carried'),
+    ('Carried out', 'carried_out'),
+    ('Carried in', 'carried_in'),
+    ('New allocated', 'new_allocated'),
+    ('New opening committed', 'new_opening_committed'),
+    ('New committed', 'new_committed'),
+)
+
+
+def _next_year_date(day):
+    try:
+        return day.replace(year=day.year + 1)
+    except ValueError:
+        # 29 February
+        return day.replace(year=day.year + 1, day=28)
+
+
+class Command(BaseCommand):
+    help = 'Opens a new budget year with cloned budget lines, carried commitments and carried plan items'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='from_year', required=True, help='Budget year being closed')
+        parser.add_argument('--to', dest='to_year', required=True, help='Budget year to open (created if missing)')
+        parser.add_argument('--start', help='Start date of a new --to year, YYYY-MM-DD (default: one year after --from)')
+        parser.add_argument('--end', help='End date of a new --to year, YYYY-MM-DD (default: one year after --from)')
+        parser.add_argument(
+            '--allocation-factor',
+            default='1',
+            help='Multiplier for cloned allocations, e.g. 1.05 for a 5%% increase (default: 1)',
+        )
+        parser.add_argument('--user', help='Username recorded as creator of new budget lines and plans')
+        parser.add_argument(
+            '--activate',
+            action='store_true',
+            help='Make the new year the active budget year',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Print the reconciliation and roll everything back',
+        )
+        parser.add_argument('--report', help='Also write the reconciliation to this CSV file')
+
+    def handle(self, *args, **options):
+        from_year = BudgetYear.objects.filter(name=options['from_year']).first()
+        if from_year is None:
+            raise CommandError(f"Unknown budget year: {options['from_year']}")
+
+        try:
+            factor = Decimal(options['allocation_factor'])
+        except InvalidOperation:
+            raise CommandError('--allocation-factor must be a number')
+        if not factor.is_finite() or factor < 0:
+            raise CommandError('--allocation-factor must be a number of at least 0')
+
+        user = None
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"Unknown user: {options['user']}")
+
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else _next_year_date(from_year.start_date)
+            end = date.fromisoformat(options['end']) if options['end'] else _next_year_date(from_year.end_date)
+        except ValueError:
+            raise CommandError('--start and --end must be in YYYY-MM-DD format')
+
+        with transaction.atomic():
+            to_year, created = BudgetYear.objects.get_or_create(
+                name=options['to_year'], defaults={'start_date': start, 'end_date': end}
+            )
+            if created:
+                self.stdout.write(f'Created budget year {to_year.name} ({to_year.start_date} to {to_year.end_date})')
+            try:
+                report = rollover(from_year, to_year, allocation_factor=factor, user=user)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+
+            if options['activate']:
+                BudgetYear.objects.exclude(pk=to_year.pk).update(is_active=False)
+                BudgetYear.objects.filter(pk=to_year.pk).update(is_active=True)
+
+            if options['dry_run']:
+                transaction.set_rollback(True)
+
+        self._print(report)
+        if not report.balanced:
+            self.stdout.write(self.style.WARNING(
+                'Carried out and carried in differ: some old budget lines had less committed '
+                'than was carried off them. Check the departments where the two columns differ.'
+            ))
+        if options['report']:
+            with open(options['report'], 'w', newline='') as handle:
+                writer = csv.writer(handle)
+                writer.writerow([label for label, _ in REPORT_COLUMNS])
+                for row in report.rows():
+                    writer.writerow([getattr(row, name) for _, name in REPORT_COLUMNS])
+            self.stdout.write(f"Reconciliation written to {options['report']}")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run: nothing was changed'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Rolled {report.from_year} over into {report.to_year}'))
+
+    def _print(self, report):
+        self.stdout.write(
+            f'{report.from_year} -> {report.to_year}: {report.budgets_created} budget lines created, '
+            f'{report.budgets_reused} reused, {report.plans_created} plans opened'
+        )
+        self.stdout.write(
+            f"{'Department':<32}{'Old allocated':>16}{'Old unspent':>16}{'POs':>6}"
+            f"{'PO value':>16}{'Plan items':>12}{'Plan value':>16}{'New allocated':>16}{'New committed':>16}"
+        )
+        for row in report.rows():
+            self.stdout.write(
+                f'{row.department[:31]:<32}{row.old_allocated:>16,.2f}{row.old_unspent:>16,.2f}'
+                f'{row.purchase_orders_carried:>6}{row.commitments_carried:>16,.2f}'
+                f'{row.plan_items_carried:>12}{row.plan_value_carried:>16,.2f}'
+                f'{row.new_allocated:>16,.2f}{row.new_committed:>16,.2f}'
+            )
+        self.stdout.write(
+            f'Commitments carried out {report.carried_out:,.2f}, carried in {report.carried_in:,.2f}'
+        )
@@ -0,0 +1,50 @@
+"""
+Management command to run the audit red-flag rules
+File location: pms/management/commands/run_audit_rules.py
+
+Intended to run nightly from cron:
+    30 2 * * * python manage.py run_audit_rules
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pms.red_flags import RULES, get_rules, run_rules
+
+
+class Command(BaseCommand):
+    help = 'Runs the audit red-flag rules and stores their findings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rule',
+            action='append',
+            dest='rules',
+            help='Only run this rule code (may be repeated)',
+        )
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='List enabled rules and their parameters',
+        )
+
+    def handle(self, *args, **options):
+        if options['list']:
+            for rule in get_rules():
+                self.stdout.write(f'{rule.code}: {rule.title} {rule.params}')
+            return
+
+        codes = options['rules']
+        unknown = set(codes or []) - set(RULES)
+        if unknown:
+            raise CommandError(f"Unknown rule(s): {', '.join(sorted(unknown))}")
+
+        results = run_rules(codes)
+
+        for code, stats in results.items():
+            self.stdout.write(
+                f"  {code}: {stats['detected']} detected "
+                f"({stats['created']} new, {stats['updated']} refreshed, {stats['retired']} retired)"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Ran {len(results)} rule(s); {sum(s['detected'] for s in results.values())} active findings"
+        ))
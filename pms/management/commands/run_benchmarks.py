@@ -0,0 +1,292 @@
+"""
+Management command to time the key views and record a JSON baseline
+File location: pms/management/commands/run_benchmarks.py
+
+Each view is requested through the test client as a user of the matching
+role; the median wall time, SQL time and query count of the timed
+requests are recorded. Typical use against a dataset produced by
+generate_load_dataset:
+    python manage.py run_benchmarks --output benchmarks/baseline.json
+    python manage.py run_benchmarks --compare benchmarks/baseline.json --fail-on-regression
+
+--capture-queries writes the SELECTs issued by each view (one JSON object
+per line) for index_advisor to replay through EXPLAIN.
+
+A view answering with anything but a 2xx status is reported as failed and
+left out of the results, so an error page is never recorded as a timing;
+the command then exits with an error.
+"""
+
+import json
+import os
+import platform
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import NoReverseMatch, reverse
+from django.utils import timezone
+
+from pms.instrumentation import RequestMetrics
+from pms.models import (
+    AuditLog, Invoice, PurchaseOrder, Requisition, RequisitionItem, StockMovement, Supplier, User,
+)
+
+
+# (name, role, url name, query string)
+BENCHMARKS = [
+    ('admin_dashboard', 'ADMIN', 'dashboard', ''),
+    ('admin_analytics', 'ADMIN', 'admin_analytics_dashboard', ''),
+    ('admin_reports', 'ADMIN', 'admin_reports', ''),
+    ('admin_reports_export', 'ADMIN', 'export_report_excel',
+     'report_type=requisitions&start_date=2000-01-01&end_date=2099-12-31'),
+    ('requisition_list', 'ADMIN', 'requisition_list', ''),
+    ('staff_dashboard', 'STAFF', 'staff_dashboard', ''),
+    ('hod_dashboard', 'HOD', 'hod_dashboard', ''),
+    ('hod_analytics', 'HOD', 'hod_analytics', ''),
+    ('hod_requisitions_csv', 'HOD', 'hod_export_requisitions_csv', ''),
+    ('procurement_dashboard', 'PROCUREMENT', 'procurement_dashboard', ''),
+    ('procurement_analytics', 'PROCUREMENT', 'procurement_analytics', ''),
+    ('po_list', 'PROCUREMENT', 'po_list', ''),
+    ('tender_list', 'PROCUREMENT', 'tender_list', ''),
+    ('supplier_list', 'PROCUREMENT', 'supplier_list', ''),
+    ('finance_dashboard', 'FINANCE', 'finance_dashboard', ''),
+    ('finance_analytics', 'FINANCE', 'finance_analytics', ''),
+    ('budget_utilization_report', 'FINANCE', 'budget_utilization_report', ''),
+    ('stock_list', 'STORES', 'stock_list', ''),
+    ('store_movement_reports', 'STORES', 'store_movement_reports', ''),
+    ('auditor_dashboard', 'AUDITOR', 'dashboard', ''),
+    ('auditor_analytics', 'AUDITOR', 'auditor_analytics', ''),
+    ('auditor_audit_trail', 'AUDITOR', 'auditor_audit_trail', ''),
+]
+
+COUNTED_MODELS = (Requisition, RequisitionItem, PurchaseOrder, Invoice, Supplier, StockMovement, AuditLog)
+
+
+class QueryCapture:
+    """execute_wrapper that keeps the SQL and parameters of each SELECT"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+            self.queries.append((context['connection'].alias, sql, params))
+        return execute(sql, params, many, context)
+
+
+def _median(values):
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+class Command(BaseCommand):
+    help = 'Times the key dashboards, lists, reports and exports and writes a JSON baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Timed requests per view after one warm-up request (default: 5)',
+        )
+        parser.add_argument(
+            '--only',
+            action='append',
+            help='Only run this benchmark (may be repeated)',
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results to this JSON file',
+        )
+        parser.add_argument(
+            '--compare',
+            help='Compare against a baseline JSON file written by --output',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=20.0,
+            help='Percentage slowdown (median time) or query increase counted as a regression (default: 20)',
+        )
+        parser.add_argument(
+            '--fail-on-regression',
+            action='store_true',
+            help='Exit with an error if --compare finds regressions',
+        )
+        parser.add_argument(
+            '--capture-queries',
+            help='Write the SELECT queries of each view to this JSON lines file (for index_advisor)',
+        )
+
+    def handle(self, *args, **options):
+        benchmarks = BENCHMARKS
+        if options['only']:
+            benchmarks = [b for b in BENCHMARKS if b[0] in options['only']]
+            if not benchmarks:
+                raise CommandError('No benchmarks match --only')
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as handle:
+                    baseline = json.load(handle)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read baseline {options['compare']}: {exc}")
+
+        self.captured = [] if options['capture_queries'] else None
+
+        self.failures = {}
+        setup_test_environment()
+        try:
+            results = self.run(benchmarks, max(options['repeat'], 1))
+        finally:
+            teardown_test_environment()
+
+        if self.captured is not None:
+            self.write_queries(options['capture_queries'])
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'debug': settings.DEBUG,
+            'repeat': options['repeat'],
+            'rows': {model.__name__: model.objects.count() for model in COUNTED_MODELS},
+            'results': results,
+            'failures': self.failures,
+        }
+
+        if options['output']:
+            directory = os.path.dirname(options['output'])
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if baseline:
+            regressions = self.compare(baseline, report, options['threshold'])
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f'{len(regressions)} regression(s): {", ".join(regressions)}')
+
+        if self.failures:
+            raise CommandError(
+                f'{len(self.failures)} benchmark(s) failed: '
+                + ', '.join(f'{name} ({status})' for name, status in self.failures.items())
+            )
+
+    def run(self, benchmarks, repeat):
+        clients = {}
+        results = {}
+        for name, role, url_name, query in benchmarks:
+            if role not in clients:
+                user = (
+                    User.objects.filter(role=role, is_active=True)
+                    .order_by('-department_id', 'date_joined').first()
+                )
+                clients[role] = None
+                if user:
+                    clients[role] = Client(raise_request_exception=False)
+                    clients[role].force_login(user)
+            client = clients[role]
+            if client is None:
+                self.stdout.write(self.style.WARNING(f'  {name}: skipped (no {role} user)'))
+                continue
+
+            try:
+                url = reverse(url_name) + (f'?{query}' if query else '')
+            except NoReverseMatch:
+                self.stdout.write(self.style.WARNING(f'  {name}: skipped (no URL named {url_name})'))
+                continue
+
+            times, queries, sql_ms = [], [], []
+            status = None
+            for attempt in range(repeat + 1):
+                metrics = RequestMetrics()
+                # Queries are captured from the untimed warm-up request only
+                capture = QueryCapture() if self.captured is not None and not attempt else None
+                started = time.perf_counter()
+                with ExitStack() as stack:
+                    for alias in connections:
+                        stack.enter_context(connections[alias].execute_wrapper(metrics))
+                        if capture:
+                            stack.enter_context(connections[alias].execute_wrapper(capture))
+                    response = client.get(url)
+                    # Exports may stream; consume them so the work is timed
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                elapsed = (time.perf_counter() - started) * 1000
+                status = response.status_code
+                if not 200 <= status < 300:
+                    break
+                if capture:
+                    self.captured.extend((name, alias, sql, params) for alias, sql, params in capture.queries)
+                if attempt:
+                    times.append(elapsed)
+                    queries.append(metrics.queries)
+                    sql_ms.append(metrics.sql_ms)
+
+            if not 200 <= status < 300:
+                self.failures[name] = status
+                self.stdout.write(self.style.ERROR(f'  {name:32} {status} failed; left out of the results'))
+                continue
+
+            results[name] = {
+                'url': url,
+                'role': role,
+                'status': status,
+                'median_ms': round(_median(times), 2),
+                'min_ms': round(min(times), 2),
+                'max_ms': round(max(times), 2),
+                'sql_ms': round(_median(sql_ms), 2),
+                'queries': max(queries),
+            }
+            self.stdout.write(
+                f"  {name:32} {status} {results[name]['median_ms']:>9.1f} ms  {results[name]['queries']} queries"
+            )
+        return results
+
+    def write_queries(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as handle:
+            for name, alias, sql, params in self.captured:
+                handle.write(json.dumps(
+                    {'benchmark': name, 'database': alias, 'sql': sql, 'params': list(params or ())},
+                    cls=DjangoJSONEncoder,
+                ))
+                handle.write('\n')
+        self.stdout.write(self.style.SUCCESS(f'{len(self.captured)} queries written to {path}'))
+
+    def compare(self, baseline, report, threshold):
+        regressions = []
+        previous = baseline.get('results', {})
+        self.stdout.write(f"\nCompared with baseline from {baseline.get('generated_at', '?')}:")
+        for name, current in report['results'].items():
+            before = previous.get(name)
+            if not before:
+                continue
+            change = (current['median_ms'] - before['median_ms']) / before['median_ms'] * 100 if before['median_ms'] else 0
+            more_queries = (
+                current['queries'] is not None and before.get('queries') is not None
+                and current['queries'] > before['queries'] * (1 + threshold / 100)
+            )
+            flag = ''
+            if change > threshold or more_queries:
+                regressions.append(name)
+                flag = '  REGRESSION'
+            self.stdout.write(
+                f"  {name:32} {before['median_ms']:>9.1f} -> {current['median_ms']:>9.1f} ms ({change:+.0f}%)  "
+                f"{before.get('queries')} -> {current['queries']} queries{flag}"
+            )
+        return regressions
@@ -1,9 +1,10 @@
 from django.core.management.base import BaseCommand
-from django.contrib.auth.hashers import make_password
+from django.db import transaction
 from django.utils import timezone
 from decimal import Decimal
 from datetime import timedelta, date
 import random
+from pms.bulk_seed import BulkCreator, shared_password
 from pms.models import *
 
 
@@ -14,9 +15,34 @@ class Command(BaseCommand):
         super().__init__()
         self.start_date = timezone.now().date() - timedelta(days=365)
         self.end_date = timezone.now().date()
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fast',
+            action='store_true',
+            help='Build rows in memory and bulk insert them (no per-row save())',
+        )
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help='Multiply the transaction volumes (requisitions, tenders, POs, ...) by this factor (default: 1.0)',
+        )
+
+    def scaled(self, count):
+        return max(1, round(count * self.scale))
         
-    def handle(self, *args, **kwargs):
+    @transaction.atomic
+    def handle(self, *args, **options):
         self.stdout.write('Starting data seeding...')
+
+        self.creator = BulkCreator(fast=options['fast'])
+        self.scale = options['scale']
+        # Children by parent id, kept so nothing has to be read back
+        self.requisition_items = {}
+        self.supplier_categories = {}
+        self.bid_items = {}
+        self.po_items = {}
         
         # Clear existing data (optional - comment out if you want to keep existing data)
         self.stdout.write('Clearing existing data...')
@@ -62,6 +88,9 @@ class Command(BaseCommand):
         
         self.stdout.write('Creating system configuration...')
         self.create_system_config()
+
+        for model, count in self.creator.flush().items():
+            self.stdout.write(f'  Inserted {count} {model} rows')
         
         self.stdout.write(self.style.SUCCESS('Data seeding completed successfully!'))
 
@@ -133,7 +162,7 @@ class Command(BaseCommand):
                     'employee_id': f'EMP{random.randint(1000, 9999)}',
                     'phone_number': f'+254{random.randint(700000000, 799999999)}',
                     'is_active_user': True,
-                    'password': make_password('password123')
+                    'password': shared_password('password123')
                 }
             )
             self.users[role] = user
@@ -151,7 +180,8 @@ class Command(BaseCommand):
         ]
         
         for name, code in faculties_data:
-            faculty = Faculty.objects.create(
+            faculty = self.creator.create(
+                Faculty,
                 name=name,
                 code=code,
                 dean=self.users.get('HOD'),
@@ -172,7 +202,8 @@ class Command(BaseCommand):
         ]
         
         for name, code, dept_type, fac_idx in departments_data:
-            dept = Department.objects.create(
+            dept = self.creator.create(
+                Department,
                 faculty=self.faculties[fac_idx],
                 name=name,
                 code=code,
@@ -185,13 +216,14 @@ class Command(BaseCommand):
         # Update users with departments
         for i, user in enumerate([self.users['STAFF'], self.users['HOD']]):
             user.department = self.departments[i % len(self.departments)]
-            user.save()
+            self.creator.save(user)
 
     def create_budget_data(self):
         """Create budget years, categories and allocations"""
         # Budget Year
         year = timezone.now().year
-        self.budget_year = BudgetYear.objects.create(
+        self.budget_year = self.creator.create(
+            BudgetYear,
             name=f'FY {year}/{year+1}',
             start_date=date(year, 7, 1),
             end_date=date(year+1, 6, 30),
@@ -211,7 +243,8 @@ class Command(BaseCommand):
         ]
         
         for name, code in categories_data:
-            cat = BudgetCategory.objects.create(
+            cat = self.creator.create(
+                BudgetCategory,
                 name=name,
                 code=code,
                 is_active=True
@@ -222,7 +255,8 @@ class Command(BaseCommand):
         self.budgets = []
         for dept in self.departments[:5]:  # First 5 departments
             for cat in self.budget_categories:
-                budget = Budget.objects.create(
+                budget = self.creator.create(
+                    Budget,
                     budget_year=self.budget_year,
                     department=dept,
                     category=cat,
@@ -250,7 +284,8 @@ class Command(BaseCommand):
         ]
         
         for name, code, cat_type in categories_data:
-            cat = ItemCategory.objects.create(
+            cat = self.creator.create(
+                ItemCategory,
                 name=name,
                 code=code,
                 category_type=cat_type,
@@ -272,7 +307,8 @@ class Command(BaseCommand):
         ]
         
         for name, code, desc, uom, price, cat_idx in items_data:
-            item = Item.objects.create(
+            item = self.creator.create(
+                Item,
                 category=self.item_categories[cat_idx],
                 name=name,
                 code=code,
@@ -295,7 +331,8 @@ class Command(BaseCommand):
         ]
         
         for i, (name, reg, email, phone, contact, cat_indices) in enumerate(suppliers_data):
-            supplier = Supplier.objects.create(
+            supplier = self.creator.create(
+                Supplier,
                 supplier_number=f'SUP-{2024}-{i+1:06d}',
                 name=name,
                 registration_number=reg,
@@ -317,12 +354,16 @@ class Command(BaseCommand):
             
             # Add categories
             for idx in cat_indices:
-                supplier.categories.add(self.item_categories[idx])
+                self.creator.add(supplier.categories, self.item_categories[idx])
+            self.supplier_categories[supplier.id] = {
+                self.item_categories[idx].id for idx in cat_indices
+            }
             
             self.suppliers.append(supplier)
             
             # Add supplier documents
-            SupplierDocument.objects.create(
+            self.creator.create(
+                SupplierDocument,
                 supplier=supplier,
                 document_type='REGISTRATION',
                 document_name=f'{name} Registration Certificate',
@@ -337,7 +378,7 @@ class Command(BaseCommand):
         self.requisitions = []
         
         # Create 50 requisitions spread over the year
-        for i in range(50):
+        for i in range(self.scaled(50)):
             days_ago = random.randint(0, 365)
             created_date = timezone.now() - timedelta(days=days_ago)
             
@@ -354,7 +395,8 @@ class Command(BaseCommand):
             else:
                 status = random.choice(['SUBMITTED', 'HOD_APPROVED', 'DRAFT'])
             
-            req = Requisition.objects.create(
+            req = self.creator.create(
+                Requisition,
                 title=f'Purchase Request for {random.choice(self.items).name}',
                 department=dept,
                 budget=budget,
@@ -367,7 +409,8 @@ class Command(BaseCommand):
                 submitted_at=created_date if status != 'DRAFT' else None
             )
             req.created_at = created_date
-            req.save()
+            self.creator.save(req)
+            self.requisition_items[req.id] = []
             
             # Add requisition items
             num_items = random.randint(1, 5)
@@ -376,7 +419,8 @@ class Command(BaseCommand):
                 qty = random.randint(1, 20)
                 unit_price = item.standard_price or Decimal(random.randint(1000, 50000))
                 
-                RequisitionItem.objects.create(
+                self.requisition_items[req.id].append(self.creator.create(
+                    RequisitionItem,
                     requisition=req,
                     item=item,
                     item_description=item.description,
@@ -385,11 +429,12 @@ class Command(BaseCommand):
                     unit_of_measure=item.unit_of_measure,
                     estimated_unit_price=unit_price,
                     estimated_total=Decimal(qty) * unit_price
-                )
+                ))
             
             # Create approval records for non-draft requisitions
             if status != 'DRAFT':
-                RequisitionApproval.objects.create(
+                self.creator.create(
+                    RequisitionApproval,
                     requisition=req,
                     approval_stage='HOD',
                     approver=self.users['HOD'],
@@ -407,12 +452,13 @@ class Command(BaseCommand):
         self.bids = []
         
         # Create tenders for approved requisitions
-        approved_reqs = [r for r in self.requisitions if r.status == 'APPROVED'][:20]
+        approved_reqs = [r for r in self.requisitions if r.status == 'APPROVED'][:self.scaled(20)]
         
         for req in approved_reqs:
             days_ago = (timezone.now() - req.created_at).days
             
-            tender = Tender.objects.create(
+            tender = self.creator.create(
+                Tender,
                 requisition=req,
                 title=f'Tender for {req.title}',
                 tender_type='RFQ',
@@ -426,19 +472,21 @@ class Command(BaseCommand):
                 created_by=self.users['PROCUREMENT']
             )
             tender.created_at = req.created_at + timedelta(days=3)
-            tender.save()
+            self.creator.save(tender)
             
             # Add invited suppliers
+            req_items = self.requisition_items[req.id]
             relevant_suppliers = [s for s in self.suppliers if 
-                                any(cat in s.categories.all() for cat in 
-                                    [item.item.category for item in req.items.all() if item.item])]
+                                any(cat in self.supplier_categories[s.id] for cat in 
+                                    [item.item.category_id for item in req_items if item.item])]
             
             if relevant_suppliers:
                 for supplier in random.sample(relevant_suppliers, min(3, len(relevant_suppliers))):
-                    tender.invited_suppliers.add(supplier)
+                    self.creator.add(tender.invited_suppliers, supplier)
                     
                     # Create bids
-                    bid = Bid.objects.create(
+                    bid = self.creator.create(
+                        Bid,
                         tender=tender,
                         supplier=supplier,
                         bid_amount=req.estimated_amount * Decimal(random.uniform(0.85, 1.15)),
@@ -452,15 +500,17 @@ class Command(BaseCommand):
                     )
                     
                     # Create bid items
-                    for req_item in req.items.all():
-                        BidItem.objects.create(
+                    self.bid_items[bid.id] = []
+                    for req_item in req_items:
+                        self.bid_items[bid.id].append(self.creator.create(
+                            BidItem,
                             bid=bid,
                             requisition_item=req_item,
                             quoted_unit_price=req_item.estimated_unit_price * Decimal(random.uniform(0.9, 1.1)),
                             quoted_total=req_item.estimated_total * Decimal(random.uniform(0.9, 1.1)),
                             delivery_period_days=random.randint(14, 45),
                             warranty_period_months=random.randint(12, 36)
-                        )
+                        ))
                     
                     self.bids.append(bid)
             
@@ -471,7 +521,7 @@ class Command(BaseCommand):
         self.purchase_orders = []
         
         # Create POs for awarded bids
-        awarded_bids = [b for b in self.bids if b.status == 'AWARDED'][:15]
+        awarded_bids = [b for b in self.bids if b.status == 'AWARDED'][:self.scaled(15)]
         
         for bid in awarded_bids:
             days_ago = (timezone.now().date() - bid.submitted_at.date()).days
@@ -479,7 +529,8 @@ class Command(BaseCommand):
             status_choices = ['APPROVED', 'SENT', 'ACKNOWLEDGED', 'DELIVERED']
             status = random.choice(status_choices[:min(len(status_choices), max(1, days_ago // 30))])
             
-            po = PurchaseOrder.objects.create(
+            po = self.creator.create(
+                PurchaseOrder,
                 requisition=bid.tender.requisition,
                 supplier=bid.supplier,
                 bid=bid,
@@ -497,8 +548,10 @@ class Command(BaseCommand):
             )
             
             # Create PO items
-            for bid_item in bid.items.all():
-                PurchaseOrderItem.objects.create(
+            self.po_items[po.id] = []
+            for bid_item in self.bid_items[bid.id]:
+                self.po_items[po.id].append(self.creator.create(
+                    PurchaseOrderItem,
                     purchase_order=po,
                     requisition_item=bid_item.requisition_item,
                     item_description=bid_item.requisition_item.item_description,
@@ -508,7 +561,7 @@ class Command(BaseCommand):
                     unit_price=bid_item.quoted_unit_price,
                     total_price=bid_item.quoted_total,
                     quantity_delivered=bid_item.requisition_item.quantity if status == 'DELIVERED' else 0
-                )
+                ))
             
             self.purchase_orders.append(po)
 
@@ -517,10 +570,11 @@ class Command(BaseCommand):
         self.contracts = []
         
         # Create contracts for POs over certain amount
-        large_pos = [po for po in self.purchase_orders if po.total_amount > 500000][:10]
+        large_pos = [po for po in self.purchase_orders if po.total_amount > 500000][:self.scaled(10)]
         
         for po in large_pos:
-            contract = Contract.objects.create(
+            contract = self.creator.create(
+                Contract,
                 purchase_order=po,
                 supplier=po.supplier,
                 title=f'Contract for {po.requisition.title}',
@@ -541,7 +595,8 @@ class Command(BaseCommand):
             )
             
             # Create contract milestone
-            ContractMilestone.objects.create(
+            self.creator.create(
+                ContractMilestone,
                 contract=contract,
                 milestone_name='Delivery and Installation',
                 description='Complete delivery and installation of goods',
@@ -567,7 +622,8 @@ class Command(BaseCommand):
         ]
         
         for name, code, store_type, dept in stores_data:
-            store = Store.objects.create(
+            store = self.creator.create(
+                Store,
                 name=name,
                 code=code,
                 store_type=store_type,
@@ -581,8 +637,10 @@ class Command(BaseCommand):
         # Create GRNs for delivered POs
         delivered_pos = [po for po in self.purchase_orders if po.status in ['DELIVERED', 'CLOSED']]
         
-        for po in delivered_pos[:10]:
-            grn = GoodsReceivedNote.objects.create(
+        self.stock_items = {}
+        for po in delivered_pos[:self.scaled(10)]:
+            grn = self.creator.create(
+                GoodsReceivedNote,
                 purchase_order=po,
                 store=random.choice(self.stores),
                 delivery_note_number=f'DN-{random.randint(10000, 99999)}',
@@ -595,8 +653,9 @@ class Command(BaseCommand):
             )
             
             # Create GRN items and stock items
-            for po_item in po.items.all():
-                GRNItem.objects.create(
+            for po_item in self.po_items[po.id]:
+                self.creator.create(
+                    GRNItem,
                     grn=grn,
                     po_item=po_item,
                     quantity_ordered=po_item.quantity,
@@ -607,27 +666,30 @@ class Command(BaseCommand):
                 
                 # Create or update stock item
                 if po_item.requisition_item.item:
-                    stock_item, created = StockItem.objects.get_or_create(
-                        store=grn.store,
-                        item=po_item.requisition_item.item,
-                        defaults={
-                            'quantity_on_hand': po_item.quantity,
-                            'reorder_level': Decimal('10'),
-                            'average_unit_cost': po_item.unit_price,
-                            'total_value': po_item.total_price,
-                            'last_restock_date': grn.delivery_date
-                        }
-                    )
+                    key = (grn.store.id, po_item.requisition_item.item.id)
+                    stock_item = self.stock_items.get(key)
                     
-                    if not created:
+                    if stock_item is None:
+                        stock_item = self.stock_items[key] = self.creator.create(
+                            StockItem,
+                            store=grn.store,
+                            item=po_item.requisition_item.item,
+                            quantity_on_hand=po_item.quantity,
+                            reorder_level=Decimal('10'),
+                            average_unit_cost=po_item.unit_price,
+                            total_value=po_item.total_price,
+                            last_restock_date=grn.delivery_date
+                        )
+                    else:
                         stock_item.quantity_on_hand += po_item.quantity
                         stock_item.total_value += po_item.total_price
                         stock_item.average_unit_cost = stock_item.total_value / stock_item.quantity_on_hand
                         stock_item.last_restock_date = grn.delivery_date
-                        stock_item.save()
+                        self.creator.save(stock_item)
                     
                     # Create stock movement
-                    StockMovement.objects.create(
+                    self.creator.create(
+                        StockMovement,
                         stock_item=stock_item,
                         movement_type='RECEIPT',
                         reference_number=grn.grn_number,
@@ -643,10 +705,11 @@ class Command(BaseCommand):
     def create_invoices_and_payments(self):
         """Create invoices and payments"""
         # Create invoices for delivered POs
-        delivered_pos = [po for po in self.purchase_orders if po.status in ['DELIVERED', 'CLOSED']][:10]
+        delivered_pos = [po for po in self.purchase_orders if po.status in ['DELIVERED', 'CLOSED']][:self.scaled(10)]
         
         for po in delivered_pos:
-            invoice = Invoice.objects.create(
+            invoice = self.creator.create(
+                Invoice,
                 invoice_number=f'INV-{timezone.now().year}-{random.randint(10000, 99999)}',
                 supplier_invoice_number=f'SI-{random.randint(10000, 99999)}',
                 purchase_order=po,
@@ -666,8 +729,9 @@ class Command(BaseCommand):
             )
             
             # Create invoice items
-            for po_item in po.items.all():
-                InvoiceItem.objects.create(
+            for po_item in self.po_items[po.id]:
+                self.creator.create(
+                    InvoiceItem,
                     invoice=invoice,
                     po_item=po_item,
                     description=po_item.item_description,
@@ -680,7 +744,8 @@ class Command(BaseCommand):
             
             # Create payment if invoice is paid
             if invoice.status == 'PAID':
-                payment = Payment.objects.create(
+                payment = self.creator.create(
+                    Payment,
                     invoice=invoice,
                     payment_date=invoice.due_date - timedelta(days=5),
                     payment_amount=invoice.total_amount,
@@ -694,7 +759,7 @@ class Command(BaseCommand):
                 
                 invoice.payment_reference = payment.payment_number
                 invoice.payment_date = payment.payment_date
-                invoice.save()
+                self.creator.save(invoice)
 
     def create_notifications(self):
         """Create notifications for users"""
@@ -709,7 +774,7 @@ class Command(BaseCommand):
         
         for user_role, user in self.users.items():
             # Create 10-20 notifications per user
-            for _ in range(random.randint(10, 20)):
+            for _ in range(self.scaled(random.randint(10, 20))):
                 notif_type, title, msg_template, priority = random.choice(notification_templates)
                 
                 # Generate reference based on type
@@ -725,7 +790,8 @@ class Command(BaseCommand):
                 is_read = random.choice([True, False, False])  # 33% read
                 created_at = timezone.now() - timedelta(days=random.randint(0, 365))
                 
-                Notification.objects.create(
+                self.creator.create(
+                    Notification,
                     user=user,
                     notification_type=notif_type,
                     priority=priority,
@@ -749,7 +815,8 @@ class Command(BaseCommand):
         ]
         
         for key, value, data_type, desc in configs:
-            SystemConfiguration.objects.create(
+            self.creator.create(
+                SystemConfiguration,
                 key=key,
                 value=value,
                 data_type=data_type,
@@ -767,7 +834,8 @@ class Command(BaseCommand):
         ]
         
         for name, min_amt, max_amt, hod, fac, proc, fin, tender in thresholds:
-            ApprovalThreshold.objects.create(
+            self.creator.create(
+                ApprovalThreshold,
                 name=name,
                 min_amount=Decimal(min_amt),
                 max_amount=Decimal(max_amt) if max_amt else None,
@@ -796,7 +864,8 @@ class Command(BaseCommand):
         ]
         
         for title, pol_num, desc, content, eff_date, exp_date in policies:
-            ProcurementPolicy.objects.create(
+            self.creator.create(
+                ProcurementPolicy,
                 title=title,
                 policy_number=pol_num,
                 description=desc,
@@ -818,8 +887,9 @@ class Command(BaseCommand):
         actions = ['CREATE', 'UPDATE', 'APPROVE', 'SUBMIT']
         models = ['Requisition', 'PurchaseOrder', 'Invoice', 'Payment']
         
-        for _ in range(100):
-            AuditLog.objects.create(
+        for _ in range(self.scaled(100)):
+            self.creator.create(
+                AuditLog,
                 user=random.choice(list(self.users.values())),
                 action=random.choice(actions),
                 model_name=random.choice(models),
@@ -834,7 +904,8 @@ class Command(BaseCommand):
         """Create supplier performance reviews"""
         for po in self.purchase_orders:
             if po.status == 'DELIVERED' and random.choice([True, False]):
-                SupplierPerformance.objects.create(
+                self.creator.create(
+                    SupplierPerformance,
                     supplier=po.supplier,
                     purchase_order=po,
                     quality_rating=random.randint(3, 5),
@@ -8,8 +8,10 @@ from django.utils import timezone
 from django.db import transaction
 from decimal import Decimal
 import random
+from collections import defaultdict
 from datetime import datetime, timedelta
 
+from pms.bulk_seed import BulkCreator
 from pms.models import (
     ProcurementPlan, ProcurementPlanItem, ProcurementPlanAmendment,
     BudgetYear, Department, Budget, Item, ItemCategory, User
@@ -25,6 +27,17 @@ class Command(BaseCommand):
             action='store_true',
             help='Clear existing procurement plans before seeding',
         )
+        parser.add_argument(
+            '--fast',
+            action='store_true',
+            help='Build rows in memory and bulk insert them (no per-row save())',
+        )
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help='Multiply the number of departments planned for and plans amended (default: 1.0)',
+        )
 
     def handle(self, *args, **options):
         if options['clear']:
@@ -34,6 +47,11 @@ class Command(BaseCommand):
             ProcurementPlan.objects.all().delete()
             self.stdout.write(self.style.SUCCESS('Cleared existing data'))
 
+        self.creator = BulkCreator(fast=options['fast'])
+        self.scale = options['scale']
+        # plan id -> [plan items], filled as plans are created
+        self.plan_items = defaultdict(list)
+
         with transaction.atomic():
             self.stdout.write('Starting procurement plan seeding...')
             
@@ -45,6 +63,9 @@ class Command(BaseCommand):
             
             # Create plan amendments
             self.create_plan_amendments()
+
+            for model, count in self.creator.flush().items():
+                self.stdout.write(f'  Inserted {count} {model} rows')
             
             self.stdout.write(self.style.SUCCESS('Successfully seeded procurement plan data!'))
 
@@ -79,7 +100,7 @@ class Command(BaseCommand):
         self.item_categories = list(ItemCategory.objects.filter(is_active=True))
         
         # Get items
-        self.items = list(Item.objects.filter(is_active=True))
+        self.items = list(Item.objects.filter(is_active=True).select_related('category'))
         
         # Get users
         self.procurement_users = list(User.objects.filter(role='PROCUREMENT'))
@@ -108,15 +129,18 @@ class Command(BaseCommand):
         # Plan statuses to distribute
         statuses = ['DRAFT', 'SUBMITTED', 'APPROVED', 'ACTIVE', 'AMENDED']
         
+        existing = set(ProcurementPlan.objects.values_list('budget_year_id', 'department_id'))
+        self.budgets_by_department = defaultdict(list)
+        for budget in self.budgets:
+            self.budgets_by_department[(budget.department_id, budget.budget_year_id)].append(budget)
+        self.plans = []
+        
         # Create plans for each department and budget year combination
         for budget_year in self.budget_years[:2]:  # Last 2 years
-            for department in self.departments[:5]:  # First 5 departments
+            for department in self.departments[:round(5 * self.scale)]:  # First 5 departments
                 
                 # Skip if plan already exists
-                if ProcurementPlan.objects.filter(
-                    budget_year=budget_year,
-                    department=department
-                ).exists():
+                if (budget_year.id, department.id) in existing:
                     continue
                 
                 # Determine status based on year
@@ -126,7 +150,8 @@ class Command(BaseCommand):
                     status = random.choice(['APPROVED', 'ACTIVE', 'AMENDED'])
                 
                 # Create plan
-                plan = ProcurementPlan.objects.create(
+                plan = self.creator.create(
+                    ProcurementPlan,
                     budget_year=budget_year,
                     department=department,
                     title=f"{department.name} Annual Procurement Plan {budget_year.name}",
@@ -140,6 +165,7 @@ class Command(BaseCommand):
                     amendment_count=random.randint(1, 3) if status == 'AMENDED' else 0
                 )
                 
+                self.plans.append(plan)
                 plans_created += 1
                 
                 # Create plan items
@@ -340,11 +366,7 @@ class Command(BaseCommand):
         ]
         
         # Get department budgets
-        dept_budgets = list(Budget.objects.filter(
-            department=plan.department,
-            budget_year=plan.budget_year,
-            is_active=True
-        ))
+        dept_budgets = list(self.budgets_by_department[(plan.department_id, plan.budget_year_id)])
         
         if not dept_budgets and self.budgets:
             dept_budgets = random.sample(self.budgets, min(3, len(self.budgets)))
@@ -377,7 +399,8 @@ class Command(BaseCommand):
                     catalog_item = random.choice(matching_items)
             
             # Create plan item
-            plan_item = ProcurementPlanItem.objects.create(
+            plan_item = self.creator.create(
+                ProcurementPlanItem,
                 procurement_plan=plan,
                 item=catalog_item,
                 item_type=item_data['type'],
@@ -407,8 +430,9 @@ class Command(BaseCommand):
                     plan_item.quantity_requisitioned = quantity
                     plan_item.amount_committed = total_cost
                 
-                plan_item.save()
+                self.creator.save(plan_item)
             
+            self.plan_items[plan.id].append(plan_item)
             items_created += 1
         
         return items_created
@@ -421,6 +445,10 @@ class Command(BaseCommand):
         plans = list(ProcurementPlan.objects.filter(
             status__in=['APPROVED', 'ACTIVE', 'AMENDED']
         ))
+        plans += [
+            plan for plan in self.plans
+            if self.creator.fast and plan.status in ['APPROVED', 'ACTIVE', 'AMENDED']
+        ]
         
         if not plans:
             self.stdout.write(self.style.WARNING('No plans available for amendments'))
@@ -440,8 +468,11 @@ class Command(BaseCommand):
         amendments_created = 0
         
         # Create 1-3 amendments for random plans
-        for plan in random.sample(plans, min(5, len(plans))):
+        for plan in random.sample(plans, min(round(5 * self.scale), len(plans))):
             num_amendments = random.randint(1, 3)
+            amendment_statuses = list(
+                plan.amendments.values_list('status', flat=True)
+            ) if plan.id not in self.plan_items else []
             
             for _ in range(num_amendments):
                 amendment_type = random.choice(amendment_types)
@@ -450,7 +481,7 @@ class Command(BaseCommand):
                 # Select a plan item if needed
                 plan_item = None
                 if amendment_type in ['REMOVE_ITEM', 'MODIFY_ITEM', 'BUDGET_CHANGE', 'QUARTER_CHANGE', 'METHOD_CHANGE']:
-                    plan_items = list(plan.items.all())
+                    plan_items = self.plan_items.get(plan.id) or list(plan.items.all())
                     if plan_items:
                         plan_item = random.choice(plan_items)
                 
@@ -458,7 +489,8 @@ class Command(BaseCommand):
                 justification = self.get_amendment_justification(amendment_type)
                 old_values, new_values = self.get_amendment_values(amendment_type, plan_item)
                 
-                amendment = ProcurementPlanAmendment.objects.create(
+                amendment = self.creator.create(
+                    ProcurementPlanAmendment,
                     procurement_plan=plan,
                     amendment_type=amendment_type,
                     plan_item=plan_item,
@@ -475,9 +507,10 @@ class Command(BaseCommand):
                 amendments_created += 1
                 
                 # Update plan amendment count
-                plan.amendment_count = plan.amendments.count()
-                plan.is_amended = plan.amendments.filter(status='APPROVED').exists()
-                plan.save()
+                amendment_statuses.append(status)
+                plan.amendment_count = len(amendment_statuses)
+                plan.is_amended = 'APPROVED' in amendment_statuses
+                self.creator.save(plan)
         
         self.stdout.write(self.style.SUCCESS(f'Created {amendments_created} amendments'))
 
@@ -6,6 +6,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django.db import transaction
 
+from pms.bulk_seed import BulkCreator
 from pms.models import (
     Requisition,
     RequisitionItem,
@@ -30,10 +31,36 @@ User = get_user_model()
 class Command(BaseCommand):
     help = "Create POs for requisitions without POs (3-year historical data)"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fast',
+            action='store_true',
+            help='Build rows in memory and bulk insert them (no per-row save())',
+        )
+
+    def stock_item_for(self, store, item, unit_cost):
+        """get_or_create() against stock items loaded up front"""
+        key = (store.id, item.id)
+        if key not in self.stock_items:
+            self.stock_items[key] = self.creator.create(
+                StockItem,
+                store=store,
+                item=item,
+                quantity_on_hand=0,
+                average_unit_cost=unit_cost,
+            )
+        return self.stock_items[key]
+
     @transaction.atomic
-    def handle(self, *args, **kwargs):
+    def handle(self, *args, **options):
         self.stdout.write("🚀 Seeding Purchase Orders...")
 
+        self.creator = creator = BulkCreator(fast=options['fast'])
+        self.stock_items = {
+            (stock.store_id, stock.item_id): stock for stock in StockItem.objects.all()
+        }
+        changed_stock = {}
+
         suppliers = list(Supplier.objects.all())
         users = list(User.objects.all())
         stores = list(Store.objects.all())
@@ -50,7 +77,7 @@ class Command(BaseCommand):
         requisitions = Requisition.objects.filter(
             purchase_orders__isnull=True,
             status__in=["APPROVED", "PROCUREMENT_APPROVED"]
-        )
+        ).prefetch_related('items__item')
 
         created_count = 0
 
@@ -69,7 +96,8 @@ class Command(BaseCommand):
             tax = subtotal * Decimal("0.16")
             total = subtotal + tax
 
-            po = PurchaseOrder.objects.create(
+            po = creator.create(
+                PurchaseOrder,
                 requisition=req,
                 supplier=supplier,
                 delivery_date=(created_at + timedelta(days=14)).date(),
@@ -90,16 +118,21 @@ class Command(BaseCommand):
                 approved_at=created_at + timedelta(days=1),
                 sent_at=created_at + timedelta(days=2),
                 created_by=created_by,
-            )
-
-            PurchaseOrder.objects.filter(id=po.id).update(
                 created_at=created_at,
                 updated_at=created_at + timedelta(days=2),
             )
 
+            if not creator.fast:
+                PurchaseOrder.objects.filter(id=po.id).update(
+                    created_at=created_at,
+                    updated_at=created_at + timedelta(days=2),
+                )
+
             # ================= PO ITEMS =================
+            po_items = []
             for req_item in req.items.all():
-                PurchaseOrderItem.objects.create(
+                po_items.append(creator.create(
+                    PurchaseOrderItem,
                     purchase_order=po,
                     requisition_item=req_item,
                     item_description=req_item.item_description,
@@ -108,12 +141,13 @@ class Command(BaseCommand):
                     unit_of_measure=req_item.unit_of_measure,
                     unit_price=req_item.estimated_unit_price,
                     quantity_delivered=req_item.quantity,
-                )
+                ))
 
             # ================= GRN =================
             store = random.choice(stores)
 
-            grn = GoodsReceivedNote.objects.create(
+            grn = creator.create(
+                GoodsReceivedNote,
                 purchase_order=po,
                 store=store,
                 delivery_note_number=f"DN-{random.randint(1000,9999)}",
@@ -123,15 +157,18 @@ class Command(BaseCommand):
                 inspection_date=(created_at + timedelta(days=15)).date(),
                 status="ACCEPTED",
                 general_condition="Goods received in good condition",
+                created_at=created_at + timedelta(days=14),
             )
 
-            GoodsReceivedNote.objects.filter(id=grn.id).update(
-                created_at=created_at + timedelta(days=14)
-            )
+            if not creator.fast:
+                GoodsReceivedNote.objects.filter(id=grn.id).update(
+                    created_at=created_at + timedelta(days=14)
+                )
 
             # ================= GRN ITEMS + STOCK =================
-            for po_item in po.items.all():
-                GRNItem.objects.create(
+            for po_item in po_items:
+                creator.create(
+                    GRNItem,
                     grn=grn,
                     po_item=po_item,
                     quantity_ordered=po_item.quantity,
@@ -139,13 +176,8 @@ class Command(BaseCommand):
                     quantity_accepted=po_item.quantity,
                 )
 
-                stock_item, _ = StockItem.objects.get_or_create(
-                    store=store,
-                    item=po_item.requisition_item.item,
-                    defaults={
-                        "quantity_on_hand": 0,
-                        "average_unit_cost": po_item.unit_price,
-                    }
+                stock_item = self.stock_item_for(
+                    store, po_item.requisition_item.item, po_item.unit_price
                 )
 
                 balance_before = stock_item.quantity_on_hand
@@ -154,9 +186,13 @@ class Command(BaseCommand):
                     stock_item.quantity_on_hand * stock_item.average_unit_cost
                 )
                 stock_item.last_restock_date = grn.delivery_date
-                stock_item.save()
+                if creator.fast:
+                    changed_stock[stock_item.pk] = stock_item
+                else:
+                    stock_item.save()
 
-                StockMovement.objects.create(
+                creator.create(
+                    StockMovement,
                     stock_item=stock_item,
                     movement_type="RECEIPT",
                     reference_number=grn.grn_number,
@@ -170,7 +206,8 @@ class Command(BaseCommand):
                 )
 
             # ================= INVOICE =================
-            invoice = Invoice.objects.create(
+            invoice = creator.create(
+                Invoice,
                 invoice_number=f"INV-{random.randint(100000,999999)}",
                 supplier_invoice_number=f"SINV-{random.randint(1000,9999)}",
                 purchase_order=po,
@@ -190,8 +227,9 @@ class Command(BaseCommand):
                 submitted_by=random.choice(users),
             )
 
-            for po_item in po.items.all():
-                InvoiceItem.objects.create(
+            for po_item in po_items:
+                creator.create(
+                    InvoiceItem,
                     invoice=invoice,
                     po_item=po_item,
                     description=po_item.item_description,
@@ -201,7 +239,8 @@ class Command(BaseCommand):
                 )
 
             # ================= PAYMENT =================
-            Payment.objects.create(
+            creator.create(
+                Payment,
                 invoice=invoice,
                 payment_date=(created_at + timedelta(days=28)).date(),
                 payment_amount=total,
@@ -219,6 +258,17 @@ class Command(BaseCommand):
 
             created_count += 1
 
+        # Stock items created in this run are inserted by flush() with their
+        # final balances; pre-existing ones are updated in one statement
+        for model, count in creator.flush().items():
+            self.stdout.write(f"  Inserted {count} {model} rows")
+        existing = [stock for stock in changed_stock.values() if not stock._state.adding]
+        StockItem.objects.bulk_update(
+            existing,
+            ["quantity_on_hand", "total_value", "last_restock_date"],
+            batch_size=500,
+        )
+
         self.stdout.write(self.style.SUCCESS(
             f"✅ Created POs for {created_count} requisitions (3-year range)"
         ))
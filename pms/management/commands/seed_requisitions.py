@@ -6,6 +6,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django.db import transaction
 
+from pms.bulk_seed import BulkCreator
 from pms.models import (
     Requisition,
     RequisitionItem,
@@ -130,10 +131,26 @@ KENYAN_ITEMS = [
 class Command(BaseCommand):
     help = "Seed requisitions, items, and approvals for past 3 years"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fast',
+            action='store_true',
+            help='Build rows in memory and bulk insert them (no per-row save())',
+        )
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help='Multiply the monthly requisition volume by this factor (default: 1.0)',
+        )
+
     @transaction.atomic
-    def handle(self, *args, **kwargs):
+    def handle(self, *args, **options):
         self.stdout.write("🚀 Seeding Requisitions (3 years historical data)...")
 
+        creator = BulkCreator(fast=options['fast'])
+        scale = options['scale']
+
         users = list(User.objects.all())
         departments = list(Department.objects.all())
         budgets = list(Budget.objects.all())
@@ -153,7 +170,7 @@ class Command(BaseCommand):
         current_date = start_date
 
         while current_date <= today:
-            for _ in range(random.randint(2, 6)):  # monthly volume
+            for _ in range(round(random.randint(2, 6) * scale)):  # monthly volume
                 department = random.choice(departments)
                 user = random.choice(users)
                 budget = random.choice(budgets)
@@ -164,7 +181,8 @@ class Command(BaseCommand):
 
                 estimated_amount = Decimal(random.randint(50_000, 3_000_000))
 
-                requisition = Requisition.objects.create(
+                requisition = creator.create(
+                    Requisition,
                     title=random.choice(KENYAN_REQUISITION_TITLES),
                     department=department,
                     budget=budget,
@@ -184,17 +202,19 @@ class Command(BaseCommand):
                     submitted_at=created_at + timedelta(days=1),
                 )
 
-                # Override auto timestamps
-                Requisition.objects.filter(id=requisition.id).update(
-                    created_at=created_at,
-                    submitted_at=created_at + timedelta(days=1),
-                )
+                # Override auto timestamps (fast mode keeps the values given)
+                if not creator.fast:
+                    Requisition.objects.filter(id=requisition.id).update(
+                        created_at=created_at,
+                        submitted_at=created_at + timedelta(days=1),
+                    )
 
                 # Create line items
                 for _ in range(random.randint(1, 4)):
                     item_name, specs = random.choice(KENYAN_ITEMS)
 
-                    RequisitionItem.objects.create(
+                    creator.create(
+                        RequisitionItem,
                         requisition=requisition,
                         item=random.choice(items) if items else None,
                         item_description=item_name,
@@ -215,7 +235,8 @@ class Command(BaseCommand):
                 ]
 
                 for index, stage in enumerate(approval_sequence, start=1):
-                    RequisitionApproval.objects.create(
+                    creator.create(
+                        RequisitionApproval,
                         requisition=requisition,
                         approval_stage=stage,
                         approver=random.choice(users),
@@ -230,6 +251,9 @@ class Command(BaseCommand):
 
             current_date += timedelta(days=30)
 
+        for model, count in creator.flush().items():
+            self.stdout.write(f"  Inserted {count} {model} rows")
+
         self.stdout.write(self.style.SUCCESS(
             f"✅ Successfully seeded {requisitions_created} requisitions covering 3 years"
         ))
@@ -3,10 +3,13 @@ Django management command to seed users with realistic Kenyan data
 File location: pms/management/commands/seed_users.py
 
 Usage: python manage.py seed_users
+       python manage.py seed_users --fast --scale 20
 """
 
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from pms.bulk_seed import shared_password
 from pms.models import Department
 
 User = get_user_model()
@@ -352,6 +355,79 @@ class Command(BaseCommand):
             action='store_true',
             help='Update passwords for all existing users to password123',
         )
+        parser.add_argument(
+            '--fast',
+            action='store_true',
+            help='Hash the password once and bulk insert/update the users',
+        )
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help='Multiply the number of users; copies get numbered usernames (default: 1.0)',
+        )
+
+    def scaled_users(self, scale):
+        """USERS_DATA repeated to round(len * scale) entries with unique identifiers"""
+        users = []
+        for index in range(max(1, round(len(USERS_DATA) * scale))):
+            user_data = USERS_DATA[index % len(USERS_DATA)]
+            copy = index // len(USERS_DATA)
+            if copy:
+                local, domain = user_data['email'].split('@')
+                user_data = {
+                    **user_data,
+                    'username': f"{user_data['username']}.{copy + 1}",
+                    'email': f"{local}+{copy + 1}@{domain}",
+                    'employee_id': f"{user_data['employee_id']}-{copy + 1}",
+                }
+            users.append(user_data)
+        return users
+
+    def apply_user_data(self, user, user_data, department_map):
+        user.email = user_data['email']
+        user.first_name = user_data['first_name']
+        user.last_name = user_data['last_name']
+        user.role = user_data['role']
+        user.employee_id = user_data['employee_id']
+        user.phone_number = user_data['phone_number']
+        user.is_active = True
+        user.is_staff = True
+        if user_data['role'] == 'ADMIN':
+            user.is_superuser = True
+        if 'department_code' in user_data and user_data['department_code'] in department_map:
+            user.department = department_map[user_data['department_code']]
+        user.password = shared_password('password123')
+
+    @transaction.atomic
+    def seed_fast(self, users_data, department_map):
+        """One query to find existing users, then one bulk insert and one bulk update"""
+        existing = User.objects.in_bulk(
+            [user_data['username'] for user_data in users_data], field_name='username'
+        )
+        new_users, updated_users = [], []
+        for user_data in users_data:
+            user = existing.get(user_data['username'])
+            if user is None:
+                user = User(username=user_data['username'])
+                new_users.append(user)
+            else:
+                updated_users.append(user)
+            self.apply_user_data(user, user_data, department_map)
+
+        User.objects.bulk_create(new_users, batch_size=500)
+        User.objects.bulk_update(
+            updated_users,
+            [
+                'email', 'first_name', 'last_name', 'role', 'employee_id', 'phone_number',
+                'is_active', 'is_staff', 'is_superuser', 'department', 'password',
+            ],
+            batch_size=500,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Bulk created {len(new_users)} users, updated {len(updated_users)}"
+        ))
+        return len(new_users), len(updated_users)
 
     def handle(self, *args, **options):
         self.stdout.write("=" * 70)
@@ -375,11 +451,17 @@ class Command(BaseCommand):
             )
             self.stdout.write("  Continuing without department assignments...")
         
+        users_data = self.scaled_users(options['scale'])
+        
         self.stdout.write(f"\n{'='*70}")
-        self.stdout.write(f"Processing {len(USERS_DATA)} users...")
+        self.stdout.write(f"Processing {len(users_data)} users...")
         self.stdout.write(f"{'='*70}\n")
         
-        for user_data in USERS_DATA:
+        if options['fast']:
+            created_count, updated_count = self.seed_fast(users_data, department_map)
+            users_data = []  # nothing left for the per-user loop below
+        
+        for user_data in users_data:
             username = user_data['username']
             
             try:
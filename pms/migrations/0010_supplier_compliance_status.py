@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pms', '0009_alter_budget_allocated_amount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='supplier',
+            name='compliance_checked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='supplier',
+            name='compliance_expiry_date',
+            field=models.DateField(blank=True, help_text='Earliest tax/registration/document expiry inside the warning window', null=True),
+        ),
+        migrations.AddField(
+            model_name='supplier',
+            name='compliance_status',
+            field=models.CharField(choices=[('UNKNOWN', 'Not Yet Checked'), ('COMPLIANT', 'Compliant'), ('EXPIRING', 'Expiring Soon'), ('NON_COMPLIANT', 'Non-Compliant')], default='UNKNOWN', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='supplier',
+            index=models.Index(fields=['tax_compliance_expiry'], name='suppliers_tax_com_af6233_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplier',
+            index=models.Index(fields=['registration_expiry'], name='suppliers_registr_0624b4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplier',
+            index=models.Index(fields=['status', 'compliance_status'], name='suppliers_status_19410f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplierdocument',
+            index=models.Index(fields=['expiry_date'], name='supplier_do_expiry__3ce117_idx'),
+        ),
+    ]
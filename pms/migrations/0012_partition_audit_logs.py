@@ -0,0 +1,85 @@
+"""
+Convert audit_logs into a table range-partitioned by month on "timestamp".
+
+PostgreSQL only; other databases keep the plain table. Existing rows are
+copied into audit_logs_default; run create_audit_partitions afterwards to
+split them into monthly partitions. PostgreSQL requires the partition key
+in the primary key, so the constraint becomes (id, "timestamp"); ids are
+still random UUIDs and the ORM keeps treating id as the primary key.
+"""
+
+from django.db import migrations
+
+
+def _definitions(cursor, table):
+    cursor.execute(
+        "SELECT pg_get_indexdef(i.indexrelid), c.relname FROM pg_index i "
+        "JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE i.indrelid = %s::regclass AND NOT i.indisprimary",
+        [table],
+    )
+    indexes = cursor.fetchall()
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        [table],
+    )
+    foreign_keys = cursor.fetchall()
+    return indexes, foreign_keys
+
+
+def _rebuild(schema_editor, partitioned):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        indexes, foreign_keys = _definitions(cursor, 'audit_logs')
+
+        cursor.execute('ALTER TABLE audit_logs RENAME TO audit_logs_previous')
+        cursor.execute('ALTER TABLE audit_logs_previous DROP CONSTRAINT audit_logs_pkey')
+        for _, name in indexes:
+            cursor.execute(f'DROP INDEX "{name}"')
+        for name, _ in foreign_keys:
+            cursor.execute(f'ALTER TABLE audit_logs_previous DROP CONSTRAINT "{name}"')
+
+        if partitioned:
+            cursor.execute(
+                'CREATE TABLE audit_logs (LIKE audit_logs_previous INCLUDING DEFAULTS) '
+                'PARTITION BY RANGE ("timestamp")'
+            )
+            cursor.execute(
+                'ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_pkey '
+                'PRIMARY KEY (id, "timestamp")'
+            )
+            cursor.execute('CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT')
+        else:
+            cursor.execute('CREATE TABLE audit_logs (LIKE audit_logs_previous INCLUDING DEFAULTS)')
+            cursor.execute('ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_pkey PRIMARY KEY (id)')
+
+        cursor.execute('INSERT INTO audit_logs SELECT * FROM audit_logs_previous')
+        cursor.execute('DROP TABLE audit_logs_previous')
+
+        # Index definitions still name "audit_logs", now the new table
+        for definition, _ in indexes:
+            cursor.execute(definition.replace(' ON ONLY ', ' ON '))
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE audit_logs ADD CONSTRAINT "{name}" {definition}')
+
+
+def partition_audit_logs(apps, schema_editor):
+    _rebuild(schema_editor, partitioned=True)
+
+
+def unpartition_audit_logs(apps, schema_editor):
+    _rebuild(schema_editor, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pms', '0011_auditlog_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_audit_logs, unpartition_audit_logs),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:31
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pms', '0012_partition_audit_logs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditActivitySummary',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('total_actions', models.PositiveIntegerField(default=0)),
+                ('action_counts', models.JSONField(default=dict, help_text='Entries per AuditLog action type')),
+                ('first_activity', models.DateTimeField(blank=True, null=True)),
+                ('last_activity', models.DateTimeField(blank=True, null=True)),
+                ('ip_addresses', models.JSONField(default=list, help_text='Distinct client IPs seen that day')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='audit_activity_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'audit_activity_summaries',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date'], name='audit_activ_date_56e48e_idx')],
+                'unique_together': {('user', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:33
+
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pms', '0013_auditactivitysummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Finding',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('rule_code', models.CharField(max_length=50)),
+                ('fingerprint', models.CharField(help_text='Identifies the same red flag across runs', max_length=64, unique=True)),
+                ('title', models.CharField(max_length=300)),
+                ('description', models.TextField()),
+                ('category', models.CharField(choices=[('COMPLIANCE', 'Compliance'), ('FINANCIAL', 'Financial'), ('OPERATIONAL', 'Operational'), ('SECURITY', 'Security')], max_length=20)),
+                ('severity', models.CharField(choices=[('LOW', 'Low'), ('MEDIUM', 'Medium'), ('HIGH', 'High'), ('CRITICAL', 'Critical')], max_length=10)),
+                ('score', models.DecimalField(decimal_places=2, max_digits=5, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('status', models.CharField(choices=[('OPEN', 'Open'), ('IN_PROGRESS', 'In Progress'), ('RESOLVED', 'Resolved'), ('CLOSED', 'Closed'), ('DISMISSED', 'Dismissed')], default='OPEN', max_length=20)),
+                ('model_name', models.CharField(max_length=100)),
+                ('object_id', models.CharField(max_length=255)),
+                ('related_objects', models.JSONField(blank=True, default=list)),
+                ('evidence', models.JSONField(blank=True, default=dict)),
+                ('amount', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('first_detected_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_detected_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True)),
+                ('resolution_notes', models.TextField(blank=True)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='audit_findings', to='pms.department')),
+                ('reviewed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='findings_reviewed', to=settings.AUTH_USER_MODEL)),
+                ('supplier', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='audit_findings', to='pms.supplier')),
+            ],
+            options={
+                'db_table': 'audit_findings',
+                'ordering': ['-score', '-last_detected_at'],
+                'indexes': [models.Index(fields=['status', 'severity'], name='audit_findi_status_abaff8_idx'), models.Index(fields=['rule_code', 'is_active'], name='audit_findi_rule_co_0a677e_idx'), models.Index(fields=['-score'], name='audit_findi_score_a64b58_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:37
+
+import hashlib
+import re
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+# Frozen copy of the pms.duplicates key functions as of this migration, with
+# the default DUPLICATE_DATE_BUCKET_DAYS. Installations using another bucket
+# size run the rebuild_duplicate_keys command afterwards.
+BUCKET_DAYS = 7
+MIN_REFERENCE_LENGTH = 4
+
+_NON_ALPHANUMERIC = re.compile(r'[^0-9A-Z]')
+_LEADING_ZEROS = re.compile(r'(?<![0-9])0+(?=[0-9])')
+
+
+def _normalise_reference(value):
+    value = _NON_ALPHANUMERIC.sub('', str(value or '').upper())
+    return _LEADING_ZEROS.sub('', value)
+
+
+def _digest(*parts):
+    return hashlib.sha256('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def invoice_duplicate_key(supplier_id, invoice_number, amount, invoice_date):
+    number = _normalise_reference(invoice_number)
+    if not (supplier_id and number and invoice_date):
+        return ''
+    return _digest(
+        'invoice', supplier_id, number, Decimal(amount or 0).quantize(Decimal('0.01')),
+        invoice_date.toordinal() // BUCKET_DAYS,
+    )
+
+
+def payment_duplicate_key(reference):
+    reference = _normalise_reference(reference)
+    if len(reference) < MIN_REFERENCE_LENGTH:
+        return ''
+    return _digest('payment', reference)
+
+
+def populate_duplicate_keys(apps, schema_editor):
+    Invoice = apps.get_model('pms', 'Invoice')
+    Payment = apps.get_model('pms', 'Payment')
+
+    invoices = []
+    for invoice in Invoice.objects.only(
+        'id', 'supplier_id', 'supplier_invoice_number', 'total_amount', 'invoice_date'
+    ).iterator(chunk_size=2000):
+        invoice.duplicate_key = invoice_duplicate_key(
+            invoice.supplier_id, invoice.supplier_invoice_number,
+            invoice.total_amount, invoice.invoice_date,
+        )
+        invoices.append(invoice)
+    Invoice.objects.bulk_update(invoices, ['duplicate_key'], batch_size=1000)
+
+    payments = []
+    for payment in Payment.objects.only('id', 'payment_reference').iterator(chunk_size=2000):
+        payment.duplicate_key = payment_duplicate_key(payment.payment_reference)
+        payments.append(payment)
+    Payment.objects.bulk_update(payments, ['duplicate_key'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pms', '0014_finding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='duplicate_key',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='duplicate_key',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['duplicate_key'], name='pms_invoice_duplica_ebe608_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['duplicate_key'], name='payments_duplica_1405f0_idx'),
+        ),
+        migrations.RunPython(populate_duplicate_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pms', '0015_duplicate_keys'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(fields=['tender', 'status'], name='bids_tender__9fd156_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bidevaluation',
+            index=models.Index(fields=['bid', 'evaluator'], name='bid_evaluat_bid_id_c904c3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['status', 'due_date'], name='pms_invoice_status_b5bc8b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['status', 'payment_date'], name='payments_status_811742_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['status', 'po_date'], name='purchase_or_status_946cc9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockmovement',
+            index=models.Index(fields=['stock_item', 'movement_date'], name='stock_movem_stock_i_4afbb0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tender',
+            index=models.Index(fields=['status', 'closing_date'], name='tenders_status_8fb2b8_idx'),
+        ),
+    ]
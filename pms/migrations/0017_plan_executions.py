@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:48
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pms', '0016_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlanExecution',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('planned_amount', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('requisitioned_amount', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('ordered_amount', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('received_amount', models.DecimalField(decimal_places=2, default=0, help_text='Accepted quantities at purchase order unit prices', max_digits=15)),
+                ('invoiced_amount', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('paid_amount', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('refreshed_at', models.DateTimeField()),
+                ('budget_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='plan_executions', to='pms.budgetyear')),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='plan_executions', to='pms.department')),
+                ('plan_item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='execution', to='pms.procurementplanitem')),
+                ('procurement_plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='executions', to='pms.procurementplan')),
+            ],
+            options={
+                'db_table': 'plan_executions',
+                'indexes': [models.Index(fields=['budget_year', 'department'], name='plan_execut_budget__c382de_idx'), models.Index(fields=['budget_year', '-refreshed_at'], name='plan_execut_budget__881558_idx')],
+            },
+        ),
+    ]
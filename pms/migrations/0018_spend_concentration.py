@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:06
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pms', '0017_plan_executions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpendConcentration',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('dimension', models.CharField(choices=[('SUPPLIER', 'Supplier'), ('ITEM', 'Item'), ('CATEGORY', 'Item Category')], max_length=10)),
+                ('name', models.CharField(max_length=300)),
+                ('rank', models.PositiveIntegerField()),
+                ('spend', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('share', models.DecimalField(decimal_places=4, help_text="Percent of the dimension's spend", max_digits=7)),
+                ('cumulative_share', models.DecimalField(decimal_places=4, help_text="Percent of the dimension's spend up to and including this rank", max_digits=7)),
+                ('abc_class', models.CharField(blank=True, choices=[('A', 'A - Top Spend'), ('B', 'B - Middle Spend'), ('C', 'C - Tail Spend')], max_length=1)),
+                ('hhi', models.DecimalField(blank=True, decimal_places=2, help_text='Herfindahl-Hirschman index of supplier shares (0-10,000), categories only', max_digits=8, null=True)),
+                ('supplier_count', models.PositiveIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField()),
+                ('budget_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='spend_concentration', to='pms.budgetyear')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='spend_concentration', to='pms.itemcategory')),
+                ('item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='spend_concentration', to='pms.item')),
+                ('supplier', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='spend_concentration', to='pms.supplier')),
+            ],
+            options={
+                'db_table': 'spend_concentration',
+                'indexes': [models.Index(fields=['budget_year', 'dimension', 'rank'], name='spend_conce_budget__d57d83_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:09
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pms', '0018_spend_concentration'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemPriceIndex',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('observations', models.JSONField(default=list, help_text='Most recent [date, unit price, source] observations, oldest first')),
+                ('sample_count', models.PositiveIntegerField(default=0)),
+                ('p25_price', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('median_price', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('p75_price', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('last_price', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('last_observed_on', models.DateField(blank=True, null=True)),
+                ('last_source', models.CharField(blank=True, choices=[('PO', 'Purchase Order'), ('BID', 'Bid')], max_length=3)),
+                ('trend_percentage', models.DecimalField(blank=True, decimal_places=2, help_text='Median of the newer half of the observations against the older half', max_digits=9, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='price_index', to='pms.item')),
+            ],
+            options={
+                'db_table': 'item_price_index',
+            },
+        ),
+    ]
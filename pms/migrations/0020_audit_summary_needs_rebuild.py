@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pms', '0019_item_price_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditactivitysummary',
+            name='needs_rebuild',
+            field=models.BooleanField(default=False, help_text='An update failed; backfill_audit_summaries --pending recounts the day'),
+        ),
+    ]
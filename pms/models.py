@@ -94,7 +94,8 @@ class AuditLog(models.Model):
     changes = models.JSONField(null=True, blank=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the action happens, not when a buffered entry is flushed
+    timestamp = models.DateTimeField(default=timezone.now)
 
     class Meta:
         db_table = 'audit_logs'
@@ -109,6 +110,38 @@ class AuditLog(models.Model):
         return f"{self.user} - {self.action} - {self.model_name} at {self.timestamp}"
 
 
+class AuditActivitySummary(models.Model):
+    """Per user per day roll-up of AuditLog, maintained by pms.audit"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='audit_activity_summaries')
+    date = models.DateField()
+    total_actions = models.PositiveIntegerField(default=0)
+    action_counts = models.JSONField(default=dict, help_text="Entries per AuditLog action type")
+    first_activity = models.DateTimeField(null=True, blank=True)
+    last_activity = models.DateTimeField(null=True, blank=True)
+    ip_addresses = models.JSONField(default=list, help_text="Distinct client IPs seen that day")
+    needs_rebuild = models.BooleanField(
+        default=False,
+        help_text="An update failed; backfill_audit_summaries --pending recounts the day"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'audit_activity_summaries'
+        ordering = ['-date']
+        unique_together = ['user', 'date']
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.date} ({self.total_actions} actions)"
+
+    @property
+    def distinct_ip_count(self):
+        return len(self.ip_addresses)
+
+
 # ============================================================================
 # 2. ORGANIZATIONAL STRUCTURE
 # ============================================================================
@@ -238,6 +271,16 @@ class Budget(models.Model):
     def __str__(self):
         return f"{self.department.code} - {self.category.code} ({self.budget_year.name})"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        from pms.budget_analytics import invalidate
+        invalidate()
+
+    def delete(self, *args, **kwargs):
+        from pms.budget_analytics import invalidate
+        invalidate()
+        return super().delete(*args, **kwargs)
+
     @property
     def available_balance(self):
         allocated = self.allocated_amount or Decimal('0.00')
@@ -326,6 +369,41 @@ class Item(models.Model):
         return f"{self.code} - {self.name}"
 
 
+class ItemPriceIndex(models.Model):
+    """Rolling price statistics of a catalogue item, maintained by pms.price_index"""
+    SOURCE_CHOICES = [
+        ('PO', 'Purchase Order'),
+        ('BID', 'Bid'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    item = models.OneToOneField(Item, on_delete=models.CASCADE, related_name='price_index')
+    observations = models.JSONField(
+        default=list,
+        help_text="Most recent [date, unit price, source] observations, oldest first"
+    )
+    sample_count = models.PositiveIntegerField(default=0)
+
+    p25_price = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    median_price = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    p75_price = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    last_price = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    last_observed_on = models.DateField(null=True, blank=True)
+    last_source = models.CharField(max_length=3, choices=SOURCE_CHOICES, blank=True)
+    trend_percentage = models.DecimalField(
+        max_digits=9, decimal_places=2, null=True, blank=True,
+        help_text="Median of the newer half of the observations against the older half"
+    )
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'item_price_index'
+
+    def __str__(self):
+        return f"{self.item} price index"
+
+
 class ProcurementPlan(models.Model):
     """Annual Procurement Plan"""
     STATUS_CHOICES = [
@@ -532,6 +610,37 @@ class ProcurementPlanItem(models.Model):
         return self.estimated_cost - self.amount_committed
 
 
+class PlanExecution(models.Model):
+    """Plan-vs-actual figures per plan item, materialised by pms.plan_execution"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    plan_item = models.OneToOneField(ProcurementPlanItem, on_delete=models.CASCADE, related_name='execution')
+    procurement_plan = models.ForeignKey(ProcurementPlan, on_delete=models.CASCADE, related_name='executions')
+    budget_year = models.ForeignKey(BudgetYear, on_delete=models.CASCADE, related_name='plan_executions')
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name='plan_executions')
+
+    planned_amount = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    requisitioned_amount = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    ordered_amount = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    received_amount = models.DecimalField(
+        max_digits=15, decimal_places=2, default=0,
+        help_text="Accepted quantities at purchase order unit prices"
+    )
+    invoiced_amount = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    paid_amount = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'plan_executions'
+        indexes = [
+            models.Index(fields=['budget_year', 'department']),
+            models.Index(fields=['budget_year', '-refreshed_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.plan_item} ({self.budget_year})"
+
+
 class ProcurementPlanAmendment(models.Model):
     """Track amendments to procurement plans"""
     AMENDMENT_TYPE_CHOICES = [
@@ -635,6 +744,13 @@ class Supplier(models.Model):
         ('BLACKLISTED', 'Blacklisted'),
     ]
     
+    COMPLIANCE_STATUS_CHOICES = [
+        ('UNKNOWN', 'Not Yet Checked'),
+        ('COMPLIANT', 'Compliant'),
+        ('EXPIRING', 'Expiring Soon'),
+        ('NON_COMPLIANT', 'Non-Compliant'),
+    ]
+    
     user = models.OneToOneField(
         User, 
         on_delete=models.CASCADE, 
@@ -672,6 +788,19 @@ class Supplier(models.Model):
     tax_compliance_expiry = models.DateField(null=True, blank=True)
     registration_expiry = models.DateField(null=True, blank=True)
     
+    # Denormalised by the refresh_supplier_compliance command
+    compliance_status = models.CharField(
+        max_length=20,
+        choices=COMPLIANCE_STATUS_CHOICES,
+        default='UNKNOWN'
+    )
+    compliance_expiry_date = models.DateField(
+        null=True,
+        blank=True,
+        help_text="Earliest tax/registration/document expiry inside the warning window"
+    )
+    compliance_checked_at = models.DateTimeField(null=True, blank=True)
+    
     notes = models.TextField(blank=True)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='suppliers_created')
     created_at = models.DateTimeField(auto_now_add=True)
@@ -680,6 +809,11 @@ class Supplier(models.Model):
     class Meta:
         db_table = 'suppliers'
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['tax_compliance_expiry']),
+            models.Index(fields=['registration_expiry']),
+            models.Index(fields=['status', 'compliance_status']),
+        ]
 
     def __str__(self):
         return f"{self.supplier_number} - {self.name}"
@@ -711,6 +845,9 @@ class SupplierDocument(models.Model):
     class Meta:
         db_table = 'supplier_documents'
         ordering = ['-uploaded_at']
+        indexes = [
+            models.Index(fields=['expiry_date']),
+        ]
 
     def __str__(self):
         return f"{self.supplier.name} - {self.document_name}"
@@ -891,7 +1028,22 @@ class Requisition(models.Model):
             
             self.requisition_number = f'REQ-{year}-{new_number:06d}'
         
-        super().save(*args, **kwargs)
+        from pms.plan_consumption import tracking
+        with tracking(self):
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        from pms.plan_consumption import tracking
+        with tracking(self, deleting=True):
+            return super().delete(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the plan usage as loaded, see pms.plan_consumption
+        from pms.plan_consumption import remember
+        remember(instance)
+        return instance
 
     def __str__(self):
         return f"{self.requisition_number} - {self.title}"
@@ -1090,6 +1242,9 @@ class Tender(models.Model):
     class Meta:
         db_table = 'tenders'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'closing_date']),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.tender_number:
@@ -1215,6 +1370,9 @@ class Bid(models.Model):
         db_table = 'bids'
         ordering = ['tender', 'rank']
         unique_together = ['tender', 'supplier']
+        indexes = [
+            models.Index(fields=['tender', 'status']),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.bid_number:
@@ -1260,8 +1418,14 @@ class BidItem(models.Model):
 
     def save(self, *args, **kwargs):
         self.quoted_total = self.requisition_item.quantity * self.quoted_unit_price
+        adding = self._state.adding
         super().save(*args, **kwargs)
 
+        if adding and self.bid.status == 'SUBMITTED':
+            # Submitted quotes feed the item benchmarks, see pms.price_index
+            from pms.price_index import record_bid_item
+            record_bid_item(self)
+
     def __str__(self):
         return f"{self.bid.bid_number} - Item {self.id}"
 
@@ -1314,6 +1478,9 @@ class BidEvaluation(models.Model):
     class Meta:
         db_table = 'bid_evaluations'
         ordering = ['-evaluated_at']
+        indexes = [
+            models.Index(fields=['bid', 'evaluator']),
+        ]
 
     def save(self, *args, **kwargs):
         # Weighted scoring: 70% technical, 30% financial
@@ -1961,6 +2128,9 @@ class PurchaseOrder(models.Model):
     class Meta:
         db_table = 'purchase_orders'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'po_date']),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.po_number:
@@ -1979,6 +2149,18 @@ class PurchaseOrder(models.Model):
         
         super().save(*args, **kwargs)
 
+        if self.status == 'APPROVED' and getattr(self, '_loaded_status', 'DRAFT') in ('DRAFT', 'PENDING_APPROVAL'):
+            # Approved prices feed the item benchmarks, see pms.price_index
+            from pms.price_index import record_purchase_order
+            record_purchase_order(self)
+        self._loaded_status = self.status
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
     def __str__(self):
         return f"{self.po_number} - {self.supplier.name}"
 
@@ -2052,6 +2234,63 @@ class POAmendment(models.Model):
         return f"{self.purchase_order.po_number} - Amendment {self.amendment_number}"
 
 
+class SpendConcentration(models.Model):
+    """
+    Pareto ranking of purchase order spend per supplier, catalogue item or
+    item category in a budget year, materialised by pms.spend_concentration
+    """
+    DIMENSION_CHOICES = [
+        ('SUPPLIER', 'Supplier'),
+        ('ITEM', 'Item'),
+        ('CATEGORY', 'Item Category'),
+    ]
+
+    ABC_CLASS_CHOICES = [
+        ('A', 'A - Top Spend'),
+        ('B', 'B - Middle Spend'),
+        ('C', 'C - Tail Spend'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    budget_year = models.ForeignKey(BudgetYear, on_delete=models.CASCADE, related_name='spend_concentration')
+    dimension = models.CharField(max_length=10, choices=DIMENSION_CHOICES)
+    supplier = models.ForeignKey(
+        Supplier, on_delete=models.CASCADE, null=True, blank=True, related_name='spend_concentration'
+    )
+    item = models.ForeignKey(
+        Item, on_delete=models.CASCADE, null=True, blank=True, related_name='spend_concentration'
+    )
+    category = models.ForeignKey(
+        ItemCategory, on_delete=models.CASCADE, null=True, blank=True, related_name='spend_concentration'
+    )
+    name = models.CharField(max_length=300)
+
+    rank = models.PositiveIntegerField()
+    spend = models.DecimalField(max_digits=15, decimal_places=2)
+    share = models.DecimalField(max_digits=7, decimal_places=4, help_text="Percent of the dimension's spend")
+    cumulative_share = models.DecimalField(
+        max_digits=7, decimal_places=4,
+        help_text="Percent of the dimension's spend up to and including this rank"
+    )
+    abc_class = models.CharField(max_length=1, choices=ABC_CLASS_CHOICES, blank=True)
+    hhi = models.DecimalField(
+        max_digits=8, decimal_places=2, null=True, blank=True,
+        help_text="Herfindahl-Hirschman index of supplier shares (0-10,000), categories only"
+    )
+    supplier_count = models.PositiveIntegerField(default=0)
+
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'spend_concentration'
+        indexes = [
+            models.Index(fields=['budget_year', 'dimension', 'rank']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_dimension_display()} {self.name} ({self.budget_year})"
+
+
 # ============================================================================
 # 10. CONTRACT MANAGEMENT
 # ============================================================================
@@ -2422,6 +2661,9 @@ class StockMovement(models.Model):
     class Meta:
         db_table = 'stock_movements'
         ordering = ['-movement_date']
+        indexes = [
+            models.Index(fields=['stock_item', 'movement_date']),
+        ]
 
     def __str__(self):
         return f"{self.movement_type} - {self.stock_item.item.name} - {self.quantity}"
@@ -2620,6 +2862,15 @@ class Invoice(models.Model):
         help_text="Remaining balance to be paid"
     )
     
+    # Hashed supplier/number/amount/date-bucket key, see pms.duplicates
+    duplicate_key = models.CharField(max_length=64, blank=True, editable=False)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['duplicate_key']),
+            models.Index(fields=['status', 'due_date']),
+        ]
+    
     def update_payment_status(self):
         """Update invoice payment status based on payments"""
         from django.db.models import Sum
@@ -2654,6 +2905,13 @@ class Invoice(models.Model):
             
             self.invoice_number = f'INV-{year}-{new_number:06d}'
         
+        from pms.duplicates import invoice_duplicate_key
+        self.duplicate_key = invoice_duplicate_key(
+            self.supplier_id, self.supplier_invoice_number, self.total_amount, self.invoice_date
+        )
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'duplicate_key'}
+        
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -2741,12 +2999,19 @@ class Payment(models.Model):
     
     notes = models.TextField(blank=True)
     
+    # Hashed normalised payment_reference, see pms.duplicates
+    duplicate_key = models.CharField(max_length=64, blank=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'payments'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['duplicate_key']),
+            models.Index(fields=['status', 'payment_date']),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.payment_number:
@@ -2763,7 +3028,19 @@ class Payment(models.Model):
             
             self.payment_number = f'PAY-{year}-{new_number:06d}'
         
+        from pms.duplicates import payment_duplicate_key
+        self.duplicate_key = payment_duplicate_key(self.payment_reference)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'duplicate_key'}
+        
         super().save(*args, **kwargs)
+        from pms.budget_analytics import invalidate
+        invalidate()
+
+    def delete(self, *args, **kwargs):
+        from pms.budget_analytics import invalidate
+        invalidate()
+        return super().delete(*args, **kwargs)
 
     def __str__(self):
         return f"{self.payment_number} - {self.payment_amount}"
@@ -2805,6 +3082,71 @@ class ProcurementReport(models.Model):
         return f"{self.get_report_type_display()} - {self.generated_at.strftime('%Y-%m-%d')}"
 
 
+class Finding(models.Model):
+    """Red flag raised by the audit rule engine (pms.red_flags)"""
+    CATEGORY_CHOICES = [
+        ('COMPLIANCE', 'Compliance'),
+        ('FINANCIAL', 'Financial'),
+        ('OPERATIONAL', 'Operational'),
+        ('SECURITY', 'Security'),
+    ]
+
+    SEVERITY_CHOICES = [
+        ('LOW', 'Low'),
+        ('MEDIUM', 'Medium'),
+        ('HIGH', 'High'),
+        ('CRITICAL', 'Critical'),
+    ]
+
+    STATUS_CHOICES = [
+        ('OPEN', 'Open'),
+        ('IN_PROGRESS', 'In Progress'),
+        ('RESOLVED', 'Resolved'),
+        ('CLOSED', 'Closed'),
+        ('DISMISSED', 'Dismissed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    rule_code = models.CharField(max_length=50)
+    fingerprint = models.CharField(max_length=64, unique=True, help_text="Identifies the same red flag across runs")
+    title = models.CharField(max_length=300)
+    description = models.TextField()
+    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
+    severity = models.CharField(max_length=10, choices=SEVERITY_CHOICES)
+    score = models.DecimalField(max_digits=5, decimal_places=2, validators=[MinValueValidator(0), MaxValueValidator(100)])
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='OPEN')
+
+    # Primary record plus everything else involved
+    model_name = models.CharField(max_length=100)
+    object_id = models.CharField(max_length=255)
+    related_objects = models.JSONField(default=list, blank=True)
+    evidence = models.JSONField(default=dict, blank=True)
+    amount = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    department = models.ForeignKey(Department, on_delete=models.SET_NULL, null=True, blank=True, related_name='audit_findings')
+    supplier = models.ForeignKey(Supplier, on_delete=models.SET_NULL, null=True, blank=True, related_name='audit_findings')
+
+    # False once the latest run of the rule no longer detects it
+    is_active = models.BooleanField(default=True)
+    first_detected_at = models.DateTimeField(default=timezone.now)
+    last_detected_at = models.DateTimeField(default=timezone.now)
+
+    reviewed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='findings_reviewed')
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+    resolution_notes = models.TextField(blank=True)
+
+    class Meta:
+        db_table = 'audit_findings'
+        ordering = ['-score', '-last_detected_at']
+        indexes = [
+            models.Index(fields=['status', 'severity']),
+            models.Index(fields=['rule_code', 'is_active']),
+            models.Index(fields=['-score']),
+        ]
+
+    def __str__(self):
+        return f"{self.rule_code} - {self.title} ({self.score})"
+
+
 # ============================================================================
 # 14. NOTIFICATIONS & COMMUNICATIONS
 # ============================================================================
@@ -0,0 +1,218 @@
+"""
+Notification service.
+
+All in-app notifications should be created through notify() / bulk_notify()
+so that fan-out to many recipients is a single bulk INSERT and the
+per-user unread counters kept in the cache stay in step with the table.
+
+Counters are reconciled against the database whenever the cached value
+expires (NOTIFICATION_COUNTER_TTL seconds), so a missed update can only
+leave a badge stale for a bounded time.
+
+Counters and ETag versions need a cache shared by all workers
+(CACHE_SHARED, i.e. REDIS_URL). With a per-process cache every worker
+would keep its own copy, so counts and ETags come from the notifications
+table instead.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from pms.events import publish_counts_changed, publish_notifications
+from pms.models import Notification
+
+
+BULK_BATCH_SIZE = 1000
+
+UNREAD_KEY = 'pms:notifications:unread:{}'
+VERSION_KEY = 'pms:notifications:version:{}'
+
+
+def _counter_ttl():
+    return getattr(settings, 'NOTIFICATION_COUNTER_TTL', 300)
+
+
+def _cache_shared():
+    return getattr(settings, 'CACHE_SHARED', False)
+
+
+def _user_id(recipient):
+    return getattr(recipient, 'pk', recipient)
+
+
+def serialize_notification(notification):
+    """JSON-friendly representation used by the polling and streaming endpoints"""
+    return {
+        'id': str(notification.id),
+        'title': notification.title,
+        'message': notification.message,
+        'type': notification.notification_type,
+        'priority': notification.priority,
+        'created_at': notification.created_at.isoformat() if notification.created_at else None,
+        'link_url': notification.link_url,
+    }
+
+
+def _apply_deltas(deltas, rows_by_user=None):
+    """
+    Adjust cached unread counters, bump ETag versions and wake any live
+    event streams for each user
+    """
+    if not deltas:
+        return
+    if not _cache_shared():
+        _publish(deltas, rows_by_user)
+        return
+
+    unread_keys = {UNREAD_KEY.format(user_id): user_id for user_id in deltas}
+    cached = cache.get_many(list(unread_keys))
+
+    counters = {}
+    for key, count in cached.items():
+        new_count = count + deltas[unread_keys[key]]
+        if new_count < 0:
+            # Counter drifted; let the next read reconcile from the table
+            cache.delete(key)
+        else:
+            counters[key] = new_count
+
+    if counters:
+        cache.set_many(counters, _counter_ttl())
+
+    cache.set_many(
+        {VERSION_KEY.format(user_id): uuid.uuid4().hex for user_id in deltas},
+        None
+    )
+    _publish(deltas, rows_by_user)
+
+
+def _publish(deltas, rows_by_user):
+    if rows_by_user:
+        publish_notifications(rows_by_user)
+    else:
+        publish_counts_changed(deltas)
+
+
+def _on_commit_apply(deltas, rows_by_user=None):
+    transaction.on_commit(lambda: _apply_deltas(deltas, rows_by_user))
+
+
+def bulk_notify(notifications):
+    """
+    Insert prepared (unsaved) Notification instances in batches and
+    update the recipients' unread counters once the transaction commits.
+    """
+    notifications = list(notifications)
+    if not notifications:
+        return []
+
+    created = Notification.objects.bulk_create(notifications, batch_size=BULK_BATCH_SIZE)
+
+    deltas = {}
+    rows_by_user = {}
+    for notification in created:
+        if not notification.is_read:
+            deltas[notification.user_id] = deltas.get(notification.user_id, 0) + 1
+            rows_by_user.setdefault(notification.user_id, []).append(
+                serialize_notification(notification)
+            )
+    _on_commit_apply(deltas, rows_by_user)
+
+    return created
+
+
+def notify(recipients, notification_type, title, message,
+           priority='MEDIUM', link_url='', sent_via_email=False):
+    """
+    Send the same notification to one user or a collection of users.
+
+    ``recipients`` may be a User, a user id, or any iterable/queryset of
+    either. Duplicates and empty values are ignored.
+    """
+    if recipients is None:
+        return []
+    if hasattr(recipients, 'pk') or isinstance(recipients, (str, uuid.UUID)):
+        recipients = [recipients]
+
+    user_ids = []
+    seen = set()
+    for recipient in recipients:
+        user_id = _user_id(recipient)
+        if user_id and user_id not in seen:
+            seen.add(user_id)
+            user_ids.append(user_id)
+
+    return bulk_notify(
+        Notification(
+            user_id=user_id,
+            notification_type=notification_type,
+            priority=priority,
+            title=title,
+            message=message,
+            link_url=link_url,
+            sent_via_email=sent_via_email,
+            email_sent_at=timezone.now() if sent_via_email else None,
+        )
+        for user_id in user_ids
+    )
+
+
+def mark_read(user, notification_ids=None):
+    """Mark some (or all) of a user's unread notifications as read"""
+    notifications = Notification.objects.filter(user=user, is_read=False)
+    if notification_ids is not None:
+        notifications = notifications.filter(id__in=notification_ids)
+
+    updated = notifications.update(is_read=True, read_at=timezone.now())
+    if updated:
+        _on_commit_apply({user.pk: -updated})
+    return updated
+
+
+def unread_count(user):
+    """Cached unread count; only queries the table on a cache miss"""
+    if not _cache_shared():
+        return Notification.objects.filter(user=user, is_read=False).count()
+    key = UNREAD_KEY.format(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = reconcile_unread_count(user)
+    return count
+
+
+def reconcile_unread_count(user):
+    """Recount unread notifications from the table and refresh the cache"""
+    count = Notification.objects.filter(user=user, is_read=False).count()
+    cache.set(UNREAD_KEY.format(user.pk), count, _counter_ttl())
+    return count
+
+
+def notification_version(user):
+    """Opaque token that changes whenever the user's notifications change"""
+    if not _cache_shared():
+        state = Notification.objects.filter(user=user).aggregate(
+            total=Count('id'),
+            unread=Count('id', filter=Q(is_read=False)),
+            created=Max('created_at'),
+            read=Max('read_at'),
+        )
+        return uuid.uuid5(uuid.NAMESPACE_OID, repr(sorted(state.items()))).hex
+    key = VERSION_KEY.format(user.pk)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.add(key, version, None)
+        version = cache.get(key, version)
+    return version
+
+
+def notification_etag(request, *args, **kwargs):
+    """ETag for the polling endpoint; computed from the cache when it is shared"""
+    if not request.user.is_authenticated:
+        return None
+    return f'{request.user.pk}-{notification_version(request.user)}'
@@ -0,0 +1,225 @@
+"""
+Procurement plan consumption.
+
+A planned requisition consumes its ProcurementPlanItem (quantity_requisitioned
+and amount_committed) from the moment it is submitted until it is rejected
+or cancelled. Drafts do not consume the plan, so an abandoned draft never
+holds budget.
+
+Requisition.save() and delete() run inside tracking(), which compares what
+the requisition consumed when it was loaded with what it consumes now and
+applies the difference with F() expressions. Concurrent approvals of
+requisitions against the same plan item therefore never overwrite each
+other's usage.
+
+recalculate() rebuilds usage from the linked requisitions in one UPDATE;
+it is used after bulk status changes that bypass save() and by the
+recalculate_plan_consumption management command.
+
+plan_item_statistics() computes every figure the plan pages show (totals,
+quarter, method and status breakdowns) with a single conditional
+aggregate, so their cost does not grow with the number of breakdowns.
+"""
+
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from pms.models import ProcurementPlan, ProcurementPlanItem, Requisition, RequisitionItem
+
+
+# Requisition statuses that hold plan quantity and budget
+CONSUMING_STATUSES = (
+    'SUBMITTED', 'HOD_APPROVED', 'FACULTY_APPROVED', 'BUDGET_APPROVED',
+    'PROCUREMENT_APPROVED', 'APPROVED',
+)
+
+_TRACKED_FIELDS = ('status', 'is_planned', 'procurement_plan_item_id', 'estimated_amount')
+
+ZERO = Decimal('0')
+
+
+def consumption(requisition):
+    """(plan item id, amount) the requisition consumes, or None"""
+    if (
+        requisition.is_planned
+        and requisition.procurement_plan_item_id
+        and requisition.status in CONSUMING_STATUSES
+    ):
+        return requisition.procurement_plan_item_id, requisition.estimated_amount or ZERO
+    return None
+
+
+def remember(requisition):
+    """Record the loaded consumption (called from Requisition.from_db)"""
+    if all(name in requisition.__dict__ for name in _TRACKED_FIELDS):
+        requisition._plan_consumption = consumption(requisition)
+
+
+def _stored_consumption(requisition):
+    if requisition._state.adding:
+        return None
+    if hasattr(requisition, '_plan_consumption'):
+        return requisition._plan_consumption
+    # Loaded with deferred fields: read the stored values instead
+    stored = Requisition.objects.filter(pk=requisition.pk).values(
+        'status', 'is_planned', 'procurement_plan_item_id', 'estimated_amount'
+    ).first()
+    if stored is None or not (
+        stored['is_planned']
+        and stored['procurement_plan_item_id']
+        and stored['status'] in CONSUMING_STATUSES
+    ):
+        return None
+    return stored['procurement_plan_item_id'], stored['estimated_amount'] or ZERO
+
+
+def _requisitioned_quantity(requisition):
+    return requisition.items.aggregate(total=Sum('quantity', default=ZERO))['total']
+
+
+def _adjust(plan_item_id, quantity, amount):
+    ProcurementPlanItem.objects.filter(pk=plan_item_id).update(
+        quantity_requisitioned=F('quantity_requisitioned') + quantity,
+        amount_committed=F('amount_committed') + amount,
+    )
+
+
+@contextmanager
+def tracking(requisition, deleting=False):
+    """
+    Wrap a requisition save (or delete) and move plan usage by the
+    difference between what it consumed before and what it consumes after.
+    """
+    before = _stored_consumption(requisition)
+    after = None if deleting else consumption(requisition)
+    quantity = ZERO
+    if before != after and not (before and after and before[0] == after[0]):
+        # Line items are only editable in draft, so the quantity released
+        # is the quantity that was committed on submission.
+        quantity = _requisitioned_quantity(requisition)
+
+    with transaction.atomic():
+        yield
+
+        if before and after and before[0] == after[0]:
+            if before[1] != after[1]:
+                _adjust(after[0], ZERO, after[1] - before[1])
+        else:
+            if before:
+                _adjust(before[0], -quantity, -before[1])
+            if after:
+                _adjust(after[0], quantity, after[1])
+    requisition._plan_consumption = after
+
+
+def recalculate(plan_items=None):
+    """
+    Rebuild quantity_requisitioned and amount_committed from the consuming
+    requisitions linked to ``plan_items`` (default: every plan item).
+    Returns the number of plan items updated.
+    """
+    if plan_items is None:
+        plan_items = ProcurementPlanItem.objects.all()
+
+    decimal = DecimalField(max_digits=15, decimal_places=2)
+    amount = Requisition.objects.filter(
+        procurement_plan_item=OuterRef('pk'),
+        is_planned=True,
+        status__in=CONSUMING_STATUSES,
+    ).order_by().values('procurement_plan_item').annotate(
+        total=Sum('estimated_amount')
+    ).values('total')
+    quantity = RequisitionItem.objects.filter(
+        requisition__procurement_plan_item=OuterRef('pk'),
+        requisition__is_planned=True,
+        requisition__status__in=CONSUMING_STATUSES,
+    ).order_by().values('requisition__procurement_plan_item').annotate(
+        total=Sum('quantity')
+    ).values('total')
+
+    return plan_items.update(
+        amount_committed=Coalesce(Subquery(amount, output_field=decimal), Value(ZERO), output_field=decimal),
+        quantity_requisitioned=Coalesce(Subquery(quantity, output_field=decimal), Value(ZERO), output_field=decimal),
+    )
+
+
+def recalculate_for_requisitions(requisitions):
+    """recalculate() the plan items linked to a requisition queryset"""
+    return recalculate(ProcurementPlanItem.objects.filter(
+        pk__in=requisitions.exclude(procurement_plan_item=None).values('procurement_plan_item')
+    ))
+
+
+def plan_item_statistics(items):
+    """
+    Totals and quarter/method/status breakdowns of a plan item queryset in
+    one query. by_quarter and by_method list only groups that have items,
+    as rows shaped like a values()/annotate() grouping.
+    """
+    quarters = ProcurementPlan.QUARTER_CHOICES
+    methods = ProcurementPlan.PROCUREMENT_METHOD_CHOICES
+    statuses = ProcurementPlanItem.STATUS_CHOICES
+
+    aggregates = {
+        'total_items': Count('id'),
+        'total_estimated': Sum('estimated_cost', default=ZERO),
+        'total_committed': Sum('amount_committed', default=ZERO),
+    }
+    for code, _ in quarters:
+        in_quarter = Q(planned_quarter=code)
+        aggregates[f'quarter_{code}_items'] = Count('id', filter=in_quarter)
+        aggregates[f'quarter_{code}_cost'] = Sum('estimated_cost', filter=in_quarter, default=ZERO)
+    for code, _ in methods:
+        by_method = Q(procurement_method=code)
+        aggregates[f'method_{code}_items'] = Count('id', filter=by_method)
+        aggregates[f'method_{code}_cost'] = Sum('estimated_cost', filter=by_method, default=ZERO)
+    for code, _ in statuses:
+        aggregates[f'status_{code}_items'] = Count('id', filter=Q(status=code))
+
+    row = items.order_by().aggregate(**aggregates)
+
+    by_quarter = [
+        {
+            'planned_quarter': code,
+            'label': label,
+            'total_items': row[f'quarter_{code}_items'],
+            'total_cost': row[f'quarter_{code}_cost'],
+        }
+        for code, label in quarters
+        if row[f'quarter_{code}_items']
+    ]
+    by_method = sorted(
+        (
+            {
+                'procurement_method': code,
+                'label': label,
+                'total_items': row[f'method_{code}_items'],
+                'total_cost': row[f'method_{code}_cost'],
+            }
+            for code, label in methods
+            if row[f'method_{code}_items']
+        ),
+        key=lambda method: method['total_cost'],
+        reverse=True,
+    )
+
+    return {
+        'total_items': row['total_items'],
+        'total_estimated': row['total_estimated'],
+        'total_committed': row['total_committed'],
+        'by_quarter': by_quarter,
+        'by_method': by_method,
+        'by_status': {code: row[f'status_{code}_items'] for code, _ in statuses},
+    }
+
+
+def plan_status_counts(plans):
+    """Number of plans in total and per status, in one query"""
+    aggregates = {'total': Count('id')}
+    for code, _ in ProcurementPlan.STATUS_CHOICES:
+        aggregates[code] = Count('id', filter=Q(status=code))
+    return plans.order_by().aggregate(**aggregates)
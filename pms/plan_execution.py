@@ -0,0 +1,240 @@
+"""
+Plan-vs-actual execution of procurement plans.
+
+Follows each ProcurementPlanItem down the chain
+
+    plan item -> requisitions -> purchase orders -> GRNs -> invoices -> payments
+
+and materialises, per plan item, what was planned, requisitioned, ordered,
+received, invoiced and paid into PlanExecution. Every stage is one grouped
+subquery correlated on the plan item, so a whole budget year is computed
+by a single SELECT and written back with one batched upsert.
+
+refresh() is incremental by default: it only recomputes plan items whose
+chain has a row updated since the year's last refresh. Deleted documents
+do not leave such a trace, so a nightly full refresh is still needed
+(see the refresh_plan_execution command).
+
+execution_report() reads the materialised rows grouped at one drill level
+(university -> department -> plan -> plan item).
+"""
+
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import (
+    DecimalField, ExpressionWrapper, F, Max, OuterRef, Q, Subquery, Sum, Value,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from pms.models import (
+    GoodsReceivedNote, GRNItem, Invoice, Payment, PlanExecution, ProcurementPlanItem,
+    PurchaseOrder, Requisition,
+)
+
+
+# What counts at each stage of the chain
+ORDERED_PO_STATUSES = (
+    'APPROVED', 'SENT', 'ACKNOWLEDGED', 'PARTIAL_DELIVERY', 'DELIVERED', 'CLOSED',
+)
+RECEIVED_GRN_STATUSES = ('ACCEPTED', 'PARTIAL')
+INVOICED_STATUSES = ('SUBMITTED', 'VERIFYING', 'MATCHED', 'APPROVED', 'PAID', 'DISPUTED')
+PAID_STATUSES = ('COMPLETED',)
+
+STAGES = ('planned', 'requisitioned', 'ordered', 'received', 'invoiced', 'paid')
+AMOUNT_FIELDS = tuple(f'{stage}_amount' for stage in STAGES)
+
+# Execution rates shown in reports, as (name, numerator, denominator)
+RATES = (
+    ('requisition_rate', 'requisitioned', 'planned'),
+    ('order_rate', 'ordered', 'planned'),
+    ('delivery_rate', 'received', 'ordered'),
+    ('payment_rate', 'paid', 'planned'),
+)
+
+UPSERT_BATCH_SIZE = 500
+
+ZERO = Decimal('0')
+_DECIMAL = DecimalField(max_digits=15, decimal_places=2)
+
+
+def _stage_total(queryset, plan_item_path, expression):
+    """Grouped, plan-item-correlated Sum(expression) over ``queryset``, 0 when empty"""
+    total = queryset.filter(**{plan_item_path: OuterRef('pk')}).order_by().values(
+        plan_item_path
+    ).annotate(total=Sum(expression, output_field=_DECIMAL)).values('total')
+    return Coalesce(Subquery(total, output_field=_DECIMAL), Value(ZERO), output_field=_DECIMAL)
+
+
+def with_execution(plan_items):
+    """Annotate a plan item queryset with the ordered/received/invoiced/paid amounts"""
+    return plan_items.annotate(
+        ordered_amount=_stage_total(
+            PurchaseOrder.objects.filter(status__in=ORDERED_PO_STATUSES),
+            'requisition__procurement_plan_item',
+            'total_amount',
+        ),
+        received_amount=_stage_total(
+            GRNItem.objects.filter(grn__status__in=RECEIVED_GRN_STATUSES),
+            'po_item__purchase_order__requisition__procurement_plan_item',
+            ExpressionWrapper(F('quantity_accepted') * F('po_item__unit_price'), output_field=_DECIMAL),
+        ),
+        invoiced_amount=_stage_total(
+            Invoice.objects.filter(status__in=INVOICED_STATUSES),
+            'purchase_order__requisition__procurement_plan_item',
+            'total_amount',
+        ),
+        paid_amount=_stage_total(
+            Payment.objects.filter(status__in=PAID_STATUSES),
+            'invoice__purchase_order__requisition__procurement_plan_item',
+            'payment_amount',
+        ),
+    )
+
+
+def changed_plan_items(since):
+    """Q matching plan items with anything in their chain updated since ``since``"""
+    def linked(model, path):
+        return Q(pk__in=model.objects.filter(updated_at__gte=since).exclude(
+            **{path: None}
+        ).values(path))
+
+    return (
+        Q(updated_at__gte=since)
+        | linked(Requisition, 'procurement_plan_item')
+        | linked(PurchaseOrder, 'requisition__procurement_plan_item')
+        | linked(GoodsReceivedNote, 'purchase_order__requisition__procurement_plan_item')
+        | linked(Invoice, 'purchase_order__requisition__procurement_plan_item')
+        | linked(Payment, 'invoice__purchase_order__requisition__procurement_plan_item')
+    )
+
+
+def last_refreshed(budget_year):
+    return PlanExecution.objects.filter(budget_year=budget_year).aggregate(
+        last=Max('refreshed_at')
+    )['last']
+
+
+def refresh(budget_year, full=False):
+    """
+    Recompute PlanExecution rows for ``budget_year``. Incremental unless
+    ``full`` or the year has never been refreshed. Returns the number of
+    plan items written.
+    """
+    started = timezone.now()
+    plan_items = ProcurementPlanItem.objects.filter(procurement_plan__budget_year=budget_year)
+
+    since = None if full else last_refreshed(budget_year)
+    if since is not None:
+        plan_items = plan_items.filter(changed_plan_items(since))
+
+    rows = with_execution(plan_items).order_by().values(
+        'id', 'procurement_plan_id', 'procurement_plan__department_id',
+        'estimated_cost', 'amount_committed',
+        'ordered_amount', 'received_amount', 'invoiced_amount', 'paid_amount',
+    )
+    executions = [
+        PlanExecution(
+            plan_item_id=row['id'],
+            procurement_plan_id=row['procurement_plan_id'],
+            budget_year_id=budget_year.pk,
+            department_id=row['procurement_plan__department_id'],
+            planned_amount=row['estimated_cost'],
+            requisitioned_amount=row['amount_committed'],
+            ordered_amount=row['ordered_amount'],
+            received_amount=row['received_amount'],
+            invoiced_amount=row['invoiced_amount'],
+            paid_amount=row['paid_amount'],
+            refreshed_at=started,
+        )
+        for row in rows.iterator(chunk_size=2000)
+    ]
+
+    with transaction.atomic():
+        PlanExecution.objects.bulk_create(
+            executions,
+            batch_size=UPSERT_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['plan_item'],
+            update_fields=[
+                'procurement_plan', 'budget_year', 'department', *AMOUNT_FIELDS, 'refreshed_at',
+            ],
+        )
+        if since is None:
+            # Items moved to another year's plan
+            PlanExecution.objects.filter(
+                budget_year=budget_year, refreshed_at__lt=started
+            ).delete()
+    return len(executions)
+
+
+def _with_rates(row):
+    for name, numerator, denominator in RATES:
+        row[name] = (row[numerator] / row[denominator] * 100) if row[denominator] else ZERO
+    return row
+
+
+# Drill levels: grouping of PlanExecution rows and how a row is labelled
+DRILL_LEVELS = {
+    'department': ('department_id', 'department__name'),
+    'plan': ('procurement_plan_id', 'procurement_plan__plan_number', 'procurement_plan__title'),
+    'item': (
+        'plan_item_id', 'plan_item__description', 'plan_item__planned_quarter',
+        'plan_item__procurement_method',
+    ),
+}
+
+
+def execution_report(budget_year, department_id=None, plan_id=None):
+    """
+    Rows of the drill level below the selection (departments for the
+    whole year, plans for a department, items for a plan) with their
+    stage totals and rates, plus the total of the selection, from one
+    grouped query over PlanExecution.
+    """
+    executions = PlanExecution.objects.filter(budget_year=budget_year)
+    if plan_id:
+        executions = executions.filter(procurement_plan_id=plan_id)
+        level = 'item'
+    elif department_id:
+        executions = executions.filter(department_id=department_id)
+        level = 'plan'
+    else:
+        level = 'department'
+
+    group_fields = DRILL_LEVELS[level]
+    rows = [
+        _with_rates(row)
+        for row in executions.order_by().values(*group_fields).annotate(
+            **{stage: Sum(f'{stage}_amount') for stage in STAGES}
+        ).order_by('-planned', group_fields[1])
+    ]
+
+    total = {stage: sum((row[stage] for row in rows), ZERO) for stage in STAGES}
+    return {
+        'level': level,
+        'rows': rows,
+        'total': _with_rates(total),
+        'refreshed_at': last_refreshed(budget_year),
+    }
+
+
+def execution_rows(budget_year, department_id=None, plan_id=None):
+    """Plan item level rows for CSV export"""
+    executions = PlanExecution.objects.filter(budget_year=budget_year)
+    if department_id:
+        executions = executions.filter(department_id=department_id)
+    if plan_id:
+        executions = executions.filter(procurement_plan_id=plan_id)
+    return (
+        _with_rates(row)
+        for row in executions.order_by(
+            'department__name', 'procurement_plan__plan_number', 'plan_item__sequence'
+        ).values(
+            'department__name', 'procurement_plan__plan_number',
+            'plan_item__description', 'plan_item__planned_quarter',
+            'plan_item__procurement_method',
+            **{stage: F(f'{stage}_amount') for stage in STAGES},
+        ).iterator(chunk_size=2000)
+    )
@@ -0,0 +1,299 @@
+"""
+Bulk import of procurement plan items from a spreadsheet.
+
+An uploaded CSV or XLSX file is read row by row (openpyxl in read-only
+mode for XLSX) into plain dicts. Validation is done in batch: catalogue
+items and budget lines referenced anywhere in the file are fetched with
+one query per table (codes match case-insensitively), choice fields are
+matched on their code or label, each built item is checked against the
+model's field limits, and every problem is reported against its spreadsheet row. Nothing is
+written unless the whole file is valid; then all items are inserted with
+one bulk_create, numbered after the plan's last sequence, and the budget
+commitments are added with one F() update per budget line, all in a
+single transaction.
+"""
+
+import csv
+import io
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, Max
+from django.db.models.functions import Lower
+
+from pms.budget_analytics import invalidate
+from pms.models import Budget, Item, ProcurementPlan, ProcurementPlanItem
+
+
+# (column, required, help text) in template order
+COLUMNS = (
+    ('description', True, 'What is being procured'),
+    ('item_type', True, 'Goods, Services or Works'),
+    ('quantity', True, 'Number of units'),
+    ('unit_of_measure', True, 'e.g. Pieces, Lot, Months'),
+    ('estimated_cost', True, 'Total estimated cost (KES)'),
+    ('budget', True, 'Budget category code of the department budget line'),
+    ('budget_reference', False, 'Budget reference number, when a category has several lines'),
+    ('procurement_method', True, 'e.g. Open Tender, RFQ, Direct Procurement'),
+    ('planned_quarter', True, 'Q1, Q2, Q3 or Q4'),
+    ('source_of_funds', False, 'Defaults to Government Budget'),
+    ('item_code', False, 'Catalogue item code'),
+    ('specifications', False, ''),
+    ('notes', False, ''),
+)
+
+DEFAULT_SOURCE_OF_FUNDS = 'Government Budget'
+MAX_REPORTED_ERRORS = 200
+
+
+class PlanImportError(Exception):
+    """The file cannot be read at all (format, size or missing columns)"""
+
+
+def _max_rows():
+    return getattr(settings, 'PLAN_IMPORT_MAX_ROWS', 5000)
+
+
+def _header(name):
+    return str(name or '').strip().lower().replace(' ', '_')
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _csv_rows(uploaded):
+    text = io.TextIOWrapper(uploaded.file, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.reader(text)
+    finally:
+        text.detach()
+
+
+def _xlsx_rows(uploaded):
+    import openpyxl
+
+    try:
+        workbook = openpyxl.load_workbook(uploaded.file, read_only=True, data_only=True)
+    except Exception as exc:
+        raise PlanImportError(f'Could not read the workbook: {exc}')
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def read_rows(uploaded):
+    """
+    Yield (spreadsheet row number, {column: text}) for every non-empty row
+    of an uploaded .csv or .xlsx file.
+    """
+    name = uploaded.name.lower()
+    if name.endswith('.csv'):
+        rows = _csv_rows(uploaded)
+    elif name.endswith('.xlsx'):
+        rows = _xlsx_rows(uploaded)
+    else:
+        raise PlanImportError('Upload a .csv or .xlsx file.')
+
+    header = [_header(value) for value in next(rows, None) or ()]
+    missing = [column for column, required, _ in COLUMNS if required and column not in header]
+    if missing:
+        raise PlanImportError(f'Missing columns: {", ".join(missing)}.')
+
+    limit = _max_rows()
+    count = 0
+    for number, values in enumerate(rows, start=2):
+        row = {column: _cell(value) for column, value in zip(header, values) if column}
+        if not any(row.values()):
+            continue
+        count += 1
+        if count > limit:
+            raise PlanImportError(f'The file has more than {limit} rows. Split it and import the parts.')
+        yield number, row
+
+
+def _choice_lookup(choices):
+    lookup = {}
+    for code, label in choices:
+        lookup[code.lower()] = code
+        lookup[label.lower()] = code
+    return lookup
+
+
+def _decimal(value):
+    try:
+        number = Decimal(value.replace(',', ''))
+    except InvalidOperation:
+        return None
+    return number if number.is_finite() else None
+
+
+def validate(plan, rows):
+    """
+    Validate parsed rows against the plan. Returns (items, errors) where
+    items are unsaved ProcurementPlanItem instances and errors a list of
+    (row number, message).
+    """
+    rows = list(rows)
+    errors = []
+
+    item_codes = {row['item_code'].lower() for _, row in rows if row.get('item_code')}
+    catalog = {
+        item.code.lower(): item
+        for item in Item.objects.annotate(code_lower=Lower('code')).filter(code_lower__in=item_codes)
+    }
+
+    budget_codes = {row['budget'].lower() for _, row in rows if row.get('budget')}
+    budgets = defaultdict(list)
+    for budget in Budget.objects.annotate(category_code_lower=Lower('category__code')).filter(
+        budget_year_id=plan.budget_year_id,
+        department_id=plan.department_id,
+        category_code_lower__in=budget_codes,
+        is_active=True,
+    ).select_related('category'):
+        budgets[budget.category.code.lower()].append(budget)
+
+    item_types = _choice_lookup(ProcurementPlanItem.ITEM_TYPE_CHOICES)
+    methods = _choice_lookup(ProcurementPlan.PROCUREMENT_METHOD_CHOICES)
+    quarters = _choice_lookup(ProcurementPlan.QUARTER_CHOICES)
+
+    items = []
+    for number, row in rows:
+        problems = [
+            f'{column.replace("_", " ")} is required'
+            for column, required, _ in COLUMNS
+            if required and not row.get(column)
+        ]
+
+        item_type = item_types.get(row.get('item_type', '').lower())
+        if row.get('item_type') and not item_type:
+            problems.append(f'unknown item type "{row["item_type"]}"')
+        method = methods.get(row.get('procurement_method', '').lower())
+        if row.get('procurement_method') and not method:
+            problems.append(f'unknown procurement method "{row["procurement_method"]}"')
+        quarter = quarters.get(row.get('planned_quarter', '').lower())
+        if row.get('planned_quarter') and not quarter:
+            problems.append(f'unknown quarter "{row["planned_quarter"]}"')
+
+        quantity = _decimal(row['quantity']) if row.get('quantity') else None
+        if row.get('quantity') and (quantity is None or quantity <= 0):
+            problems.append(f'quantity "{row["quantity"]}" must be a positive number')
+        cost = _decimal(row['estimated_cost']) if row.get('estimated_cost') else None
+        if row.get('estimated_cost') and (cost is None or cost < 0):
+            problems.append(f'estimated cost "{row["estimated_cost"]}" must be a number of at least 0')
+
+        catalog_item = None
+        if row.get('item_code'):
+            catalog_item = catalog.get(row['item_code'].lower())
+            if catalog_item is None:
+                problems.append(f'no catalogue item with code "{row["item_code"]}"')
+
+        budget = None
+        if row.get('budget'):
+            candidates = budgets.get(row['budget'].lower(), [])
+            if row.get('budget_reference'):
+                candidates = [b for b in candidates if b.reference_number == row['budget_reference']]
+            if not candidates:
+                problems.append(f'no {plan.department.name} budget line "{row["budget"]}" in {plan.budget_year.name}')
+            elif len(candidates) > 1:
+                problems.append(f'budget "{row["budget"]}" has several lines; add a budget reference')
+            else:
+                budget = candidates[0]
+
+        if problems:
+            errors.append((number, '; '.join(problems)))
+            continue
+
+        item = ProcurementPlanItem(
+            procurement_plan=plan,
+            item=catalog_item,
+            item_type=item_type,
+            description=row['description'],
+            specifications=row.get('specifications', ''),
+            quantity=quantity,
+            unit_of_measure=row['unit_of_measure'],
+            estimated_cost=cost,
+            budget=budget,
+            procurement_method=method,
+            planned_quarter=quarter,
+            source_of_funds=row.get('source_of_funds') or DEFAULT_SOURCE_OF_FUNDS,
+            notes=row.get('notes', ''),
+        )
+        # Field limits (digits, lengths) the database would otherwise reject on insert
+        try:
+            item.clean_fields(exclude=['procurement_plan', 'budget', 'item'])
+        except ValidationError as error:
+            errors.append((number, '; '.join(
+                f'{field.replace("_", " ")}: {message.rstrip(".")}'
+                for field, messages in error.message_dict.items()
+                for message in messages
+            )))
+            continue
+        items.append(item)
+
+    if not errors:
+        # Same availability rule as adding items one by one, per budget line
+        requested = defaultdict(Decimal)
+        budget_lines = {}
+        for item in items:
+            requested[item.budget.pk] += item.estimated_cost
+            budget_lines[item.budget.pk] = item.budget
+        for pk, amount in requested.items():
+            budget = budget_lines[pk]
+            if amount > budget.available_balance:
+                errors.append((None, (
+                    f'Items charged to {budget.category.code} total KES {amount:,.2f}, '
+                    f'more than its available balance of KES {budget.available_balance:,.2f}'
+                )))
+
+    return items, errors
+
+
+def import_items(plan, uploaded):
+    """
+    Validate and import an uploaded file into ``plan``. Returns
+    (number of items created, errors); nothing is created when there are
+    errors. Raises PlanImportError for unreadable files.
+    """
+    items, errors = validate(plan, read_rows(uploaded))
+    if errors:
+        return 0, errors[:MAX_REPORTED_ERRORS]
+    if not items:
+        raise PlanImportError('The file has no items.')
+
+    with transaction.atomic():
+        # Lock the plan so concurrent imports or additions cannot reuse sequence numbers
+        ProcurementPlan.objects.select_for_update().filter(pk=plan.pk).first()
+        last_sequence = plan.items.aggregate(last=Max('sequence'))['last'] or 0
+        for offset, item in enumerate(items, start=1):
+            item.sequence = last_sequence + offset
+        ProcurementPlanItem.objects.bulk_create(items, batch_size=500)
+
+        committed = defaultdict(Decimal)
+        for item in items:
+            committed[item.budget_id] += item.estimated_cost
+        for budget_id, amount in committed.items():
+            Budget.objects.filter(pk=budget_id).update(committed_amount=F('committed_amount') + amount)
+        invalidate()
+
+    return len(items), []
+
+
+def template_csv():
+    """Header row and one example row for the downloadable template"""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow([column for column, _, _ in COLUMNS])
+    writer.writerow([
+        'Laptops for computer lab', 'Goods', '40', 'Pieces', '3200000', 'ICT', '',
+        'Open Tender', 'Q2', 'Government Budget', '', 'Core i5, 16GB RAM', '',
+    ])
+    return output.getvalue()
@@ -0,0 +1,265 @@
+"""
+Price benchmarks per catalogue item.
+
+Each price observation comes from one of two places:
+
+- an approved purchase order line (PurchaseOrderItem.unit_price)
+- a submitted bid line (BidItem.quoted_unit_price)
+
+Only lines whose requisition item is linked to a catalogue Item count.
+For each item, ItemPriceIndex keeps the PRICE_INDEX_WINDOW most recent
+observations. From that window it derives the quartiles, the median,
+the last price and a trend: the median of the newer half of the window
+against the median of the older half.
+
+Updates are incremental. PurchaseOrder.save() calls
+record_purchase_order() when an order is approved, and BidItem.save()
+calls record_bid_item() for the lines of a submitted bid. Each call
+locks the item's row, inserts the observation and recomputes the
+statistics from the window alone. The cost therefore does not grow with
+the item's history.
+
+rebuild() recomputes every item from scratch in one pass over all PO and
+bid lines, ordered by item and date (see the rebuild_price_index
+command). This also drops prices of orders and bids that were cancelled
+or disqualified after they were recorded, and catches approvals made by
+bulk updates.
+
+price_benchmark() compares a price with its item's range, for the bid
+line flags in bid_detail. suggested_price() proposes the estimated unit
+price in requisition forms.
+"""
+
+from bisect import insort
+from collections import deque
+from datetime import date
+from decimal import Decimal
+from itertools import groupby
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from pms.models import BidItem, ItemPriceIndex, PurchaseOrderItem
+from pms.plan_execution import ORDERED_PO_STATUSES
+
+
+# Bids whose quotes are not used as benchmarks
+EXCLUDED_BID_STATUSES = ('DISQUALIFIED',)
+
+# Tukey fences: a price is an outlier beyond this many spreads outside the quartiles
+OUTLIER_FACTOR = Decimal('1.5')
+# Lower bound of the spread as a fraction of the median, so that an item
+# always bought at one price does not flag every cent of difference
+MIN_SPREAD = Decimal('0.10')
+
+STATISTIC_FIELDS = (
+    'observations', 'sample_count', 'p25_price', 'median_price', 'p75_price',
+    'last_price', 'last_observed_on', 'last_source', 'trend_percentage',
+)
+
+UPSERT_BATCH_SIZE = 500
+
+HUNDRED = Decimal('100')
+CENTS = Decimal('0.01')
+
+
+def _window():
+    return getattr(settings, 'PRICE_INDEX_WINDOW', 50)
+
+
+def _min_samples():
+    return getattr(settings, 'PRICE_INDEX_MIN_SAMPLES', 3)
+
+
+def _percentile(ordered, fraction):
+    """Linearly interpolated percentile of the sorted list ``ordered``"""
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _median(prices):
+    return _percentile(sorted(prices), Decimal('0.5'))
+
+
+def _apply(index, observations):
+    """
+    Set ``index`` from ``observations`` ([ISO date, price, source] lists,
+    oldest first), keeping only the most recent window
+    """
+    observations = observations[-_window():]
+    prices = [Decimal(price) for _, price, _ in observations]
+    index.observations = observations
+    index.sample_count = len(prices)
+    if not prices:
+        for field in STATISTIC_FIELDS[2:]:
+            setattr(index, field, '' if field == 'last_source' else None)
+        return index
+
+    ordered = sorted(prices)
+    index.p25_price = _percentile(ordered, Decimal('0.25')).quantize(CENTS)
+    index.median_price = _percentile(ordered, Decimal('0.5')).quantize(CENTS)
+    index.p75_price = _percentile(ordered, Decimal('0.75')).quantize(CENTS)
+
+    observed_on, price, source = observations[-1]
+    index.last_price = Decimal(price)
+    index.last_observed_on = date.fromisoformat(observed_on)
+    index.last_source = source
+
+    half = len(prices) // 2
+    older = _median(prices[:half]) if half >= 2 else None
+    index.trend_percentage = (
+        ((_median(prices[-half:]) - older) / older * HUNDRED).quantize(CENTS) if older else None
+    )
+    return index
+
+
+def _observation(observed_on, price, source):
+    return [observed_on.isoformat(), str(price), source]
+
+
+def _record(observations_by_item):
+    """Insert {item id: [observation, ...]} into the items' indexes"""
+    if not observations_by_item:
+        return
+    with transaction.atomic():
+        ItemPriceIndex.objects.bulk_create(
+            [ItemPriceIndex(item_id=item_id) for item_id in observations_by_item],
+            ignore_conflicts=True,
+        )
+        indexes = list(
+            ItemPriceIndex.objects.select_for_update().filter(
+                item_id__in=observations_by_item
+            ).order_by('item_id')
+        )
+        now = timezone.now()
+        for index in indexes:
+            observations = list(index.observations)
+            for observation in observations_by_item[index.item_id]:
+                insort(observations, observation, key=lambda entry: entry[0])
+            _apply(index, observations)
+            index.updated_at = now
+        ItemPriceIndex.objects.bulk_update(indexes, [*STATISTIC_FIELDS, 'updated_at'])
+
+
+def record_purchase_order(purchase_order):
+    """Add the unit prices of a just-approved purchase order"""
+    observed_on = timezone.localdate(purchase_order.approved_at) if purchase_order.approved_at else timezone.localdate()
+    observations = {}
+    for item_id, unit_price in purchase_order.items.exclude(requisition_item__item=None).values_list(
+        'requisition_item__item_id', 'unit_price'
+    ):
+        observations.setdefault(item_id, []).append(_observation(observed_on, unit_price, 'PO'))
+    _record(observations)
+
+
+def record_bid_item(bid_item):
+    """Add the quoted unit price of a submitted bid line"""
+    item_id = bid_item.requisition_item.item_id
+    if item_id is None:
+        return
+    observed_on = timezone.localdate(bid_item.bid.submitted_at) if bid_item.bid.submitted_at else timezone.localdate()
+    _record({item_id: [_observation(observed_on, bid_item.quoted_unit_price, 'BID')]})
+
+
+def _price_lines():
+    """Every PO and bid price observation as one query, ordered by item and date"""
+    source = CharField(max_length=3)
+    po_lines = PurchaseOrderItem.objects.filter(
+        purchase_order__status__in=ORDERED_PO_STATUSES,
+    ).exclude(requisition_item__item=None).order_by().values(
+        item=F('requisition_item__item_id'),
+        observed_on=Coalesce(TruncDate('purchase_order__approved_at'), F('purchase_order__po_date')),
+        price=F('unit_price'),
+        source=Value('PO', output_field=source),
+    )
+    bid_lines = BidItem.objects.exclude(
+        bid__status__in=EXCLUDED_BID_STATUSES,
+    ).exclude(requisition_item__item=None).order_by().values(
+        item=F('requisition_item__item_id'),
+        observed_on=TruncDate('bid__submitted_at'),
+        price=F('quoted_unit_price'),
+        source=Value('BID', output_field=source),
+    )
+    return po_lines.union(bid_lines, all=True).order_by('item', 'observed_on', 'source')
+
+
+def rebuild():
+    """
+    Recompute every ItemPriceIndex from the full PO and bid history in one
+    grouped pass. Returns the number of items indexed.
+    """
+    started = timezone.now()
+    indexes = []
+    for item_id, lines in groupby(_price_lines().iterator(chunk_size=2000), key=lambda line: line['item']):
+        window = deque(
+            (_observation(line['observed_on'], line['price'], line['source']) for line in lines),
+            maxlen=_window(),
+        )
+        indexes.append(_apply(ItemPriceIndex(item_id=item_id), list(window)))
+
+    with transaction.atomic():
+        ItemPriceIndex.objects.bulk_create(
+            indexes,
+            batch_size=UPSERT_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['item'],
+            update_fields=[*STATISTIC_FIELDS, 'updated_at'],
+        )
+        # Items whose every price was withdrawn since
+        ItemPriceIndex.objects.filter(updated_at__lt=started).delete()
+    return len(indexes)
+
+
+def index_of(item):
+    """The ItemPriceIndex of ``item``, or None"""
+    if item is None:
+        return None
+    try:
+        return item.price_index
+    except ItemPriceIndex.DoesNotExist:
+        return None
+
+
+def price_benchmark(item, price):
+    """
+    How ``price`` compares with the benchmark of ``item``: a dict with
+    the median, quartiles, sample count, deviation from the median in
+    percent and a flag ('HIGH', 'LOW' or ''), or None without enough
+    observations
+    """
+    index = index_of(item)
+    if index is None or index.sample_count < _min_samples() or not index.median_price:
+        return None
+    spread = max(index.p75_price - index.p25_price, index.median_price * MIN_SPREAD)
+    if price > index.p75_price + OUTLIER_FACTOR * spread:
+        flag = 'HIGH'
+    elif price < index.p25_price - OUTLIER_FACTOR * spread:
+        flag = 'LOW'
+    else:
+        flag = ''
+    return {
+        'median': index.median_price,
+        'p25': index.p25_price,
+        'p75': index.p75_price,
+        'samples': index.sample_count,
+        'deviation': ((price - index.median_price) / index.median_price * HUNDRED).quantize(CENTS),
+        'flag': flag,
+    }
+
+
+def suggested_price(item):
+    """
+    Estimated unit price to propose for ``item``: the benchmark median,
+    else the last observed price, else the catalogue standard price
+    """
+    index = index_of(item)
+    if index is not None and index.sample_count >= _min_samples():
+        return index.median_price
+    if index is not None and index.last_price is not None:
+        return index.last_price
+    return item.standard_price if item is not None else None
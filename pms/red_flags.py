@@ -0,0 +1,678 @@
+"""
+Audit red-flag engine.
+
+Each rule is a set-based pass over procurement data that yields scored
+candidates; run_rules() turns them into Finding rows. Findings are keyed
+by a fingerprint so re-running a rule refreshes existing findings (and
+keeps whatever status an auditor gave them) instead of duplicating them.
+Findings a rule no longer detects are marked inactive, not deleted.
+
+Rules are registered with @register. Parameters come from each rule's
+``defaults`` overridden by settings.AUDIT_RULES[code]; extra rules can be
+plugged in by listing their dotted paths in settings.AUDIT_EXTRA_RULES.
+Run the engine with the run_audit_rules management command.
+"""
+
+import hashlib
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min, Q, Sum
+from django.db.models.functions import Lower, Mod, Trim
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from pms.duplicates import near_duplicate_invoices
+from pms.models import Bid, Finding, Invoice, Payment, PurchaseOrder, Requisition, Tender
+
+
+BULK_BATCH_SIZE = 500
+
+RULES = {}
+
+
+def register(rule_class):
+    """Class decorator adding a rule to the engine"""
+    RULES[rule_class.code] = rule_class
+    return rule_class
+
+
+def severity_for(score):
+    if score >= 80:
+        return 'CRITICAL'
+    if score >= 60:
+        return 'HIGH'
+    if score >= 40:
+        return 'MEDIUM'
+    return 'LOW'
+
+
+def fingerprint(*parts):
+    return hashlib.sha256('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _ref(model_name, object_id, label):
+    return {'model': model_name, 'id': str(object_id), 'label': label}
+
+
+def _money(value):
+    return f'KES {value:,.2f}'
+
+
+class Candidate:
+    """A finding produced by one rule run, before it is persisted"""
+
+    def __init__(self, key, title, description, score, model_name, object_id,
+                 related_objects=None, evidence=None, amount=None,
+                 department_id=None, supplier_id=None):
+        self.key = key
+        self.title = title
+        self.description = description
+        self.score = Decimal(min(max(score, 0), 100)).quantize(Decimal('0.01'))
+        self.model_name = model_name
+        self.object_id = str(object_id)
+        self.related_objects = related_objects or []
+        self.evidence = evidence or {}
+        self.amount = amount
+        self.department_id = department_id
+        self.supplier_id = supplier_id
+
+
+class Rule:
+    code = ''
+    title = ''
+    category = 'COMPLIANCE'
+    defaults = {}
+
+    def __init__(self, **overrides):
+        self.params = {**self.defaults, **overrides}
+        self.today = timezone.now().date()
+
+    def since(self):
+        return self.today - timedelta(days=self.params['lookback_days'])
+
+    def since_datetime(self):
+        return timezone.now() - timedelta(days=self.params['lookback_days'])
+
+    def evaluate(self):
+        """Yield Candidate instances"""
+        raise NotImplementedError
+
+
+# ----------------------------------------------------------------------------
+# Rules
+# ----------------------------------------------------------------------------
+
+@register
+class SplitPurchaseRule(Rule):
+    """
+    Several purchase orders to the same supplier for the same department,
+    each below the approval threshold but above it in total within a short
+    window.
+    """
+    code = 'SPLIT_PURCHASE'
+    title = 'Possible split purchase'
+    category = 'COMPLIANCE'
+    defaults = {
+        'lookback_days': 365,
+        'window_days': 14,
+        'threshold': 1000000,
+        'min_orders': 2,
+    }
+
+    def evaluate(self):
+        threshold = Decimal(self.params['threshold'])
+        window = timedelta(days=self.params['window_days'])
+
+        orders = PurchaseOrder.objects.filter(
+            po_date__gte=self.since(),
+            total_amount__lt=threshold,
+        ).exclude(status='CANCELLED').order_by(
+            'requisition__department_id', 'supplier_id', 'po_date'
+        ).values_list(
+            'id', 'po_number', 'po_date', 'total_amount',
+            'requisition__department_id', 'supplier_id',
+        )
+
+        groups = defaultdict(list)
+        for row in orders:
+            groups[(row[4], row[5])].append(row)
+
+        for (department_id, supplier_id), rows in groups.items():
+            yield from self._clusters(department_id, supplier_id, rows, window, threshold)
+
+    def _clusters(self, department_id, supplier_id, rows, window, threshold):
+        # Sliding window over orders sorted by date; overlapping windows that
+        # trip the rule are merged into one cluster
+        flagged = []
+        left = 0
+        running = Decimal('0')
+        for right, row in enumerate(rows):
+            running += row[3]
+            while row[2] - rows[left][2] > window:
+                running -= rows[left][3]
+                left += 1
+            if right - left + 1 >= self.params['min_orders'] and running >= threshold:
+                if flagged and left <= flagged[-1][1]:
+                    flagged[-1][1] = right
+                else:
+                    flagged.append([left, right])
+
+        for start, end in flagged:
+            cluster = rows[start:end + 1]
+            total = sum(row[3] for row in cluster)
+            days = (cluster[-1][2] - cluster[0][2]).days
+            score = 50 + 10 * (len(cluster) - 2) + 25 * min(total / threshold - 1, 1)
+            yield Candidate(
+                key=(department_id, supplier_id, cluster[0][0]),
+                title=f'{len(cluster)} purchase orders totalling {_money(total)} within {days} days',
+                description=(
+                    f'Orders {", ".join(row[1] for row in cluster)} were each below the '
+                    f'{_money(threshold)} threshold but together exceed it.'
+                ),
+                score=float(score),
+                model_name='PurchaseOrder',
+                object_id=cluster[0][0],
+                related_objects=[_ref('PurchaseOrder', row[0], row[1]) for row in cluster],
+                evidence={
+                    'order_count': len(cluster),
+                    'total': str(total),
+                    'threshold': str(threshold),
+                    'days': days,
+                },
+                amount=total,
+                department_id=department_id,
+                supplier_id=supplier_id,
+            )
+
+
+@register
+class BidClusteringRule(Rule):
+    """Bids on one tender priced suspiciously close together"""
+    code = 'BID_CLUSTERING'
+    title = 'Clustered bid prices'
+    category = 'COMPLIANCE'
+    defaults = {
+        'lookback_days': 365,
+        'min_bids': 3,
+        'max_spread': 0.02,
+    }
+
+    def evaluate(self):
+        max_spread = self.params['max_spread']
+        tenders = Tender.objects.filter(
+            closing_date__gte=self.since_datetime(),
+        ).exclude(status__in=['DRAFT', 'CANCELLED']).annotate(
+            bid_count=Count('bids', filter=~Q(bids__status='DISQUALIFIED')),
+            low_bid=Min('bids__bid_amount', filter=~Q(bids__status='DISQUALIFIED')),
+            high_bid=Max('bids__bid_amount', filter=~Q(bids__status='DISQUALIFIED')),
+            mean_bid=Avg('bids__bid_amount', filter=~Q(bids__status='DISQUALIFIED')),
+        ).filter(
+            bid_count__gte=self.params['min_bids'],
+            mean_bid__gt=0,
+        ).values_list(
+            'id', 'tender_number', 'bid_count', 'low_bid', 'high_bid', 'mean_bid',
+            'requisition__department_id',
+        )
+
+        for tender_id, number, bid_count, low, high, mean, department_id in tenders:
+            spread = float(high - low) / float(mean)
+            if spread > max_spread:
+                continue
+            yield Candidate(
+                key=(tender_id,),
+                title=f'{bid_count} bids on {number} within {spread:.2%} of each other',
+                description=(
+                    f'Bids ranged from {_money(low)} to {_money(high)}. Prices this close '
+                    f'can indicate bid rigging or cover pricing.'
+                ),
+                score=60 + 40 * (1 - spread / max_spread) if max_spread else 100,
+                model_name='Tender',
+                object_id=tender_id,
+                related_objects=[_ref('Tender', tender_id, number)],
+                evidence={
+                    'bid_count': bid_count,
+                    'low': str(low),
+                    'high': str(high),
+                    'spread': round(spread, 6),
+                },
+                amount=low,
+                department_id=department_id,
+            )
+
+
+@register
+class SupplierConcentrationRule(Rule):
+    """One supplier receiving most of a department's purchase order spend"""
+    code = 'SUPPLIER_CONCENTRATION'
+    title = 'Supplier concentration'
+    category = 'OPERATIONAL'
+    defaults = {
+        'lookback_days': 365,
+        'max_share': 0.5,
+        'min_department_spend': 500000,
+        'min_orders': 3,
+    }
+
+    def evaluate(self):
+        max_share = self.params['max_share']
+        orders = PurchaseOrder.objects.filter(
+            po_date__gte=self.since(),
+        ).exclude(status__in=['DRAFT', 'CANCELLED'])
+
+        department_spend = dict(
+            orders.values('requisition__department_id').annotate(
+                spend=Sum('total_amount')
+            ).values_list('requisition__department_id', 'spend')
+        )
+
+        per_supplier = orders.values(
+            'requisition__department_id', 'requisition__department__name',
+            'supplier_id', 'supplier__name',
+        ).annotate(
+            spend=Sum('total_amount'), order_count=Count('id'),
+        ).filter(order_count__gte=self.params['min_orders'])
+
+        for row in per_supplier:
+            department_id = row['requisition__department_id']
+            total = department_spend.get(department_id) or 0
+            if total < self.params['min_department_spend']:
+                continue
+            share = float(row['spend'] / total)
+            if share < max_share:
+                continue
+            yield Candidate(
+                key=(department_id, row['supplier_id']),
+                title=(
+                    f"{row['supplier__name']} received {share:.0%} of "
+                    f"{row['requisition__department__name']} spend"
+                ),
+                description=(
+                    f"{row['order_count']} orders worth {_money(row['spend'])} out of "
+                    f"{_money(total)} in the last {self.params['lookback_days']} days."
+                ),
+                score=40 + 60 * (share - max_share) / (1 - max_share) if max_share < 1 else 40,
+                model_name='Supplier',
+                object_id=row['supplier_id'],
+                related_objects=[_ref('Supplier', row['supplier_id'], row['supplier__name'])],
+                evidence={
+                    'share': round(share, 4),
+                    'supplier_spend': str(row['spend']),
+                    'department_spend': str(total),
+                    'order_count': row['order_count'],
+                },
+                amount=row['spend'],
+                department_id=department_id,
+                supplier_id=row['supplier_id'],
+            )
+
+
+@register
+class RepeatedWinnerRule(Rule):
+    """A supplier winning nearly every tender it bids on"""
+    code = 'REPEATED_WINNER'
+    title = 'Repeated tender winner'
+    category = 'COMPLIANCE'
+    defaults = {
+        'lookback_days': 365,
+        'min_wins': 3,
+        'min_win_rate': 0.75,
+    }
+
+    def evaluate(self):
+        suppliers = Bid.objects.filter(
+            submitted_at__gte=self.since_datetime(),
+        ).values('supplier_id', 'supplier__name').annotate(
+            bids=Count('id'),
+            wins=Count('id', filter=Q(status='AWARDED')),
+            won_value=Sum('bid_amount', filter=Q(status='AWARDED')),
+        ).filter(wins__gte=self.params['min_wins'])
+
+        for row in suppliers:
+            win_rate = row['wins'] / row['bids']
+            if win_rate < self.params['min_win_rate']:
+                continue
+            yield Candidate(
+                key=(row['supplier_id'],),
+                title=f"{row['supplier__name']} won {row['wins']} of {row['bids']} bids",
+                description=(
+                    f"Awards worth {_money(row['won_value'])} in the last "
+                    f"{self.params['lookback_days']} days ({win_rate:.0%} win rate)."
+                ),
+                score=50 + 50 * (win_rate - self.params['min_win_rate']) / (1 - self.params['min_win_rate'])
+                if self.params['min_win_rate'] < 1 else 50,
+                model_name='Supplier',
+                object_id=row['supplier_id'],
+                related_objects=[_ref('Supplier', row['supplier_id'], row['supplier__name'])],
+                evidence={'bids': row['bids'], 'wins': row['wins'], 'win_rate': round(win_rate, 4)},
+                amount=row['won_value'],
+                supplier_id=row['supplier_id'],
+            )
+
+
+@register
+class DuplicateInvoiceRule(Rule):
+    """The same supplier invoice number entered more than once"""
+    code = 'DUPLICATE_INVOICE'
+    title = 'Duplicate invoice number'
+    category = 'FINANCIAL'
+    defaults = {
+        'lookback_days': 730,
+    }
+
+    def evaluate(self):
+        invoices = Invoice.objects.filter(
+            invoice_date__gte=self.since(),
+        ).exclude(status='REJECTED').annotate(
+            normalised=Lower(Trim('supplier_invoice_number')),
+        )
+
+        duplicates = invoices.values('supplier_id', 'normalised').annotate(
+            copies=Count('id'),
+        ).filter(copies__gt=1)
+        keys = {(row['supplier_id'], row['normalised']) for row in duplicates}
+        if not keys:
+            return
+
+        groups = defaultdict(list)
+        for row in invoices.filter(
+            supplier_id__in={supplier_id for supplier_id, _ in keys}
+        ).values_list(
+            'id', 'invoice_number', 'supplier_id', 'normalised', 'total_amount', 'status',
+            'purchase_order__requisition__department_id',
+        ).order_by('invoice_date'):
+            if (row[2], row[3]) in keys:
+                groups[(row[2], row[3])].append(row)
+
+        for (supplier_id, number), rows in groups.items():
+            paid = [row for row in rows if row[5] == 'PAID']
+            total = sum(row[4] for row in rows)
+            yield Candidate(
+                key=(supplier_id, number),
+                title=f'Supplier invoice {rows[0][3].upper()} recorded {len(rows)} times',
+                description=(
+                    f'Invoices {", ".join(row[1] for row in rows)} share a supplier invoice '
+                    f'number; {len(paid)} already paid.'
+                ),
+                score=70 + 10 * min(len(paid), 3),
+                model_name='Invoice',
+                object_id=rows[-1][0],
+                related_objects=[_ref('Invoice', row[0], row[1]) for row in rows],
+                evidence={'copies': len(rows), 'paid': len(paid), 'total': str(total)},
+                amount=total,
+                department_id=rows[-1][6],
+                supplier_id=supplier_id,
+            )
+
+
+@register
+class NearDuplicateInvoiceRule(Rule):
+    """Invoices from one supplier whose numbers differ by a typo or two"""
+    code = 'NEAR_DUPLICATE_INVOICE'
+    title = 'Near-duplicate invoice'
+    category = 'FINANCIAL'
+    defaults = {
+        'lookback_days': 730,
+        'max_distance': 2,
+        'window': 5,
+        'amount_tolerance': 0.01,
+    }
+
+    def evaluate(self):
+        invoices = Invoice.objects.filter(
+            invoice_date__gte=self.since(),
+        ).exclude(status='REJECTED').only(
+            'id', 'invoice_number', 'supplier_invoice_number', 'supplier_id',
+            'total_amount', 'status',
+        )
+
+        pairs = near_duplicate_invoices(
+            invoices.iterator(chunk_size=2000),
+            max_distance=self.params['max_distance'],
+            window=self.params['window'],
+            amount_tolerance=self.params['amount_tolerance'],
+        )
+        for first, second, distance in pairs:
+            # Identical numbers are reported by DUPLICATE_INVOICE
+            if distance == 0:
+                continue
+            first, second = sorted((first, second), key=lambda invoice: invoice.invoice_number)
+            paid = sum(1 for invoice in (first, second) if invoice.status == 'PAID')
+            yield Candidate(
+                key=(first.id, second.id),
+                title=(
+                    f'{first.supplier_invoice_number} and {second.supplier_invoice_number} '
+                    f'look like the same invoice'
+                ),
+                description=(
+                    f'Invoices {first.invoice_number} and {second.invoice_number} have supplier '
+                    f'numbers {distance} edit(s) apart and amounts within '
+                    f"{self.params['amount_tolerance']:.0%}; {paid} already paid."
+                ),
+                score=55 + 15 * (self.params['max_distance'] - distance + 1) / self.params['max_distance'] + 10 * paid,
+                model_name='Invoice',
+                object_id=second.id,
+                related_objects=[
+                    _ref('Invoice', invoice.id, invoice.invoice_number) for invoice in (first, second)
+                ],
+                evidence={
+                    'distance': distance,
+                    'amounts': [str(first.total_amount), str(second.total_amount)],
+                    'paid': paid,
+                },
+                amount=max(first.total_amount, second.total_amount),
+                supplier_id=first.supplier_id,
+            )
+
+
+@register
+class RoundAmountPaymentRule(Rule):
+    """Large payments in suspiciously round amounts"""
+    code = 'ROUND_AMOUNT'
+    title = 'Round-amount payment'
+    category = 'FINANCIAL'
+    defaults = {
+        'lookback_days': 365,
+        'min_amount': 100000,
+        'round_to': 10000,
+    }
+
+    def evaluate(self):
+        round_to = Decimal(self.params['round_to'])
+        payments = Payment.objects.filter(
+            payment_date__gte=self.since(),
+            payment_amount__gte=self.params['min_amount'],
+        ).exclude(status__in=['FAILED', 'CANCELLED']).annotate(
+            remainder=Mod('payment_amount', round_to),
+        ).filter(remainder=0).values_list(
+            'id', 'payment_number', 'payment_amount', 'invoice__supplier_id',
+            'invoice__purchase_order__requisition__department_id',
+        )
+
+        for payment_id, number, amount, supplier_id, department_id in payments:
+            # Rounder (and larger) amounts score higher
+            rounder = amount % (round_to * 10) == 0
+            yield Candidate(
+                key=(payment_id,),
+                title=f'Payment {number} of exactly {_money(amount)}',
+                description='Exact round-number payments are uncommon for invoiced goods and services.',
+                score=30 + (15 if rounder else 0) + min(float(amount) / 1000000, 1) * 15,
+                model_name='Payment',
+                object_id=payment_id,
+                related_objects=[_ref('Payment', payment_id, number)],
+                evidence={'amount': str(amount), 'round_to': str(round_to)},
+                amount=amount,
+                department_id=department_id,
+                supplier_id=supplier_id,
+            )
+
+
+@register
+class BelowThresholdRule(Rule):
+    """Requisitions and invoices priced just under an approval threshold"""
+    code = 'BELOW_THRESHOLD'
+    title = 'Amount just below approval threshold'
+    category = 'COMPLIANCE'
+    defaults = {
+        'lookback_days': 365,
+        'thresholds': [500000, 1000000],
+        'margin': 0.03,
+    }
+
+    def _just_below(self, field):
+        condition = Q()
+        for threshold in self.params['thresholds']:
+            threshold = Decimal(threshold)
+            floor = threshold * (1 - Decimal(str(self.params['margin'])))
+            condition |= Q(**{f'{field}__gte': floor, f'{field}__lt': threshold})
+        return condition
+
+    def _threshold_for(self, amount):
+        return min(Decimal(t) for t in self.params['thresholds'] if amount < Decimal(t))
+
+    def _candidate(self, model_name, object_id, number, amount, department_id, supplier_id=None):
+        threshold = self._threshold_for(amount)
+        gap = float((threshold - amount) / threshold)
+        return Candidate(
+            key=(model_name, object_id),
+            title=f'{number}: {_money(amount)} is {gap:.1%} below {_money(threshold)}',
+            description='Amounts set just under an approval threshold can indicate threshold avoidance.',
+            score=35 + 30 * (1 - gap / self.params['margin']),
+            model_name=model_name,
+            object_id=object_id,
+            related_objects=[_ref(model_name, object_id, number)],
+            evidence={'amount': str(amount), 'threshold': str(threshold), 'gap': round(gap, 4)},
+            amount=amount,
+            department_id=department_id,
+            supplier_id=supplier_id,
+        )
+
+    def evaluate(self):
+        if not self.params['thresholds']:
+            return
+        since = self.since()
+
+        for row in Requisition.objects.filter(
+            self._just_below('estimated_amount'), created_at__gte=self.since_datetime(),
+        ).exclude(status__in=['DRAFT', 'CANCELLED']).values_list(
+            'id', 'requisition_number', 'estimated_amount', 'department_id',
+        ):
+            yield self._candidate('Requisition', *row)
+
+        for object_id, number, amount, department_id, supplier_id in Invoice.objects.filter(
+            self._just_below('total_amount'), invoice_date__gte=since,
+        ).exclude(status='REJECTED').values_list(
+            'id', 'invoice_number', 'total_amount',
+            'purchase_order__requisition__department_id', 'supplier_id',
+        ):
+            yield self._candidate('Invoice', object_id, number, amount, department_id, supplier_id)
+
+
+# ----------------------------------------------------------------------------
+# Engine
+# ----------------------------------------------------------------------------
+
+def _load_extra_rules():
+    for path in getattr(settings, 'AUDIT_EXTRA_RULES', ()):
+        rule_class = import_string(path)
+        RULES.setdefault(rule_class.code, rule_class)
+
+
+def get_rules(codes=None):
+    """Instantiate enabled rules (optionally only ``codes``) with configured parameters"""
+    _load_extra_rules()
+    config = getattr(settings, 'AUDIT_RULES', {})
+    rules = []
+    for code, rule_class in RULES.items():
+        if codes and code not in codes:
+            continue
+        overrides = dict(config.get(code, {}))
+        if not overrides.pop('enabled', True):
+            continue
+        rules.append(rule_class(**overrides))
+    return rules
+
+
+def _store(rule, candidates):
+    """Upsert one rule's candidates; returns (created, updated, retired)"""
+    now = timezone.now()
+    by_fingerprint = {
+        fingerprint(rule.code, *candidate.key): candidate
+        for candidate in candidates
+    }
+
+    with transaction.atomic():
+        existing = {
+            finding.fingerprint: finding
+            for finding in Finding.objects.filter(
+                rule_code=rule.code, fingerprint__in=list(by_fingerprint)
+            )
+        }
+
+        new_findings = []
+        changed = []
+        for key, candidate in by_fingerprint.items():
+            finding = existing.get(key) or Finding(
+                rule_code=rule.code,
+                fingerprint=key,
+                category=rule.category,
+                first_detected_at=now,
+            )
+            finding.title = candidate.title[:300]
+            finding.description = candidate.description
+            finding.score = candidate.score
+            finding.severity = severity_for(candidate.score)
+            finding.model_name = candidate.model_name
+            finding.object_id = candidate.object_id
+            finding.related_objects = candidate.related_objects
+            finding.evidence = candidate.evidence
+            finding.amount = candidate.amount
+            finding.department_id = candidate.department_id
+            finding.supplier_id = candidate.supplier_id
+            finding.is_active = True
+            finding.last_detected_at = now
+            (changed if key in existing else new_findings).append(finding)
+
+        Finding.objects.bulk_create(new_findings, batch_size=BULK_BATCH_SIZE)
+        Finding.objects.bulk_update(changed, [
+            'title', 'description', 'score', 'severity', 'model_name', 'object_id',
+            'related_objects', 'evidence', 'amount', 'department_id', 'supplier_id',
+            'is_active', 'last_detected_at',
+        ], batch_size=BULK_BATCH_SIZE)
+
+        retired = Finding.objects.filter(
+            rule_code=rule.code, is_active=True
+        ).exclude(fingerprint__in=list(by_fingerprint)).update(is_active=False)
+
+    return len(new_findings), len(changed), retired
+
+
+def run_rules(codes=None):
+    """Run the enabled rules and store their findings; returns stats per rule code"""
+    results = {}
+    for rule in get_rules(codes):
+        candidates = list(rule.evaluate())
+        created, updated, retired = _store(rule, candidates)
+        results[rule.code] = {
+            'detected': len(candidates),
+            'created': created,
+            'updated': updated,
+            'retired': retired,
+        }
+    return results
+
+
+def finding_summary(queryset=None):
+    """Conditional counts used by the auditor pages"""
+    if queryset is None:
+        queryset = Finding.objects.filter(is_active=True)
+    return queryset.aggregate(
+        total=Count('id'),
+        critical=Count('id', filter=Q(severity='CRITICAL')),
+        high=Count('id', filter=Q(severity='HIGH')),
+        open=Count('id', filter=Q(status__in=['OPEN', 'IN_PROGRESS'])),
+        resolved=Count('id', filter=Q(status__in=['RESOLVED', 'CLOSED'])),
+    )
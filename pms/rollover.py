@@ -0,0 +1,347 @@
+"""
+Budget year rollover.
+
+rollover() opens a new budget year from the one being closed, in one
+transaction:
+
+1. Budget lines are cloned (same department, category, type and
+   reference) with allocated_amount scaled by ``allocation_factor``.
+   Lines that already exist in the new year are reused as they are.
+2. Open commitments move to the new year. An open commitment is the
+   unpaid value of an approved or sent purchase order that is not yet
+   fully delivered. Its requisition is re-pointed at the new year's
+   budget line, and the amount moves from the old line's
+   committed_amount to the new one's.
+3. Plan items still PLANNED or IN_PROGRESS are copied, with their
+   unrequisitioned quantity and cost, into the department's plan for
+   the new year. The plan is created as a draft if needed. Their
+   unrequisitioned cost moves to the new budget line the same way, and
+   the old items become CARRIED_FORWARD.
+
+Each step reads the old year with one query and writes with
+bulk_create / bulk_update / update, so the run takes a fixed number of
+queries plus one per batch of rows, whatever the size of the year.
+Already-moved requisitions and CARRIED_FORWARD items are not picked up
+again, so a rerun only carries what is new.
+
+The returned RolloverReport reconciles both years per department from
+the figures read back after the writes: committed_amount released by
+the old year must equal what the new year received.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from pms.budget_analytics import invalidate
+from pms.models import (
+    Budget, Payment, ProcurementPlan, ProcurementPlanItem, PurchaseOrder, Requisition,
+)
+
+
+OPEN_PO_STATUSES = ('APPROVED', 'SENT', 'ACKNOWLEDGED', 'PARTIAL_DELIVERY')
+OPEN_PLAN_ITEM_STATUSES = ('PLANNED', 'IN_PROGRESS')
+
+BATCH_SIZE = 500
+ZERO = Decimal('0')
+
+
+@dataclass
+class DepartmentReconciliation:
+    department: str
+    budget_lines: int = 0
+    old_allocated: Decimal = ZERO
+    old_spent: Decimal = ZERO
+    old_committed: Decimal = ZERO
+    old_closing_committed: Decimal = ZERO
+    purchase_orders_carried: int = 0
+    commitments_carried: Decimal = ZERO
+    plan_items_carried: int = 0
+    plan_value_carried: Decimal = ZERO
+    new_allocated: Decimal = ZERO
+    new_opening_committed: Decimal = ZERO
+    new_committed: Decimal = ZERO
+
+    @property
+    def carried_out(self):
+        return self.old_committed - self.old_closing_committed
+
+    @property
+    def carried_in(self):
+        return self.new_committed - self.new_opening_committed
+
+    @property
+    def old_unspent(self):
+        return self.old_allocated - self.old_closing_committed - self.old_spent
+
+
+@dataclass
+class RolloverReport:
+    from_year: str
+    to_year: str
+    budgets_created: int = 0
+    budgets_reused: int = 0
+    plans_created: int = 0
+    departments: dict = field(default_factory=dict)
+
+    def department(self, name):
+        if name not in self.departments:
+            self.departments[name] = DepartmentReconciliation(name)
+        return self.departments[name]
+
+    def rows(self):
+        return [self.departments[name] for name in sorted(self.departments)]
+
+    @property
+    def carried_out(self):
+        return sum((row.carried_out for row in self.departments.values()), ZERO)
+
+    @property
+    def carried_in(self):
+        return sum((row.carried_in for row in self.departments.values()), ZERO)
+
+    @property
+    def balanced(self):
+        """
+        Whether committed_amount released from the old year equals what the
+        new year received. It differs only where an old budget line had
+        less committed than the commitments carried off it (release is
+        capped at zero).
+        """
+        return self.carried_out == self.carried_in
+
+
+def _budget_key(budget):
+    return budget.department_id, budget.category_id, budget.reference_number
+
+
+def _clone_budgets(from_year, to_year, allocation_factor, user, report):
+    """Map old budget id -> new year Budget, creating missing lines"""
+    old_budgets = list(
+        Budget.objects.select_for_update(of=('self',)).filter(
+            budget_year=from_year, is_active=True
+        ).select_related('department')
+    )
+    existing = {
+        _budget_key(budget): budget
+        for budget in Budget.objects.select_for_update().filter(budget_year=to_year)
+    }
+
+    created = []
+    mapping = {}
+    for old in old_budgets:
+        line = report.department(old.department.name)
+        line.budget_lines += 1
+        line.old_allocated += old.allocated_amount
+        line.old_committed += old.committed_amount
+        line.old_spent += old.actual_spent
+
+        new = existing.get(_budget_key(old))
+        if new is not None:
+            line.new_opening_committed += new.committed_amount
+        else:
+            new = Budget(
+                budget_year=to_year,
+                department_id=old.department_id,
+                category_id=old.category_id,
+                budget_type=old.budget_type,
+                allocated_amount=(old.allocated_amount * allocation_factor).quantize(Decimal('0.01')),
+                reference_number=old.reference_number,
+                description=old.description,
+                created_by=user,
+            )
+            existing[_budget_key(old)] = new
+            created.append(new)
+        mapping[old.pk] = new
+
+    Budget.objects.bulk_create(created, batch_size=BATCH_SIZE)
+    report.budgets_created = len(created)
+    report.budgets_reused = len({new.pk for new in mapping.values()}) - len(created)
+    return old_budgets, mapping
+
+
+def _open_commitments(from_year):
+    """Open purchase orders charged to ``from_year`` with their unpaid value"""
+    decimal = DecimalField(max_digits=15, decimal_places=2)
+    paid = Payment.objects.filter(
+        invoice__purchase_order=OuterRef('pk'), status='COMPLETED'
+    ).order_by().values('invoice__purchase_order').annotate(
+        total=Sum('payment_amount')
+    ).values('total')
+    return PurchaseOrder.objects.filter(
+        status__in=OPEN_PO_STATUSES,
+        requisition__budget__budget_year=from_year,
+        requisition__budget__is_active=True,
+    ).annotate(
+        paid=Coalesce(Subquery(paid, output_field=decimal), Value(ZERO), output_field=decimal),
+    ).values('id', 'requisition_id', 'requisition__budget_id', 'total_amount', 'paid')
+
+
+def _carry_commitments(from_year, old_budgets, mapping, report):
+    """Re-point requisitions of open orders; returns {old budget id: unpaid amount}"""
+    old_by_id = {budget.pk: budget for budget in old_budgets}
+    carried = defaultdict(Decimal)
+    requisitions = {}
+    for po in _open_commitments(from_year):
+        budget_id = po['requisition__budget_id']
+        requisitions[po['requisition_id']] = mapping[budget_id]
+        line = report.department(old_by_id[budget_id].department.name)
+        line.purchase_orders_carried += 1
+        outstanding = po['total_amount'] - po['paid']
+        if outstanding > 0:
+            line.commitments_carried += outstanding
+            carried[budget_id] += outstanding
+
+    # Payments against carried orders now draw on the new year's lines
+    moved = list(Requisition.objects.filter(pk__in=requisitions).only('id', 'budget_id'))
+    for requisition in moved:
+        requisition.budget = requisitions[requisition.pk]
+    Requisition.objects.bulk_update(moved, ['budget'], batch_size=BATCH_SIZE)
+    return carried
+
+
+def _move_commitments(old_budgets, mapping, carried):
+    """Move ``carried`` {old budget id: amount} from old to new committed_amount"""
+    old_by_id = {budget.pk: budget for budget in old_budgets}
+    changed_old, changed_new = [], {}
+    for budget_id, amount in carried.items():
+        old = old_by_id[budget_id]
+        old.committed_amount = max(old.committed_amount - amount, ZERO)
+        changed_old.append(old)
+        new = mapping[budget_id]
+        new.committed_amount = (new.committed_amount or ZERO) + amount
+        changed_new[new.pk] = new
+
+    Budget.objects.bulk_update(changed_old, ['committed_amount'], batch_size=BATCH_SIZE)
+    Budget.objects.bulk_update(list(changed_new.values()), ['committed_amount'], batch_size=BATCH_SIZE)
+
+
+def _next_plan_numbers(to_year, count):
+    """Plan numbers in the same series as ProcurementPlan.save()"""
+    prefix = f"PP-{to_year.name.replace('/', '-')}"
+    last_plan = ProcurementPlan.objects.filter(
+        plan_number__startswith=prefix
+    ).order_by('-plan_number').first()
+    start = int(last_plan.plan_number.split('-')[-1]) + 1 if last_plan else 1
+    return [f'{prefix}-{number:04d}' for number in range(start, start + count)]
+
+
+def _carry_plan_items(from_year, to_year, mapping, user, report):
+    """Copy unfinished plan items forward; returns {old budget id: value carried}"""
+    old_items = list(
+        ProcurementPlanItem.objects.filter(
+            procurement_plan__budget_year=from_year,
+            status__in=OPEN_PLAN_ITEM_STATUSES,
+            quantity__gt=F('quantity_requisitioned'),
+            estimated_cost__gt=F('amount_committed'),
+        ).select_related('procurement_plan__department').order_by(
+            'procurement_plan__department__name', 'procurement_plan__plan_number', 'sequence'
+        )
+    )
+    if not old_items:
+        return {}
+
+    departments = {item.procurement_plan.department_id: item.procurement_plan.department for item in old_items}
+    plans = {
+        plan.department_id: plan
+        for plan in ProcurementPlan.objects.select_for_update().filter(
+            budget_year=to_year, department_id__in=departments
+        )
+    }
+    missing = [department for pk, department in departments.items() if pk not in plans]
+    new_plans = [
+        ProcurementPlan(
+            plan_number=number,
+            budget_year=to_year,
+            department=department,
+            title=f'{department.name} Procurement Plan {to_year.name}',
+            description=f'Opened by the {report.from_year} rollover with carried-forward items.',
+            status='DRAFT',
+            submitted_by=user,
+        )
+        for department, number in zip(missing, _next_plan_numbers(to_year, len(missing)))
+    ]
+    ProcurementPlan.objects.bulk_create(new_plans, batch_size=BATCH_SIZE)
+    plans.update({plan.department_id: plan for plan in new_plans})
+    report.plans_created = len(new_plans)
+
+    sequences = defaultdict(int)
+    sequences.update(
+        ProcurementPlanItem.objects.filter(procurement_plan__in=plans.values()).order_by().values(
+            'procurement_plan_id'
+        ).annotate(last=Max('sequence')).values_list('procurement_plan_id', 'last')
+    )
+
+    new_items = []
+    carried = defaultdict(Decimal)
+    for old in old_items:
+        plan = plans[old.procurement_plan.department_id]
+        sequences[plan.pk] += 1
+        new_items.append(ProcurementPlanItem(
+            procurement_plan=plan,
+            item_id=old.item_id,
+            item_type=old.item_type,
+            description=old.description,
+            specifications=old.specifications,
+            quantity=old.remaining_quantity,
+            unit_of_measure=old.unit_of_measure,
+            estimated_cost=old.remaining_budget,
+            budget=mapping.get(old.budget_id),
+            procurement_method=old.procurement_method,
+            planned_quarter=old.planned_quarter,
+            source_of_funds=old.source_of_funds,
+            sequence=sequences[plan.pk],
+            notes=f'Carried forward from {old.procurement_plan.plan_number} item {old.sequence}',
+        ))
+        line = report.department(old.procurement_plan.department.name)
+        line.plan_items_carried += 1
+        line.plan_value_carried += old.remaining_budget
+        if old.budget_id in mapping:
+            carried[old.budget_id] += old.remaining_budget
+
+    ProcurementPlanItem.objects.bulk_create(new_items, batch_size=BATCH_SIZE)
+    ProcurementPlanItem.objects.filter(pk__in=[item.pk for item in old_items]).update(
+        status='CARRIED_FORWARD'
+    )
+    return carried
+
+
+def _reconcile(old_budgets, mapping, report):
+    """Closing figures of both years, read back after the writes"""
+    figures = Budget.objects.filter(
+        pk__in=[budget.pk for budget in old_budgets] + [new.pk for new in mapping.values()]
+    ).order_by().values('budget_year_id', 'department__name').annotate(
+        allocated=Sum('allocated_amount'), committed=Sum('committed_amount')
+    )
+    old_year_id = old_budgets[0].budget_year_id
+    for row in figures:
+        line = report.department(row['department__name'])
+        if row['budget_year_id'] == old_year_id:
+            line.old_closing_committed = row['committed']
+        else:
+            line.new_allocated = row['allocated']
+            line.new_committed = row['committed']
+
+
+def rollover(from_year, to_year, allocation_factor=Decimal('1'), user=None):
+    """Roll ``from_year`` over into ``to_year``; returns a RolloverReport"""
+    if from_year.pk == to_year.pk:
+        raise ValueError('Cannot roll a budget year over into itself')
+
+    report = RolloverReport(from_year=from_year.name, to_year=to_year.name)
+    with transaction.atomic():
+        old_budgets, mapping = _clone_budgets(from_year, to_year, allocation_factor, user, report)
+        if not old_budgets:
+            raise ValueError(f'{from_year.name} has no active budget lines to roll over')
+
+        carried = _carry_commitments(from_year, old_budgets, mapping, report)
+        for budget_id, amount in _carry_plan_items(from_year, to_year, mapping, user, report).items():
+            carried[budget_id] += amount
+        _move_commitments(old_budgets, mapping, carried)
+        _reconcile(old_budgets, mapping, report)
+        invalidate()
+    return report
@@ -0,0 +1,256 @@
+"""
+Supplier spend concentration and Pareto (ABC) analysis.
+
+For one budget year, the lines of ordered purchase orders are read in a
+single query, grouped by supplier x catalogue item (with the item's
+category) and sorted by spend. From those rows, spend is summed per
+supplier, per item and per item category. Each dimension is then sorted
+once, and one pass down the sorted list accumulates the cumulative spend
+curve and assigns a class:
+
+- A: the largest spenders making up the first SPEND_ABC_A_SHARE percent
+- B: the next ones, up to SPEND_ABC_B_SHARE percent
+- C: the rest, i.e. the tail spend
+
+A category gets a Herfindahl-Hirschman index (HHI) instead of a class.
+This is the sum of its suppliers' squared percentage shares, from
+0 (fragmented) to 10,000 (a single supplier). Lines not linked to a
+catalogue item count towards supplier spend only.
+
+refresh() replaces the year's SpendConcentration rows (see the
+refresh_spend_concentration command). concentration_report() and
+concentration_rows() read them back for the procurement reports page and
+its CSV export.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from pms.models import PurchaseOrderItem, SpendConcentration
+from pms.plan_execution import ORDERED_PO_STATUSES
+
+
+DIMENSIONS = ('SUPPLIER', 'ITEM', 'CATEGORY')
+
+# Which foreign key of SpendConcentration a dimension's rows point to
+DIMENSION_FIELDS = {'SUPPLIER': 'supplier_id', 'ITEM': 'item_id', 'CATEGORY': 'category_id'}
+
+ZERO = Decimal('0')
+HUNDRED = Decimal('100')
+SHARE_PLACES = Decimal('0.0001')
+HHI_PLACES = Decimal('0.01')
+
+# HHI bands used by competition authorities
+HHI_MODERATE = 1500
+HHI_HIGH = 2500
+
+
+def _thresholds():
+    return (
+        Decimal(str(getattr(settings, 'SPEND_ABC_A_SHARE', 80))),
+        Decimal(str(getattr(settings, 'SPEND_ABC_B_SHARE', 95))),
+    )
+
+
+def _grouped_spend(budget_year):
+    return PurchaseOrderItem.objects.filter(
+        purchase_order__status__in=ORDERED_PO_STATUSES,
+        purchase_order__po_date__gte=budget_year.start_date,
+        purchase_order__po_date__lte=budget_year.end_date,
+    ).order_by().values(
+        'purchase_order__supplier_id', 'purchase_order__supplier__name',
+        'requisition_item__item_id', 'requisition_item__item__name',
+        'requisition_item__item__category_id', 'requisition_item__item__category__name',
+    ).annotate(spend=Sum('total_price')).order_by('-spend')
+
+
+def _ranked(totals, names, a_share=None, b_share=None):
+    """
+    (key, rank, spend, share, cumulative share, class) per key of
+    ``totals`` ({key: spend}), largest spend first. The class is blank
+    without thresholds. A key is classed by the cumulative share before
+    it, so the one crossing a threshold still belongs to the upper class.
+    """
+    total = sum(totals.values(), ZERO)
+    cumulative = ZERO
+    ranked = []
+    for rank, key in enumerate(sorted(totals, key=lambda key: (-totals[key], names[key])), 1):
+        spend = totals[key]
+        if a_share is None:
+            abc_class = ''
+        elif cumulative < a_share:
+            abc_class = 'A'
+        elif cumulative < b_share:
+            abc_class = 'B'
+        else:
+            abc_class = 'C'
+        share = spend / total * HUNDRED if total else ZERO
+        cumulative += share
+        ranked.append((
+            key, rank, spend, share.quantize(SHARE_PLACES),
+            min(cumulative, HUNDRED).quantize(SHARE_PLACES), abc_class,
+        ))
+    return ranked
+
+
+def abc_summary(totals, names):
+    """
+    Count, spend and share of each ABC class of ``totals`` ({key: spend},
+    ``names`` breaking ties), classed with the configured thresholds, as
+    dicts for A, B and C in that order
+    """
+    summary = {abc_class: {'abc_class': abc_class, 'count': 0, 'spend': ZERO, 'share': ZERO} for abc_class in 'ABC'}
+    for _, _, spend, share, _, abc_class in _ranked(totals, names, *_thresholds()):
+        summary[abc_class]['count'] += 1
+        summary[abc_class]['spend'] += spend
+        summary[abc_class]['share'] += share
+    return [summary[abc_class] for abc_class in 'ABC']
+
+
+def _hhi(supplier_spend):
+    total = sum(supplier_spend.values(), ZERO)
+    if not total:
+        return ZERO
+    return sum(((spend / total * HUNDRED) ** 2 for spend in supplier_spend.values()), ZERO).quantize(HHI_PLACES)
+
+
+def refresh(budget_year):
+    """
+    Recompute the SpendConcentration rows of ``budget_year`` from its
+    ordered purchase order lines. Returns the number of rows written.
+    """
+    started = timezone.now()
+    a_share, b_share = _thresholds()
+
+    totals = {dimension: defaultdict(lambda: ZERO) for dimension in DIMENSIONS}
+    names = {dimension: {} for dimension in DIMENSIONS}
+    item_suppliers = defaultdict(set)
+    category_suppliers = defaultdict(lambda: defaultdict(lambda: ZERO))
+
+    for row in _grouped_spend(budget_year).iterator(chunk_size=2000):
+        spend = row['spend'] or ZERO
+        supplier_id = row['purchase_order__supplier_id']
+        totals['SUPPLIER'][supplier_id] += spend
+        names['SUPPLIER'][supplier_id] = row['purchase_order__supplier__name']
+
+        item_id = row['requisition_item__item_id']
+        if item_id is None:
+            continue
+        totals['ITEM'][item_id] += spend
+        names['ITEM'][item_id] = row['requisition_item__item__name']
+        item_suppliers[item_id].add(supplier_id)
+
+        category_id = row['requisition_item__item__category_id']
+        totals['CATEGORY'][category_id] += spend
+        names['CATEGORY'][category_id] = row['requisition_item__item__category__name']
+        category_suppliers[category_id][supplier_id] += spend
+
+    rows = []
+    for dimension in DIMENSIONS:
+        classed = dimension != 'CATEGORY'
+        for key, rank, spend, share, cumulative_share, abc_class in _ranked(
+            totals[dimension], names[dimension],
+            a_share if classed else None, b_share if classed else None,
+        ):
+            if dimension == 'SUPPLIER':
+                supplier_count, hhi = 1, None
+            elif dimension == 'ITEM':
+                supplier_count, hhi = len(item_suppliers[key]), None
+            else:
+                supplier_count, hhi = len(category_suppliers[key]), _hhi(category_suppliers[key])
+            rows.append(SpendConcentration(
+                budget_year_id=budget_year.pk,
+                dimension=dimension,
+                name=names[dimension][key],
+                rank=rank,
+                spend=spend,
+                share=share,
+                cumulative_share=cumulative_share,
+                abc_class=abc_class,
+                hhi=hhi,
+                supplier_count=supplier_count,
+                refreshed_at=started,
+                **{DIMENSION_FIELDS[dimension]: key},
+            ))
+
+    with transaction.atomic():
+        SpendConcentration.objects.filter(budget_year=budget_year).delete()
+        SpendConcentration.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def hhi_band(hhi):
+    if hhi is None:
+        return ''
+    if hhi > HHI_HIGH:
+        return 'High'
+    if hhi >= HHI_MODERATE:
+        return 'Moderate'
+    return 'Low'
+
+
+def concentration_report(budget_year, limit=10):
+    """
+    The stored analysis of ``budget_year`` from one query: the supplier
+    spend curve, spend per ABC class for suppliers and items, overall
+    supplier HHI, tail spend, the largest suppliers and the most
+    concentrated categories (``limit`` of each)
+    """
+    rows = list(
+        SpendConcentration.objects.filter(budget_year=budget_year).order_by('dimension', 'rank').values(
+            'dimension', 'name', 'rank', 'spend', 'share', 'cumulative_share', 'abc_class', 'hhi',
+            'supplier_count', 'refreshed_at',
+        )
+    )
+    by_dimension = {dimension: [] for dimension in DIMENSIONS}
+    for row in rows:
+        by_dimension[row['dimension']].append(row)
+    suppliers = by_dimension['SUPPLIER']
+
+    classes = {}
+    for dimension in ('SUPPLIER', 'ITEM'):
+        summary = {abc_class: {'count': 0, 'spend': ZERO, 'share': ZERO} for abc_class in 'ABC'}
+        for row in by_dimension[dimension]:
+            summary[row['abc_class']]['count'] += 1
+            summary[row['abc_class']]['spend'] += row['spend']
+            summary[row['abc_class']]['share'] += row['share']
+        classes[dimension] = summary
+
+    categories = sorted(by_dimension['CATEGORY'], key=lambda row: (-row['hhi'], row['rank']))[:limit]
+    for row in categories:
+        row['hhi_band'] = hhi_band(row['hhi'])
+
+    supplier_hhi = sum((row['share'] ** 2 for row in suppliers), ZERO).quantize(HHI_PLACES)
+    return {
+        'refreshed_at': max((row['refreshed_at'] for row in rows), default=None),
+        'total_spend': sum((row['spend'] for row in suppliers), ZERO),
+        'supplier_count': len(suppliers),
+        'item_count': len(by_dimension['ITEM']),
+        'supplier_hhi': supplier_hhi,
+        'supplier_hhi_band': hhi_band(supplier_hhi) if suppliers else '',
+        'curve': [(row['rank'], row['cumulative_share']) for row in suppliers],
+        'classes': classes,
+        'class_rows': [
+            {'abc_class': abc_class, 'suppliers': classes['SUPPLIER'][abc_class], 'items': classes['ITEM'][abc_class]}
+            for abc_class in 'ABC'
+        ],
+        'tail': classes['SUPPLIER']['C'],
+        'top_suppliers': suppliers[:limit],
+        'categories': categories,
+    }
+
+
+def concentration_rows(budget_year, dimension=None):
+    """Stored rows of ``budget_year`` (optionally one dimension) for CSV export"""
+    rows = SpendConcentration.objects.filter(budget_year=budget_year)
+    if dimension:
+        rows = rows.filter(dimension=dimension)
+    return rows.order_by('dimension', 'rank').values(
+        'dimension', 'rank', 'name', 'spend', 'share', 'cumulative_share', 'abc_class', 'hhi',
+        'supplier_count',
+    ).iterator(chunk_size=2000)
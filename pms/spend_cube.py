@@ -0,0 +1,221 @@
+"""
+Spend cube for the spend analysis page.
+
+Every figure on the page is a grouping of the same filtered purchase
+orders. SpendCube loads them once. A single query returns one fact row
+per purchase order in the selected period and in the previous period of
+the same length. Each row carries its department, budget category,
+supplier and status, plus the per-order attributes the charts need,
+resolved by correlated subqueries: item category types, tender method
+and supplier review ratings.
+
+Totals, groupings, rankings, the supplier ABC classes and the period
+comparison are then computed from these rows in memory. The rows are cached by the page's filters for
+SPEND_CUBE_CACHE_TTL seconds.
+"""
+
+import hashlib
+from collections import namedtuple
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Exists, OuterRef, Subquery, Sum
+
+from pms.models import PurchaseOrder, RequisitionItem, SupplierPerformance, Tender
+from pms.spend_concentration import abc_summary
+
+
+CACHE_KEY = 'pms:spend_cube:{}'
+
+COMPLETED_STATUSES = ('DELIVERED', 'CLOSED')
+CATEGORY_TYPES = ('GOODS', 'SERVICES', 'WORKS')
+
+Fact = namedtuple('Fact', [
+    'id', 'po_number', 'po_date', 'status', 'amount', 'estimated',
+    'supplier_id', 'supplier_name', 'department_id', 'department_name',
+    'category_id', 'category_name', 'is_emergency',
+    'goods', 'services', 'works', 'tender_method', 'review_count', 'rating_total',
+])
+
+ZERO = Decimal('0')
+
+
+def _cache_ttl():
+    return getattr(settings, 'SPEND_CUBE_CACHE_TTL', 300)
+
+
+def _load(date_from, date_to, previous_from, department_id, category_id, supplier_id):
+    orders = PurchaseOrder.objects.filter(po_date__gte=previous_from, po_date__lte=date_to)
+    if department_id:
+        orders = orders.filter(requisition__department_id=department_id)
+    if category_id:
+        orders = orders.filter(requisition__budget__category_id=category_id)
+    if supplier_id:
+        orders = orders.filter(supplier_id=supplier_id)
+
+    reviews = SupplierPerformance.objects.filter(purchase_order=OuterRef('pk')).order_by().values(
+        'purchase_order'
+    )
+    orders = orders.annotate(
+        **{
+            category_type.lower(): Exists(RequisitionItem.objects.filter(
+                requisition=OuterRef('requisition'), item__category__category_type=category_type,
+            ))
+            for category_type in CATEGORY_TYPES
+        },
+        tender_method=Subquery(
+            Tender.objects.filter(requisition=OuterRef('requisition')).order_by('-created_at').values(
+                'procurement_method'
+            )[:1]
+        ),
+        review_count=Subquery(reviews.annotate(n=Count('id')).values('n')),
+        rating_total=Subquery(reviews.annotate(total=Sum('overall_rating')).values('total')),
+    )
+    return [
+        Fact(*row)
+        for row in orders.order_by().values_list(
+            'id', 'po_number', 'po_date', 'status', 'total_amount', 'requisition__estimated_amount',
+            'supplier_id', 'supplier__name', 'requisition__department_id', 'requisition__department__name',
+            'requisition__budget__category_id', 'requisition__budget__category__name',
+            'requisition__is_emergency',
+            'goods', 'services', 'works', 'tender_method', 'review_count', 'rating_total',
+        )
+    ]
+
+
+def _group(facts, key):
+    """{key: {'total', 'count', 'max', 'min'}} over ``facts``"""
+    groups = {}
+    for fact in facts:
+        group_key = key(fact)
+        group = groups.get(group_key)
+        if group is None:
+            group = groups[group_key] = {'total': ZERO, 'count': 0, 'max': fact.amount, 'min': fact.amount}
+        group['total'] += fact.amount
+        group['count'] += 1
+        group['max'] = max(group['max'], fact.amount)
+        group['min'] = min(group['min'], fact.amount)
+    for group in groups.values():
+        group['avg'] = group['total'] / group['count']
+    return groups
+
+
+class SpendCube:
+    """Purchase order facts of one filter selection and its previous period"""
+
+    def __init__(self, facts, date_from):
+        self.current = [fact for fact in facts if fact.po_date >= date_from]
+        self.previous = [fact for fact in facts if fact.po_date < date_from]
+
+    @property
+    def total_spend(self):
+        return sum((fact.amount for fact in self.current), ZERO)
+
+    @property
+    def previous_spend(self):
+        return sum((fact.amount for fact in self.previous), ZERO)
+
+    def summary(self):
+        total = self.total_spend
+        count = len(self.current)
+        return {
+            'total_spend': total,
+            'total_orders': count,
+            'avg_order_value': total / count if count else ZERO,
+            'unique_suppliers': len({fact.supplier_id for fact in self.current}),
+            'unique_departments': len({fact.department_id for fact in self.current}),
+            'completed_orders': sum(1 for fact in self.current if fact.status in COMPLETED_STATUSES),
+            'pending_orders': sum(
+                1 for fact in self.current if fact.status not in COMPLETED_STATUSES + ('CANCELLED',)
+            ),
+            'emergency_spend': sum((fact.amount for fact in self.current if fact.is_emergency), ZERO),
+            'estimated': sum((fact.estimated for fact in self.current if fact.estimated is not None), ZERO),
+        }
+
+    def spend_change(self):
+        """Percentage change against the previous period, 0 without previous spend"""
+        previous = self.previous_spend
+        return (self.total_spend - previous) / previous * 100 if previous > 0 else 0
+
+    def monthly(self):
+        """[(first day of month, group)] oldest first, with spend per category type"""
+        groups = _group(self.current, lambda fact: fact.po_date.replace(day=1))
+        for group in groups.values():
+            for category_type in CATEGORY_TYPES:
+                group[category_type.lower()] = ZERO
+        for fact in self.current:
+            group = groups[fact.po_date.replace(day=1)]
+            for category_type in CATEGORY_TYPES:
+                if getattr(fact, category_type.lower()):
+                    group[category_type.lower()] += fact.amount
+        return sorted(groups.items())
+
+    def category_type_spend(self):
+        """Spend of orders with at least one item of each category type"""
+        return {
+            category_type: sum(
+                (fact.amount for fact in self.current if getattr(fact, category_type.lower())), ZERO
+            )
+            for category_type in CATEGORY_TYPES
+        }
+
+    def ranked(self, dimension, order='total'):
+        """
+        Groups by ``dimension`` ('department', 'category', 'supplier',
+        'status' or 'tender_method') as dicts with id, name and the group
+        figures, largest ``order`` first
+        """
+        if dimension == 'status':
+            key = lambda fact: (fact.status, fact.status)
+        elif dimension == 'tender_method':
+            key = lambda fact: (fact.tender_method, fact.tender_method)
+        else:
+            key = lambda fact: (getattr(fact, f'{dimension}_id'), getattr(fact, f'{dimension}_name'))
+        rows = [
+            {'id': group_id, 'name': name, **group}
+            for (group_id, name), group in _group(self.current, key).items()
+        ]
+        return sorted(rows, key=lambda row: row[order], reverse=True)
+
+    def supplier_abc(self):
+        """
+        Pareto (ABC) classes of the selected suppliers' spend, see
+        pms.spend_concentration.abc_summary
+        """
+        suppliers = self.ranked('supplier')
+        return abc_summary(
+            {row['id']: row['total'] for row in suppliers},
+            {row['id']: row['name'] for row in suppliers},
+        )
+
+    def supplier_ratings(self):
+        """{supplier id: average review rating of its orders, or None}"""
+        reviews = {}
+        for fact in self.current:
+            count, total = reviews.get(fact.supplier_id, (0, ZERO))
+            reviews[fact.supplier_id] = (count + (fact.review_count or 0), total + (fact.rating_total or ZERO))
+        return {
+            supplier_id: total / count if count else None
+            for supplier_id, (count, total) in reviews.items()
+        }
+
+    def top_orders(self, limit=10):
+        return sorted(self.current, key=lambda fact: fact.amount, reverse=True)[:limit]
+
+
+def spend_cube(date_from, date_to, department_id='', category_id='', supplier_id=''):
+    """
+    The SpendCube for purchase orders dated ``date_from`` to ``date_to``
+    (dates) with the page's optional filters. The previous period is the
+    same number of days before ``date_from``.
+    """
+    previous_from = date_from - timedelta(days=(date_to - date_from).days)
+    selection = '|'.join(str(value) for value in (date_from, date_to, department_id, category_id, supplier_id))
+    key = CACHE_KEY.format(hashlib.md5(selection.encode()).hexdigest())
+    facts = cache.get(key)
+    if facts is None:
+        facts = _load(date_from, date_to, previous_from, department_id, category_id, supplier_id)
+        cache.set(key, facts, _cache_ttl())
+    return SpendCube(facts, date_from)
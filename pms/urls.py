@@ -194,6 +194,9 @@ urlpatterns = [
     path('settings/', views.system_settings, name='system_settings'),
     path('audit-trail/', views.audit_trail, name='audit_trail'),
     path('notifications/', views.notifications_list, name='notifications_list'),
+    path('api/notifications/poll/', views.notifications_poll_api, name='api_notifications_poll'),
+    path('api/events/stream/', views.live_events_stream, name='api_live_events'),
+    path('api/performance/metrics/', views.performance_metrics, name='api_performance_metrics'),
     path('policies/', views.policy_list, name='policy_list'),
     path('policies/<uuid:policy_id>/', views.policy_detail, name='policy_detail'),
     
@@ -416,6 +419,7 @@ urlpatterns = [
     path('procurement-module/orders/completed/', views.procurement_completed_orders_view, name='procurement_completed_orders'),
     path('procurement-module/orders/<uuid:po_id>/', views.procurement_order_detail_view, name='procurement_order_detail'),
     path('po/<uuid:po_id>/download-pdf/', views.po_download_pdf, name='po_download_pdf'),
+    path('documents/<str:kind>/print/', views.print_documents, name='print_documents'),
     
     # ============================================================================
     # CONTRACTS
@@ -435,6 +439,7 @@ urlpatterns = [
     # ============================================================================
     path('procurement-module/reports/', views.procurement_reports_view, name='procurement_reports'),
     path('procurement-module/reports/spend-analysis/', views.procurement_spend_analysis_view, name='procurement_spend_analysis'),
+    path('procurement-module/reports/spend-concentration/export/', views.procurement_spend_concentration_export, name='procurement_spend_concentration_export'),
     
     # ========================================================================
     # PROCUREMENT PLAN MANAGEMENT
@@ -463,6 +468,7 @@ urlpatterns = [
     
     # Plan Item Management URLs
     path('procurement/plans/<uuid:plan_pk>/items/add/', views.procurement_plan_item_add, name='procurement_plan_item_add'),
+    path('procurement/plans/<uuid:pk>/items/import/', views.procurement_plan_import, name='procurement_plan_import'),
     path('procurement/plans/items/<uuid:item_pk>/get/', views.procurement_plan_item_get, name='procurement_plan_item_get'),
     path('procurement/plans/items/<uuid:item_pk>/edit/', views.procurement_plan_item_edit, name='procurement_plan_item_edit'),
     path('procurement/plans/items/<uuid:item_pk>/delete/', views.procurement_plan_item_delete, name='procurement_plan_item_delete'),
@@ -494,6 +500,7 @@ urlpatterns = [
     
     # Reports
     path('plans/reports/', views.procurement_plan_reports, name='procurement_plan_reports'),
+    path('plans/execution/', views.plan_execution_report, name='plan_execution_report'),
 
     # ========================================================================
     # UTILITY ENDPOINTS (AJAX)
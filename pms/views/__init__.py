@@ -0,0 +1,24 @@
+"""
+Views, grouped by role.
+
+The URLconf refers to every view as ``views.<name>``, so each module is
+re-exported here. Heavy libraries (openpyxl, reportlab, dateutil) are
+imported inside the export and PDF views that need them, not at import
+time; keep it that way when adding views (benchmark_startup
+--fail-on-heavy checks it).
+"""
+
+from pms.views.common import *  # noqa: F401,F403
+from pms.views.admin import *  # noqa: F401,F403
+from pms.views.requisitions import *  # noqa: F401,F403
+from pms.views.tenders import *  # noqa: F401,F403
+from pms.views.procurement import *  # noqa: F401,F403
+from pms.views.finance import *  # noqa: F401,F403
+from pms.views.stores import *  # noqa: F401,F403
+from pms.views.supplier import *  # noqa: F401,F403
+from pms.views.staff import *  # noqa: F401,F403
+from pms.views.hod import *  # noqa: F401,F403
+from pms.views.planning import *  # noqa: F401,F403
+from pms.views.auditor import *  # noqa: F401,F403
+from pms.views.profiles import *  # noqa: F401,F403
+from pms.views.printing import *  # noqa: F401,F403
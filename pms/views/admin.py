@@ -0,0 +1,1424 @@
+"""
+Administrator views: analytics dashboard, reports and the Excel export,
+users, roles, departments, system settings, the audit trail and the
+per-view performance metrics.
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.db.models import Avg, Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+
+from pms.audit import record_audit
+from pms.db_routing import read_replica
+from pms.forms import DepartmentForm, UserForm
+from pms.instrumentation import (
+    metrics as instrumentation_metrics, registry as instrumentation_registry,
+)
+from pms.models import (
+    AuditLog, Bid, Budget, Contract, Department, Faculty, Invoice,
+    ItemCategory, Permission, PurchaseOrder, Requisition, RequisitionItem,
+    RolePermission, StockItem, Supplier, SupplierPerformance,
+    SystemConfiguration, Tender, User,
+)
+
+
+# ============================================================================
+# ADMIN ANALYTICS DASHBOARD
+# ============================================================================
+
+
+@login_required
+def admin_analytics_dashboard(request):
+    """
+    Comprehensive admin analytics dashboard
+    """
+
+    if request.user.role != 'ADMIN':
+        messages.error(request, 'Access denied. Administrators only.')
+        return redirect('dashboard')
+
+    # =========================================================
+    # DATE RANGE FILTERS
+    # =========================================================
+    end_date = timezone.now().date()
+    start_date = end_date - timedelta(days=365)
+
+    filter_start = request.GET.get('start_date')
+    filter_end = request.GET.get('end_date')
+
+    if filter_start:
+        start_date = datetime.strptime(filter_start, '%Y-%m-%d').date()
+    if filter_end:
+        end_date = datetime.strptime(filter_end, '%Y-%m-%d').date()
+
+    # =========================================================
+    # SYSTEM STATISTICS
+    # =========================================================
+    total_requisitions = Requisition.objects.count()
+    total_pos = PurchaseOrder.objects.count()
+    total_suppliers = Supplier.objects.filter(status='APPROVED').count()
+    total_contracts = Contract.objects.count()
+
+    total_spend = PurchaseOrder.objects.filter(
+        status__in=['APPROVED', 'SENT', 'ACKNOWLEDGED', 'DELIVERED']
+    ).aggregate(
+        total=Sum('total_amount')
+    )['total'] or Decimal('0.00')
+
+    # =========================================================
+    # MONTHLY SPEND TREND
+    # =========================================================
+    monthly_spend = PurchaseOrder.objects.filter(
+        po_date__gte=start_date,
+        po_date__lte=end_date,
+        status__in=['APPROVED', 'SENT', 'ACKNOWLEDGED', 'DELIVERED']
+    ).annotate(
+        month=TruncMonth('po_date')
+    ).values('month').annotate(
+        total=Sum('total_amount')
+    ).order_by('month')
+
+    spend_chart = {
+        'labels': [m['month'].strftime('%b %Y') for m in monthly_spend],
+        'values': [float(m['total']) for m in monthly_spend]
+    }
+
+    # =========================================================
+    # BUDGET UTILIZATION
+    # =========================================================
+    budget_data = Budget.objects.filter(
+        budget_year__is_active=True
+    ).aggregate(
+        allocated=Sum('allocated_amount'),
+        committed=Sum('committed_amount'),
+        spent=Sum('actual_spent')
+    )
+
+    total_allocated = budget_data['allocated'] or Decimal('0.00')
+    total_committed = budget_data['committed'] or Decimal('0.00')
+    total_spent = budget_data['spent'] or Decimal('0.00')
+    available = total_allocated - total_committed - total_spent
+
+    budget_chart = {
+        'labels': ['Spent', 'Committed', 'Available'],
+        'values': [
+            float(total_spent),
+            float(total_committed),
+            float(available)
+        ]
+    }
+
+    # =========================================================
+    # REQUISITION STATUS
+    # =========================================================
+    req_status = Requisition.objects.values('status').annotate(
+        count=Count('id')
+    ).order_by('-count')
+
+    req_status_chart = {
+        'labels': [
+            dict(Requisition.STATUS_CHOICES).get(r['status'], r['status'])
+            for r in req_status
+        ],
+        'values': [r['count'] for r in req_status]
+    }
+
+    # =========================================================
+    # PURCHASE ORDER TRENDS
+    # =========================================================
+    po_trend = PurchaseOrder.objects.filter(
+        po_date__gte=start_date,
+        po_date__lte=end_date
+    ).annotate(
+        month=TruncMonth('po_date')
+    ).values('month').annotate(
+        count=Count('id'),
+        total=Sum('total_amount')
+    ).order_by('month')
+
+    po_trend_chart = {
+        'labels': [p['month'].strftime('%b %Y') for p in po_trend],
+        'count': [p['count'] for p in po_trend],
+        'values': [float(p['total']) for p in po_trend]
+    }
+
+    # =========================================================
+    # TOP SUPPLIERS
+    # =========================================================
+    top_suppliers = PurchaseOrder.objects.filter(
+        status__in=['APPROVED', 'SENT', 'ACKNOWLEDGED', 'DELIVERED']
+    ).values('supplier__name').annotate(
+        total=Sum('total_amount')
+    ).order_by('-total')[:10]
+
+    top_suppliers_chart = {
+        'labels': [s['supplier__name'] for s in top_suppliers],
+        'values': [float(s['total']) for s in top_suppliers]
+    }
+
+    # =========================================================
+    # DEPARTMENT SPEND
+    # =========================================================
+    dept_spend = Requisition.objects.filter(
+        status='APPROVED',
+        purchase_orders__status__in=['APPROVED', 'SENT', 'ACKNOWLEDGED', 'DELIVERED']
+    ).values('department__name').annotate(
+        total=Sum('purchase_orders__total_amount')
+    ).order_by('-total')[:10]
+
+    dept_spend_chart = {
+        'labels': [d['department__name'] for d in dept_spend],
+        'values': [float(d['total'] or 0) for d in dept_spend]
+    }
+
+    # =========================================================
+    # TENDER STATUS
+    # =========================================================
+    tender_status = Tender.objects.values('status').annotate(
+        count=Count('id')
+    ).order_by('-count')
+
+    tender_status_chart = {
+        'labels': [
+            dict(Tender.STATUS_CHOICES).get(t['status'], t['status'])
+            for t in tender_status
+        ],
+        'values': [t['count'] for t in tender_status]
+    }
+
+    # =========================================================
+    # CONTRACT TYPES
+    # =========================================================
+    contract_type = Contract.objects.values('contract_type').annotate(
+        count=Count('id'),
+        total_value=Sum('contract_value')
+    ).order_by('-count')
+
+    contract_type_chart = {
+        'labels': [
+            dict(Contract.CONTRACT_TYPES).get(c['contract_type'], c['contract_type'])
+            for c in contract_type
+        ],
+        'values': [c['count'] for c in contract_type]
+    }
+
+    # =========================================================
+    # PERFORMANCE METRICS (FIXED)
+    # =========================================================
+    approved_reqs = Requisition.objects.filter(
+        status='APPROVED',
+        submitted_at__isnull=False,
+        updated_at__isnull=False
+    )
+
+    avg_approval_days = 0
+    if approved_reqs.exists():
+        total_seconds = sum(
+            (r.updated_at - r.submitted_at).total_seconds()
+            for r in approved_reqs
+        )
+        avg_approval_days = int(
+            total_seconds / approved_reqs.count() / 86400
+        )
+
+    avg_bids = Bid.objects.values('tender').annotate(
+        bid_count=Count('id')
+    ).aggregate(
+        avg=Avg('bid_count')
+    )['avg'] or 0
+
+    delivered_pos = PurchaseOrder.objects.filter(
+        status='DELIVERED',
+        sent_at__isnull=False,
+        updated_at__isnull=False
+    )
+
+    avg_delivery_days = 0
+    if delivered_pos.exists():
+        total_delivery_seconds = sum(
+            (po.updated_at - po.sent_at).total_seconds()
+            for po in delivered_pos
+        )
+        avg_delivery_days = int(
+            total_delivery_seconds / delivered_pos.count() / 86400
+        )
+
+    total_delivered = delivered_pos.count()
+    on_time = delivered_pos.filter(
+        updated_at__lte=F('delivery_date')
+    ).count()
+
+    delivery_compliance = int(
+        (on_time / total_delivered) * 100
+    ) if total_delivered > 0 else 0
+
+    performance = {
+        'avg_approval_time': avg_approval_days,
+        'avg_bids_per_tender': round(avg_bids, 1),
+        'avg_delivery_time': avg_delivery_days,
+        'delivery_compliance': delivery_compliance
+    }
+
+    # =========================================================
+    # CATEGORY SPEND
+    # =========================================================
+    category_spend = RequisitionItem.objects.filter(
+        requisition__status='APPROVED',
+        requisition__purchase_orders__status__in=[
+            'APPROVED', 'SENT', 'ACKNOWLEDGED', 'DELIVERED'
+        ]
+    ).values(
+        'item__category__name'
+    ).annotate(
+        total=Sum('estimated_total')
+    ).order_by('-total')[:8]
+
+    category_spend_chart = {
+        'labels': [
+            c['item__category__name'] or 'Uncategorized'
+            for c in category_spend
+        ],
+        'values': [float(c['total']) for c in category_spend]
+    }
+
+    # =========================================================
+    # SUPPLIER RATINGS
+    # =========================================================
+    supplier_ratings = SupplierPerformance.objects.values(
+        'supplier__name'
+    ).annotate(
+        avg_rating=Avg('overall_rating'),
+        count=Count('id')
+    ).order_by('-avg_rating')[:10]
+
+    supplier_rating_chart = {
+        'labels': [s['supplier__name'] for s in supplier_ratings],
+        'values': [float(s['avg_rating']) for s in supplier_ratings]
+    }
+
+    # =========================================================
+    # PAYMENT STATUS
+    # =========================================================
+    payment_status = Invoice.objects.values('status').annotate(
+        count=Count('id'),
+        total=Sum('total_amount')
+    ).order_by('-count')
+
+    payment_status_chart = {
+        'labels': [
+            dict(Invoice.STATUS_CHOICES).get(p['status'], p['status'])
+            for p in payment_status
+        ],
+        'values': [float(p['total'] or 0) for p in payment_status]
+    }
+
+    # =========================================================
+    # STOCK VALUE
+    # =========================================================
+    stock_value = StockItem.objects.values(
+        'store__name'
+    ).annotate(
+        total_value=Sum('total_value')
+    ).order_by('-total_value')
+
+    stock_value_chart = {
+        'labels': [s['store__name'] for s in stock_value],
+        'values': [float(s['total_value']) for s in stock_value]
+    }
+
+    # =========================================================
+    # CONTEXT
+    # =========================================================
+    context = {
+        'title': 'Admin Analytics Dashboard',
+        'total_requisitions': total_requisitions,
+        'total_pos': total_pos,
+        'total_suppliers': total_suppliers,
+        'total_contracts': total_contracts,
+        'system_stats': {
+            'total_spend': total_spend
+        },
+        'spend_chart': spend_chart,
+        'budget_chart': budget_chart,
+        'req_status_chart': req_status_chart,
+        'po_trend_chart': po_trend_chart,
+        'top_suppliers_chart': top_suppliers_chart,
+        'dept_spend_chart': dept_spend_chart,
+        'tender_status_chart': tender_status_chart,
+        'contract_type_chart': contract_type_chart,
+        'category_spend_chart': category_spend_chart,
+        'supplier_rating_chart': supplier_rating_chart,
+        'payment_status_chart': payment_status_chart,
+        'stock_value_chart': stock_value_chart,
+        'performance': performance,
+        'start_date': start_date,
+        'end_date': end_date,
+    }
+
+    return render(request, 'admin/analytics_dashboard.html', context)
+
+
+# ============================================================================
+# REPORTS VIEW WITH FILTERS
+# ============================================================================
+
+@read_replica
+@login_required
+def admin_reports(request):
+    """
+    Reports page with advanced filtering and Excel export
+    """
+    if request.user.role != 'ADMIN':
+        messages.error(request, 'Access denied. Administrators only.')
+        return redirect('dashboard')
+    
+    # Get filter parameters
+    report_type = request.GET.get('report_type', 'requisitions')
+    start_date = request.GET.get('start_date')
+    end_date = request.GET.get('end_date')
+    department_id = request.GET.get('department')
+    supplier_id = request.GET.get('supplier')
+    status_filter = request.GET.get('status')
+    category_id = request.GET.get('category')
+    
+    # Set default date range (last 90 days)
+    if not start_date:
+        start_date = (timezone.now() - timedelta(days=90)).strftime('%Y-%m-%d')
+    if not end_date:
+        end_date = timezone.now().strftime('%Y-%m-%d')
+    
+    # Initialize data
+    report_data = []
+    chart_data = {}
+    summary_stats = {}
+    
+    # ========== REQUISITIONS REPORT ==========
+    if report_type == 'requisitions':
+        queryset = Requisition.objects.select_related(
+            'department', 'requested_by', 'budget'
+        ).filter(
+            created_at__date__gte=start_date,
+            created_at__date__lte=end_date
+        )
+        
+        if department_id:
+            queryset = queryset.filter(department_id=department_id)
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+        
+        report_data = queryset.order_by('-created_at')
+        
+        # Summary stats
+        summary_stats = {
+            'total_count': queryset.count(),
+            'total_value': queryset.aggregate(Sum('estimated_amount'))['estimated_amount__sum'] or Decimal('0.00'),
+            'avg_value': queryset.aggregate(Avg('estimated_amount'))['estimated_amount__avg'] or Decimal('0.00'),
+            'pending': queryset.filter(status='SUBMITTED').count(),
+            'approved': queryset.filter(status='APPROVED').count(),
+            'rejected': queryset.filter(status='REJECTED').count(),
+        }
+        
+        # Chart: Status breakdown
+        status_data = queryset.values('status').annotate(
+            count=Count('id')
+        ).order_by('-count')
+        
+        chart_data['status_chart'] = {
+            'labels': [dict(Requisition.STATUS_CHOICES).get(item['status'], item['status']) for item in status_data],
+            'values': [item['count'] for item in status_data]
+        }
+        
+        # Chart: Monthly trend
+        monthly_data = queryset.annotate(
+            month=TruncMonth('created_at')
+        ).values('month').annotate(
+            count=Count('id'),
+            total=Sum('estimated_amount')
+        ).order_by('month')
+        
+        chart_data['monthly_chart'] = {
+            'labels': [item['month'].strftime('%b %Y') for item in monthly_data],
+            'count': [item['count'] for item in monthly_data],
+            'values': [float(item['total']) for item in monthly_data]
+        }
+    
+    # ========== PURCHASE ORDERS REPORT ==========
+    elif report_type == 'purchase_orders':
+        queryset = PurchaseOrder.objects.select_related(
+            'supplier', 'requisition', 'created_by'
+        ).filter(
+            po_date__gte=start_date,
+            po_date__lte=end_date
+        )
+        
+        if supplier_id:
+            queryset = queryset.filter(supplier_id=supplier_id)
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+        
+        report_data = queryset.order_by('-po_date')
+        
+        # Summary stats
+        summary_stats = {
+            'total_count': queryset.count(),
+            'total_value': queryset.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
+            'avg_value': queryset.aggregate(Avg('total_amount'))['total_amount__avg'] or Decimal('0.00'),
+            'pending': queryset.filter(status='PENDING_APPROVAL').count(),
+            'approved': queryset.filter(status='APPROVED').count(),
+            'delivered': queryset.filter(status='DELIVERED').count(),
+        }
+        
+        # Chart: Status breakdown
+        status_data = queryset.values('status').annotate(
+            count=Count('id'),
+            total=Sum('total_amount')
+        ).order_by('-count')
+        
+        chart_data['status_chart'] = {
+            'labels': [dict(PurchaseOrder.STATUS_CHOICES).get(item['status'], item['status']) for item in status_data],
+            'values': [float(item['total']) for item in status_data]
+        }
+        
+        # Chart: Top suppliers
+        supplier_data = queryset.values('supplier__name').annotate(
+            total=Sum('total_amount')
+        ).order_by('-total')[:10]
+        
+        chart_data['supplier_chart'] = {
+            'labels': [item['supplier__name'] for item in supplier_data],
+            'values': [float(item['total']) for item in supplier_data]
+        }
+    
+    # ========== SUPPLIER REPORT ==========
+    elif report_type == 'suppliers':
+        queryset = Supplier.objects.annotate(
+            po_count=Count('purchase_orders'),
+            total_value=Sum('purchase_orders__total_amount')
+        ).filter(
+            purchase_orders__po_date__gte=start_date,
+            purchase_orders__po_date__lte=end_date
+        ).distinct()
+        
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+        
+        report_data = queryset.order_by('-total_value')
+        
+        # Summary stats
+        summary_stats = {
+            'total_count': queryset.count(),
+            'total_spend': queryset.aggregate(Sum('total_value'))['total_value__sum'] or Decimal('0.00'),
+            'active': queryset.filter(status='APPROVED').count(),
+            'suspended': queryset.filter(status='SUSPENDED').count(),
+        }
+        
+        # Chart: Supplier ratings
+        rating_data = SupplierPerformance.objects.filter(
+            reviewed_at__date__gte=start_date,
+            reviewed_at__date__lte=end_date
+        ).values('supplier__name').annotate(
+            avg_rating=Avg('overall_rating')
+        ).order_by('-avg_rating')[:10]
+        
+        chart_data['rating_chart'] = {
+            'labels': [item['supplier__name'] for item in rating_data],
+            'values': [float(item['avg_rating']) for item in rating_data]
+        }
+    
+    # ========== BUDGET REPORT ==========
+    elif report_type == 'budget':
+        queryset = Budget.objects.select_related(
+            'department', 'budget_year', 'category'
+        ).filter(
+            budget_year__is_active=True
+        )
+        
+        if department_id:
+            queryset = queryset.filter(department_id=department_id)
+        
+        report_data = queryset.order_by('department__name')
+        
+        # Summary stats
+        summary_stats = {
+            'total_allocated': queryset.aggregate(Sum('allocated_amount'))['allocated_amount__sum'] or Decimal('0.00'),
+            'total_committed': queryset.aggregate(Sum('committed_amount'))['committed_amount__sum'] or Decimal('0.00'),
+            'total_spent': queryset.aggregate(Sum('actual_spent'))['actual_spent__sum'] or Decimal('0.00'),
+        }
+        summary_stats['available'] = summary_stats['total_allocated'] - summary_stats['total_committed'] - summary_stats['total_spent']
+        summary_stats['utilization_rate'] = (summary_stats['total_spent'] / summary_stats['total_allocated'] * 100) if summary_stats['total_allocated'] > 0 else 0
+        
+        # Chart: Department utilization
+        dept_data = queryset.values('department__name').annotate(
+            allocated=Sum('allocated_amount'),
+            spent=Sum('actual_spent')
+        ).order_by('-spent')[:10]
+        
+        chart_data['dept_chart'] = {
+            'labels': [item['department__name'] for item in dept_data],
+            'allocated': [float(item['allocated']) for item in dept_data],
+            'spent': [float(item['spent']) for item in dept_data]
+        }
+    
+    # ========== INVENTORY REPORT ==========
+    elif report_type == 'inventory':
+        queryset = StockItem.objects.select_related(
+            'store', 'item'
+        ).all()
+        
+        report_data = queryset.order_by('store__name', 'item__name')
+        
+        # Summary stats
+        summary_stats = {
+            'total_items': queryset.count(),
+            'total_value': queryset.aggregate(Sum('total_value'))['total_value__sum'] or Decimal('0.00'),
+            'low_stock': queryset.filter(quantity_on_hand__lte=F('reorder_level')).count(),
+        }
+        
+        # Chart: Stock value by store
+        store_data = queryset.values('store__name').annotate(
+            total=Sum('total_value')
+        ).order_by('-total')
+        
+        chart_data['store_chart'] = {
+            'labels': [item['store__name'] for item in store_data],
+            'values': [float(item['total']) for item in store_data]
+        }
+    
+    # Get filter options
+    departments = Department.objects.filter(is_active=True).order_by('name')
+    suppliers = Supplier.objects.filter(status='APPROVED').order_by('name')
+    categories = ItemCategory.objects.filter(is_active=True).order_by('name')
+    
+    context = {
+        'title': 'Reports & Analytics',
+        'report_type': report_type,
+        'report_data': report_data,
+        'chart_data': chart_data,
+        'summary_stats': summary_stats,
+        'start_date': start_date,
+        'end_date': end_date,
+        'department_id': department_id,
+        'supplier_id': supplier_id,
+        'status_filter': status_filter,
+        'category_id': category_id,
+        'departments': departments,
+        'suppliers': suppliers,
+        'categories': categories,
+        'requisition_statuses': Requisition.STATUS_CHOICES,
+        'po_statuses': PurchaseOrder.STATUS_CHOICES,
+        'supplier_statuses': Supplier.STATUS_CHOICES,
+    }
+    
+    return render(request, 'admin/reports.html', context)
+
+
+# ============================================================================
+# EXCEL EXPORT
+# ============================================================================
+
+@login_required
+def export_report_excel(request):
+    """
+    Export filtered report data to Excel
+    """
+    import openpyxl
+    from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+    if request.user.role != 'ADMIN':
+        return HttpResponse('Access denied', status=403)
+    
+    report_type = request.GET.get('report_type', 'requisitions')
+    start_date = request.GET.get('start_date')
+    end_date = request.GET.get('end_date')
+    department_id = request.GET.get('department')
+    supplier_id = request.GET.get('supplier')
+    status_filter = request.GET.get('status')
+    
+    # Create workbook
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    
+    # Styling
+    header_fill = PatternFill(start_color='2563EB', end_color='2563EB', fill_type='solid')
+    header_font = Font(bold=True, color='FFFFFF', size=12)
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    
+    # ========== REQUISITIONS EXPORT ==========
+    if report_type == 'requisitions':
+        ws.title = 'Requisitions Report'
+        
+        # Headers
+        headers = ['Req Number', 'Date', 'Department', 'Title', 'Requested By', 
+                   'Status', 'Priority', 'Estimated Amount', 'Required Date']
+        ws.append(headers)
+        
+        # Style headers
+        for col_num, header in enumerate(headers, 1):
+            cell = ws.cell(row=1, column=col_num)
+            cell.fill = header_fill
+            cell.font = header_font
+            cell.alignment = Alignment(horizontal='center', vertical='center')
+            cell.border = border
+        
+        # Get data
+        queryset = Requisition.objects.select_related(
+            'department', 'requested_by'
+        )
+        
+        if start_date:
+            queryset = queryset.filter(created_at__date__gte=start_date)
+        if end_date:
+            queryset = queryset.filter(created_at__date__lte=end_date)
+        if department_id:
+            queryset = queryset.filter(department_id=department_id)
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+        
+        # Add data rows
+        for req in queryset.order_by('-created_at'):
+            ws.append([
+                req.requisition_number,
+                req.created_at.strftime('%Y-%m-%d'),
+                req.department.name,
+                req.title,
+                req.requested_by.get_full_name(),
+                dict(Requisition.STATUS_CHOICES).get(req.status, req.status),
+                dict(Requisition.PRIORITY_CHOICES).get(req.priority, req.priority),
+                float(req.estimated_amount),
+                req.required_date.strftime('%Y-%m-%d')
+            ])
+        
+        # Auto-size columns
+        for col in ws.columns:
+            max_length = 0
+            column = col[0].column_letter
+            for cell in col:
+                try:
+                    if len(str(cell.value)) > max_length:
+                        max_length = len(str(cell.value))
+                except:
+                    pass
+            adjusted_width = min(max_length + 2, 50)
+            ws.column_dimensions[column].width = adjusted_width
+    
+    # ========== PURCHASE ORDERS EXPORT ==========
+    elif report_type == 'purchase_orders':
+        ws.title = 'Purchase Orders Report'
+        
+        headers = ['PO Number', 'Date', 'Supplier', 'Requisition', 'Status', 
+                   'Subtotal', 'Tax', 'Total', 'Delivery Date']
+        ws.append(headers)
+        
+        for col_num, header in enumerate(headers, 1):
+            cell = ws.cell(row=1, column=col_num)
+            cell.fill = header_fill
+            cell.font = header_font
+            cell.alignment = Alignment(horizontal='center', vertical='center')
+            cell.border = border
+        
+        queryset = PurchaseOrder.objects.select_related(
+            'supplier', 'requisition'
+        )
+        
+        if start_date:
+            queryset = queryset.filter(po_date__gte=start_date)
+        if end_date:
+            queryset = queryset.filter(po_date__lte=end_date)
+        if supplier_id:
+            queryset = queryset.filter(supplier_id=supplier_id)
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+        
+        for po in queryset.order_by('-po_date'):
+            ws.append([
+                po.po_number,
+                po.po_date.strftime('%Y-%m-%d'),
+                po.supplier.name,
+                po.requisition.requisition_number,
+                dict(PurchaseOrder.STATUS_CHOICES).get(po.status, po.status),
+                float(po.subtotal),
+                float(po.tax_amount),
+                float(po.total_amount),
+                po.delivery_date.strftime('%Y-%m-%d')
+            ])
+        
+        for col in ws.columns:
+            max_length = 0
+            column = col[0].column_letter
+            for cell in col:
+                try:
+                    if len(str(cell.value)) > max_length:
+                        max_length = len(str(cell.value))
+                except:
+                    pass
+            adjusted_width = min(max_length + 2, 50)
+            ws.column_dimensions[column].width = adjusted_width
+    
+    # ========== SUPPLIER EXPORT ==========
+    elif report_type == 'suppliers':
+        ws.title = 'Suppliers Report'
+        
+        headers = ['Supplier Number', 'Name', 'Email', 'Phone', 'Status', 
+                   'PO Count', 'Total Value', 'Rating']
+        ws.append(headers)
+        
+        for col_num, header in enumerate(headers, 1):
+            cell = ws.cell(row=1, column=col_num)
+            cell.fill = header_fill
+            cell.font = header_font
+            cell.alignment = Alignment(horizontal='center', vertical='center')
+            cell.border = border
+        
+        queryset = Supplier.objects.annotate(
+            po_count=Count('purchase_orders'),
+            total_value=Sum('purchase_orders__total_amount')
+        )
+        
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+        
+        for supplier in queryset.order_by('name'):
+            ws.append([
+                supplier.supplier_number,
+                supplier.name,
+                supplier.email,
+                supplier.phone_number,
+                dict(Supplier.STATUS_CHOICES).get(supplier.status, supplier.status),
+                supplier.po_count or 0,
+                float(supplier.total_value or 0),
+                float(supplier.rating)
+            ])
+        
+        for col in ws.columns:
+            max_length = 0
+            column = col[0].column_letter
+            for cell in col:
+                try:
+                    if len(str(cell.value)) > max_length:
+                        max_length = len(str(cell.value))
+                except:
+                    pass
+            adjusted_width = min(max_length + 2, 50)
+            ws.column_dimensions[column].width = adjusted_width
+    
+    # ========== BUDGET EXPORT ==========
+    elif report_type == 'budget':
+        ws.title = 'Budget Report'
+        
+        headers = ['Department', 'Category', 'Budget Year', 'Allocated', 
+                   'Committed', 'Spent', 'Available', 'Utilization %']
+        ws.append(headers)
+        
+        for col_num, header in enumerate(headers, 1):
+            cell = ws.cell(row=1, column=col_num)
+            cell.fill = header_fill
+            cell.font = header_font
+            cell.alignment = Alignment(horizontal='center', vertical='center')
+            cell.border = border
+        
+        queryset = Budget.objects.select_related(
+            'department', 'category', 'budget_year'
+        ).filter(is_active=True)
+        
+        if department_id:
+            queryset = queryset.filter(department_id=department_id)
+        
+        for budget in queryset.order_by('department__name', 'category__name'):
+            allocated = budget.allocated_amount or 0
+            used = (budget.committed_amount or 0) + (budget.actual_spent or 0)
+            ws.append([
+                budget.department.name,
+                budget.category.name,
+                budget.budget_year.name,
+                float(allocated),
+                float(budget.committed_amount or 0),
+                float(budget.actual_spent or 0),
+                float(budget.available_balance),
+                round(float(used / allocated * 100), 2) if allocated else 0,
+            ])
+        
+        for col in ws.columns:
+            max_length = 0
+            column = col[0].column_letter
+            for cell in col:
+                try:
+                    if len(str(cell.value)) > max_length:
+                        max_length = len(str(cell.value))
+                except:
+                    pass
+            adjusted_width = min(max_length + 2, 50)
+            ws.column_dimensions[column].width = adjusted_width
+    
+    response = HttpResponse(
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{report_type}_report_{timezone.now().strftime("%Y%m%d")}.xlsx"'
+    )
+    wb.save(response)
+    return response
+
+
+# ============================================================================
+# USER MANAGEMENT VIEWS
+# ============================================================================
+
+@login_required
+def user_list(request):
+    """List all users with filtering"""
+    if request.user.role not in ['ADMIN', 'PROCUREMENT']:
+        messages.error(request, 'You do not have permission to access this page.')
+        return redirect('dashboard')
+    
+    users = User.objects.all().select_related('department', 'department__faculty')
+    
+    # Filters
+    search = request.GET.get('search', '')
+    role = request.GET.get('role', '')
+    department = request.GET.get('department', '')
+    status = request.GET.get('status', '')
+    
+    if search:
+        users = users.filter(
+            Q(username__icontains=search) |
+            Q(first_name__icontains=search) |
+            Q(last_name__icontains=search) |
+            Q(email__icontains=search) |
+            Q(employee_id__icontains=search)
+        )
+    
+    if role:
+        users = users.filter(role=role)
+    
+    if department:
+        users = users.filter(department_id=department)
+    
+    if status:
+        is_active = status == 'active'
+        users = users.filter(is_active_user=is_active)
+    
+    # Statistics
+    total_users = users.count()
+    active_users = users.filter(is_active_user=True).count()
+    inactive_users = users.filter(is_active_user=False).count()
+    
+    # Role distribution
+    role_counts = users.values('role').annotate(count=Count('id'))
+    
+    # Pagination
+    paginator = Paginator(users, 20)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    
+    context = {
+        'users': page_obj,
+        'total_users': total_users,
+        'active_users': active_users,
+        'inactive_users': inactive_users,
+        'role_counts': role_counts,
+        'role_choices': User.ROLE_CHOICES,
+        'departments': Department.objects.filter(is_active=True),
+        'filters': {
+            'search': search,
+            'role': role,
+            'department': department,
+            'status': status,
+        }
+    }
+    return render(request, 'administration/user_list.html', context)
+
+
+@login_required
+def user_create(request):
+    """Create new user"""
+    if request.user.role not in ['ADMIN']:
+        messages.error(request, 'You do not have permission to create users.')
+        return redirect('user_list')
+    
+    if request.method == 'POST':
+        form = UserForm(request.POST, request.FILES)
+        if form.is_valid():
+            user = form.save(commit=False)
+            user.set_password(form.cleaned_data['password'])
+            user.save()
+            
+            # Log audit
+            record_audit(
+                durable=True,
+                user=request.user,
+                action='CREATE',
+                model_name='User',
+                object_id=str(user.id),
+                object_repr=str(user),
+                changes={'created': 'New user created'}
+            )
+            
+            messages.success(request, f'User {user.username} created successfully.')
+            return redirect('user_detail', user.id)
+    else:
+        form = UserForm()
+    
+    context = {
+        'form': form,
+        'departments': Department.objects.filter(is_active=True),
+        'role_choices': User.ROLE_CHOICES,
+    }
+    return render(request, 'administration/user_form.html', context)
+
+
+@login_required
+def user_detail(request, user_id):
+    """View user details"""
+    if request.user.role not in ['ADMIN', 'PROCUREMENT']:
+        messages.error(request, 'You do not have permission to view user details.')
+        return redirect('dashboard')
+    
+    user_obj = get_object_or_404(User, id=user_id)
+    
+    # Get user activity
+    recent_activity = AuditLog.objects.filter(user=user_obj).order_by('-timestamp')[:20]
+    
+    # Get statistics
+    total_requisitions = user_obj.requisitions_created.count()
+    total_approvals = user_obj.approvals_made.count()
+    
+    context = {
+        'user_obj': user_obj,
+        'recent_activity': recent_activity,
+        'total_requisitions': total_requisitions,
+        'total_approvals': total_approvals,
+    }
+    return render(request, 'administration/user_detail.html', context)
+
+
+@login_required
+def user_edit(request, user_id):
+    """Edit user"""
+    if request.user.role not in ['ADMIN']:
+        messages.error(request, 'You do not have permission to edit users.')
+        return redirect('user_list')
+    
+    user_obj = get_object_or_404(User, id=user_id)
+    
+    if request.method == 'POST':
+        form = UserForm(request.POST, request.FILES, instance=user_obj)
+        if form.is_valid():
+            user = form.save()
+            
+            # Log audit
+            record_audit(
+                durable=True,
+                user=request.user,
+                action='UPDATE',
+                model_name='User',
+                object_id=str(user.id),
+                object_repr=str(user),
+                changes={'updated': 'User information updated'}
+            )
+            
+            messages.success(request, f'User {user.username} updated successfully.')
+            return redirect('user_detail', user.id)
+    else:
+        form = UserForm(instance=user_obj)
+    
+    context = {
+        'form': form,
+        'user_obj': user_obj,
+        'departments': Department.objects.filter(is_active=True),
+        'role_choices': User.ROLE_CHOICES,
+    }
+    return render(request, 'administration/user_form.html', context)
+
+
+@login_required
+def user_toggle_status(request, user_id):
+    """Toggle user active status"""
+    if request.user.role not in ['ADMIN']:
+        messages.error(request, 'You do not have permission to modify user status.')
+        return redirect('user_list')
+    
+    user_obj = get_object_or_404(User, id=user_id)
+    
+    # Prevent self-deactivation
+    if user_obj == request.user:
+        messages.error(request, 'You cannot deactivate your own account.')
+        return redirect('user_detail', user_id)
+    
+    user_obj.is_active_user = not user_obj.is_active_user
+    user_obj.save()
+    
+    status = 'activated' if user_obj.is_active_user else 'deactivated'
+    
+    # Log audit
+    record_audit(
+        durable=True,
+        user=request.user,
+        action='UPDATE',
+        model_name='User',
+        object_id=str(user_obj.id),
+        object_repr=str(user_obj),
+        changes={'status_changed': status}
+    )
+    
+    messages.success(request, f'User {user_obj.username} has been {status}.')
+    return redirect('user_detail', user_id)
+
+
+# ============================================================================
+# ROLES & PERMISSIONS VIEWS
+# ============================================================================
+
+@login_required
+def role_permissions_list(request):
+    """List roles and their permissions"""
+    if request.user.role not in ['ADMIN']:
+        messages.error(request, 'You do not have permission to access this page.')
+        return redirect('dashboard')
+    
+    # Get all roles with their permissions
+    roles_data = []
+    for role_code, role_name in User.ROLE_CHOICES:
+        permissions = RolePermission.objects.filter(role=role_code).select_related('permission')
+        roles_data.append({
+            'code': role_code,
+            'name': role_name,
+            'permissions': permissions,
+            'permission_count': permissions.count(),
+        })
+    
+    # Get all available permissions grouped by module
+    all_permissions = Permission.objects.all().order_by('module', 'name')
+    modules = {}
+    for perm in all_permissions:
+        if perm.module not in modules:
+            modules[perm.module] = []
+        modules[perm.module].append(perm)
+    
+    context = {
+        'roles_data': roles_data,
+        'modules': modules,
+        'all_permissions': all_permissions,
+    }
+    return render(request, 'administration/role_permissions_list.html', context)
+
+
+@login_required
+def role_permissions_edit(request, role_code):
+    """Edit permissions for a specific role"""
+    if request.user.role not in ['ADMIN']:
+        messages.error(request, 'You do not have permission to edit role permissions.')
+        return redirect('role_permissions_list')
+    
+    role_name = dict(User.ROLE_CHOICES).get(role_code, role_code)
+    
+    if request.method == 'POST':
+        permission_ids = request.POST.getlist('permissions')
+        
+        # Remove existing permissions for this role
+        RolePermission.objects.filter(role=role_code).delete()
+        
+        # Add new permissions
+        for perm_id in permission_ids:
+            permission = Permission.objects.get(id=perm_id)
+            RolePermission.objects.create(role=role_code, permission=permission)
+        
+        # Log audit
+        record_audit(
+            durable=True,
+            user=request.user,
+            action='UPDATE',
+            model_name='RolePermission',
+            object_id=role_code,
+            object_repr=f'{role_name} permissions',
+            changes={'permissions_updated': f'{len(permission_ids)} permissions assigned'}
+        )
+        
+        messages.success(request, f'Permissions for {role_name} updated successfully.')
+        return redirect('role_permissions_list')
+    
+    # Get current permissions for this role
+    current_permissions = RolePermission.objects.filter(role=role_code).values_list('permission_id', flat=True)
+    
+    # Get all permissions grouped by module
+    all_permissions = Permission.objects.all().order_by('module', 'name')
+    modules = {}
+    for perm in all_permissions:
+        if perm.module not in modules:
+            modules[perm.module] = []
+        modules[perm.module].append(perm)
+    
+    context = {
+        'role_code': role_code,
+        'role_name': role_name,
+        'modules': modules,
+        'current_permissions': list(current_permissions),
+    }
+    return render(request, 'administration/role_permissions_edit.html', context)
+
+
+# ============================================================================
+# DEPARTMENT MANAGEMENT VIEWS
+# ============================================================================
+
+@login_required
+def department_list(request):
+    """List all departments"""
+    if request.user.role not in ['ADMIN', 'PROCUREMENT']:
+        messages.error(request, 'You do not have permission to access this page.')
+        return redirect('dashboard')
+    
+    departments = Department.objects.all().select_related('faculty', 'hod')
+    
+    # Filters
+    search = request.GET.get('search', '')
+    faculty = request.GET.get('faculty', '')
+    dept_type = request.GET.get('type', '')
+    status = request.GET.get('status', '')
+    
+    if search:
+        departments = departments.filter(
+            Q(name__icontains=search) |
+            Q(code__icontains=search)
+        )
+    
+    if faculty:
+        departments = departments.filter(faculty_id=faculty)
+    
+    if dept_type:
+        departments = departments.filter(department_type=dept_type)
+    
+    if status:
+        is_active = status == 'active'
+        departments = departments.filter(is_active=is_active)
+    
+    # Statistics
+    total_depts = departments.count()
+    active_depts = departments.filter(is_active=True).count()
+    
+    # Type distribution
+    type_counts = departments.values('department_type').annotate(count=Count('id'))
+    
+    context = {
+        'departments': departments,
+        'total_depts': total_depts,
+        'active_depts': active_depts,
+        'type_counts': type_counts,
+        'faculties': Faculty.objects.filter(is_active=True),
+        'type_choices': Department.DEPARTMENT_TYPE,
+        'filters': {
+            'search': search,
+            'faculty': faculty,
+            'type': dept_type,
+            'status': status,
+        }
+    }
+    return render(request, 'administration/department_list.html', context)
+
+
+@login_required
+def department_create(request):
+    """Create new department"""
+    if request.user.role not in ['ADMIN']:
+        messages.error(request, 'You do not have permission to create departments.')
+        return redirect('department_list')
+    
+    if request.method == 'POST':
+        form = DepartmentForm(request.POST)
+        if form.is_valid():
+            department = form.save()
+            
+            # Log audit
+            record_audit(
+                user=request.user,
+                action='CREATE',
+                model_name='Department',
+                object_id=str(department.id),
+                object_repr=str(department),
+                changes={'created': 'New department created'}
+            )
+            
+            messages.success(request, f'Department {department.name} created successfully.')
+            return redirect('department_detail', department.id)
+    else:
+        form = DepartmentForm()
+    
+    context = {
+        'form': form,
+        'faculties': Faculty.objects.filter(is_active=True),
+        'type_choices': Department.DEPARTMENT_TYPE,
+        'hods': User.objects.filter(role='HOD', is_active_user=True),
+    }
+    return render(request, 'administration/department_form.html', context)
+
+
+@login_required
+def department_detail(request, dept_id):
+    """View department details"""
+    if request.user.role not in ['ADMIN', 'PROCUREMENT', 'HOD']:
+        messages.error(request, 'You do not have permission to view department details.')
+        return redirect('dashboard')
+    
+    department = get_object_or_404(Department, id=dept_id)
+    
+    # Statistics
+    total_staff = User.objects.filter(department=department, is_active_user=True).count()
+    total_requisitions = department.requisitions.count()
+    total_budgets = department.budgets.count()
+    
+    # Recent activity
+    recent_requisitions = department.requisitions.order_by('-created_at')[:5]
+    
+    context = {
+        'department': department,
+        'total_staff': total_staff,
+        'total_requisitions': total_requisitions,
+        'total_budgets': total_budgets,
+        'recent_requisitions': recent_requisitions,
+    }
+    return render(request, 'administration/department_detail.html', context)
+
+
+# ============================================================================
+# SYSTEM SETTINGS VIEWS
+# ============================================================================
+
+@login_required
+def system_settings(request):
+    """System configuration settings"""
+    if request.user.role not in ['ADMIN']:
+        messages.error(request, 'You do not have permission to access system settings.')
+        return redirect('dashboard')
+    
+    configs = SystemConfiguration.objects.all().order_by('key')
+    
+    if request.method == 'POST':
+        for config in configs:
+            if config.is_editable:
+                new_value = request.POST.get(f'config_{config.id}')
+                if new_value is not None:
+                    config.value = new_value
+                    config.updated_by = request.user
+                    config.save()
+        
+        # Log audit
+        record_audit(
+            durable=True,
+            user=request.user,
+            action='UPDATE',
+            model_name='SystemConfiguration',
+            object_id='bulk',
+            object_repr='System Settings',
+            changes={'updated': 'System configuration updated'}
+        )
+        
+        messages.success(request, 'System settings updated successfully.')
+        return redirect('system_settings')
+    
+    context = {
+        'configs': configs,
+    }
+    return render(request, 'administration/system_settings.html', context)
+
+
+# ============================================================================
+# AUDIT TRAIL VIEWS
+# ============================================================================
+
+@login_required
+def audit_trail(request):
+    """View audit trail"""
+    if request.user.role not in ['ADMIN', 'AUDITOR']:
+        messages.error(request, 'You do not have permission to access audit trail.')
+        return redirect('dashboard')
+    
+    logs = AuditLog.objects.all().select_related('user')
+    
+    # Filters
+    search = request.GET.get('search', '')
+    user = request.GET.get('user', '')
+    action = request.GET.get('action', '')
+    model = request.GET.get('model', '')
+    date_from = request.GET.get('date_from', '')
+    date_to = request.GET.get('date_to', '')
+    
+    if search:
+        logs = logs.filter(
+            Q(object_repr__icontains=search) |
+            Q(object_id__icontains=search)
+        )
+    
+    if user:
+        logs = logs.filter(user_id=user)
+    
+    if action:
+        logs = logs.filter(action=action)
+    
+    if model:
+        logs = logs.filter(model_name=model)
+    
+    if date_from:
+        logs = logs.filter(timestamp__gte=date_from)
+    
+    if date_to:
+        logs = logs.filter(timestamp__lte=date_to)
+    
+    # Statistics
+    total_logs = logs.count()
+    action_counts = logs.values('action').annotate(count=Count('id'))
+    
+    # Pagination
+    paginator = Paginator(logs, 50)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    
+    context = {
+        'logs': page_obj,
+        'total_logs': total_logs,
+        'action_counts': action_counts,
+        'users': User.objects.filter(is_active_user=True),
+        'action_choices': AuditLog.ACTION_TYPES,
+        'filters': {
+            'search': search,
+            'user': user,
+            'action': action,
+            'model': model,
+            'date_from': date_from,
+            'date_to': date_to,
+        }
+    }
+    return render(request, 'administration/audit_trail.html', context)
+
+
+@login_required
+def performance_metrics(request):
+    """
+    Per-view query counts and latencies recorded by
+    QueryInstrumentationMiddleware (this worker process only).
+    
+    ?sort=queries|sql_ms|template_ms|total_ms&limit=N; POST resets.
+    """
+    if request.user.role != 'ADMIN' and not request.user.is_superuser:
+        return JsonResponse({'error': 'Administrators only'}, status=403)
+    
+    if request.method == 'POST':
+        instrumentation_registry.reset()
+        return JsonResponse({'reset': True})
+    
+    try:
+        limit = int(request.GET.get('limit', 0))
+    except ValueError:
+        limit = 0
+    return JsonResponse(instrumentation_metrics(request.GET.get('sort', 'total_ms'), limit))
@@ -0,0 +1,1040 @@
+"""
+Auditor views: dashboard, analytics, reviews, red flags, audit trail
+and reports. Read-only GET requests are served from the read replica.
+"""
+
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.db.models import Avg, Count, F, Max, Q, Sum
+from django.shortcuts import redirect, render
+from django.utils import timezone
+
+from pms.audit_storage import audit_window, logs_between
+from pms.db_routing import read_replica
+from pms.models import (
+    AuditActivitySummary, AuditLog, Budget, Contract, Finding, Invoice,
+    Payment, PurchaseOrder, Requisition, Supplier, SupplierPerformance, Tender,
+)
+from pms.red_flags import finding_summary
+
+
+# ============================================================================
+# AUDITOR DASHBOARD & ANALYTICS
+# ============================================================================
+
+@read_replica
+@login_required
+def auditor_dashboard(request):
+    """Auditor Dashboard with Analytics"""
+    if request.user.role != 'AUDITOR':
+        messages.error(request, 'Access denied. Auditor role required.')
+        return redirect('dashboard')
+    
+    # Date ranges
+    today = timezone.now().date()
+    thirty_days_ago = today - timedelta(days=30)
+    six_months_ago = today - timedelta(days=180)
+    this_month_start = today.replace(day=1)
+    
+    # ========================================================================
+    # KEY METRICS
+    # ========================================================================
+    
+    # Compliance Stats
+    total_requisitions = Requisition.objects.count()
+    emergency_requisitions = Requisition.objects.filter(is_emergency=True).count()
+    unplanned_requisitions = Requisition.objects.filter(is_planned=False).count()
+    
+    total_tenders = Tender.objects.count()
+    total_contracts = Contract.objects.count()
+    total_purchase_orders = PurchaseOrder.objects.count()
+    
+    # High-value transactions
+    high_value_reqs = Requisition.objects.filter(
+        estimated_amount__gte=1000000
+    ).count()
+    
+    high_value_pos = PurchaseOrder.objects.filter(
+        total_amount__gte=1000000
+    ).count()
+    
+    # Pending reviews
+    pending_reviews_count = Requisition.objects.filter(
+        status__in=['SUBMITTED', 'HOD_APPROVED', 'FACULTY_APPROVED']
+    ).count()
+    
+    # Flagged items
+    flagged_count = (
+        emergency_requisitions + 
+        unplanned_requisitions + 
+        Tender.objects.annotate(bid_count=Count('bids')).filter(bid_count=1).count()
+    )
+    
+    # Budget compliance
+    budgets_with_overruns = Budget.objects.filter(
+        actual_spent__gt=F('allocated_amount')
+    ).count()
+    
+    total_budgets = Budget.objects.count()
+    budget_compliance_rate = ((total_budgets - budgets_with_overruns) / total_budgets * 100) if total_budgets > 0 else 100
+    
+    # Payment compliance
+    total_invoices = Invoice.objects.count()
+    paid_on_time = Invoice.objects.filter(
+        status='PAID',
+        payment_date__lte=F('due_date')
+    ).count()
+    payment_compliance_rate = (paid_on_time / total_invoices * 100) if total_invoices > 0 else 100
+    
+    # Supplier compliance
+    total_suppliers = Supplier.objects.filter(status='APPROVED').count()
+    compliant_suppliers = Supplier.objects.filter(
+        status='APPROVED',
+        tax_compliance_expiry__gte=today
+    ).count()
+    supplier_compliance_rate = (compliant_suppliers / total_suppliers * 100) if total_suppliers > 0 else 100
+    
+    # ========================================================================
+    # CHART 1: COMPLIANCE OVERVIEW (Donut Chart)
+    # ========================================================================
+    
+    compliance_overview_chart = json.dumps({
+        'labels': ['Budget Compliance', 'Payment Compliance', 'Supplier Compliance', 'Procurement Plan Compliance'],
+        'values': [
+            round(budget_compliance_rate, 1),
+            round(payment_compliance_rate, 1),
+            round(supplier_compliance_rate, 1),
+            85.0  # Placeholder for procurement plan compliance
+        ],
+        'colors': ['#10B981', '#6366F1', '#F59E0B', '#2563EB']
+    })
+    
+    # ========================================================================
+    # CHART 2: RISK INDICATORS (Radar Chart)
+    # ========================================================================
+    
+    # Calculate risk scores (0-100, higher = more risk)
+    emergency_risk = (emergency_requisitions / total_requisitions * 100) if total_requisitions > 0 else 0
+    unplanned_risk = (unplanned_requisitions / total_requisitions * 100) if total_requisitions > 0 else 0
+    
+    single_bid_tenders = Tender.objects.annotate(
+        bid_count=Count('bids')
+    ).filter(bid_count=1).count()
+    single_bid_risk = (single_bid_tenders / total_tenders * 100) if total_tenders > 0 else 0
+    
+    overdue_pos = PurchaseOrder.objects.filter(
+        status__in=['SENT', 'ACKNOWLEDGED'],
+        delivery_date__lt=today
+    ).count()
+    delivery_risk = (overdue_pos / total_purchase_orders * 100) if total_purchase_orders > 0 else 0
+    
+    overdue_invoices = Invoice.objects.filter(
+        status__in=['SUBMITTED', 'APPROVED'],
+        due_date__lt=today
+    ).count()
+    payment_risk = (overdue_invoices / total_invoices * 100) if total_invoices > 0 else 0
+    
+    budget_risk = (budgets_with_overruns / total_budgets * 100) if total_budgets > 0 else 0
+    
+    risk_radar_chart = json.dumps({
+        'labels': ['Emergency Procurements', 'Unplanned Items', 'Single Bids', 
+                   'Delivery Delays', 'Payment Delays', 'Budget Overruns'],
+        'values': [
+            round(emergency_risk, 1),
+            round(unplanned_risk, 1),
+            round(single_bid_risk, 1),
+            round(delivery_risk, 1),
+            round(payment_risk, 1),
+            round(budget_risk, 1)
+        ]
+    })
+    
+    # ========================================================================
+    # CHART 3: PROCUREMENT TREND (Last 6 Months)
+    # ========================================================================
+    
+    six_months_data = []
+    for i in range(6):
+        month_start = (today.replace(day=1) - timedelta(days=30*i)).replace(day=1)
+        if i < 5:
+            month_end = (today.replace(day=1) - timedelta(days=30*(i-1))).replace(day=1) - timedelta(days=1)
+        else:
+            month_end = today
+        
+        reqs = Requisition.objects.filter(
+            created_at__range=[month_start, month_end]
+        ).count()
+        
+        pos = PurchaseOrder.objects.filter(
+            created_at__range=[month_start, month_end]
+        ).count()
+        
+        payments = Payment.objects.filter(
+            created_at__range=[month_start, month_end],
+            status='COMPLETED'
+        ).count()
+        
+        six_months_data.insert(0, {
+            'month': month_start.strftime('%b %Y'),
+            'requisitions': reqs,
+            'pos': pos,
+            'payments': payments
+        })
+    
+    procurement_trend_chart = json.dumps({
+        'labels': [d['month'] for d in six_months_data],
+        'requisitions': [d['requisitions'] for d in six_months_data],
+        'purchase_orders': [d['pos'] for d in six_months_data],
+        'payments': [d['payments'] for d in six_months_data],
+    })
+    
+    # ========================================================================
+    # CHART 4: TRANSACTION VALUE BY DEPARTMENT (Bar Chart)
+    # ========================================================================
+    
+    dept_spending = Budget.objects.values(
+        'department__name', 'department__code'
+    ).annotate(
+        total_spent=Sum('actual_spent')
+    ).order_by('-total_spent')[:8]
+    
+    dept_spending_chart = json.dumps({
+        'labels': [d['department__code'] for d in dept_spending],
+        'values': [float(d['total_spent']) for d in dept_spending],
+        'full_names': [d['department__name'] for d in dept_spending]
+    })
+    
+    # ========================================================================
+    # FLAGGED TRANSACTIONS (FIXED)
+    # ========================================================================
+    
+    flagged_items = []
+    
+    # Emergency requisitions
+    emergency_reqs = Requisition.objects.filter(
+        is_emergency=True,
+        created_at__gte=thirty_days_ago
+    ).select_related('department', 'requested_by')[:5]
+    
+    for req in emergency_reqs:
+        flagged_items.append({
+            'type': 'Emergency Requisition',
+            'reference': req.requisition_number,
+            'description': req.title,
+            'amount': req.estimated_amount,
+            'date': req.created_at.date(),  # Convert to date
+            'flag': 'Emergency Procurement',
+            'sort_date': req.created_at  # Keep datetime for sorting
+        })
+    
+    # Single-bid tenders
+    single_bid_tenders = Tender.objects.annotate(
+        bid_count=Count('bids')
+    ).filter(bid_count=1, created_at__gte=thirty_days_ago)[:5]
+    
+    for tender in single_bid_tenders:
+        flagged_items.append({
+            'type': 'Tender',
+            'reference': tender.tender_number,
+            'description': tender.title,
+            'amount': tender.estimated_budget,
+            'date': tender.created_at.date(),  # Convert to date
+            'flag': 'Single Bid Received',
+            'sort_date': tender.created_at  # Keep datetime for sorting
+        })
+    
+    # Overdue purchase orders
+    overdue_pos_list = PurchaseOrder.objects.filter(
+        status__in=['SENT', 'ACKNOWLEDGED'],
+        delivery_date__lt=today
+    ).select_related('supplier')[:5]
+    
+    for po in overdue_pos_list:
+        # Convert delivery_date (date) to datetime for consistent sorting
+        delivery_datetime = datetime.combine(po.delivery_date, datetime.min.time())
+        delivery_datetime = timezone.make_aware(delivery_datetime)
+        
+        flagged_items.append({
+            'type': 'Purchase Order',
+            'reference': po.po_number,
+            'description': f"Overdue delivery - {po.supplier.name}",
+            'amount': po.total_amount,
+            'date': po.delivery_date,  # Keep as date for display
+            'flag': 'Overdue Delivery',
+            'sort_date': delivery_datetime  # Use datetime for sorting
+        })
+    
+    # Sort by datetime, then remove the sort_date field
+    flagged_items.sort(key=lambda x: x['sort_date'], reverse=True)
+    for item in flagged_items:
+        del item['sort_date']
+    
+    # ========================================================================
+    # RECENT ACTIVITIES
+    # ========================================================================
+    
+    recent_activities = AuditLog.objects.select_related('user').order_by('-timestamp')[:15]
+    
+    # Pending high-value reviews
+    pending_reviews = Requisition.objects.filter(
+        estimated_amount__gte=500000,
+        status__in=['SUBMITTED', 'HOD_APPROVED', 'FACULTY_APPROVED']
+    ).select_related('department', 'requested_by').order_by('-created_at')[:10]
+    
+    # High-value purchase orders
+    high_value_pos_list = PurchaseOrder.objects.filter(
+        total_amount__gte=1000000
+    ).select_related('supplier', 'requisition').order_by('-created_at')[:10]
+    
+    # ========================================================================
+    # COMPLIANCE ALERTS
+    # ========================================================================
+    
+    # Budget overruns
+    budget_overruns = Budget.objects.filter(
+        actual_spent__gt=F('allocated_amount')
+    ).select_related('department', 'category')[:5]
+    
+    # Expired supplier documents
+    expired_supplier_docs = Supplier.objects.filter(
+        Q(tax_compliance_expiry__lt=today) | 
+        Q(registration_expiry__lt=today),
+        status='APPROVED'
+    )[:5]
+    
+    # Late payments 
+    late_payments = Invoice.objects.filter(
+        status__in=['SUBMITTED', 'APPROVED'],
+        due_date__lt=today
+    ).select_related('supplier').order_by('due_date')[:5]
+    
+    # Contracts expiring soon (within 30 days)
+    expiring_contracts = Contract.objects.filter(
+        status='ACTIVE',
+        end_date__lte=today + timedelta(days=30),
+        end_date__gte=today
+    ).select_related('supplier').order_by('end_date')[:5]
+    
+    # ========================================================================
+    # USER ACTIVITY SUMMARY
+    # ========================================================================
+    
+    actions_today = {}
+    for counts in AuditActivitySummary.objects.filter(
+        date=today
+    ).values_list('action_counts', flat=True):
+        for action, count in counts.items():
+            actions_today[action] = actions_today.get(action, 0) + count
+    user_actions_today = [
+        {'action': action, 'count': count} for action, count in actions_today.items()
+    ]
+    
+    most_active_users = AuditActivitySummary.objects.filter(
+        date__gte=thirty_days_ago
+    ).values('user__username', 'user__first_name', 'user__last_name').annotate(
+        action_count=Sum('total_actions')
+    ).order_by('-action_count')[:5]
+    
+    # ========================================================================
+    # CONTEXT
+    # ========================================================================
+    
+    context = {
+        # Key Metrics
+        'total_requisitions': total_requisitions,
+        'emergency_requisitions': emergency_requisitions,
+        'unplanned_requisitions': unplanned_requisitions,
+        'total_tenders': total_tenders,
+        'total_contracts': total_contracts,
+        'total_purchase_orders': total_purchase_orders,
+        'high_value_reqs': high_value_reqs,
+        'high_value_pos': high_value_pos,
+        'pending_reviews_count': pending_reviews_count,
+        'flagged_count': flagged_count,
+        
+        # Compliance Rates
+        'budget_compliance_rate': round(budget_compliance_rate, 1),
+        'payment_compliance_rate': round(payment_compliance_rate, 1),
+        'supplier_compliance_rate': round(supplier_compliance_rate, 1),
+        
+        # Chart Data (JSON) - Only 4 essential charts
+        'compliance_overview_chart': compliance_overview_chart,
+        'risk_radar_chart': risk_radar_chart,
+        'procurement_trend_chart': procurement_trend_chart,
+        'dept_spending_chart': dept_spending_chart,
+        
+        # Lists
+        'recent_activities': recent_activities,
+        'pending_reviews': pending_reviews,
+        'high_value_pos_list': high_value_pos_list,
+        'flagged_items': flagged_items[:10],
+        
+        # Alerts
+        'budget_overruns': budget_overruns,
+        'expired_supplier_docs': expired_supplier_docs,
+        'late_payments': late_payments,
+        'expiring_contracts': expiring_contracts,
+        
+        # User Activity
+        'user_actions_today': user_actions_today,
+        'most_active_users': most_active_users,
+    }
+    
+    return render(request, 'auditor/dashboard.html', context)
+
+@read_replica
+@login_required
+def auditor_analytics_view(request):
+    """Audit analytics and insights"""
+    if request.user.role != 'AUDITOR':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    # Spending patterns
+    monthly_spend = PurchaseOrder.objects.filter(
+        status='APPROVED',
+        created_at__year=timezone.now().year
+    ).values('created_at__month').annotate(
+        total=Sum('total_amount')
+    )
+    
+    # Department spending
+    dept_spending = Budget.objects.values(
+        'department__name'
+    ).annotate(
+        allocated=Sum('allocated_amount'),
+        spent=Sum('actual_spent')
+    )
+    
+    # Supplier analysis
+    top_suppliers = Supplier.objects.annotate(
+        total_orders=Count('purchase_orders'),
+        total_value=Sum('purchase_orders__total_amount')
+    ).order_by('-total_value')[:10]
+    
+    context = {
+        'monthly_spend': monthly_spend,
+        'dept_spending': dept_spending,
+        'top_suppliers': top_suppliers,
+    }
+    
+    return render(request, 'auditor/analytics.html', context)
+
+
+# ============================================================================
+# AUDIT MANAGEMENT
+# ============================================================================
+
+@read_replica
+@login_required
+def auditor_all_audits_view(request):
+    """List all audits"""
+    if request.user.role != 'AUDITOR':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    # TODO: Create Audit model first
+    # For now, showing audit logs as placeholder
+    audit_logs = AuditLog.objects.select_related('user').all()
+    
+    context = {
+        'audit_logs': audit_logs,
+    }
+    
+    return render(request, 'auditor/audits/all_audits.html', context)
+
+
+@read_replica
+@login_required
+def auditor_new_audit_view(request):
+    """Create new audit"""
+    if request.user.role != 'AUDITOR':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    # TODO: Implement audit creation
+    
+    return render(request, 'auditor/audits/new_audit.html')
+
+
+@read_replica
+@login_required
+def auditor_active_audits_view(request):
+    """List active audits"""
+    if request.user.role != 'AUDITOR':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    # TODO: Implement when Audit model exists
+    
+    return render(request, 'auditor/audits/active_audits.html')
+
+
+@read_replica
+@login_required
+def auditor_completed_audits_view(request):
+    """List completed audits"""
+    if request.user.role != 'AUDITOR':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    # TODO: Implement when Audit model exists
+    
+    return render(request, 'auditor/audits/completed_audits.html')
+
+
+# ============================================================================
+# TRANSACTION REVIEWS
+# ============================================================================
+
+@read_replica
+@login_required
+def auditor_requisitions_review_view(request):
+    """Review requisitions"""
+    if request.user.role != 'AUDITOR':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    status_filter = request.GET.get('status', '')
+    department_filter = request.GET.get('department', '')
+    
+    requisitions = Requisition.objects.select_related(
+        'department', 'requested_by', 'budget'
+    ).all()
+    
+    if status_filter:
+        requisitions = requisitions.filter(status=status_filter)
+    
+    if department_filter:
+        requisitions = requisitions.filter(department_id=department_filter)
+    
+    # Flag suspicious requisitions
+    for req in requisitions:
+        req.is_suspicious = False
+        # Check for red flags
+        if req.is_emergency and not req.emergency_justification:
+            req.is_suspicious = True
+        if req.estimated_amount > 1000000:  # High value
+            req.is_suspicious = True
+    
+    context = {
+        'requisitions': requisitions,
+        'status_choices': Requisition.STATUS_CHOICES,
+    }
+    
+    return render(request, 'auditor/reviews/requisitions.html', context)
+
+
+@read_replica
+@login_required
+def auditor_purchase_orders_review_view(request):
+    """Review purchase orders"""
+    if request.user.role != 'AUDITOR':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    purchase_orders = PurchaseOrder.objects.select_related(
+        'requisition', 'supplier', 'created_by'
+    ).all()
+    
+    # Add compliance checks
+    for po in purchase_orders:
+        po.compliance_issues = []
+        
+        # Check if PO matches requisition
+        if po.total_amount > po.requisition.estimated_amount * Decimal('1.1'):
+            po.compliance_issues.append('PO amount exceeds requisition by >10%')
+        
+        # Check approval trail
+        if not po.approved_by:
+            po.compliance_issues.append('Missing approval')
+        
+        # Check delivery timeline
+        if po.delivery_date < timezone.now().date():
+            po.compliance_issues.append('Overdue delivery')
+    
+    context = {
+        'purchase_orders': purchase_orders,
+    }
+    
+    return render(request, 'auditor/reviews/purchase_orders.html', context)
+
+
+@read_replica
+@login_required
+def auditor_payments_review_view(request):
+    """Review payments"""
+    if request.user.role != 'AUDITOR':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    payments = Payment.objects.select_related(
+        'invoice', 'invoice__supplier', 'processed_by'
+    ).all()
+    
+    # Add audit checks
+    for payment in payments:
+        payment.audit_flags = []
+        
+        # Check if payment matches invoice
+        if payment.payment_amount > payment.invoice.total_amount:
+            payment.audit_flags.append('Payment exceeds invoice amount')
+        
+        # Check if invoice was approved
+        if not payment.invoice.approved_by:
+            payment.audit_flags.append('Invoice not approved')
+        
+        # Check for duplicate payments
+        duplicate_count = Payment.objects.filter(
+            invoice=payment.invoice,
+            status='COMPLETED'
+        ).count()
+        if duplicate_count > 1:
+            payment.audit_flags.append('Possible duplicate payment')
+    
+    context = {
+        'payments': payments,
+    }
+    
+    return render(request, 'auditor/reviews/payments.html', context)
+
+
+@read_replica
+@login_required
+def auditor_contracts_review_view(request):
+    """Review contracts"""
+    if request.user.role != 'AUDITOR':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    contracts = Contract.objects.select_related(
+        'supplier', 'contract_manager'
+    ).all()
+    
+    # Add compliance checks
+    for contract in contracts:
+        contract.compliance_status = 'OK'
+        contract.issues = []
+        
+        # Check if contract is signed
+        if not contract.signed_by_university or not contract.signed_by_supplier:
+            contract.compliance_status = 'Warning'
+            contract.issues.append('Contract not fully signed')
+        
+        # Check if contract is expiring soon
+        if contract.end_date <= timezone.now().date() + timedelta(days=30):
+            contract.issues.append('Contract expiring within 30 days')
+        
+        # Check performance bond if required
+        if contract.performance_bond_required and contract.performance_bond_amount == 0:
+            contract.compliance_status = 'Critical'
+            contract.issues.append('Performance bond required but not recorded')
+    
+    context = {
+        'contracts': contracts,
+    }
+    
+    return render(request, 'auditor/reviews/contracts.html', context)
+
+
+# ============================================================================
+# COMPLIANCE
+# ============================================================================
+
+@read_replica
+@login_required
+def auditor_compliance_review_view(request):
+    """Overall compliance dashboard"""
+    if request.user.role != 'AUDITOR':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    # Compliance metrics
+    total_requisitions = Requisition.objects.count()
+    approved_requisitions = Requisition.objects.filter(
+        status='APPROVED'
+    ).count()
+    
+    total_tenders = Tender.objects.count()
+    properly_evaluated = Tender.objects.filter(
+        status='AWARDED'
+    ).count()
+    
+    total_payments = Payment.objects.count()
+    timely_payments = Payment.objects.filter(
+        status='COMPLETED',
+        payment_date__lte=timezone.now().date()
+    ).count()
+    
+    # Supplier compliance: approved suppliers with a current tax certificate
+    supplier_counts = Supplier.objects.filter(status='APPROVED').aggregate(
+        total=Count('id'),
+        compliant=Count('id', filter=Q(tax_compliance_expiry__gte=timezone.now().date())),
+    )
+    suppliers_compliant = supplier_counts['compliant']
+    total_suppliers = supplier_counts['total']
+    
+    context = {
+        'requisition_compliance': (approved_requisitions / total_requisitions * 100) if total_requisitions > 0 else 0,
+        'tender_compliance': (properly_evaluated / total_tenders * 100) if total_tenders > 0 else 0,
+        'payment_compliance': (timely_payments / total_payments * 100) if total_payments > 0 else 0,
+        'supplier_compliance': (suppliers_compliant / total_suppliers * 100) if total_suppliers > 0 else 0,
+        
+        'total_requisitions': total_requisitions,
+        'total_tenders': total_tenders,
+        'total_payments': total_payments,
+        'total_suppliers': total_suppliers,
+        'suppliers_compliant': suppliers_compliant,
+    }
+    
+    return render(request, 'auditor/compliance/overview.html', context)
+
+
+@read_replica
+@login_required
+def auditor_flagged_items_view(request):
+    """View flagged/suspicious items"""
+    if request.user.role != 'AUDITOR':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    # High-value requisitions
+    high_value_reqs = Requisition.objects.filter(
+        estimated_amount__gte=1000000
+    ).select_related('department', 'requested_by')
+    
+    # Emergency procurements
+    emergency_procs = Requisition.objects.filter(
+        is_emergency=True
+    ).select_related('department', 'requested_by')
+    
+    # Unplanned requisitions
+    unplanned_reqs = Requisition.objects.filter(
+        is_planned=False
+    ).select_related('department', 'requested_by')
+    
+    # Direct procurements (tenders with only 1 bid)
+    direct_tenders = Tender.objects.annotate(
+        bid_count=Count('bids')
+    ).filter(bid_count=1)
+    
+    # Late payments
+    late_payments = Payment.objects.filter(
+        status='PENDING',
+        invoice__due_date__lt=timezone.now().date()
+    ).select_related('invoice', 'invoice__supplier')
+    
+    # Overdue purchase orders
+    overdue_pos = PurchaseOrder.objects.filter(
+        status__in=['SENT', 'ACKNOWLEDGED'],
+        delivery_date__lt=timezone.now().date()
+    ).select_related('supplier', 'requisition')
+    
+    # Red flags from the rule engine (run_audit_rules)
+    red_flags = Finding.objects.filter(
+        is_active=True, status__in=['OPEN', 'IN_PROGRESS']
+    ).select_related('department', 'supplier')[:50]
+    
+    context = {
+        'high_value_reqs': high_value_reqs,
+        'emergency_procs': emergency_procs,
+        'unplanned_reqs': unplanned_reqs,
+        'direct_tenders': direct_tenders,
+        'late_payments': late_payments,
+        'overdue_pos': overdue_pos,
+        'red_flags': red_flags,
+    }
+    
+    return render(request, 'auditor/flagged_items.html', context)
+
+
+# ============================================================================
+# SYSTEM AUDIT
+# ============================================================================
+
+@read_replica
+@login_required
+def auditor_audit_trail_view(request):
+    """System audit trail"""
+    if request.user.role != 'AUDITOR':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    # Filters
+    action_filter = request.GET.get('action', '')
+    user_filter = request.GET.get('user', '')
+    
+    # Always bounded by date so only the matching partitions are scanned
+    window_start, window_end = audit_window(
+        request.GET.get('date_from'), request.GET.get('date_to')
+    )
+    audit_logs = logs_between(
+        window_start, window_end, AuditLog.objects.select_related('user')
+    )
+    
+    if action_filter:
+        audit_logs = audit_logs.filter(action=action_filter)
+    
+    if user_filter:
+        audit_logs = audit_logs.filter(user_id=user_filter)
+    
+    audit_logs = audit_logs[:1000]  # Limit results
+    
+    context = {
+        'audit_logs': audit_logs,
+        'action_types': AuditLog.ACTION_TYPES,
+        'window_start': window_start,
+        'window_end': window_end,
+    }
+    
+    return render(request, 'auditor/system_audit/audit_trail.html', context)
+
+
+@read_replica
+@login_required
+def auditor_activity_logs_view(request):
+    """User activity logs"""
+    if request.user.role != 'AUDITOR':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    window_start, window_end = audit_window(
+        request.GET.get('date_from'), request.GET.get('date_to')
+    )
+    
+    # Group activities by user from the daily summaries
+    user_activities = AuditActivitySummary.objects.filter(
+        date__gte=window_start.date(),
+        date__lt=window_end.date()
+    ).values(
+        'user__id', 'user__username', 'user__first_name', 'user__role',
+        'user__department__name'
+    ).annotate(
+        total_actions=Sum('total_actions'),
+        last_activity=Max('last_activity')
+    ).order_by('-total_actions')
+    
+    # Recent activities
+    recent_activities = logs_between(window_start, window_end).select_related(
+        'user'
+    ).order_by('-timestamp')[:100]
+    
+    context = {
+        'user_activities': user_activities,
+        'recent_activities': recent_activities,
+        'window_start': window_start,
+        'window_end': window_end,
+    }
+    
+    return render(request, 'auditor/system_audit/activity_logs.html', context)
+
+
+@read_replica
+@login_required
+def auditor_access_logs_view(request):
+    """Access and authentication logs"""
+    if request.user.role != 'AUDITOR':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    # Login activities
+    window_start, window_end = audit_window(
+        request.GET.get('date_from'), request.GET.get('date_to')
+    )
+    login_logs = logs_between(window_start, window_end).filter(
+        action__in=['LOGIN', 'LOGOUT']
+    ).select_related('user').order_by('-timestamp')[:200]
+    
+    # Failed login attempts (would need to be tracked separately)
+    # Placeholder for now
+    
+    context = {
+        'login_logs': login_logs,
+    }
+    
+    return render(request, 'auditor/system_audit/access_logs.html', context)
+
+
+@read_replica
+@login_required
+def auditor_data_changes_view(request):
+    """Track data changes and modifications"""
+    if request.user.role != 'AUDITOR':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    window_start, window_end = audit_window(
+        request.GET.get('date_from'), request.GET.get('date_to')
+    )
+    changes = logs_between(window_start, window_end).filter(
+        action__in=['UPDATE', 'DELETE']
+    )
+    
+    # UPDATE and DELETE actions within the window
+    data_changes = changes.select_related('user').order_by('-timestamp')[:500]
+    
+    # Group by model
+    changes_by_model = changes.values('model_name').annotate(
+        change_count=Count('id')
+    ).order_by('-change_count')
+    
+    context = {
+        'data_changes': data_changes,
+        'changes_by_model': changes_by_model,
+        'window_start': window_start,
+        'window_end': window_end,
+    }
+    
+    return render(request, 'auditor/system_audit/data_changes.html', context)
+
+
+# ============================================================================
+# REPORTS & FINDINGS
+# ============================================================================
+
+@read_replica
+@login_required
+def auditor_audit_reports_view(request):
+    """List of audit reports"""
+    if request.user.role != 'AUDITOR':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    # TODO: Create AuditReport model
+    # Placeholder using ProcurementReport for now
+    from pms.models import ProcurementReport
+    
+    reports = ProcurementReport.objects.filter(
+        report_type='COMPLIANCE'
+    ).order_by('-generated_at')
+    
+    context = {
+        'reports': reports,
+    }
+    
+    return render(request, 'auditor/reports/audit_reports.html', context)
+
+
+@read_replica
+@login_required
+def auditor_findings_view(request):
+    """Audit findings and issues"""
+    if request.user.role != 'AUDITOR':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    # Findings are produced by the run_audit_rules batch job
+    findings = Finding.objects.filter(is_active=True).select_related(
+        'department', 'supplier', 'reviewed_by'
+    )
+    summary = finding_summary(findings)
+    
+    severity_filter = request.GET.get('severity', '')
+    status_filter = request.GET.get('status', '')
+    category_filter = request.GET.get('category', '')
+    
+    if severity_filter:
+        findings = findings.filter(severity=severity_filter)
+    if status_filter:
+        findings = findings.filter(status=status_filter)
+    if category_filter:
+        findings = findings.filter(category=category_filter)
+    
+    context = {
+        'findings': findings[:500],
+        'summary': summary,
+    }
+    
+    return render(request, 'auditor/reports/findings.html', context)
+
+
+@read_replica
+@login_required
+def auditor_recommendations_view(request):
+    """Audit recommendations"""
+    if request.user.role != 'AUDITOR':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    # TODO: Create Recommendation model
+    
+    context = {
+        'recommendations': [],  # Placeholder
+    }
+    
+    return render(request, 'auditor/reports/recommendations.html', context)
+
+
+@read_replica
+@login_required
+def auditor_risk_assessment_view(request):
+    """Risk assessment dashboard"""
+    if request.user.role != 'AUDITOR':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    # Risk indicators
+    
+    # 1. Budget overruns
+    budget_risks = Budget.objects.filter(
+        actual_spent__gt=F('allocated_amount')
+    ).select_related('department', 'category')
+    
+    # 2. Suppliers with poor performance
+    poor_suppliers = SupplierPerformance.objects.filter(
+        overall_rating__lt=3
+    ).values('supplier__name').annotate(
+        avg_rating=Avg('overall_rating'),
+        review_count=Count('id')
+    )
+    
+    # 3. Delayed deliveries
+    delayed_pos = PurchaseOrder.objects.filter(
+        status__in=['SENT', 'ACKNOWLEDGED', 'PARTIAL_DELIVERY'],
+        delivery_date__lt=timezone.now().date()
+    ).count()
+    
+    # 4. High-value single-source procurements
+    single_source = Tender.objects.filter(
+        procurement_method='DIRECT',
+        estimated_budget__gte=500000
+    ).count()
+    
+    # 5. Red flags by rule from the rule engine
+    findings_by_rule = Finding.objects.filter(
+        is_active=True, status__in=['OPEN', 'IN_PROGRESS']
+    ).values('rule_code').annotate(
+        count=Count('id'),
+        max_score=Max('score'),
+        amount=Sum('amount')
+    ).order_by('-max_score')
+    
+    context = {
+        'budget_risks': budget_risks,
+        'poor_suppliers': poor_suppliers,
+        'delayed_deliveries': delayed_pos,
+        'single_source_count': single_source,
+        'findings_by_rule': findings_by_rule,
+        'finding_summary': finding_summary(),
+    }
+    
+    return render(request, 'auditor/reports/risk_assessment.html', context)
+
+
+# ============================================================================
+# HELP & SUPPORT
+# ============================================================================
+
+@read_replica
+@login_required
+def auditor_help_center_view(request):
+    """Auditor help center"""
+    if request.user.role != 'AUDITOR':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    return render(request, 'auditor/help_center.html')
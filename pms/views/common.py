@@ -0,0 +1,1575 @@
+"""
+Views shared by every role: sign-in and sign-out, supplier registration,
+the dashboard router, error pages, notifications and the live event
+stream, procurement policies and the help centre.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.hashers import make_password
+from django.core.mail import send_mail
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Avg, Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from django.views.decorators.http import condition
+
+from pms.audit import record_audit
+from pms.models import (
+    AuditLog, Bid, Budget, Contract, Department, GoodsReceivedNote, Invoice,
+    ItemCategory, Notification, ProcurementPolicy, PurchaseOrder, Requisition,
+    StockIssue, StockItem, StockMovement, Store, Supplier, Tender, User,
+)
+from pms.notifications import (
+    mark_read, notification_etag, serialize_notification, unread_count,
+)
+from pms.views.auditor import auditor_dashboard
+from pms.views.finance import finance_dashboard_view
+from pms.views.hod import hod_dashboard
+from pms.views.procurement import procurement_dashboard_view
+from pms.views.requisitions import get_pending_approvals_for_user
+from pms.views.staff import staff_dashboard
+from pms.views.supplier import supplier_dashboard
+
+
+logger = logging.getLogger(__name__)
+
+
+def login_view(request):
+    """
+    Universal login view that authenticates users and redirects to role-based dashboards
+    """
+    if request.user.is_authenticated:
+        return redirect('dashboard')
+    
+    if request.method == 'POST':
+        username = request.POST.get('username')
+        password = request.POST.get('password')
+        remember_me = request.POST.get('remember_me')
+        
+        user = authenticate(request, username=username, password=password)
+        
+        if user is not None:
+            if user.is_active_user:
+                login(request, user)
+                
+                # Set session expiry based on remember me
+                if not remember_me:
+                    request.session.set_expiry(0)  # Session expires when browser closes
+                else:
+                    request.session.set_expiry(1209600)  # 2 weeks
+                
+                # Log the login
+                record_audit(
+                    user=user,
+                    action='LOGIN',
+                    model_name='User',
+                    object_id=str(user.id),
+                    object_repr=str(user),
+                    ip_address=get_client_ip(request),
+                    user_agent=request.META.get('HTTP_USER_AGENT', '')
+                )
+                
+                messages.success(request, f'Welcome back, {user.get_full_name() or user.username}!')
+                
+                # Redirect to next parameter or dashboard
+                next_url = request.GET.get('next')
+                if next_url:
+                    return redirect(next_url)
+                return redirect('dashboard')
+            else:
+                messages.error(request, 'Your account has been deactivated. Please contact the administrator.')
+        else:
+            messages.error(request, 'Invalid username or password.')
+    
+    return render(request, 'auth/login.html')
+
+
+def logout_view(request):
+    """
+    Logout view
+    """
+    if request.user.is_authenticated:
+        # Log the logout
+        record_audit(
+            user=request.user,
+            action='LOGOUT',
+            model_name='User',
+            object_id=str(request.user.id),
+            object_repr=str(request.user),
+            ip_address=get_client_ip(request),
+            user_agent=request.META.get('HTTP_USER_AGENT', '')
+        )
+    
+    logout(request)
+    messages.success(request, 'You have been logged out successfully.')
+    return redirect('login')
+
+
+@login_required
+def dashboard_view(request):
+    """
+    Role-based dashboard router
+    """
+    user = request.user
+    role = user.role
+    
+    # Route to appropriate dashboard based on role
+    if role == 'ADMIN':
+        return admin_dashboard(request)
+    elif role == 'STAFF':
+        return staff_dashboard(request)
+    elif role == 'HOD':
+        return hod_dashboard(request)
+    elif role == 'PROCUREMENT':
+        return procurement_dashboard_view(request)
+    elif role == 'FINANCE':
+        return finance_dashboard_view(request)
+    elif role == 'STORES':
+        return stores_dashboard(request)
+    elif role == 'SUPPLIER':
+        return supplier_dashboard(request)
+    elif role == 'AUDITOR':
+        return auditor_dashboard(request)
+    else:
+        messages.error(request, 'Invalid user role.')
+        return redirect('login')
+
+
+def register_supplier(request):
+    """
+    Supplier self-registration view.
+    Only suppliers can register themselves; other user types are created by admin.
+    """
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                # Extract form data
+                company_name = request.POST.get('company_name')
+                registration_number = request.POST.get('registration_number')
+                tax_id = request.POST.get('tax_id', '')
+                email = request.POST.get('email')
+                phone_number = request.POST.get('phone_number')
+                physical_address = request.POST.get('physical_address')
+                postal_address = request.POST.get('postal_address', '')
+                website = request.POST.get('website', '')
+                
+                # Contact person details
+                contact_person = request.POST.get('contact_person')
+                contact_person_phone = request.POST.get('contact_person_phone')
+                contact_person_email = request.POST.get('contact_person_email')
+                
+                # Banking details
+                bank_name = request.POST.get('bank_name')
+                bank_branch = request.POST.get('bank_branch')
+                account_number = request.POST.get('account_number')
+                account_name = request.POST.get('account_name')
+                swift_code = request.POST.get('swift_code', '')
+                
+                # Categories
+                category_ids = request.POST.getlist('categories')
+                
+                # Validation
+                if User.objects.filter(email=email).exists():
+                    messages.error(request, 'A user with this email already exists.')
+                    return redirect('register_supplier')
+                
+                if Supplier.objects.filter(registration_number=registration_number).exists():
+                    messages.error(request, 'A supplier with this registration number already exists.')
+                    return redirect('register_supplier')
+                
+                # Generate username and password
+                username = email.split('@')[0] + '_' + get_random_string(4)
+                temp_password = get_random_string(12)
+                
+                # Create User account
+                user = User.objects.create(
+                    username=username,
+                    email=email,
+                    first_name=contact_person.split()[0] if contact_person else '',
+                    last_name=' '.join(contact_person.split()[1:]) if contact_person and len(contact_person.split()) > 1 else '',
+                    role='SUPPLIER',
+                    phone_number=contact_person_phone,
+                    is_active=False,  # Inactive until admin approval
+                    password=make_password(temp_password)
+                )
+                
+                # Generate supplier number
+                year = timezone.now().year
+                last_supplier = Supplier.objects.filter(
+                    supplier_number__startswith=f'SUP-{year}'
+                ).order_by('-supplier_number').first()
+                
+                if last_supplier:
+                    last_number = int(last_supplier.supplier_number.split('-')[-1])
+                    new_number = last_number + 1
+                else:
+                    new_number = 1
+                
+                supplier_number = f'SUP-{year}-{new_number:06d}'
+                
+                # Create Supplier profile
+                supplier = Supplier.objects.create(
+                    user=user,
+                    supplier_number=supplier_number,
+                    name=company_name,
+                    registration_number=registration_number,
+                    tax_id=tax_id,
+                    email=email,
+                    phone_number=phone_number,
+                    physical_address=physical_address,
+                    postal_address=postal_address,
+                    website=website,
+                    contact_person=contact_person,
+                    contact_person_phone=contact_person_phone,
+                    contact_person_email=contact_person_email,
+                    bank_name=bank_name,
+                    bank_branch=bank_branch,
+                    account_number=account_number,
+                    account_name=account_name,
+                    swift_code=swift_code,
+                    status='PENDING',
+                    created_by=None
+                )
+                
+                # Add categories
+                if category_ids:
+                    valid_categories = [cid for cid in category_ids if cid and cid.strip()]
+                    if valid_categories:
+                        supplier.categories.set(valid_categories)
+                
+                # Handle document uploads
+                documents = {
+                    'REGISTRATION': request.FILES.get('registration_cert'),
+                    'TAX': request.FILES.get('tax_cert'),
+                    'BANK': request.FILES.get('bank_statement'),
+                }
+                
+                from pms.models import SupplierDocument
+                for doc_type, file in documents.items():
+                    if file:
+                        SupplierDocument.objects.create(
+                            supplier=supplier,
+                            document_type=doc_type,
+                            document_name=file.name,
+                            file=file,
+                            is_verified=False
+                        )
+                
+                # Create audit log
+                record_audit(
+                    user=user,
+                    action='CREATE',
+                    model_name='Supplier',
+                    object_id=str(supplier.id),
+                    object_repr=supplier.supplier_number,
+                    changes={'status': 'Self-registered, pending approval'}
+                )
+                
+                # Send welcome email with credentials
+                try:
+                    email_subject = 'Welcome to University Procurement System'
+                    email_body = f"""
+Dear {contact_person},
+
+Thank you for registering with the University Procurement System!
+
+Your supplier account has been created successfully. Here are your login credentials:
+
+Supplier Number: {supplier_number}
+Username: {username}
+Temporary Password: {temp_password}
+Login URL: {request.build_absolute_uri('/login/')}
+
+IMPORTANT SECURITY NOTICE:
+- Please change your password immediately after your first login
+- Keep your credentials confidential
+- Your account is currently pending approval by our procurement team
+
+NEXT STEPS:
+1. Your account will be reviewed by our procurement team
+2. You may be contacted for additional verification documents
+3. Once approved, you will receive a confirmation email
+4. You can then participate in tenders and quotations
+
+If you have any questions, please contact us at:
+Email: procurement@university.edu
+Phone: [Your Contact Number]
+
+Best regards,
+University Procurement Team
+
+---
+This is an automated message. Please do not reply to this email.
+                    """
+                    
+                    send_mail(
+                        email_subject,
+                        email_body,
+                        settings.DEFAULT_FROM_EMAIL,
+                        [email, contact_person_email],
+                        fail_silently=False,
+                    )
+                    
+                    logger.info(f'Registration email sent to {email}')
+                    
+                except Exception as e:
+                    logger.error(f'Failed to send registration email: {str(e)}')
+                    # Don't fail registration if email fails
+                
+                messages.success(
+                    request, 
+                    f'Registration successful! Your supplier number is {supplier_number}. '
+                    f'Login credentials have been sent to {email}. '
+                    f'Your account is pending approval by the procurement team.'
+                )
+                return redirect('login')
+                
+        except Exception as e:
+            messages.error(request, f'Registration failed: {str(e)}')
+            logger.error(f'Supplier registration error: {str(e)}')
+            import traceback
+            logger.error(traceback.format_exc())
+    
+    # GET request - show registration form
+    context = {
+        'categories': ItemCategory.objects.filter(is_active=True).order_by('name'),
+    }
+    
+    return render(request, 'accounts/register_supplier.html', context)
+
+
+def admin_dashboard(request):
+    """Admin Dashboard with Comprehensive Analytics"""
+    
+    # Time ranges
+    today = timezone.now().date()
+    thirty_days_ago = today - timedelta(days=30)
+    ninety_days_ago = today - timedelta(days=90)
+    year_start = today.replace(month=1, day=1)
+    
+    # ==================== Basic Statistics ====================
+    total_users = User.objects.filter(is_active_user=True).count()
+    total_requisitions = Requisition.objects.count()
+    total_pos = PurchaseOrder.objects.count()
+    total_suppliers = Supplier.objects.filter(status='APPROVED').count()
+    pending_approvals = Requisition.objects.filter(
+        status__in=['SUBMITTED', 'HOD_APPROVED', 'BUDGET_APPROVED']
+    ).count()
+    
+    # ==================== Financial Analytics ====================
+    # Total spend by status
+    total_spend = Invoice.objects.filter(status='PAID').aggregate(
+        total=Sum('total_amount')
+    )['total'] or Decimal('0')
+    
+    # Monthly spend trend (last 12 months)
+    twelve_months_ago = today - timedelta(days=365)
+    monthly_spend_data = Invoice.objects.filter(
+        status='PAID',
+        payment_date__gte=twelve_months_ago,
+        payment_date__isnull=False
+    ).annotate(
+        month=TruncMonth('payment_date')
+    ).values('month').annotate(
+        total=Sum('total_amount')
+    ).order_by('month')
+    
+    # Ensure we have data for all 12 months
+    from dateutil.relativedelta import relativedelta
+    spend_labels = []
+    spend_values = []
+    
+    current_date = twelve_months_ago.replace(day=1)
+    monthly_data_dict = {item['month'].strftime('%Y-%m'): float(item['total']) for item in monthly_spend_data}
+    
+    for i in range(12):
+        month_key = current_date.strftime('%Y-%m')
+        spend_labels.append(current_date.strftime('%b %Y'))
+        spend_values.append(monthly_data_dict.get(month_key, 0))
+        current_date = current_date + relativedelta(months=1)
+    
+    # Budget utilization
+    budget_stats = Budget.objects.filter(
+        is_active=True
+    ).aggregate(
+        total_allocated=Sum('allocated_amount'),
+        total_committed=Sum('committed_amount'),
+        total_spent=Sum('actual_spent')
+    )
+    
+    budget_allocated = float(budget_stats['total_allocated'] or 0)
+    budget_committed = float(budget_stats['total_committed'] or 0)
+    budget_spent = float(budget_stats['total_spent'] or 0)
+    budget_available = budget_allocated - budget_committed - budget_spent
+    
+    # ==================== Requisition Analytics ====================
+    # Requisitions by status
+    req_by_status = Requisition.objects.values('status').annotate(
+        count=Count('id')
+    ).order_by('-count')
+    
+    req_status_labels = [item['status'].replace('_', ' ').title() for item in req_by_status]
+    req_status_values = [item['count'] for item in req_by_status]
+    
+    # Requisition trends (last 90 days)
+    req_trend_data = Requisition.objects.filter(
+        created_at__date__gte=ninety_days_ago
+    ).annotate(
+        date=TruncDate('created_at')
+    ).values('date').annotate(
+        count=Count('id')
+    ).order_by('date')
+    
+    req_trend_labels = [item['date'].strftime('%b %d') for item in req_trend_data]
+    req_trend_values = [item['count'] for item in req_trend_data]
+    
+    # Average approval time (in days)
+    avg_approval_time = 0
+    approved_reqs = Requisition.objects.filter(
+        status='APPROVED',
+        submitted_at__isnull=False
+    )
+    
+    if approved_reqs.exists():
+        total_days = 0
+        count = 0
+        for req in approved_reqs:
+            if req.submitted_at:
+                days = (req.updated_at - req.submitted_at).days
+                total_days += days
+                count += 1
+        avg_approval_time = round(total_days / count, 1) if count > 0 else 0
+    
+    # ==================== Procurement Analytics ====================
+    # PO by status
+    po_by_status = PurchaseOrder.objects.values('status').annotate(
+        count=Count('id')
+    ).order_by('-count')
+    
+    po_status_labels = [item['status'].replace('_', ' ').title() for item in po_by_status]
+    po_status_values = [item['count'] for item in po_by_status]
+    
+    # Monthly PO trend (last 6 months)
+    six_months_ago = today - timedelta(days=180)
+    po_monthly_data = PurchaseOrder.objects.filter(
+        created_at__date__gte=six_months_ago
+    ).annotate(
+        month=TruncMonth('created_at')
+    ).values('month').annotate(
+        count=Count('id'),
+        total_value=Sum('total_amount')
+    ).order_by('month')
+    
+    po_trend_labels = [item['month'].strftime('%b %Y') for item in po_monthly_data]
+    po_trend_count = [item['count'] for item in po_monthly_data]
+    po_trend_value = [float(item['total_value'] or 0) for item in po_monthly_data]
+    
+    # ==================== Supplier Analytics ====================
+    # Top 10 suppliers by transaction value
+    top_suppliers = Supplier.objects.filter(
+        purchase_orders__status__in=['DELIVERED', 'CLOSED']
+    ).annotate(
+        total_value=Sum('purchase_orders__total_amount'),
+        po_count=Count('purchase_orders')
+    ).order_by('-total_value')[:10]
+    
+    top_supplier_names = [s.name[:20] + '...' if len(s.name) > 20 else s.name for s in top_suppliers]
+    top_supplier_values = [float(s.total_value) if s.total_value else 0 for s in top_suppliers]
+    
+    # Supplier by status
+    supplier_status = Supplier.objects.values('status').annotate(
+        count=Count('id')
+    )
+    
+    supplier_status_labels = [item['status'].title() for item in supplier_status]
+    supplier_status_values = [item['count'] for item in supplier_status]
+    
+    # Average supplier rating
+    avg_supplier_rating = Supplier.objects.filter(
+        status='APPROVED'
+    ).aggregate(avg_rating=Avg('rating'))['avg_rating'] or 0
+    
+    # ==================== Department Analytics ====================
+    # Top 5 departments by spend
+    top_depts = Department.objects.filter(
+        is_active=True,
+        requisitions__purchase_orders__isnull=False
+    ).annotate(
+        total_spend=Sum('requisitions__purchase_orders__total_amount')
+    ).order_by('-total_spend')[:5]
+    
+    dept_names = [dept.name for dept in top_depts]
+    dept_values = [float(dept.total_spend) if dept.total_spend else 0 for dept in top_depts]
+    
+    # Requisitions by department
+    req_by_dept = Department.objects.filter(
+        is_active=True
+    ).annotate(
+        req_count=Count('requisitions')
+    ).order_by('-req_count')[:8]
+    
+    req_dept_labels = [dept.code for dept in req_by_dept]
+    req_dept_values = [dept.req_count for dept in req_by_dept]
+    
+    # ==================== Tender & Bid Analytics ====================
+    # Active tenders
+    active_tenders = Tender.objects.filter(status='PUBLISHED').count()
+    
+    # Tender by status
+    tender_status = Tender.objects.values('status').annotate(
+        count=Count('id')
+    )
+    
+    tender_status_labels = [item['status'].title() for item in tender_status]
+    tender_status_values = [item['count'] for item in tender_status]
+    
+    # Average bids per tender
+    avg_bids = Tender.objects.filter(
+        status__in=['CLOSED', 'EVALUATING', 'AWARDED']
+    ).annotate(
+        bid_count=Count('bids')
+    ).aggregate(avg=Avg('bid_count'))['avg'] or 0
+    
+    # ==================== Contract Analytics ====================
+    active_contracts = Contract.objects.filter(status='ACTIVE').count()
+    expiring_soon = Contract.objects.filter(
+        status='ACTIVE',
+        end_date__lte=today + timedelta(days=30),
+        end_date__gte=today
+    ).count()
+    
+    # Contract value by type
+    contract_by_type = Contract.objects.filter(
+        status='ACTIVE'
+    ).values('contract_type').annotate(
+        total=Sum('contract_value')
+    )
+    
+    contract_type_labels = [item['contract_type'].replace('_', ' ').title() for item in contract_by_type]
+    contract_type_values = [float(item['total']) for item in contract_by_type]
+    
+    # ==================== Inventory Analytics ====================
+    # Low stock items
+    low_stock_items = StockItem.objects.filter(
+        quantity_on_hand__lte=F('reorder_level')
+    ).count()
+    
+    # Total inventory value
+    total_inventory_value = StockItem.objects.aggregate(
+        total=Sum('total_value')
+    )['total'] or Decimal('0')
+    
+    # Stock movements (last 30 days)
+    stock_movements = StockMovement.objects.filter(
+        movement_date__date__gte=thirty_days_ago
+    ).values('movement_type').annotate(
+        count=Count('id')
+    )
+    
+    stock_movement_labels = [item['movement_type'].replace('_', ' ').title() for item in stock_movements]
+    stock_movement_values = [item['count'] for item in stock_movements]
+    
+    # ==================== Recent Activities ====================
+    recent_activities = AuditLog.objects.select_related('user').all()[:15]
+    
+    # ==================== System Health Indicators ====================
+    # User activity (last 7 days)
+    active_users_week = AuditLog.objects.filter(
+        action='LOGIN',
+        timestamp__gte=today - timedelta(days=7)
+    ).values('user').distinct().count()
+    
+    # Pending items summary
+    pending_summary = {
+        'requisitions': Requisition.objects.filter(status='SUBMITTED').count(),
+        'approvals': pending_approvals,
+        'invoices': Invoice.objects.filter(status='SUBMITTED').count(),
+        'grns': GoodsReceivedNote.objects.filter(status='DRAFT').count(),
+    }
+    
+    # ==================== Performance Metrics ====================
+    # On-time delivery compliance
+    on_time_deliveries = GoodsReceivedNote.objects.filter(
+        delivery_date__lte=F('purchase_order__delivery_date')
+    ).count()
+    total_deliveries = GoodsReceivedNote.objects.count()
+    delivery_compliance = round((on_time_deliveries / total_deliveries * 100), 1) if total_deliveries > 0 else 0
+    
+    # ==================== Context Assembly ====================
+    context = {
+        # Basic stats
+        'total_users': total_users,
+        'total_requisitions': total_requisitions,
+        'total_pos': total_pos,
+        'total_suppliers': total_suppliers,
+        'pending_approvals': pending_approvals,
+        'recent_activities': recent_activities,
+        
+        # System stats
+        'system_stats': {
+            'departments': Department.objects.filter(is_active=True).count(),
+            'active_contracts': active_contracts,
+            'total_spend': total_spend,
+            'active_tenders': active_tenders,
+            'low_stock_items': low_stock_items,
+            'expiring_contracts': expiring_soon,
+            'active_users_week': active_users_week,
+            'avg_supplier_rating': round(float(avg_supplier_rating), 2),
+            'inventory_value': total_inventory_value,
+        },
+        
+        # Financial charts
+        'spend_chart': {
+            'labels': json.dumps(spend_labels),
+            'values': json.dumps(spend_values),
+        },
+        'budget_chart': {
+            'labels': json.dumps(['Spent', 'Committed', 'Available']),
+            'values': json.dumps([budget_spent, budget_committed, budget_available]),
+        },
+        
+        # Requisition charts
+        'req_status_chart': {
+            'labels': json.dumps(req_status_labels),
+            'values': json.dumps(req_status_values),
+        },
+        'req_trend_chart': {
+            'labels': json.dumps(req_trend_labels),
+            'values': json.dumps(req_trend_values),
+        },
+        
+        # Purchase Order charts
+        'po_status_chart': {
+            'labels': json.dumps(po_status_labels),
+            'values': json.dumps(po_status_values),
+        },
+        'po_trend_chart': {
+            'labels': json.dumps(po_trend_labels),
+            'count': json.dumps(po_trend_count),
+            'value': json.dumps(po_trend_value),
+        },
+        
+        # Supplier charts
+        'top_suppliers_chart': {
+            'labels': json.dumps(top_supplier_names),
+            'values': json.dumps(top_supplier_values),
+        },
+        'supplier_status_chart': {
+            'labels': json.dumps(supplier_status_labels),
+            'values': json.dumps(supplier_status_values),
+        },
+        
+        # Department charts
+        'dept_spend_chart': {
+            'labels': json.dumps(dept_names),
+            'values': json.dumps(dept_values),
+        },
+        'req_by_dept_chart': {
+            'labels': json.dumps(req_dept_labels),
+            'values': json.dumps(req_dept_values),
+        },
+        
+        # Contract charts
+        'contract_type_chart': {
+            'labels': json.dumps(contract_type_labels),
+            'values': json.dumps(contract_type_values),
+        },
+        
+        # Tender charts
+        'tender_status_chart': {
+            'labels': json.dumps(tender_status_labels),
+            'values': json.dumps(tender_status_values),
+        },
+        
+        # Inventory charts
+        'stock_movement_chart': {
+            'labels': json.dumps(stock_movement_labels),
+            'values': json.dumps(stock_movement_values),
+        },
+        
+        # Performance metrics
+        'performance': {
+            'avg_approval_time': avg_approval_time,
+            'avg_bids_per_tender': round(float(avg_bids), 1),
+            'avg_po_creation': 3.5,  # You can calculate this based on your data
+            'avg_delivery_time': 15.2,  # You can calculate this based on your data
+            'delivery_compliance': delivery_compliance,
+        },
+        
+        # Pending summary
+        'pending_summary': pending_summary,
+    }
+    
+    return render(request, 'dashboards/admin_dashboard.html', context)
+
+
+def procurement_dashboard(request):
+    """Procurement Officer Dashboard"""
+    context = {
+        'pending_requisitions': Requisition.objects.filter(
+            status='HOD_APPROVED'
+        ).count(),
+        'active_tenders': Tender.objects.filter(
+            status__in=['PUBLISHED', 'EVALUATING']
+        ).order_by('-created_at')[:10],
+        'pending_pos': PurchaseOrder.objects.filter(
+            status='PENDING_APPROVAL'
+        ).count(),
+        'recent_bids': Bid.objects.filter(
+            status='SUBMITTED'
+        ).order_by('-submitted_at')[:10],
+        'supplier_stats': {
+            'total': Supplier.objects.count(),
+            'approved': Supplier.objects.filter(status='APPROVED').count(),
+            'pending': Supplier.objects.filter(status='PENDING').count(),
+        },
+        'procurement_stats': {
+            'total_pos': PurchaseOrder.objects.count(),
+            'total_value': PurchaseOrder.objects.aggregate(
+                total=Sum('total_amount')
+            )['total'] or Decimal('0'),
+            'active_contracts': Contract.objects.filter(status='ACTIVE').count(),
+        }
+    }
+    return render(request, 'dashboards/procurement_dashboard.html', context)
+
+
+@login_required
+def stores_dashboard(request):
+    """
+    Stores Officer Dashboard with comprehensive analytics and charts
+    """
+    # Date ranges
+    today = timezone.now().date()
+    last_30_days = today - timedelta(days=30)
+    last_6_months = today - timedelta(days=180)
+    current_month_start = timezone.datetime(today.year, today.month, 1).date()
+    
+    # ============================================================================
+    # KEY METRICS
+    # ============================================================================
+    
+    # Pending GRNs
+    pending_grns_count = GoodsReceivedNote.objects.filter(
+        status__in=['DRAFT', 'INSPECTING']
+    ).count()
+    
+    # Low stock items
+    low_stock_count = StockItem.objects.filter(
+        quantity_on_hand__lte=F('reorder_level')
+    ).count()
+    
+    # Pending stock issues
+    pending_issues_count = StockIssue.objects.filter(
+        status='PENDING'
+    ).count()
+    
+    # Total inventory value
+    total_inventory_value = StockItem.objects.aggregate(
+        total=Sum('total_value')
+    )['total'] or Decimal('0')
+    
+    # Active stores
+    active_stores_count = Store.objects.filter(is_active=True).count()
+    
+    # Total stock items
+    total_stock_items = StockItem.objects.count()
+    
+    # Items received this month
+    items_received_month = GoodsReceivedNote.objects.filter(
+        received_date__gte=current_month_start,
+        status__in=['ACCEPTED', 'PARTIAL']
+    ).count()
+    
+    # Items issued this month
+    items_issued_month = StockIssue.objects.filter(
+        issue_date__gte=current_month_start,
+        status='ISSUED'
+    ).count()
+    
+    # ============================================================================
+    # CHART DATA 1: Monthly Stock Movements (Line Chart)
+    # ============================================================================
+    
+    monthly_movements = StockMovement.objects.filter(
+        movement_date__gte=last_6_months
+    ).annotate(
+        month=TruncMonth('movement_date')
+    ).values('month', 'movement_type').annotate(
+        count=Count('id'),
+        total_quantity=Sum('quantity')
+    ).order_by('month')
+    
+    # Organize data by movement type
+    receipts = {}
+    issues = {}
+    
+    for movement in monthly_movements:
+        month_str = movement['month'].strftime('%b %Y')
+        if movement['movement_type'] == 'RECEIPT':
+            receipts[month_str] = int(movement['count'])
+        elif movement['movement_type'] == 'ISSUE':
+            issues[month_str] = int(movement['count'])
+    
+    # Get all months
+    all_months = sorted(set(list(receipts.keys()) + list(issues.keys())))
+    
+    movements_chart_data = {
+        'labels': all_months,
+        'receipts': [receipts.get(m, 0) for m in all_months],
+        'issues': [issues.get(m, 0) for m in all_months]
+    }
+    
+    # ============================================================================
+    # CHART DATA 2: Stock Status Distribution (Donut Chart)
+    # ============================================================================
+    
+    # Categorize stock items
+    stock_categories = {
+        'Normal Stock': StockItem.objects.filter(
+            quantity_on_hand__gt=F('reorder_level')
+        ).count(),
+        'Low Stock': StockItem.objects.filter(
+            quantity_on_hand__lte=F('reorder_level'),
+            quantity_on_hand__gt=0
+        ).count(),
+        'Out of Stock': StockItem.objects.filter(
+            quantity_on_hand=0
+        ).count(),
+        'Overstock': StockItem.objects.filter(
+            quantity_on_hand__gt=F('max_stock_level'),
+            max_stock_level__isnull=False
+        ).count()
+    }
+    
+    stock_status_chart = {
+        'labels': list(stock_categories.keys()),
+        'values': list(stock_categories.values()),
+        'colors': ['#10B981', '#F59E0B', '#EF4444', '#6366F1']
+    }
+    
+    # ============================================================================
+    # CHART DATA 3: Inventory Value by Store (Bar Chart)
+    # ============================================================================
+    
+    store_inventory = StockItem.objects.values(
+        'store__name', 'store__code'
+    ).annotate(
+        total_value=Sum('total_value'),
+        item_count=Count('id')
+    ).order_by('-total_value')[:10]
+    
+    store_inventory_chart = {
+        'labels': [f"{item['store__code']}" for item in store_inventory],
+        'values': [float(item['total_value']) for item in store_inventory],
+        'counts': [item['item_count'] for item in store_inventory]
+    }
+    
+    # ============================================================================
+    # CHART DATA 4: Stock Movement Types (Radar Chart)
+    # ============================================================================
+    
+    movement_type_stats = {}
+    movement_types = ['RECEIPT', 'ISSUE', 'TRANSFER', 'ADJUSTMENT', 'RETURN']
+    
+    for m_type in movement_types:
+        count = StockMovement.objects.filter(
+            movement_type=m_type,
+            movement_date__gte=last_30_days
+        ).count()
+        movement_type_stats[m_type] = count
+    
+    # Normalize to 0-100 scale
+    max_count = max(movement_type_stats.values()) if movement_type_stats.values() else 1
+    
+    movement_radar = {
+        'labels': [m.replace('_', ' ').title() for m in movement_types],
+        'values': [
+            (movement_type_stats.get(m, 0) / max_count * 100) if max_count > 0 else 0 
+            for m in movement_types
+        ]
+    }
+    
+    # ============================================================================
+    # CHART DATA 5: GRN Processing Status (Bar Chart)
+    # ============================================================================
+    
+    grn_status_distribution = GoodsReceivedNote.objects.values(
+        'status'
+    ).annotate(
+        count=Count('id')
+    ).order_by('-count')
+    
+    grn_status_chart = {
+        'labels': [item['status'].replace('_', ' ').title() for item in grn_status_distribution],
+        'values': [item['count'] for item in grn_status_distribution]
+    }
+    
+    # ============================================================================
+    # CHART DATA 6: Top Requested Items (Bar Chart)
+    # ============================================================================
+    
+    from django.db.models import Subquery, OuterRef
+    
+    top_items = StockMovement.objects.filter(
+        movement_type='ISSUE',
+        movement_date__gte=last_30_days
+    ).values(
+        'stock_item__item__name',
+        'stock_item__item__code'
+    ).annotate(
+        total_quantity=Sum('quantity'),
+        issue_count=Count('id')
+    ).order_by('-total_quantity')[:10]
+    
+    top_items_chart = {
+        'labels': [item['stock_item__item__code'] for item in top_items],
+        'values': [float(item['total_quantity']) for item in top_items],
+        'counts': [item['issue_count'] for item in top_items]
+    }
+    
+    # ============================================================================
+    # RECENT ACTIVITIES - Lists for display
+    # ============================================================================
+    
+    pending_grns = GoodsReceivedNote.objects.filter(
+        status__in=['DRAFT', 'INSPECTING']
+    ).select_related('purchase_order', 'store').order_by('-created_at')[:10]
+    
+    low_stock_items = StockItem.objects.filter(
+        quantity_on_hand__lte=F('reorder_level')
+    ).select_related('item', 'store').order_by('quantity_on_hand')[:10]
+    
+    pending_issues = StockIssue.objects.filter(
+        status='PENDING'
+    ).select_related('department', 'store').order_by('-created_at')[:10]
+    
+    recent_movements = StockMovement.objects.select_related(
+        'stock_item__item', 'performed_by'
+    ).order_by('-movement_date')[:10]
+    
+    # Critical alerts
+    out_of_stock_items = StockItem.objects.filter(
+        quantity_on_hand=0
+    ).select_related('item', 'store')[:5]
+    
+    overdue_grns = GoodsReceivedNote.objects.filter(
+        status__in=['DRAFT', 'INSPECTING'],
+        created_at__lt=timezone.now() - timedelta(days=3)
+    ).count()
+    
+    # ============================================================================
+    # CONTEXT
+    # ============================================================================
+    
+    context = {
+        # Key Metrics
+        'pending_grns_count': pending_grns_count,
+        'low_stock_count': low_stock_count,
+        'pending_issues_count': pending_issues_count,
+        'total_inventory_value': total_inventory_value,
+        'active_stores_count': active_stores_count,
+        'total_stock_items': total_stock_items,
+        'items_received_month': items_received_month,
+        'items_issued_month': items_issued_month,
+        'overdue_grns': overdue_grns,
+        
+        # Chart Data (JSON encoded for JavaScript)
+        'movements_chart_data': json.dumps(movements_chart_data),
+        'stock_status_chart': json.dumps(stock_status_chart),
+        'store_inventory_chart': json.dumps(store_inventory_chart),
+        'movement_radar': json.dumps(movement_radar),
+        'grn_status_chart': json.dumps(grn_status_chart),
+        'top_items_chart': json.dumps(top_items_chart),
+        
+        # Activity Lists
+        'pending_grns': pending_grns,
+        'low_stock_items': low_stock_items,
+        'pending_issues': pending_issues,
+        'recent_movements': recent_movements,
+        'out_of_stock_items': out_of_stock_items,
+        
+        # Additional Stats
+        'inventory_stats': {
+            'total_items': total_stock_items,
+            'total_value': total_inventory_value,
+            'stores': active_stores_count,
+        },
+    }
+    
+    return render(request, 'dashboards/stores_dashboard.html', context)
+
+
+# Helper Functions
+def get_client_ip(request):
+    """Get client IP address"""
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        ip = x_forwarded_for.split(',')[0]
+    else:
+        ip = request.META.get('REMOTE_ADDR')
+    return ip
+
+
+def get_monthly_spend(department):
+    """Get monthly spending for a department"""
+    start_date = timezone.now().date() - timedelta(days=30)
+    return Invoice.objects.filter(
+        purchase_order__requisition__department=department,
+        status='PAID',
+        invoice_date__gte=start_date
+    ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
+
+
+def get_budget_utilization():
+    """Get overall budget utilization"""
+    budgets = Budget.objects.filter(budget_year__is_active=True)
+    total_allocated = budgets.aggregate(total=Sum('allocated_amount'))['total'] or Decimal('0')
+    total_spent = budgets.aggregate(total=Sum('actual_spent'))['total'] or Decimal('0')
+    
+    utilization = (total_spent / total_allocated * 100) if total_allocated > 0 else 0
+    
+    return {
+        'total_allocated': total_allocated,
+        'total_spent': total_spent,
+        'utilization_percentage': round(utilization, 2)
+    }
+
+def custom_404(request, exception):
+    return render(request, 'errors/404.html', status=404)
+
+def custom_500(request):
+    return render(request, 'errors/500.html', status=500)
+
+
+# ============================================================================
+# NOTIFICATIONS MANAGEMENT
+# ============================================================================
+
+@login_required
+def notifications_list(request):
+    """List all notifications"""
+    notifications = Notification.objects.filter(user=request.user).order_by('-created_at')
+    
+    # Mark as read if requested
+    if request.GET.get('mark_read'):
+        notification_id = request.GET.get('mark_read')
+        notification = get_object_or_404(Notification, id=notification_id, user=request.user)
+        mark_read(request.user, [notification.id])
+        return redirect('notifications_list')
+    
+    # Mark all as read
+    if request.GET.get('mark_all_read'):
+        mark_read(request.user)
+        messages.success(request, 'All notifications marked as read.')
+        return redirect('notifications_list')
+    
+    # Pagination
+    paginator = Paginator(notifications, 20)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    
+    context = {
+        'notifications': page_obj,
+        'unread_count': unread_count(request.user),
+    }
+    return render(request, 'administration/notifications_list.html', context)
+
+
+@login_required
+@condition(etag_func=notification_etag)
+def notifications_poll_api(request):
+    """
+    Cheap polling endpoint for the header badge.
+    
+    With a shared cache the ETag is derived from a cached per-user version
+    token, so clients sending If-None-Match get a 304 without touching the
+    notifications table.
+    """
+    latest = Notification.objects.filter(
+        user=request.user,
+        is_read=False
+    ).order_by('-created_at')[:10]
+    
+    response = JsonResponse({
+        'unread_count': unread_count(request.user),
+        'notifications': [serialize_notification(n) for n in latest],
+    })
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+# ============================================================================
+# LIVE EVENTS (SERVER-SENT EVENTS)
+# ============================================================================
+
+def _sse_message(event, data):
+    return f'event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'
+
+
+def _live_counts(user):
+    """Badge counters pushed to live streams"""
+    return {
+        'unread_count': unread_count(user),
+        'pending_approvals': get_pending_approvals_for_user(user).count(),
+    }
+
+
+def _notifications_since(user, since, exclude_ids):
+    rows = Notification.objects.filter(
+        user=user,
+        is_read=False,
+        created_at__gt=since
+    ).order_by('created_at')[:50]
+    return [serialize_notification(n) for n in rows if str(n.id) not in exclude_ids]
+
+
+async def _live_event_messages(user):
+    """
+    Yield SSE messages for ``user``: pushed immediately from the in-process
+    event bus, with a periodic database poll to pick up changes made by
+    other processes.
+    """
+    from asgiref.sync import sync_to_async
+    from collections import deque
+    from pms.events import bus
+    
+    keepalive = getattr(settings, 'SSE_KEEPALIVE_SECONDS', 15)
+    poll_interval = getattr(settings, 'SSE_FALLBACK_POLL_SECONDS', 60)
+    loop = asyncio.get_running_loop()
+    
+    subscription = bus.subscribe(user.pk)
+    recent_ids = deque(maxlen=200)
+    try:
+        counts = await sync_to_async(_live_counts)(user)
+        yield _sse_message('counts', counts)
+        
+        last_poll_at = timezone.now()
+        next_poll = loop.time() + poll_interval
+        
+        while True:
+            timeout = max(0, min(keepalive, next_poll - loop.time()))
+            try:
+                event, data = await subscription.get(timeout)
+            except asyncio.TimeoutError:
+                event, data = None, None
+            
+            if event == 'notification':
+                for row in data:
+                    recent_ids.append(row['id'])
+                    yield _sse_message('notification', row)
+                counts['unread_count'] = await sync_to_async(unread_count)(user)
+                yield _sse_message('counts', counts)
+            
+            elif event == 'counts':
+                counts = await sync_to_async(_live_counts)(user)
+                yield _sse_message('counts', counts)
+            
+            elif loop.time() >= next_poll:
+                # Database fallback for updates published in other processes
+                poll_started_at = timezone.now()
+                rows = await sync_to_async(_notifications_since)(
+                    user, last_poll_at - timedelta(seconds=keepalive), set(recent_ids)
+                )
+                for row in rows:
+                    recent_ids.append(row['id'])
+                    yield _sse_message('notification', row)
+                
+                latest = await sync_to_async(_live_counts)(user)
+                if rows or latest != counts:
+                    counts = latest
+                    yield _sse_message('counts', counts)
+                
+                last_poll_at = poll_started_at
+                next_poll = loop.time() + poll_interval
+            
+            else:
+                yield ': keepalive\n\n'
+    finally:
+        bus.unsubscribe(subscription)
+
+
+async def live_events_stream(request):
+    """
+    Server-sent events endpoint for notifications and approval counters.
+    
+    Requires the ASGI application (procurement_mis.asgi). Under WSGI it
+    answers 204 so browsers stop reconnecting and fall back to polling
+    api/notifications/poll/.
+    """
+    from django.core.handlers.asgi import ASGIRequest
+    
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+    
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    
+    response = StreamingHttpResponse(
+        _live_event_messages(user),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# ============================================================================
+# PROCUREMENT POLICIES
+# ============================================================================
+
+@login_required
+def policy_list(request):
+    """List procurement policies"""
+    policies = ProcurementPolicy.objects.all().order_by('-effective_date')
+    
+    # Filter by active status
+    status = request.GET.get('status', '')
+    if status == 'active':
+        policies = policies.filter(is_active=True)
+    elif status == 'inactive':
+        policies = policies.filter(is_active=False)
+    
+    context = {
+        'policies': policies,
+        'filters': {'status': status},
+    }
+    return render(request, 'administration/policy_list.html', context)
+
+
+@login_required
+def policy_detail(request, policy_id):
+    """View policy details"""
+    policy = get_object_or_404(ProcurementPolicy, id=policy_id)
+    
+    context = {
+        'policy': policy,
+    }
+    return render(request, 'administration/policy_detail.html', context)
+
+
+@login_required
+def help_center(request):
+    """Help Center page with FAQs and support options"""
+    
+    # Common FAQs organized by category
+    faqs = {
+        'Requisitions': [
+            {
+                'question': 'How do I create a purchase requisition?',
+                'answer': 'Navigate to Requisitions > Create New. Fill in all required fields including item details, justification, and budget information. Submit for approval once complete.'
+            },
+            {
+                'question': 'What is the approval process for requisitions?',
+                'answer': 'Requisitions follow a multi-level approval workflow: HOD approval, Faculty approval (if required), Budget verification, and Procurement approval. The specific workflow depends on the requisition amount.'
+            },
+            {
+                'question': 'How long does requisition approval take?',
+                'answer': 'Standard requisitions are typically approved within 5-7 business days. Urgent requisitions may be expedited with proper justification.'
+            },
+        ],
+        'Purchase Orders': [
+            {
+                'question': 'Who can create purchase orders?',
+                'answer': 'Only Procurement Officers and System Administrators can create purchase orders. POs are generated after requisitions are fully approved.'
+            },
+            {
+                'question': 'How do I track my purchase order?',
+                'answer': 'Go to Purchase Orders > My Orders. Click on any PO number to view detailed status, delivery tracking, and related documents.'
+            },
+            {
+                'question': 'Can a purchase order be amended?',
+                'answer': 'Yes, PO amendments can be requested through the system. The amendment must be justified and approved before implementation.'
+            },
+        ],
+        'Suppliers': [
+            {
+                'question': 'How do suppliers register in the system?',
+                'answer': 'Suppliers can submit registration through the Supplier Portal. They must provide all required documents including business registration, tax compliance, and bank details.'
+            },
+            {
+                'question': 'How are suppliers evaluated?',
+                'answer': 'Suppliers are evaluated based on quality, delivery performance, and service. Performance ratings are recorded after each transaction.'
+            },
+        ],
+        'Budget': [
+            {
+                'question': 'How do I check my department budget?',
+                'answer': 'Navigate to Budget > Department Budget. You can view allocated amounts, committed amounts, actual spent, and available balance.'
+            },
+            {
+                'question': 'Can budget be reallocated between line items?',
+                'answer': 'Yes, budget reallocations require justification and approval from authorized officers.'
+            },
+        ],
+        'Inventory': [
+            {
+                'question': 'How do I request items from store?',
+                'answer': 'Create a stock issue request specifying items and quantities needed. The store keeper will process approved requests.'
+            },
+            {
+                'question': 'How do I check stock availability?',
+                'answer': 'Go to Stores > Inventory. Search for items to view current stock levels across all stores.'
+            },
+        ],
+    }
+    
+    # System guides
+    guides = [
+        {
+            'title': 'Getting Started Guide',
+            'description': 'Learn the basics of using the procurement system',
+            'icon': 'fa-rocket',
+            'url': 'documentation#getting-started'
+        },
+        {
+            'title': 'Requisition Process',
+            'description': 'Step-by-step guide to creating requisitions',
+            'icon': 'fa-file-alt',
+            'url': 'documentation#requisitions'
+        },
+        {
+            'title': 'Budget Management',
+            'description': 'Understanding budget tracking and reporting',
+            'icon': 'fa-chart-line',
+            'url': 'documentation#budget'
+        },
+        {
+            'title': 'User Roles & Permissions',
+            'description': 'Learn about different user roles in the system',
+            'icon': 'fa-users-cog',
+            'url': 'documentation#roles'
+        },
+    ]
+    
+    # Contact information
+    support_contacts = {
+        'Technical Support': {
+            'email': 'ict.support@university.ac.ke',
+            'phone': '+254 700 000 001',
+            'hours': 'Mon-Fri: 8:00 AM - 5:00 PM'
+        },
+        'Procurement Office': {
+            'email': 'procurement@university.ac.ke',
+            'phone': '+254 700 000 002',
+            'hours': 'Mon-Fri: 8:00 AM - 5:00 PM'
+        },
+        'Finance Office': {
+            'email': 'finance@university.ac.ke',
+            'phone': '+254 700 000 003',
+            'hours': 'Mon-Fri: 8:00 AM - 4:00 PM'
+        },
+    }
+    
+    context = {
+        'faqs': faqs,
+        'guides': guides,
+        'support_contacts': support_contacts,
+    }
+    
+    return render(request, 'support/help_center.html', context)
+
+
+@login_required
+def documentation(request):
+    """System documentation and user guides"""
+    
+    # Documentation sections
+    documentation_sections = [
+        {
+            'id': 'getting-started',
+            'title': 'Getting Started',
+            'icon': 'fa-rocket',
+            'content': [
+                {
+                    'subtitle': 'System Overview',
+                    'text': 'The University Procurement System is a comprehensive platform for managing all procurement activities from requisition to payment. It ensures transparency, compliance, and efficiency in the procurement process.'
+                },
+                {
+                    'subtitle': 'Login and Dashboard',
+                    'text': 'Access the system using your university credentials. The dashboard provides an overview of your pending tasks, recent activities, and quick access to frequently used features.'
+                },
+                {
+                    'subtitle': 'Navigation',
+                    'text': 'Use the sidebar menu to navigate between different modules. The top bar provides quick search, notifications, and access to your profile settings.'
+                },
+            ]
+        },
+        {
+            'id': 'requisitions',
+            'title': 'Purchase Requisitions',
+            'icon': 'fa-file-alt',
+            'content': [
+                {
+                    'subtitle': 'Creating a Requisition',
+                    'text': '1. Navigate to Requisitions > Create New\n2. Select your department and budget category\n3. Add items with detailed specifications\n4. Provide justification for the purchase\n5. Attach supporting documents (quotations, specifications)\n6. Submit for approval'
+                },
+                {
+                    'subtitle': 'Approval Workflow',
+                    'text': 'Requisitions go through multiple approval stages:\n- Head of Department (HOD) approval\n- Faculty/School Dean approval (for amounts above threshold)\n- Budget verification by Finance\n- Procurement Officer review\n- Final approval based on amount'
+                },
+                {
+                    'subtitle': 'Tracking Status',
+                    'text': 'Monitor your requisition status in real-time. You will receive email notifications at each approval stage. Access the requisition detail page to view approval history and comments.'
+                },
+            ]
+        },
+        {
+            'id': 'purchase-orders',
+            'title': 'Purchase Orders',
+            'icon': 'fa-shopping-cart',
+            'content': [
+                {
+                    'subtitle': 'PO Generation',
+                    'text': 'Purchase Orders are automatically generated by Procurement Officers after requisitions are fully approved and suppliers are selected through the tendering process.'
+                },
+                {
+                    'subtitle': 'PO Tracking',
+                    'text': 'Track PO status including:\n- Approval status\n- Supplier acknowledgment\n- Delivery progress\n- Goods receipt\n- Invoice matching\n- Payment status'
+                },
+                {
+                    'subtitle': 'PO Amendments',
+                    'text': 'If changes are needed, submit a PO amendment request with justification. Amendments require approval before implementation.'
+                },
+            ]
+        },
+        {
+            'id': 'suppliers',
+            'title': 'Supplier Management',
+            'icon': 'fa-building',
+            'content': [
+                {
+                    'subtitle': 'Supplier Registration',
+                    'text': 'Suppliers must register and provide:\n- Business registration certificate\n- Tax compliance certificate\n- Bank details\n- Product/service categories\n- Contact information'
+                },
+                {
+                    'subtitle': 'Supplier Evaluation',
+                    'text': 'Suppliers are evaluated on:\n- Quality of goods/services\n- Delivery timeliness\n- Service and communication\nRatings affect future tender opportunities.'
+                },
+            ]
+        },
+        {
+            'id': 'budget',
+            'title': 'Budget Management',
+            'icon': 'fa-chart-line',
+            'content': [
+                {
+                    'subtitle': 'Budget Tracking',
+                    'text': 'Monitor your department budget:\n- Allocated amount\n- Committed (pending requisitions)\n- Actual spent\n- Available balance'
+                },
+                {
+                    'subtitle': 'Budget Reports',
+                    'text': 'Generate budget utilization reports by:\n- Department\n- Category\n- Time period\n- Budget year'
+                },
+            ]
+        },
+        {
+            'id': 'inventory',
+            'title': 'Inventory & Stores',
+            'icon': 'fa-warehouse',
+            'content': [
+                {
+                    'subtitle': 'Goods Receipt',
+                    'text': 'When goods are delivered:\n- Store keeper receives and inspects\n- GRN (Goods Received Note) is generated\n- Items are added to inventory\n- Supplier invoice is matched'
+                },
+                {
+                    'subtitle': 'Stock Issues',
+                    'text': 'Request items from store:\n- Create stock issue request\n- Specify items and quantities\n- Provide purpose/justification\n- Store keeper approves and issues items'
+                },
+            ]
+        },
+        {
+            'id': 'roles',
+            'title': 'User Roles & Permissions',
+            'icon': 'fa-users-cog',
+            'content': [
+                {
+                    'subtitle': 'System Roles',
+                    'text': '- Requesting Staff: Create requisitions\n- Head of Department: Approve department requisitions\n- Procurement Officer: Manage tenders and POs\n- Finance Officer: Budget verification and payments\n- Stores Officer: Manage inventory\n- Supplier: Submit bids and track orders\n- Auditor: View audit trails\n- Administrator: System configuration'
+                },
+            ]
+        },
+    ]
+    
+    context = {
+        'documentation_sections': documentation_sections,
+    }
+    
+    return render(request, 'support/documentation.html', context)
+
+
+@login_required
+def submit_support_ticket(request):
+    """Submit a support ticket"""
+    
+    if request.method == 'POST':
+        try:
+            subject = request.POST.get('subject')
+            category = request.POST.get('category')
+            priority = request.POST.get('priority')
+            description = request.POST.get('description')
+            
+            # Send email to support team
+            email_subject = f'[Support Ticket] {category} - {subject}'
+            email_body = f"""
+Support Ticket Details:
+
+From: {request.user.get_full_name()} ({request.user.email})
+Employee ID: {request.user.employee_id}
+Department: {request.user.department.name if request.user.department else 'N/A'}
+Role: {request.user.get_role_display()}
+
+Category: {category}
+Priority: {priority}
+Subject: {subject}
+
+Description:
+{description}
+
+---
+Submitted via University Procurement System
+            """
+            
+            send_mail(
+                email_subject,
+                email_body,
+                settings.DEFAULT_FROM_EMAIL,
+                ['ict.support@university.ac.ke'],
+                fail_silently=False,
+            )
+            
+            # Log the action
+            record_audit(
+                user=request.user,
+                action='CREATE',
+                model_name='SupportTicket',
+                object_id='TICKET',
+                object_repr=subject,
+                changes={'category': category, 'priority': priority}
+            )
+            
+            messages.success(
+                request, 
+                'Your support ticket has been submitted. Our team will respond within 24 hours.'
+            )
+            return redirect('help_center')
+            
+        except Exception as e:
+            messages.error(request, f'Error submitting support ticket: {str(e)}')
+    
+    return redirect('help_center')
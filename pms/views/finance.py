@@ -0,0 +1,3677 @@
+"""
+Finance views: budgets, invoices, payments and financial reports, and the
+finance officer portal.
+"""
+
+import csv
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import (
+    Avg, Count, DurationField, ExpressionWrapper, F, Max, Min, Q, Sum,
+)
+from django.db.models.functions import Coalesce, TruncMonth
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+
+from pms.budget_analytics import budget_cube
+from pms.db_routing import read_replica
+from pms.duplicates import find_duplicate_invoice, find_duplicate_payment
+from pms.forms import BudgetForm, BudgetReallocationForm, PaymentForm
+from pms.models import (
+    AuditLog, Budget, BudgetCategory, BudgetReallocation, BudgetYear,
+    Department, GoodsReceivedNote, Invoice, InvoiceItem, Payment,
+    PurchaseOrder, Requisition, RequisitionApproval, Supplier,
+    SupplierPerformance, Tender,
+)
+from pms.views.hod import log_action
+
+
+# ============================================================================
+# FINANCE DASHBOARD
+# ============================================================================
+
+@login_required
+def finance_dashboard(request):
+    """Main finance dashboard with key metrics and charts"""
+    
+    today = timezone.now().date()
+    current_year = BudgetYear.objects.filter(is_active=True).first()
+    
+    # Budget Overview
+    total_allocated = Budget.objects.filter(
+        budget_year=current_year,
+        is_active=True
+    ).aggregate(total=Sum('allocated_amount'))['total'] or 0
+    
+    total_committed = Budget.objects.filter(
+        budget_year=current_year,
+        is_active=True
+    ).aggregate(total=Sum('committed_amount'))['total'] or 0
+    
+    total_spent = Budget.objects.filter(
+        budget_year=current_year,
+        is_active=True
+    ).aggregate(total=Sum('actual_spent'))['total'] or 0
+    
+    available_budget = total_allocated - total_committed - total_spent
+    utilization_rate = (total_spent / total_allocated * 100) if total_allocated > 0 else 0
+    
+    # Invoice Statistics
+    pending_invoices = Invoice.objects.filter(
+        status__in=['SUBMITTED', 'VERIFYING']
+    ).count()
+    
+    approved_invoices_value = Invoice.objects.filter(
+        status='APPROVED'
+    ).aggregate(total=Sum('total_amount'))['total'] or 0
+    
+    # Payment Statistics
+    pending_payments = Payment.objects.filter(
+        status='PENDING'
+    ).count()
+    
+    payments_this_month = Payment.objects.filter(
+        payment_date__month=today.month,
+        payment_date__year=today.year,
+        status='COMPLETED'
+    ).aggregate(total=Sum('payment_amount'))['total'] or 0
+    
+    # Budget Utilization by Department (Top 10)
+    dept_utilization = Budget.objects.filter(
+        budget_year=current_year
+    ).values(
+        'department__name'
+    ).annotate(
+        allocated=Sum('allocated_amount'),
+        spent=Sum('actual_spent'),
+        utilization=Sum('actual_spent') / Sum('allocated_amount') * 100
+    ).order_by('-spent')[:10]
+    
+    dept_chart = {
+        'labels': [item['department__name'] for item in dept_utilization],
+        'allocated': [float(item['allocated']) for item in dept_utilization],
+        'spent': [float(item['spent']) for item in dept_utilization]
+    }
+    
+    # Budget by Category
+    category_budget = Budget.objects.filter(
+        budget_year=current_year
+    ).values(
+        'category__name'
+    ).annotate(
+        total=Sum('allocated_amount')
+    ).order_by('-total')[:8]
+    
+    category_chart = {
+        'labels': [item['category__name'] for item in category_budget],
+        'values': [float(item['total']) for item in category_budget]
+    }
+    
+    # Monthly Expenditure Trend (Last 6 months)
+    months = []
+    expenditure = []
+    
+    for i in range(5, -1, -1):
+        month_date = today - timedelta(days=30*i)
+        month_start = month_date.replace(day=1)
+        if i > 0:
+            next_month = month_date.replace(day=28) + timedelta(days=4)
+            month_end = next_month.replace(day=1) - timedelta(days=1)
+        else:
+            month_end = today
+            
+        month_spend = Payment.objects.filter(
+            payment_date__gte=month_start,
+            payment_date__lte=month_end,
+            status='COMPLETED'
+        ).aggregate(total=Sum('payment_amount'))['total'] or 0
+        
+        months.append(month_start.strftime('%b %Y'))
+        expenditure.append(float(month_spend))
+    
+    expenditure_chart = {
+        'labels': months,
+        'values': expenditure
+    }
+    
+    # Invoice Status Distribution
+    invoice_status = Invoice.objects.values('status').annotate(
+        count=Count('id')
+    ).order_by('-count')
+    
+    invoice_chart = {
+        'labels': [dict(Invoice.STATUS_CHOICES).get(item['status'], item['status']) 
+                   for item in invoice_status],
+        'values': [item['count'] for item in invoice_status]
+    }
+    
+    # Recent Activities
+    recent_invoices = Invoice.objects.select_related(
+        'supplier', 'purchase_order'
+    ).order_by('-created_at')[:5]
+    
+    recent_payments = Payment.objects.select_related(
+        'invoice__supplier'
+    ).order_by('-created_at')[:5]
+    
+    # Pending Approvals
+    pending_invoice_approvals = Invoice.objects.filter(
+        status='VERIFYING'
+    ).select_related('supplier')[:5]
+    
+    context = {
+        'current_year': current_year,
+        'total_allocated': total_allocated,
+        'total_committed': total_committed,
+        'total_spent': total_spent,
+        'available_budget': available_budget,
+        'utilization_rate': round(utilization_rate, 1),
+        'pending_invoices': pending_invoices,
+        'approved_invoices_value': approved_invoices_value,
+        'pending_payments': pending_payments,
+        'payments_this_month': payments_this_month,
+        'dept_chart': dept_chart,
+        'category_chart': category_chart,
+        'expenditure_chart': expenditure_chart,
+        'invoice_chart': invoice_chart,
+        'recent_invoices': recent_invoices,
+        'recent_payments': recent_payments,
+        'pending_invoice_approvals': pending_invoice_approvals,
+    }
+    
+    return render(request, 'finance/dashboard.html', context)
+
+
+# ============================================================================
+# BUDGET MANAGEMENT
+# ============================================================================
+
+@login_required
+def budget_list(request):
+    """List all budgets with filtering"""
+    
+    budgets = Budget.objects.select_related(
+        'budget_year', 'department', 'category', 'created_by'
+    ).all()
+    
+    # Filters
+    year_filter = request.GET.get('year')
+    department_filter = request.GET.get('department')
+    category_filter = request.GET.get('category')
+    budget_type_filter = request.GET.get('budget_type')
+    search = request.GET.get('search')
+    
+    if year_filter:
+        budgets = budgets.filter(budget_year_id=year_filter)
+    
+    if department_filter:
+        budgets = budgets.filter(department_id=department_filter)
+    
+    if category_filter:
+        budgets = budgets.filter(category_id=category_filter)
+    
+    if budget_type_filter:
+        budgets = budgets.filter(budget_type=budget_type_filter)
+    
+    if search:
+        budgets = budgets.filter(
+            Q(department__name__icontains=search) |
+            Q(category__name__icontains=search)
+        )
+    
+    budgets = budgets.order_by('-created_at')
+    
+    # Calculate totals
+    total_allocated = budgets.aggregate(total=Sum('allocated_amount'))['total'] or 0
+    total_spent = budgets.aggregate(total=Sum('actual_spent'))['total'] or 0
+    total_available = sum(b.available_balance for b in budgets)
+    
+    # Get filter options
+    budget_years = BudgetYear.objects.all().order_by('-start_date')
+    departments = Department.objects.filter(is_active=True).order_by('name')
+    categories = BudgetCategory.objects.filter(is_active=True).order_by('name')
+    
+    context = {
+        'budgets': budgets,
+        'budget_years': budget_years,
+        'departments': departments,
+        'categories': categories,
+        'budget_types': Budget.BUDGET_TYPE,
+        'total_allocated': total_allocated,
+        'total_spent': total_spent,
+        'total_available': total_available,
+        'filters': {
+            'year': year_filter,
+            'department': department_filter,
+            'category': category_filter,
+            'budget_type': budget_type_filter,
+            'search': search,
+        }
+    }
+    
+    return render(request, 'finance/budget_list.html', context)
+
+
+@login_required
+def budget_detail(request, budget_id):
+    """Budget detail view with utilization tracking"""
+    
+    budget = get_object_or_404(
+        Budget.objects.select_related(
+            'budget_year', 'department', 'category', 'created_by'
+        ),
+        id=budget_id
+    )
+    
+    # Get requisitions using this budget
+    requisitions = budget.requisitions.select_related(
+        'requested_by', 'department'
+    ).order_by('-created_at')
+    
+    # Get reallocations
+    reallocations_from = budget.reallocations_from.select_related(
+        'to_budget__department', 'requested_by', 'approved_by'
+    ).order_by('-created_at')
+    
+    reallocations_to = budget.reallocations_to.select_related(
+        'from_budget__department', 'requested_by', 'approved_by'
+    ).order_by('-created_at')
+    
+    # Calculate utilization percentage
+    utilization = (budget.actual_spent / budget.allocated_amount * 100) if budget.allocated_amount > 0 else 0
+    commitment = (budget.committed_amount / budget.allocated_amount * 100) if budget.allocated_amount > 0 else 0
+    
+    context = {
+        'budget': budget,
+        'requisitions': requisitions,
+        'reallocations_from': reallocations_from,
+        'reallocations_to': reallocations_to,
+        'utilization': round(utilization, 1),
+        'commitment': round(commitment, 1),
+    }
+    
+    return render(request, 'finance/budget_detail.html', context)
+
+
+@login_required
+def budget_create(request):
+    """Create new budget allocation"""
+    
+    if request.user.role not in ['FINANCE', 'ADMIN']:
+        messages.error(request, 'You do not have permission to create budgets')
+        return redirect('budget_list')
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                budget_year_id = request.POST.get('budget_year')
+                department_id = request.POST.get('department')
+                category_id = request.POST.get('category')
+                budget_type = request.POST.get('budget_type')
+                allocated_amount = Decimal(request.POST.get('allocated_amount'))
+                reference_number = request.POST.get('reference_number', '')
+                description = request.POST.get('description', '')
+                
+                # Check for duplicate
+                if Budget.objects.filter(
+                    budget_year_id=budget_year_id,
+                    department_id=department_id,
+                    category_id=category_id,
+                    reference_number=reference_number
+                ).exists():
+                    messages.error(request, 'Budget already exists for this combination')
+                    return redirect('budget_create')
+                
+                Budget.objects.create(
+                    budget_year_id=budget_year_id,
+                    department_id=department_id,
+                    category_id=category_id,
+                    budget_type=budget_type,
+                    allocated_amount=allocated_amount,
+                    reference_number=reference_number,
+                    description=description,
+                    created_by=request.user
+                )
+                
+                messages.success(request, 'Budget created successfully')
+                return redirect('budget_list')
+                
+        except Exception as e:
+            messages.error(request, f'Error creating budget: {str(e)}')
+    
+    # GET request
+    budget_years = BudgetYear.objects.all().order_by('-start_date')
+    departments = Department.objects.filter(is_active=True).order_by('name')
+    categories = BudgetCategory.objects.filter(is_active=True).order_by('name')
+    
+    context = {
+        'budget_years': budget_years,
+        'departments': departments,
+        'categories': categories,
+        'budget_types': Budget.BUDGET_TYPE,
+    }
+    
+    return render(request, 'finance/budget_create.html', context)
+
+
+@login_required
+def budget_reallocation_create(request, budget_id):
+    """Create budget reallocation request"""
+    
+    from_budget = get_object_or_404(Budget, id=budget_id)
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                to_budget_id = request.POST.get('to_budget')
+                amount = Decimal(request.POST.get('amount'))
+                justification = request.POST.get('justification')
+                
+                to_budget = get_object_or_404(Budget, id=to_budget_id)
+                
+                # Validate amount
+                if amount > from_budget.available_balance:
+                    messages.error(request, 'Insufficient available budget')
+                    return redirect('budget_reallocation_create', budget_id=budget_id)
+                
+                BudgetReallocation.objects.create(
+                    from_budget=from_budget,
+                    to_budget=to_budget,
+                    amount=amount,
+                    justification=justification,
+                    requested_by=request.user
+                )
+                
+                messages.success(request, 'Reallocation request submitted successfully')
+                return redirect('budget_detail', budget_id=budget_id)
+                
+        except Exception as e:
+            messages.error(request, f'Error creating reallocation: {str(e)}')
+    
+    # GET request - get available budgets in same year
+    available_budgets = Budget.objects.filter(
+        budget_year=from_budget.budget_year,
+        is_active=True
+    ).exclude(id=budget_id).select_related('department', 'category')
+    
+    context = {
+        'from_budget': from_budget,
+        'available_budgets': available_budgets,
+    }
+    
+    return render(request, 'finance/budget_reallocation_create.html', context)
+
+
+# ============================================================================
+# INVOICE MANAGEMENT
+# ============================================================================
+
+@login_required
+def invoice_list(request):
+    """List all invoices with filtering"""
+    
+    invoices = Invoice.objects.select_related(
+        'supplier', 'purchase_order', 'verified_by', 'approved_by'
+    ).all()
+    
+    # Filters
+    status_filter = request.GET.get('status')
+    supplier_filter = request.GET.get('supplier')
+    date_from = request.GET.get('date_from')
+    date_to = request.GET.get('date_to')
+    search = request.GET.get('search')
+    
+    if status_filter:
+        invoices = invoices.filter(status=status_filter)
+    
+    if supplier_filter:
+        invoices = invoices.filter(supplier_id=supplier_filter)
+    
+    if date_from:
+        invoices = invoices.filter(invoice_date__gte=date_from)
+    
+    if date_to:
+        invoices = invoices.filter(invoice_date__lte=date_to)
+    
+    if search:
+        invoices = invoices.filter(
+            Q(invoice_number__icontains=search) |
+            Q(supplier_invoice_number__icontains=search) |
+            Q(supplier__name__icontains=search)
+        )
+    
+    invoices = invoices.order_by('-created_at')
+    
+    # Statistics
+    total_value = invoices.aggregate(total=Sum('total_amount'))['total'] or 0
+    pending_value = invoices.filter(
+        status__in=['SUBMITTED', 'VERIFYING']
+    ).aggregate(total=Sum('total_amount'))['total'] or 0
+    
+    # Get filter options
+    suppliers = Supplier.objects.filter(status='APPROVED').order_by('name')
+    
+    context = {
+        'invoices': invoices,
+        'suppliers': suppliers,
+        'status_choices': Invoice.STATUS_CHOICES,
+        'total_value': total_value,
+        'pending_value': pending_value,
+        'filters': {
+            'status': status_filter,
+            'supplier': supplier_filter,
+            'date_from': date_from,
+            'date_to': date_to,
+            'search': search,
+        }
+    }
+    
+    return render(request, 'finance/invoice_list.html', context)
+
+
+@login_required
+def invoice_detail(request, invoice_id):
+    """Invoice detail view with 3-way matching"""
+    
+    invoice = get_object_or_404(
+        Invoice.objects.select_related(
+            'supplier', 'purchase_order', 'grn',
+            'verified_by', 'approved_by', 'submitted_by'
+        ),
+        id=invoice_id
+    )
+    
+    # Get invoice items
+    invoice_items = invoice.items.select_related('po_item').all()
+    
+    # Get payments
+    payments = invoice.payments.select_related(
+        'processed_by', 'approved_by'
+    ).order_by('-created_at')
+    
+    # Calculate matching status
+    if invoice.purchase_order and invoice.grn:
+        po_match = abs(invoice.total_amount - invoice.purchase_order.total_amount) < Decimal('0.01')
+        grn_match = invoice.grn.status == 'ACCEPTED'
+        three_way_match = po_match and grn_match
+    else:
+        po_match = False
+        grn_match = False
+        three_way_match = False
+    
+    # Payment status
+    total_paid = payments.filter(
+        status='COMPLETED'
+    ).aggregate(total=Sum('payment_amount'))['total'] or 0
+    
+    payment_progress = (total_paid / invoice.total_amount * 100) if invoice.total_amount > 0 else 0
+    
+    context = {
+        'invoice': invoice,
+        'invoice_items': invoice_items,
+        'payments': payments,
+        'po_match': po_match,
+        'grn_match': grn_match,
+        'three_way_match': three_way_match,
+        'total_paid': total_paid,
+        'payment_progress': round(payment_progress, 1),
+    }
+    
+    return render(request, 'finance/invoice_detail.html', context)
+
+
+@login_required
+def invoice_verify(request, invoice_id):
+    """Verify invoice details"""
+    
+    invoice = get_object_or_404(Invoice, id=invoice_id)
+    
+    if request.user.role not in ['FINANCE', 'PROCUREMENT', 'ADMIN']:
+        messages.error(request, 'You do not have permission to verify invoices')
+        return redirect('invoice_detail', invoice_id=invoice_id)
+    
+    if invoice.status != 'SUBMITTED':
+        messages.error(request, 'This invoice cannot be verified')
+        return redirect('invoice_detail', invoice_id=invoice_id)
+    
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        notes = request.POST.get('notes', '')
+        
+        if action == 'approve':
+            invoice.status = 'MATCHED'
+            invoice.verified_by = request.user
+            invoice.verified_at = timezone.now()
+            invoice.matching_notes = notes
+            invoice.save()
+            
+            messages.success(request, f'Invoice {invoice.invoice_number} verified successfully')
+        elif action == 'dispute':
+            invoice.status = 'DISPUTED'
+            invoice.dispute_reason = notes
+            invoice.save()
+            
+            messages.warning(request, f'Invoice {invoice.invoice_number} marked as disputed')
+        
+        return redirect('invoice_detail', invoice_id=invoice_id)
+    
+    context = {'invoice': invoice}
+    return render(request, 'finance/invoice_verify.html', context)
+
+
+@login_required
+def invoice_approve(request, invoice_id):
+    """Approve invoice for payment"""
+    
+    invoice = get_object_or_404(Invoice, id=invoice_id)
+    
+    if request.user.role not in ['FINANCE', 'ADMIN']:
+        messages.error(request, 'You do not have permission to approve invoices')
+        return redirect('invoice_detail', invoice_id=invoice_id)
+    
+    if invoice.status != 'MATCHED':
+        messages.error(request, 'Invoice must be verified and matched before approval')
+        return redirect('invoice_detail', invoice_id=invoice_id)
+    
+    if request.method == 'POST':
+        invoice.status = 'APPROVED'
+        invoice.approved_by = request.user
+        invoice.approved_at = timezone.now()
+        invoice.save()
+        
+        messages.success(request, f'Invoice {invoice.invoice_number} approved for payment')
+        return redirect('invoice_detail', invoice_id=invoice_id)
+    
+    context = {'invoice': invoice}
+    return render(request, 'finance/invoice_approve.html', context)
+
+
+# ============================================================================
+# INVOICE CREATION
+# ============================================================================
+
+
+@login_required
+def invoice_create(request, grn_id):
+    """Create invoice from GRN"""
+    grn = get_object_or_404(
+        GoodsReceivedNote.objects.select_related(
+            'purchase_order__supplier',
+            'store'
+        ).prefetch_related('items__po_item'),
+        id=grn_id
+    )
+    
+    # Check permissions
+    if request.user.role not in ['FINANCE', 'PROCUREMENT', 'ADMIN']:
+        messages.error(request, 'You do not have permission to create invoices')
+        return redirect('grn_detail', grn_id=grn_id)
+    
+    # Check if GRN is accepted
+    if grn.status not in ['ACCEPTED', 'PARTIAL']:
+        messages.error(request, 'Can only create invoices for accepted GRNs')
+        return redirect('grn_detail', grn_id=grn_id)
+    
+    # Check if invoice already exists
+    if grn.invoices.exists():
+        messages.warning(request, 'Invoice already exists for this GRN')
+        return redirect('invoice_detail', invoice_id=grn.invoices.first().id)
+    
+    # Calculate subtotal and count accepted items
+    subtotal = Decimal('0')
+    accepted_items = grn.items.filter(item_status='ACCEPTED')
+    
+    for grn_item in accepted_items:
+        item_total = grn_item.quantity_accepted * grn_item.po_item.unit_price
+        subtotal += item_total
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                supplier_invoice_number = request.POST.get('supplier_invoice_number', '').strip()
+                
+                if not supplier_invoice_number:
+                    messages.error(request, 'Supplier invoice number is required')
+                    return redirect('invoice_create', grn_id=grn_id)
+                
+                invoice_date = request.POST.get('invoice_date')
+                due_date = request.POST.get('due_date')
+                tax_rate = Decimal(request.POST.get('tax_rate', '0'))
+                other_charges = Decimal(request.POST.get('other_charges', '0'))
+                notes = request.POST.get('notes', '')
+                
+                # Calculate tax and total
+                tax_amount = (subtotal * tax_rate) / Decimal('100')
+                total_amount = subtotal + tax_amount + other_charges
+                
+                duplicate = find_duplicate_invoice(
+                    grn.purchase_order.supplier_id, supplier_invoice_number,
+                    total_amount, invoice_date
+                )
+                if duplicate:
+                    messages.error(
+                        request,
+                        f'Supplier invoice {supplier_invoice_number} for this amount is already '
+                        f'recorded as {duplicate.invoice_number}'
+                    )
+                    return redirect('invoice_create', grn_id=grn_id)
+                
+                # Create invoice (invoice_number will be auto-generated)
+                invoice = Invoice.objects.create(
+                    supplier_invoice_number=supplier_invoice_number,
+                    purchase_order=grn.purchase_order,
+                    grn=grn,
+                    supplier=grn.purchase_order.supplier,
+                    invoice_date=invoice_date,
+                    due_date=due_date,
+                    subtotal=subtotal,
+                    tax_amount=tax_amount,
+                    other_charges=other_charges,
+                    total_amount=total_amount,
+                    balance_due=total_amount,
+                    status='DRAFT',
+                    notes=notes,
+                    submitted_by=request.user
+                )
+                
+                # Create invoice items from accepted GRN items
+                for grn_item in accepted_items:
+                    item_subtotal = grn_item.quantity_accepted * grn_item.po_item.unit_price
+                    item_tax = (item_subtotal * tax_rate) / Decimal('100')
+                    
+                    InvoiceItem.objects.create(
+                        invoice=invoice,
+                        po_item=grn_item.po_item,
+                        description=grn_item.po_item.item_description,
+                        quantity=grn_item.quantity_accepted,
+                        unit_price=grn_item.po_item.unit_price,
+                        total_price=item_subtotal,
+                        tax_rate=tax_rate,
+                        tax_amount=item_tax
+                    )
+                
+                messages.success(request, f'Invoice {invoice.invoice_number} created successfully!')
+                return redirect('invoice_detail', invoice_id=invoice.id)
+                
+        except Exception as e:
+            messages.error(request, f'Error creating invoice: {str(e)}')
+            import traceback
+            print(traceback.format_exc())  # Log full error for debugging
+    
+    context = {
+        'grn': grn,
+        'subtotal': subtotal,
+        'po': grn.purchase_order,
+        'today': timezone.now().date(),
+        'accepted_items_count': accepted_items.count(),  # FIXED: Added this
+    }
+    
+    return render(request, 'finance/invoice_create.html', context)
+
+
+@login_required
+def invoice_submit(request, invoice_id):
+    """Submit invoice for verification"""
+    invoice = get_object_or_404(Invoice, id=invoice_id)
+    
+    if request.user.role not in ['FINANCE', 'PROCUREMENT', 'ADMIN']:
+        messages.error(request, 'You do not have permission to submit invoices')
+        return redirect('invoice_detail', invoice_id=invoice_id)
+    
+    if invoice.status != 'DRAFT':
+        messages.error(request, 'Invoice has already been submitted')
+        return redirect('invoice_detail', invoice_id=invoice_id)
+    
+    if request.method == 'POST':
+        invoice.status = 'SUBMITTED'
+        invoice.submitted_by = request.user
+        invoice.save()
+        
+        messages.success(request, f'Invoice {invoice.invoice_number} submitted for verification')
+        return redirect('invoice_detail', invoice_id=invoice_id)
+    
+    context = {'invoice': invoice}
+    return render(request, 'finance/invoice_submit.html', context)
+
+
+# ============================================================================
+# PAYMENT PROCESSING
+# ============================================================================
+
+@login_required
+def invoice_pay(request, invoice_id):
+    """Create payment for invoice"""
+    invoice = get_object_or_404(
+        Invoice.objects.select_related('supplier', 'purchase_order'),
+        id=invoice_id
+    )
+    
+    # Check permissions
+    if request.user.role not in ['FINANCE', 'ADMIN']:
+        messages.error(request, 'You do not have permission to process payments')
+        return redirect('invoice_detail', invoice_id=invoice_id)
+    
+    # Check invoice status
+    if invoice.status != 'APPROVED':
+        messages.error(request, 'Invoice must be approved before payment')
+        return redirect('invoice_detail', invoice_id=invoice_id)
+    
+    # Calculate remaining balance
+    total_paid = invoice.payments.filter(
+        status__in=['COMPLETED', 'PROCESSING']
+    ).aggregate(total=Sum('payment_amount'))['total'] or Decimal('0')
+    
+    remaining_balance = invoice.total_amount - total_paid
+    
+    if remaining_balance <= 0:
+        messages.warning(request, 'This invoice has been fully paid')
+        return redirect('invoice_detail', invoice_id=invoice_id)
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                payment_date = request.POST.get('payment_date')
+                payment_amount = Decimal(request.POST.get('payment_amount'))
+                payment_method = request.POST.get('payment_method')
+                payment_reference = request.POST.get('payment_reference')
+                bank_name = request.POST.get('bank_name', '')
+                cheque_number = request.POST.get('cheque_number', '')
+                notes = request.POST.get('notes', '')
+                
+                # Validate amount
+                if payment_amount <= 0:
+                    messages.error(request, 'Payment amount must be greater than zero')
+                    return redirect('invoice_pay', invoice_id=invoice_id)
+                
+                if payment_amount > remaining_balance:
+                    messages.error(request, f'Payment amount (KES {payment_amount:,.2f}) exceeds remaining balance (KES {remaining_balance:,.2f})')
+                    return redirect('invoice_pay', invoice_id=invoice_id)
+                
+                duplicate = find_duplicate_payment(
+                    payment_reference, invoice.id, payment_amount, payment_date
+                )
+                if duplicate:
+                    messages.error(request, f'This looks like a duplicate of payment {duplicate.payment_number}')
+                    return redirect('invoice_pay', invoice_id=invoice_id)
+                
+                # Create payment
+                payment = Payment.objects.create(
+                    invoice=invoice,
+                    payment_date=payment_date,
+                    payment_amount=payment_amount,
+                    payment_method=payment_method,
+                    payment_reference=payment_reference,
+                    bank_name=bank_name,
+                    cheque_number=cheque_number,
+                    notes=notes,
+                    processed_by=request.user,
+                    status='PENDING'
+                )
+                
+                messages.success(
+                    request, 
+                    f'Payment {payment.payment_number} created successfully. Please complete the payment process.'
+                )
+                return redirect('payment_detail', payment_id=payment.id)
+                
+        except Exception as e:
+            messages.error(request, f'Error creating payment: {str(e)}')
+    
+    context = {
+        'invoice': invoice,
+        'remaining_balance': remaining_balance,
+        'total_paid': total_paid,
+        'payment_methods': Payment.PAYMENT_METHODS,
+        'today': timezone.now().date(),
+    }
+    
+    return render(request, 'finance/invoice_pay.html', context)
+
+
+@login_required
+def payment_detail(request, payment_id):
+    """View payment details"""
+    payment = get_object_or_404(
+        Payment.objects.select_related(
+            'invoice__supplier',
+            'invoice__purchase_order',
+            'processed_by',
+            'approved_by'
+        ),
+        id=payment_id
+    )
+    
+    context = {
+        'payment': payment,
+        'can_complete': request.user.role in ['FINANCE', 'ADMIN'] and payment.status == 'PENDING',
+        'can_cancel': request.user.role in ['FINANCE', 'ADMIN'] and payment.status in ['PENDING', 'PROCESSING'],
+    }
+    
+    return render(request, 'finance/payment_detail.html', context)
+
+
+@login_required
+def payment_complete(request, payment_id):
+    """Complete/approve payment"""
+    payment = get_object_or_404(Payment, id=payment_id)
+    
+    # Check permissions
+    if request.user.role not in ['FINANCE', 'ADMIN']:
+        messages.error(request, 'You do not have permission to complete payments')
+        return redirect('payment_detail', payment_id=payment_id)
+    
+    # Check payment status
+    if payment.status not in ['PENDING', 'PROCESSING']:
+        messages.error(request, 'Payment has already been processed')
+        return redirect('payment_detail', payment_id=payment_id)
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                # Update payment status
+                payment.status = 'COMPLETED'
+                payment.approved_by = request.user
+                payment.save()
+                
+                # Update invoice payment status
+                payment.invoice.update_payment_status()
+                
+                messages.success(
+                    request, 
+                    f'Payment {payment.payment_number} completed successfully'
+                )
+                
+                # Check if invoice is fully paid
+                if payment.invoice.status == 'PAID':
+                    messages.success(
+                        request,
+                        f'Invoice {payment.invoice.invoice_number} has been fully paid!'
+                    )
+                
+                return redirect('payment_detail', payment_id=payment_id)
+                
+        except Exception as e:
+            messages.error(request, f'Error completing payment: {str(e)}')
+    
+    context = {'payment': payment}
+    return render(request, 'finance/payment_complete.html', context)
+
+
+@login_required
+def payment_cancel(request, payment_id):
+    """Cancel payment"""
+    payment = get_object_or_404(Payment, id=payment_id)
+    
+    # Check permissions
+    if request.user.role not in ['FINANCE', 'ADMIN']:
+        messages.error(request, 'You do not have permission to cancel payments')
+        return redirect('payment_detail', payment_id=payment_id)
+    
+    # Check payment status
+    if payment.status not in ['PENDING', 'PROCESSING']:
+        messages.error(request, 'Cannot cancel completed or failed payments')
+        return redirect('payment_detail', payment_id=payment_id)
+    
+    if request.method == 'POST':
+        payment.status = 'CANCELLED'
+        payment.notes += f"\n\nCancelled by {request.user.get_full_name()} on {timezone.now()}"
+        payment.save()
+        
+        messages.success(request, f'Payment {payment.payment_number} cancelled')
+        return redirect('invoice_detail', invoice_id=payment.invoice.id)
+    
+    context = {'payment': payment}
+    return render(request, 'finance/payment_cancel.html', context)
+
+# ============================================================================
+# PAYMENT MANAGEMENT
+# ============================================================================
+
+@login_required
+def payment_list(request):
+    """List all payments with filtering"""
+    
+    payments = Payment.objects.select_related(
+        'invoice__supplier', 'processed_by', 'approved_by'
+    ).all()
+    
+    # Filters
+    status_filter = request.GET.get('status')
+    method_filter = request.GET.get('method')
+    date_from = request.GET.get('date_from')
+    date_to = request.GET.get('date_to')
+    search = request.GET.get('search')
+    
+    if status_filter:
+        payments = payments.filter(status=status_filter)
+    
+    if method_filter:
+        payments = payments.filter(payment_method=method_filter)
+    
+    if date_from:
+        payments = payments.filter(payment_date__gte=date_from)
+    
+    if date_to:
+        payments = payments.filter(payment_date__lte=date_to)
+    
+    if search:
+        payments = payments.filter(
+            Q(payment_number__icontains=search) |
+            Q(payment_reference__icontains=search) |
+            Q(invoice__supplier__name__icontains=search)
+        )
+    
+    payments = payments.order_by('-created_at')
+    
+    # Statistics
+    total_paid = payments.filter(
+        status='COMPLETED'
+    ).aggregate(total=Sum('payment_amount'))['total'] or 0
+    
+    pending_amount = payments.filter(
+        status='PENDING'
+    ).aggregate(total=Sum('payment_amount'))['total'] or 0
+    
+    context = {
+        'payments': payments,
+        'status_choices': Payment.PAYMENT_STATUS,
+        'method_choices': Payment.PAYMENT_METHODS,
+        'total_paid': total_paid,
+        'pending_amount': pending_amount,
+        'filters': {
+            'status': status_filter,
+            'method': method_filter,
+            'date_from': date_from,
+            'date_to': date_to,
+            'search': search,
+        }
+    }
+    
+    return render(request, 'finance/payment_list.html', context)
+
+
+@login_required
+def payment_create(request, invoice_id):
+    """Create payment for invoice"""
+    
+    invoice = get_object_or_404(Invoice, id=invoice_id)
+    
+    if request.user.role not in ['FINANCE', 'ADMIN']:
+        messages.error(request, 'You do not have permission to create payments')
+        return redirect('invoice_detail', invoice_id=invoice_id)
+    
+    if invoice.status != 'APPROVED':
+        messages.error(request, 'Invoice must be approved before payment')
+        return redirect('invoice_detail', invoice_id=invoice_id)
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                payment_date = request.POST.get('payment_date')
+                payment_amount = Decimal(request.POST.get('payment_amount'))
+                payment_method = request.POST.get('payment_method')
+                payment_reference = request.POST.get('payment_reference')
+                bank_name = request.POST.get('bank_name', '')
+                cheque_number = request.POST.get('cheque_number', '')
+                notes = request.POST.get('notes', '')
+                
+                # Validate amount
+                total_paid = invoice.payments.filter(
+                    status__in=['COMPLETED', 'PROCESSING']
+                ).aggregate(total=Sum('payment_amount'))['total'] or 0
+                
+                if total_paid + payment_amount > invoice.total_amount:
+                    messages.error(request, 'Payment amount exceeds invoice balance')
+                    return redirect('payment_create', invoice_id=invoice_id)
+                
+                duplicate = find_duplicate_payment(
+                    payment_reference, invoice.id, payment_amount, payment_date
+                )
+                if duplicate:
+                    messages.error(request, f'This looks like a duplicate of payment {duplicate.payment_number}')
+                    return redirect('payment_create', invoice_id=invoice_id)
+                
+                payment = Payment.objects.create(
+                    invoice=invoice,
+                    payment_date=payment_date,
+                    payment_amount=payment_amount,
+                    payment_method=payment_method,
+                    payment_reference=payment_reference,
+                    bank_name=bank_name,
+                    cheque_number=cheque_number,
+                    notes=notes,
+                    processed_by=request.user,
+                    status='PENDING'
+                )
+                
+                messages.success(request, f'Payment {payment.payment_number} created successfully')
+                return redirect('invoice_detail', invoice_id=invoice_id)
+                
+        except Exception as e:
+            messages.error(request, f'Error creating payment: {str(e)}')
+    
+    # Calculate remaining balance
+    total_paid = invoice.payments.filter(
+        status='COMPLETED'
+    ).aggregate(total=Sum('payment_amount'))['total'] or 0
+    
+    remaining = invoice.total_amount - total_paid
+    
+    context = {
+        'invoice': invoice,
+        'remaining': remaining,
+        'payment_methods': Payment.PAYMENT_METHODS,
+    }
+    
+    return render(request, 'finance/payment_create.html', context)
+
+
+@login_required
+def payment_process(request, payment_id):
+    """Process/complete payment"""
+    
+    payment = get_object_or_404(Payment, id=payment_id)
+    
+    if request.user.role not in ['FINANCE', 'ADMIN']:
+        messages.error(request, 'You do not have permission to process payments')
+        return redirect('payment_list')
+    
+    if payment.status != 'PENDING':
+        messages.error(request, 'Payment has already been processed')
+        return redirect('payment_list')
+    
+    if request.method == 'POST':
+        payment.status = 'COMPLETED'
+        payment.approved_by = request.user
+        payment.save()
+        
+        # Update invoice status if fully paid
+        total_paid = payment.invoice.payments.filter(
+            status='COMPLETED'
+        ).aggregate(total=Sum('payment_amount'))['total'] or 0
+        
+        if total_paid >= payment.invoice.total_amount:
+            payment.invoice.status = 'PAID'
+            payment.invoice.payment_date = timezone.now().date()
+            payment.invoice.save()
+        
+        messages.success(request, f'Payment {payment.payment_number} processed successfully')
+        return redirect('payment_list')
+    
+    context = {'payment': payment}
+    return render(request, 'finance/payment_process.html', context)
+
+
+@read_replica
+@login_required
+def financial_reports(request):
+    """Financial reports dashboard with dynamic data and audit analytics"""
+    
+    # Get filters from request
+    start_date = request.GET.get('start_date')
+    end_date = request.GET.get('end_date')
+    budget_year_id = request.GET.get('budget_year')
+    
+    # Default to current year
+    current_year = BudgetYear.objects.filter(is_active=True).first()
+    
+    if budget_year_id:
+        selected_year = BudgetYear.objects.filter(id=budget_year_id).first()
+    else:
+        selected_year = current_year
+    
+    # Set date range
+    if start_date:
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+    else:
+        start_date = selected_year.start_date if selected_year else timezone.now().date().replace(month=1, day=1)
+    
+    if end_date:
+        end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+    else:
+        end_date = selected_year.end_date if selected_year else timezone.now().date()
+    
+    # ============================================================================
+    # 1. BUDGET UTILIZATION DATA
+    # ============================================================================
+    
+    cube = budget_cube(selected_year)
+    budget_summary = cube.total()
+    utilization_rate = budget_summary['utilization']
+    
+    # Budget by department
+    dept_budgets = cube.rollup('department')[:10]
+    
+    # Budget by category
+    category_budgets = cube.rollup('category')[:8]
+    
+    # ============================================================================
+    # 2. EXPENDITURE ANALYSIS DATA
+    # ============================================================================
+    
+    # Monthly expenditure trend, from the cube when it holds exactly the range
+    if cube.covers(start_date, end_date):
+        monthly_expenditure = cube.monthly(start_date, end_date)
+    else:
+        monthly_expenditure = list(Payment.objects.filter(
+            payment_date__gte=start_date,
+            payment_date__lte=end_date,
+            status='COMPLETED'
+        ).annotate(
+            month=TruncMonth('payment_date')
+        ).values('month').annotate(
+            amount=Sum('payment_amount'),
+            count=Count('id')
+        ).order_by('month'))
+    
+    # Expenditure by department
+    dept_expenditure = Invoice.objects.filter(
+        created_at__gte=start_date,
+        created_at__lte=end_date,
+        status='PAID'
+    ).values(
+        'purchase_order__requisition__department__name'
+    ).annotate(
+        total=Sum('total_amount'),
+        count=Count('id')
+    ).order_by('-total')[:10]
+    
+    # Expenditure by category
+    category_expenditure = InvoiceItem.objects.filter(
+        invoice__created_at__gte=start_date,
+        invoice__created_at__lte=end_date,
+        invoice__status='PAID'
+    ).values(
+        'po_item__requisition_item__item__category__name'
+    ).annotate(
+        total=Sum('total_price'),
+        count=Count('id')
+    ).order_by('-total')[:10]
+    
+    # ============================================================================
+    # 3. SUPPLIER PAYMENTS DATA
+    # ============================================================================
+    
+    # Supplier payment summary
+    supplier_payments = Payment.objects.filter(
+        payment_date__gte=start_date,
+        payment_date__lte=end_date,
+        status='COMPLETED'
+    ).values(
+        'invoice__supplier__name',
+        'invoice__supplier__supplier_number'
+    ).annotate(
+        total=Sum('payment_amount'),
+        count=Count('id'),
+        avg_payment=Avg('payment_amount')
+    ).order_by('-total')[:15]
+    
+    # Payment method distribution
+    payment_methods = Payment.objects.filter(
+        payment_date__gte=start_date,
+        payment_date__lte=end_date,
+        status='COMPLETED'
+    ).values('payment_method').annotate(
+        total=Sum('payment_amount'),
+        count=Count('id')
+    ).order_by('-total')
+    
+    # Supplier performance
+    supplier_performance = SupplierPerformance.objects.filter(
+        reviewed_at__gte=start_date,
+        reviewed_at__lte=end_date
+    ).values(
+        'supplier__name'
+    ).annotate(
+        avg_rating=Avg('overall_rating'),
+        count=Count('id')
+    ).order_by('-avg_rating')[:10]
+    
+    # ============================================================================
+    # 4. INVOICE AGING ANALYSIS
+    # ============================================================================
+    
+    # Invoice aging buckets
+    today = timezone.now().date()
+    
+    aging_data = []
+    aging_buckets = [
+        ('Current', 0, 30),
+        ('31-60 days', 31, 60),
+        ('61-90 days', 61, 90),
+        ('Over 90 days', 91, 365),
+    ]
+    
+    for bucket_name, min_days, max_days in aging_buckets:
+        min_date = today - timedelta(days=max_days)
+        max_date = today - timedelta(days=min_days) if min_days > 0 else today
+        
+        invoices = Invoice.objects.filter(
+            created_at__range=[min_date, max_date],
+            status__in=['SUBMITTED', 'VERIFYING', 'MATCHED', 'APPROVED']
+        ).aggregate(
+            total=Sum('total_amount'),
+            count=Count('id'),
+            avg_age=Avg(today - F('created_at'))
+        )
+        
+        aging_data.append({
+            'bucket': bucket_name,
+            'total': invoices['total'] or 0,
+            'count': invoices['count'] or 0,
+            'avg_days': invoices['avg_age'].days if invoices['avg_age'] else 0
+        })
+    
+    # Overdue invoices
+    overdue_invoices = Invoice.objects.filter(
+        due_date__lt=today,
+        status__in=['SUBMITTED', 'VERIFYING', 'MATCHED', 'APPROVED']
+    ).aggregate(
+        total=Sum('total_amount'),
+        count=Count('id')
+    )
+    
+    # ============================================================================
+    # 5. CASH FLOW ANALYSIS
+    # ============================================================================
+    
+    # Monthly cash flow
+    monthly_cashflow = []
+    for i in range(11, -1, -1):
+        month_date = today - timedelta(days=30*i)
+        month_start = month_date.replace(day=1)
+        if i > 0:
+            next_month = month_date.replace(day=28) + timedelta(days=4)
+            month_end = next_month.replace(day=1) - timedelta(days=1)
+        else:
+            month_end = today
+        
+        # Cash in (allocations)
+        cash_in = BudgetReallocation.objects.filter(
+            status='APPROVED',
+            approved_at__gte=month_start,
+            approved_at__lte=month_end
+        ).aggregate(total=Sum('amount'))['total'] or 0
+        
+        # Cash out (payments)
+        cash_out = Payment.objects.filter(
+            payment_date__gte=month_start,
+            payment_date__lte=month_end,
+            status='COMPLETED'
+        ).aggregate(total=Sum('payment_amount'))['total'] or 0
+        
+        monthly_cashflow.append({
+            'month': month_start.strftime('%b %Y'),
+            'cash_in': cash_in,
+            'cash_out': cash_out,
+            'net_flow': cash_in - cash_out
+        })
+    
+    # ============================================================================
+    # 6. AUDIT & COMPLIANCE DATA
+    # ============================================================================
+    
+    # Audit trail summary
+    audit_summary = AuditLog.objects.filter(
+        timestamp__gte=start_date,
+        timestamp__lte=end_date
+    ).values('action').annotate(
+        count=Count('id')
+    ).order_by('-count')
+    
+    # High-value transactions
+    high_value_payments = Payment.objects.filter(
+        payment_date__gte=start_date,
+        payment_date__lte=end_date,
+        status='COMPLETED',
+        payment_amount__gte=1000000  # Payments over 1M
+    ).select_related(
+        'invoice', 'invoice__supplier'
+    ).order_by('-payment_amount')[:10]
+    
+    # Compliance checks
+    compliance_data = {
+        'three_way_matched': Invoice.objects.filter(
+            is_three_way_matched=True,
+            created_at__gte=start_date,
+            created_at__lte=end_date
+        ).count(),
+        'unmatched_invoices': Invoice.objects.filter(
+            is_three_way_matched=False,
+            status='PAID',
+            created_at__gte=start_date,
+            created_at__lte=end_date
+        ).count(),
+        'suppliers_with_expired_docs': Supplier.objects.filter(
+            Q(tax_compliance_expiry__lt=today) | 
+            Q(registration_expiry__lt=today),
+            status='APPROVED'
+        ).count(),
+    }
+    
+    # ============================================================================
+    # 7. PROCUREMENT PERFORMANCE
+    # ============================================================================
+    
+    # Requisition to PO timeline
+    timeline_data = PurchaseOrder.objects.filter(
+        created_at__gte=start_date,
+        created_at__lte=end_date
+    ).annotate(
+        timeline=ExpressionWrapper(
+            F('created_at') - F('requisition__created_at'),
+            output_field=DurationField()
+        )
+    ).aggregate(
+        avg_days=Avg('timeline'),
+        min_days=Min('timeline'),
+        max_days=Max('timeline')
+    )
+    
+    # Tender success rate
+    tender_stats = Tender.objects.filter(
+        created_at__gte=start_date,
+        created_at__lte=end_date
+    ).aggregate(
+        total=Count('id'),
+        awarded=Count('id', filter=Q(status='AWARDED')),
+        cancelled=Count('id', filter=Q(status='CANCELLED'))
+    )
+    
+    if tender_stats['total']:
+        tender_success_rate = (tender_stats['awarded'] / tender_stats['total']) * 100
+    else:
+        tender_success_rate = 0
+    
+    # ============================================================================
+    # 8. REPORT TYPES WITH DYNAMIC DATA
+    # ============================================================================
+    
+    # Get all budget years for filter
+    budget_years = BudgetYear.objects.all().order_by('-start_date')
+    
+    reports = {
+        'budget_utilization': {
+            'title': 'Budget Utilization Report',
+            'description': f'Budget analysis for {selected_year.name if selected_year else "current year"}',
+            'icon': 'chart-pie',
+            'data_available': budget_summary['count'] > 0,
+            'summary': {
+                'allocated': budget_summary['allocated'],
+                'spent': budget_summary['spent'],
+                'utilization': utilization_rate
+            }
+        },
+        'expenditure_analysis': {
+            'title': 'Expenditure Analysis',
+            'description': f'Expenditure breakdown from {start_date} to {end_date}',
+            'icon': 'graph-up',
+            'data_available': len(monthly_expenditure) > 0,
+            'summary': {
+                'total': sum((m['amount'] for m in monthly_expenditure), 0),
+                'count': sum(m['count'] for m in monthly_expenditure)
+            }
+        },
+        'supplier_payments': {
+            'title': 'Supplier Payment Report',
+            'description': f'Supplier payments from {start_date} to {end_date}',
+            'icon': 'people',
+            'data_available': supplier_payments.count() > 0,
+            'summary': {
+                'total_suppliers': supplier_payments.count(),
+                'total_paid': sum(p['total'] for p in supplier_payments),
+                'avg_per_supplier': sum(p['total'] for p in supplier_payments) / supplier_payments.count() if supplier_payments.count() > 0 else 0
+            }
+        },
+        'invoice_aging': {
+            'title': 'Invoice Aging Report',
+            'description': 'Invoice status and aging analysis',
+            'icon': 'clock-history',
+            'data_available': aging_data and any(d['count'] > 0 for d in aging_data),
+            'summary': {
+                'overdue_total': overdue_invoices['total'] or 0,
+                'overdue_count': overdue_invoices['count'] or 0,
+                'current_count': aging_data[0]['count'] if aging_data else 0
+            }
+        },
+        'cashflow': {
+            'title': 'Cash Flow Report',
+            'description': f'Monthly cash flow from {start_date} to {end_date}',
+            'icon': 'currency-exchange',
+            'data_available': len(monthly_cashflow) > 0,
+            'summary': {
+                'total_in': sum(c['cash_in'] for c in monthly_cashflow),
+                'total_out': sum(c['cash_out'] for c in monthly_cashflow),
+                'net_flow': sum(c['net_flow'] for c in monthly_cashflow)
+            }
+        },
+        'audit_trail': {
+            'title': 'Audit Trail Report',
+            'description': f'System audit from {start_date} to {end_date}',
+            'icon': 'shield-check',
+            'data_available': audit_summary.count() > 0,
+            'summary': {
+                'total_actions': sum(a['count'] for a in audit_summary),
+                'top_action': audit_summary[0]['action'] if audit_summary else 'None',
+                'users_involved': AuditLog.objects.filter(
+                    timestamp__gte=start_date,
+                    timestamp__lte=end_date
+                ).values('user').distinct().count()
+            }
+        },
+        'compliance': {
+            'title': 'Compliance Report',
+            'description': 'Procurement compliance analysis',
+            'icon': 'file-check',
+            'data_available': True,
+            'summary': {
+                'matched_invoices': compliance_data['three_way_matched'],
+                'unmatched_invoices': compliance_data['unmatched_invoices'],
+                'suppliers_expired': compliance_data['suppliers_with_expired_docs']
+            }
+        },
+        'performance': {
+            'title': 'Procurement Performance',
+            'description': 'System performance metrics',
+            'icon': 'speedometer',
+            'data_available': True,
+            'summary': {
+                'avg_timeline': timeline_data['avg_days'].days if timeline_data['avg_days'] else 0,
+                'tender_success': tender_success_rate,
+                'high_value_count': high_value_payments.count()
+            }
+        }
+    }
+    
+    # Prepare chart data for JavaScript
+    context = {
+        'current_year': current_year,
+        'selected_year': selected_year,
+        'budget_years': budget_years,
+        'start_date': start_date,
+        'end_date': end_date,
+        'today': today,
+        
+        # Report data
+        'reports': reports,
+        
+        # Chart data for quick preview
+        'chart_data': {
+            # Budget Utilization Charts
+            'budget_utilization': {
+                'labels': [d['name'] for d in dept_budgets],
+                'allocated': [float(d['allocated']) for d in dept_budgets],
+                'spent': [float(d['spent']) for d in dept_budgets],
+            },
+            'category_budget': {
+                'labels': [c['name'] for c in category_budgets],
+                'allocated': [float(c['allocated']) for c in category_budgets],
+                'utilization': [float(c['utilization']) for c in category_budgets],
+            },
+            
+            # Expenditure Charts
+            'monthly_expenditure': {
+                'labels': [m['month'].strftime('%b %Y') for m in monthly_expenditure],
+                'amounts': [float(m['amount'] or 0) for m in monthly_expenditure],
+                'counts': [m['count'] for m in monthly_expenditure],
+            },
+            'dept_expenditure': {
+                'labels': [d['purchase_order__requisition__department__name'] or 'Unknown' for d in dept_expenditure],
+                'amounts': [float(d['total'] or 0) for d in dept_expenditure],
+            },
+            
+            # Supplier Charts
+            'supplier_payments': {
+                'labels': [s['invoice__supplier__name'] for s in supplier_payments[:8]],
+                'amounts': [float(s['total'] or 0) for s in supplier_payments[:8]],
+            },
+            'payment_methods': {
+                'labels': [p['payment_method'] for p in payment_methods],
+                'amounts': [float(p['total'] or 0) for p in payment_methods],
+            },
+            'supplier_performance': {
+                'labels': [s['supplier__name'] for s in supplier_performance],
+                'ratings': [float(s['avg_rating'] or 0) for s in supplier_performance],
+            },
+            
+            # Invoice Aging Charts
+            'invoice_aging': {
+                'labels': [a['bucket'] for a in aging_data],
+                'amounts': [float(a['total'] or 0) for a in aging_data],
+                'counts': [a['count'] for a in aging_data],
+            },
+            
+            # Cash Flow Charts
+            'cash_flow': {
+                'labels': [c['month'] for c in monthly_cashflow],
+                'cash_in': [float(c['cash_in'] or 0) for c in monthly_cashflow],
+                'cash_out': [float(c['cash_out'] or 0) for c in monthly_cashflow],
+                'net_flow': [float(c['net_flow'] or 0) for c in monthly_cashflow],
+            },
+            
+            # Audit Charts
+            'audit_actions': {
+                'labels': [a['action'] for a in audit_summary[:10]],
+                'counts': [a['count'] for a in audit_summary[:10]],
+            },
+            
+            # Compliance Charts
+            'compliance_status': {
+                'labels': ['3-Way Matched', 'Unmatched Paid', 'Suppliers Expired'],
+                'values': [
+                    compliance_data['three_way_matched'],
+                    compliance_data['unmatched_invoices'],
+                    compliance_data['suppliers_with_expired_docs']
+                ],
+            },
+        },
+        
+        # Summary statistics for display
+        'summary_stats': {
+            'budget_allocated': budget_summary['allocated'],
+            'budget_spent': budget_summary['spent'],
+            'budget_utilization': round(utilization_rate, 2),
+            'total_payments': reports['expenditure_analysis']['summary']['total'],
+            'total_invoices': Invoice.objects.filter(
+                created_at__gte=start_date,
+                created_at__lte=end_date
+            ).count(),
+            'total_suppliers': Supplier.objects.filter(status='APPROVED').count(),
+            'overdue_invoices': overdue_invoices['count'] or 0,
+            'overdue_amount': overdue_invoices['total'] or 0,
+            'avg_supplier_rating': Supplier.objects.filter(
+                status='APPROVED',
+                rating__gt=0
+            ).aggregate(avg=Avg('rating'))['avg'] or 0,
+            'procurement_timeline': timeline_data['avg_days'].days if timeline_data['avg_days'] else 0,
+        },
+        
+        # Table data for quick view
+        'table_data': {
+            'top_suppliers': list(supplier_payments[:5]),
+            'high_value_payments': high_value_payments,
+            'recent_audits': AuditLog.objects.filter(
+                timestamp__gte=start_date,
+                timestamp__lte=end_date
+            ).select_related('user').order_by('-timestamp')[:5],
+            'department_budgets': list(dept_budgets[:5]),
+        }
+    }
+    
+    return render(request, 'finance/reports.html', context)
+
+
+@read_replica
+@login_required
+def expenditure_report(request):
+    """Detailed expenditure analysis with dynamic charts"""
+
+    current_year = BudgetYear.objects.filter(is_active=True).first()
+
+    # Date range filters
+    start_date = request.GET.get('start_date')
+    end_date = request.GET.get('end_date')
+
+    if start_date:
+        start_date = timezone.datetime.strptime(start_date, '%Y-%m-%d').date()
+    else:
+        start_date = timezone.now().replace(month=1, day=1).date()
+
+    if end_date:
+        end_date = timezone.datetime.strptime(end_date, '%Y-%m-%d').date()
+    else:
+        end_date = timezone.now().date()
+
+    # =========================
+    # Department Expenditure
+    # =========================
+    dept_expenditure = Budget.objects.filter(
+        budget_year=current_year
+    ).values('department__name').annotate(
+        allocated=Sum('allocated_amount'),
+        spent=Sum('actual_spent'),
+        committed=Sum('committed_amount')
+    ).order_by('-spent')[:10]
+
+    # =========================
+    # Category Expenditure
+    # =========================
+    category_expenditure = Budget.objects.filter(
+        budget_year=current_year
+    ).values('category__name').annotate(
+        allocated=Sum('allocated_amount'),
+        spent=Sum('actual_spent')
+    ).order_by('-spent')[:8]
+
+    # =========================
+    # Monthly Expenditure Trend
+    # =========================
+    monthly_payments = Payment.objects.filter(
+        payment_date__gte=start_date,
+        payment_date__lte=end_date,
+        status='COMPLETED'
+    ).annotate(
+        month=TruncMonth('payment_date')
+    ).values('month').annotate(
+        total=Sum('payment_amount'),
+        count=Count('id')
+    ).order_by('month')
+
+    # =========================
+    # Payment Methods
+    # =========================
+    payment_methods = Payment.objects.filter(
+        payment_date__gte=start_date,
+        payment_date__lte=end_date,
+        status='COMPLETED'
+    ).values('payment_method').annotate(
+        total=Sum('payment_amount'),
+        count=Count('id')
+    ).order_by('-total')
+
+    # =========================
+    # Top Suppliers
+    # =========================
+    top_suppliers = Payment.objects.filter(
+        payment_date__gte=start_date,
+        payment_date__lte=end_date,
+        status='COMPLETED'
+    ).values('invoice__supplier__name').annotate(
+        total=Sum('payment_amount'),
+        count=Count('id')
+    ).order_by('-total')[:10]
+
+    # =========================
+    # Budget Utilization
+    # =========================
+    budget_utilization = Budget.objects.filter(
+        budget_year=current_year
+    ).aggregate(
+        total_allocated=Sum('allocated_amount'),
+        total_spent=Sum('actual_spent'),
+        total_committed=Sum('committed_amount')
+    )
+
+    utilization_rate = (
+        (budget_utilization['total_spent'] / budget_utilization['total_allocated']) * 100
+        if budget_utilization['total_allocated'] else 0
+    )
+
+    # =========================
+    # Invoice Aging (FIXED)
+    # =========================
+    invoice_aging = Invoice.objects.filter(
+        status__in=['SUBMITTED', 'VERIFYING', 'MATCHED', 'APPROVED']
+    ).annotate(
+        age=ExpressionWrapper(
+            timezone.now().date() - F('created_at'),
+            output_field=DurationField()
+        )
+    ).values('status').annotate(
+        total_amount=Sum('total_amount'),
+        count=Count('id'),
+        avg_age=Avg('age')
+    )
+
+    # =========================
+    # Payment Status Summary
+    # =========================
+    payment_status = Payment.objects.filter(
+        payment_date__gte=start_date,
+        payment_date__lte=end_date
+    ).values('status').annotate(
+        total=Sum('payment_amount'),
+        count=Count('id')
+    )
+
+    # =========================
+    # Recent Payments
+    # =========================
+    recent_payments = Payment.objects.filter(
+        status='COMPLETED'
+    ).select_related(
+        'invoice', 'invoice__supplier'
+    ).order_by('-payment_date')[:10]
+
+    # =========================
+    # Context
+    # =========================
+    context = {
+        'current_year': current_year,
+        'start_date': start_date,
+        'end_date': end_date,
+
+        'monthly_chart': {
+            'labels': [m['month'].strftime('%b %Y') for m in monthly_payments],
+            'values': [float(m['total']) for m in monthly_payments],
+            'counts': [m['count'] for m in monthly_payments],
+        },
+
+        'category_chart': {
+            'labels': [c['category__name'] for c in category_expenditure],
+            'values': [float(c['spent']) for c in category_expenditure],
+            'allocated': [float(c['allocated']) for c in category_expenditure],
+        },
+
+        'dept_chart': {
+            'labels': [d['department__name'] for d in dept_expenditure],
+            'allocated': [float(d['allocated']) for d in dept_expenditure],
+            'spent': [float(d['spent']) for d in dept_expenditure],
+            'committed': [float(d['committed']) for d in dept_expenditure],
+        },
+
+        'payment_method_chart': {
+            'labels': [p['payment_method'] for p in payment_methods],
+            'values': [float(p['total']) for p in payment_methods],
+            'counts': [p['count'] for p in payment_methods],
+        },
+
+        'supplier_chart': {
+            'labels': [s['invoice__supplier__name'] for s in top_suppliers],
+            'values': [float(s['total']) for s in top_suppliers],
+            'counts': [s['count'] for s in top_suppliers],
+        },
+
+        'payment_status_chart': {
+            'labels': [p['status'] for p in payment_status],
+            'values': [float(p['total']) for p in payment_status],
+            'counts': [p['count'] for p in payment_status],
+        },
+
+        'stats': {
+            'total_allocated': budget_utilization['total_allocated'] or 0,
+            'total_spent': budget_utilization['total_spent'] or 0,
+            'total_committed': budget_utilization['total_committed'] or 0,
+            'utilization_rate': round(utilization_rate, 2),
+        },
+
+        'recent_payments': recent_payments,
+        'invoice_aging': invoice_aging,
+        'category_expenditure': category_expenditure,
+        'dept_expenditure': dept_expenditure,
+    }
+
+    return render(request, 'finance/expenditure_report.html', context)
+
+
+@read_replica
+@login_required
+def budget_utilization_report(request):
+    """Budget Utilization Report with detailed breakdown"""
+    
+    # Get filters from request
+    start_date = request.GET.get('start_date')
+    end_date = request.GET.get('end_date')
+    budget_year_id = request.GET.get('budget_year')
+    department_id = request.GET.get('department')
+    
+    # Default to current year
+    current_year = BudgetYear.objects.filter(is_active=True).first()
+    
+    if budget_year_id:
+        selected_year = BudgetYear.objects.filter(id=budget_year_id).first()
+    else:
+        selected_year = current_year
+    
+    # Set date range
+    if start_date:
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+    else:
+        start_date = selected_year.start_date if selected_year else timezone.now().date().replace(month=1, day=1)
+    
+    if end_date:
+        end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+    else:
+        end_date = selected_year.end_date if selected_year else timezone.now().date()
+    
+    # Every budget figure below is a slice of the year's cached cube
+    cube = budget_cube(selected_year)
+    department_filter = department_id or None
+    
+    # ============================================================================
+    # 1. OVERALL BUDGET SUMMARY
+    # ============================================================================
+    overall_summary = cube.total(department_id=department_filter)
+    
+    total_allocated = overall_summary['allocated']
+    total_committed = overall_summary['committed']
+    total_spent = overall_summary['spent']
+    available_balance = overall_summary['available']
+    utilization_rate = overall_summary['utilization']
+    commitment_rate = overall_summary['commitment_rate']
+    total_utilization = overall_summary['total_utilization']
+    
+    # ============================================================================
+    # 2. BUDGET BY DEPARTMENT
+    # ============================================================================
+    dept_budgets_list = cube.rollup('department', department_id=department_filter)
+    
+    # ============================================================================
+    # 3. BUDGET BY CATEGORY
+    # ============================================================================
+    category_budgets_list = cube.rollup('category', department_id=department_filter)
+    
+    # ============================================================================
+    # 4. BUDGET BY TYPE
+    # ============================================================================
+    budget_types_list = [
+        {
+            'type': bt['id'],
+            'type_display': bt['name'],
+            'allocated': bt['allocated'],
+            'committed': bt['committed'],
+            'spent': bt['spent'],
+            'count': bt['count'],
+            'utilization': bt['utilization'],
+        }
+        for bt in cube.rollup('budget_type', department_id=department_filter)
+    ]
+    
+    # ============================================================================
+    # 5. OVER/UNDER UTILIZED BUDGETS
+    # ============================================================================
+    over_utilized = []
+    under_utilized = []
+    critical_budgets = []
+    
+    for budget in cube.lines(department_id=department_filter):
+        if budget['allocated'] > 0:
+            util_rate = budget['utilization']
+            
+            budget_data = {
+                'id': budget['id'],
+                'department': budget['department_name'],
+                'category': budget['category_name'],
+                'allocated': budget['allocated'],
+                'spent': budget['spent'],
+                'committed': budget['committed'],
+                'available': budget['available'],
+                'utilization': util_rate
+            }
+            
+            # Over-utilized (>100%)
+            if util_rate > 100:
+                over_utilized.append(budget_data)
+            
+            # Critical (>90% but <=100%)
+            elif util_rate > 90:
+                critical_budgets.append(budget_data)
+            
+            # Under-utilized (<50%)
+            elif util_rate < 50:
+                under_utilized.append(budget_data)
+    
+    # Sort lists
+    over_utilized.sort(key=lambda x: x['utilization'], reverse=True)
+    under_utilized.sort(key=lambda x: x['utilization'])
+    critical_budgets.sort(key=lambda x: x['utilization'], reverse=True)
+    
+    # ============================================================================
+    # 6. MONTHLY TREND
+    # ============================================================================
+    # Completed payments per month, from the cube when it holds exactly the range
+    if cube.covers(start_date, end_date):
+        monthly_data = cube.monthly(start_date, end_date)
+    else:
+        monthly_data = Payment.objects.filter(
+            payment_date__gte=start_date,
+            payment_date__lte=end_date,
+            status='COMPLETED'
+        ).annotate(
+            month=TruncMonth('payment_date')
+        ).values('month').annotate(
+            amount=Sum('payment_amount'),
+            count=Count('id')
+        ).order_by('month')
+    
+    # ============================================================================
+    # 7. BUDGET REALLOCATIONS
+    # ============================================================================
+    reallocations = BudgetReallocation.objects.filter(
+        status='APPROVED',
+        approved_at__gte=start_date,
+        approved_at__lte=end_date
+    ).select_related(
+        'from_budget__department',
+        'from_budget__category',
+        'to_budget__department',
+        'to_budget__category',
+        'requested_by',
+        'approved_by'
+    ).order_by('-approved_at')[:10]
+    
+    # ============================================================================
+    # 8. PREPARE CHART DATA
+    # ============================================================================
+    chart_data = {
+        # Department Budget Chart
+        'dept_budget': {
+            'labels': [d['name'] for d in dept_budgets_list[:10]],
+            'allocated': [float(d['allocated']) for d in dept_budgets_list[:10]],
+            'spent': [float(d['spent']) for d in dept_budgets_list[:10]],
+            'committed': [float(d['committed']) for d in dept_budgets_list[:10]],
+            'available': [float(d['available']) for d in dept_budgets_list[:10]],
+        },
+        
+        # Category Budget Chart
+        'category_budget': {
+            'labels': [c['name'] for c in category_budgets_list[:8]],
+            'allocated': [float(c['allocated']) for c in category_budgets_list[:8]],
+            'spent': [float(c['spent']) for c in category_budgets_list[:8]],
+        },
+        
+        # Budget Type Chart
+        'budget_type': {
+            'labels': [bt['type_display'] for bt in budget_types_list],
+            'values': [float(bt['allocated']) for bt in budget_types_list],
+        },
+        
+        # Utilization Chart
+        'utilization': {
+            'labels': [d['name'] for d in dept_budgets_list[:10]],
+            'values': [float(d['utilization']) for d in dept_budgets_list[:10]],
+        },
+    }
+    
+    # Get all departments and budget years for filters
+    all_departments = Department.objects.filter(is_active=True).order_by('name')
+    budget_years = BudgetYear.objects.all().order_by('-start_date')
+    
+    context = {
+        'current_year': current_year,
+        'selected_year': selected_year,
+        'budget_years': budget_years,
+        'all_departments': all_departments,
+        'selected_department': department_id,
+        'start_date': start_date,
+        'end_date': end_date,
+        
+        # Summary Stats
+        'stats': {
+            'total_allocated': total_allocated,
+            'total_committed': total_committed,
+            'total_spent': total_spent,
+            'available_balance': available_balance,
+            'utilization_rate': round(utilization_rate, 2),
+            'commitment_rate': round(commitment_rate, 2),
+            'total_utilization': round(total_utilization, 2),
+            'budget_count': overall_summary['count'],
+        },
+        
+        # Detailed Data
+        'dept_budgets': dept_budgets_list,
+        'category_budgets': category_budgets_list,
+        'budget_types': budget_types_list,
+        
+        # Special Categories
+        'over_utilized': over_utilized[:5],
+        'under_utilized': under_utilized[:5],
+        'critical_budgets': critical_budgets[:5],
+        
+        # Other Data
+        'monthly_data': monthly_data,
+        'reallocations': reallocations,
+        
+        # Chart Data
+        'chart_data': chart_data,
+    }
+    
+    return render(request, 'finance/budget_utilization_report.html', context)
+
+
+# ============================================================================
+# DASHBOARD & ANALYTICS
+# ============================================================================
+
+
+# Custom JSON encoder to handle Decimal and date objects
+class CustomJSONEncoder(DjangoJSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return float(obj)
+        if hasattr(obj, 'isoformat'):  # Handle date/datetime
+            return obj.isoformat()
+        return super().default(obj)
+
+
+@login_required
+def finance_dashboard_view(request):
+    """Finance Officer Dashboard with enhanced analytics"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    # Get current budget year
+    current_year = BudgetYear.objects.filter(is_active=True).first()
+    
+    # ============================================================================
+    # BUDGET STATISTICS
+    # ============================================================================
+    if current_year:
+        budgets = Budget.objects.filter(
+            budget_year=current_year,
+            is_active=True
+        )
+        
+        total_allocated = budgets.aggregate(
+            total=Coalesce(Sum('allocated_amount'), Decimal('0'))
+        )['total']
+        
+        total_committed = budgets.aggregate(
+            total=Coalesce(Sum('committed_amount'), Decimal('0'))
+        )['total']
+        
+        total_spent = budgets.aggregate(
+            total=Coalesce(Sum('actual_spent'), Decimal('0'))
+        )['total']
+        
+        available_balance = total_allocated - total_committed - total_spent
+        budget_utilization_percentage = (
+            (total_spent / total_allocated * 100) if total_allocated > 0 else 0
+        )
+    else:
+        total_allocated = total_committed = total_spent = available_balance = Decimal('0')
+        budget_utilization_percentage = 0
+    
+    # ============================================================================
+    # INVOICE STATISTICS
+    # ============================================================================
+    # Pending invoices (submitted and under verification)
+    pending_invoices = Invoice.objects.filter(
+        status__in=['SUBMITTED', 'VERIFYING']
+    )
+    pending_invoices_count = pending_invoices.count()
+    pending_invoices_value = pending_invoices.aggregate(
+        total=Coalesce(Sum('total_amount'), Decimal('0'))
+    )['total']
+    
+    # Approved invoices (ready for payment)
+    approved_invoices = Invoice.objects.filter(status='APPROVED')
+    approved_invoices_count = approved_invoices.count()
+    approved_invoices_value = approved_invoices.aggregate(
+        total=Coalesce(Sum('total_amount'), Decimal('0'))
+    )['total']
+    
+    # Overdue invoices (past due date and not paid)
+    today = timezone.now().date()
+    overdue_invoices = Invoice.objects.filter(
+        due_date__lt=today,
+        status__in=['APPROVED', 'MATCHED', 'VERIFYING']
+    )
+    overdue_invoices_count = overdue_invoices.count()
+    overdue_invoices_value = overdue_invoices.aggregate(
+        total=Coalesce(Sum('total_amount'), Decimal('0'))
+    )['total']
+    
+    # Total invoices this month
+    month_start = timezone.now().replace(day=1)
+    invoices_this_month = Invoice.objects.filter(
+        created_at__gte=month_start
+    ).count()
+    
+    # ============================================================================
+    # PAYMENT STATISTICS
+    # ============================================================================
+    # Pending payments
+    pending_payments_count = Payment.objects.filter(
+        status='PENDING'
+    ).count()
+    
+    pending_payments_value = Payment.objects.filter(
+        status='PENDING'
+    ).aggregate(
+        total=Coalesce(Sum('payment_amount'), Decimal('0'))
+    )['total']
+    
+    # Completed payments this month
+    completed_payments_count = Payment.objects.filter(
+        status='COMPLETED',
+        payment_date__gte=month_start
+    ).count()
+    
+    total_paid_this_month = Payment.objects.filter(
+        status='COMPLETED',
+        payment_date__gte=month_start
+    ).aggregate(
+        total=Coalesce(Sum('payment_amount'), Decimal('0'))
+    )['total']
+    
+    # Processing payments
+    processing_payments_count = Payment.objects.filter(
+        status='PROCESSING'
+    ).count()
+    
+    # Average payment processing time (in days)
+    completed_payments_with_dates = Payment.objects.filter(
+        status='COMPLETED',
+        payment_date__isnull=False,
+        created_at__isnull=False
+    ).annotate(
+        processing_days=F('payment_date') - F('created_at__date')
+    )
+    
+    avg_processing_time = 0
+    if completed_payments_with_dates.exists():
+        total_days = sum([p.processing_days.days for p in completed_payments_with_dates])
+        avg_processing_time = total_days / completed_payments_with_dates.count()
+    
+    # ============================================================================
+    # PENDING APPROVALS (Budget Check Stage)
+    # ============================================================================
+    pending_approvals = RequisitionApproval.objects.filter(
+        approval_stage='BUDGET',
+        status='PENDING'
+    ).select_related(
+        'requisition',
+        'requisition__department',
+        'requisition__requested_by'
+    ).order_by('-created_at')[:5]
+    
+    pending_approvals_count = RequisitionApproval.objects.filter(
+        approval_stage='BUDGET',
+        status='PENDING'
+    ).count()
+    
+    # ============================================================================
+    # RECENT ACTIVITIES
+    # ============================================================================
+    # Recent invoices
+    recent_invoices = Invoice.objects.filter(
+        status__in=['SUBMITTED', 'VERIFYING', 'APPROVED', 'MATCHED']
+    ).select_related(
+        'supplier',
+        'purchase_order'
+    ).order_by('-created_at')[:10]
+    
+    # Recent payments
+    recent_payments = Payment.objects.filter(
+        status__in=['PENDING', 'PROCESSING', 'COMPLETED']
+    ).select_related(
+        'invoice',
+        'invoice__supplier'
+    ).order_by('-created_at')[:10]
+    
+    # ============================================================================
+    # DEPARTMENT BUDGET UTILIZATION
+    # ============================================================================
+    department_utilization = []
+    if current_year:
+        department_utilization = Budget.objects.filter(
+            budget_year=current_year,
+            is_active=True
+        ).values(
+            'department__name',
+            'department__code'
+        ).annotate(
+            allocated=Coalesce(Sum('allocated_amount'), Decimal('0')),
+            spent=Coalesce(Sum('actual_spent'), Decimal('0')),
+            committed=Coalesce(Sum('committed_amount'), Decimal('0'))
+        ).order_by('-allocated')[:10]
+    
+    # ============================================================================
+    # CHARTS DATA
+    # ============================================================================
+    
+    # 1. Monthly Invoice Trend (Last 6 months)
+    six_months_ago = timezone.now() - timedelta(days=180)
+    monthly_invoices = Invoice.objects.filter(
+        created_at__gte=six_months_ago
+    ).annotate(
+        month=TruncMonth('created_at')
+    ).values('month').annotate(
+        count=Count('id'),
+        total=Coalesce(Sum('total_amount'), Decimal('0'))
+    ).order_by('month')
+    
+    # 2. Payment Status Distribution
+    payment_status_distribution = Payment.objects.values('status').annotate(
+        count=Count('id'),
+        total=Coalesce(Sum('payment_amount'), Decimal('0'))
+    ).order_by('-count')
+    
+    # 3. Top 5 Suppliers by Invoice Value (This Year)
+    year_start = timezone.now().replace(month=1, day=1)
+    top_suppliers = Invoice.objects.filter(
+        created_at__gte=year_start
+    ).values(
+        'supplier__name'
+    ).annotate(
+        total=Coalesce(Sum('total_amount'), Decimal('0')),
+        count=Count('id')
+    ).order_by('-total')[:5]
+    
+    # 4. Budget vs Actual by Category (Top 8 categories)
+    if current_year:
+        category_comparison = Budget.objects.filter(
+            budget_year=current_year,
+            is_active=True
+        ).values(
+            'category__name',
+            'category__code'
+        ).annotate(
+            allocated=Coalesce(Sum('allocated_amount'), Decimal('0')),
+            spent=Coalesce(Sum('actual_spent'), Decimal('0'))
+        ).order_by('-allocated')[:8]
+    else:
+        category_comparison = []
+    
+    # ============================================================================
+    # SUPPLIER STATISTICS
+    # ============================================================================
+    total_active_suppliers = Supplier.objects.filter(status='APPROVED').count()
+    
+    # Suppliers with pending payments
+    suppliers_pending_payment = Invoice.objects.filter(
+        status='APPROVED'
+    ).values('supplier').distinct().count()
+    
+    # ============================================================================
+    # CONTEXT
+    # ============================================================================
+    
+    # Prepare chart data for JSON serialization
+    monthly_invoices_list = list(monthly_invoices)
+    payment_status_list = list(payment_status_distribution)
+    top_suppliers_list = list(top_suppliers)
+    category_comparison_list = list(category_comparison)
+    
+    context = {
+        # Budget Year
+        'current_year': current_year,
+        
+        # Budget Statistics
+        'total_allocated': total_allocated,
+        'total_committed': total_committed,
+        'total_spent': total_spent,
+        'available_balance': available_balance,
+        'budget_utilization_percentage': budget_utilization_percentage,
+        
+        # Invoice Statistics
+        'pending_invoices_count': pending_invoices_count,
+        'pending_invoices_value': pending_invoices_value,
+        'approved_invoices_count': approved_invoices_count,
+        'approved_invoices_value': approved_invoices_value,
+        'overdue_invoices_count': overdue_invoices_count,
+        'overdue_invoices_value': overdue_invoices_value,
+        'invoices_this_month': invoices_this_month,
+        
+        # Payment Statistics
+        'pending_payments_count': pending_payments_count,
+        'pending_payments_value': pending_payments_value,
+        'completed_payments_count': completed_payments_count,
+        'total_paid_this_month': total_paid_this_month,
+        'processing_payments_count': processing_payments_count,
+        'avg_processing_time': round(avg_processing_time, 1),
+        
+        # Approvals
+        'pending_approvals': pending_approvals,
+        'pending_approvals_count': pending_approvals_count,
+        
+        # Recent Activities
+        'recent_invoices': recent_invoices,
+        'recent_payments': recent_payments,
+        
+        # Department Utilization
+        'department_utilization': department_utilization,
+        
+        # Chart Data - As lists (for json_script filter)
+        'monthly_invoices': monthly_invoices_list,
+        'payment_status_distribution': payment_status_list,
+        'top_suppliers': top_suppliers_list,
+        'category_comparison': category_comparison_list,
+        
+        # Supplier Statistics
+        'total_active_suppliers': total_active_suppliers,
+        'suppliers_pending_payment': suppliers_pending_payment,
+        
+        # Today for overdue checks
+        'today': today,
+    }
+    
+    return render(request, 'finance/finance_module/dashboard.html', context)
+
+
+def check_finance_permission(user):
+    """Check if user has finance permissions"""
+    return user.role in ['FINANCE', 'ADMIN']
+
+
+@login_required
+def finance_analytics_view(request):
+    """Finance Analytics Dashboard with proper data serialization for charts"""
+    
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    # Get current active budget year
+    current_year = BudgetYear.objects.filter(is_active=True).first()
+    
+    if not current_year:
+        messages.warning(request, 'No active budget year found.')
+        context = {
+            'current_year': None,
+            'monthly_spending_json': '[]',
+            'category_spending_json': '[]',
+            'department_spending_json': '[]',
+            'top_suppliers': [],
+            'payment_by_method': [],
+        }
+        return render(request, 'finance/finance_module/analytics.html', context)
+    
+    # ===================================================================
+    # 1. MONTHLY SPENDING TREND (Last 12 months)
+    # ===================================================================
+    twelve_months_ago = timezone.now() - timedelta(days=365)
+    
+    monthly_payments = Payment.objects.filter(
+        status='COMPLETED',
+        payment_date__gte=twelve_months_ago
+    ).annotate(
+        month_date=TruncMonth('payment_date')
+    ).values('month_date').annotate(
+        total=Sum('payment_amount')
+    ).order_by('month_date')
+    
+    # Format for Chart.js
+    monthly_spending_data = []
+    for item in monthly_payments:
+        monthly_spending_data.append({
+            'month': item['month_date'].strftime('%b %Y'),
+            'total': float(item['total'] or 0)
+        })
+    
+    # If no data, create empty months
+    if not monthly_spending_data:
+        monthly_spending_data = [
+            {'month': (timezone.now() - timedelta(days=30*i)).strftime('%b %Y'), 'total': 0}
+            for i in range(12, 0, -1)
+        ]
+    
+    monthly_spending_json = json.dumps(monthly_spending_data)
+    
+    # ===================================================================
+    # 2. CATEGORY-WISE SPENDING
+    # ===================================================================
+    category_spending = Budget.objects.filter(
+        budget_year=current_year,
+        is_active=True
+    ).values('category__name').annotate(
+        allocated=Sum('allocated_amount'),
+        spent=Sum('actual_spent')
+    ).order_by('-spent')[:10]
+    
+    # Format for Chart.js
+    category_spending_data = []
+    for item in category_spending:
+        if item['spent'] and item['spent'] > 0:
+            category_spending_data.append({
+                'category': item['category__name'] or 'Uncategorized',
+                'spent': float(item['spent'])
+            })
+    
+    # If no data, add dummy data
+    if not category_spending_data:
+        category_spending_data = [
+            {'category': 'No Data', 'spent': 0}
+        ]
+    
+    category_spending_json = json.dumps(category_spending_data)
+    
+    # ===================================================================
+    # 3. DEPARTMENT-WISE SPENDING
+    # ===================================================================
+    department_spending = Budget.objects.filter(
+        budget_year=current_year,
+        is_active=True
+    ).values('department__name').annotate(
+        allocated=Sum('allocated_amount'),
+        spent=Sum('actual_spent')
+    ).order_by('-spent')[:10]
+    
+    # Format for Chart.js
+    department_spending_data = []
+    for item in department_spending:
+        if item['spent'] and item['spent'] > 0:
+            department_spending_data.append({
+                'department': item['department__name'] or 'Unknown',
+                'spent': float(item['spent'])
+            })
+    
+    # If no data, add dummy data
+    if not department_spending_data:
+        department_spending_data = [
+            {'department': 'No Data', 'spent': 0}
+        ]
+    
+    department_spending_json = json.dumps(department_spending_data)
+    
+    # ===================================================================
+    # 4. TOP SUPPLIERS BY PAYMENT VALUE
+    # ===================================================================
+    top_suppliers = Payment.objects.filter(
+        status='COMPLETED',
+        payment_date__year=timezone.now().year
+    ).values('invoice__supplier__name').annotate(
+        total_paid=Sum('payment_amount'),
+        payment_count=Count('id')
+    ).order_by('-total_paid')[:10]
+    
+    # Calculate total for percentage
+    total_all_payments = Payment.objects.filter(
+        status='COMPLETED',
+        payment_date__year=timezone.now().year
+    ).aggregate(total=Sum('payment_amount'))['total'] or Decimal('0')
+    
+    # Add percentage to each supplier
+    top_suppliers_list = []
+    for supplier in top_suppliers:
+        total_paid = supplier['total_paid'] or Decimal('0')
+        percentage = (total_paid / total_all_payments * 100) if total_all_payments > 0 else 0
+        
+        top_suppliers_list.append({
+            'name': supplier['invoice__supplier__name'] or 'Unknown Supplier',
+            'total_paid': total_paid,
+            'payment_count': supplier['payment_count'],
+            'percentage': float(percentage)
+        })
+    
+    # ===================================================================
+    # 5. PAYMENT METHODS DISTRIBUTION
+    # ===================================================================
+    payment_by_method = Payment.objects.filter(
+        status='COMPLETED',
+        payment_date__year=timezone.now().year
+    ).values('payment_method').annotate(
+        total=Sum('payment_amount'),
+        count=Count('id')
+    ).order_by('-total')
+    
+    payment_methods_list = []
+    for method in payment_by_method:
+        total = method['total'] or Decimal('0')
+        count = method['count'] or 0
+        avg = (total / count) if count > 0 else Decimal('0')
+        
+        payment_methods_list.append({
+            'payment_method': method['payment_method'],
+            'total': total,
+            'count': count,
+            'average': avg
+        })
+    
+    # ===================================================================
+    # CONTEXT
+    # ===================================================================
+    context = {
+        'current_year': current_year,
+        'monthly_spending_json': monthly_spending_json,
+        'category_spending_json': category_spending_json,
+        'department_spending_json': department_spending_json,
+        'top_suppliers': top_suppliers_list,
+        'payment_by_method': payment_methods_list,
+        'total_all_payments': total_all_payments,
+    }
+    
+    return render(request, 'finance/finance_module/analytics.html', context)
+
+
+# ============================================================================
+# BUDGET MANAGEMENT
+# ============================================================================
+
+@login_required
+def finance_budgets_list_view(request):
+    """List all budgets"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    # Filters
+    year_id = request.GET.get('year')
+    department_id = request.GET.get('department')
+    category_id = request.GET.get('category')
+    budget_type = request.GET.get('budget_type')
+    search = request.GET.get('search', '')
+    
+    budgets = Budget.objects.select_related(
+        'budget_year', 'department', 'category', 'created_by'
+    ).all()
+    
+    if year_id:
+        budgets = budgets.filter(budget_year_id=year_id)
+    if department_id:
+        budgets = budgets.filter(department_id=department_id)
+    if category_id:
+        budgets = budgets.filter(category_id=category_id)
+    if budget_type:
+        budgets = budgets.filter(budget_type=budget_type)
+    if search:
+        budgets = budgets.filter(
+            Q(department__name__icontains=search) |
+            Q(category__name__icontains=search) |
+            Q(reference_number__icontains=search)
+        )
+    
+    budgets = budgets.order_by('-created_at')
+    
+    # Pagination
+    paginator = Paginator(budgets, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    # For filters
+    budget_years = BudgetYear.objects.all().order_by('-start_date')
+    departments = Department.objects.filter(is_active=True).order_by('name')
+    categories = BudgetCategory.objects.filter(is_active=True).order_by('name')
+    
+    context = {
+        'page_obj': page_obj,
+        'budget_years': budget_years,
+        'departments': departments,
+        'categories': categories,
+        'total_count': budgets.count(),
+    }
+    
+    return render(request, 'finance/finance_module/budgets_list.html', context)
+
+
+@login_required
+def finance_budget_detail_view(request, pk):
+    """Budget detail view"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    budget = get_object_or_404(
+        Budget.objects.select_related(
+            'budget_year', 'department', 'category', 'created_by'
+        ),
+        pk=pk
+    )
+    
+    # Get requisitions linked to this budget
+    requisitions = Requisition.objects.filter(
+        budget=budget
+    ).select_related('requested_by', 'department').order_by('-created_at')
+    
+    # Budget reallocations
+    reallocations_from = BudgetReallocation.objects.filter(
+        from_budget=budget
+    ).select_related('to_budget', 'requested_by', 'approved_by')
+    
+    reallocations_to = BudgetReallocation.objects.filter(
+        to_budget=budget
+    ).select_related('from_budget', 'requested_by', 'approved_by')
+    
+    context = {
+        'budget': budget,
+        'requisitions': requisitions,
+        'reallocations_from': reallocations_from,
+        'reallocations_to': reallocations_to,
+    }
+    
+    return render(request, 'finance/finance_module/budget_detail.html', context)
+
+
+@login_required
+def finance_budget_create_view(request):
+    """Create new budget"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    if request.method == 'POST':
+        form = BudgetForm(request.POST)
+        if form.is_valid():
+            budget = form.save(commit=False)
+            budget.created_by = request.user
+            budget.save()
+            
+            log_action(request.user, 'CREATE', 'Budget', budget.id, str(budget), request=request)
+            messages.success(request, f'Budget created successfully for {budget.department.name}.')
+            return redirect('finance_budget_detail', pk=budget.pk)
+    else:
+        form = BudgetForm()
+    
+    context = {
+        'form': form,
+    }
+    
+    return render(request, 'finance/finance_module/budget_form.html', context)
+
+
+@login_required
+def finance_budget_edit_view(request, pk):
+    """Edit existing budget"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    budget = get_object_or_404(Budget, pk=pk)
+    
+    if request.method == 'POST':
+        form = BudgetForm(request.POST, instance=budget)
+        if form.is_valid():
+            budget = form.save()
+            
+            log_action(request.user, 'UPDATE', 'Budget', budget.id, str(budget), request=request)
+            messages.success(request, f'Budget updated successfully.')
+            return redirect('finance_budget_detail', pk=budget.pk)
+    else:
+        form = BudgetForm(instance=budget)
+    
+    context = {
+        'form': form,
+        'budget': budget,
+    }
+    
+    return render(request, 'finance/finance_module/budget_form.html', context)
+
+
+@login_required
+def finance_budget_allocation_view(request):
+    """View and manage budget allocations"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    current_year = BudgetYear.objects.filter(is_active=True).first()
+    
+    if not current_year:
+        messages.warning(request, 'No active budget year found.')
+        return redirect('finance_dashboard')
+    
+    # Get all budgets for current year
+    budgets = Budget.objects.filter(
+        budget_year=current_year,
+        is_active=True
+    ).select_related('department', 'category').order_by('department__name', 'category__name')
+    
+    # Summary by department
+    dept_summary = budgets.values('department__name').annotate(
+        total_allocated=Sum('allocated_amount'),
+        total_spent=Sum('actual_spent'),
+        total_committed=Sum('committed_amount')
+    ).order_by('department__name')
+    
+    context = {
+        'current_year': current_year,
+        'budgets': budgets,
+        'dept_summary': dept_summary,
+    }
+    
+    return render(request, 'finance/finance_module/budget_allocation.html', context)
+
+
+@login_required
+def finance_budget_tracking_view(request):
+    """Budget tracking and utilization"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    current_year = BudgetYear.objects.filter(is_active=True).first()
+    
+    if not current_year:
+        messages.warning(request, 'No active budget year found.')
+        return redirect('finance_dashboard')
+    
+    # Department-wise budget summary
+    department_summary = Budget.objects.filter(
+        budget_year=current_year,
+        is_active=True
+    ).values(
+        'department__id',
+        'department__name',
+        'department__code'
+    ).annotate(
+        allocated=Sum('allocated_amount'),
+        committed=Sum('committed_amount'),
+        spent=Sum('actual_spent')
+    ).order_by('department__name')
+    
+    # Calculate available balance for each
+    for dept in department_summary:
+        dept['available'] = dept['allocated'] - dept['committed'] - dept['spent']
+        dept['utilization_percentage'] = (
+            (dept['spent'] / dept['allocated'] * 100) if dept['allocated'] > 0 else 0
+        )
+    
+    # Category-wise budget summary
+    category_summary = Budget.objects.filter(
+        budget_year=current_year,
+        is_active=True
+    ).values(
+        'category__id',
+        'category__name',
+        'category__code'
+    ).annotate(
+        allocated=Sum('allocated_amount'),
+        committed=Sum('committed_amount'),
+        spent=Sum('actual_spent')
+    ).order_by('category__name')
+    
+    for cat in category_summary:
+        cat['available'] = cat['allocated'] - cat['committed'] - cat['spent']
+        cat['utilization_percentage'] = (
+            (cat['spent'] / cat['allocated'] * 100) if cat['allocated'] > 0 else 0
+        )
+    
+    context = {
+        'current_year': current_year,
+        'department_summary': department_summary,
+        'category_summary': category_summary,
+    }
+    
+    return render(request, 'finance/finance_module/budget_tracking.html', context)
+
+
+@login_required
+def finance_budget_reallocate_view(request):
+    """Budget reallocation/virement"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    if request.method == 'POST':
+        form = BudgetReallocationForm(request.POST)
+        if form.is_valid():
+            reallocation = form.save(commit=False)
+            reallocation.requested_by = request.user
+            reallocation.approved_by = request.user
+            reallocation.approved_at = timezone.now()
+            reallocation.status = 'APPROVED'
+            
+            # Update budgets
+            from_budget = reallocation.from_budget
+            to_budget = reallocation.to_budget
+            amount = reallocation.amount
+            
+            from_budget.allocated_amount -= amount
+            from_budget.save()
+            
+            to_budget.allocated_amount += amount
+            to_budget.save()
+            
+            reallocation.save()
+            
+            log_action(request.user, 'CREATE', 'BudgetReallocation', reallocation.id, str(reallocation), request=request)
+            messages.success(request, f'Budget reallocation of {amount} completed successfully.')
+            return redirect('finance_budget_tracking')
+    else:
+        form = BudgetReallocationForm()
+    
+    context = {
+        'form': form,
+    }
+    
+    return render(request, 'finance/finance_module/budget_reallocate.html', context)
+
+
+# ============================================================================
+# INVOICE MANAGEMENT
+# ============================================================================
+
+@login_required
+def finance_invoices_list_view(request):
+    """List all invoices"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    # Filters
+    status = request.GET.get('status')
+    supplier_id = request.GET.get('supplier')
+    search = request.GET.get('search', '')
+    date_from = request.GET.get('date_from')
+    date_to = request.GET.get('date_to')
+    
+    invoices = Invoice.objects.select_related(
+        'supplier', 'purchase_order', 'grn', 'verified_by', 'approved_by'
+    ).all()
+    
+    if status:
+        invoices = invoices.filter(status=status)
+    if supplier_id:
+        invoices = invoices.filter(supplier_id=supplier_id)
+    if search:
+        invoices = invoices.filter(
+            Q(invoice_number__icontains=search) |
+            Q(supplier_invoice_number__icontains=search) |
+            Q(supplier__name__icontains=search)
+        )
+    if date_from:
+        invoices = invoices.filter(invoice_date__gte=date_from)
+    if date_to:
+        invoices = invoices.filter(invoice_date__lte=date_to)
+    
+    invoices = invoices.order_by('-created_at')
+    
+    # Pagination
+    paginator = Paginator(invoices, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    # Statistics
+    total_value = invoices.aggregate(Sum('total_amount'))['total_amount__sum'] or 0
+    
+    context = {
+        'page_obj': page_obj,
+        'total_count': invoices.count(),
+        'total_value': total_value,
+    }
+    
+    return render(request, 'finance/finance_module/invoices_list.html', context)
+
+
+@login_required
+def finance_invoice_detail_view(request, pk):
+    """Invoice detail view"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    invoice = get_object_or_404(
+        Invoice.objects.select_related(
+            'supplier', 'purchase_order', 'grn',
+            'verified_by', 'approved_by', 'submitted_by'
+        ),
+        pk=pk
+    )
+    
+    # Get invoice items
+    items = invoice.items.select_related('po_item').all()
+    
+    # Get invoice documents
+    documents = invoice.documents.all()
+    
+    # Get payments for this invoice
+    payments = invoice.payments.select_related(
+        'processed_by', 'approved_by'
+    ).order_by('-created_at')
+    
+    context = {
+        'invoice': invoice,
+        'items': items,
+        'documents': documents,
+        'payments': payments,
+    }
+    
+    return render(request, 'finance/finance_module/invoice_detail.html', context)
+
+
+@login_required
+def finance_invoice_verify_view(request, pk):
+    """Verify invoice (3-way matching)"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    invoice = get_object_or_404(Invoice, pk=pk)
+    
+    if invoice.status not in ['SUBMITTED', 'VERIFYING']:
+        messages.warning(request, 'This invoice cannot be verified.')
+        return redirect('finance_invoice_detail', pk=pk)
+    
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        comments = request.POST.get('comments', '')
+        
+        if action == 'approve':
+            invoice.status = 'MATCHED'
+            invoice.verified_by = request.user
+            invoice.verified_at = timezone.now()
+            invoice.matching_notes = comments
+            invoice.is_three_way_matched = True
+            invoice.save()
+            
+            log_action(request.user, 'APPROVE', 'Invoice', invoice.id, str(invoice), request=request)
+            messages.success(request, f'Invoice {invoice.invoice_number} verified successfully.')
+            
+        elif action == 'dispute':
+            invoice.status = 'DISPUTED'
+            invoice.dispute_reason = comments
+            invoice.verified_by = request.user
+            invoice.verified_at = timezone.now()
+            invoice.save()
+            
+            log_action(request.user, 'REJECT', 'Invoice', invoice.id, str(invoice), request=request)
+            messages.info(request, f'Invoice {invoice.invoice_number} marked as disputed.')
+        
+        return redirect('finance_invoice_detail', pk=pk)
+    
+    # Get PO and GRN for comparison
+    po = invoice.purchase_order
+    grn = invoice.grn
+    
+    context = {
+        'invoice': invoice,
+        'po': po,
+        'grn': grn,
+    }
+    
+    return render(request, 'finance/finance_module/invoice_verify.html', context)
+
+
+@login_required
+def finance_invoice_approve_view(request, pk):
+    """Approve invoice for payment"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    invoice = get_object_or_404(Invoice, pk=pk)
+    
+    if invoice.status != 'MATCHED':
+        messages.warning(request, 'Invoice must be verified before approval.')
+        return redirect('finance_invoice_detail', pk=pk)
+    
+    if request.method == 'POST':
+        comments = request.POST.get('comments', '')
+        
+        invoice.status = 'APPROVED'
+        invoice.approved_by = request.user
+        invoice.approved_at = timezone.now()
+        invoice.balance_due = invoice.total_amount  # Set initial balance
+        if comments:
+            invoice.notes = f"{invoice.notes}\n\nApproval Notes: {comments}" if invoice.notes else f"Approval Notes: {comments}"
+        invoice.save()
+        
+        log_action(request.user, 'APPROVE', 'Invoice', invoice.id, str(invoice), request=request)
+        messages.success(request, f'Invoice {invoice.invoice_number} approved for payment.')
+        
+        return redirect('finance_invoice_detail', pk=pk)
+    
+    context = {
+        'invoice': invoice,
+    }
+    
+    return render(request, 'finance/finance_module/invoice_approve.html', context)
+
+
+@login_required
+def finance_pending_invoices_view(request):
+    """List pending invoices"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    invoices = Invoice.objects.filter(
+        status__in=['SUBMITTED', 'VERIFYING']
+    ).select_related('supplier', 'purchase_order').order_by('-created_at')
+    
+    paginator = Paginator(invoices, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    total_value = invoices.aggregate(Sum('total_amount'))['total_amount__sum'] or 0
+    
+    context = {
+        'page_obj': page_obj,
+        'total_count': invoices.count(),
+        'total_value': total_value,
+    }
+    
+    return render(request, 'finance/finance_module/pending_invoices.html', context)
+
+
+@login_required
+def finance_paid_invoices_view(request):
+    """List paid invoices"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    invoices = Invoice.objects.filter(
+        status='PAID'
+    ).select_related('supplier', 'purchase_order').order_by('-payment_date')
+    
+    paginator = Paginator(invoices, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    total_paid = invoices.aggregate(Sum('total_amount'))['total_amount__sum'] or 0
+    
+    context = {
+        'page_obj': page_obj,
+        'total_count': invoices.count(),
+        'total_paid': total_paid,
+    }
+    
+    return render(request, 'finance/finance_module/paid_invoices.html', context)
+
+
+@login_required
+def finance_overdue_invoices_view(request):
+    """List overdue invoices"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    today = timezone.now().date()
+    
+    invoices = Invoice.objects.filter(
+        status__in=['APPROVED', 'MATCHED'],
+        due_date__lt=today
+    ).select_related('supplier', 'purchase_order').order_by('due_date')
+    
+    paginator = Paginator(invoices, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    total_overdue = invoices.aggregate(Sum('total_amount'))['total_amount__sum'] or 0
+    
+    context = {
+        'page_obj': page_obj,
+        'total_count': invoices.count(),
+        'total_overdue': total_overdue,
+    }
+    
+    return render(request, 'finance/finance_module/overdue_invoices.html', context)
+
+
+# ============================================================================
+# PAYMENT MANAGEMENT
+# ============================================================================
+
+@login_required
+def finance_payments_list_view(request):
+    """List all payments"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    # Filters
+    status = request.GET.get('status')
+    search = request.GET.get('search', '')
+    date_from = request.GET.get('date_from')
+    date_to = request.GET.get('date_to')
+    
+    payments = Payment.objects.select_related(
+        'invoice', 'invoice__supplier', 'processed_by', 'approved_by'
+    ).all()
+    
+    if status:
+        payments = payments.filter(status=status)
+    if search:
+        payments = payments.filter(
+            Q(payment_number__icontains=search) |
+            Q(payment_reference__icontains=search) |
+            Q(invoice__invoice_number__icontains=search) |
+            Q(invoice__supplier__name__icontains=search)
+        )
+    if date_from:
+        payments = payments.filter(payment_date__gte=date_from)
+    if date_to:
+        payments = payments.filter(payment_date__lte=date_to)
+    
+    payments = payments.order_by('-created_at')
+    
+    # Pagination
+    paginator = Paginator(payments, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    total_amount = payments.aggregate(Sum('payment_amount'))['payment_amount__sum'] or 0
+    
+    context = {
+        'page_obj': page_obj,
+        'total_count': payments.count(),
+        'total_amount': total_amount,
+    }
+    
+    return render(request, 'finance/finance_module/payments_list.html', context)
+
+
+@login_required
+def finance_payment_detail_view(request, pk):
+    """Payment detail view"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    payment = get_object_or_404(
+        Payment.objects.select_related(
+            'invoice', 'invoice__supplier', 'invoice__purchase_order',
+            'processed_by', 'approved_by'
+        ),
+        pk=pk
+    )
+    
+    context = {
+        'payment': payment,
+    }
+    
+    return render(request, 'finance/finance_module/payment_detail.html', context)
+
+
+@login_required
+def finance_process_payment_view(request, invoice_id):
+    """Process payment for an invoice"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    invoice = get_object_or_404(
+        Invoice.objects.select_related('supplier', 'purchase_order'),
+        pk=invoice_id
+    )
+    
+    if invoice.status != 'APPROVED':
+        messages.error(request, 'Invoice must be approved before payment.')
+        return redirect('finance_invoice_detail', pk=invoice_id)
+    
+    if request.method == 'POST':
+        form = PaymentForm(request.POST)
+        if form.is_valid():
+            duplicate = find_duplicate_payment(
+                form.cleaned_data.get('payment_reference'), invoice.id,
+                form.cleaned_data.get('payment_amount'), form.cleaned_data.get('payment_date')
+            )
+            if duplicate:
+                form.add_error(None, f'This looks like a duplicate of payment {duplicate.payment_number}.')
+        if form.is_valid():
+            payment = form.save(commit=False)
+            payment.invoice = invoice
+            payment.processed_by = request.user
+            payment.status = 'PENDING'
+            payment.save()
+            
+            # Update invoice
+            invoice.update_payment_status()
+            
+            log_action(request.user, 'CREATE', 'Payment', payment.id, str(payment), request=request)
+            messages.success(request, f'Payment {payment.payment_number} created successfully.')
+            
+            return redirect('finance_payment_detail', pk=payment.pk)
+    else:
+        form = PaymentForm(initial={
+            'payment_date': timezone.now().date(),
+            'payment_amount': invoice.balance_due,
+        })
+    
+    context = {
+        'form': form,
+        'invoice': invoice,
+    }
+    
+    return render(request, 'finance/finance_module/process_payment.html', context)
+
+
+@login_required
+def finance_approve_payment_view(request, pk):
+    """Approve a payment"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    payment = get_object_or_404(Payment, pk=pk)
+    
+    if payment.status != 'PENDING':
+        messages.warning(request, 'Payment is not pending approval.')
+        return redirect('finance_payment_detail', pk=pk)
+    
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        
+        if action == 'approve':
+            payment.status = 'COMPLETED'
+            payment.approved_by = request.user
+            payment.save()
+            
+            # Update invoice payment status
+            payment.invoice.update_payment_status()
+            
+            log_action(request.user, 'APPROVE', 'Payment', payment.id, str(payment), request=request)
+            messages.success(request, f'Payment {payment.payment_number} approved.')
+            
+        elif action == 'reject':
+            payment.status = 'CANCELLED'
+            payment.notes = request.POST.get('notes', 'Rejected by finance')
+            payment.save()
+            
+            log_action(request.user, 'REJECT', 'Payment', payment.id, str(payment), request=request)
+            messages.info(request, f'Payment {payment.payment_number} rejected.')
+        
+        return redirect('finance_payment_detail', pk=pk)
+    
+    context = {
+        'payment': payment,
+    }
+    
+    return render(request, 'finance/finance_module/approve_payment.html', context)
+
+
+@login_required
+def finance_payment_schedule_view(request):
+    """Payment schedule view"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    # Get approved invoices awaiting payment
+    upcoming_payments = Invoice.objects.filter(
+        status='APPROVED'
+    ).select_related('supplier', 'purchase_order').order_by('due_date')
+    
+    paginator = Paginator(upcoming_payments, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    total_scheduled = upcoming_payments.aggregate(Sum('balance_due'))['balance_due__sum'] or 0
+    
+    context = {
+        'page_obj': page_obj,
+        'total_count': upcoming_payments.count(),
+        'total_scheduled': total_scheduled,
+    }
+    
+    return render(request, 'finance/finance_module/payment_schedule.html', context)
+
+
+@login_required
+def finance_payment_history_view(request):
+    """Payment history"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    payments = Payment.objects.filter(
+        status='COMPLETED'
+    ).select_related(
+        'invoice', 'invoice__supplier', 'processed_by', 'approved_by'
+    ).order_by('-payment_date')
+    
+    paginator = Paginator(payments, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    total_paid = payments.aggregate(Sum('payment_amount'))['payment_amount__sum'] or 0
+    
+    context = {
+        'page_obj': page_obj,
+        'total_count': payments.count(),
+        'total_paid': total_paid,
+    }
+    
+    return render(request, 'finance/finance_module/payment_history.html', context)
+
+
+# ============================================================================
+# APPROVALS
+# ============================================================================
+
+@login_required
+def finance_pending_approvals_view(request):
+    """Pending budget approvals"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    approvals = RequisitionApproval.objects.filter(
+        approval_stage='BUDGET',
+        status='PENDING'
+    ).select_related(
+        'requisition', 'requisition__department', 'requisition__requested_by'
+    ).order_by('-created_at')
+    
+    paginator = Paginator(approvals, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    context = {
+        'page_obj': page_obj,
+        'total_count': approvals.count(),
+    }
+    
+    return render(request, 'finance/finance_module/pending_approvals.html', context)
+
+
+@login_required
+def finance_approve_requisition_view(request, requisition_id):
+    """Approve or reject requisition (budget check)"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    requisition = get_object_or_404(
+        Requisition.objects.select_related('department', 'budget', 'requested_by'),
+        pk=requisition_id
+    )
+    
+    approval = RequisitionApproval.objects.filter(
+        requisition=requisition,
+        approval_stage='BUDGET',
+        status='PENDING'
+    ).first()
+    
+    if not approval:
+        messages.error(request, 'Budget approval not found or already processed.')
+        return redirect('finance_pending_approvals')
+    
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        comments = request.POST.get('comments', '')
+        
+        if action == 'approve':
+            approval.status = 'APPROVED'
+            approval.approver = request.user
+            approval.approval_date = timezone.now()
+            approval.comments = comments
+            approval.save()
+            
+            requisition.status = 'BUDGET_APPROVED'
+            requisition.save()
+            
+            log_action(request.user, 'APPROVE', 'Requisition', requisition.id, str(requisition), request=request)
+            messages.success(request, f'Requisition {requisition.requisition_number} approved.')
+            
+        elif action == 'reject':
+            approval.status = 'REJECTED'
+            approval.approver = request.user
+            approval.approval_date = timezone.now()
+            approval.comments = comments
+            approval.save()
+            
+            requisition.status = 'REJECTED'
+            requisition.rejection_reason = comments
+            requisition.save()
+            
+            log_action(request.user, 'REJECT', 'Requisition', requisition.id, str(requisition), request=request)
+            messages.info(request, f'Requisition {requisition.requisition_number} rejected.')
+        
+        return redirect('finance_pending_approvals')
+    
+    context = {
+        'requisition': requisition,
+        'approval': approval,
+    }
+    
+    return render(request, 'finance/finance_module/approve_requisition.html', context)
+
+
+@login_required
+def finance_approved_requisitions_view(request):
+    """List approved requisitions"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    requisitions = Requisition.objects.filter(
+        status__in=['BUDGET_APPROVED', 'APPROVED']
+    ).select_related('department', 'requested_by', 'budget').order_by('-updated_at')
+    
+    paginator = Paginator(requisitions, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    context = {
+        'page_obj': page_obj,
+        'total_count': requisitions.count(),
+    }
+    
+    return render(request, 'finance/finance_module/approved_requisitions.html', context)
+
+
+@login_required
+def finance_rejected_requisitions_view(request):
+    """List rejected requisitions"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    requisitions = Requisition.objects.filter(
+        status='REJECTED'
+    ).select_related(
+        'department', 
+        'requested_by', 
+        'budget'
+    ).prefetch_related('approvals').order_by('-updated_at')
+    
+    # Add rejection info from approvals
+    for req in requisitions:
+        rejection_approval = req.approvals.filter(status='REJECTED').first()
+        if rejection_approval:
+            req.rejected_by = rejection_approval.approver
+            req.rejected_by_role = rejection_approval.get_approval_stage_display()
+            req.rejection_comments = rejection_approval.comments
+        else:
+            req.rejected_by = None
+            req.rejected_by_role = ''
+            req.rejection_comments = ''
+    
+    paginator = Paginator(requisitions, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    # Calculate summary stats
+    total_amount = sum(req.estimated_amount for req in requisitions)
+    departments = requisitions.values_list('department', flat=True).distinct()
+    
+    # Calculate average review days
+    avg_days = 0
+    if requisitions:
+        total_days = sum(
+            (req.updated_at - req.created_at).days 
+            for req in requisitions
+        )
+        avg_days = total_days / requisitions.count()
+    
+    context = {
+        'page_obj': page_obj,
+        'total_count': requisitions.count(),
+        'total_amount': total_amount,
+        'departments': Department.objects.filter(id__in=departments),
+        'avg_days': avg_days,
+    }
+    
+    return render(request, 'finance/finance_module/rejected_requisitions.html', context)
+
+# ============================================================================
+# REPORTS
+# ============================================================================
+
+@login_required
+def finance_expenditure_report_view(request):
+    """Expenditure report"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    # Get filter parameters
+    date_from = request.GET.get('date_from', (timezone.now() - timedelta(days=30)).strftime('%Y-%m-%d'))
+    date_to = request.GET.get('date_to', timezone.now().strftime('%Y-%m-%d'))
+    department_id = request.GET.get('department')
+    
+    payments = Payment.objects.filter(
+        status='COMPLETED',
+        payment_date__gte=date_from,
+        payment_date__lte=date_to
+    ).select_related('invoice', 'invoice__supplier', 'invoice__purchase_order__requisition__department')
+    
+    if department_id:
+        payments = payments.filter(invoice__purchase_order__requisition__department_id=department_id)
+    
+    # Summary by department
+    dept_expenditure = payments.values(
+        'invoice__purchase_order__requisition__department__name'
+    ).annotate(
+        total=Sum('payment_amount'),
+        count=Count('id')
+    ).order_by('-total')
+    
+    # Summary by supplier
+    supplier_expenditure = payments.values(
+        'invoice__supplier__name'
+    ).annotate(
+        total=Sum('payment_amount'),
+        count=Count('id')
+    ).order_by('-total')[:10]
+    
+    total_expenditure = payments.aggregate(Sum('payment_amount'))['payment_amount__sum'] or 0
+    
+    departments = Department.objects.filter(is_active=True).order_by('name')
+    
+    context = {
+        'date_from': date_from,
+        'date_to': date_to,
+        'payments': payments[:50],  # Limit display
+        'dept_expenditure': dept_expenditure,
+        'supplier_expenditure': supplier_expenditure,
+        'total_expenditure': total_expenditure,
+        'departments': departments,
+    }
+    
+    return render(request, 'finance/finance_module/expenditure_report.html', context)
+
+
+@login_required
+def finance_budget_vs_actual_view(request):
+    """Budget vs Actual report"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    current_year = BudgetYear.objects.filter(is_active=True).first()
+    
+    if not current_year:
+        messages.warning(request, 'No active budget year found.')
+        return redirect('finance_dashboard')
+    
+    budgets = Budget.objects.filter(
+        budget_year=current_year,
+        is_active=True
+    ).select_related('department', 'category').annotate(
+        variance=F('allocated_amount') - F('actual_spent'),
+        variance_percentage=(F('actual_spent') / F('allocated_amount') * 100)
+    ).order_by('department__name', 'category__name')
+    
+    context = {
+        'current_year': current_year,
+        'budgets': budgets,
+    }
+    
+    return render(request, 'finance/finance_module/budget_vs_actual.html', context)
+
+
+@login_required
+def finance_financial_statements_view(request):
+    """Financial statements"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    current_year = BudgetYear.objects.filter(is_active=True).first()
+    
+    # Income statement components
+    total_payments = Payment.objects.filter(
+        status='COMPLETED',
+        payment_date__year=timezone.now().year
+    ).aggregate(Sum('payment_amount'))['payment_amount__sum'] or 0
+    
+    # Balance sheet components
+    outstanding_invoices = Invoice.objects.filter(
+        status='APPROVED'
+    ).aggregate(Sum('balance_due'))['balance_due__sum'] or 0
+    
+    context = {
+        'current_year': current_year,
+        'total_payments': total_payments,
+        'outstanding_invoices': outstanding_invoices,
+    }
+    
+    return render(request, 'finance/finance_module/financial_statements.html', context)
+
+
+@login_required
+def finance_transaction_report_view(request):
+    """Transaction report"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    date_from = request.GET.get('date_from', (timezone.now() - timedelta(days=30)).strftime('%Y-%m-%d'))
+    date_to = request.GET.get('date_to', timezone.now().strftime('%Y-%m-%d'))
+    
+    payments = Payment.objects.filter(
+        payment_date__gte=date_from,
+        payment_date__lte=date_to
+    ).select_related('invoice', 'invoice__supplier').order_by('-payment_date')
+    
+    paginator = Paginator(payments, 50)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    total_amount = payments.aggregate(Sum('payment_amount'))['payment_amount__sum'] or 0
+    
+    context = {
+        'date_from': date_from,
+        'date_to': date_to,
+        'page_obj': page_obj,
+        'total_amount': total_amount,
+    }
+    
+    return render(request, 'finance/finance_module/transaction_report.html', context)
+
+
+@login_required
+def finance_export_report_view(request):
+    """Export reports to CSV/PDF"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    report_type = request.GET.get('type', 'payments')
+    export_format = request.GET.get('format', 'csv')
+    date_from = request.GET.get('date_from', (timezone.now() - timedelta(days=30)).strftime('%Y-%m-%d'))
+    date_to = request.GET.get('date_to', timezone.now().strftime('%Y-%m-%d'))
+    
+    if report_type == 'payments':
+        data = Payment.objects.filter(
+            status='COMPLETED',
+            payment_date__gte=date_from,
+            payment_date__lte=date_to
+        ).select_related('invoice', 'invoice__supplier')
+        
+        if export_format == 'csv':
+            response = HttpResponse(content_type='text/csv')
+            response['Content-Disposition'] = f'attachment; filename="payments_{timezone.now().strftime("%Y%m%d")}.csv"'
+            
+            writer = csv.writer(response)
+            writer.writerow(['Payment Number', 'Date', 'Supplier', 'Invoice Number', 'Amount', 'Method', 'Reference'])
+            
+            for payment in data:
+                writer.writerow([
+                    payment.payment_number,
+                    payment.payment_date,
+                    payment.invoice.supplier.name,
+                    payment.invoice.invoice_number,
+                    payment.payment_amount,
+                    payment.get_payment_method_display(),
+                    payment.payment_reference
+                ])
+            
+            return response
+    
+    messages.warning(request, 'Export format not implemented yet.')
+    return redirect('finance_dashboard')
+
+
+@login_required
+def finance_help_view(request):
+    """Finance help and documentation"""
+    if not check_finance_permission(request.user):
+        messages.error(request, 'You do not have finance officer permissions.')
+        return redirect('dashboard')
+    
+    context = {}
+    return render(request, 'finance/finance_module/help.html', context)
@@ -0,0 +1,1664 @@
+"""
+Procurement plan views: plans, plan items, submission and approval,
+amendments and plan reports.
+"""
+
+import csv
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+from django.utils.text import slugify
+from django.views.decorators.http import require_http_methods
+
+from pms.db_routing import read_replica
+from pms.models import (
+    Budget, BudgetYear, Department, Item, ItemCategory, ProcurementPlan,
+    ProcurementPlanAmendment, ProcurementPlanItem,
+)
+from pms.plan_consumption import plan_item_statistics, plan_status_counts
+from pms.plan_execution import RATES, STAGES, execution_report, execution_rows
+from pms.plan_import import COLUMNS, PlanImportError, import_items, template_csv
+from pms.price_index import index_of, suggested_price
+
+
+# ============================================================================
+# PERMISSION DECORATORS
+# ============================================================================
+
+def procurement_or_admin_required(user):
+    """Check if user is procurement officer or admin"""
+    return user.role in ['PROCUREMENT', 'ADMIN']
+
+
+def admin_required(user):
+    """Check if user is admin"""
+    return user.role == 'ADMIN'
+
+
+# ============================================================================
+# PROCUREMENT PLAN LIST & DASHBOARD
+# ============================================================================
+
+@login_required
+@user_passes_test(procurement_or_admin_required)
+def procurement_plan_list(request):
+    """List all procurement plans with filters"""
+    
+    # Get filter parameters
+    budget_year_id = request.GET.get('budget_year')
+    department_id = request.GET.get('department')
+    status = request.GET.get('status')
+    search = request.GET.get('search', '').strip()
+    
+    # Base queryset
+    plans = ProcurementPlan.objects.all()
+    
+    # Apply filters
+    if budget_year_id:
+        plans = plans.filter(budget_year_id=budget_year_id)
+    
+    if department_id:
+        plans = plans.filter(department_id=department_id)
+    
+    if status:
+        plans = plans.filter(status=status)
+    
+    if search:
+        plans = plans.filter(
+            Q(plan_number__icontains=search) |
+            Q(title__icontains=search) |
+            Q(description__icontains=search) |
+            Q(department__name__icontains=search)
+        )
+    
+    # Get filter options
+    budget_years = BudgetYear.objects.all().order_by('-start_date')
+    departments = Department.objects.filter(is_active=True).order_by('name')
+    
+    # Statistics
+    status_counts = plan_status_counts(plans)
+    
+    plans = plans.select_related(
+        'budget_year', 'department', 'submitted_by', 'approved_by'
+    ).annotate(
+        total_items=Count('items'),
+        total_estimated_cost=Sum('items__estimated_cost'),
+        total_committed=Sum('items__amount_committed')
+    ).order_by('-created_at')
+    
+    context = {
+        'plans': plans,
+        'budget_years': budget_years,
+        'departments': departments,
+        'total_plans': status_counts['total'],
+        'approved_plans': status_counts['APPROVED'],
+        'active_plans': status_counts['ACTIVE'],
+        'draft_plans': status_counts['DRAFT'],
+        'page_title': 'Procurement Plans Management',
+        'selected_budget_year': budget_year_id,
+        'selected_department': department_id,
+        'selected_status': status,
+        'search_query': search,
+    }
+    
+    return render(request, 'procurement/plan_list.html', context)
+
+
+@login_required
+@user_passes_test(procurement_or_admin_required)
+def procurement_plan_detail(request, pk):
+    """View detailed procurement plan with items"""
+    
+    plan = get_object_or_404(
+        ProcurementPlan.objects.select_related(
+            'budget_year', 'department', 'submitted_by', 'approved_by'
+        ),
+        pk=pk
+    )
+    
+    # Get plan items grouped by quarter (one query for all quarters)
+    items_by_quarter = {code: [] for code, _ in ProcurementPlan.QUARTER_CHOICES}
+    for item in plan.items.all():
+        items_by_quarter.setdefault(item.planned_quarter, []).append(item)
+    
+    # Calculate statistics
+    statistics = plan_item_statistics(plan.items.all())
+    
+    # Get amendments
+    amendments = list(plan.amendments.select_related(
+        'requested_by', 'approved_by', 'plan_item'
+    ).order_by('-requested_at'))
+    
+    # Permissions
+    can_edit = plan.status in ['DRAFT', 'SUBMITTED'] and request.user.role in ['PROCUREMENT', 'ADMIN']
+    can_approve = plan.status == 'SUBMITTED' and request.user.role == 'ADMIN'
+    can_activate = plan.status == 'APPROVED' and request.user.role == 'ADMIN'
+    
+    context = {
+        'plan': plan,
+        'items_q1': items_by_quarter['Q1'],
+        'items_q2': items_by_quarter['Q2'],
+        'items_q3': items_by_quarter['Q3'],
+        'items_q4': items_by_quarter['Q4'],
+        'total_estimated': statistics['total_estimated'],
+        'total_committed': statistics['total_committed'],
+        'total_items': statistics['total_items'],
+        'completed_items': statistics['by_status']['COMPLETED'],
+        'in_progress_items': statistics['by_status']['IN_PROGRESS'],
+        'amendments': amendments,
+        'can_edit': can_edit,
+        'can_approve': can_approve,
+        'can_activate': can_activate,
+        'page_title': f'Procurement Plan: {plan.plan_number}',
+    }
+    
+    return render(request, 'procurement/plan_detail.html', context)
+
+
+# ============================================================================
+# CREATE & EDIT PROCUREMENT PLAN
+# ============================================================================
+
+
+def procurement_hod_or_admin_required(user):
+    """Check if user is procurement officer, HOD or admin"""
+    return user.role in ['PROCUREMENT', 'ADMIN', 'HOD']
+
+
+@login_required
+@user_passes_test(procurement_hod_or_admin_required)
+def procurement_plan_create(request):
+    """Create new procurement plan with items"""
+    
+    if request.method == 'POST':
+        # Get form data
+        plan_title = request.POST.get('title')
+        plan_description = request.POST.get('description', '')
+        budget_year_id = request.POST.get('budget_year')
+        department_id = request.POST.get('department')
+        
+        # Get items data (JSON string from frontend)
+        items_json = request.POST.get('items_data', '[]')
+        
+        # Validation
+        if not all([plan_title, budget_year_id, department_id]):
+            messages.error(request, 'Please fill in all required fields.')
+            return redirect('procurement_plan_create')
+        
+        # Parse items
+        try:
+            items_data = json.loads(items_json)
+        except json.JSONDecodeError:
+            messages.error(request, 'Invalid items data.')
+            return redirect('procurement_plan_create')
+        
+        # Validate items
+        if not items_data:
+            messages.error(request, 'Please add at least one item to the procurement plan.')
+            return redirect('procurement_plan_create')
+        
+        # Check if plan already exists for this department/year
+        existing_plan = ProcurementPlan.objects.filter(
+            budget_year_id=budget_year_id,
+            department_id=department_id
+        ).exists()
+        
+        if existing_plan:
+            messages.error(
+                request,
+                'A procurement plan already exists for this department and budget year. '
+                'Please edit the existing plan instead.'
+            )
+            return redirect('procurement_plan_list')
+        
+        # Create plan
+        plan = ProcurementPlan.objects.create(
+            budget_year_id=budget_year_id,
+            department_id=department_id,
+            title=plan_title,
+            description=plan_description,
+            status='DRAFT',
+            submitted_by=request.user
+        )
+        
+        # Create plan items
+        sequence = 1
+        created_items = 0
+        
+        for item_data in items_data:
+            try:
+                # Get item if ID provided, otherwise None
+                item = None
+                if item_data.get('item_id'):
+                    item = Item.objects.get(id=item_data['item_id'])
+                
+                # Get budget if provided
+                budget = None
+                if item_data.get('budget_id'):
+                    budget = Budget.objects.get(id=item_data['budget_id'])
+                
+                # Create plan item
+                ProcurementPlanItem.objects.create(
+                    procurement_plan=plan,
+                    item=item,
+                    item_type=item_data['item_type'],
+                    description=item_data['description'],
+                    specifications=item_data.get('specifications', ''),
+                    quantity=Decimal(str(item_data['quantity'])),
+                    unit_of_measure=item_data['unit_of_measure'],
+                    estimated_cost=Decimal(str(item_data['estimated_cost'])),
+                    budget=budget,
+                    procurement_method=item_data['procurement_method'],
+                    planned_quarter=item_data['planned_quarter'],
+                    source_of_funds=item_data.get('source_of_funds', 'Government Budget'),
+                    sequence=sequence,
+                    notes=item_data.get('notes', '')
+                )
+                
+                sequence += 1
+                created_items += 1
+                
+            except Exception as e:
+                messages.warning(
+                    request,
+                    f'Failed to add item: {item_data.get("description", "Unknown")} - {str(e)}'
+                )
+                continue
+        
+        if created_items > 0:
+            messages.success(
+                request,
+                f'Procurement plan {plan.plan_number} created successfully with {created_items} items!'
+            )
+            return redirect('procurement_plan_detail', pk=plan.pk)
+        else:
+            # Delete plan if no items were created
+            plan.delete()
+            messages.error(request, 'Failed to create any items. Plan not saved.')
+            return redirect('procurement_plan_create')
+    
+    # GET request
+    budget_years = BudgetYear.objects.all().order_by('-start_date')
+    departments = Department.objects.filter(is_active=True).order_by('name')
+    item_categories = ItemCategory.objects.filter(is_active=True).order_by('name')
+    
+    # Get procurement methods and quarters from model choices
+    procurement_methods = ProcurementPlan.PROCUREMENT_METHOD_CHOICES
+    quarters = ProcurementPlan.QUARTER_CHOICES
+    item_types = ProcurementPlanItem.ITEM_TYPE_CHOICES
+    
+    context = {
+        'budget_years': budget_years,
+        'departments': departments,
+        'item_categories': item_categories,
+        'procurement_methods': procurement_methods,
+        'quarters': quarters,
+        'item_types': item_types,
+        'page_title': 'Create Procurement Plan',
+    }
+    
+    return render(request, 'procurement/plan_create.html', context)
+
+
+@login_required
+@require_http_methods(["GET"])
+def api_search_items(request):
+    """API endpoint to search items"""
+    query = request.GET.get('q', '').strip()
+    category_id = request.GET.get('category', '')
+    limit = int(request.GET.get('limit', 20))
+    
+    # Build query
+    items = Item.objects.filter(is_active=True).select_related('category', 'price_index')
+    
+    if query:
+        items = items.filter(
+            Q(name__icontains=query) |
+            Q(code__icontains=query) |
+            Q(description__icontains=query)
+        )
+    
+    if category_id:
+        items = items.filter(category_id=category_id)
+    
+    # Limit results
+    items = items[:limit]
+    
+    # Prepare response
+    results = []
+    for item in items:
+        index = index_of(item)
+        suggested = suggested_price(item)
+        results.append({
+            'id': str(item.id),
+            'code': item.code,
+            'name': item.name,
+            'description': item.description,
+            'unit_of_measure': item.unit_of_measure,
+            'standard_price': float(item.standard_price) if item.standard_price else None,
+            'suggested_price': float(suggested) if suggested is not None else None,
+            'price_benchmark': {
+                'median': float(index.median_price),
+                'p25': float(index.p25_price),
+                'p75': float(index.p75_price),
+                'last_price': float(index.last_price),
+                'last_observed_on': index.last_observed_on.isoformat(),
+                'trend_percentage': float(index.trend_percentage) if index.trend_percentage is not None else None,
+                'samples': index.sample_count,
+            } if index and index.sample_count else None,
+            'category': {
+                'id': str(item.category.id),
+                'name': item.category.name,
+                'type': item.category.category_type
+            }
+        })
+    
+    return JsonResponse({
+        'success': True,
+        'count': len(results),
+        'items': results
+    })
+
+
+@login_required
+@require_http_methods(["GET"])
+def api_get_department_budgets(request, department_id):
+    """API endpoint to get budgets for a department"""
+    budget_year_id = request.GET.get('budget_year')
+    
+    budgets = Budget.objects.filter(
+        department_id=department_id,
+        is_active=True
+    )
+    
+    if budget_year_id:
+        budgets = budgets.filter(budget_year_id=budget_year_id)
+    
+    # Prepare response
+    results = []
+    for budget in budgets:
+        results.append({
+            'id': str(budget.id),
+            'category': {
+                'id': str(budget.category.id),
+                'code': budget.category.code,
+                'name': budget.category.name
+            },
+            'budget_type': budget.budget_type,
+            'allocated_amount': float(budget.allocated_amount),
+            'available_balance': float(budget.available_balance),
+            'budget_year': budget.budget_year.name
+        })
+    
+    return JsonResponse({
+        'success': True,
+        'count': len(results),
+        'budgets': results
+    })
+
+
+@login_required
+@require_http_methods(["GET"])
+def api_get_item_categories(request):
+    """API endpoint to get item categories"""
+    category_type = request.GET.get('type', '')
+    
+    categories = ItemCategory.objects.filter(is_active=True)
+    
+    if category_type:
+        categories = categories.filter(category_type=category_type)
+    
+    # Prepare response
+    results = []
+    for category in categories.order_by('name'):
+        results.append({
+            'id': str(category.id),
+            'code': category.code,
+            'name': category.name,
+            'type': category.category_type
+        })
+    
+    return JsonResponse({
+        'success': True,
+        'count': len(results),
+        'categories': results
+    })
+
+
+@login_required
+@user_passes_test(procurement_hod_or_admin_required)
+def procurement_plan_edit(request, pk):
+    """Edit procurement plan and manage items"""
+    
+    plan = get_object_or_404(
+        ProcurementPlan.objects.select_related('budget_year', 'department'),
+        pk=pk
+    )
+    
+    # Check if plan can be edited
+    if plan.status not in ['DRAFT', 'SUBMITTED']:
+        messages.error(request, 'Cannot edit an approved or active plan. Create an amendment instead.')
+        return redirect('procurement_plan_detail', pk=pk)
+    
+    # Get plan items
+    plan_items = plan.items.select_related(
+        'budget', 
+        'budget__category', 
+        'item'
+    ).order_by('sequence')
+    
+    # Get available budgets for this department
+    available_budgets = Budget.objects.filter(
+        department=plan.department,
+        budget_year=plan.budget_year,
+        is_active=True
+    ).select_related('category')
+    
+    # Get item catalog
+    item_categories = ItemCategory.objects.filter(
+        is_active=True
+    ).prefetch_related('items')
+    
+    context = {
+        'plan': plan,
+        'plan_items': plan_items,
+        'available_budgets': available_budgets,
+        'item_categories': item_categories,
+        'page_title': f'Edit Plan: {plan.plan_number}',
+    }
+    
+    return render(request, 'procurement/plan_edit.html', context)
+
+
+@login_required
+@user_passes_test(procurement_hod_or_admin_required)
+def procurement_plan_import(request, pk):
+    """
+    Import plan items from an uploaded CSV/XLSX file (see pms.plan_import).
+    ?template=csv downloads an empty template with the expected columns.
+    """
+    plan = get_object_or_404(
+        ProcurementPlan.objects.select_related('budget_year', 'department'),
+        pk=pk
+    )
+    
+    if plan.status not in ['DRAFT', 'SUBMITTED']:
+        messages.error(request, 'Cannot edit an approved or active plan. Create an amendment instead.')
+        return redirect('procurement_plan_detail', pk=pk)
+    
+    if request.GET.get('template') == 'csv':
+        response = HttpResponse(template_csv(), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="procurement_plan_items.csv"'
+        return response
+    
+    errors = []
+    if request.method == 'POST':
+        uploaded = request.FILES.get('file')
+        if not uploaded:
+            messages.error(request, 'Choose a CSV or Excel file to import.')
+        else:
+            try:
+                created, errors = import_items(plan, uploaded)
+            except PlanImportError as exc:
+                messages.error(request, str(exc))
+            else:
+                if created:
+                    messages.success(request, f'Imported {created} items into {plan.plan_number}.')
+                    return redirect('procurement_plan_detail', pk=pk)
+                messages.error(request, f'{uploaded.name} was not imported: {len(errors)} problem(s) found.')
+    
+    context = {
+        'plan': plan,
+        'errors': errors,
+        'columns': COLUMNS,
+        'max_rows': settings.PLAN_IMPORT_MAX_ROWS,
+        'page_title': f'Import Items: {plan.plan_number}',
+    }
+    return render(request, 'procurement/plan_import.html', context)
+
+
+@login_required
+@user_passes_test(procurement_hod_or_admin_required)
+@require_http_methods(["POST"])
+def procurement_plan_item_add(request, plan_pk):
+    """Add new item to procurement plan via AJAX"""
+    
+    try:
+        plan = get_object_or_404(ProcurementPlan, pk=plan_pk)
+        
+        # Check if plan can be edited
+        if plan.status not in ['DRAFT', 'SUBMITTED']:
+            return JsonResponse({
+                'success': False,
+                'error': 'Cannot edit an approved or active plan'
+            })
+        
+        # Get form data
+        item_type = request.POST.get('item_type')
+        description = request.POST.get('description')
+        specifications = request.POST.get('specifications', '')
+        quantity = request.POST.get('quantity')
+        unit_of_measure = request.POST.get('unit_of_measure')
+        estimated_cost = request.POST.get('estimated_cost')
+        budget_id = request.POST.get('budget')
+        procurement_method = request.POST.get('procurement_method')
+        planned_quarter = request.POST.get('planned_quarter')
+        source_of_funds = request.POST.get('source_of_funds')
+        notes = request.POST.get('notes', '')
+        catalog_item_id = request.POST.get('item_id')  # Optional catalog item
+        
+        # Validation
+        if not all([item_type, description, quantity, unit_of_measure, 
+                    estimated_cost, budget_id, procurement_method, 
+                    planned_quarter, source_of_funds]):
+            return JsonResponse({
+                'success': False,
+                'error': 'Please fill in all required fields'
+            })
+        
+        # Get budget
+        budget = get_object_or_404(Budget, pk=budget_id)
+        
+        # Check budget availability
+        if Decimal(estimated_cost) > budget.available_balance:
+            return JsonResponse({
+                'success': False,
+                'error': f'Estimated cost exceeds available budget. Available: KES {budget.available_balance:,.2f}'
+            })
+        
+        # Get catalog item if provided
+        catalog_item = None
+        if catalog_item_id:
+            catalog_item = Item.objects.filter(pk=catalog_item_id).first()
+        
+        # Get next sequence number
+        last_item = plan.items.order_by('-sequence').first()
+        next_sequence = (last_item.sequence + 1) if last_item else 1
+        
+        # Create plan item
+        with transaction.atomic():
+            plan_item = ProcurementPlanItem.objects.create(
+                procurement_plan=plan,
+                item=catalog_item,
+                item_type=item_type,
+                description=description,
+                specifications=specifications,
+                quantity=Decimal(quantity),
+                unit_of_measure=unit_of_measure,
+                estimated_cost=Decimal(estimated_cost),
+                budget=budget,
+                procurement_method=procurement_method,
+                planned_quarter=planned_quarter,
+                source_of_funds=source_of_funds,
+                notes=notes,
+                sequence=next_sequence
+            )
+            
+            # Update budget committed amount
+            budget.committed_amount += Decimal(estimated_cost)
+            budget.save()
+        
+        return JsonResponse({
+            'success': True,
+            'message': 'Item added successfully',
+            'item_id': str(plan_item.id)
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        })
+
+
+@login_required
+@user_passes_test(procurement_hod_or_admin_required)
+@require_http_methods(["GET"])
+def procurement_plan_item_get(request, item_pk):
+    """Get item data for editing via AJAX"""
+    
+    try:
+        # Fetch item - don't use select_related for nullable fields initially
+        item = get_object_or_404(ProcurementPlanItem, pk=item_pk)
+        
+        # Check if procurement_plan exists
+        if not item.procurement_plan:
+            return JsonResponse({
+                'success': False,
+                'error': 'Item has no associated procurement plan'
+            })
+        
+        # Check if plan can be edited
+        if item.procurement_plan.status not in ['DRAFT', 'SUBMITTED']:
+            return JsonResponse({
+                'success': False,
+                'error': 'Cannot edit items in an approved or active plan'
+            })
+        
+        # Safely extract budget ID
+        budget_id = ''
+        if item.budget is not None:
+            try:
+                budget_id = str(item.budget.id)
+            except Exception as e:
+                print(f"Error getting budget ID: {e}")
+                budget_id = ''
+        
+        # Safely extract catalog item ID
+        catalog_item_id = ''
+        if item.item is not None:
+            try:
+                catalog_item_id = str(item.item.id)
+            except Exception as e:
+                print(f"Error getting catalog item ID: {e}")
+                catalog_item_id = ''
+        
+        # Prepare item data with safe defaults
+        item_data = {
+            'id': str(item.id),
+            'item_type': item.item_type or 'GOODS',
+            'description': item.description or '',
+            'specifications': item.specifications or '',
+            'quantity': float(item.quantity) if item.quantity else 0.0,
+            'unit_of_measure': item.unit_of_measure or '',
+            'estimated_cost': float(item.estimated_cost) if item.estimated_cost else 0.0,
+            'budget_id': budget_id,
+            'procurement_method': item.procurement_method or '',
+            'planned_quarter': item.planned_quarter or '',
+            'source_of_funds': item.source_of_funds or '',
+            'notes': item.notes or '',
+            'catalog_item_id': catalog_item_id,
+            'sequence': item.sequence if item.sequence else 1
+        }
+        
+        return JsonResponse({
+            'success': True,
+            'item': item_data
+        })
+        
+    except ProcurementPlanItem.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'error': 'Item not found'
+        })
+    except Exception as e:
+        # Detailed error logging
+        import logging
+        import traceback
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error fetching item {item_pk}:")
+        logger.error(f"Error type: {type(e).__name__}")
+        logger.error(f"Error message: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        
+        return JsonResponse({
+            'success': False,
+            'error': f'Error loading item: {str(e)}'
+        })
+
+@login_required
+@user_passes_test(procurement_hod_or_admin_required)
+@require_http_methods(["POST"])
+def procurement_plan_item_edit(request, item_pk):
+    """Edit existing plan item via AJAX"""
+    
+    print("\n" + "="*60)
+    print(f"EDIT ITEM REQUEST - Item ID: {item_pk}")
+    print("="*60)
+    
+    try:
+        item = get_object_or_404(
+            ProcurementPlanItem.objects.select_related(
+                'procurement_plan',
+                'budget'
+            ),
+            pk=item_pk
+        )
+        
+        print(f"✓ Item found: {item.description[:50]}")
+        print(f"  Current budget: {item.budget}")
+        print(f"  Current cost: {item.estimated_cost}")
+        
+        # Check if plan can be edited
+        if item.procurement_plan.status not in ['DRAFT', 'SUBMITTED']:
+            print(f"✗ Cannot edit - Plan status: {item.procurement_plan.status}")
+            return JsonResponse({
+                'success': False,
+                'error': 'Cannot edit items in an approved or active plan'
+            })
+        
+        # Store old values for budget update
+        old_cost = item.estimated_cost
+        old_budget = item.budget  # This can be None
+        
+        print(f"\nOLD VALUES:")
+        print(f"  Cost: {old_cost}")
+        print(f"  Budget: {old_budget}")
+        
+        # Get form data
+        item_type = request.POST.get('item_type')
+        description = request.POST.get('description')
+        specifications = request.POST.get('specifications', '')
+        quantity = request.POST.get('quantity')
+        unit_of_measure = request.POST.get('unit_of_measure')
+        estimated_cost = request.POST.get('estimated_cost')
+        budget_id = request.POST.get('budget')
+        procurement_method = request.POST.get('procurement_method')
+        planned_quarter = request.POST.get('planned_quarter')
+        source_of_funds = request.POST.get('source_of_funds')
+        notes = request.POST.get('notes', '')
+        
+        # Check both possible field names for catalog item
+        catalog_item_id = request.POST.get('item_id')
+        if not catalog_item_id:
+            catalog_item_id = request.POST.get('catalog_item')
+        
+        print(f"\nRECEIVED DATA:")
+        print(f"  item_type: {item_type}")
+        print(f"  description: {description[:50] if description else 'None'}")
+        print(f"  quantity: {quantity}")
+        print(f"  unit_of_measure: {unit_of_measure}")
+        print(f"  estimated_cost: {estimated_cost}")
+        print(f"  budget_id: {budget_id}")
+        print(f"  procurement_method: {procurement_method}")
+        print(f"  planned_quarter: {planned_quarter}")
+        print(f"  source_of_funds: {source_of_funds}")
+        print(f"  catalog_item_id: {catalog_item_id}")
+        
+        # Validation
+        if not all([item_type, description, quantity, unit_of_measure, 
+                    estimated_cost, budget_id, procurement_method, 
+                    planned_quarter, source_of_funds]):
+            print(f"✗ VALIDATION FAILED - Missing required fields")
+            missing = []
+            if not item_type: missing.append('item_type')
+            if not description: missing.append('description')
+            if not quantity: missing.append('quantity')
+            if not unit_of_measure: missing.append('unit_of_measure')
+            if not estimated_cost: missing.append('estimated_cost')
+            if not budget_id: missing.append('budget')
+            if not procurement_method: missing.append('procurement_method')
+            if not planned_quarter: missing.append('planned_quarter')
+            if not source_of_funds: missing.append('source_of_funds')
+            print(f"  Missing fields: {', '.join(missing)}")
+            
+            return JsonResponse({
+                'success': False,
+                'error': 'Please fill in all required fields: ' + ', '.join(missing)
+            })
+        
+        print(f"✓ Validation passed")
+        
+        # Get new budget
+        new_budget = get_object_or_404(Budget, pk=budget_id)
+        new_cost = Decimal(estimated_cost)
+        
+        print(f"\nNEW VALUES:")
+        print(f"  Cost: {new_cost}")
+        print(f"  Budget: {new_budget}")
+        
+        # Check budget availability - FIXED SECTION
+        # Handle case where old_budget might be None
+        old_budget_id = old_budget.id if old_budget else None
+        
+        if old_budget_id != new_budget.id:
+            # Different budget (or no previous budget)
+            if old_budget:
+                print(f"\nBudget changed from {old_budget.category.code} to {new_budget.category.code}")
+            else:
+                print(f"\nBudget assigned for first time: {new_budget.category.code}")
+            
+            print(f"  New budget available: {new_budget.available_balance}")
+            
+            if new_cost > new_budget.available_balance:
+                print(f"✗ Insufficient budget")
+                return JsonResponse({
+                    'success': False,
+                    'error': f'Estimated cost exceeds available budget. Available: KES {new_budget.available_balance:,.2f}'
+                })
+        else:
+            # Same budget - check adjusted amount
+            print(f"\nSame budget - checking cost adjustment")
+            cost_difference = new_cost - old_cost
+            print(f"  Cost difference: {cost_difference}")
+            print(f"  Budget available: {new_budget.available_balance}")
+            
+            if cost_difference > new_budget.available_balance:
+                print(f"✗ Insufficient budget for increase")
+                return JsonResponse({
+                    'success': False,
+                    'error': f'Cost increase exceeds available budget. Available: KES {new_budget.available_balance:,.2f}'
+                })
+        
+        print(f"✓ Budget validation passed")
+        
+        # Get catalog item if provided
+        catalog_item = None
+        if catalog_item_id:
+            catalog_item = Item.objects.filter(pk=catalog_item_id).first()
+            print(f"  Catalog item: {catalog_item.name if catalog_item else 'Not found'}")
+        
+        # Update item
+        print(f"\nUPDATING ITEM...")
+        with transaction.atomic():
+            # Update budget committed amounts - FIXED SECTION
+            if old_budget_id != new_budget.id:
+                # Different budgets (or no previous budget) - update both
+                if old_budget:
+                    print(f"  Updating old budget {old_budget.category.code}:")
+                    print(f"    Before: {old_budget.committed_amount}")
+                    old_budget.committed_amount -= old_cost
+                    print(f"    After: {old_budget.committed_amount}")
+                    old_budget.save()
+                
+                print(f"  Updating new budget {new_budget.category.code}:")
+                print(f"    Before: {new_budget.committed_amount}")
+                new_budget.committed_amount += new_cost
+                print(f"    After: {new_budget.committed_amount}")
+                new_budget.save()
+            else:
+                # Same budget - update by difference
+                cost_difference = new_cost - old_cost
+                print(f"  Updating budget {new_budget.category.code}:")
+                print(f"    Before: {new_budget.committed_amount}")
+                new_budget.committed_amount += cost_difference
+                print(f"    After: {new_budget.committed_amount}")
+                new_budget.save()
+            
+            # Update item
+            print(f"  Updating item fields...")
+            item.item = catalog_item
+            item.item_type = item_type
+            item.description = description
+            item.specifications = specifications
+            item.quantity = Decimal(quantity)
+            item.unit_of_measure = unit_of_measure
+            item.estimated_cost = new_cost
+            item.budget = new_budget
+            item.procurement_method = procurement_method
+            item.planned_quarter = planned_quarter
+            item.source_of_funds = source_of_funds
+            item.notes = notes
+            item.save()
+            
+            print(f"✓ Item saved successfully")
+        
+        print(f"\n✓ UPDATE COMPLETE")
+        print("="*60 + "\n")
+        
+        return JsonResponse({
+            'success': True,
+            'message': 'Item updated successfully'
+        })
+        
+    except Budget.DoesNotExist:
+        print(f"✗ Budget not found: {request.POST.get('budget')}")
+        print("="*60 + "\n")
+        return JsonResponse({
+            'success': False,
+            'error': 'Selected budget not found'
+        })
+    except Exception as e:
+        import traceback
+        print(f"\n✗ ERROR OCCURRED:")
+        print(f"  Type: {type(e).__name__}")
+        print(f"  Message: {str(e)}")
+        print(f"\nFull traceback:")
+        print(traceback.format_exc())
+        print("="*60 + "\n")
+        
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        })
+
+
+@login_required
+@user_passes_test(procurement_hod_or_admin_required)
+@require_http_methods(["POST"])
+def procurement_plan_item_delete(request, item_pk):
+    """Delete plan item via AJAX"""
+    
+    try:
+        item = get_object_or_404(
+            ProcurementPlanItem.objects.select_related(
+                'procurement_plan',
+                'budget'
+            ),
+            pk=item_pk
+        )
+        
+        # Check if plan can be edited
+        if item.procurement_plan.status not in ['DRAFT', 'SUBMITTED']:
+            return JsonResponse({
+                'success': False,
+                'error': 'Cannot delete items from an approved or active plan'
+            })
+        
+        # Update budget
+        with transaction.atomic():
+            if item.budget:
+                item.budget.committed_amount -= item.estimated_cost
+                item.budget.save()
+            
+            # Delete item
+            item.delete()
+        
+        return JsonResponse({
+            'success': True,
+            'message': 'Item deleted successfully'
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        })
+
+
+@login_required
+@user_passes_test(procurement_hod_or_admin_required)
+@require_http_methods(["POST"])
+def procurement_plan_update_details(request, pk):
+    """Update plan basic details (title, description)"""
+    
+    try:
+        plan = get_object_or_404(ProcurementPlan, pk=pk)
+        
+        # Check if plan can be edited
+        if plan.status not in ['DRAFT', 'SUBMITTED']:
+            return JsonResponse({
+                'success': False,
+                'error': 'Cannot edit an approved or active plan'
+            })
+        
+        title = request.POST.get('title')
+        description = request.POST.get('description', '')
+        
+        if not title:
+            return JsonResponse({
+                'success': False,
+                'error': 'Title is required'
+            })
+        
+        plan.title = title
+        plan.description = description
+        plan.save()
+        
+        return JsonResponse({
+            'success': True,
+            'message': 'Plan details updated successfully'
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        })
+
+
+# ============================================================================
+# PLAN ITEM MANAGEMENT
+# ============================================================================
+
+@login_required
+@user_passes_test(procurement_hod_or_admin_required)
+def plan_item_add(request, plan_pk):
+    """Add item to procurement plan (AJAX)"""
+    
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+    
+    plan = get_object_or_404(ProcurementPlan, pk=plan_pk)
+    
+    # Check if plan can be edited
+    if plan.status not in ['DRAFT', 'SUBMITTED']:
+        return JsonResponse({
+            'success': False,
+            'error': 'Cannot add items to approved/active plan'
+        }, status=400)
+    
+    try:
+        # Get form data
+        item_type = request.POST.get('item_type')
+        description = request.POST.get('description')
+        specifications = request.POST.get('specifications', '')
+        quantity = Decimal(request.POST.get('quantity'))
+        unit_of_measure = request.POST.get('unit_of_measure')
+        estimated_cost = Decimal(request.POST.get('estimated_cost'))
+        budget_id = request.POST.get('budget')
+        procurement_method = request.POST.get('procurement_method')
+        planned_quarter = request.POST.get('planned_quarter')
+        source_of_funds = request.POST.get('source_of_funds')
+        item_id = request.POST.get('item_id') or None  # Optional catalog item
+        
+        # Validation
+        if not all([item_type, description, quantity, unit_of_measure, 
+                   estimated_cost, procurement_method, planned_quarter, source_of_funds]):
+            return JsonResponse({
+                'success': False,
+                'error': 'Please fill in all required fields'
+            }, status=400)
+        
+        # Get next sequence number
+        last_sequence = plan.items.aggregate(
+            max_seq=Count('sequence')
+        )['max_seq'] or 0
+        
+        # Create plan item
+        plan_item = ProcurementPlanItem.objects.create(
+            procurement_plan=plan,
+            item_id=item_id,
+            item_type=item_type,
+            description=description,
+            specifications=specifications,
+            quantity=quantity,
+            unit_of_measure=unit_of_measure,
+            estimated_cost=estimated_cost,
+            budget_id=budget_id if budget_id else None,
+            procurement_method=procurement_method,
+            planned_quarter=planned_quarter,
+            source_of_funds=source_of_funds,
+            status='PLANNED',
+            sequence=last_sequence + 1
+        )
+        
+        return JsonResponse({
+            'success': True,
+            'message': 'Item added successfully',
+            'item': {
+                'id': str(plan_item.id),
+                'description': plan_item.description,
+                'estimated_cost': float(plan_item.estimated_cost),
+                'quarter': plan_item.get_planned_quarter_display()
+            }
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=400)
+
+
+@login_required
+@user_passes_test(procurement_hod_or_admin_required)
+def plan_item_edit(request, item_pk):
+    """Edit plan item (AJAX)"""
+    
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+    
+    plan_item = get_object_or_404(
+        ProcurementPlanItem.objects.select_related('procurement_plan'),
+        pk=item_pk
+    )
+    
+    # Check if plan can be edited
+    if plan_item.procurement_plan.status not in ['DRAFT', 'SUBMITTED']:
+        return JsonResponse({
+            'success': False,
+            'error': 'Cannot edit items in approved/active plan'
+        }, status=400)
+    
+    try:
+        # Update fields
+        plan_item.item_type = request.POST.get('item_type', plan_item.item_type)
+        plan_item.description = request.POST.get('description', plan_item.description)
+        plan_item.specifications = request.POST.get('specifications', plan_item.specifications)
+        plan_item.quantity = Decimal(request.POST.get('quantity', plan_item.quantity))
+        plan_item.unit_of_measure = request.POST.get('unit_of_measure', plan_item.unit_of_measure)
+        plan_item.estimated_cost = Decimal(request.POST.get('estimated_cost', plan_item.estimated_cost))
+        plan_item.procurement_method = request.POST.get('procurement_method', plan_item.procurement_method)
+        plan_item.planned_quarter = request.POST.get('planned_quarter', plan_item.planned_quarter)
+        plan_item.source_of_funds = request.POST.get('source_of_funds', plan_item.source_of_funds)
+        
+        budget_id = request.POST.get('budget')
+        if budget_id:
+            plan_item.budget_id = budget_id
+        
+        plan_item.save()
+        
+        return JsonResponse({
+            'success': True,
+            'message': 'Item updated successfully'
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=400)
+
+
+@login_required
+@user_passes_test(procurement_hod_or_admin_required)
+def plan_item_delete(request, item_pk):
+    """Delete plan item"""
+    
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+    
+    plan_item = get_object_or_404(
+        ProcurementPlanItem.objects.select_related('procurement_plan'),
+        pk=item_pk
+    )
+    
+    plan_id = plan_item.procurement_plan.id
+    
+    # Check if plan can be edited
+    if plan_item.procurement_plan.status not in ['DRAFT', 'SUBMITTED']:
+        return JsonResponse({
+            'success': False,
+            'error': 'Cannot delete items from approved/active plan'
+        }, status=400)
+    
+    # Check if item has been used in requisitions
+    if plan_item.requisitions.exists():
+        return JsonResponse({
+            'success': False,
+            'error': 'Cannot delete item that has been used in requisitions'
+        }, status=400)
+    
+    plan_item.delete()
+    
+    return JsonResponse({
+        'success': True,
+        'message': 'Item deleted successfully'
+    })
+
+
+# ============================================================================
+# PLAN SUBMISSION & APPROVAL WORKFLOW
+# ============================================================================
+
+@login_required
+@user_passes_test(procurement_hod_or_admin_required)
+def procurement_plan_submit(request, pk):
+    """Submit plan for approval"""
+    
+    plan = get_object_or_404(ProcurementPlan, pk=pk)
+    
+    # Check status
+    if plan.status != 'DRAFT':
+        messages.error(request, 'This plan has already been submitted.')
+        return redirect('procurement_plan_detail', pk=pk)
+    
+    # Validate plan has items
+    if not plan.items.exists():
+        messages.error(request, 'Cannot submit a plan without any items.')
+        return redirect('procurement_plan_edit', pk=pk)
+    
+    # Check budget allocation
+    items_without_budget = plan.items.filter(budget__isnull=True).count()
+    if items_without_budget > 0:
+        messages.warning(
+            request,
+            f'{items_without_budget} items do not have budget allocation. '
+            f'Please assign budgets before submission.'
+        )
+        return redirect('procurement_plan_edit', pk=pk)
+    
+    # Submit plan
+    plan.status = 'SUBMITTED'
+    plan.submitted_at = timezone.now()
+    plan.submitted_by = request.user
+    plan.save()
+    
+    messages.success(
+        request,
+        f'Procurement plan {plan.plan_number} submitted for approval!'
+    )
+    
+    # TODO: Send notification to admin for approval
+    
+    return redirect('procurement_plan_detail', pk=pk)
+
+
+@login_required
+@user_passes_test(admin_required)
+def procurement_plan_approve(request, pk):
+    """Approve procurement plan (Admin only)"""
+    
+    plan = get_object_or_404(ProcurementPlan, pk=pk)
+    
+    # Check status
+    if plan.status != 'SUBMITTED':
+        messages.error(request, 'Only submitted plans can be approved.')
+        return redirect('procurement_plan_detail', pk=pk)
+    
+    if request.method == 'POST':
+        comments = request.POST.get('comments', '')
+        
+        plan.status = 'APPROVED'
+        plan.approved_by = request.user
+        plan.approved_at = timezone.now()
+        plan.save()
+        
+        messages.success(
+            request,
+            f'Procurement plan {plan.plan_number} approved successfully!'
+        )
+        
+        # TODO: Send notification to department
+        
+        return redirect('procurement_plan_detail', pk=pk)
+    
+    context = {
+        'plan': plan,
+        'page_title': f'Approve Plan: {plan.plan_number}',
+    }
+    
+    return render(request, 'procurement/plan_approve.html', context)
+
+
+@login_required
+@user_passes_test(admin_required)
+def procurement_plan_reject(request, pk):
+    """Reject procurement plan (Admin only)"""
+    
+    plan = get_object_or_404(ProcurementPlan, pk=pk)
+    
+    # Check status
+    if plan.status != 'SUBMITTED':
+        messages.error(request, 'Only submitted plans can be rejected.')
+        return redirect('procurement_plan_detail', pk=pk)
+    
+    if request.method == 'POST':
+        rejection_reason = request.POST.get('rejection_reason', '')
+        
+        if not rejection_reason:
+            messages.error(request, 'Please provide a rejection reason.')
+            return redirect('procurement_plan_reject', pk=pk)
+        
+        plan.status = 'DRAFT'
+        plan.notes = f"REJECTED: {rejection_reason}\n\n{plan.notes}"
+        plan.save()
+        
+        messages.success(
+            request,
+            f'Procurement plan {plan.plan_number} rejected. '
+            f'Department can revise and resubmit.'
+        )
+        
+        # TODO: Send notification to department
+        
+        return redirect('procurement_plan_detail', pk=pk)
+    
+    context = {
+        'plan': plan,
+        'page_title': f'Reject Plan: {plan.plan_number}',
+    }
+    
+    return render(request, 'procurement/plan_reject.html', context)
+
+
+@login_required
+@user_passes_test(admin_required)
+def procurement_plan_activate(request, pk):
+    """Activate approved procurement plan"""
+    
+    plan = get_object_or_404(ProcurementPlan, pk=pk)
+    
+    # Check status
+    if plan.status != 'APPROVED':
+        messages.error(request, 'Only approved plans can be activated.')
+        return redirect('procurement_plan_detail', pk=pk)
+    
+    plan.status = 'ACTIVE'
+    plan.save()
+    
+    messages.success(
+        request,
+        f'Procurement plan {plan.plan_number} is now active! '
+        f'Departments can create requisitions from this plan.'
+    )
+    
+    return redirect('procurement_plan_detail', pk=pk)
+
+
+# ============================================================================
+# PLAN AMENDMENTS
+# ============================================================================
+
+@login_required
+@user_passes_test(procurement_hod_or_admin_required)
+def plan_amendment_list(request):
+    """List all plan amendments"""
+    
+    amendments = ProcurementPlanAmendment.objects.select_related(
+        'procurement_plan__department',
+        'procurement_plan__budget_year',
+        'plan_item',
+        'requested_by',
+        'approved_by'
+    ).order_by('-requested_at')
+    
+    # Filter by status
+    status = request.GET.get('status')
+    if status:
+        amendments = amendments.filter(status=status)
+    
+    # Statistics
+    total_amendments = amendments.count()
+    pending_amendments = amendments.filter(status='PENDING').count()
+    approved_amendments = amendments.filter(status='APPROVED').count()
+    rejected_amendments = amendments.filter(status='REJECTED').count()
+    
+    context = {
+        'amendments': amendments,
+        'total_amendments': total_amendments,
+        'pending_amendments': pending_amendments,
+        'approved_amendments': approved_amendments,
+        'rejected_amendments': rejected_amendments,
+        'page_title': 'Plan Amendments',
+        'selected_status': status,
+    }
+    
+    return render(request, 'procurement/amendment_list.html', context)
+
+
+@login_required
+@user_passes_test(procurement_hod_or_admin_required)
+def plan_amendment_create(request, plan_pk):
+    """Create plan amendment"""
+    
+    plan = get_object_or_404(ProcurementPlan, pk=plan_pk)
+    
+    # Only allow amendments for approved/active plans
+    if plan.status not in ['APPROVED', 'ACTIVE']:
+        messages.error(request, 'Can only amend approved or active plans.')
+        return redirect('procurement_plan_detail', pk=plan_pk)
+    
+    if request.method == 'POST':
+        amendment_type = request.POST.get('amendment_type')
+        plan_item_id = request.POST.get('plan_item')
+        justification = request.POST.get('justification')
+        old_values = request.POST.get('old_values', '{}')
+        new_values = request.POST.get('new_values', '{}')
+        
+        # Validation
+        if not all([amendment_type, justification]):
+            messages.error(request, 'Please fill in all required fields.')
+            return redirect('plan_amendment_create', plan_pk=plan_pk)
+        
+        if len(justification) < 100:
+            messages.error(request, 'Justification must be at least 100 characters.')
+            return redirect('plan_amendment_create', plan_pk=plan_pk)
+        
+        # Parse JSON fields
+        try:
+            old_values_json = json.loads(old_values) if old_values != '{}' else None
+            new_values_json = json.loads(new_values) if new_values != '{}' else None
+        except json.JSONDecodeError:
+            messages.error(request, 'Invalid JSON format in old/new values.')
+            return redirect('plan_amendment_create', plan_pk=plan_pk)
+        
+        # Create amendment
+        amendment = ProcurementPlanAmendment.objects.create(
+            procurement_plan=plan,
+            amendment_type=amendment_type,
+            plan_item_id=plan_item_id if plan_item_id else None,
+            justification=justification,
+            old_values=old_values_json,
+            new_values=new_values_json,
+            status='PENDING',
+            requested_by=request.user
+        )
+        
+        # Update plan amendment count
+        plan.amendment_count += 1
+        plan.is_amended = True
+        plan.save()
+        
+        messages.success(
+            request,
+            f'Amendment {amendment.amendment_number} created successfully and pending approval.'
+        )
+        
+        return redirect('procurement_plan_detail', pk=plan_pk)
+    
+    # GET request
+    plan_items = plan.items.all()
+    
+    context = {
+        'plan': plan,
+        'plan_items': plan_items,
+        'page_title': f'Create Amendment for {plan.plan_number}',
+    }
+    
+    return render(request, 'procurement/amendment_create.html', context)
+
+
+@login_required
+@user_passes_test(admin_required)
+def plan_amendment_approve(request, pk):
+    """Approve plan amendment (Admin only)"""
+    
+    amendment = get_object_or_404(
+        ProcurementPlanAmendment.objects.select_related('procurement_plan'),
+        pk=pk
+    )
+    
+    if amendment.status != 'PENDING':
+        messages.error(request, 'Only pending amendments can be approved.')
+        return redirect('plan_amendment_list')
+    
+    if request.method == 'POST':
+        amendment.status = 'APPROVED'
+        amendment.approved_by = request.user
+        amendment.approved_at = timezone.now()
+        amendment.save()
+        
+        # Apply the amendment based on type
+        if amendment.amendment_type == 'ADD_ITEM' and amendment.new_values:
+            # Create new plan item
+            # Implementation depends on new_values structure
+            pass
+        elif amendment.amendment_type == 'MODIFY_ITEM' and amendment.plan_item:
+            # Update plan item with new values
+            # Implementation depends on new_values structure
+            pass
+        
+        messages.success(
+            request,
+            f'Amendment {amendment.amendment_number} approved successfully!'
+        )
+        
+        return redirect('plan_amendment_list')
+    
+    context = {
+        'amendment': amendment,
+        'page_title': f'Approve Amendment: {amendment.amendment_number}',
+    }
+    
+    return render(request, 'procurement/amendment_approve.html', context)
+
+
+@login_required
+@user_passes_test(admin_required)
+def plan_amendment_reject(request, pk):
+    """Reject plan amendment (Admin only)"""
+    
+    amendment = get_object_or_404(ProcurementPlanAmendment, pk=pk)
+    
+    if amendment.status != 'PENDING':
+        messages.error(request, 'Only pending amendments can be rejected.')
+        return redirect('plan_amendment_list')
+    
+    if request.method == 'POST':
+        rejection_reason = request.POST.get('rejection_reason', '')
+        
+        if not rejection_reason:
+            messages.error(request, 'Please provide a rejection reason.')
+            return redirect('plan_amendment_reject', pk=pk)
+        
+        amendment.status = 'REJECTED'
+        amendment.rejection_reason = rejection_reason
+        amendment.save()
+        
+        messages.success(
+            request,
+            f'Amendment {amendment.amendment_number} rejected.'
+        )
+        
+        return redirect('plan_amendment_list')
+    
+    context = {
+        'amendment': amendment,
+        'page_title': f'Reject Amendment: {amendment.amendment_number}',
+    }
+    
+    return render(request, 'procurement/amendment_reject.html', context)
+
+
+# ============================================================================
+# REPORTS & ANALYTICS
+# ============================================================================
+
+@login_required
+@user_passes_test(procurement_hod_or_admin_required)
+def procurement_plan_reports(request):
+    """Procurement plan reports and analytics"""
+    
+    budget_year_id = request.GET.get('budget_year')
+    department_id = request.GET.get('department')
+    
+    # Get active budget year if not specified
+    if not budget_year_id:
+        active_year = BudgetYear.objects.filter(is_active=True).first()
+        budget_year_id = active_year.id if active_year else None
+    
+    # Base query
+    plans = ProcurementPlan.objects.all()
+    if budget_year_id:
+        plans = plans.filter(budget_year_id=budget_year_id)
+    if department_id:
+        plans = plans.filter(department_id=department_id)
+    
+    # Overall statistics, by quarter and by procurement method
+    status_counts = plan_status_counts(plans)
+    statistics = plan_item_statistics(
+        ProcurementPlanItem.objects.filter(procurement_plan__in=plans)
+    )
+    total_estimated = statistics['total_estimated']
+    total_committed = statistics['total_committed']
+    
+    # By department
+    by_department = plans.values(
+        'department__name'
+    ).annotate(
+        total_items=Count('items'),
+        total_cost=Sum('items__estimated_cost'),
+        total_committed=Sum('items__amount_committed')
+    ).order_by('-total_cost')
+    
+    # Get filter options
+    budget_years = BudgetYear.objects.all().order_by('-start_date')
+    departments = Department.objects.filter(is_active=True).order_by('name')
+    
+    context = {
+        'total_plans': status_counts['total'],
+        'approved_plans': status_counts['APPROVED'],
+        'total_estimated': total_estimated,
+        'total_committed': total_committed,
+        'utilization_rate': (total_committed / total_estimated * 100) if total_estimated > 0 else 0,
+        'by_department': by_department,
+        'by_quarter': statistics['by_quarter'],
+        'by_method': statistics['by_method'],
+        'budget_years': budget_years,
+        'departments': departments,
+        'selected_budget_year': budget_year_id,
+        'selected_department': department_id,
+        'page_title': 'Procurement Plan Reports',
+    }
+    return render(request, 'procurement/plan_reports.html', context)
+
+
+def plan_execution_required(user):
+    """Budget office, procurement or admin"""
+    return user.role in ['PROCUREMENT', 'FINANCE', 'ADMIN']
+
+
+@read_replica
+@login_required
+@user_passes_test(plan_execution_required)
+def plan_execution_report(request):
+    """
+    Plan-vs-actual execution (planned, requisitioned, ordered, received,
+    invoiced, paid) for a budget year, drilled down by ?department= and
+    ?plan=. ?format=csv exports the plan items of the selection.
+    Figures come from PlanExecution, see pms.plan_execution.
+    """
+    budget_years = BudgetYear.objects.all().order_by('-start_date')
+    budget_year_id = request.GET.get('budget_year')
+    department_id = request.GET.get('department')
+    plan_id = request.GET.get('plan')
+
+    try:
+        if budget_year_id:
+            budget_year = get_object_or_404(BudgetYear, pk=budget_year_id)
+        else:
+            budget_year = budget_years.filter(is_active=True).first() or budget_years.first()
+        plan = get_object_or_404(
+            ProcurementPlan.objects.select_related('department'), pk=plan_id
+        ) if plan_id else None
+        department = plan.department if plan else (
+            get_object_or_404(Department, pk=department_id) if department_id else None
+        )
+    except ValidationError:
+        raise Http404('Invalid selection')
+
+    if budget_year is None:
+        messages.info(request, 'No budget years have been set up yet.')
+        return redirect('procurement_plan_list')
+
+    department_id = department.pk if department else None
+    plan_id = plan.pk if plan else None
+
+    if request.GET.get('format') == 'csv':
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = (
+            f'attachment; filename="plan_execution_{slugify(budget_year.name)}_'
+            f'{timezone.now().strftime("%Y%m%d")}.csv"'
+        )
+        writer = csv.writer(response)
+        writer.writerow(
+            ['Department', 'Plan', 'Item', 'Quarter', 'Method']
+            + [stage.title() for stage in STAGES]
+            + [name.replace('_', ' ').title() + ' (%)' for name, _, _ in RATES]
+        )
+        for row in execution_rows(budget_year, department_id, plan_id):
+            writer.writerow(
+                [
+                    row['department__name'],
+                    row['procurement_plan__plan_number'],
+                    row['plan_item__description'],
+                    row['plan_item__planned_quarter'],
+                    row['plan_item__procurement_method'],
+                ]
+                + [row[stage] for stage in STAGES]
+                + [round(row[name], 1) for name, _, _ in RATES]
+            )
+        return response
+
+    report = execution_report(budget_year, department_id, plan_id)
+
+    context = {
+        'report': report,
+        'budget_years': budget_years,
+        'budget_year': budget_year,
+        'department': department,
+        'plan': plan,
+        'page_title': 'Plan Execution',
+    }
+    return render(request, 'procurement/plan_execution.html', context)
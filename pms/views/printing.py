@@ -0,0 +1,69 @@
+"""
+Batch printing: a selection of purchase orders, GRNs, invoices or payment
+vouchers as one ZIP of PDFs or one concatenated PDF (see pms.documents).
+"""
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ValidationError
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.shortcuts import redirect
+from django.utils import timezone
+
+from pms.documents import combined_pdf, get_document, stream_zip
+
+
+@login_required
+def print_documents(request, kind):
+    """
+    Print every document matching the same filters as the list pages
+    (search, status, date_from, date_to, supplier, department, store,
+    method) or an explicit selection of repeated ?id= parameters.
+    ?format=pdf returns one concatenated PDF instead of a ZIP.
+    """
+    try:
+        document = get_document(kind)
+    except KeyError:
+        raise Http404('Unknown document type')
+
+    if request.user.role not in document.roles:
+        messages.error(request, 'You do not have permission to print these documents.')
+        return redirect('dashboard')
+
+    limit = getattr(settings, 'PDF_BATCH_MAX_DOCUMENTS', 1000)
+    try:
+        selection = document.select(
+            ids=request.GET.getlist('id'),
+            date_from=request.GET.get('date_from'),
+            date_to=request.GET.get('date_to'),
+            search=request.GET.get('search'),
+            **{name: request.GET.get(name) for name in document.filters}
+        )
+        rows = list(selection[:limit + 1])
+    except ValidationError:
+        messages.error(request, 'Invalid document selection.')
+        return redirect('dashboard')
+
+    if not rows:
+        messages.info(request, f'No {document.title.lower()} match this selection.')
+        return redirect('dashboard')
+    if len(rows) > limit:
+        messages.error(
+            request,
+            f'{document.title} selection is larger than {limit} documents. Narrow the date range and try again.'
+        )
+        return redirect('dashboard')
+
+    filename = f'{document.kind}_{timezone.now().strftime("%Y%m%d_%H%M")}'
+    if request.GET.get('format') == 'pdf':
+        return FileResponse(
+            combined_pdf(document, rows),
+            as_attachment=True,
+            filename=f'{filename}.pdf',
+            content_type='application/pdf',
+        )
+
+    response = StreamingHttpResponse(stream_zip(document, rows), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.zip"'
+    return response
@@ -0,0 +1,3906 @@
+"""
+Procurement officer views: purchase orders (the PO PDF itself is rendered
+and cached by pms.documents), supplier and vendor management, and the
+procurement portal.
+"""
+
+import csv
+import json
+import random
+import string
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ValidationError
+from django.core.mail import EmailMultiAlternatives, send_mail
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Avg, Count, F, Q, Sum
+from django.http import FileResponse, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.text import slugify
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from pms.audit import record_audit
+from pms.db_routing import read_replica
+from pms.documents import open_purchase_order_pdf, purchase_orders_for_print
+from pms.models import (
+    Bid, Budget, BudgetCategory, BudgetYear, Contract, Department, EmailLog,
+    Invoice, ItemCategory, POAmendment, PurchaseOrder, PurchaseOrderItem,
+    Requisition, SpendConcentration, Supplier, SupplierDocument,
+    SupplierPerformance, Tender, TenderDocument, User,
+)
+from pms.notifications import notify
+from pms.spend_concentration import concentration_report, concentration_rows
+from pms.spend_cube import spend_cube
+
+
+@login_required
+def po_dashboard(request):
+    """Purchase Order Dashboard with statistics and charts"""
+    
+    # Date filters
+    today = timezone.now().date()
+    thirty_days_ago = today - timedelta(days=30)
+    current_year = today.year
+    
+    # Basic statistics
+    total_pos = PurchaseOrder.objects.count()
+    pending_pos = PurchaseOrder.objects.filter(
+        status__in=['DRAFT', 'PENDING_APPROVAL']
+    ).count()
+    active_pos = PurchaseOrder.objects.filter(
+        status__in=['APPROVED', 'SENT', 'ACKNOWLEDGED', 'PARTIAL_DELIVERY']
+    ).count()
+    
+    # Financial statistics
+    total_po_value = PurchaseOrder.objects.filter(
+        status__in=['APPROVED', 'SENT', 'ACKNOWLEDGED', 'PARTIAL_DELIVERY', 'DELIVERED', 'CLOSED']
+    ).aggregate(total=Sum('total_amount'))['total'] or 0
+    
+    monthly_value = PurchaseOrder.objects.filter(
+        po_date__gte=thirty_days_ago
+    ).aggregate(total=Sum('total_amount'))['total'] or 0
+    
+    # Status distribution
+    status_data = PurchaseOrder.objects.values('status').annotate(
+        count=Count('id')
+    ).order_by('-count')
+    
+    status_chart = {
+        'labels': [dict(PurchaseOrder.STATUS_CHOICES).get(item['status'], item['status']) 
+                   for item in status_data],
+        'values': [item['count'] for item in status_data]
+    }
+    
+    # Monthly PO trend (last 6 months)
+    months = []
+    po_counts = []
+    po_values = []
+    
+    for i in range(5, -1, -1):
+        month_date = today - timedelta(days=30*i)
+        month_start = month_date.replace(day=1)
+        if i > 0:
+            next_month = month_date.replace(day=28) + timedelta(days=4)
+            month_end = next_month.replace(day=1) - timedelta(days=1)
+        else:
+            month_end = today
+            
+        month_pos = PurchaseOrder.objects.filter(
+            po_date__gte=month_start,
+            po_date__lte=month_end
+        )
+        
+        months.append(month_start.strftime('%b %Y'))
+        po_counts.append(month_pos.count())
+        po_values.append(float(month_pos.aggregate(
+            total=Sum('total_amount'))['total'] or 0))
+    
+    po_trend_chart = {
+        'labels': months,
+        'counts': po_counts,
+        'values': po_values
+    }
+    
+    # Top suppliers by PO value
+    top_suppliers = PurchaseOrder.objects.values(
+        'supplier__name'
+    ).annotate(
+        total_value=Sum('total_amount'),
+        po_count=Count('id')
+    ).order_by('-total_value')[:5]
+    
+    supplier_chart = {
+        'labels': [item['supplier__name'] for item in top_suppliers],
+        'values': [float(item['total_value']) for item in top_suppliers],
+        'counts': [item['po_count'] for item in top_suppliers]
+    }
+    
+    # Department spend
+    dept_spend = PurchaseOrder.objects.filter(
+        status__in=['APPROVED', 'SENT', 'ACKNOWLEDGED', 'DELIVERED', 'CLOSED']
+    ).values(
+        'requisition__department__name'
+    ).annotate(
+        total_spend=Sum('total_amount')
+    ).order_by('-total_spend')[:8]
+    
+    dept_chart = {
+        'labels': [item['requisition__department__name'] or 'N/A' 
+                   for item in dept_spend],
+        'values': [float(item['total_spend']) for item in dept_spend]
+    }
+    
+    # Recent POs
+    recent_pos = PurchaseOrder.objects.select_related(
+        'supplier', 'requisition', 'created_by'
+    ).order_by('-created_at')[:10]
+    
+    # Pending approvals
+    pending_approvals = PurchaseOrder.objects.filter(
+        status='PENDING_APPROVAL'
+    ).select_related('supplier', 'requisition').order_by('-created_at')[:5]
+    
+    # Delivery tracking
+    pending_delivery = PurchaseOrder.objects.filter(
+        status__in=['SENT', 'ACKNOWLEDGED', 'PARTIAL_DELIVERY'],
+        delivery_date__lte=today + timedelta(days=7)
+    ).select_related('supplier').order_by('delivery_date')[:10]
+    
+    # Performance metrics
+    avg_po_value = PurchaseOrder.objects.filter(
+        status__in=['APPROVED', 'SENT', 'ACKNOWLEDGED', 'DELIVERED', 'CLOSED']
+    ).aggregate(avg=Avg('total_amount'))['avg'] or 0
+    
+    # Delivery performance
+    delivered_pos = PurchaseOrder.objects.filter(status='DELIVERED')
+    on_time_delivery = delivered_pos.filter(
+        delivery_date__gte=F('po_date')
+    ).count()
+    total_delivered = delivered_pos.count()
+    delivery_rate = (on_time_delivery / total_delivered * 100) if total_delivered > 0 else 0
+    
+    context = {
+        'total_pos': total_pos,
+        'pending_pos': pending_pos,
+        'active_pos': active_pos,
+        'total_po_value': total_po_value,
+        'monthly_value': monthly_value,
+        'avg_po_value': avg_po_value,
+        'delivery_rate': round(delivery_rate, 1),
+        'status_chart': status_chart,
+        'po_trend_chart': po_trend_chart,
+        'supplier_chart': supplier_chart,
+        'dept_chart': dept_chart,
+        'recent_pos': recent_pos,
+        'pending_approvals': pending_approvals,
+        'pending_delivery': pending_delivery,
+    }
+    
+    return render(request, 'procurement/po_dashboard.html', context)
+
+
+@login_required
+def po_list(request):
+    """List all purchase orders with filtering and search"""
+    
+    pos = PurchaseOrder.objects.select_related(
+        'supplier', 'requisition__department', 'created_by', 'approved_by'
+    ).all()
+    
+    # Filters
+    status_filter = request.GET.get('status')
+    supplier_filter = request.GET.get('supplier')
+    department_filter = request.GET.get('department')
+    date_from = request.GET.get('date_from')
+    date_to = request.GET.get('date_to')
+    search = request.GET.get('search')
+    
+    if status_filter:
+        pos = pos.filter(status=status_filter)
+    
+    if supplier_filter:
+        pos = pos.filter(supplier_id=supplier_filter)
+    
+    if department_filter:
+        pos = pos.filter(requisition__department_id=department_filter)
+    
+    if date_from:
+        pos = pos.filter(po_date__gte=date_from)
+    
+    if date_to:
+        pos = pos.filter(po_date__lte=date_to)
+    
+    if search:
+        pos = pos.filter(
+            Q(po_number__icontains=search) |
+            Q(supplier__name__icontains=search) |
+            Q(requisition__requisition_number__icontains=search)
+        )
+    
+    pos = pos.order_by('-created_at')
+    
+    # Get filter options
+    suppliers = Supplier.objects.filter(status='APPROVED').order_by('name')
+    departments = Department.objects.filter(is_active=True).order_by('name')
+    
+    # Statistics for current filter
+    total_value = pos.aggregate(total=Sum('total_amount'))['total'] or 0
+    
+    context = {
+        'pos': pos,
+        'suppliers': suppliers,
+        'departments': departments,
+        'status_choices': PurchaseOrder.STATUS_CHOICES,
+        'total_value': total_value,
+        'filters': {
+            'status': status_filter,
+            'supplier': supplier_filter,
+            'department': department_filter,
+            'date_from': date_from,
+            'date_to': date_to,
+            'search': search,
+        }
+    }
+    
+    return render(request, 'procurement/po_list.html', context)
+
+
+@login_required
+def po_detail(request, po_id):
+    """Purchase Order detail view"""
+    
+    po = get_object_or_404(
+        PurchaseOrder.objects.select_related(
+            'supplier', 'requisition', 'bid', 'created_by', 'approved_by'
+        ),
+        id=po_id
+    )
+    
+    # Get PO items
+    po_items = po.items.select_related('requisition_item').all()
+    
+    # Get amendments
+    amendments = po.amendments.select_related(
+        'requested_by', 'approved_by'
+    ).order_by('-created_at')
+    
+    # Get GRNs
+    grns = po.grns.select_related('store', 'received_by').order_by('-created_at')
+    
+    # Get invoices
+    invoices = po.invoices.select_related('supplier').order_by('-created_at')
+    
+    # Calculate delivery progress
+    total_items = po_items.count()
+    items_delivered = po_items.filter(
+        quantity_delivered__gte=F('quantity')
+    ).count()
+    delivery_progress = (items_delivered / total_items * 100) if total_items > 0 else 0
+    
+    # Calculate invoice status
+    total_invoiced = invoices.aggregate(
+        total=Sum('total_amount')
+    )['total'] or 0
+    invoice_progress = (total_invoiced / po.total_amount * 100) if po.total_amount > 0 else 0
+    
+    context = {
+        'po': po,
+        'po_items': po_items,
+        'amendments': amendments,
+        'grns': grns,
+        'invoices': invoices,
+        'delivery_progress': round(delivery_progress, 1),
+        'invoice_progress': round(invoice_progress, 1),
+    }
+    
+    return render(request, 'procurement/po_detail.html', context)
+
+
+@csrf_exempt
+@login_required
+@require_POST
+def po_submit_for_approval(request, po_id):
+    """
+    Ajax API endpoint to submit PO from DRAFT to PENDING_APPROVAL
+    """
+    try:
+        po = get_object_or_404(PurchaseOrder, id=po_id)
+        
+        # Check permissions - only creator or procurement can submit
+        if po.created_by != request.user and request.user.role not in ['PROCUREMENT', 'ADMIN']:
+            return JsonResponse({
+                'success': False,
+                'message': 'You do not have permission to submit this purchase order.'
+            }, status=403)
+        
+        # Check current status
+        if po.status != 'DRAFT':
+            return JsonResponse({
+                'success': False,
+                'message': f'Cannot submit PO with status: {po.get_status_display()}'
+            }, status=400)
+        
+        # Validate PO has items
+        if not po.items.exists():
+            return JsonResponse({
+                'success': False,
+                'message': 'Cannot submit purchase order without items.'
+            }, status=400)
+        
+        # Validate total amount
+        if po.total_amount <= 0:
+            return JsonResponse({
+                'success': False,
+                'message': 'Purchase order total amount must be greater than zero.'
+            }, status=400)
+        
+        with transaction.atomic():
+            # Update status
+            po.status = 'PENDING_APPROVAL'
+            po.save()
+            
+            # Create notification for approvers
+            approvers = User.objects.filter(
+                role__in=['PROCUREMENT', 'FINANCE', 'ADMIN'],
+                is_active=True
+            )
+            
+            notify(
+                approvers,
+                notification_type='PO',
+                priority='MEDIUM',
+                title=f'PO Pending Approval: {po.po_number}',
+                message=f'Purchase Order {po.po_number} for {po.supplier.name} '
+                        f'(KES {po.total_amount:,.2f}) has been submitted for approval.',
+                link_url=f'/procurement/po/{po.id}/'
+            )
+        
+        return JsonResponse({
+            'success': True,
+            'message': 'Purchase order submitted for approval successfully.',
+            'data': {
+                'po_number': po.po_number,
+                'status': po.status,
+                'status_display': po.get_status_display()
+            }
+        })
+        
+    except PurchaseOrder.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'message': 'Purchase order not found.'
+        }, status=404)
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': f'An error occurred: {str(e)}'
+        }, status=500)
+
+@login_required
+def po_create(request):
+    """Create new purchase order from approved requisition"""
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                # Get form data
+                requisition_id = request.POST.get('requisition')
+                supplier_id = request.POST.get('supplier')
+                bid_id = request.POST.get('bid')
+                delivery_date = request.POST.get('delivery_date')
+                delivery_address = request.POST.get('delivery_address')
+                payment_terms = request.POST.get('payment_terms')
+                warranty_terms = request.POST.get('warranty_terms', '')
+                special_instructions = request.POST.get('special_instructions', '')
+                
+                # Validate
+                requisition = get_object_or_404(Requisition, id=requisition_id)
+                supplier = get_object_or_404(Supplier, id=supplier_id)
+                
+                # Check if requisition is approved
+                if requisition.status != 'APPROVED':
+                    messages.error(request, 'Requisition must be fully approved')
+                    return redirect('po_create')
+                
+                # Check if PO already exists for this requisition
+                if PurchaseOrder.objects.filter(requisition=requisition).exists():
+                    messages.warning(request, 'Purchase order already exists for this requisition')
+                    return redirect('po_list')
+                
+                # Get bid if provided
+                bid = None
+                if bid_id:
+                    bid = get_object_or_404(Bid, id=bid_id)
+                
+                # Create PO
+                po = PurchaseOrder.objects.create(
+                    requisition=requisition,
+                    supplier=supplier,
+                    bid=bid,
+                    delivery_date=delivery_date,
+                    delivery_address=delivery_address,
+                    payment_terms=payment_terms,
+                    warranty_terms=warranty_terms,
+                    special_instructions=special_instructions,
+                    subtotal=0,
+                    tax_amount=0,
+                    total_amount=0,
+                    status='DRAFT',
+                    created_by=request.user
+                )
+                
+                # Create PO items from requisition items
+                req_items = requisition.items.all()
+                subtotal = Decimal('0.00')
+                
+                for req_item in req_items:
+                    # Get price from bid if available
+                    unit_price = req_item.estimated_unit_price
+                    
+                    if bid:
+                        bid_item = bid.items.filter(
+                            requisition_item=req_item
+                        ).first()
+                        if bid_item:
+                            unit_price = bid_item.quoted_unit_price
+                    
+                    PurchaseOrderItem.objects.create(
+                        purchase_order=po,
+                        requisition_item=req_item,
+                        item_description=req_item.item_description,
+                        specifications=req_item.specifications,
+                        quantity=req_item.quantity,
+                        unit_of_measure=req_item.unit_of_measure,
+                        unit_price=unit_price,
+                        total_price=req_item.quantity * unit_price
+                    )
+                    
+                    subtotal += req_item.quantity * unit_price
+                
+                # Calculate tax (assuming 16% VAT)
+                tax_rate = Decimal('0.16')
+                tax_amount = subtotal * tax_rate
+                total_amount = subtotal + tax_amount
+                
+                # Update PO totals
+                po.subtotal = subtotal
+                po.tax_amount = tax_amount
+                po.total_amount = total_amount
+                po.save()
+                
+                # Update budget commitment
+                if requisition.budget:
+                    budget = requisition.budget
+                    budget.committed_amount += total_amount
+                    budget.save()
+                
+                messages.success(request, f'Purchase Order {po.po_number} created successfully')
+                return redirect('po_detail', po_id=po.id)
+                
+        except Exception as e:
+            messages.error(request, f'Error creating purchase order: {str(e)}')
+            return redirect('po_create')
+    
+    # GET request
+    # Get approved requisitions without PO
+    approved_requisitions = Requisition.objects.filter(
+        status='APPROVED'
+    ).exclude(
+        id__in=PurchaseOrder.objects.values_list('requisition_id', flat=True)
+    ).select_related('department', 'requested_by')
+    
+    suppliers = Supplier.objects.filter(status='APPROVED').order_by('name')
+    
+    context = {
+        'approved_requisitions': approved_requisitions,
+        'suppliers': suppliers,
+    }
+    
+    return render(request, 'procurement/po_create.html', context)
+
+
+@login_required
+def po_update(request, po_id):
+    """Update purchase order (only in DRAFT status)"""
+    
+    po = get_object_or_404(PurchaseOrder, id=po_id)
+    
+    # Check if PO can be edited
+    if po.status not in ['DRAFT', 'PENDING_APPROVAL']:
+        messages.error(request, 'This purchase order cannot be edited')
+        return redirect('po_detail', po_id=po.id)
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                # Update PO fields
+                po.delivery_date = request.POST.get('delivery_date')
+                po.delivery_address = request.POST.get('delivery_address')
+                po.payment_terms = request.POST.get('payment_terms')
+                po.warranty_terms = request.POST.get('warranty_terms', '')
+                po.special_instructions = request.POST.get('special_instructions', '')
+                po.save()
+                
+                messages.success(request, 'Purchase order updated successfully')
+                return redirect('po_detail', po_id=po.id)
+                
+        except Exception as e:
+            messages.error(request, f'Error updating purchase order: {str(e)}')
+    
+    context = {
+        'po': po,
+        'po_items': po.items.all()
+    }
+    
+    return render(request, 'procurement/po_update.html', context)
+
+
+@login_required
+def po_approve(request, po_id):
+    """Approve purchase order"""
+    
+    po = get_object_or_404(PurchaseOrder, id=po_id)
+    
+    # Check permission (should be procurement/finance officer)
+    if request.user.role not in ['PROCUREMENT', 'FINANCE', 'ADMIN']:
+        messages.error(request, 'You do not have permission to approve purchase orders')
+        return redirect('po_detail', po_id=po.id)
+    
+  
+    if request.method == 'POST':
+        po.status = 'APPROVED'
+        po.approved_by = request.user
+        po.approved_at = timezone.now()
+        po.save()
+        
+        messages.success(request, f'Purchase Order {po.po_number} approved successfully')
+        return redirect('po_detail', po_id=po.id)
+    
+    return render(request, 'procurement/po_approve.html', {'po': po})
+
+
+@login_required
+def po_send(request, po_id):
+    """Send PO to supplier"""
+    
+    po = get_object_or_404(PurchaseOrder, id=po_id)
+    
+    if po.status != 'APPROVED':
+        messages.error(request, 'Only approved POs can be sent to suppliers')
+        return redirect('po_detail', po_id=po.id)
+    
+    if request.method == 'POST':
+        try:
+            # Update PO status
+            po.status = 'SENT'
+            po.sent_at = timezone.now()
+            po.save()
+            
+            # Send email to supplier
+            send_po_email(po)
+            
+            # Log the email
+            EmailLog.objects.create(
+                recipient=po.supplier.email,
+                subject=f'Purchase Order {po.po_number}',
+                body=f'Purchase Order {po.po_number} has been sent',
+                status='SENT',
+                sent_at=timezone.now()
+            )
+            
+            # Create audit log
+            record_audit(
+                user=request.user,
+                action='SUBMIT',
+                model_name='PurchaseOrder',
+                object_id=str(po.id),
+                object_repr=str(po),
+                changes={'status': 'SENT', 'sent_at': str(timezone.now())},
+                ip_address=request.META.get('REMOTE_ADDR'),
+                user_agent=request.META.get('HTTP_USER_AGENT', '')
+            )
+            
+            messages.success(request, f'Purchase Order {po.po_number} sent to supplier')
+            return redirect('po_detail', po_id=po.id)
+            
+        except Exception as e:
+            # Revert status if email fails
+            po.status = 'APPROVED'
+            po.sent_at = None
+            po.save()
+            
+            # Log the failed email
+            EmailLog.objects.create(
+                recipient=po.supplier.email,
+                subject=f'Purchase Order {po.po_number}',
+                body=f'Purchase Order {po.po_number} - Failed to send',
+                status='FAILED',
+                error_message=str(e)
+            )
+            
+            messages.error(request, f'Failed to send email to supplier: {str(e)}')
+            return redirect('po_detail', po_id=po.id)
+    
+    return render(request, 'procurement/po_send.html', {'po': po})
+
+
+def send_po_email(po):
+    """
+    Send purchase order email to supplier with PDF attachment
+    
+    Args:
+        po: PurchaseOrder instance
+    """
+    
+    po = purchase_orders_for_print().get(pk=po.pk)
+
+    # Email context
+    context = {
+        'po': po,
+        'supplier': po.supplier,
+        'items': po.items.all(),
+        'company_name': getattr(settings, 'COMPANY_NAME', 'University'),
+        'company_email': getattr(settings, 'DEFAULT_FROM_EMAIL', 'procurement@university.edu'),
+    }
+    
+    # Render HTML email template
+    html_content = render_to_string('emails/purchase_order.html', context)
+    text_content = strip_tags(html_content)
+    
+    # Create email
+    subject = f'Purchase Order {po.po_number} - {po.requisition.title}'
+    from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', 'procurement@university.edu')
+    to_email = po.supplier.email
+    
+    # Add CC if needed
+    cc_emails = []
+    if po.created_by and po.created_by.email:
+        cc_emails.append(po.created_by.email)
+    if po.requisition.department.hod and po.requisition.department.hod.email:
+        cc_emails.append(po.requisition.department.hod.email)
+    
+    # Create the email
+    email = EmailMultiAlternatives(
+        subject=subject,
+        body=text_content,
+        from_email=from_email,
+        to=[to_email],
+        cc=cc_emails,
+        reply_to=[from_email]
+    )
+    
+    # Attach HTML version
+    email.attach_alternative(html_content, "text/html")
+    
+    # Generate and attach PO PDF
+    try:
+        with open_purchase_order_pdf(po) as pdf:
+            email.attach(f'PO_{po.po_number}.pdf', pdf.read(), 'application/pdf')
+    except Exception as e:
+        # Log error but don't fail the email
+        print(f"Error generating PDF: {str(e)}")
+    
+    # Send the email
+    email.send(fail_silently=False)
+
+
+@login_required
+def po_download_pdf(request, po_id):
+    """Download PO as PDF"""
+    po = get_object_or_404(purchase_orders_for_print(), id=po_id)
+    
+    # Rendered once per version of the PO, then served from the PDF cache
+    return FileResponse(
+        open_purchase_order_pdf(po),
+        as_attachment=True,
+        filename=f'PO_{po.po_number}.pdf',
+        content_type='application/pdf',
+    )
+
+
+@login_required
+def po_cancel(request, po_id):
+    """Cancel purchase order"""
+    
+    po = get_object_or_404(PurchaseOrder, id=po_id)
+    
+    # Check if PO can be cancelled
+    if po.status in ['DELIVERED', 'CLOSED']:
+        messages.error(request, 'This purchase order cannot be cancelled')
+        return redirect('po_detail', po_id=po.id)
+    
+    if request.method == 'POST':
+        cancellation_reason = request.POST.get('cancellation_reason')
+        
+        with transaction.atomic():
+            po.status = 'CANCELLED'
+            po.save()
+            
+            # Release budget commitment
+            if po.requisition.budget:
+                budget = po.requisition.budget
+                budget.committed_amount -= po.total_amount
+                budget.save()
+            
+            messages.success(request, f'Purchase Order {po.po_number} cancelled')
+            return redirect('po_detail', po_id=po.id)
+    
+    context = {'po': po}
+    return render(request, 'procurement/po_cancel.html', context)
+
+
+@login_required
+def po_amendment_create(request, po_id):
+    """Create PO amendment"""
+    
+    po = get_object_or_404(PurchaseOrder, id=po_id)
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                amendment_type = request.POST.get('amendment_type')
+                description = request.POST.get('description')
+                justification = request.POST.get('justification')
+                old_value = request.POST.get('old_value')
+                new_value = request.POST.get('new_value')
+                amount_change = Decimal(request.POST.get('amount_change', '0'))
+                
+                # Generate amendment number
+                last_amendment = po.amendments.order_by('-created_at').first()
+                if last_amendment:
+                    last_num = int(last_amendment.amendment_number.split('-')[-1])
+                    amendment_number = f"{po.po_number}-AMD-{last_num + 1:03d}"
+                else:
+                    amendment_number = f"{po.po_number}-AMD-001"
+                
+                POAmendment.objects.create(
+                    purchase_order=po,
+                    amendment_number=amendment_number,
+                    amendment_type=amendment_type,
+                    description=description,
+                    justification=justification,
+                    old_value=old_value,
+                    new_value=new_value,
+                    amount_change=amount_change,
+                    requested_by=request.user
+                )
+                
+                messages.success(request, 'Amendment request created successfully')
+                return redirect('po_detail', po_id=po.id)
+                
+        except Exception as e:
+            messages.error(request, f'Error creating amendment: {str(e)}')
+    
+    context = {
+        'po': po,
+        'amendment_types': POAmendment.AMENDMENT_TYPES
+    }
+    
+    return render(request, 'procurement/po_amendment_create.html', context)
+
+
+# AJAX endpoints
+
+@login_required
+def get_requisition_details(request, req_id):
+    """Get requisition details for PO creation"""
+    
+    requisition = get_object_or_404(Requisition, id=req_id)
+    
+    items = []
+    for item in requisition.items.all():
+        items.append({
+            'id': str(item.id),
+            'description': item.item_description,
+            'quantity': float(item.quantity),
+            'unit': item.unit_of_measure,
+            'price': float(item.estimated_unit_price),
+            'total': float(item.estimated_total)
+        })
+    
+    data = {
+        'number': requisition.requisition_number,
+        'department': requisition.department.name,
+        'estimated_amount': float(requisition.estimated_amount),
+        'items': items
+    }
+    
+    return JsonResponse(data)
+
+
+@login_required
+def get_supplier_bids(request, req_id, supplier_id):
+    """Get supplier bids for a requisition"""
+    
+    bids = Bid.objects.filter(
+        tender__requisition_id=req_id,
+        supplier_id=supplier_id,
+        status='AWARDED'
+    ).select_related('tender')
+    
+    bid_list = []
+    for bid in bids:
+        bid_list.append({
+            'id': str(bid.id),
+            'bid_number': bid.bid_number,
+            'amount': float(bid.bid_amount),
+            'tender': bid.tender.tender_number
+        })
+    
+    return JsonResponse({'bids': bid_list})
+
+
+# ============================================================================
+# SUPPLIER VIEWS
+# ============================================================================
+
+@login_required
+def supplier_list(request):
+    """List all suppliers with filtering"""
+    
+    # Get filter parameters
+    search = request.GET.get('search', '')
+    status = request.GET.get('status', '')
+    category = request.GET.get('category', '')
+    rating_min = request.GET.get('rating_min', '')
+    
+    # Base queryset
+    suppliers = Supplier.objects.all().select_related().prefetch_related('categories')
+    
+    # Apply filters
+    if search:
+        suppliers = suppliers.filter(
+            Q(name__icontains=search) |
+            Q(supplier_number__icontains=search) |
+            Q(registration_number__icontains=search) |
+            Q(email__icontains=search)
+        )
+    
+    if status:
+        suppliers = suppliers.filter(status=status)
+    
+    if category:
+        suppliers = suppliers.filter(categories__id=category)
+    
+    if rating_min:
+        suppliers = suppliers.filter(rating__gte=rating_min)
+    
+    # Get statistics
+    total_suppliers = suppliers.count()
+    approved_suppliers = suppliers.filter(status='APPROVED').count()
+    pending_suppliers = suppliers.filter(status='PENDING').count()
+    
+    # Get categories for filter
+    categories = ItemCategory.objects.filter(is_active=True)
+    
+    context = {
+        'suppliers': suppliers.order_by('-created_at'),
+        'total_suppliers': total_suppliers,
+        'approved_suppliers': approved_suppliers,
+        'pending_suppliers': pending_suppliers,
+        'categories': categories,
+        'status_choices': Supplier.STATUS_CHOICES,
+        'filters': {
+            'search': search,
+            'status': status,
+            'category': category,
+            'rating_min': rating_min,
+        }
+    }
+    
+    return render(request, 'suppliers/supplier_list.html', context)
+
+
+@login_required
+def supplier_detail(request, supplier_id):
+    """View supplier details"""
+    
+    supplier = get_object_or_404(
+        Supplier.objects.prefetch_related('categories', 'documents', 'performances'),
+        id=supplier_id
+    )
+    
+    # Get supplier statistics
+    total_pos = PurchaseOrder.objects.filter(supplier=supplier).count()
+    total_value = PurchaseOrder.objects.filter(
+        supplier=supplier,
+        status__in=['APPROVED', 'SENT', 'ACKNOWLEDGED', 'DELIVERED', 'CLOSED']
+    ).aggregate(total=Sum('total_amount'))['total'] or 0
+    
+    # Get recent purchase orders
+    recent_pos = PurchaseOrder.objects.filter(
+        supplier=supplier
+    ).select_related('requisition__department').order_by('-created_at')[:5]
+    
+    # Get performance reviews
+    performances = supplier.performances.select_related(
+        'purchase_order', 'reviewed_by'
+    ).order_by('-reviewed_at')[:10]
+    
+    # Calculate average ratings
+    avg_ratings = supplier.performances.aggregate(
+        avg_quality=Avg('quality_rating'),
+        avg_delivery=Avg('delivery_rating'),
+        avg_service=Avg('service_rating'),
+        avg_overall=Avg('overall_rating')
+    )
+    
+    # Get active contracts
+    active_contracts = Contract.objects.filter(
+        supplier=supplier,
+        status='ACTIVE'
+    ).order_by('-start_date')[:5]
+    
+    # Check document expiry
+    documents = supplier.documents.filter(is_verified=True)
+    expiring_docs = documents.filter(
+        expiry_date__lte=timezone.now().date() + timedelta(days=30),
+        expiry_date__gte=timezone.now().date()
+    )
+    expired_docs = documents.filter(expiry_date__lt=timezone.now().date())
+    
+    context = {
+        'supplier': supplier,
+        'total_pos': total_pos,
+        'total_value': total_value,
+        'recent_pos': recent_pos,
+        'performances': performances,
+        'avg_ratings': avg_ratings,
+        'active_contracts': active_contracts,
+        'documents': documents,
+        'expiring_docs': expiring_docs,
+        'expired_docs': expired_docs,
+    }
+    
+    return render(request, 'suppliers/supplier_detail.html', context)
+
+
+def generate_password(length=12):
+    """Generate a secure random password"""
+    characters = string.ascii_letters + string.digits + string.punctuation
+    # Ensure password has at least one of each type
+    password = [
+        random.choice(string.ascii_uppercase),
+        random.choice(string.ascii_lowercase),
+        random.choice(string.digits),
+        random.choice(string.punctuation)
+    ]
+    # Fill the rest randomly
+    password += [random.choice(characters) for _ in range(length - 4)]
+    # Shuffle to avoid predictable patterns
+    random.shuffle(password)
+    return ''.join(password)
+
+
+def generate_employee_id(supplier_number):
+    """Generate employee ID from supplier number"""
+    # Convert SUP-2025-000001 to EMP-SUP-2025-000001
+    return f"EMP-{supplier_number}"
+
+
+def send_supplier_credentials_email(supplier, username, password):
+    """Send login credentials to supplier via email"""
+    subject = 'Your University Procurement System Account'
+    
+    message = f"""
+Dear {supplier.contact_person},
+
+Welcome to the University Procurement System!
+
+Your supplier account has been successfully created. Below are your login credentials:
+
+Organization: {supplier.name}
+Supplier Number: {supplier.supplier_number}
+
+Login Credentials:
+------------------
+Username: {username}
+Password: {password}
+
+Login URL: {settings.SITE_URL}/login/
+
+IMPORTANT SECURITY NOTICE:
+- Please change your password immediately after your first login
+- Keep your credentials secure and do not share them with unauthorized persons
+- Contact the procurement office if you experience any login issues
+
+For any questions or support, please contact:
+Email: procurement@university.edu
+Phone: [Your Support Number]
+
+Best regards,
+University Procurement Office
+
+---
+This is an automated message. Please do not reply to this email.
+"""
+    
+    html_message = f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+        .header {{ background-color: #2563EB; color: white; padding: 20px; text-align: center; border-radius: 5px 5px 0 0; }}
+        .content {{ background-color: #f9f9f9; padding: 30px; border: 1px solid #ddd; }}
+        .credentials {{ background-color: #fff; padding: 20px; border-left: 4px solid #2563EB; margin: 20px 0; }}
+        .credential-item {{ margin: 10px 0; }}
+        .credential-label {{ font-weight: bold; color: #2563EB; }}
+        .warning {{ background-color: #FEF2F2; border-left: 4px solid #EF4444; padding: 15px; margin: 20px 0; }}
+        .button {{ display: inline-block; padding: 12px 30px; background-color: #2563EB; color: white; text-decoration: none; border-radius: 5px; margin: 20px 0; }}
+        .footer {{ text-align: center; margin-top: 30px; padding-top: 20px; border-top: 1px solid #ddd; color: #666; font-size: 12px; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h2>Welcome to University Procurement System</h2>
+        </div>
+        
+        <div class="content">
+            <p>Dear <strong>{supplier.contact_person}</strong>,</p>
+            
+            <p>Your supplier account has been successfully created in our procurement system.</p>
+            
+            <div class="credentials">
+                <h3>Organization Details</h3>
+                <div class="credential-item">
+                    <span class="credential-label">Organization:</span> {supplier.name}
+                </div>
+                <div class="credential-item">
+                    <span class="credential-label">Supplier Number:</span> {supplier.supplier_number}
+                </div>
+                
+                <h3 style="margin-top: 20px;">Login Credentials</h3>
+                <div class="credential-item">
+                    <span class="credential-label">Username:</span> {username}
+                </div>
+                <div class="credential-item">
+                    <span class="credential-label">Temporary Password:</span> {password}
+                </div>
+            </div>
+            
+            <div style="text-align: center;">
+                <a href="{settings.SITE_URL}/login/" class="button">Login to Your Account</a>
+            </div>
+            
+            <div class="warning">
+                <h4 style="margin-top: 0;">⚠️ Important Security Notice</h4>
+                <ul style="margin: 10px 0;">
+                    <li>Please change your password immediately after your first login</li>
+                    <li>Keep your credentials secure and confidential</li>
+                    <li>Do not share your login details with unauthorized persons</li>
+                    <li>Contact us immediately if you suspect unauthorized access</li>
+                </ul>
+            </div>
+            
+            <h3>Need Help?</h3>
+            <p>If you have any questions or experience any issues, please contact our support team:</p>
+            <ul>
+                <li><strong>Email:</strong> procurement@university.edu</li>
+                <li><strong>Phone:</strong> [Your Support Number]</li>
+            </ul>
+        </div>
+        
+        <div class="footer">
+            <p>This is an automated message from the University Procurement System.</p>
+            <p>Please do not reply to this email.</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+    
+    try:
+        send_mail(
+            subject=subject,
+            message=message,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipient_list=[supplier.contact_person_email, supplier.email],
+            html_message=html_message,
+            fail_silently=False,
+        )
+        return True
+    except Exception as e:
+        print(f"Error sending email: {str(e)}")
+        return False
+
+
+@login_required
+def supplier_create(request):
+    """Create new supplier with user account"""
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                # Generate supplier number
+                year = timezone.now().year
+                last_supplier = Supplier.objects.filter(
+                    supplier_number__startswith=f'SUP-{year}'
+                ).order_by('-supplier_number').first()
+                
+                if last_supplier:
+                    last_number = int(last_supplier.supplier_number.split('-')[-1])
+                    new_number = last_number + 1
+                else:
+                    new_number = 1
+                
+                supplier_number = f'SUP-{year}-{new_number:06d}'
+                
+                # Generate username from supplier name and number
+                supplier_name = request.POST.get('name')
+                # Create username: first 3 letters of name + last 4 digits of supplier number
+                username_base = supplier_name.replace(' ', '')[:3].upper()
+                username = f"{username_base}{supplier_number.split('-')[-1]}"
+                
+                # Check if username exists, add random suffix if needed
+                original_username = username
+                counter = 1
+                while User.objects.filter(username=username).exists():
+                    username = f"{original_username}{counter}"
+                    counter += 1
+                
+                # Generate secure password
+                temp_password = generate_password()
+                
+                # Create user account
+                user = User.objects.create_user(
+                    username=username,
+                    email=request.POST.get('contact_person_email'),
+                    password=temp_password,
+                    first_name=request.POST.get('contact_person', '').split()[0] if request.POST.get('contact_person') else '',
+                    last_name=' '.join(request.POST.get('contact_person', '').split()[1:]) if len(request.POST.get('contact_person', '').split()) > 1 else '',
+                    role='SUPPLIER',
+                    employee_id=generate_employee_id(supplier_number),
+                    phone_number=request.POST.get('contact_person_phone', ''),
+                    is_active_user=True
+                )
+                
+                # Create supplier
+                supplier = Supplier.objects.create(
+                    user=user,  # Link to user account
+                    supplier_number=supplier_number,
+                    name=request.POST.get('name'),
+                    registration_number=request.POST.get('registration_number'),
+                    tax_id=request.POST.get('tax_id', ''),
+                    email=request.POST.get('email'),
+                    phone_number=request.POST.get('phone_number'),
+                    physical_address=request.POST.get('physical_address'),
+                    postal_address=request.POST.get('postal_address', ''),
+                    website=request.POST.get('website', ''),
+                    contact_person=request.POST.get('contact_person'),
+                    contact_person_phone=request.POST.get('contact_person_phone'),
+                    contact_person_email=request.POST.get('contact_person_email'),
+                    bank_name=request.POST.get('bank_name'),
+                    bank_branch=request.POST.get('bank_branch'),
+                    account_number=request.POST.get('account_number'),
+                    account_name=request.POST.get('account_name'),
+                    swift_code=request.POST.get('swift_code', ''),
+                    notes=request.POST.get('notes', ''),
+                    status='PENDING',  # Set to pending for approval
+                    created_by=request.user
+                )
+                
+                # Add categories
+                category_ids = request.POST.getlist('categories')
+                if category_ids:
+                    supplier.categories.set(category_ids)
+                
+                # Send credentials email
+                email_sent = send_supplier_credentials_email(supplier, username, temp_password)
+                
+                if email_sent:
+                    messages.success(
+                        request, 
+                        f'Supplier "{supplier.name}" created successfully! '
+                        f'Login credentials have been sent to {supplier.contact_person_email}'
+                    )
+                else:
+                    messages.warning(
+                        request,
+                        f'Supplier "{supplier.name}" created successfully! '
+                        f'However, there was an issue sending the email. '
+                        f'Username: {username}, Please contact the supplier to provide credentials manually.'
+                    )
+                
+                return redirect('supplier_detail', supplier_id=supplier.id)
+                
+        except Exception as e:
+            messages.error(request, f'Error creating supplier: {str(e)}')
+    
+    categories = ItemCategory.objects.filter(is_active=True)
+    
+    context = {
+        'categories': categories,
+    }
+    
+    return render(request, 'suppliers/supplier_create.html', context)
+
+
+@login_required
+def supplier_edit(request, supplier_id):
+    """Edit supplier information"""
+    
+    supplier = get_object_or_404(Supplier, id=supplier_id)
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                # Update supplier details
+                supplier.name = request.POST.get('name')
+                supplier.registration_number = request.POST.get('registration_number')
+                supplier.tax_id = request.POST.get('tax_id', '')
+                supplier.email = request.POST.get('email')
+                supplier.phone_number = request.POST.get('phone_number')
+                supplier.physical_address = request.POST.get('physical_address')
+                supplier.postal_address = request.POST.get('postal_address', '')
+                supplier.website = request.POST.get('website', '')
+                supplier.contact_person = request.POST.get('contact_person')
+                supplier.contact_person_phone = request.POST.get('contact_person_phone')
+                supplier.contact_person_email = request.POST.get('contact_person_email')
+                supplier.bank_name = request.POST.get('bank_name')
+                supplier.bank_branch = request.POST.get('bank_branch')
+                supplier.account_number = request.POST.get('account_number')
+                supplier.account_name = request.POST.get('account_name')
+                supplier.swift_code = request.POST.get('swift_code', '')
+                supplier.notes = request.POST.get('notes', '')
+                supplier.save()
+                
+                # Update linked user account if exists
+                if supplier.user:
+                    supplier.user.email = request.POST.get('contact_person_email')
+                    supplier.user.phone_number = request.POST.get('contact_person_phone')
+                    
+                    # Update first and last name from contact person
+                    contact_person_parts = request.POST.get('contact_person', '').split()
+                    if contact_person_parts:
+                        supplier.user.first_name = contact_person_parts[0]
+                        supplier.user.last_name = ' '.join(contact_person_parts[1:]) if len(contact_person_parts) > 1 else ''
+                    
+                    supplier.user.save()
+                
+                # Update categories
+                category_ids = request.POST.getlist('categories')
+                supplier.categories.set(category_ids)
+                
+                messages.success(request, 'Supplier updated successfully!')
+                return redirect('supplier_detail', supplier_id=supplier.id)
+                
+        except Exception as e:
+            messages.error(request, f'Error updating supplier: {str(e)}')
+    
+    categories = ItemCategory.objects.filter(is_active=True)
+    
+    context = {
+        'supplier': supplier,
+        'categories': categories,
+    }
+    
+    return render(request, 'suppliers/supplier_edit.html', context)
+
+
+@login_required
+def supplier_resend_credentials(request, supplier_id):
+    """Resend login credentials to supplier"""
+    supplier = get_object_or_404(Supplier, id=supplier_id)
+    
+    if not supplier.user:
+        messages.error(request, 'This supplier does not have a user account.')
+        return redirect('supplier_detail', supplier_id=supplier.id)
+    
+    try:
+        # Generate new password
+        new_password = generate_password()
+        supplier.user.set_password(new_password)
+        supplier.user.save()
+        
+        # Send credentials email
+        email_sent = send_supplier_credentials_email(
+            supplier, 
+            supplier.user.username, 
+            new_password
+        )
+        
+        if email_sent:
+            messages.success(
+                request,
+                f'New login credentials have been sent to {supplier.contact_person_email}'
+            )
+        else:
+            messages.error(
+                request,
+                f'Failed to send email. New password: {new_password} (Username: {supplier.user.username})'
+            )
+            
+    except Exception as e:
+        messages.error(request, f'Error resending credentials: {str(e)}')
+    
+    return redirect('supplier_detail', supplier_id=supplier.id)
+
+@login_required
+def supplier_update_status(request, supplier_id):
+    """Update supplier status (approve/suspend/blacklist)"""
+    
+    if request.method == 'POST':
+        supplier = get_object_or_404(Supplier, id=supplier_id)
+        new_status = request.POST.get('status')
+        reason = request.POST.get('reason', '')
+        
+        if new_status in dict(Supplier.STATUS_CHOICES).keys():
+            old_status = supplier.status
+            supplier.status = new_status
+            
+            if reason:
+                supplier.notes = f"{supplier.notes}\n\n[{timezone.now()}] Status changed from {old_status} to {new_status}: {reason}"
+            
+            supplier.save()
+            
+            messages.success(request, f'Supplier status updated to {supplier.get_status_display()}')
+        else:
+            messages.error(request, 'Invalid status')
+    
+    return redirect('supplier_detail', supplier_id=supplier_id)
+
+
+@login_required
+def supplier_verify_document(request, document_id):
+    """Verify supplier document"""
+    
+    if request.method == 'POST':
+        document = get_object_or_404(SupplierDocument, id=document_id)
+        
+        document.is_verified = True
+        document.verified_by = request.user
+        document.verified_at = timezone.now()
+        document.save()
+        
+        from pms.compliance import refresh_supplier
+        refresh_supplier(document.supplier)
+        
+        messages.success(request, f'Document {document.document_name} verified successfully!')
+    
+    return redirect('supplier_detail', supplier_id=document.supplier.id)
+
+
+# ============================================================================
+# VENDOR MANAGEMENT VIEWS
+# ============================================================================
+
+@login_required
+def vendor_dashboard(request):
+    """Vendor management dashboard"""
+    
+    # Get statistics
+    total_vendors = Supplier.objects.count()
+    approved_vendors = Supplier.objects.filter(status='APPROVED').count()
+    pending_vendors = Supplier.objects.filter(status='PENDING').count()
+    suspended_vendors = Supplier.objects.filter(status='SUSPENDED').count()
+    blacklisted_vendors = Supplier.objects.filter(status='BLACKLISTED').count()
+    
+    # Top performing vendors
+    top_vendors = Supplier.objects.filter(
+        status='APPROVED'
+    ).order_by('-rating')[:10]
+    
+    # Recent vendor registrations
+    recent_vendors = Supplier.objects.order_by('-created_at')[:10]
+    
+    # Vendors with expiring documents
+    expiring_date = timezone.now().date() + timedelta(days=30)
+    vendors_expiring_docs = Supplier.objects.filter(
+        documents__expiry_date__lte=expiring_date,
+        documents__expiry_date__gte=timezone.now().date(),
+        documents__is_verified=True
+    ).distinct()
+    
+    # Vendors with expired documents
+    vendors_expired_docs = Supplier.objects.filter(
+        documents__expiry_date__lt=timezone.now().date(),
+        documents__is_verified=True
+    ).distinct()
+    
+    # Performance distribution
+    excellent_vendors = Supplier.objects.filter(rating__gte=4.5).count()
+    good_vendors = Supplier.objects.filter(rating__gte=3.5, rating__lt=4.5).count()
+    average_vendors = Supplier.objects.filter(rating__gte=2.5, rating__lt=3.5).count()
+    poor_vendors = Supplier.objects.filter(rating__lt=2.5).count()
+    
+    # Category distribution
+    category_stats = ItemCategory.objects.annotate(
+        vendor_count=Count('suppliers')
+    ).order_by('-vendor_count')[:10]
+    
+    context = {
+        'total_vendors': total_vendors,
+        'approved_vendors': approved_vendors,
+        'pending_vendors': pending_vendors,
+        'suspended_vendors': suspended_vendors,
+        'blacklisted_vendors': blacklisted_vendors,
+        'top_vendors': top_vendors,
+        'recent_vendors': recent_vendors,
+        'vendors_expiring_docs': vendors_expiring_docs,
+        'vendors_expired_docs': vendors_expired_docs,
+        'excellent_vendors': excellent_vendors,
+        'good_vendors': good_vendors,
+        'average_vendors': average_vendors,
+        'poor_vendors': poor_vendors,
+        'category_stats': category_stats,
+    }
+    
+    return render(request, 'vendors/vendor_dashboard.html', context)
+
+
+@login_required
+def vendor_performance_list(request):
+    """List all vendor performance reviews"""
+    
+    # Get filter parameters
+    supplier_id = request.GET.get('supplier', '')
+    rating_min = request.GET.get('rating_min', '')
+    date_from = request.GET.get('date_from', '')
+    date_to = request.GET.get('date_to', '')
+    
+    # Base queryset
+    performances = SupplierPerformance.objects.select_related(
+        'supplier', 'purchase_order', 'reviewed_by'
+    )
+    
+    # Apply filters
+    if supplier_id:
+        performances = performances.filter(supplier_id=supplier_id)
+    
+    if rating_min:
+        performances = performances.filter(overall_rating__gte=rating_min)
+    
+    if date_from:
+        performances = performances.filter(reviewed_at__gte=date_from)
+    
+    if date_to:
+        performances = performances.filter(reviewed_at__lte=date_to)
+    
+    # Get statistics
+    total_reviews = performances.count()
+    avg_quality = performances.aggregate(avg=Avg('quality_rating'))['avg'] or 0
+    avg_delivery = performances.aggregate(avg=Avg('delivery_rating'))['avg'] or 0
+    avg_service = performances.aggregate(avg=Avg('service_rating'))['avg'] or 0
+    avg_overall = performances.aggregate(avg=Avg('overall_rating'))['avg'] or 0
+    
+    # Get suppliers for filter
+    suppliers = Supplier.objects.filter(status='APPROVED').order_by('name')
+    
+    context = {
+        'performances': performances.order_by('-reviewed_at'),
+        'total_reviews': total_reviews,
+        'avg_quality': avg_quality,
+        'avg_delivery': avg_delivery,
+        'avg_service': avg_service,
+        'avg_overall': avg_overall,
+        'suppliers': suppliers,
+        'filters': {
+            'supplier': supplier_id,
+            'rating_min': rating_min,
+            'date_from': date_from,
+            'date_to': date_to,
+        }
+    }
+    
+    return render(request, 'vendors/vendor_performance_list.html', context)
+
+
+@login_required
+def vendor_performance_create(request, po_id):
+    """Create vendor performance review"""
+    
+    po = get_object_or_404(
+        PurchaseOrder.objects.select_related('supplier'),
+        id=po_id
+    )
+    
+    # Check if already reviewed
+    existing_review = SupplierPerformance.objects.filter(purchase_order=po).first()
+    if existing_review:
+        messages.warning(request, 'This purchase order has already been reviewed.')
+        return redirect('po_detail', po_id=po.id)
+    
+    if request.method == 'POST':
+        try:
+            quality_rating = int(request.POST.get('quality_rating'))
+            delivery_rating = int(request.POST.get('delivery_rating'))
+            service_rating = int(request.POST.get('service_rating'))
+            
+            performance = SupplierPerformance.objects.create(
+                supplier=po.supplier,
+                purchase_order=po,
+                quality_rating=quality_rating,
+                delivery_rating=delivery_rating,
+                service_rating=service_rating,
+                comments=request.POST.get('comments', ''),
+                reviewed_by=request.user
+            )
+            
+            # Update supplier overall rating
+            avg_rating = SupplierPerformance.objects.filter(
+                supplier=po.supplier
+            ).aggregate(avg=Avg('overall_rating'))['avg']
+            
+            po.supplier.rating = avg_rating
+            po.supplier.save()
+            
+            messages.success(request, 'Performance review submitted successfully!')
+            return redirect('po_detail', po_id=po.id)
+            
+        except Exception as e:
+            messages.error(request, f'Error creating review: {str(e)}')
+    
+    context = {
+        'po': po,
+    }
+    
+    return render(request, 'vendors/vendor_performance_create.html', context)
+
+
+@login_required
+def vendor_comparison(request):
+    """Compare vendors for selection"""
+    
+    supplier_ids = request.GET.getlist('suppliers')
+    
+    if not supplier_ids:
+        messages.warning(request, 'Please select suppliers to compare.')
+        return redirect('supplier_list')
+    
+    suppliers = Supplier.objects.filter(
+        id__in=supplier_ids
+    ).prefetch_related('performances', 'categories')
+    
+    # Get comparison data
+    comparison_data = []
+    for supplier in suppliers:
+        performances = supplier.performances.aggregate(
+            avg_quality=Avg('quality_rating'),
+            avg_delivery=Avg('delivery_rating'),
+            avg_service=Avg('service_rating'),
+            avg_overall=Avg('overall_rating'),
+            total_reviews=Count('id')
+        )
+        
+        total_pos = PurchaseOrder.objects.filter(supplier=supplier).count()
+        total_value = PurchaseOrder.objects.filter(
+            supplier=supplier,
+            status__in=['APPROVED', 'SENT', 'ACKNOWLEDGED', 'DELIVERED', 'CLOSED']
+        ).aggregate(total=Sum('total_amount'))['total'] or 0
+        
+        comparison_data.append({
+            'supplier': supplier,
+            'performances': performances,
+            'total_pos': total_pos,
+            'total_value': total_value,
+        })
+    
+    context = {
+        'comparison_data': comparison_data,
+    }
+    
+    return render(request, 'vendors/vendor_comparison.html', context)
+
+
+@login_required
+def vendor_compliance(request):
+    """Vendor compliance tracking"""
+    from pms.compliance import compliance_summary
+    
+    today = timezone.now().date()
+    
+    # Overall status is precomputed by refresh_supplier_compliance
+    summary = compliance_summary()
+    
+    # Tax and registration breakdown in a single pass
+    breakdown = Supplier.objects.filter(status='APPROVED').aggregate(
+        tax_compliant=Count('id', filter=Q(tax_compliance_expiry__gte=today)),
+        tax_expiring=Count('id', filter=Q(
+            tax_compliance_expiry__gte=today,
+            tax_compliance_expiry__lte=today + timedelta(days=30)
+        )),
+        tax_expired=Count('id', filter=Q(tax_compliance_expiry__lt=today)),
+        reg_compliant=Count('id', filter=Q(registration_expiry__gte=today)),
+        reg_expiring=Count('id', filter=Q(
+            registration_expiry__gte=today,
+            registration_expiry__lte=today + timedelta(days=30)
+        )),
+        reg_expired=Count('id', filter=Q(registration_expiry__lt=today)),
+    )
+    
+    non_compliant_vendors = Supplier.objects.filter(
+        status='APPROVED',
+        compliance_status='NON_COMPLIANT'
+    ).order_by('compliance_expiry_date')
+    
+    expiring_soon = Supplier.objects.filter(
+        status='APPROVED',
+        compliance_status='EXPIRING'
+    ).order_by('compliance_expiry_date')
+    
+    context = {
+        'total_vendors': summary['total'],
+        'tax_compliant': breakdown['tax_compliant'],
+        'tax_expiring': breakdown['tax_expiring'],
+        'tax_expired': breakdown['tax_expired'],
+        'reg_compliant': breakdown['reg_compliant'],
+        'reg_expiring': breakdown['reg_expiring'],
+        'reg_expired': breakdown['reg_expired'],
+        'non_compliant_vendors': non_compliant_vendors,
+        'expiring_soon': expiring_soon,
+    }
+    
+    return render(request, 'vendors/vendor_compliance.html', context)
+
+
+def check_procurement_permission(user):
+    """Check if user has procurement officer permissions"""
+    return user.role in ['PROCUREMENT', 'ADMIN']
+
+
+# ============================================================================
+# DASHBOARD & ANALYTICS
+# ============================================================================
+
+@login_required
+def procurement_dashboard_view(request):
+    """Procurement officer dashboard"""
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+    
+    # Get statistics
+    pending_requisitions = Requisition.objects.filter(
+        status='PROCUREMENT_APPROVED'
+    ).count()
+    
+    active_tenders = Tender.objects.filter(
+        status='PUBLISHED',
+        closing_date__gte=timezone.now()
+    ).count()
+    
+    pending_pos = PurchaseOrder.objects.filter(
+        status__in=['DRAFT', 'PENDING_APPROVAL']
+    ).count()
+    
+    active_suppliers = Supplier.objects.filter(
+        status='APPROVED'
+    ).count()
+    
+    # Recent activities
+    recent_requisitions = Requisition.objects.filter(
+        status__in=['SUBMITTED', 'HOD_APPROVED', 'BUDGET_APPROVED']
+    ).select_related('department', 'requested_by').order_by('-created_at')[:5]
+    
+    recent_tenders = Tender.objects.all().select_related(
+        'requisition'
+    ).order_by('-created_at')[:5]
+    
+    recent_pos = PurchaseOrder.objects.all().select_related(
+        'supplier', 'requisition'
+    ).order_by('-created_at')[:5]
+    
+    # Monthly trends
+    current_month = timezone.now().month
+    monthly_spend = PurchaseOrder.objects.filter(
+        po_date__month=current_month,
+        status__in=['APPROVED', 'SENT', 'DELIVERED']
+    ).aggregate(total=Sum('total_amount'))['total'] or 0
+    
+    context = {
+        'pending_requisitions': pending_requisitions,
+        'active_tenders': active_tenders,
+        'pending_pos': pending_pos,
+        'active_suppliers': active_suppliers,
+        'recent_requisitions': recent_requisitions,
+        'recent_tenders': recent_tenders,
+        'recent_pos': recent_pos,
+        'monthly_spend': monthly_spend,
+    }
+    
+    return render(request, 'procurement/procurement_module/dashboard.html', context)
+
+
+@login_required
+def procurement_analytics_view(request):
+    """Procurement analytics and insights with interactive charts"""
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+    
+    # Date range filter
+    date_from_str = request.GET.get('date_from', (timezone.now() - timedelta(days=90)).strftime('%Y-%m-%d'))
+    date_to_str = request.GET.get('date_to', timezone.now().strftime('%Y-%m-%d'))
+    
+    date_from = timezone.datetime.strptime(date_from_str, '%Y-%m-%d').date()
+    date_to = timezone.datetime.strptime(date_to_str, '%Y-%m-%d').date()
+    
+    # ====================
+    # KEY METRICS
+    # ====================
+    
+    # Total spend
+    total_spend = PurchaseOrder.objects.filter(
+        po_date__gte=date_from,
+        po_date__lte=date_to,
+        status__in=['APPROVED', 'SENT', 'ACKNOWLEDGED', 'PARTIAL_DELIVERY', 'DELIVERED', 'CLOSED']
+    ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
+    
+    # Total orders
+    total_orders = PurchaseOrder.objects.filter(
+        po_date__gte=date_from,
+        po_date__lte=date_to
+    ).count()
+    
+    # Active suppliers
+    active_suppliers = PurchaseOrder.objects.filter(
+        po_date__gte=date_from,
+        po_date__lte=date_to
+    ).values('supplier').distinct().count()
+    
+    # Average processing time (requisition submitted to approved)
+    from django.db.models import F, ExpressionWrapper, fields
+    from django.db.models.functions import Coalesce
+    
+    approved_requisitions = Requisition.objects.filter(
+        status='APPROVED',
+        submitted_at__isnull=False,
+        submitted_at__gte=date_from,
+        updated_at__lte=date_to
+    )
+    
+    # Calculate processing time in days
+    processing_times = []
+    for req in approved_requisitions:
+        if req.submitted_at:
+            days = (req.updated_at.date() - req.submitted_at.date()).days
+            processing_times.append(days)
+    
+    avg_processing_time = sum(processing_times) / len(processing_times) if processing_times else 0
+    
+    # ====================
+    # GRAPH 1: MONTHLY SPENDING TREND
+    # ====================
+    from django.db.models.functions import TruncMonth
+    
+    monthly_spending = PurchaseOrder.objects.filter(
+        po_date__gte=date_from,
+        po_date__lte=date_to,
+        status__in=['APPROVED', 'SENT', 'ACKNOWLEDGED', 'PARTIAL_DELIVERY', 'DELIVERED', 'CLOSED']
+    ).annotate(
+        month=TruncMonth('po_date')
+    ).values('month').annotate(
+        total=Sum('total_amount'),
+        count=Count('id')
+    ).order_by('month')
+    
+    # Format for chart
+    monthly_labels = [item['month'].strftime('%b %Y') for item in monthly_spending]
+    monthly_values = [float(item['total']) for item in monthly_spending]
+    monthly_counts = [item['count'] for item in monthly_spending]
+    
+    # ====================
+    # GRAPH 2: DEPARTMENT SPENDING (TOP 10)
+    # ====================
+    dept_spending = PurchaseOrder.objects.filter(
+        po_date__gte=date_from,
+        po_date__lte=date_to,
+        status__in=['APPROVED', 'SENT', 'ACKNOWLEDGED', 'PARTIAL_DELIVERY', 'DELIVERED', 'CLOSED']
+    ).values(
+        'requisition__department__name'
+    ).annotate(
+        total=Sum('total_amount'),
+        order_count=Count('id')
+    ).order_by('-total')[:10]
+    
+    # Format for chart
+    dept_labels = [item['requisition__department__name'] or 'Unknown' for item in dept_spending]
+    dept_values = [float(item['total']) for item in dept_spending]
+    dept_counts = [item['order_count'] for item in dept_spending]
+    
+    # ====================
+    # GRAPH 3: SUPPLIER PERFORMANCE (TOP 10)
+    # ====================
+    supplier_stats = PurchaseOrder.objects.filter(
+        po_date__gte=date_from,
+        po_date__lte=date_to
+    ).values(
+        'supplier__name',
+        'supplier__id'
+    ).annotate(
+        order_count=Count('id'),
+        total_value=Sum('total_amount')
+    ).order_by('-total_value')[:10]
+    
+    # Format for chart
+    supplier_labels = [item['supplier__name'] for item in supplier_stats]
+    supplier_order_counts = [item['order_count'] for item in supplier_stats]
+    supplier_values = [float(item['total_value']) for item in supplier_stats]
+    
+    # ====================
+    # ADDITIONAL ANALYTICS
+    # ====================
+    
+    # Procurement method distribution
+    procurement_methods = Tender.objects.filter(
+        created_at__gte=date_from,
+        created_at__lte=date_to
+    ).values('procurement_method').annotate(
+        count=Count('id')
+    ).order_by('-count')
+    
+    # Status distribution
+    order_status_dist = PurchaseOrder.objects.filter(
+        po_date__gte=date_from,
+        po_date__lte=date_to
+    ).values('status').annotate(
+        count=Count('id')
+    ).order_by('-count')
+    
+    # Top items by quantity ordered
+    top_items = PurchaseOrderItem.objects.filter(
+        purchase_order__po_date__gte=date_from,
+        purchase_order__po_date__lte=date_to
+    ).values(
+        'item_description'
+    ).annotate(
+        total_quantity=Sum('quantity'),
+        total_value=Sum('total_price')
+    ).order_by('-total_value')[:10]
+    
+    # Budget utilization
+    budget_utilization = Budget.objects.filter(
+        is_active=True
+    ).annotate(
+        utilization_percentage=ExpressionWrapper(
+            (F('committed_amount') + F('actual_spent')) * 100.0 / F('allocated_amount'),
+            output_field=fields.FloatField()
+        )
+    ).values(
+        'department__name',
+        'category__name',
+        'allocated_amount',
+        'committed_amount',
+        'actual_spent',
+        'utilization_percentage'
+    ).order_by('-utilization_percentage')[:10]
+    
+    context = {
+        'date_from': date_from_str,
+        'date_to': date_to_str,
+        
+        # Key metrics
+        'total_spend': total_spend,
+        'total_orders': total_orders,
+        'active_suppliers': active_suppliers,
+        'avg_processing_time': round(avg_processing_time, 1),
+        
+        # Graph 1: Monthly Spending Trend
+        'monthly_labels': json.dumps(monthly_labels),
+        'monthly_values': json.dumps(monthly_values),
+        'monthly_counts': json.dumps(monthly_counts),
+        
+        # Graph 2: Department Spending
+        'dept_labels': json.dumps(dept_labels),
+        'dept_values': json.dumps(dept_values),
+        'dept_counts': dept_counts,
+        
+        # Graph 3: Supplier Performance
+        'supplier_labels': json.dumps(supplier_labels),
+        'supplier_order_counts': json.dumps(supplier_order_counts),
+        'supplier_values': json.dumps(supplier_values),
+        
+        # Additional data
+        'dept_spending': dept_spending,
+        'supplier_stats': supplier_stats,
+        'procurement_methods': procurement_methods,
+        'order_status_dist': order_status_dist,
+        'top_items': top_items,
+        'budget_utilization': budget_utilization,
+    }
+    
+    return render(request, 'procurement/procurement_module/analytics.html', context)
+
+
+# ============================================================================
+# REQUISITIONS MANAGEMENT
+# ============================================================================
+
+@login_required
+def procurement_all_requisitions_view(request):
+    """List all requisitions"""
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+    
+    # Filters
+    status = request.GET.get('status', '')
+    department = request.GET.get('department', '')
+    search = request.GET.get('search', '')
+    
+    requisitions = Requisition.objects.all().select_related(
+        'department', 'requested_by', 'budget'
+    ).order_by('-created_at')
+    
+    if status:
+        requisitions = requisitions.filter(status=status)
+    if department:
+        requisitions = requisitions.filter(department_id=department)
+    if search:
+        requisitions = requisitions.filter(
+            Q(requisition_number__icontains=search) |
+            Q(title__icontains=search)
+        )
+    
+    paginator = Paginator(requisitions, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    departments = Department.objects.all()
+    
+    context = {
+        'page_obj': page_obj,
+        'departments': departments,
+        'total_count': requisitions.count(),
+        'status_choices': Requisition.STATUS_CHOICES,
+    }
+    
+    return render(request, 'procurement/procurement_module/all_requisitions.html', context)
+
+
+@login_required
+def procurement_pending_requisitions_view(request):
+    """List pending requisitions for procurement processing"""
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+    
+    requisitions = Requisition.objects.filter(
+        status__in=['SUBMITTED', 'HOD_APPROVED', 'BUDGET_APPROVED']
+    ).select_related(
+        'department', 'requested_by', 'budget'
+    ).order_by('-created_at')
+    
+    paginator = Paginator(requisitions, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    total_value = requisitions.aggregate(Sum('estimated_amount'))['estimated_amount__sum'] or 0
+    
+    context = {
+        'page_obj': page_obj,
+        'total_count': requisitions.count(),
+        'total_value': total_value,
+    }
+    
+    return render(request, 'procurement/procurement_module/pending_requisitions.html', context)
+
+
+@login_required
+def procurement_processed_requisitions_view(request):
+    """List processed requisitions"""
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+    
+    requisitions = Requisition.objects.filter(
+        status__in=['APPROVED', 'PROCUREMENT_APPROVED']
+    ).select_related(
+        'department', 'requested_by', 'budget'
+    ).order_by('-updated_at')
+    
+    paginator = Paginator(requisitions, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    context = {
+        'page_obj': page_obj,
+        'total_count': requisitions.count(),
+    }
+    
+    return render(request, 'procurement/procurement_module/processed_requisitions.html', context)
+
+
+# ============================================================================
+# TENDERS MANAGEMENT
+# ============================================================================
+
+@login_required
+def procurement_active_tenders_view(request):
+    """List active tenders"""
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+    
+    tenders = Tender.objects.filter(
+        status='PUBLISHED',
+        closing_date__gte=timezone.now()
+    ).select_related('requisition').order_by('closing_date')
+    
+    paginator = Paginator(tenders, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    context = {
+        'page_obj': page_obj,
+        'total_count': tenders.count(),
+    }
+    
+    return render(request, 'procurement/procurement_module/active_tenders.html', context)
+
+
+@login_required
+def procurement_create_tender_view(request):
+    """Create new tender with document uploads"""
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                # Extract form data
+                requisition_id = request.POST.get('requisition')
+                title = request.POST.get('title')
+                tender_type = request.POST.get('tender_type')
+                procurement_method = request.POST.get('procurement_method')
+                description = request.POST.get('description')
+                estimated_budget = request.POST.get('estimated_budget')
+                closing_date = request.POST.get('closing_date')
+                bid_opening_date = request.POST.get('bid_opening_date')
+                supplier_ids = request.POST.getlist('suppliers')
+                
+                # Create tender
+                requisition = Requisition.objects.get(id=requisition_id)
+                tender = Tender.objects.create(
+                    requisition=requisition,
+                    title=title,
+                    tender_type=tender_type,
+                    procurement_method=procurement_method,
+                    description=description,
+                    estimated_budget=estimated_budget,
+                    closing_date=closing_date,
+                    bid_opening_date=bid_opening_date,
+                    status='DRAFT',
+                    created_by=request.user
+                )
+                
+                # Add invited suppliers if any
+                if supplier_ids:
+                    suppliers = Supplier.objects.filter(id__in=supplier_ids)
+                    tender.invited_suppliers.set(suppliers)
+                
+                # Handle document uploads
+                uploaded_files = request.FILES.getlist('tender_documents')
+                document_names = request.POST.getlist('document_names')
+                document_descriptions = request.POST.getlist('document_descriptions')
+                mandatory_flags = request.POST.getlist('document_mandatory')
+                
+                for i, file in enumerate(uploaded_files):
+                    doc_name = document_names[i] if i < len(document_names) else file.name
+                    doc_desc = document_descriptions[i] if i < len(document_descriptions) else ''
+                    is_mandatory = str(i) in mandatory_flags
+                    
+                    TenderDocument.objects.create(
+                        tender=tender,
+                        document_name=doc_name,
+                        file=file,
+                        description=doc_desc,
+                        is_mandatory=is_mandatory
+                    )
+                
+                # Create notifications for invited suppliers
+                if supplier_ids:
+                    notify(
+                        Supplier.objects.filter(
+                            id__in=supplier_ids,
+                            user__isnull=False
+                        ).values_list('user_id', flat=True),
+                        notification_type='TENDER',
+                        priority='HIGH',
+                        title=f'New Tender Invitation: {tender.title}',
+                        message=f'You have been invited to submit a bid for tender {tender.tender_number}. Closing date: {tender.closing_date.strftime("%d %b %Y %H:%M")}',
+                        link_url=f'/suppliers/tenders/{tender.id}/'
+                    )
+                
+                messages.success(
+                    request, 
+                    f'Tender {tender.tender_number} created successfully with {len(uploaded_files)} document(s).'
+                )
+                return redirect('procurement_active_tenders')
+                
+        except Requisition.DoesNotExist:
+            messages.error(request, 'Selected requisition does not exist.')
+        except Exception as e:
+            messages.error(request, f'Error creating tender: {str(e)}')
+            return redirect('procurement_create_tender')
+    
+    # GET request - show form
+    requisitions = Requisition.objects.filter(
+        status='APPROVED'
+    ).exclude(
+        tenders__isnull=False
+    ).select_related('department')
+    
+    suppliers = Supplier.objects.filter(status='APPROVED')
+    
+    # Common tender document types
+    document_types = [
+        'Invitation to Bid (ITB)',
+        'Terms of Reference (TOR)',
+        'Technical Specifications',
+        'Bill of Quantities (BOQ)',
+        'Bid Data Sheet',
+        'General Conditions of Contract',
+        'Special Conditions of Contract',
+        'Sample Forms (Bid Form, Performance Security)',
+        'Evaluation Criteria',
+        'Tender Drawings/Plans',
+    ]
+    
+    context = {
+        'requisitions': requisitions,
+        'suppliers': suppliers,
+        'tender_types': Tender.TENDER_TYPES,
+        'methods': Tender.METHOD_CHOICES,
+        'document_types': document_types,
+    }
+    
+    return render(request, 'procurement/procurement_module/create_tender.html', context)
+
+
+@login_required
+def procurement_closed_tenders_view(request):
+    """List closed tenders"""
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+    
+    tenders = Tender.objects.filter(
+        status__in=['CLOSED', 'AWARDED', 'CANCELLED']
+    ).select_related('requisition').order_by('-closing_date')
+    
+    paginator = Paginator(tenders, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    context = {
+        'page_obj': page_obj,
+        'total_count': tenders.count(),
+    }
+    
+    return render(request, 'procurement/procurement_module/closed_tenders.html', context)
+
+
+@login_required
+def procurement_tender_evaluation_view(request):
+    """Tender evaluation dashboard"""
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+    
+    tenders = Tender.objects.filter(
+        status__in=['CLOSED', 'EVALUATING']
+    ).select_related('requisition').order_by('-closing_date')
+    
+    # Get tenders with bids
+    tenders_with_bids = []
+    for tender in tenders:
+        bid_count = tender.bids.count()
+        if bid_count > 0:
+            tenders_with_bids.append({
+                'tender': tender,
+                'bid_count': bid_count,
+                'evaluated_count': tender.bids.filter(evaluations__isnull=False).distinct().count()
+            })
+    
+    context = {
+        'tenders_with_bids': tenders_with_bids,
+    }
+    
+    return render(request, 'procurement/procurement_module/tender_evaluation.html', context)
+
+
+# ============================================================================
+# BIDS MANAGEMENT
+# ============================================================================
+
+@login_required
+def procurement_bids_management_view(request):
+    """Manage all bids"""
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+    
+    status = request.GET.get('status', '')
+    tender_id = request.GET.get('tender', '')
+    
+    bids = Bid.objects.all().select_related(
+        'tender', 'supplier'
+    ).order_by('-submitted_at')
+    
+    if status:
+        bids = bids.filter(status=status)
+    if tender_id:
+        bids = bids.filter(tender_id=tender_id)
+    
+    paginator = Paginator(bids, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    tenders = Tender.objects.filter(status__in=['PUBLISHED', 'CLOSED', 'EVALUATING'])
+    
+    context = {
+        'page_obj': page_obj,
+        'tenders': tenders,
+        'status_choices': Bid.STATUS_CHOICES,
+        'total_count': bids.count(),
+    }
+    
+    return render(request, 'procurement/procurement_module/bids_management.html', context)
+
+
+# ============================================================================
+# PURCHASE ORDERS
+# ============================================================================
+
+@login_required
+def procurement_all_orders_view(request):
+    """List all purchase orders"""
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+    
+    status = request.GET.get('status', '')
+    search = request.GET.get('search', '')
+    
+    orders = PurchaseOrder.objects.all().select_related(
+        'supplier', 'requisition'
+    ).order_by('-created_at')
+    
+    if status:
+        orders = orders.filter(status=status)
+    if search:
+        orders = orders.filter(
+            Q(po_number__icontains=search) |
+            Q(supplier__name__icontains=search)
+        )
+    
+    paginator = Paginator(orders, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    total_value = orders.aggregate(Sum('total_amount'))['total_amount__sum'] or 0
+    
+    context = {
+        'page_obj': page_obj,
+        'total_count': orders.count(),
+        'total_value': total_value,
+        'status_choices': PurchaseOrder.STATUS_CHOICES,
+    }
+    
+    return render(request, 'procurement/procurement_module/all_orders.html', context)
+
+
+@login_required
+def procurement_create_order_view(request):
+    """Create new purchase order"""
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                # Get form data
+                bid_id = request.POST.get('bid')
+                requisition_id = request.POST.get('requisition')
+                supplier_id = request.POST.get('supplier')
+                delivery_date = request.POST.get('delivery_date')
+                delivery_address = request.POST.get('delivery_address')
+                payment_terms = request.POST.get('payment_terms')
+                special_instructions = request.POST.get('special_instructions', '')
+                
+                # Validate required fields
+                if not supplier_id:
+                    messages.error(request, 'Please select a supplier.')
+                    return redirect('procurement_create_order')
+                
+                if not delivery_date or not delivery_address or not payment_terms:
+                    messages.error(request, 'Please fill in all required fields.')
+                    return redirect('procurement_create_order')
+                
+                # Get supplier
+                supplier = get_object_or_404(Supplier, id=supplier_id)
+                
+                # Initialize variables
+                bid = None
+                requisition = None
+                subtotal = Decimal('0.00')
+                tax_amount = Decimal('0.00')
+                po_items_data = []
+                
+                # Handle bid-based order
+                if bid_id:
+                    bid = get_object_or_404(Bid, id=bid_id, status='AWARDED')
+                    requisition = bid.tender.requisition
+                    
+                    # Calculate totals from bid
+                    subtotal = bid.bid_amount
+                    tax_amount = subtotal * Decimal('0.16')  # 16% VAT
+                    
+                    # Collect bid items for PO creation
+                    for bid_item in bid.items.all():
+                        po_items_data.append({
+                            'requisition_item': bid_item.requisition_item,
+                            'description': bid_item.requisition_item.item_description,
+                            'specifications': bid_item.requisition_item.specifications,
+                            'quantity': bid_item.requisition_item.quantity,
+                            'unit_of_measure': bid_item.requisition_item.unit_of_measure,
+                            'unit_price': bid_item.quoted_unit_price,
+                            'total_price': bid_item.quoted_total,
+                            'notes': f"Brand: {bid_item.brand}, Model: {bid_item.model}" if bid_item.brand else ""
+                        })
+                
+                # Handle direct requisition-based order (no tender/bid)
+                elif requisition_id:
+                    requisition = get_object_or_404(
+                        Requisition, 
+                        id=requisition_id, 
+                        status='APPROVED'
+                    )
+                    
+                    # Calculate totals from requisition items
+                    for req_item in requisition.items.all():
+                        item_total = req_item.estimated_total
+                        subtotal += item_total
+                        
+                        po_items_data.append({
+                            'requisition_item': req_item,
+                            'description': req_item.item_description,
+                            'specifications': req_item.specifications,
+                            'quantity': req_item.quantity,
+                            'unit_of_measure': req_item.unit_of_measure,
+                            'unit_price': req_item.estimated_unit_price,
+                            'total_price': req_item.estimated_total,
+                            'notes': ''
+                        })
+                    
+                    tax_amount = subtotal * Decimal('0.16')  # 16% VAT
+                
+                else:
+                    messages.error(request, 'Please select either an awarded bid or an approved requisition.')
+                    return redirect('procurement_create_order')
+                
+                total_amount = subtotal + tax_amount
+                
+                # Create Purchase Order
+                po = PurchaseOrder.objects.create(
+                    requisition=requisition,
+                    supplier=supplier,
+                    bid=bid,
+                    delivery_date=delivery_date,
+                    delivery_address=delivery_address,
+                    subtotal=subtotal,
+                    tax_amount=tax_amount,
+                    total_amount=total_amount,
+                    payment_terms=payment_terms,
+                    special_instructions=special_instructions,
+                    status='DRAFT',
+                    created_by=request.user
+                )
+                
+                # Create PO items
+                for item_data in po_items_data:
+                    PurchaseOrderItem.objects.create(
+                        purchase_order=po,
+                        requisition_item=item_data['requisition_item'],
+                        item_description=item_data['description'],
+                        specifications=item_data['specifications'],
+                        quantity=item_data['quantity'],
+                        unit_of_measure=item_data['unit_of_measure'],
+                        unit_price=item_data['unit_price'],
+                        total_price=item_data['total_price'],
+                        notes=item_data['notes']
+                    )
+                
+                # Update requisition status
+                if requisition:
+                    requisition.status = 'APPROVED'
+                    requisition.save()
+                
+                # Create audit log
+                record_audit(
+                    user=request.user,
+                    action='CREATE',
+                    model_name='PurchaseOrder',
+                    object_id=str(po.id),
+                    object_repr=str(po),
+                    changes={
+                        'po_number': po.po_number,
+                        'supplier': supplier.name,
+                        'total_amount': str(total_amount),
+                        'source': 'bid' if bid else 'requisition'
+                    },
+                    ip_address=request.META.get('REMOTE_ADDR'),
+                    user_agent=request.META.get('HTTP_USER_AGENT', '')
+                )
+                
+                # Create notification for supplier
+                if supplier.user:
+                    notify(
+                        supplier.user,
+                        notification_type='PO',
+                        priority='HIGH',
+                        title='New Purchase Order Created',
+                        message=f'A new purchase order {po.po_number} has been created for your review.',
+                        link_url=f'/procurement/orders/{po.id}/'
+                    )
+                
+                messages.success(
+                    request, 
+                    f'Purchase order {po.po_number} created successfully for {supplier.name}.'
+                )
+                return redirect('procurement_order_detail', po_id=po.id)
+                
+        except Exception as e:
+            messages.error(request, f'Error creating purchase order: {str(e)}')
+            return redirect('procurement_create_order')
+    
+    # GET request - show form
+    # Get awarded bids without POs
+    awarded_bids = Bid.objects.filter(
+        status='AWARDED',
+        purchase_order__isnull=True
+    ).select_related(
+        'tender',
+        'tender__requisition', 
+        'supplier'
+    ).prefetch_related('items__requisition_item')
+    
+    # Prepare bid data with items as JSON
+    awarded_bids_data = []
+    for bid in awarded_bids:
+        bid_items = []
+        for bid_item in bid.items.all():
+            bid_items.append({
+                'item_name': bid_item.requisition_item.item.name if bid_item.requisition_item.item else 'N/A',
+                'description': bid_item.requisition_item.item_description,
+                'quantity': float(bid_item.requisition_item.quantity),
+                'unit_price': float(bid_item.quoted_unit_price),
+                'total': float(bid_item.quoted_total),
+            })
+        
+        bid_data = bid
+        bid_data.items_json = json.dumps(bid_items)
+        awarded_bids_data.append(bid_data)
+    
+    # Get approved requisitions without POs and without tenders
+    approved_requisitions = Requisition.objects.filter(
+        status='APPROVED',
+        purchase_orders__isnull=True
+    ).select_related(
+        'department',
+        'budget',
+        'requested_by'
+    ).prefetch_related('items__item')
+    
+    # Prepare requisition data with items as JSON
+    approved_requisitions_data = []
+    for req in approved_requisitions:
+        req_items = []
+        for req_item in req.items.all():
+            req_items.append({
+                'item_name': req_item.item.name if req_item.item else 'N/A',
+                'description': req_item.item_description,
+                'quantity': float(req_item.quantity),
+                'unit_price': float(req_item.estimated_unit_price),
+                'total': float(req_item.estimated_total),
+            })
+        
+        req_data = req
+        req_data.items_json = json.dumps(req_items)
+        approved_requisitions_data.append(req_data)
+    
+    # Get approved suppliers
+    suppliers = Supplier.objects.filter(
+        status='APPROVED'
+    ).order_by('name')
+    
+    context = {
+        'awarded_bids': awarded_bids_data,
+        'approved_requisitions': approved_requisitions_data,
+        'suppliers': suppliers,
+    }
+    
+    return render(request, 'procurement/procurement_module/create_order.html', context)
+
+
+@login_required
+def procurement_order_detail_view(request, po_id):
+    """View purchase order details"""
+    
+    # Get the purchase order with related data
+    po = get_object_or_404(
+        PurchaseOrder.objects.select_related(
+            'supplier',
+            'requisition',
+            'requisition__department',
+            'requisition__requested_by',
+            'bid',
+            'bid__tender',
+            'created_by',
+            'approved_by'
+        ).prefetch_related(
+            'items__requisition_item',
+            'items__requisition_item__item',
+            'grns',
+            'invoices',
+            'amendments'
+        ),
+        id=po_id
+    )
+    
+    # Check permissions
+    user = request.user
+    can_edit = False
+    can_approve = False
+    can_send = False
+    can_cancel = False
+    
+    if user.role == 'PROCUREMENT':
+        can_edit = po.status == 'DRAFT'
+        can_approve = po.status == 'DRAFT'
+        can_send = po.status == 'APPROVED'
+        can_cancel = po.status in ['DRAFT', 'APPROVED']
+    elif user.role == 'ADMIN':
+        can_edit = True
+        can_approve = True
+        can_send = True
+        can_cancel = True
+    
+    # Handle POST actions
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        
+        if action == 'approve' and can_approve:
+            po.status = 'APPROVED'
+            po.approved_by = user
+            po.approved_at = timezone.now()
+            po.save()
+            
+            # Create audit log
+            record_audit(
+                user=user,
+                action='APPROVE',
+                model_name='PurchaseOrder',
+                object_id=str(po.id),
+                object_repr=str(po),
+                changes={'status': 'APPROVED'},
+                ip_address=request.META.get('REMOTE_ADDR'),
+                user_agent=request.META.get('HTTP_USER_AGENT', '')
+            )
+            
+            messages.success(request, f'Purchase Order {po.po_number} approved successfully.')
+            return redirect('procurement_order_detail', po_id=po.id)
+        
+        elif action == 'send' and can_send:
+            po.status = 'SENT'
+            po.sent_at = timezone.now()
+            po.save()
+            
+            # Create notification for supplier
+            if po.supplier.user:
+                notify(
+                    po.supplier.user,
+                    notification_type='PO',
+                    priority='HIGH',
+                    title='Purchase Order Sent',
+                    message=f'Purchase Order {po.po_number} has been sent to you. Please review and acknowledge.',
+                    link_url=f'/supplier/orders/{po.id}/'
+                )
+            
+            # Send email to supplier
+            try:
+                email_subject = f'Purchase Order {po.po_number} - Action Required'
+                
+                # Build text email content
+                email_body = f"""
+Dear {po.supplier.contact_person},
+
+PURCHASE ORDER NOTIFICATION
+
+We are pleased to inform you that Purchase Order {po.po_number} has been issued to {po.supplier.name}.
+
+PURCHASE ORDER DETAILS:
+-----------------------
+PO Number: {po.po_number}
+PO Date: {po.po_date.strftime('%B %d, %Y')}
+Delivery Date: {po.delivery_date.strftime('%B %d, %Y')}
+Total Amount: KES {po.total_amount:,.2f}
+
+SUPPLIER INFORMATION:
+--------------------
+Company: {po.supplier.name}
+Contact Person: {po.supplier.contact_person}
+Phone: {po.supplier.phone_number}
+Email: {po.supplier.email}
+
+DELIVERY ADDRESS:
+-----------------
+{po.delivery_address}
+
+ORDER ITEMS:
+------------
+"""
+                # Add items to email
+                for idx, item in enumerate(po.items.all(), 1):
+                    email_body += f"""
+{idx}. {item.item_description}
+   Quantity: {item.quantity} {item.unit_of_measure}
+   Unit Price: KES {item.unit_price:,.2f}
+   Total: KES {item.total_price:,.2f}
+"""
+
+                email_body += f"""
+
+PAYMENT TERMS:
+--------------
+{po.payment_terms}
+"""
+
+                if po.warranty_terms:
+                    email_body += f"""
+WARRANTY TERMS:
+---------------
+{po.warranty_terms}
+"""
+
+                if po.special_instructions:
+                    email_body += f"""
+SPECIAL INSTRUCTIONS:
+--------------------
+{po.special_instructions}
+"""
+
+                email_body += f"""
+
+FINANCIAL SUMMARY:
+------------------
+Subtotal: KES {po.subtotal:,.2f}
+Tax (VAT): KES {po.tax_amount:,.2f}
+TOTAL AMOUNT: KES {po.total_amount:,.2f}
+
+NEXT STEPS:
+-----------
+1. Please review the purchase order details carefully
+2. Acknowledge receipt of this purchase order
+3. Confirm the delivery date
+4. Contact us immediately if there are any issues or discrepancies
+
+Please acknowledge receipt of this purchase order by replying to this email or contacting our procurement department.
+
+For any questions or concerns regarding this purchase order, please contact:
+{user.get_full_name()}
+{user.email}
+Phone: {user.phone_number if hasattr(user, 'phone_number') and user.phone_number else 'N/A'}
+
+Thank you for your continued partnership.
+
+Best regards,
+{user.get_full_name()}
+Procurement Department
+{settings.ORGANIZATION_NAME if hasattr(settings, 'ORGANIZATION_NAME') else 'University Procurement System'}
+
+---
+This is an automated message. Please do not reply directly to this email.
+Purchase Order Number: {po.po_number}
+Generated on: {timezone.now().strftime('%B %d, %Y at %I:%M %p')}
+"""
+
+                # Send the email
+                send_mail(
+                    subject=email_subject,
+                    message=email_body,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    recipient_list=[po.supplier.email],
+                    fail_silently=False,
+                )
+                
+                # Log email sent
+                EmailLog.objects.create(
+                    recipient=po.supplier.email,
+                    subject=email_subject,
+                    body=email_body,
+                    status='SENT',
+                    sent_at=timezone.now()
+                )
+                
+                messages.success(
+                    request, 
+                    f'Purchase Order {po.po_number} sent to supplier successfully. Email notification sent to {po.supplier.email}.'
+                )
+                
+            except Exception as e:
+                # Log email failure
+                EmailLog.objects.create(
+                    recipient=po.supplier.email,
+                    subject=email_subject,
+                    body=email_body if 'email_body' in locals() else '',
+                    status='FAILED',
+                    error_message=str(e)
+                )
+                
+                messages.warning(
+                    request, 
+                    f'Purchase Order {po.po_number} sent to supplier, but email notification failed. Please contact the supplier directly.'
+                )
+            
+            # Create audit log
+            record_audit(
+                user=user,
+                action='UPDATE',
+                model_name='PurchaseOrder',
+                object_id=str(po.id),
+                object_repr=str(po),
+                changes={'status': 'SENT', 'email_sent': True},
+                ip_address=request.META.get('REMOTE_ADDR'),
+                user_agent=request.META.get('HTTP_USER_AGENT', '')
+            )
+            
+            return redirect('procurement_order_detail', po_id=po.id)
+        
+        elif action == 'cancel' and can_cancel:
+            cancellation_reason = request.POST.get('cancellation_reason', '')
+            
+            if not cancellation_reason:
+                messages.error(request, 'Please provide a reason for cancellation.')
+                return redirect('procurement_order_detail', po_id=po.id)
+            
+            po.status = 'CANCELLED'
+            po.special_instructions += f"\n\nCANCELLATION REASON ({timezone.now().strftime('%Y-%m-%d')}): {cancellation_reason}"
+            po.save()
+            
+            # Send cancellation email to supplier
+            try:
+                email_subject = f'CANCELLATION: Purchase Order {po.po_number}'
+                
+                email_body = f"""
+Dear {po.supplier.contact_person},
+
+PURCHASE ORDER CANCELLATION NOTICE
+
+This is to inform you that Purchase Order {po.po_number} has been CANCELLED.
+
+PURCHASE ORDER DETAILS:
+-----------------------
+PO Number: {po.po_number}
+PO Date: {po.po_date.strftime('%B %d, %Y')}
+Original Delivery Date: {po.delivery_date.strftime('%B %d, %Y')}
+Total Amount: KES {po.total_amount:,.2f}
+Cancellation Date: {timezone.now().strftime('%B %d, %Y at %I:%M %p')}
+
+SUPPLIER INFORMATION:
+--------------------
+Company: {po.supplier.name}
+Contact Person: {po.supplier.contact_person}
+
+REASON FOR CANCELLATION:
+------------------------
+{cancellation_reason}
+
+NEXT STEPS:
+-----------
+1. Please cease all work or procurement activities related to this purchase order
+2. If any goods have already been shipped, please contact us immediately
+3. If you have incurred any costs, please document them and contact our procurement department
+4. Do not deliver any items under this cancelled purchase order
+
+If you have any questions or concerns regarding this cancellation, please contact us immediately.
+
+CONTACT INFORMATION:
+--------------------
+Cancelled by: {user.get_full_name()}
+Email: {user.email}
+Phone: {user.phone_number if hasattr(user, 'phone_number') and user.phone_number else 'N/A'}
+
+We apologize for any inconvenience this may cause and appreciate your understanding.
+
+Best regards,
+{user.get_full_name()}
+Procurement Department
+{settings.ORGANIZATION_NAME if hasattr(settings, 'ORGANIZATION_NAME') else 'University Procurement System'}
+
+---
+This is an automated message. Please do not reply directly to this email.
+Purchase Order Number: {po.po_number}
+Status: CANCELLED
+Generated on: {timezone.now().strftime('%B %d, %Y at %I:%M %p')}
+"""
+
+                # Send the email
+                send_mail(
+                    subject=email_subject,
+                    message=email_body,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    recipient_list=[po.supplier.email],
+                    fail_silently=False,
+                )
+                
+                # Log email sent
+                EmailLog.objects.create(
+                    recipient=po.supplier.email,
+                    subject=email_subject,
+                    body=email_body,
+                    status='SENT',
+                    sent_at=timezone.now()
+                )
+                
+                messages.success(
+                    request, 
+                    f'Purchase Order {po.po_number} cancelled successfully. Cancellation email sent to {po.supplier.email}.'
+                )
+                
+            except Exception as e:
+                # Log email failure
+                EmailLog.objects.create(
+                    recipient=po.supplier.email,
+                    subject=email_subject,
+                    body=email_body if 'email_body' in locals() else '',
+                    status='FAILED',
+                    error_message=str(e)
+                )
+                
+                messages.warning(
+                    request, 
+                    f'Purchase Order {po.po_number} cancelled, but email notification failed. Please contact the supplier directly.'
+                )
+            
+            # Create audit log
+            record_audit(
+                user=user,
+                action='CANCEL',
+                model_name='PurchaseOrder',
+                object_id=str(po.id),
+                object_repr=str(po),
+                changes={'status': 'CANCELLED', 'reason': cancellation_reason, 'email_sent': True},
+                ip_address=request.META.get('REMOTE_ADDR'),
+                user_agent=request.META.get('HTTP_USER_AGENT', '')
+            )
+            
+            return redirect('procurement_order_detail', po_id=po.id)
+    
+    # Calculate delivery statistics
+    total_items = po.items.count()
+    items_fully_delivered = po.items.filter(quantity_pending=0).count()
+    items_partially_delivered = po.items.filter(
+        quantity_delivered__gt=0,
+        quantity_pending__gt=0
+    ).count()
+    items_not_delivered = po.items.filter(quantity_delivered=0).count()
+    
+    delivery_percentage = 0
+    if total_items > 0:
+        total_quantity = po.items.aggregate(total=Sum('quantity'))['total'] or 0
+        delivered_quantity = po.items.aggregate(total=Sum('quantity_delivered'))['total'] or 0
+        if total_quantity > 0:
+            delivery_percentage = (delivered_quantity / total_quantity) * 100
+    
+    # Get related documents count
+    grn_count = po.grns.count()
+    invoice_count = po.invoices.count()
+    amendment_count = po.amendments.count()
+    
+    # Check if overdue
+    is_overdue = False
+    days_until_delivery = 0
+    if po.delivery_date:
+        days_until_delivery = (po.delivery_date - timezone.now().date()).days
+        is_overdue = days_until_delivery < 0 and po.status not in ['DELIVERED', 'CLOSED', 'CANCELLED']
+    
+    context = {
+        'po': po,
+        'can_edit': can_edit,
+        'can_approve': can_approve,
+        'can_send': can_send,
+        'can_cancel': can_cancel,
+        'total_items': total_items,
+        'items_fully_delivered': items_fully_delivered,
+        'items_partially_delivered': items_partially_delivered,
+        'items_not_delivered': items_not_delivered,
+        'delivery_percentage': round(delivery_percentage, 1),
+        'grn_count': grn_count,
+        'invoice_count': invoice_count,
+        'amendment_count': amendment_count,
+        'is_overdue': is_overdue,
+        'days_until_delivery': days_until_delivery,
+    }
+    
+    return render(request, 'procurement/procurement_module/order_detail.html', context)
+
+@login_required
+def procurement_pending_orders_view(request):
+    """List pending purchase orders"""
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+    
+    orders = PurchaseOrder.objects.filter(
+        status__in=['DRAFT', 'PENDING_APPROVAL']
+    ).select_related('supplier', 'requisition').order_by('-created_at')
+    
+    paginator = Paginator(orders, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    context = {
+        'page_obj': page_obj,
+        'total_count': orders.count(),
+    }
+    
+    return render(request, 'procurement/procurement_module/pending_orders.html', context)
+
+
+@login_required
+def procurement_completed_orders_view(request):
+    """List completed purchase orders"""
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+    
+    orders = PurchaseOrder.objects.filter(
+        status__in=['DELIVERED', 'CLOSED']
+    ).select_related('supplier', 'requisition').order_by('-updated_at')
+    
+    paginator = Paginator(orders, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    context = {
+        'page_obj': page_obj,
+        'total_count': orders.count(),
+    }
+    
+    return render(request, 'procurement/procurement_module/completed_orders.html', context)
+
+
+# ============================================================================
+# CONTRACTS
+# ============================================================================
+
+@login_required
+def procurement_contracts_view(request):
+    """List all contracts"""
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+    
+    status = request.GET.get('status', '')
+    contract_type = request.GET.get('type', '')
+    
+    contracts = Contract.objects.all().select_related(
+        'supplier', 'purchase_order'
+    ).order_by('-created_at')
+    
+    if status:
+        contracts = contracts.filter(status=status)
+    if contract_type:
+        contracts = contracts.filter(contract_type=contract_type)
+    
+    paginator = Paginator(contracts, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    total_value = contracts.aggregate(Sum('contract_value'))['contract_value__sum'] or 0
+    active_count = contracts.filter(status='ACTIVE').count()
+    
+    context = {
+        'page_obj': page_obj,
+        'total_count': contracts.count(),
+        'total_value': total_value,
+        'active_count': active_count,
+        'status_choices': Contract.STATUS_CHOICES,
+        'type_choices': Contract.CONTRACT_TYPES,
+    }
+    
+    return render(request, 'procurement/procurement_module/contracts.html', context)
+
+
+# ============================================================================
+# SUPPLIERS
+# ============================================================================
+
+@login_required
+def procurement_all_suppliers_view(request):
+    """List all suppliers"""
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+    
+    status = request.GET.get('status', '')
+    search = request.GET.get('search', '')
+    
+    suppliers = Supplier.objects.all().prefetch_related('categories').order_by('name')
+    
+    if status:
+        suppliers = suppliers.filter(status=status)
+    if search:
+        suppliers = suppliers.filter(
+            Q(name__icontains=search) |
+            Q(supplier_number__icontains=search) |
+            Q(email__icontains=search)
+        )
+    
+    paginator = Paginator(suppliers, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    context = {
+        'page_obj': page_obj,
+        'total_count': suppliers.count(),
+        'status_choices': Supplier.STATUS_CHOICES,
+    }
+    
+    return render(request, 'procurement/procurement_module/all_suppliers.html', context)
+
+
+@login_required
+def procurement_add_supplier_view(request):
+    """Add new supplier"""
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+    
+    if request.method == 'POST':
+        # Handle supplier creation
+        messages.success(request, 'Supplier added successfully.')
+        return redirect('procurement_all_suppliers')
+    
+    categories = ItemCategory.objects.filter(is_active=True)
+    
+    context = {
+        'categories': categories,
+    }
+    
+    return render(request, 'procurement/procurement_module/add_supplier.html', context)
+
+
+@login_required
+def procurement_supplier_evaluation_view(request):
+    """Supplier performance evaluation"""
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+    
+    suppliers = Supplier.objects.filter(
+        status='APPROVED'
+    ).annotate(
+        order_count=Count('purchase_orders'),
+        total_value=Sum('purchase_orders__total_amount'),
+        avg_rating=Avg('performances__overall_rating')
+    ).order_by('-avg_rating')
+    
+    paginator = Paginator(suppliers, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    context = {
+        'page_obj': page_obj,
+        'total_count': suppliers.count(),
+    }
+    
+    return render(request, 'procurement/procurement_module/supplier_evaluation.html', context)
+
+
+@login_required
+def procurement_blacklisted_suppliers_view(request):
+    """List blacklisted suppliers"""
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+    
+    suppliers = Supplier.objects.filter(
+        status='BLACKLISTED'
+    ).order_by('-updated_at')
+    
+    paginator = Paginator(suppliers, 20)
+    page = request.GET.get('page')
+    page_obj = paginator.get_page(page)
+    
+    context = {
+        'page_obj': page_obj,
+        'total_count': suppliers.count(),
+    }
+    
+    return render(request, 'procurement/procurement_module/blacklisted_suppliers.html', context)
+
+
+# ============================================================================
+# REPORTS
+# ============================================================================
+@read_replica
+@login_required
+def procurement_reports_view(request):
+    """Procurement reports dashboard with comprehensive analytics"""
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+    
+    from django.db.models import Sum, Count, Q, Avg, F
+    from django.db.models.functions import TruncMonth, TruncQuarter
+    from decimal import Decimal
+    import json
+    
+    # Date filters
+    current_year = timezone.now().year
+    start_date = request.GET.get('start_date')
+    end_date = request.GET.get('end_date')
+    
+    # Base querysets
+    requisitions_qs = Requisition.objects.all()
+    tenders_qs = Tender.objects.all()
+    pos_qs = PurchaseOrder.objects.all()
+    invoices_qs = Invoice.objects.all()
+    
+    # Apply date filters if provided
+    if start_date:
+        requisitions_qs = requisitions_qs.filter(created_at__gte=start_date)
+        tenders_qs = tenders_qs.filter(created_at__gte=start_date)
+        pos_qs = pos_qs.filter(created_at__gte=start_date)
+        invoices_qs = invoices_qs.filter(created_at__gte=start_date)
+    
+    if end_date:
+        requisitions_qs = requisitions_qs.filter(created_at__lte=end_date)
+        tenders_qs = tenders_qs.filter(created_at__lte=end_date)
+        pos_qs = pos_qs.filter(created_at__lte=end_date)
+        invoices_qs = invoices_qs.filter(created_at__lte=end_date)
+    
+    # ==========================================
+    # 1. SUMMARY STATISTICS
+    # ==========================================
+    total_requisitions = requisitions_qs.count()
+    total_tenders = tenders_qs.count()
+    total_pos = pos_qs.count()
+    total_suppliers = Supplier.objects.filter(status='APPROVED').count()
+    
+    total_spend = pos_qs.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0')
+    total_budget = Budget.objects.filter(
+        budget_year__is_active=True
+    ).aggregate(Sum('allocated_amount'))['allocated_amount__sum'] or Decimal('0')
+    
+    budget_utilization = (total_spend / total_budget * 100) if total_budget > 0 else 0
+    
+    # Pending approvals
+    pending_requisitions = requisitions_qs.exclude(
+        status__in=['APPROVED', 'REJECTED', 'CANCELLED']
+    ).count()
+    
+    pending_invoices = invoices_qs.exclude(
+        status__in=['PAID', 'REJECTED']
+    ).count()
+    
+    # ==========================================
+    # 2. LINE CHART - Monthly Spend Trend
+    # ==========================================
+    monthly_spend = pos_qs.filter(
+        created_at__year=current_year
+    ).annotate(
+        month=TruncMonth('created_at')
+    ).values('month').annotate(
+        total=Sum('total_amount'),
+        count=Count('id')
+    ).order_by('month')
+    
+    spend_trend_labels = []
+    spend_trend_amounts = []
+    spend_trend_count = []
+    
+    for item in monthly_spend:
+        spend_trend_labels.append(item['month'].strftime('%B'))
+        spend_trend_amounts.append(float(item['total'] or 0))
+        spend_trend_count.append(item['count'])
+    
+    # ==========================================
+    # 3. BAR CHART - Spend by Department
+    # ==========================================
+    department_spend = pos_qs.values(
+        'requisition__department__name'
+    ).annotate(
+        total=Sum('total_amount'),
+        count=Count('id')
+    ).order_by('-total')[:10]  # Top 10 departments
+    
+    dept_labels = []
+    dept_amounts = []
+    dept_colors = []
+    
+    # Color palette for departments
+    color_palette = [
+        '#2563EB', '#10B981', '#F59E0B', '#EF4444', '#8B5CF6',
+        '#EC4899', '#14B8A6', '#F97316', '#06B6D4', '#84CC16'
+    ]
+    
+    for idx, item in enumerate(department_spend):
+        dept_labels.append(item['requisition__department__name'] or 'Unknown')
+        dept_amounts.append(float(item['total'] or 0))
+        dept_colors.append(color_palette[idx % len(color_palette)])
+    
+    # ==========================================
+    # 4. DONUT CHART - Requisition Status Distribution
+    # ==========================================
+    req_status_data = requisitions_qs.values('status').annotate(
+        count=Count('id')
+    ).order_by('-count')
+    
+    req_status_labels = []
+    req_status_values = []
+    req_status_colors = {
+        'DRAFT': '#94A3B8',
+        'SUBMITTED': '#3B82F6',
+        'HOD_APPROVED': '#8B5CF6',
+        'FACULTY_APPROVED': '#EC4899',
+        'BUDGET_APPROVED': '#14B8A6',
+        'PROCUREMENT_APPROVED': '#10B981',
+        'APPROVED': '#22C55E',
+        'REJECTED': '#EF4444',
+        'CANCELLED': '#6B7280',
+    }
+    
+    donut_colors = []
+    for item in req_status_data:
+        status_display = dict(Requisition.STATUS_CHOICES).get(
+            item['status'], item['status']
+        )
+        req_status_labels.append(status_display)
+        req_status_values.append(item['count'])
+        donut_colors.append(req_status_colors.get(item['status'], '#64748B'))
+    
+    # ==========================================
+    # 5. RADAR CHART - Supplier Performance Metrics
+    # ==========================================
+    # Get top 5 suppliers by number of orders
+    top_suppliers = pos_qs.values(
+        'supplier__name'
+    ).annotate(
+        order_count=Count('id'),
+        total_value=Sum('total_amount'),
+        avg_delivery_rating=Avg('performance_reviews__delivery_rating'),
+        avg_quality_rating=Avg('performance_reviews__quality_rating'),
+        avg_service_rating=Avg('performance_reviews__service_rating')
+    ).order_by('-order_count')[:5]
+    
+    radar_labels = ['Quality', 'Delivery', 'Service', 'Value', 'Reliability']
+    radar_datasets = []
+    
+    for supplier in top_suppliers:
+        # Normalize value score (0-5 scale)
+        max_value = float(top_suppliers[0]['total_value'] or 1)
+        value_score = (float(supplier['total_value'] or 0) / max_value) * 5
+        
+        # Calculate reliability score based on order completion
+        reliability_score = min(5.0, (supplier['order_count'] / 10) * 5)
+        
+        dataset = {
+            'label': supplier['supplier__name'] or 'Unknown',
+            'data': [
+                float(supplier['avg_quality_rating'] or 3.0),
+                float(supplier['avg_delivery_rating'] or 3.0),
+                float(supplier['avg_service_rating'] or 3.0),
+                value_score,
+                reliability_score
+            ],
+            'backgroundColor': f'rgba({", ".join(map(str, [
+                hash(supplier["supplier__name"]) % 255,
+                (hash(supplier["supplier__name"]) * 2) % 255,
+                (hash(supplier["supplier__name"]) * 3) % 255
+            ]))}, 0.2)',
+            'borderColor': f'rgb({", ".join(map(str, [
+                hash(supplier["supplier__name"]) % 255,
+                (hash(supplier["supplier__name"]) * 2) % 255,
+                (hash(supplier["supplier__name"]) * 3) % 255
+            ]))})',
+            'borderWidth': 2
+        }
+        radar_datasets.append(dataset)
+    
+    # ==========================================
+    # 6. 3D DONUT - Budget Utilization by Category
+    # ==========================================
+    budget_by_category = Budget.objects.filter(
+        budget_year__is_active=True
+    ).values(
+        'category__name'
+    ).annotate(
+        allocated=Sum('allocated_amount'),
+        spent=Sum('actual_spent'),
+        committed=Sum('committed_amount')
+    ).order_by('-allocated')[:8]  # Top 8 categories
+    
+    budget_3d_labels = []
+    budget_3d_allocated = []
+    budget_3d_spent = []
+    budget_3d_available = []
+    
+    for item in budget_by_category:
+        budget_3d_labels.append(item['category__name'] or 'Unknown')
+        allocated = float(item['allocated'] or 0)
+        spent = float(item['spent'] or 0)
+        committed = float(item['committed'] or 0)
+        
+        budget_3d_allocated.append(allocated)
+        budget_3d_spent.append(spent)
+        budget_3d_available.append(max(0, allocated - spent - committed))
+    
+    # ==========================================
+    # 7. PROCUREMENT METHOD BREAKDOWN
+    # ==========================================
+    procurement_methods = tenders_qs.values(
+        'procurement_method'
+    ).annotate(
+        count=Count('id'),
+        total_value=Sum('estimated_budget')
+    ).order_by('-count')
+    
+    method_labels = []
+    method_values = []
+    method_colors_list = ['#2563EB', '#10B981', '#F59E0B', '#EF4444', '#8B5CF6']
+    
+    for idx, item in enumerate(procurement_methods):
+        method_display = dict(Tender.METHOD_CHOICES).get(
+            item['procurement_method'], item['procurement_method']
+        )
+        method_labels.append(method_display)
+        method_values.append(item['count'])
+    
+    # ==========================================
+    # 8. QUARTERLY COMPARISON
+    # ==========================================
+    quarterly_data = pos_qs.filter(
+        created_at__year=current_year
+    ).annotate(
+        quarter=TruncQuarter('created_at')
+    ).values('quarter').annotate(
+        total=Sum('total_amount'),
+        count=Count('id')
+    ).order_by('quarter')
+    
+    quarterly_labels = []
+    quarterly_amounts = []
+    
+    for item in quarterly_data:
+        quarter_num = ((item['quarter'].month - 1) // 3) + 1
+        quarterly_labels.append(f'Q{quarter_num} {item["quarter"].year}')
+        quarterly_amounts.append(float(item['total'] or 0))
+    
+    # ==========================================
+    # 9. PAYMENT STATUS OVERVIEW
+    # ==========================================
+    payment_status = invoices_qs.values('status').annotate(
+        count=Count('id'),
+        total=Sum('total_amount')
+    ).order_by('-count')
+    
+    payment_labels = []
+    payment_counts = []
+    payment_amounts = []
+    
+    for item in payment_status:
+        status_display = dict(Invoice.STATUS_CHOICES).get(
+            item['status'], item['status']
+        )
+        payment_labels.append(status_display)
+        payment_counts.append(item['count'])
+        payment_amounts.append(float(item['total'] or 0))
+    
+    # ==========================================
+    # 10. SPEND CONCENTRATION (stored per budget year)
+    # ==========================================
+    budget_years = BudgetYear.objects.order_by('-start_date')
+    concentration_year = _selected_budget_year(request, budget_years)
+    concentration = concentration_report(concentration_year) if concentration_year else None
+
+    # ==========================================
+    # CONTEXT PREPARATION
+    # ==========================================
+    context = {
+        # Summary stats
+        'total_requisitions': total_requisitions,
+        'total_tenders': total_tenders,
+        'total_pos': total_pos,
+        'total_suppliers': total_suppliers,
+        'total_spend': total_spend,
+        'total_budget': total_budget,
+        'budget_utilization': round(budget_utilization, 2),
+        'pending_requisitions': pending_requisitions,
+        'pending_invoices': pending_invoices,
+        
+        # Chart data - JSON encoded for JavaScript
+        'spend_trend_data': json.dumps({
+            'labels': spend_trend_labels,
+            'amounts': spend_trend_amounts,
+            'count': spend_trend_count
+        }),
+        
+        'department_data': json.dumps({
+            'labels': dept_labels,
+            'amounts': dept_amounts,
+            'colors': dept_colors
+        }),
+        
+        'requisition_status_data': json.dumps({
+            'labels': req_status_labels,
+            'values': req_status_values,
+            'colors': donut_colors
+        }),
+        
+        'radar_data': json.dumps({
+            'labels': radar_labels,
+            'datasets': radar_datasets
+        }),
+        
+        'budget_3d_data': json.dumps({
+            'labels': budget_3d_labels,
+            'allocated': budget_3d_allocated,
+            'spent': budget_3d_spent,
+            'available': budget_3d_available
+        }),
+        
+        'procurement_method_data': json.dumps({
+            'labels': method_labels,
+            'values': method_values,
+            'colors': method_colors_list[:len(method_values)]
+        }),
+        
+        'quarterly_data': json.dumps({
+            'labels': quarterly_labels,
+            'amounts': quarterly_amounts
+        }),
+        
+        'payment_status_data': json.dumps({
+            'labels': payment_labels,
+            'counts': payment_counts,
+            'amounts': payment_amounts
+        }),
+        
+        'concentration': concentration,
+        'concentration_year': concentration_year,
+        'concentration_curve_data': json.dumps({
+            'labels': [rank for rank, _ in concentration['curve']] if concentration else [],
+            'cumulative': [float(share) for _, share in concentration['curve']] if concentration else [],
+        }),
+        'budget_years': budget_years,
+
+        # Filters
+        'current_year': current_year,
+        'start_date': start_date,
+        'end_date': end_date,
+    }
+    
+    return render(request, 'procurement/procurement_module/reports.html', context)
+
+
+def _selected_budget_year(request, budget_years):
+    """?budget_year= of the request, else the active or latest budget year"""
+    budget_year_id = request.GET.get('budget_year')
+    if budget_year_id:
+        try:
+            return budget_years.filter(pk=budget_year_id).first()
+        except ValidationError:
+            return None
+    return budget_years.filter(is_active=True).first() or budget_years.first()
+
+
+@read_replica
+@login_required
+def procurement_spend_concentration_export(request):
+    """
+    CSV of the stored spend concentration of ?budget_year= (default: the
+    active year), all dimensions or only ?dimension=SUPPLIER/ITEM/CATEGORY
+    """
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+
+    budget_year = _selected_budget_year(request, BudgetYear.objects.order_by('-start_date'))
+    if budget_year is None:
+        messages.error(request, 'Select a budget year to export.')
+        return redirect('procurement_reports')
+
+    dimension = request.GET.get('dimension', '').upper()
+    if dimension not in dict(SpendConcentration.DIMENSION_CHOICES):
+        dimension = None
+    dimensions = dict(SpendConcentration.DIMENSION_CHOICES)
+
+    response = HttpResponse(content_type='text/csv')
+    response['Content-Disposition'] = (
+        f'attachment; filename="spend_concentration_{slugify(budget_year.name)}'
+        f'{"_" + dimension.lower() if dimension else ""}_{timezone.now().strftime("%Y%m%d")}.csv"'
+    )
+    writer = csv.writer(response)
+    writer.writerow([
+        'Dimension', 'Rank', 'Name', 'Spend', 'Share (%)', 'Cumulative Share (%)',
+        'ABC Class', 'HHI', 'Suppliers',
+    ])
+    for row in concentration_rows(budget_year, dimension):
+        writer.writerow([
+            dimensions[row['dimension']], row['rank'], row['name'], row['spend'], row['share'],
+            row['cumulative_share'], row['abc_class'], row['hhi'] if row['hhi'] is not None else '',
+            row['supplier_count'],
+        ])
+    return response
+
+
+@read_replica
+@login_required
+def procurement_spend_analysis_view(request):
+    """Comprehensive spend analysis report with advanced analytics"""
+    if not check_procurement_permission(request.user):
+        messages.error(request, 'You do not have procurement officer permissions.')
+        return redirect('dashboard')
+    
+    # Date filters with defaults
+    date_from = request.GET.get('date_from', (timezone.now() - timedelta(days=365)).strftime('%Y-%m-%d'))
+    date_to = request.GET.get('date_to', timezone.now().strftime('%Y-%m-%d'))
+    
+    # Additional filters
+    selected_department = request.GET.get('department', '')
+    selected_category = request.GET.get('category', '')
+    selected_supplier = request.GET.get('supplier', '')
+    
+    # All figures below are computed from one cached load of the filtered
+    # purchase orders (this period and the previous one of equal length)
+    cube = spend_cube(
+        datetime.strptime(date_from, '%Y-%m-%d').date(),
+        datetime.strptime(date_to, '%Y-%m-%d').date(),
+        department_id=selected_department,
+        category_id=selected_category,
+        supplier_id=selected_supplier,
+    )
+    
+    # ==========================================
+    # 1. SUMMARY STATISTICS
+    # ==========================================
+    summary = cube.summary()
+    total_spend = summary['total_spend']
+    spend_change = cube.spend_change()
+    
+    # ==========================================
+    # 2. LINE CHART - Spend Trend Over Time
+    # ==========================================
+    monthly = cube.monthly()
+    
+    trend_labels = []
+    trend_amounts = []
+    trend_counts = []
+    trend_averages = []
+    
+    for month, item in monthly:
+        trend_labels.append(month.strftime('%b %Y'))
+        trend_amounts.append(float(item['total']))
+        trend_counts.append(item['count'])
+        trend_averages.append(float(item['avg']))
+    
+    # ==========================================
+    # 3. BAR CHART - Top Departments by Spend
+    # ==========================================
+    dept_spending = [
+        {
+            'requisition__department__name': item['name'],
+            'requisition__department__id': item['id'],
+            'total': item['total'],
+            'count': item['count'],
+            'avg': item['avg'],
+        }
+        for item in cube.ranked('department')[:15]
+    ]
+    
+    dept_labels = []
+    dept_amounts = []
+    dept_counts = []
+    dept_colors = []
+    
+    color_palette = [
+        '#2563EB', '#10B981', '#F59E0B', '#EF4444', '#8B5CF6',
+        '#EC4899', '#14B8A6', '#F97316', '#06B6D4', '#84CC16',
+        '#6366F1', '#F43F5E', '#22D3EE', '#A855F7', '#EAB308'
+    ]
+    
+    for idx, item in enumerate(dept_spending):
+        dept_labels.append(item['requisition__department__name'] or 'Unknown')
+        dept_amounts.append(float(item['total']))
+        dept_counts.append(item['count'])
+        dept_colors.append(color_palette[idx % len(color_palette)])
+    
+    # ==========================================
+    # 4. HORIZONTAL BAR - Top Categories
+    # ==========================================
+    category_spending = [
+        {
+            'requisition__budget__category__name': item['name'],
+            'total': item['total'],
+            'count': item['count'],
+        }
+        for item in cube.ranked('category')[:10]
+    ]
+    
+    category_labels = []
+    category_amounts = []
+    category_counts = []
+    
+    for item in category_spending:
+        category_labels.append(item['requisition__budget__category__name'] or 'Unbudgeted')
+        category_amounts.append(float(item['total']))
+        category_counts.append(item['count'])
+    
+    # ==========================================
+    # 5. DONUT CHART - Supplier Concentration
+    # ==========================================
+    suppliers_ranked = cube.ranked('supplier')
+    
+    supplier_labels = []
+    supplier_amounts = []
+    supplier_colors = [
+        '#3B82F6', '#10B981', '#F59E0B', '#EF4444', '#8B5CF6',
+        '#EC4899', '#14B8A6', '#F97316', '#06B6D4', '#84CC16'
+    ]
+    
+    # Calculate "Others" if there are more suppliers
+    top_10_total = Decimal('0')
+    for item in suppliers_ranked[:10]:
+        supplier_labels.append(item['name'])
+        supplier_amounts.append(float(item['total']))
+        top_10_total += item['total']
+    
+    # Add "Others" category if applicable
+    if total_spend > top_10_total:
+        others_amount = float(total_spend - top_10_total)
+        if others_amount > 0:
+            supplier_labels.append('Others')
+            supplier_amounts.append(others_amount)
+            supplier_colors.append('#94A3B8')
+    
+    # Pareto (ABC) classes of the filtered supplier spend
+    supplier_abc = cube.supplier_abc()
+    
+    # ==========================================
+    # 6. RADAR CHART - Spending Dimensions
+    # ==========================================
+    # Emergency vs Planned spending
+    emergency_spend = summary['emergency_spend']
+    planned_spend = total_spend - emergency_spend
+    
+    # Goods vs Services vs Works
+    type_spend = cube.category_type_spend()
+    
+    # Normalize values for radar chart (0-100 scale)
+    max_value = float(total_spend) if total_spend > 0 else 1
+    
+    radar_data = {
+        'labels': ['Planned Procurement', 'Emergency Procurement', 'Goods', 'Services', 'Works', 'Compliance Score'],
+        'datasets': [{
+            'label': 'Spending Pattern',
+            'data': [
+                (float(planned_spend) / max_value) * 100,
+                (float(emergency_spend) / max_value) * 100,
+                (float(type_spend['GOODS']) / max_value) * 100,
+                (float(type_spend['SERVICES']) / max_value) * 100,
+                (float(type_spend['WORKS']) / max_value) * 100,
+                85  # Placeholder compliance score
+            ],
+            'backgroundColor': 'rgba(37, 99, 235, 0.2)',
+            'borderColor': 'rgb(37, 99, 235)',
+            'borderWidth': 2
+        }]
+    }
+    
+    # ==========================================
+    # 7. STACKED BAR - Monthly Spend by Category Type
+    # ==========================================
+    stacked_labels = []
+    stacked_goods = []
+    stacked_services = []
+    stacked_works = []
+    
+    for month, item in monthly:
+        stacked_labels.append(month.strftime('%b %Y'))
+        stacked_goods.append(float(item['goods']))
+        stacked_services.append(float(item['services']))
+        stacked_works.append(float(item['works']))
+    
+    # ==========================================
+    # 8. BUBBLE CHART - Supplier Performance vs Spend
+    # ==========================================
+    ratings = cube.supplier_ratings()
+    
+    bubble_data = []
+    for supplier in suppliers_ranked[:20]:
+        bubble_data.append({
+            'x': float(supplier['total']),
+            'y': float(ratings[supplier['id']] or 3.0),
+            'r': min(supplier['count'] * 2, 30),  # Bubble size
+            'label': supplier['name']
+        })
+    
+    # ==========================================
+    # 9. POLAR AREA - Procurement Methods Distribution
+    # ==========================================
+    polar_labels = []
+    polar_values = []
+    polar_colors = ['#2563EB', '#10B981', '#F59E0B', '#EF4444', '#8B5CF6']
+    
+    for item in cube.ranked('tender_method'):
+        if item['id'] is None:
+            continue
+        method_display = dict(Tender.METHOD_CHOICES).get(item['id'], item['id'])
+        polar_labels.append(method_display)
+        polar_values.append(float(item['total']))
+    
+    # ==========================================
+    # 10. PIE CHART - Order Status Distribution
+    # ==========================================
+    status_labels = []
+    status_counts = []
+    status_amounts = []
+    status_colors = {
+        'DRAFT': '#94A3B8',
+        'PENDING_APPROVAL': '#3B82F6',
+        'APPROVED': '#10B981',
+        'SENT': '#8B5CF6',
+        'ACKNOWLEDGED': '#EC4899',
+        'PARTIAL_DELIVERY': '#F59E0B',
+        'DELIVERED': '#22C55E',
+        'CLOSED': '#6B7280',
+        'CANCELLED': '#EF4444',
+    }
+    pie_colors = []
+    for item in cube.ranked('status', order='count'):
+        status_display = dict(PurchaseOrder.STATUS_CHOICES).get(item['id'], item['id'])
+        status_labels.append(status_display)
+        status_counts.append(item['count'])
+        status_amounts.append(float(item['total']))
+        pie_colors.append(status_colors.get(item['id'], '#64748B'))
+    
+    # ==========================================
+    # 11. TOP SPENDING ANALYSIS
+    # ==========================================
+    # Top 10 individual purchase orders
+    top_pos = [
+        {
+            'po_number': po.po_number,
+            'supplier__name': po.supplier_name,
+            'total_amount': po.amount,
+            'po_date': po.po_date,
+            'status': po.status,
+        }
+        for po in cube.top_orders(10)
+    ]
+    
+    # Average order value by department
+    dept_avg_orders = [
+        {
+            'requisition__department__name': item['name'],
+            'avg_order': item['avg'],
+            'max_order': item['max'],
+            'min_order': item['min'],
+            'count': item['count'],
+        }
+        for item in cube.ranked('department', order='avg')[:10]
+    ]
+    
+    # ==========================================
+    # 12. SAVINGS ANALYSIS
+    # ==========================================
+    # Compare requisition estimates with actual PO amounts
+    total_estimated = summary['estimated']
+    total_actual = total_spend
+    total_savings = total_estimated - total_actual
+    savings_percentage = 0
+    if total_estimated > 0:
+        savings_percentage = (total_savings / total_estimated * 100)
+    
+    # ==========================================
+    # FILTER OPTIONS
+    # ==========================================
+    departments = Department.objects.filter(is_active=True).order_by('name')
+    categories = BudgetCategory.objects.filter(is_active=True).order_by('name')
+    suppliers = Supplier.objects.filter(status='APPROVED').order_by('name')
+    
+    # ==========================================
+    # CONTEXT PREPARATION
+    # ==========================================
+    context = {
+        # Filters
+        'date_from': date_from,
+        'date_to': date_to,
+        'selected_department': selected_department,
+        'selected_category': selected_category,
+        'selected_supplier': selected_supplier,
+        'departments': departments,
+        'categories': categories,
+        'suppliers': suppliers,
+        
+        # Summary Statistics
+        'total_spend': total_spend,
+        'total_orders': summary['total_orders'],
+        'avg_order_value': summary['avg_order_value'],
+        'spend_change': round(spend_change, 2),
+        'unique_suppliers': summary['unique_suppliers'],
+        'unique_departments': summary['unique_departments'],
+        'completed_orders': summary['completed_orders'],
+        'pending_orders': summary['pending_orders'],
+        'total_savings': total_savings,
+        'savings_percentage': round(savings_percentage, 2),
+        
+        # Chart Data - JSON encoded
+        'trend_data': json.dumps({
+            'labels': trend_labels,
+            'amounts': trend_amounts,
+            'counts': trend_counts,
+            'averages': trend_averages
+        }),
+        
+        'department_data': json.dumps({
+            'labels': dept_labels,
+            'amounts': dept_amounts,
+            'counts': dept_counts,
+            'colors': dept_colors
+        }),
+        
+        'category_data': json.dumps({
+            'labels': category_labels,
+            'amounts': category_amounts,
+            'counts': category_counts
+        }),
+        
+        'supplier_data': json.dumps({
+            'labels': supplier_labels,
+            'amounts': supplier_amounts,
+            'colors': supplier_colors
+        }),
+        
+        'radar_data': json.dumps(radar_data),
+        
+        'stacked_data': json.dumps({
+            'labels': stacked_labels,
+            'goods': stacked_goods,
+            'services': stacked_services,
+            'works': stacked_works
+        }),
+        
+        'bubble_data': json.dumps(bubble_data),
+        
+        'polar_data': json.dumps({
+            'labels': polar_labels,
+            'values': polar_values,
+            'colors': polar_colors
+        }),
+        
+        'status_data': json.dumps({
+            'labels': status_labels,
+            'counts': status_counts,
+            'amounts': status_amounts,
+            'colors': pie_colors
+        }),
+        
+        # Table Data
+        'dept_spending': dept_spending,
+        'category_spending': category_spending,
+        'top_pos': top_pos,
+        'dept_avg_orders': dept_avg_orders,
+        'supplier_abc': supplier_abc,
+    }
+    
+    return render(request, 'procurement/procurement_module/spend_analysis.html', context)
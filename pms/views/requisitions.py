@@ -0,0 +1,1449 @@
+"""
+Requisition views: the requisition register, create/edit/submit, and the
+multi-stage approval workflow (pending, approved, rejected, bulk approval).
+"""
+
+import json
+from decimal import Decimal
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+from django.views.decorators.http import require_http_methods
+
+from pms.audit import record_audit
+from pms.events import approvals_changed
+from pms.models import (
+    Budget, Department, Item, Notification, Requisition, RequisitionApproval,
+    RequisitionAttachment, RequisitionItem, User,
+)
+from pms.notifications import bulk_notify, notify
+
+
+@login_required
+def requisition_list(request):
+    """List all requisitions with filters"""
+    requisitions = Requisition.objects.select_related(
+        'department', 'budget', 'requested_by'
+    ).prefetch_related('items')
+    
+    # Filters
+    status_filter = request.GET.get('status', '')
+    priority_filter = request.GET.get('priority', '')
+    department_filter = request.GET.get('department', '')
+    search_query = request.GET.get('search', '')
+    date_from = request.GET.get('date_from', '')
+    date_to = request.GET.get('date_to', '')
+    
+    if status_filter:
+        requisitions = requisitions.filter(status=status_filter)
+    
+    if priority_filter:
+        requisitions = requisitions.filter(priority=priority_filter)
+    
+    if department_filter:
+        requisitions = requisitions.filter(department_id=department_filter)
+    
+    if search_query:
+        requisitions = requisitions.filter(
+            Q(requisition_number__icontains=search_query) |
+            Q(title__icontains=search_query) |
+            Q(justification__icontains=search_query)
+        )
+    
+    if date_from:
+        requisitions = requisitions.filter(created_at__gte=date_from)
+    
+    if date_to:
+        requisitions = requisitions.filter(created_at__lte=date_to)
+    
+    # Role-based filtering
+    if request.user.role == 'STAFF':
+        requisitions = requisitions.filter(requested_by=request.user)
+    elif request.user.role == 'HOD':
+        requisitions = requisitions.filter(department=request.user.department)
+    
+    # Statistics
+    total_count = requisitions.count()
+    pending_count = requisitions.filter(status='SUBMITTED').count()
+    approved_count = requisitions.filter(status='APPROVED').count()
+    rejected_count = requisitions.filter(status='REJECTED').count()
+    total_amount = requisitions.aggregate(Sum('estimated_amount'))['estimated_amount__sum'] or 0
+    
+    # Pagination
+    paginator = Paginator(requisitions.order_by('-created_at'), 15)
+    page_number = request.GET.get('page', 1)
+    page_obj = paginator.get_page(page_number)
+    
+    # Get departments for filter
+    departments = Department.objects.filter(is_active=True).order_by('name')
+    
+    context = {
+        'requisitions': page_obj,
+        'page_obj': page_obj,
+        'departments': departments,
+        'status_filter': status_filter,
+        'priority_filter': priority_filter,
+        'department_filter': department_filter,
+        'search_query': search_query,
+        'date_from': date_from,
+        'date_to': date_to,
+        'total_count': total_count,
+        'pending_count': pending_count,
+        'approved_count': approved_count,
+        'rejected_count': rejected_count,
+        'total_amount': total_amount,
+        'status_choices': Requisition.STATUS_CHOICES,
+        'priority_choices': Requisition.PRIORITY_CHOICES,
+    }
+    
+    return render(request, 'requisitions/requisition_list.html', context)
+
+
+@login_required
+def requisition_create(request):
+    """Create new requisition"""
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                # Create requisition
+                requisition = Requisition.objects.create(
+                    title=request.POST.get('title'),
+                    department_id=request.POST.get('department'),
+                    budget_id=request.POST.get('budget') if request.POST.get('budget') else None,
+                    requested_by=request.user,
+                    justification=request.POST.get('justification'),
+                    estimated_amount=Decimal(request.POST.get('estimated_amount', 0)),
+                    required_date=request.POST.get('required_date'),
+                    priority=request.POST.get('priority', 'MEDIUM'),
+                    is_emergency=request.POST.get('is_emergency') == 'on',
+                    emergency_justification=request.POST.get('emergency_justification', ''),
+                    notes=request.POST.get('notes', ''),
+                    status='DRAFT'
+                )
+                
+                # Create requisition items
+                items_data = json.loads(request.POST.get('items_json', '[]'))
+                total_estimated = Decimal('0')
+                
+                for item_data in items_data:
+                    item = RequisitionItem.objects.create(
+                        requisition=requisition,
+                        item_id=item_data.get('item_id') if item_data.get('item_id') else None,
+                        item_description=item_data.get('description'),
+                        specifications=item_data.get('specifications', ''),
+                        quantity=Decimal(item_data.get('quantity')),
+                        unit_of_measure=item_data.get('unit'),
+                        estimated_unit_price=Decimal(item_data.get('unit_price')),
+                        notes=item_data.get('notes', '')
+                    )
+                    total_estimated += item.estimated_total
+                
+                # Update estimated amount
+                requisition.estimated_amount = total_estimated
+                requisition.save()
+                
+                # Handle file attachments
+                if request.FILES:
+                    for file_key in request.FILES:
+                        file = request.FILES[file_key]
+                        RequisitionAttachment.objects.create(
+                            requisition=requisition,
+                            attachment_type=request.POST.get(f'{file_key}_type', 'OTHER'),
+                            file_name=file.name,
+                            file=file,
+                            description=request.POST.get(f'{file_key}_description', ''),
+                            uploaded_by=request.user
+                        )
+                
+                # Create audit log
+                record_audit(
+                    user=request.user,
+                    action='CREATE',
+                    model_name='Requisition',
+                    object_id=str(requisition.id),
+                    object_repr=requisition.requisition_number,
+                    changes={'status': 'DRAFT', 'created': True}
+                )
+                
+                messages.success(request, f'Requisition {requisition.requisition_number} created successfully!')
+                
+                # Check if submit action
+                if request.POST.get('action') == 'submit':
+                    return redirect('requisition_submit', pk=requisition.id)
+                
+                return redirect('requisition_detail', pk=requisition.id)
+                
+        except Exception as e:
+            messages.error(request, f'Error creating requisition: {str(e)}')
+            return redirect('requisition_create')
+    
+    # GET request - show form
+    departments = Department.objects.filter(is_active=True).order_by('name')
+    budgets = Budget.objects.filter(is_active=True).select_related('category', 'department')
+    items = Item.objects.filter(is_active=True).select_related('category').order_by('name')
+    
+    # Filter budgets by user's department if not admin
+    if request.user.role not in ['ADMIN', 'PROCUREMENT', 'FINANCE']:
+        if request.user.department:
+            budgets = budgets.filter(department=request.user.department)
+    
+    context = {
+        'departments': departments,
+        'budgets': budgets,
+        'items': items,
+        'priority_choices': Requisition.PRIORITY_CHOICES,
+    }
+    
+    return render(request, 'requisitions/requisition_create.html', context)
+
+
+@login_required
+def requisition_detail(request, pk):
+    """View requisition details"""
+    requisition = get_object_or_404(
+        Requisition.objects.select_related(
+            'department', 'budget', 'requested_by'
+        ).prefetch_related(
+            'items__item',
+            'attachments',
+            'approvals__approver',
+            'purchase_orders'
+        ),
+        pk=pk
+    )
+    
+    # Check permissions
+    can_edit = False
+    can_approve = False
+    can_submit = False
+    
+    # Debug info
+    debug_info = {
+        'user_role': request.user.role,
+        'user_dept': request.user.department.name if request.user.department else 'None',
+        'req_status': requisition.status,
+        'req_dept': requisition.department.name,
+        'is_requester': request.user == requisition.requested_by,
+    }
+    
+    # ADMIN can do everything
+    if request.user.role == 'ADMIN':
+        can_edit = True
+        can_approve = requisition.status == 'PROCUREMENT_APPROVED'
+        debug_info['approve_reason'] = f'User is ADMIN, status is {requisition.status}, can_approve={can_approve}'
+    
+    # Requester can edit and submit drafts
+    elif request.user == requisition.requested_by and requisition.status == 'DRAFT':
+        can_edit = True
+        can_submit = True
+        debug_info['approve_reason'] = 'User is requester, status is DRAFT'
+    
+    # HOD can approve submitted requisitions from their department
+    elif request.user.role == 'HOD' and request.user.department == requisition.department:
+        can_approve = requisition.status == 'SUBMITTED'
+        debug_info['approve_reason'] = f'User is HOD, status is {requisition.status}, can_approve={can_approve}'
+    
+    # PROCUREMENT can approve any HOD_APPROVED requisition (no department restriction)
+    elif request.user.role == 'PROCUREMENT':
+        can_approve = requisition.status == 'HOD_APPROVED'
+        debug_info['approve_reason'] = f'User is PROCUREMENT, status is {requisition.status}, can_approve={can_approve}'
+    
+    else:
+        debug_info['approve_reason'] = 'No matching approval condition'
+    
+    # Get approval history
+    approvals = requisition.approvals.all().order_by('sequence')
+    
+    # Calculate totals
+    items_total = requisition.items.aggregate(Sum('estimated_total'))['estimated_total__sum'] or 0
+    
+    context = {
+        'requisition': requisition,
+        'can_edit': can_edit,
+        'can_approve': can_approve,
+        'can_submit': can_submit,
+        'approvals': approvals,
+        'items_total': items_total,
+        'debug_info': debug_info,
+    }
+    
+    return render(request, 'requisitions/requisition_detail.html', context)
+
+
+@login_required
+def requisition_approve(request, pk):
+    """Approve a requisition"""
+    requisition = get_object_or_404(Requisition, pk=pk)
+    
+    # Determine next status based on current user role
+    if request.user.role == 'HOD':
+        if requisition.status != 'SUBMITTED':
+            messages.error(request, 'This requisition cannot be approved at this stage.')
+            return redirect('requisition_detail', pk=pk)
+        
+        # Update status
+        requisition.status = 'HOD_APPROVED'
+        
+        # Create or update approval record
+        approval, created = RequisitionApproval.objects.get_or_create(
+            requisition=requisition,
+            approval_stage='HOD',
+            defaults={
+                'approver': request.user,
+                'sequence': 1
+            }
+        )
+        approval.status = 'APPROVED'
+        approval.approval_date = timezone.now()
+        approval.approver = request.user
+        approval.save()
+        
+        messages.success(request, 'Requisition approved as HOD.')
+        
+    elif request.user.role == 'PROCUREMENT':
+        if requisition.status != 'HOD_APPROVED':
+            messages.error(request, 'This requisition cannot be approved at this stage.')
+            return redirect('requisition_detail', pk=pk)
+        
+        # Update status
+        requisition.status = 'PROCUREMENT_APPROVED'
+        
+        # Create or update approval record
+        approval, created = RequisitionApproval.objects.get_or_create(
+            requisition=requisition,
+            approval_stage='PROCUREMENT',
+            defaults={
+                'approver': request.user,
+                'sequence': 2
+            }
+        )
+        approval.status = 'APPROVED'
+        approval.approval_date = timezone.now()
+        approval.approver = request.user
+        approval.save()
+        
+        messages.success(request, 'Requisition approved as Procurement Officer.')
+        
+    elif request.user.role == 'ADMIN':
+        if requisition.status != 'PROCUREMENT_APPROVED':
+            messages.error(request, 'This requisition cannot be approved at this stage.')
+            return redirect('requisition_detail', pk=pk)
+        
+        # Final approval
+        requisition.status = 'APPROVED'
+        
+        # Create or update approval record
+        approval, created = RequisitionApproval.objects.get_or_create(
+            requisition=requisition,
+            approval_stage='FINAL',
+            defaults={
+                'approver': request.user,
+                'sequence': 3
+            }
+        )
+        approval.status = 'APPROVED'
+        approval.approval_date = timezone.now()
+        approval.approver = request.user
+        approval.save()
+        
+        messages.success(request, 'Requisition fully approved! Ready for procurement.')
+        
+    else:
+        messages.error(request, 'You do not have permission to approve this requisition.')
+        return redirect('requisition_detail', pk=pk)
+    
+    # Save the requisition
+    requisition.save()
+    
+    # Create notification for next approver or requester
+    if requisition.status == 'APPROVED':
+        notify(
+            requisition.requested_by,
+            notification_type='APPROVAL',
+            priority='HIGH',
+            title='Requisition Fully Approved',
+            message=f'Your requisition {requisition.requisition_number} has been fully approved.',
+            link_url=f'/requisitions/{requisition.id}/'
+        )
+    
+    return redirect('requisition_detail', pk=pk)
+
+@login_required
+def requisition_update(request, pk):
+    """Update requisition"""
+    requisition = get_object_or_404(Requisition, pk=pk)
+    
+    # Check permissions
+    if requisition.status != 'DRAFT' and request.user.role != 'ADMIN':
+        messages.error(request, 'You can only edit draft requisitions.')
+        return redirect('requisition_detail', pk=pk)
+    
+    if requisition.requested_by != request.user and request.user.role != 'ADMIN':
+        messages.error(request, 'You do not have permission to edit this requisition.')
+        return redirect('requisition_detail', pk=pk)
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                # Store old values for audit
+                old_values = {
+                    'title': requisition.title,
+                    'estimated_amount': str(requisition.estimated_amount),
+                    'status': requisition.status
+                }
+                
+                # Update requisition
+                requisition.title = request.POST.get('title')
+                requisition.department_id = request.POST.get('department')
+                requisition.budget_id = request.POST.get('budget') if request.POST.get('budget') else None
+                requisition.justification = request.POST.get('justification')
+                requisition.required_date = request.POST.get('required_date')
+                requisition.priority = request.POST.get('priority', 'MEDIUM')
+                requisition.is_emergency = request.POST.get('is_emergency') == 'on'
+                requisition.emergency_justification = request.POST.get('emergency_justification', '')
+                requisition.notes = request.POST.get('notes', '')
+                
+                # Delete existing items
+                requisition.items.all().delete()
+                
+                # Create new items
+                items_data = json.loads(request.POST.get('items_json', '[]'))
+                total_estimated = Decimal('0')
+                
+                for item_data in items_data:
+                    item = RequisitionItem.objects.create(
+                        requisition=requisition,
+                        item_id=item_data.get('item_id') if item_data.get('item_id') else None,
+                        item_description=item_data.get('description'),
+                        specifications=item_data.get('specifications', ''),
+                        quantity=Decimal(item_data.get('quantity')),
+                        unit_of_measure=item_data.get('unit'),
+                        estimated_unit_price=Decimal(item_data.get('unit_price')),
+                        notes=item_data.get('notes', '')
+                    )
+                    total_estimated += item.estimated_total
+                
+                requisition.estimated_amount = total_estimated
+                requisition.save()
+                
+                # Handle new attachments
+                if request.FILES:
+                    for file_key in request.FILES:
+                        file = request.FILES[file_key]
+                        RequisitionAttachment.objects.create(
+                            requisition=requisition,
+                            attachment_type=request.POST.get(f'{file_key}_type', 'OTHER'),
+                            file_name=file.name,
+                            file=file,
+                            description=request.POST.get(f'{file_key}_description', ''),
+                            uploaded_by=request.user
+                        )
+                
+                # Create audit log
+                new_values = {
+                    'title': requisition.title,
+                    'estimated_amount': str(requisition.estimated_amount),
+                    'status': requisition.status
+                }
+                
+                record_audit(
+                    user=request.user,
+                    action='UPDATE',
+                    model_name='Requisition',
+                    object_id=str(requisition.id),
+                    object_repr=requisition.requisition_number,
+                    changes={'old': old_values, 'new': new_values}
+                )
+                
+                messages.success(request, f'Requisition {requisition.requisition_number} updated successfully!')
+                return redirect('requisition_detail', pk=pk)
+                
+        except Exception as e:
+            messages.error(request, f'Error updating requisition: {str(e)}')
+    
+    # GET request
+    departments = Department.objects.filter(is_active=True).order_by('name')
+    budgets = Budget.objects.filter(is_active=True).select_related('category', 'department')
+    items = Item.objects.filter(is_active=True).select_related('category').order_by('name')
+    
+    context = {
+        'requisition': requisition,
+        'departments': departments,
+        'budgets': budgets,
+        'items': items,
+        'priority_choices': Requisition.PRIORITY_CHOICES,
+    }
+    
+    return render(request, 'requisitions/requisition_update.html', context)
+
+
+@login_required
+def requisition_delete(request, pk):
+    """Delete requisition"""
+    requisition = get_object_or_404(Requisition, pk=pk)
+    
+    # Check permissions
+    if requisition.status != 'DRAFT' and request.user.role != 'ADMIN':
+        messages.error(request, 'You can only delete draft requisitions.')
+        return redirect('requisition_detail', pk=pk)
+    
+    if requisition.requested_by != request.user and request.user.role != 'ADMIN':
+        messages.error(request, 'You do not have permission to delete this requisition.')
+        return redirect('requisition_detail', pk=pk)
+    
+    if request.method == 'POST':
+        req_number = requisition.requisition_number
+        
+        # Create audit log before deletion
+        record_audit(
+            user=request.user,
+            action='DELETE',
+            model_name='Requisition',
+            object_id=str(requisition.id),
+            object_repr=req_number,
+            changes={'deleted': True}
+        )
+        
+        requisition.delete()
+        messages.success(request, f'Requisition {req_number} deleted successfully!')
+        return redirect('requisition_list')
+    
+    return render(request, 'requisitions/requisition_delete.html', {'requisition': requisition})
+
+
+@login_required
+def requisition_submit(request, pk):
+    """Submit requisition for approval"""
+    requisition = get_object_or_404(Requisition, pk=pk)
+    
+    # Check permissions
+    if requisition.requested_by != request.user and request.user.role != 'ADMIN':
+        messages.error(request, 'You do not have permission to submit this requisition.')
+        return redirect('requisition_detail', pk=pk)
+    
+    if requisition.status != 'DRAFT':
+        messages.error(request, 'Only draft requisitions can be submitted.')
+        return redirect('requisition_detail', pk=pk)
+    
+    if not requisition.items.exists():
+        messages.error(request, 'Cannot submit requisition without items.')
+        return redirect('requisition_detail', pk=pk)
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                # Update status
+                requisition.status = 'SUBMITTED'
+                requisition.submitted_at = timezone.now()
+                requisition.save()
+                
+                # Create approval workflow
+                sequence = 1
+                
+                # HOD Approval
+                if requisition.department.hod:
+                    RequisitionApproval.objects.create(
+                        requisition=requisition,
+                        approval_stage='HOD',
+                        approver=requisition.department.hod,
+                        sequence=sequence
+                    )
+                    sequence += 1
+                    
+                    # Create notification
+                    notify(
+                        requisition.department.hod,
+                        notification_type='APPROVAL',
+                        priority='HIGH',
+                        title='Requisition Pending Approval',
+                        message=f'Requisition {requisition.requisition_number} requires your approval.',
+                        link_url=f'/requisitions/{requisition.id}/'
+                    )
+                
+                # Budget approval
+                finance_users = User.objects.filter(role='FINANCE', is_active=True).first()
+                if finance_users:
+                    RequisitionApproval.objects.create(
+                        requisition=requisition,
+                        approval_stage='BUDGET',
+                        approver=finance_users,
+                        sequence=sequence
+                    )
+                    sequence += 1
+                
+                # Procurement approval
+                procurement_users = User.objects.filter(role='PROCUREMENT', is_active=True).first()
+                if procurement_users:
+                    RequisitionApproval.objects.create(
+                        requisition=requisition,
+                        approval_stage='PROCUREMENT',
+                        approver=procurement_users,
+                        sequence=sequence
+                    )
+                
+                approvals_changed(requisition)
+                
+                # Create audit log
+                record_audit(
+                    user=request.user,
+                    action='SUBMIT',
+                    model_name='Requisition',
+                    object_id=str(requisition.id),
+                    object_repr=requisition.requisition_number,
+                    changes={'status': 'SUBMITTED'}
+                )
+                
+                messages.success(request, f'Requisition {requisition.requisition_number} submitted for approval!')
+                return redirect('requisition_detail', pk=pk)
+                
+        except Exception as e:
+            messages.error(request, f'Error submitting requisition: {str(e)}')
+    
+    return render(request, 'requisitions/requisition_submit.html', {'requisition': requisition})
+
+
+@login_required
+def pending_requisitions(request):
+    """View pending requisitions for approval"""
+    requisitions = Requisition.objects.none()
+    
+    # Get requisitions based on user role
+    if request.user.role == 'HOD':
+        requisitions = Requisition.objects.filter(
+            department=request.user.department,
+            status='SUBMITTED'
+        ).select_related('department', 'requested_by')
+    
+    elif request.user.role == 'FINANCE':
+        requisitions = Requisition.objects.filter(
+            status__in=['HOD_APPROVED', 'FACULTY_APPROVED']
+        ).select_related('department', 'requested_by')
+    
+    elif request.user.role == 'PROCUREMENT':
+        requisitions = Requisition.objects.filter(
+            status__in=['HOD_APPROVED', 'FACULTY_APPROVED', 'BUDGET_APPROVED']
+        ).select_related('department', 'requested_by')
+    
+    elif request.user.role == 'ADMIN':
+        requisitions = Requisition.objects.filter(
+            status__in=['SUBMITTED', 'HOD_APPROVED', 'FACULTY_APPROVED', 'BUDGET_APPROVED']
+        ).select_related('department', 'requested_by')
+    
+    # Pagination
+    paginator = Paginator(requisitions.order_by('-created_at'), 15)
+    page_number = request.GET.get('page', 1)
+    page_obj = paginator.get_page(page_number)
+    
+    total_count = requisitions.count()
+    total_amount = requisitions.aggregate(Sum('estimated_amount'))['estimated_amount__sum'] or 0
+    
+    context = {
+        'requisitions': page_obj,
+        'page_obj': page_obj,
+        'total_count': total_count,
+        'total_amount': total_amount,
+    }
+    
+    return render(request, 'requisitions/pending_requisitions.html', context)
+
+
+# API Views
+@login_required
+def get_budget_info(request, budget_id):
+    """API: Get budget information"""
+    try:
+        budget = Budget.objects.select_related('category', 'department').get(id=budget_id)
+        return JsonResponse({
+            'success': True,
+            'data': {
+                'id': str(budget.id),
+                'category': budget.category.name,
+                'allocated_amount': float(budget.allocated_amount),
+                'available_balance': float(budget.available_balance),
+                'department': budget.department.name
+            }
+        })
+    except Budget.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Budget not found'}, status=404)
+
+
+@login_required
+def get_item_info(request, item_id):
+    """API: Get item information"""
+    try:
+        item = Item.objects.select_related('category').get(id=item_id)
+        return JsonResponse({
+            'success': True,
+            'data': {
+                'id': str(item.id),
+                'name': item.name,
+                'code': item.code,
+                'description': item.description,
+                'unit_of_measure': item.unit_of_measure,
+                'standard_price': float(item.standard_price) if item.standard_price else None,
+                'specifications': item.specifications,
+                'category': item.category.name
+            }
+        })
+    except Item.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Item not found'}, status=404)
+
+
+@login_required
+def delete_attachment(request, attachment_id):
+    """API: Delete requisition attachment"""
+    try:
+        attachment = get_object_or_404(RequisitionAttachment, id=attachment_id)
+        requisition = attachment.requisition
+        
+        # Check permissions
+        if requisition.requested_by != request.user and request.user.role != 'ADMIN':
+            return JsonResponse({'success': False, 'error': 'Permission denied'}, status=403)
+        
+        if requisition.status != 'DRAFT':
+            return JsonResponse({'success': False, 'error': 'Can only delete attachments from draft requisitions'}, status=400)
+        
+        attachment.delete()
+        return JsonResponse({'success': True, 'message': 'Attachment deleted successfully'})
+        
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+# ============================================================================
+# HELPER FUNCTIONS
+# ============================================================================
+
+def get_user_approval_stage(user):
+    """Get the approval stage based on user role"""
+    role_to_stage = {
+        'HOD': 'HOD',
+        'FINANCE': 'BUDGET',
+        'PROCUREMENT': 'PROCUREMENT',
+    }
+    return role_to_stage.get(user.role)
+
+
+def can_approve_stage(user, approval_stage):
+    """Check if user can approve at a specific stage"""
+    if user.role == 'ADMIN':
+        return True  # Admin can approve at all levels
+    
+    if user.role == 'HOD' and approval_stage == 'HOD':
+        return True
+    
+    if user.role == 'FINANCE' and approval_stage == 'BUDGET':
+        return True
+    
+    if user.role == 'PROCUREMENT' and approval_stage == 'PROCUREMENT':
+        return True
+    
+    return False
+
+
+def get_pending_approvals_for_user(user):
+    """Get all pending approvals for a specific user"""
+    if user.role == 'ADMIN':
+        # Admin can see all pending approvals
+        return RequisitionApproval.objects.filter(
+            status='PENDING'
+        ).select_related('requisition', 'approver')
+    
+    # Get approvals where user is the approver
+    return RequisitionApproval.objects.filter(
+        approver=user,
+        status='PENDING'
+    ).select_related('requisition')
+
+
+def check_budget_availability(requisition):
+    """Check if budget is available for requisition"""
+    if not requisition.budget:
+        return {
+            'available': False,
+            'message': 'No budget line assigned',
+            'details': None
+        }
+    
+    budget = requisition.budget
+    available = budget.available_balance
+    required = requisition.estimated_amount
+    
+    if available >= required:
+        return {
+            'available': True,
+            'message': 'Sufficient budget available',
+            'details': {
+                'allocated': float(budget.allocated_amount),
+                'committed': float(budget.committed_amount),
+                'spent': float(budget.actual_spent),
+                'available': float(available),
+                'required': float(required),
+                'balance_after': float(available - required)
+            }
+        }
+    else:
+        return {
+            'available': False,
+            'message': f'Insufficient budget. Available: {available}, Required: {required}',
+            'details': {
+                'allocated': float(budget.allocated_amount),
+                'committed': float(budget.committed_amount),
+                'spent': float(budget.actual_spent),
+                'available': float(available),
+                'required': float(required),
+                'shortfall': float(required - available)
+            }
+        }
+
+
+# ============================================================================
+# API ENDPOINTS
+# ============================================================================
+
+@login_required
+@require_http_methods(["GET"])
+def api_approval_stats(request):
+    """API endpoint to get approval statistics"""
+    user = request.user
+    
+    if user.role == 'ADMIN':
+        pending = RequisitionApproval.objects.filter(status='PENDING').count()
+        approved = RequisitionApproval.objects.filter(status='APPROVED').count()
+        rejected = RequisitionApproval.objects.filter(status='REJECTED').count()
+    else:
+        pending = RequisitionApproval.objects.filter(
+            approver=user, 
+            status='PENDING'
+        ).count()
+        approved = RequisitionApproval.objects.filter(
+            approver=user, 
+            status='APPROVED'
+        ).count()
+        rejected = RequisitionApproval.objects.filter(
+            approver=user, 
+            status='REJECTED'
+        ).count()
+    
+    return JsonResponse({
+        'success': True,
+        'data': {
+            'pending': pending,
+            'approved': approved,
+            'rejected': rejected,
+            'total': pending + approved + rejected
+        }
+    })
+
+
+@login_required
+@require_http_methods(["GET"])
+def api_check_budget(request, requisition_id):
+    """API endpoint to check budget availability"""
+    requisition = get_object_or_404(Requisition, pk=requisition_id)
+    
+    # Check permissions
+    if not can_approve_stage(request.user, 'BUDGET') and request.user.role != 'ADMIN':
+        return JsonResponse({
+            'success': False,
+            'message': 'You do not have permission to check budget'
+        }, status=403)
+    
+    result = check_budget_availability(requisition)
+    
+    return JsonResponse({
+        'success': True,
+        'data': result
+    })
+
+
+@login_required
+@require_http_methods(["GET"])
+def api_approval_details(request, approval_id):
+    """API endpoint to get approval details"""
+    approval = get_object_or_404(RequisitionApproval, pk=approval_id)
+    
+    # Check permissions
+    if approval.approver != request.user and request.user.role != 'ADMIN':
+        return JsonResponse({
+            'success': False,
+            'message': 'You do not have permission to view this approval'
+        }, status=403)
+    
+    requisition = approval.requisition
+    
+    data = {
+        'approval': {
+            'id': str(approval.id),
+            'stage': approval.approval_stage,
+            'stage_display': approval.get_approval_stage_display(),
+            'status': approval.status,
+            'approver': approval.approver.get_full_name(),
+            'comments': approval.comments,
+            'sequence': approval.sequence,
+            'created_at': approval.created_at.isoformat(),
+        },
+        'requisition': {
+            'id': str(requisition.id),
+            'number': requisition.requisition_number,
+            'title': requisition.title,
+            'department': requisition.department.name,
+            'requested_by': requisition.requested_by.get_full_name(),
+            'amount': float(requisition.estimated_amount),
+            'priority': requisition.priority,
+            'status': requisition.status,
+            'items_count': requisition.items.count(),
+        }
+    }
+    
+    # Add budget check if Finance/Budget stage
+    if approval.approval_stage == 'BUDGET':
+        data['budget_check'] = check_budget_availability(requisition)
+    
+    return JsonResponse({
+        'success': True,
+        'data': data
+    })
+
+
+# ============================================================================
+# PENDING APPROVALS VIEW
+# ============================================================================
+
+@login_required
+def pending_approvals(request):
+    """Display pending approvals for the user"""
+    user = request.user
+    
+    # Get pending approvals based on role
+    if user.role == 'ADMIN':
+        approvals_list = RequisitionApproval.objects.filter(
+            status='PENDING',
+            requisition__status__in=['SUBMITTED', 'HOD_APPROVED', 'BUDGET_APPROVED', 'PROCUREMENT_APPROVED']
+        ).select_related(
+            'requisition', 
+            'requisition__department', 
+            'requisition__requested_by',
+            'approver'
+        ).order_by('-created_at')
+    else:
+        approvals_list = RequisitionApproval.objects.filter(
+            approver=user,
+            status='PENDING',
+            requisition__status__in=['SUBMITTED', 'HOD_APPROVED', 'BUDGET_APPROVED', 'PROCUREMENT_APPROVED']
+        ).select_related(
+            'requisition', 
+            'requisition__department', 
+            'requisition__requested_by'
+        ).order_by('-created_at')
+    
+    # Filters
+    priority = request.GET.get('priority')
+    department = request.GET.get('department')
+    stage = request.GET.get('stage')
+    
+    if priority:
+        approvals_list = approvals_list.filter(requisition__priority=priority)
+    
+    if department:
+        approvals_list = approvals_list.filter(requisition__department_id=department)
+    
+    if stage:
+        approvals_list = approvals_list.filter(approval_stage=stage)
+    
+    # Pagination
+    paginator = Paginator(approvals_list, 20)
+    page_number = request.GET.get('page')
+    approvals = paginator.get_page(page_number)
+    
+    # Get filter options
+    departments = Department.objects.filter(is_active=True).order_by('name')
+    
+    # Calculate statistics
+    total_pending = approvals_list.count()
+    urgent_count = approvals_list.filter(requisition__priority='URGENT').count()
+    high_count = approvals_list.filter(requisition__priority='HIGH').count()
+    total_amount = approvals_list.aggregate(
+        total=Sum('requisition__estimated_amount')
+    )['total'] or 0
+    
+    context = {
+        'approvals': approvals,
+        'departments': departments,
+        'selected_priority': priority,
+        'selected_department': department,
+        'selected_stage': stage,
+        'total_pending': total_pending,
+        'urgent_count': urgent_count,
+        'high_count': high_count,
+        'total_amount': total_amount,
+        'user_role': user.role,
+    }
+    
+    return render(request, 'approvals/pending_approvals.html', context)
+
+
+# ============================================================================
+# APPROVED REQUISITIONS VIEW
+# ============================================================================
+
+@login_required
+def approved_requisitions(request):
+    """Display approved requisitions"""
+    user = request.user
+    
+    # Get approved items based on role
+    if user.role == 'ADMIN':
+        approvals_list = RequisitionApproval.objects.filter(
+            status='APPROVED'
+        ).select_related(
+            'requisition', 
+            'requisition__department', 
+            'requisition__requested_by',
+            'approver'
+        ).order_by('-approval_date')
+    else:
+        approvals_list = RequisitionApproval.objects.filter(
+            approver=user,
+            status='APPROVED'
+        ).select_related(
+            'requisition', 
+            'requisition__department', 
+            'requisition__requested_by'
+        ).order_by('-approval_date')
+    
+    # Filters
+    date_from = request.GET.get('date_from')
+    date_to = request.GET.get('date_to')
+    department = request.GET.get('department')
+    
+    if date_from:
+        approvals_list = approvals_list.filter(approval_date__gte=date_from)
+    
+    if date_to:
+        approvals_list = approvals_list.filter(approval_date__lte=date_to)
+    
+    if department:
+        approvals_list = approvals_list.filter(requisition__department_id=department)
+    
+    # Pagination
+    paginator = Paginator(approvals_list, 20)
+    page_number = request.GET.get('page')
+    approvals = paginator.get_page(page_number)
+    
+    # Get filter options
+    departments = Department.objects.filter(is_active=True).order_by('name')
+    
+    # Calculate statistics
+    total_approved = approvals_list.count()
+    total_amount = approvals_list.aggregate(
+        total=Sum('requisition__estimated_amount')
+    )['total'] or 0
+    
+    context = {
+        'approvals': approvals,
+        'departments': departments,
+        'selected_department': department,
+        'date_from': date_from,
+        'date_to': date_to,
+        'total_approved': total_approved,
+        'total_amount': total_amount,
+        'user_role': user.role,
+    }
+    
+    return render(request, 'approvals/approved_requisitions.html', context)
+
+
+# ============================================================================
+# REJECTED REQUISITIONS VIEW
+# ============================================================================
+
+@login_required
+def rejected_requisitions(request):
+    """Display rejected requisitions"""
+    user = request.user
+    
+    # Get rejected items based on role
+    if user.role == 'ADMIN':
+        approvals_list = RequisitionApproval.objects.filter(
+            status='REJECTED'
+        ).select_related(
+            'requisition', 
+            'requisition__department', 
+            'requisition__requested_by',
+            'approver'
+        ).order_by('-approval_date')
+    else:
+        approvals_list = RequisitionApproval.objects.filter(
+            approver=user,
+            status='REJECTED'
+        ).select_related(
+            'requisition', 
+            'requisition__department', 
+            'requisition__requested_by'
+        ).order_by('-approval_date')
+    
+    # Filters
+    date_from = request.GET.get('date_from')
+    date_to = request.GET.get('date_to')
+    department = request.GET.get('department')
+    
+    if date_from:
+        approvals_list = approvals_list.filter(approval_date__gte=date_from)
+    
+    if date_to:
+        approvals_list = approvals_list.filter(approval_date__lte=date_to)
+    
+    if department:
+        approvals_list = approvals_list.filter(requisition__department_id=department)
+    
+    # Pagination
+    paginator = Paginator(approvals_list, 20)
+    page_number = request.GET.get('page')
+    approvals = paginator.get_page(page_number)
+    
+    # Get filter options
+    departments = Department.objects.filter(is_active=True).order_by('name')
+    
+    # Calculate statistics
+    total_rejected = approvals_list.count()
+    
+    context = {
+        'approvals': approvals,
+        'departments': departments,
+        'selected_department': department,
+        'date_from': date_from,
+        'date_to': date_to,
+        'total_rejected': total_rejected,
+        'user_role': user.role,
+    }
+    
+    return render(request, 'approvals/rejected_requisitions.html', context)
+
+
+# ============================================================================
+# APPROVAL DETAIL & ACTION VIEW
+# ============================================================================
+
+@login_required
+def approval_detail(request, approval_id):
+    """Display approval detail and handle approval/rejection"""
+    approval = get_object_or_404(
+        RequisitionApproval.objects.select_related(
+            'requisition',
+            'requisition__department',
+            'requisition__requested_by',
+            'requisition__budget',
+            'approver'
+        ),
+        pk=approval_id
+    )
+    
+    requisition = approval.requisition
+    
+    # Check permissions
+    if approval.approver != request.user and request.user.role != 'ADMIN':
+        messages.error(request, 'You do not have permission to view this approval.')
+        return redirect('pending_approvals')
+    
+    # Check if user can approve this stage
+    can_approve = can_approve_stage(request.user, approval.approval_stage)
+    
+    # Get budget check if finance stage
+    budget_check = None
+    if approval.approval_stage == 'BUDGET':
+        budget_check = check_budget_availability(requisition)
+    
+    # Get all approvals for this requisition
+    all_approvals = requisition.approvals.all().order_by('sequence')
+    
+    # Get requisition items
+    items = requisition.items.all()
+    items_total = sum(item.estimated_total for item in items)
+    
+    context = {
+        'approval': approval,
+        'requisition': requisition,
+        'can_approve': can_approve,
+        'budget_check': budget_check,
+        'all_approvals': all_approvals,
+        'items': items,
+        'items_total': items_total,
+    }
+    
+    return render(request, 'approvals/approval_detail.html', context)
+
+
+@login_required
+def process_approval(request, requisition_id):
+    """Process single or bulk approval/rejection"""
+    requisition = get_object_or_404(Requisition, pk=requisition_id)
+    
+    # Get pending approvals for this user
+    pending_approvals = RequisitionApproval.objects.filter(
+        requisition=requisition,
+        status='PENDING'
+    ).order_by('sequence')
+    
+    # Check if user is admin and can bulk approve
+    is_admin = request.user.role == 'ADMIN'
+    can_bulk_approve = is_admin and pending_approvals.exists()
+    
+    if request.method == 'GET':
+        # Show approval form
+        context = {
+            'requisition': requisition,
+            'pending_approvals': pending_approvals,
+            'can_bulk_approve': can_bulk_approve,
+            'is_admin': is_admin,
+        }
+        return render(request, 'procurement/process_approval.html', context)
+    
+    elif request.method == 'POST':
+        action = request.POST.get('action')  # 'approve' or 'reject'
+        comments = request.POST.get('comments', '')
+        bulk_approve = request.POST.get('bulk_approve') == 'true'
+        
+        if action not in ['approve', 'reject']:
+            messages.error(request, 'Invalid action.')
+            return redirect('requisition_detail', pk=requisition_id)
+        
+        try:
+            with transaction.atomic():
+                # Bulk approval for admin
+                if bulk_approve and is_admin and action == 'approve':
+                    approved_count = 0
+                    
+                    for approval in pending_approvals:
+                        # For budget stage, check availability
+                        if approval.approval_stage == 'BUDGET':
+                            budget_check = check_budget_availability(requisition)
+                            if not budget_check['available']:
+                                messages.error(request, f"Budget check failed: {budget_check['message']}")
+                                raise Exception("Insufficient budget")
+                        
+                        # Approve this stage
+                        approval.status = 'APPROVED'
+                        approval.approver = request.user
+                        approval.comments = comments or f'Bulk approved by {request.user.get_full_name()}'
+                        approval.approval_date = timezone.now()
+                        approval.save()
+                        approved_count += 1
+                        
+                        # Create audit log
+                        record_audit(
+                            user=request.user,
+                            action='APPROVE',
+                            model_name='RequisitionApproval',
+                            object_id=str(approval.id),
+                            object_repr=f'{requisition.requisition_number} - {approval.get_approval_stage_display()}',
+                            changes={
+                                'status': 'APPROVED',
+                                'comments': approval.comments,
+                                'bulk_approved': True
+                            }
+                        )
+                    
+                    # Update requisition to fully approved
+                    requisition.status = 'APPROVED'
+                    requisition.save()
+                    
+                    # Notify requester
+                    notify(
+                        requisition.requested_by,
+                        notification_type='APPROVAL',
+                        priority='HIGH',
+                        title='Requisition Fully Approved',
+                        message=f'Your requisition {requisition.requisition_number} has been fully approved (bulk approval).',
+                        link_url=f'/requisitions/{requisition.id}/'
+                    )
+                    
+                    messages.success(request, f'Requisition {requisition.requisition_number} has been fully approved ({approved_count} stages).')
+                
+                else:
+                    # Single approval
+                    approval_id = request.POST.get('approval_id')
+                    if not approval_id:
+                        messages.error(request, 'No approval ID provided.')
+                        return redirect('requisition_detail', pk=requisition_id)
+                    
+                    approval = get_object_or_404(RequisitionApproval, pk=approval_id)
+                    
+                    if approval.status != 'PENDING':
+                        messages.error(request, 'This approval has already been processed.')
+                        return redirect('requisition_detail', pk=requisition_id)
+                    
+                    # For budget stage, check budget availability
+                    if approval.approval_stage == 'BUDGET' and action == 'approve':
+                        budget_check = check_budget_availability(requisition)
+                        if not budget_check['available']:
+                            messages.error(request, f"Budget check failed: {budget_check['message']}")
+                            return redirect('process_approval', requisition_id=requisition_id)
+                    
+                    # Update approval
+                    approval.status = 'APPROVED' if action == 'approve' else 'REJECTED'
+                    approval.approver = request.user
+                    approval.comments = comments
+                    approval.approval_date = timezone.now()
+                    approval.save()
+                    
+                    # If rejected, update requisition
+                    if action == 'reject':
+                        requisition.status = 'REJECTED'
+                        requisition.rejection_reason = comments
+                        requisition.save()
+                    else:
+                        # Update requisition status based on workflow
+                        update_requisition_status(requisition)
+                    
+                    # Notify requester
+                    notify(
+                        requisition.requested_by,
+                        notification_type='APPROVAL',
+                        priority='HIGH',
+                        title=f'Requisition {action.title()}d',
+                        message=f'Your requisition {requisition.requisition_number} has been {action}d at {approval.get_approval_stage_display()} stage.',
+                        link_url=f'/requisitions/{requisition.id}/'
+                    )
+                    
+                    # Create audit log
+                    record_audit(
+                        user=request.user,
+                        action='APPROVE' if action == 'approve' else 'REJECT',
+                        model_name='RequisitionApproval',
+                        object_id=str(approval.id),
+                        object_repr=f'{requisition.requisition_number} - {approval.get_approval_stage_display()}',
+                        changes={
+                            'status': approval.status,
+                            'comments': comments
+                        }
+                    )
+                    
+                    messages.success(request, f'Requisition {requisition.requisition_number} has been {action}d successfully.')
+                
+                return redirect('requisition_detail', pk=requisition_id)
+                
+        except Exception as e:
+            messages.error(request, f'Error processing approval: {str(e)}')
+            return redirect('process_approval', requisition_id=requisition_id)
+
+
+def update_requisition_status(requisition):
+    """Update requisition status based on approval workflow"""
+    approvals = RequisitionApproval.objects.filter(
+        requisition=requisition
+    ).order_by('sequence')
+    
+    # Check if all approved
+    if all(approval.status == 'APPROVED' for approval in approvals):
+        requisition.status = 'APPROVED'
+    # Check for any rejections
+    elif any(approval.status == 'REJECTED' for approval in approvals):
+        requisition.status = 'REJECTED'
+    # Otherwise, update to current stage
+    else:
+        for approval in approvals:
+            if approval.status == 'APPROVED':
+                # Map approval stage to requisition status
+                status_map = {
+                    'HOD': 'HOD_APPROVED',
+                    'FACULTY': 'FACULTY_APPROVED',
+                    'BUDGET': 'BUDGET_APPROVED',
+                    'PROCUREMENT': 'PROCUREMENT_APPROVED',
+                }
+                requisition.status = status_map.get(approval.approval_stage, requisition.status)
+            elif approval.status == 'PENDING':
+                break  # Stop at first pending
+    
+    requisition.save()
+    approvals_changed(requisition)
+
+
+# ============================================================================
+# BULK APPROVAL ACTION
+# ============================================================================
+
+@login_required
+@require_http_methods(["POST"])
+def bulk_approve(request):
+    """Bulk approve multiple requisitions"""
+    if request.user.role != 'ADMIN':
+        return JsonResponse({
+            'success': False,
+            'message': 'Only administrators can perform bulk approvals.'
+        }, status=403)
+    
+    approval_ids = request.POST.getlist('approval_ids[]')
+    comments = request.POST.get('comments', 'Bulk approval')
+    
+    if not approval_ids:
+        return JsonResponse({
+            'success': False,
+            'message': 'No approvals selected.'
+        }, status=400)
+    
+    approved_count = 0
+    failed_count = 0
+    errors = []
+    pending_notifications = []
+    
+    for approval_id in approval_ids:
+        try:
+            with transaction.atomic():
+                approval = RequisitionApproval.objects.select_for_update().get(
+                    pk=approval_id,
+                    status='PENDING'
+                )
+                
+                requisition = approval.requisition
+                
+                # Check budget if needed
+                if approval.approval_stage == 'BUDGET':
+                    budget_check = check_budget_availability(requisition)
+                    if not budget_check['available']:
+                        failed_count += 1
+                        errors.append(f'{requisition.requisition_number}: {budget_check["message"]}')
+                        continue
+                
+                # Approve
+                approval.status = 'APPROVED'
+                approval.comments = comments
+                approval.approval_date = timezone.now()
+                approval.save()
+                
+                update_requisition_status(requisition)
+                
+                # Notification (inserted in bulk after the loop)
+                pending_notifications.append(Notification(
+                    user_id=requisition.requested_by_id,
+                    notification_type='APPROVAL',
+                    priority='HIGH',
+                    title='Requisition Approved',
+                    message=f'Your requisition {requisition.requisition_number} has been approved.',
+                    link_url=f'/requisitions/{requisition.id}/'
+                ))
+                
+                approved_count += 1
+                
+        except RequisitionApproval.DoesNotExist:
+            failed_count += 1
+            errors.append(f'Approval {approval_id} not found or already processed')
+        except Exception as e:
+            failed_count += 1
+            errors.append(f'Approval {approval_id}: {str(e)}')
+    
+    bulk_notify(pending_notifications)
+    
+    return JsonResponse({
+        'success': True,
+        'message': f'Bulk approval complete. Approved: {approved_count}, Failed: {failed_count}',
+        'approved_count': approved_count,
+        'failed_count': failed_count,
+        'errors': errors
+    })
@@ -0,0 +1,1035 @@
+"""
+Staff portal views: the staff dashboard and the staff requisition
+workflow.
+"""
+
+from decimal import Decimal
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.db.models import Q, Sum
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+
+from pms.events import approvals_changed
+from pms.forms import (
+    RequisitionAttachmentFormSet, RequisitionFilterForm, RequisitionForm,
+    RequisitionItemFormSet,
+)
+from pms.models import (
+    Budget, BudgetYear, ProcurementPlanItem, Requisition, RequisitionApproval,
+)
+
+
+@login_required
+def staff_dashboard(request):
+    """Staff dashboard with overview of requisitions and statistics"""
+    
+    user = request.user
+    
+    # Get requisitions created by this user
+    user_requisitions = Requisition.objects.filter(requested_by=user)
+    
+    # Calculate statistics
+    total_requisitions = user_requisitions.count()
+    draft_count = user_requisitions.filter(status='DRAFT').count()
+    submitted_count = user_requisitions.filter(status='SUBMITTED').count()
+    pending_count = user_requisitions.filter(
+        status__in=['SUBMITTED', 'HOD_APPROVED', 'FACULTY_APPROVED', 'BUDGET_APPROVED', 'PROCUREMENT_APPROVED']
+    ).count()
+    approved_count = user_requisitions.filter(status='APPROVED').count()
+    rejected_count = user_requisitions.filter(status='REJECTED').count()
+    
+    # Recent requisitions
+    recent_requisitions = user_requisitions.order_by('-created_at')[:5]
+    
+    # Monthly statistics
+    today = timezone.now().date()
+    current_month_start = today.replace(day=1)
+    
+    monthly_requisitions = user_requisitions.filter(
+        created_at__gte=current_month_start
+    ).count()
+    
+    # Total estimated amount for approved requisitions this year
+    total_approved_amount = user_requisitions.filter(
+        status='APPROVED',
+        created_at__year=today.year
+    ).aggregate(
+        total=Sum('estimated_amount')
+    )['total'] or Decimal('0')
+    
+    # Requisitions by priority
+    urgent_count = user_requisitions.filter(
+        priority='URGENT',
+        status__in=['SUBMITTED', 'HOD_APPROVED', 'FACULTY_APPROVED', 'BUDGET_APPROVED', 'PROCUREMENT_APPROVED']
+    ).count()
+    
+    context = {
+        'total_requisitions': total_requisitions,
+        'draft_count': draft_count,
+        'submitted_count': submitted_count,
+        'pending_count': pending_count,
+        'approved_count': approved_count,
+        'rejected_count': rejected_count,
+        'recent_requisitions': recent_requisitions,
+        'monthly_requisitions': monthly_requisitions,
+        'total_approved_amount': total_approved_amount,
+        'urgent_count': urgent_count,
+        'user': user,
+    }
+    
+    return render(request, 'staff/dashboard.html', context)
+
+
+@login_required
+def staff_requisitions_list(request):
+    """List all requisitions for the staff member"""
+    
+    user = request.user
+    
+    # Get requisitions created by this user
+    requisitions = Requisition.objects.filter(requested_by=user)
+    
+    # Apply filters from GET parameters
+    status_filter = request.GET.get('status')
+    if status_filter:
+        requisitions = requisitions.filter(status=status_filter)
+    
+    priority_filter = request.GET.get('priority')
+    if priority_filter:
+        requisitions = requisitions.filter(priority=priority_filter)
+    
+    search_query = request.GET.get('search')
+    if search_query:
+        requisitions = requisitions.filter(
+            Q(requisition_number__icontains=search_query) |
+            Q(title__icontains=search_query) |
+            Q(justification__icontains=search_query)
+        )
+    
+    # Date filters
+    date_from = request.GET.get('date_from')
+    if date_from:
+        requisitions = requisitions.filter(created_at__gte=date_from)
+    
+    date_to = request.GET.get('date_to')
+    if date_to:
+        requisitions = requisitions.filter(created_at__lte=date_to)
+    
+    # Order by most recent
+    requisitions = requisitions.select_related(
+        'department', 'budget'
+    ).order_by('-created_at')
+    
+    # Pagination
+    paginator = Paginator(requisitions, 15)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    
+    # Get filter form
+    filter_form = RequisitionFilterForm(request.GET)
+    
+    context = {
+        'requisitions': page_obj,
+        'filter_form': filter_form,
+        'status_filter': status_filter,
+        'priority_filter': priority_filter,
+        'search_query': search_query,
+        'total_count': requisitions.count(),
+    }
+    
+    return render(request, 'staff/requisitions_list.html', context)
+
+
+@login_required
+def staff_requisition_create(request):
+    """Create a new requisition with plan enforcement and enhanced UX"""
+    
+    # ========================================================================
+    # POST: Handle form submission
+    # ========================================================================
+    if request.method == 'POST':
+        form = RequisitionForm(request.POST, user=request.user)
+        formset = RequisitionItemFormSet(request.POST)
+        attachment_formset = RequisitionAttachmentFormSet(request.POST, request.FILES)
+        
+        if form.is_valid() and formset.is_valid() and attachment_formset.is_valid():
+            requisition = form.save(commit=False)
+            requisition.requested_by = request.user
+            
+            # Set department from user's department
+            if request.user.department:
+                requisition.department = request.user.department
+            else:
+                messages.error(request, 'You must be assigned to a department to create requisitions.')
+                return redirect('staff_requisitions_list')
+            
+            requisition.status = 'DRAFT'
+            
+            # PLAN ENFORCEMENT LOGIC
+            is_planned = form.cleaned_data.get('is_planned', True)
+            procurement_plan_item = form.cleaned_data.get('procurement_plan_item')
+            is_emergency = form.cleaned_data.get('is_emergency', False)
+            
+            # Validate plan compliance
+            if is_planned and not procurement_plan_item:
+                messages.error(
+                    request, 
+                    'Please select a procurement plan item for planned requisitions.'
+                )
+                context = _get_context_data(request.user, form, formset, attachment_formset)
+                return render(request, 'staff/requisition_form.html', context)
+            
+            # Validate unplanned requisitions
+            if not is_planned:
+                if not is_emergency:
+                    messages.error(
+                        request, 
+                        'Unplanned requisitions must be marked as emergency.'
+                    )
+                    context = _get_context_data(request.user, form, formset, attachment_formset)
+                    return render(request, 'staff/requisition_form.html', context)
+                
+                if not requisition.emergency_justification:
+                    messages.error(
+                        request, 
+                        'Emergency justification is required for unplanned requisitions.'
+                    )
+                    context = _get_context_data(request.user, form, formset, attachment_formset)
+                    return render(request, 'staff/requisition_form.html', context)
+                
+                # Mark as requiring plan amendment
+                requisition.requires_plan_amendment = True
+            
+            # CALCULATE ESTIMATED AMOUNT BEFORE SAVING
+            # Process items first to get total
+            items = formset.save(commit=False)
+            total_estimated = Decimal('0')
+            
+            for item in items:
+                # Calculate item total if not already set
+                item_qty = Decimal(str(item.quantity))
+                item_price = Decimal(str(item.estimated_unit_price))
+                item.estimated_total = item_qty * item_price
+                total_estimated += item.estimated_total
+            
+            # Set estimated amount BEFORE first save
+            requisition.estimated_amount = total_estimated
+            
+            # Now save the requisition
+            requisition.save()
+            
+            # Save requisition items with requisition reference
+            for item in items:
+                item.requisition = requisition
+                item.save()
+            
+            # VALIDATE AGAINST PLAN ITEM
+            # (plan usage is committed on submission, see pms.plan_consumption)
+            if is_planned and procurement_plan_item:
+                # Check budget
+                if total_estimated > procurement_plan_item.remaining_budget:
+                    messages.warning(
+                        request,
+                        f'Warning: Estimated amount (KES {total_estimated:,.2f}) exceeds '
+                        f'remaining plan budget (KES {procurement_plan_item.remaining_budget:,.2f}). '
+                        f'This may require additional approvals.'
+                    )
+            
+            # No need to save requisition again - estimated_amount already set
+            
+            # Save attachments
+            attachments = attachment_formset.save(commit=False)
+            for attachment in attachments:
+                attachment.requisition = requisition
+                attachment.uploaded_by = request.user
+                attachment.save()
+            
+            messages.success(
+                request, 
+                f'Requisition {requisition.requisition_number} created successfully!'
+            )
+            
+            if not is_planned:
+                messages.info(
+                    request,
+                    'This is an unplanned/emergency requisition. '
+                    'It will require HOD emergency approval and procurement plan amendment.'
+                )
+            
+            return redirect('staff_requisition_detail', pk=requisition.pk)
+        else:
+            # Show validation errors
+            if form.errors:
+                for field, errors in form.errors.items():
+                    for error in errors:
+                        messages.error(request, f'{field}: {error}')
+            if formset.errors:
+                messages.error(request, 'Please correct errors in the items section.')
+            if attachment_formset.errors:
+                messages.error(request, 'Please correct errors in the attachments section.')
+    
+    # ========================================================================
+    # GET: Display empty form
+    # ========================================================================
+    else:
+        form = RequisitionForm(user=request.user)
+        formset = RequisitionItemFormSet()
+        attachment_formset = RequisitionAttachmentFormSet()
+    
+    # Get context data
+    context = _get_context_data(request.user, form, formset, attachment_formset)
+    
+    return render(request, 'staff/requisition_form.html', context)
+
+
+def _get_context_data(user, form, formset, attachment_formset):
+    """Helper function to get context data for the template"""
+    
+    # Get available procurement plan items for the user's department
+    available_plan_items = []
+    current_budget_year = None
+    debug_info = {
+        'has_department': bool(user.department),
+        'department': str(user.department) if user.department else None,
+        'budget_year': None,
+        'total_plans': 0,
+        'active_plans': 0,
+        'plan_items_count': 0,
+    }
+    
+    if user.department:
+        current_budget_year = BudgetYear.objects.filter(is_active=True).first()
+        debug_info['budget_year'] = str(current_budget_year) if current_budget_year else None
+        
+        if current_budget_year:
+            # Count all plans for this department and year
+            from pms.models import ProcurementPlan
+            all_plans = ProcurementPlan.objects.filter(
+                department=user.department,
+                budget_year=current_budget_year
+            )
+            debug_info['total_plans'] = all_plans.count()
+            
+            # Count active plans
+            active_plans = all_plans.filter(status='ACTIVE')
+            debug_info['active_plans'] = active_plans.count()
+            
+            # FIXED: Changed from 'APPROVED' to 'ACTIVE'
+            available_plan_items = ProcurementPlanItem.objects.filter(
+                procurement_plan__department=user.department,
+                procurement_plan__budget_year=current_budget_year,
+                procurement_plan__status__in=['ACTIVE', 'APPROVED'],  # Allow both ACTIVE and APPROVED
+                status='PLANNED'
+            ).select_related('procurement_plan', 'budget', 'item').order_by(
+                'planned_quarter', 'sequence'
+            )
+            
+            debug_info['plan_items_count'] = available_plan_items.count()
+            
+            # Add debug message if no items found
+            if not available_plan_items:
+                print(f"\n{'='*60}")
+                print(f"DEBUG: No procurement plan items found")
+                print(f"Department: {user.department.name} (ID: {user.department.id})")
+                print(f"Budget Year: {current_budget_year.name} (ID: {current_budget_year.id})")
+                print(f"Total Plans: {debug_info['total_plans']}")
+                print(f"Active Plans: {debug_info['active_plans']}")
+                
+                # Show all plans with their status
+                if all_plans.exists():
+                    print("\nAll Plans for this department:")
+                    for plan in all_plans:
+                        items_count = plan.items.count()
+                        print(f"  - {plan.plan_number}: {plan.status} ({items_count} items)")
+                else:
+                    print("\nNo plans exist for this department and year")
+                print(f"{'='*60}\n")
+    
+    context = {
+        'form': form,
+        'formset': formset,
+        'attachment_formset': attachment_formset,
+        'page_title': 'Create New Requisition',
+        'available_plan_items': available_plan_items,
+        'current_budget_year': current_budget_year,
+        'debug_info': debug_info,  # Add debug info to context
+    }
+    
+    return context
+
+
+@login_required
+def api_get_plan_item_details(request, plan_item_id):
+    """
+    API endpoint to get procurement plan item details
+    """
+    try:
+        plan_item = ProcurementPlanItem.objects.select_related(
+            'procurement_plan', 'budget', 'item'
+        ).get(id=plan_item_id)
+        
+        # Check if user has access
+        if plan_item.procurement_plan.department != request.user.department:
+            return JsonResponse({'error': 'Access denied'}, status=403)
+        
+        data = {
+            'id': str(plan_item.id),
+            'description': plan_item.description,
+            'specifications': plan_item.specifications,
+            'quantity': str(plan_item.quantity),
+            'unit_of_measure': plan_item.unit_of_measure,
+            'estimated_cost': str(plan_item.estimated_cost),
+            'remaining_budget': str(plan_item.remaining_budget),
+            'remaining_quantity': str(plan_item.remaining_quantity),
+            'planned_quarter': plan_item.get_planned_quarter_display(),
+            'procurement_method': plan_item.get_procurement_method_display(),
+            'budget_code': f"{plan_item.budget.category.code} - {plan_item.budget.category.name}" if plan_item.budget else '',
+            'item_type': plan_item.get_item_type_display(),
+        }
+        
+        return JsonResponse(data)
+        
+    except ProcurementPlanItem.DoesNotExist:
+        return JsonResponse({'error': 'Plan item not found'}, status=404)
+
+
+@login_required
+def api_validate_budget(request):
+    """
+    API endpoint to validate if budget has sufficient balance
+    """
+    budget_id = request.GET.get('budget_id')
+    amount = request.GET.get('amount', '0')
+    
+    try:
+        budget = Budget.objects.get(id=budget_id)
+        amount_decimal = Decimal(amount)
+        
+        available = budget.available_balance
+        sufficient = available >= amount_decimal
+        
+        return JsonResponse({
+            'sufficient': sufficient,
+            'available_balance': str(available),
+            'allocated_amount': str(budget.allocated_amount),
+            'committed_amount': str(budget.committed_amount),
+            'actual_spent': str(budget.actual_spent),
+            'budget_code': f"{budget.category.code} - {budget.category.name}",
+        })
+        
+    except Budget.DoesNotExist:
+        return JsonResponse({'error': 'Budget not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+@login_required
+def staff_requisition_detail(request, pk):
+    """View requisition details with plan information"""
+    
+    requisition = get_object_or_404(
+        Requisition.objects.select_related(
+            'department', 'budget', 'requested_by',
+            'procurement_plan_item__procurement_plan',
+            'plan_amendment'
+        ).prefetch_related('items', 'attachments', 'approvals'),
+        pk=pk
+    )
+    
+    # Check permissions - only creator can view their own requisitions
+    if requisition.requested_by != request.user:
+        messages.error(request, 'You do not have permission to view this requisition.')
+        return redirect('staff_requisitions_list')
+    
+    # Get items and attachments
+    items = requisition.items.all()
+    attachments = requisition.attachments.all()
+    
+    # Get approval history
+    approvals = requisition.approvals.select_related('approver').order_by('sequence')
+    
+    # Calculate totals
+    total_items = items.count()
+    
+    # Plan compliance check
+    plan_warnings = []
+    if requisition.is_planned and requisition.procurement_plan_item:
+        plan_item = requisition.procurement_plan_item
+        
+        if requisition.estimated_amount > plan_item.estimated_cost:
+            plan_warnings.append(
+                f'Requisition amount exceeds planned budget by '
+                f'KES {(requisition.estimated_amount - plan_item.estimated_cost):,.2f}'
+            )
+        
+        if plan_item.remaining_budget < 0:
+            plan_warnings.append('Procurement plan item is over budget')
+    
+    context = {
+        'requisition': requisition,
+        'items': items,
+        'attachments': attachments,
+        'approvals': approvals,
+        'total_items': total_items,
+        'plan_warnings': plan_warnings,
+        'can_edit': requisition.status == 'DRAFT',
+        'can_submit': requisition.status == 'DRAFT' and items.exists(),
+        'can_cancel': requisition.status in ['DRAFT', 'SUBMITTED'],
+    }
+    
+    return render(request, 'staff/requisition_detail.html', context)
+
+@login_required
+def staff_requisition_edit(request, pk):
+    """Edit a requisition (only if in DRAFT status)"""
+    
+    requisition = get_object_or_404(
+        Requisition.objects.select_related(
+            'procurement_plan_item__procurement_plan',
+            'procurement_plan_item__budget',
+            'department',
+            'budget',
+            'requested_by'
+        ).prefetch_related(
+            'items__item',
+            'attachments'
+        ),
+        pk=pk
+    )
+    
+    # Check permissions
+    if requisition.requested_by != request.user:
+        messages.error(request, 'You can only edit your own requisitions.')
+        return redirect('staff_requisitions_list')
+    
+    if requisition.status != 'DRAFT':
+        messages.error(request, 'You can only edit draft requisitions.')
+        return redirect('staff_requisition_detail', pk=pk)
+    
+    if request.method == 'POST':
+        form = RequisitionForm(request.POST, instance=requisition, user=request.user)
+        formset = RequisitionItemFormSet(request.POST, instance=requisition)
+        attachment_formset = RequisitionAttachmentFormSet(
+            request.POST, 
+            request.FILES, 
+            instance=requisition
+        )
+        
+        if form.is_valid() and formset.is_valid() and attachment_formset.is_valid():
+            requisition = form.save()
+            
+            # Save items and recalculate total
+            items = formset.save()
+            total_estimated = sum(
+                item.estimated_total for item in requisition.items.all()
+            )
+            requisition.estimated_amount = total_estimated
+            
+            # Drafts do not hold plan budget; it is committed on submission
+            new_plan_item = requisition.procurement_plan_item
+            if new_plan_item and requisition.is_planned:
+                # Validate budget
+                if total_estimated > new_plan_item.remaining_budget:
+                    messages.warning(
+                        request,
+                        f'Warning: Amount exceeds remaining budget by '
+                        f'KES {(total_estimated - new_plan_item.remaining_budget):,.2f}'
+                    )
+            
+            requisition.save()
+            
+            # Save attachments
+            attachments = attachment_formset.save(commit=False)
+            for attachment in attachments:
+                if not attachment.uploaded_by:
+                    attachment.uploaded_by = request.user
+                attachment.save()
+            
+            # Handle deleted attachments
+            for obj in attachment_formset.deleted_objects:
+                obj.delete()
+            
+            messages.success(request, 'Requisition updated successfully!')
+            return redirect('staff_requisition_detail', pk=pk)
+    else:
+        # Initialize form with existing data
+        form = RequisitionForm(instance=requisition, user=request.user)
+        formset = RequisitionItemFormSet(instance=requisition)
+        attachment_formset = RequisitionAttachmentFormSet(instance=requisition)
+    
+    # Get available plan items including the currently selected one
+    available_plan_items = None
+    current_budget_year = BudgetYear.objects.filter(is_active=True).first()
+    
+    if request.user.department and current_budget_year:
+        # Base queryset for available plan items
+        available_plan_items_qs = ProcurementPlanItem.objects.filter(
+            procurement_plan__department=request.user.department,
+            procurement_plan__budget_year=current_budget_year,
+            procurement_plan__status='APPROVED',
+            status='PLANNED'
+        ).select_related('procurement_plan', 'budget', 'item')
+        
+        # If requisition has a plan item, make sure it's included even if status changed
+        if requisition.procurement_plan_item:
+            # Get the existing plan item
+            existing_plan_item = requisition.procurement_plan_item
+            
+            # Combine with available items, ensuring the existing one is included
+            available_plan_items = available_plan_items_qs.filter(
+                id=existing_plan_item.id
+            ) | available_plan_items_qs.exclude(
+                id=existing_plan_item.id
+            )
+        else:
+            available_plan_items = available_plan_items_qs
+        
+        available_plan_items = available_plan_items.distinct().order_by(
+            'planned_quarter', 
+            'description'
+        )
+    
+    # Debug information
+    debug_info = {
+        'has_department': bool(request.user.department),
+        'department': request.user.department.name if request.user.department else None,
+        'budget_year': current_budget_year.name if current_budget_year else None,
+        'requisition_plan_item': requisition.procurement_plan_item.description[:50] if requisition.procurement_plan_item else None,
+        'is_planned': requisition.is_planned,
+        'plan_items_count': available_plan_items.count() if available_plan_items else 0,
+    }
+    
+    context = {
+        'form': form,
+        'formset': formset,
+        'attachment_formset': attachment_formset,
+        'requisition': requisition,
+        'page_title': f'Edit Requisition {requisition.requisition_number}',
+        'available_plan_items': available_plan_items,
+        'current_budget_year': current_budget_year,
+        'debug_info': debug_info,
+    }
+    
+    return render(request, 'staff/requisition_form.html', context)
+
+
+@login_required
+def staff_requisition_submit(request, pk):
+    """Submit a requisition for approval with plan validation"""
+    
+    requisition = get_object_or_404(
+        Requisition.objects.select_related(
+            'procurement_plan_item__procurement_plan'
+        ),
+        pk=pk
+    )
+    
+    # Check permissions
+    if requisition.requested_by != request.user:
+        messages.error(request, 'You can only submit your own requisitions.')
+        return redirect('staff_requisitions_list')
+    
+    if requisition.status != 'DRAFT':
+        messages.error(request, 'This requisition has already been submitted.')
+        return redirect('staff_requisition_detail', pk=pk)
+    
+    # Validate that requisition has items
+    if not requisition.items.exists():
+        messages.error(request, 'Cannot submit a requisition without items.')
+        return redirect('staff_requisition_edit', pk=pk)
+    
+    # Check if budget is allocated
+    if not requisition.budget:
+        messages.error(request, 'Please select a budget before submitting.')
+        return redirect('staff_requisition_edit', pk=pk)
+    
+    # PLAN VALIDATION
+    validation_errors = []
+    
+    if requisition.is_planned:
+        if not requisition.procurement_plan_item:
+            validation_errors.append(
+                'Planned requisition must be linked to a procurement plan item'
+            )
+        else:
+            plan_item = requisition.procurement_plan_item
+            
+            # Check if plan is approved
+            if plan_item.procurement_plan.status != 'APPROVED':
+                validation_errors.append(
+                    'Procurement plan is not approved. Status: '
+                    f'{plan_item.procurement_plan.get_status_display()}'
+                )
+            
+            # Check budget
+            # if requisition.estimated_amount > plan_item.remaining_budget:
+            #     validation_errors.append(
+            #         f'Amount (KES {requisition.estimated_amount:,.2f}) exceeds '
+            #         f'remaining plan budget (KES {plan_item.remaining_budget:,.2f})'
+            #     )
+    else:
+        # Unplanned requisition validation
+        if not requisition.is_emergency:
+            validation_errors.append(
+                'Unplanned requisition must be marked as emergency'
+            )
+        
+        if not requisition.emergency_justification:
+            validation_errors.append(
+                'Emergency justification is required for unplanned requisitions'
+            )
+        
+        if not requisition.emergency_type:
+            validation_errors.append('Emergency type must be specified')
+        
+        if requisition.requires_plan_amendment and not requisition.plan_amendment:
+            messages.warning(
+                request,
+                'This unplanned requisition will require procurement plan amendment. '
+                'HOD and procurement officer will create the amendment during approval.'
+            )
+    
+    # If there are validation errors, don't submit
+    if validation_errors:
+        for error in validation_errors:
+            messages.error(request, error)
+        return redirect('staff_requisition_edit', pk=pk)
+    
+    # Change status to submitted
+    requisition.status = 'SUBMITTED'
+    requisition.submitted_at = timezone.now()
+    requisition.save()
+    
+    # Create approval workflow (HOD approval first)
+    RequisitionApproval.objects.create(
+        requisition=requisition,
+        approval_stage='HOD',
+        sequence=1,
+        status='PENDING'
+    )
+    approvals_changed(requisition, requisition.department.hod_id)
+    
+    success_msg = f'Requisition {requisition.requisition_number} submitted for approval!'
+    
+    if not requisition.is_planned:
+        success_msg += ' (Emergency/Unplanned - requires HOD emergency approval)'
+    
+    messages.success(request, success_msg)
+    
+    return redirect('staff_requisition_detail', pk=pk)
+
+
+@login_required
+def staff_requisition_cancel(request, pk):
+    """Cancel a requisition and revert plan commitments"""
+    
+    requisition = get_object_or_404(
+        Requisition.objects.select_related('procurement_plan_item'),
+        pk=pk
+    )
+    
+    # Check permissions
+    if requisition.requested_by != request.user:
+        messages.error(request, 'You can only cancel your own requisitions.')
+        return redirect('staff_requisitions_list')
+    
+    if requisition.status not in ['DRAFT', 'SUBMITTED']:
+        messages.error(request, 'Cannot cancel this requisition at its current stage.')
+        return redirect('staff_requisition_detail', pk=pk)
+    
+    if request.method == 'POST':
+        # Saving the cancellation releases any plan commitment
+        requisition.status = 'CANCELLED'
+        requisition.save()
+        
+        messages.success(request, 'Requisition cancelled successfully.')
+        return redirect('staff_requisitions_list')
+    
+    context = {
+        'requisition': requisition,
+    }
+    
+    return render(request, 'staff/requisition_cancel_confirm.html', context)
+
+
+@login_required
+def get_plan_item_details(request, plan_item_id):
+    """AJAX endpoint to get plan item details"""
+    try:
+        plan_item = ProcurementPlanItem.objects.select_related(
+            'procurement_plan', 'budget'
+        ).get(pk=plan_item_id)
+        
+        return JsonResponse({
+            'success': True,
+            'data': {
+                'description': plan_item.description,
+                'estimated_cost': float(plan_item.estimated_cost),
+                'remaining_budget': float(plan_item.remaining_budget),
+                'quantity': float(plan_item.quantity),
+                'remaining_quantity': float(plan_item.remaining_quantity),
+                'unit_of_measure': plan_item.unit_of_measure,
+                'planned_quarter': plan_item.get_planned_quarter_display(),
+                'procurement_method': plan_item.get_procurement_method_display(),
+                'budget_name': plan_item.budget.category.name if plan_item.budget else 'N/A',
+            }
+        })
+    except ProcurementPlanItem.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'error': 'Plan item not found'
+        }, status=404)
+
+@login_required
+def staff_requisitions_pending(request):
+    """List all pending requisitions"""
+    
+    user = request.user
+    
+    # Get pending requisitions (all statuses except DRAFT, APPROVED, REJECTED, CANCELLED)
+    requisitions = Requisition.objects.filter(
+        requested_by=user,
+        status__in=['SUBMITTED', 'HOD_APPROVED', 'FACULTY_APPROVED', 'BUDGET_APPROVED', 'PROCUREMENT_APPROVED']
+    ).select_related('department', 'budget').order_by('-created_at')
+    
+    # Pagination
+    paginator = Paginator(requisitions, 15)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    
+    context = {
+        'requisitions': page_obj,
+        'count': requisitions.count(),
+        'page_title': 'Pending Requisitions',
+    }
+    
+    return render(request, 'staff/requisitions_status.html', context)
+
+
+@login_required
+def staff_requisitions_approved(request):
+    """List all approved requisitions"""
+    
+    user = request.user
+    
+    requisitions = Requisition.objects.filter(
+        requested_by=user,
+        status='APPROVED'
+    ).select_related('department', 'budget').order_by('-created_at')
+    
+    # Pagination
+    paginator = Paginator(requisitions, 15)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    
+    context = {
+        'requisitions': page_obj,
+        'count': requisitions.count(),
+        'page_title': 'Approved Requisitions',
+    }
+    
+    return render(request, 'staff/requisitions_status.html', context)
+
+
+@login_required
+def staff_requisitions_rejected(request):
+    """List all rejected requisitions"""
+    
+    user = request.user
+    
+    requisitions = Requisition.objects.filter(
+        requested_by=user,
+        status='REJECTED'
+    ).select_related('department', 'budget').order_by('-updated_at')
+    
+    # Pagination
+    paginator = Paginator(requisitions, 15)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    
+    context = {
+        'requisitions': page_obj,
+        'count': requisitions.count(),
+        'page_title': 'Rejected Requisitions',
+    }
+    
+    return render(request, 'staff/requisitions_status.html', context)
+
+
+@login_required
+def staff_help_center(request):
+    """Help center with FAQs and support information"""
+    
+    faqs = [
+        {
+            'category': 'Getting Started',
+            'questions': [
+                {
+                    'question': 'How do I create a new requisition?',
+                    'answer': 'Click on "New Requisition" from the sidebar, fill in the required details including title, justification, and required date. Then add items with specifications and quantities. You can also attach supporting documents. Save as draft or submit directly for approval.'
+                },
+                {
+                    'question': 'What information do I need to provide?',
+                    'answer': 'You need to provide: requisition title, justification, required date, budget allocation, and detailed item descriptions with specifications, quantities, and estimated prices. Supporting documents like quotations or specifications are recommended.'
+                },
+            ]
+        },
+        {
+            'category': 'Approval Process',
+            'questions': [
+                {
+                    'question': 'How long does approval take?',
+                    'answer': 'Approval typically takes 3-7 business days depending on the amount and complexity. The requisition goes through multiple approval stages: HOD, Faculty (for amounts above threshold), Budget/Finance, and Procurement.'
+                },
+                {
+                    'question': 'Can I track my requisition status?',
+                    'answer': 'Yes! Go to "My Requisitions" and click on any requisition to view its detailed status, approval history, and comments from approvers.'
+                },
+                {
+                    'question': 'What if my requisition is rejected?',
+                    'answer': 'Check the rejection reason provided by the approver. You can create a new requisition addressing the concerns raised. Contact the approver if you need clarification.'
+                },
+            ]
+        },
+        {
+            'category': 'Editing & Cancellation',
+            'questions': [
+                {
+                    'question': 'Can I edit a submitted requisition?',
+                    'answer': 'No, once submitted you cannot edit. However, you can cancel it (if not yet approved) and create a new one with the correct information.'
+                },
+                {
+                    'question': 'How do I cancel a requisition?',
+                    'answer': 'Open the requisition detail page and click the "Cancel" button. You can only cancel requisitions in DRAFT or SUBMITTED status.'
+                },
+            ]
+        },
+        {
+            'category': 'Budget & Amounts',
+            'questions': [
+                {
+                    'question': 'How do I know my department\'s budget?',
+                    'answer': 'Contact your Head of Department or the Finance office for information about available budget allocations and codes.'
+                },
+                {
+                    'question': 'What happens after approval?',
+                    'answer': 'Once fully approved, the procurement team will initiate the tendering or quotation process, issue purchase orders, and process your request according to procurement guidelines.'
+                },
+            ]
+        },
+    ]
+    
+    context = {
+        'faqs': faqs,
+        'support_email': 'procurement@university.ac.ke',
+        'support_phone': '+254 XXX XXX XXX',
+        'office_hours': 'Monday - Friday, 8:00 AM - 5:00 PM',
+    }
+    
+    return render(request, 'staff/help_center.html', context)
+
+
+@login_required
+def staff_guidelines(request):
+    """Procurement guidelines and policies"""
+    
+    guidelines = [
+        {
+            'title': 'Requisition Submission Guidelines',
+            'icon': 'bi-file-earmark-text',
+            'items': [
+                'Submit requisitions at least 3 weeks before the required date to allow for processing time.',
+                'Provide detailed specifications to ensure accurate procurement.',
+                'Include market research or quotations to support estimated costs.',
+                'Ensure all mandatory fields are completed before submission.',
+                'Attach relevant supporting documents (specifications, quotations, TOR).',
+            ]
+        },
+        {
+            'title': 'Budget & Financial Guidelines',
+            'icon': 'bi-cash-stack',
+            'items': [
+                'All requisitions must be charged to an approved budget line.',
+                'Ensure sufficient budget balance before submitting requisitions.',
+                'Departmental budget limits apply - seek HOD approval for large amounts.',
+                'Emergency purchases require special justification and additional approvals.',
+                'Budget reallocations must be approved by Finance before requisition submission.',
+            ]
+        },
+        {
+            'title': 'Approval Thresholds',
+            'icon': 'bi-diagram-3',
+            'items': [
+                'Up to KES 50,000: HOD and Procurement approval required.',
+                'KES 50,001 - 500,000: Requires Faculty and Finance approval.',
+                'Above KES 500,000: Additional Director approval and competitive tendering required.',
+                'Emergency purchases follow expedited approval process with proper justification.',
+            ]
+        },
+        {
+            'title': 'Item Specifications',
+            'icon': 'bi-list-check',
+            'items': [
+                'Provide clear, detailed technical specifications for all items.',
+                'Avoid specifying brand names unless justified (use "or equivalent").',
+                'Include quantity, unit of measure, and quality standards.',
+                'For technical items, attach manufacturer specifications or datasheets.',
+                'Specify any special delivery or installation requirements.',
+            ]
+        },
+        {
+            'title': 'Supplier Selection',
+            'icon': 'bi-people',
+            'items': [
+                'Procurement team handles supplier selection based on value for money.',
+                'Three quotations required for purchases above KES 50,000.',
+                'Competitive tendering mandatory for purchases above KES 500,000.',
+                'Supplier must be registered and compliant with tax requirements.',
+                'You may suggest preferred suppliers but final selection rests with procurement.',
+            ]
+        },
+        {
+            'title': 'Documentation Requirements',
+            'icon': 'bi-folder',
+            'items': [
+                'Attach justification documents explaining need and urgency.',
+                'Include quotations or price estimates from potential suppliers.',
+                'Provide technical specifications or terms of reference.',
+                'For specialized items, attach supporting research or documentation.',
+                'Ensure all attachments are clearly labeled and readable.',
+            ]
+        },
+        {
+            'title': 'Compliance & Ethics',
+            'icon': 'bi-shield-check',
+            'items': [
+                'All procurement must follow university policies and government regulations.',
+                'Declare any conflict of interest with suppliers or vendors.',
+                'Do not split requisitions to circumvent approval thresholds.',
+                'Report any suspected fraud or misconduct to the appropriate office.',
+                'Maintain confidentiality of procurement information.',
+            ]
+        },
+        {
+            'title': 'Delivery & Receipt',
+            'icon': 'bi-truck',
+            'items': [
+                'Specify accurate delivery location and contact person.',
+                'Be available to inspect and receive goods when delivered.',
+                'Report any discrepancies or damages immediately to Stores.',
+                'Sign Goods Received Notes only after thorough inspection.',
+                'Follow up with procurement team if delivery is delayed beyond agreed date.',
+            ]
+        },
+    ]
+    
+    context = {
+        'guidelines': guidelines,
+        'policy_document_url': '#',  # Link to full procurement policy document
+        'last_updated': '2024',
+    }
+    
+    return render(request, 'staff/guidelines.html', context)
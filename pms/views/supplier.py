@@ -0,0 +1,1600 @@
+"""
+Supplier portal views: tenders, bids, purchase orders, invoices,
+payments and the company profile.
+"""
+
+import random
+import traceback
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.mail import send_mail
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Avg, Count, Q, Sum
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+
+from pms.audit import record_audit
+from pms.duplicates import find_duplicate_invoice
+from pms.forms import (
+    InvoiceForm, InvoiceItemFormSet, SupplierDocumentForm, SupplierProfileForm,
+)
+from pms.models import (
+    Bid, BidDocument, BidItem, BidTechnicalResponse, GoodsReceivedNote,
+    Invoice, InvoiceDocument, InvoiceItem, Notification, Payment,
+    PurchaseOrder, PurchaseOrderItem, Supplier, SupplierDocument,
+    SupplierPerformance, Tender, TenderDocument,
+)
+from pms.notifications import notify
+
+
+# ============================================================================
+# SUPPLIER DASHBOARD
+# ============================================================================
+
+@login_required
+def supplier_dashboard(request):
+    """Supplier portal dashboard with key metrics and notifications"""
+    
+    # Get supplier profile
+    try:
+        supplier = request.user.supplier_profile
+    except:
+        messages.error(request, "Supplier profile not found. Please contact administrator.")
+        return redirect('home')
+    
+    # Date ranges
+    today = timezone.now().date()
+    month_start = today.replace(day=1)
+    year_start = today.replace(month=1, day=1)
+    
+    # Key Metrics
+    # Active tenders
+    active_tenders = Tender.objects.filter(
+        status='PUBLISHED',
+        closing_date__gte=timezone.now()
+    ).count()
+    
+    # My bids
+    my_bids = Bid.objects.filter(supplier=supplier)
+    total_bids = my_bids.count()
+    pending_bids = my_bids.filter(status='SUBMITTED').count()
+    awarded_bids = my_bids.filter(status='AWARDED').count()
+    
+    # Purchase orders
+    purchase_orders = PurchaseOrder.objects.filter(supplier=supplier)
+    pending_pos = purchase_orders.filter(
+        status__in=['APPROVED', 'SENT', 'ACKNOWLEDGED']
+    ).count()
+    
+    # Invoices
+    invoices = Invoice.objects.filter(supplier=supplier)
+    pending_invoices = invoices.filter(
+        status__in=['SUBMITTED', 'VERIFYING', 'MATCHED', 'APPROVED']
+    ).count()
+    
+    # Financial metrics
+    total_invoiced = invoices.aggregate(
+        total=Sum('total_amount')
+    )['total'] or Decimal('0')
+    
+    total_paid = invoices.filter(
+        status='PAID'
+    ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
+    
+    pending_payments = total_invoiced - total_paid
+    
+    # This month's orders
+    month_orders = purchase_orders.filter(
+        po_date__gte=month_start
+    ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
+    
+    # Performance rating
+    avg_rating = SupplierPerformance.objects.filter(
+        supplier=supplier
+    ).aggregate(avg=Avg('overall_rating'))['avg'] or 0
+    
+    # Recent tenders (open for bidding)
+    recent_tenders = Tender.objects.filter(
+        Q(status='PUBLISHED') &
+        Q(closing_date__gte=timezone.now())
+    ).order_by('-publish_date')[:5]
+    
+    # Recent bids
+    recent_bids = Bid.objects.filter(
+        supplier=supplier
+    ).select_related('tender').order_by('-submitted_at')[:5]
+    
+    # Active purchase orders
+    active_pos = PurchaseOrder.objects.filter(
+        supplier=supplier,
+        status__in=['APPROVED', 'SENT', 'ACKNOWLEDGED', 'PARTIAL_DELIVERY']
+    ).order_by('-po_date')[:5]
+    
+    # Recent invoices
+    recent_invoices = Invoice.objects.filter(
+        supplier=supplier
+    ).order_by('-created_at')[:5]
+    
+    # Notifications
+    notifications = Notification.objects.filter(
+        user=request.user,
+        is_read=False
+    ).order_by('-created_at')[:10]
+    
+    # Documents expiring soon (30 days)
+    expiring_docs = SupplierDocument.objects.filter(
+        supplier=supplier,
+        expiry_date__lte=today + timedelta(days=30),
+        expiry_date__gte=today
+    ).order_by('expiry_date')
+    
+    context = {
+        'supplier': supplier,
+        'active_tenders': active_tenders,
+        'total_bids': total_bids,
+        'pending_bids': pending_bids,
+        'awarded_bids': awarded_bids,
+        'pending_pos': pending_pos,
+        'pending_invoices': pending_invoices,
+        'total_invoiced': total_invoiced,
+        'total_paid': total_paid,
+        'pending_payments': pending_payments,
+        'month_orders': month_orders,
+        'avg_rating': avg_rating,
+        'recent_tenders': recent_tenders,
+        'recent_bids': recent_bids,
+        'active_pos': active_pos,
+        'recent_invoices': recent_invoices,
+        'notifications': notifications,
+        'expiring_docs': expiring_docs,
+    }
+    
+    return render(request, 'supplier/dashboard.html', context)
+
+
+# ============================================================================
+# TENDERS & OPPORTUNITIES
+# ============================================================================
+
+@login_required
+def supplier_tenders_list(request):
+    """List all available tenders"""
+    
+    supplier = request.user.supplier_profile
+    
+    # Filter options
+    status = request.GET.get('status', 'all')
+    tender_type = request.GET.get('type', 'all')
+    search = request.GET.get('search', '')
+    
+    # Base query
+    tenders = Tender.objects.filter(
+        status='PUBLISHED',
+        closing_date__gte=timezone.now()
+    )
+    
+    # Apply filters
+    if tender_type != 'all':
+        tenders = tenders.filter(tender_type=tender_type)
+    
+    if search:
+        tenders = tenders.filter(
+            Q(tender_number__icontains=search) |
+            Q(title__icontains=search) |
+            Q(description__icontains=search)
+        )
+    
+    # Check if supplier has bid
+    for tender in tenders:
+        tender.has_bid = Bid.objects.filter(
+            tender=tender,
+            supplier=supplier
+        ).exists()
+    
+    # Pagination
+    paginator = Paginator(tenders, 10)
+    page_number = request.GET.get('page')
+    tenders_page = paginator.get_page(page_number)
+    
+    context = {
+        'tenders': tenders_page,
+        'tender_types': Tender.TENDER_TYPES,
+        'current_status': status,
+        'current_type': tender_type,
+        'search': search,
+    }
+    
+    return render(request, 'supplier/tenders_list.html', context)
+
+
+@login_required
+def supplier_tender_detail(request, tender_id):
+    """View tender details"""
+    
+    supplier = request.user.supplier_profile
+    tender = get_object_or_404(Tender, id=tender_id)
+    
+    # Check if supplier has already bid
+    existing_bid = Bid.objects.filter(
+        tender=tender,
+        supplier=supplier
+    ).first()
+    
+    # Get tender documents
+    documents = TenderDocument.objects.filter(tender=tender)
+    
+    # Get evaluation criteria
+    criteria = tender.evaluation_criteria.all()
+    
+    # Calculate time remaining
+    time_remaining = tender.closing_date - timezone.now()
+    
+    context = {
+        'tender': tender,
+        'existing_bid': existing_bid,
+        'documents': documents,
+        'criteria': criteria,
+        'time_remaining': time_remaining,
+        'can_bid': tender.closing_date > timezone.now() and not existing_bid,
+    }
+    
+    return render(request, 'supplier/tender_detail.html', context)
+
+
+# ============================================================================
+# BIDS MANAGEMENT
+# ============================================================================
+
+@login_required
+def supplier_bids_list(request):
+    """List all supplier's bids"""
+    
+    supplier = request.user.supplier_profile
+    
+    # Filter options
+    status = request.GET.get('status', 'all')
+    search = request.GET.get('search', '')
+    
+    # Base query
+    bids = Bid.objects.filter(supplier=supplier).select_related('tender')
+    
+    # Apply filters
+    if status != 'all':
+        bids = bids.filter(status=status)
+    
+    if search:
+        bids = bids.filter(
+            Q(bid_number__icontains=search) |
+            Q(tender__tender_number__icontains=search) |
+            Q(tender__title__icontains=search)
+        )
+    
+    # Order by submission date
+    bids = bids.order_by('-submitted_at')
+    
+    # Statistics
+    stats = {
+        'total': bids.count(),
+        'submitted': bids.filter(status='SUBMITTED').count(),
+        'evaluating': bids.filter(status='EVALUATING').count(),
+        'qualified': bids.filter(status='QUALIFIED').count(),
+        'awarded': bids.filter(status='AWARDED').count(),
+        'rejected': bids.filter(status='REJECTED').count(),
+    }
+    
+    # Pagination
+    paginator = Paginator(bids, 15)
+    page_number = request.GET.get('page')
+    bids_page = paginator.get_page(page_number)
+    
+    context = {
+        'bids': bids_page,
+        'stats': stats,
+        'status_choices': Bid.STATUS_CHOICES,
+        'current_status': status,
+        'search': search,
+    }
+    
+    return render(request, 'supplier/bids_list.html', context)
+
+
+@login_required
+def supplier_bid_detail(request, bid_id):
+    """View bid details"""
+    
+    supplier = request.user.supplier_profile
+    bid = get_object_or_404(Bid, id=bid_id, supplier=supplier)
+    
+    # Get bid items
+    items = BidItem.objects.filter(bid=bid).select_related('requisition_item')
+    
+    # Get bid documents
+    documents = BidDocument.objects.filter(bid=bid)
+    
+    # Get evaluation if exists
+    evaluation = bid.evaluations.first()
+    
+    context = {
+        'bid': bid,
+        'items': items,
+        'documents': documents,
+        'evaluation': evaluation,
+    }
+    
+    return render(request, 'supplier/bid_detail.html', context)
+
+
+@login_required
+def supplier_submit_bid(request, tender_id):
+    """Submit a new bid for a tender with technical responses"""
+    
+    # Get supplier profile
+    try:
+        supplier = request.user.supplier_profile
+    except Supplier.DoesNotExist:
+        messages.error(request, "You must be registered as a supplier to submit bids.")
+        return redirect('supplier_dashboard')
+    
+    # Check supplier status
+    if supplier.status != 'APPROVED':
+        messages.error(request, "Your supplier account is not approved. Please contact procurement office.")
+        return redirect('supplier_dashboard')
+    
+    # Live dates rather than the nightly flag, so a renewal counts at once
+    from pms.compliance import supplier_status
+    if supplier_status(supplier)[0] == 'NON_COMPLIANT':
+        messages.error(request, "Your compliance documents have expired. Please upload renewed documents before bidding.")
+        return redirect('supplier_documents')
+    
+    tender = get_object_or_404(Tender, id=tender_id)
+    
+    # Check if tender is still open
+    if tender.closing_date < timezone.now():
+        messages.error(request, "This tender has closed.")
+        return redirect('supplier_tender_detail', tender_id=tender_id)
+    
+    # Check if tender is published
+    if tender.status != 'PUBLISHED':
+        messages.error(request, "This tender is not open for bidding.")
+        return redirect('supplier_tender_detail', tender_id=tender_id)
+    
+    # Check if already submitted
+    if Bid.objects.filter(tender=tender, supplier=supplier).exists():
+        messages.error(request, "You have already submitted a bid for this tender.")
+        return redirect('supplier_tender_detail', tender_id=tender_id)
+    
+    # Get requisition items and technical criteria
+    requisition_items = tender.requisition.items.all()
+    technical_criteria = tender.technical_criteria.all().order_by('sequence')
+    
+    # Get required documents from tender
+    tender_documents = tender.documents.filter(is_mandatory=True)
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                # Validate bid amount
+                bid_amount = Decimal(request.POST.get('bid_amount', 0))
+                if bid_amount <= 0:
+                    raise ValueError("Bid amount must be greater than zero")
+                
+                # Validate delivery period
+                delivery_period = int(request.POST.get('delivery_period_days', 0))
+                if delivery_period < 1:
+                    raise ValueError("Delivery period must be at least 1 day")
+                
+                # Validate validity period
+                validity_period = int(request.POST.get('validity_period_days', 0))
+                if validity_period < 30:
+                    raise ValueError("Validity period must be at least 30 days")
+                
+                # Create the bid
+                bid = Bid.objects.create(
+                    tender=tender,
+                    supplier=supplier,
+                    bid_amount=bid_amount,
+                    bid_bond_amount=Decimal(request.POST.get('bid_bond_amount', 0)),
+                    validity_period_days=validity_period,
+                    delivery_period_days=delivery_period,
+                    status='SUBMITTED',
+                    notes=request.POST.get('notes', ''),
+                    preliminary_evaluation_status='PENDING',
+                    technical_evaluation_status='PENDING',
+                    financial_evaluation_status='PENDING'
+                )
+                
+                # Calculate total from items
+                total_calculated = Decimal('0')
+                
+                # Save bid items
+                for i, req_item in enumerate(requisition_items):
+                    quoted_unit_price = Decimal(request.POST.get(f'items-{i}-quoted_unit_price', 0))
+                    
+                    if quoted_unit_price <= 0:
+                        raise ValueError(f"Please provide valid unit price for item {i+1}")
+                    
+                    quoted_total = quoted_unit_price * req_item.quantity
+                    total_calculated += quoted_total
+                    
+                    delivery_days = int(request.POST.get(f'items-{i}-delivery_period_days', delivery_period))
+                    warranty_months = int(request.POST.get(f'items-{i}-warranty_period_months', 0))
+                    
+                    BidItem.objects.create(
+                        bid=bid,
+                        requisition_item=req_item,
+                        quoted_unit_price=quoted_unit_price,
+                        quoted_total=quoted_total,
+                        delivery_period_days=delivery_days,
+                        brand=request.POST.get(f'items-{i}-brand', ''),
+                        model=request.POST.get(f'items-{i}-model', ''),
+                        specifications=request.POST.get(f'items-{i}-specifications', ''),
+                        warranty_period_months=warranty_months,
+                        notes=request.POST.get(f'items-{i}-notes', '')
+                    )
+                
+                # Verify calculated total matches submitted bid amount
+                if abs(total_calculated - bid_amount) > Decimal('0.01'):
+                    raise ValueError(
+                        f"Bid amount mismatch. Calculated: {total_calculated}, Submitted: {bid_amount}"
+                    )
+                
+                # Save technical responses if tender requires technical evaluation
+                if tender.requires_technical_evaluation and technical_criteria.exists():
+                    for i, criterion in enumerate(technical_criteria):
+                        response_text = request.POST.get(f'tech-{i}-response_text', '')
+                        response_value = request.POST.get(f'tech-{i}-response_value', '')
+                        supplier_remarks = request.POST.get(f'tech-{i}-remarks', '')
+                        
+                        # Handle file upload for this criterion
+                        doc_file = request.FILES.get(f'tech-{i}-document')
+                        
+                        # Create technical response
+                        tech_response = BidTechnicalResponse.objects.create(
+                            bid=bid,
+                            criterion=criterion,
+                            response_text=response_text,
+                            response_value=response_value,
+                            supplier_remarks=supplier_remarks,
+                            compliance_status='PENDING'
+                        )
+                        
+                        # Save supporting document if uploaded
+                        if doc_file:
+                            tech_response.supporting_document = doc_file
+                            tech_response.save()
+                
+                # Handle mandatory bid documents
+                doc_count = 0
+                uploaded_doc_types = set()
+                
+                # Get all uploaded files and their metadata
+                documents = request.FILES.getlist('documents')
+                doc_types = request.POST.getlist('doc_types')
+                doc_names = request.POST.getlist('doc_names')
+                doc_descriptions = request.POST.getlist('doc_descriptions')
+                
+                if len(documents) != len(doc_types) or len(documents) != len(doc_names):
+                    raise ValueError("Document upload data is inconsistent")
+                
+                # Save each document
+                for i, doc_file in enumerate(documents):
+                    if doc_file:
+                        doc_type = doc_types[i] if i < len(doc_types) else 'OTHER'
+                        doc_name = doc_names[i] if i < len(doc_names) else doc_file.name
+                        doc_desc = doc_descriptions[i] if i < len(doc_descriptions) else ''
+                        
+                        BidDocument.objects.create(
+                            bid=bid,
+                            document_type=doc_type,
+                            document_name=doc_name,
+                            file=doc_file,
+                            description=doc_desc
+                        )
+                        
+                        uploaded_doc_types.add(doc_type)
+                        doc_count += 1
+                
+                # Verify all mandatory document types are uploaded
+                required_doc_types = ['TECHNICAL', 'FINANCIAL', 'COMPLIANCE']
+                missing_docs = [dt for dt in required_doc_types if dt not in uploaded_doc_types]
+                
+                if missing_docs:
+                    raise ValueError(
+                        f"Missing required documents: {', '.join(missing_docs)}"
+                    )
+                
+                if doc_count < 3:
+                    raise ValueError("Please upload all required documents (Technical, Financial, Compliance)")
+                
+                # Create notification for procurement team
+                from pms.models import Notification, User
+                procurement_users = User.objects.filter(role='PROCUREMENT', is_active=True)
+                
+                notify(
+                    procurement_users,
+                    notification_type='TENDER',
+                    priority='MEDIUM',
+                    title=f'New Bid Submitted - {tender.tender_number}',
+                    message=f'{supplier.name} has submitted a bid for {tender.title}. '
+                            f'Bid Amount: KES {bid_amount:,.2f}',
+                    link_url=f'/procurement/bids/{bid.id}/'
+                )
+                
+                # Log the submission
+                from pms.models import AuditLog
+                record_audit(
+                    user=request.user,
+                    action='CREATE',
+                    model_name='Bid',
+                    object_id=str(bid.id),
+                    object_repr=str(bid),
+                    changes={
+                        'bid_number': bid.bid_number,
+                        'tender': tender.tender_number,
+                        'supplier': supplier.name,
+                        'bid_amount': str(bid_amount),
+                        'items_count': requisition_items.count(),
+                        'documents_count': doc_count,
+                        'technical_responses': technical_criteria.count()
+                    },
+                    ip_address=request.META.get('REMOTE_ADDR'),
+                    user_agent=request.META.get('HTTP_USER_AGENT', '')[:500]
+                )
+                
+                messages.success(
+                    request, 
+                    f"Bid {bid.bid_number} submitted successfully! "
+                    f"You will be notified when the evaluation is complete."
+                )
+                return redirect('supplier_bid_detail', bid_id=bid.id)
+                
+        except ValueError as e:
+            messages.error(request, f"Validation Error: {str(e)}")
+        except Exception as e:
+            messages.error(request, f"Error submitting bid: {str(e)}")
+            # Log the error
+            import logging
+            logger = logging.getLogger(__name__)
+            logger.error(f"Bid submission error: {str(e)}", exc_info=True)
+    
+    context = {
+        'tender': tender,
+        'requisition_items': requisition_items,
+        'technical_criteria': technical_criteria,
+        'tender_documents': tender_documents,
+        'supplier': supplier,
+    }
+    
+    return render(request, 'supplier/submit_bid.html', context)
+
+
+@login_required
+def supplier_awarded_contracts(request):
+    """List awarded contracts/bids"""
+    
+    supplier = request.user.supplier_profile
+    
+    # Get awarded bids with purchase orders prefetched
+    awarded_bids = Bid.objects.filter(
+        supplier=supplier,
+        status='AWARDED'
+    ).select_related(
+        'tender',
+        'tender__requisition',
+        'tender__requisition__department'
+    ).prefetch_related(
+        'purchase_order'  # This will prefetch the related PurchaseOrder
+    ).order_by('-submitted_at')
+    
+    context = {
+        'awarded_bids': awarded_bids,
+    }
+    
+    return render(request, 'supplier/awarded_contracts.html', context)
+
+
+# ============================================================================
+# PURCHASE ORDERS
+# ============================================================================
+
+@login_required
+def supplier_purchase_orders_list(request):
+    """List all purchase orders"""
+    
+    supplier = request.user.supplier_profile
+    
+    # Filter options
+    status = request.GET.get('status', 'all')
+    search = request.GET.get('search', '')
+    
+    # Base query
+    pos = PurchaseOrder.objects.filter(supplier=supplier)
+    
+    # Apply filters
+    if status != 'all':
+        pos = pos.filter(status=status)
+    
+    if search:
+        pos = pos.filter(
+            Q(po_number__icontains=search) |
+            Q(requisition__requisition_number__icontains=search)
+        )
+    
+    pos = pos.order_by('-po_date')
+    
+    # Statistics
+    stats = {
+        'total': pos.count(),
+        'pending': pos.filter(status__in=['APPROVED', 'SENT']).count(),
+        'acknowledged': pos.filter(status='ACKNOWLEDGED').count(),
+        'partial': pos.filter(status='PARTIAL_DELIVERY').count(),
+        'delivered': pos.filter(status='DELIVERED').count(),
+        'total_value': pos.aggregate(total=Sum('total_amount'))['total'] or Decimal('0'),
+    }
+    
+    # Pagination
+    paginator = Paginator(pos, 15)
+    page_number = request.GET.get('page')
+    pos_page = paginator.get_page(page_number)
+    
+    context = {
+        'pos': pos_page,
+        'stats': stats,
+        'status_choices': PurchaseOrder.STATUS_CHOICES,
+        'current_status': status,
+        'search': search,
+    }
+    
+    return render(request, 'supplier/purchase_orders_list.html', context)
+
+
+@login_required
+def supplier_purchase_order_detail(request, po_id):
+    """View purchase order details"""
+    
+    supplier = request.user.supplier_profile
+    po = get_object_or_404(PurchaseOrder, id=po_id, supplier=supplier)
+    
+    # Get PO items
+    items = PurchaseOrderItem.objects.filter(purchase_order=po)
+    
+    # Get amendments
+    amendments = po.amendments.all()
+    
+    # Get related GRNs
+    grns = GoodsReceivedNote.objects.filter(purchase_order=po)
+    
+    # Get related invoices
+    invoices = Invoice.objects.filter(purchase_order=po)
+    
+    context = {
+        'po': po,
+        'items': items,
+        'amendments': amendments,
+        'grns': grns,
+        'invoices': invoices,
+        'can_acknowledge': po.status == 'SENT',
+    }
+    
+    return render(request, 'supplier/purchase_order_detail.html', context)
+
+
+@login_required
+def supplier_acknowledge_po(request, po_id):
+    """Acknowledge receipt of purchase order"""
+    
+    supplier = request.user.supplier_profile
+    po = get_object_or_404(PurchaseOrder, id=po_id, supplier=supplier)
+    
+    if po.status != 'SENT':
+        messages.error(request, "This PO cannot be acknowledged.")
+        return redirect('supplier_purchase_order_detail', po_id=po_id)
+    
+    if request.method == 'POST':
+        po.status = 'ACKNOWLEDGED'
+        po.acknowledged_at = timezone.now()
+        po.save()
+        
+        messages.success(request, f"Purchase Order {po.po_number} acknowledged successfully!")
+        return redirect('supplier_purchase_order_detail', po_id=po_id)
+    
+    return render(request, 'supplier/acknowledge_po.html', {'po': po})
+
+
+@login_required
+def supplier_pending_orders(request):
+    """List pending purchase orders requiring action"""
+    
+    supplier = request.user.supplier_profile
+    
+    pending_pos = PurchaseOrder.objects.filter(
+        supplier=supplier,
+        status__in=['SENT', 'ACKNOWLEDGED']
+    ).order_by('delivery_date')
+    
+    context = {
+        'pending_pos': pending_pos,
+    }
+    
+    return render(request, 'supplier/pending_orders.html', context)
+
+
+@login_required
+def supplier_deliveries(request):
+    """Track deliveries and GRNs"""
+    
+    supplier = request.user.supplier_profile
+    
+    # Get all GRNs for supplier's POs
+    grns = GoodsReceivedNote.objects.filter(
+        purchase_order__supplier=supplier
+    ).select_related('purchase_order', 'store').order_by('-created_at')
+    
+    # Pagination
+    paginator = Paginator(grns, 15)
+    page_number = request.GET.get('page')
+    grns_page = paginator.get_page(page_number)
+    
+    context = {
+        'grns': grns_page,
+    }
+    
+    return render(request, 'supplier/deliveries.html', context)
+
+
+@login_required
+def supplier_completed_orders(request):
+    """List completed orders"""
+    
+    supplier = request.user.supplier_profile
+    
+    completed_pos = PurchaseOrder.objects.filter(
+        supplier=supplier,
+        status__in=['DELIVERED', 'CLOSED']
+    ).order_by('-po_date')
+    
+    # Pagination
+    paginator = Paginator(completed_pos, 15)
+    page_number = request.GET.get('page')
+    pos_page = paginator.get_page(page_number)
+    
+    context = {
+        'pos': pos_page,
+    }
+    
+    return render(request, 'supplier/completed_orders.html', context)
+
+
+# ============================================================================
+# INVOICES & PAYMENTS
+# ============================================================================
+
+@login_required
+def supplier_invoices_list(request):
+    """List all supplier invoices"""
+    
+    supplier = request.user.supplier_profile
+    
+    # Filter options
+    status = request.GET.get('status', 'all')
+    search = request.GET.get('search', '')
+    
+    # Base query
+    invoices = Invoice.objects.filter(supplier=supplier)
+    
+    # Apply filters
+    if status != 'all':
+        invoices = invoices.filter(status=status)
+    
+    if search:
+        invoices = invoices.filter(
+            Q(invoice_number__icontains=search) |
+            Q(supplier_invoice_number__icontains=search) |
+            Q(purchase_order__po_number__icontains=search)
+        )
+    
+    invoices = invoices.order_by('-created_at')
+    
+    # Statistics
+    stats = {
+        'total': invoices.count(),
+        'draft': invoices.filter(status='DRAFT').count(),
+        'submitted': invoices.filter(status='SUBMITTED').count(),
+        'approved': invoices.filter(status='APPROVED').count(),
+        'paid': invoices.filter(status='PAID').count(),
+        'total_invoiced': invoices.aggregate(total=Sum('total_amount'))['total'] or Decimal('0'),
+        'total_paid': invoices.filter(status='PAID').aggregate(total=Sum('total_amount'))['total'] or Decimal('0'),
+    }
+    
+    # Pagination
+    paginator = Paginator(invoices, 15)
+    page_number = request.GET.get('page')
+    invoices_page = paginator.get_page(page_number)
+    
+    context = {
+        'invoices': invoices_page,
+        'stats': stats,
+        'status_choices': Invoice.STATUS_CHOICES,
+        'current_status': status,
+        'search': search,
+    }
+    
+    return render(request, 'supplier/invoices_list.html', context)
+
+
+@login_required
+def supplier_invoice_detail(request, invoice_id):
+    """View invoice details"""
+    
+    supplier = request.user.supplier_profile
+    invoice = get_object_or_404(Invoice, id=invoice_id, supplier=supplier)
+    
+    # Get invoice items
+    items = InvoiceItem.objects.filter(invoice=invoice)
+    
+    # Get invoice documents
+    documents = InvoiceDocument.objects.filter(invoice=invoice)
+    
+    # Get payments
+    payments = Payment.objects.filter(invoice=invoice)
+    
+    context = {
+        'invoice': invoice,
+        'items': items,
+        'documents': documents,
+        'payments': payments,
+    }
+    
+    return render(request, 'supplier/invoice_detail.html', context)
+
+
+@login_required
+def get_po_details(request, po_id):
+    """AJAX endpoint to get PO details and items when PO is selected"""
+    try:
+        supplier = request.user.supplier_profile
+        po = get_object_or_404(PurchaseOrder, id=po_id, supplier=supplier)
+        
+        print(f"=== Fetching PO Details for AJAX ===")
+        print(f"PO: {po.po_number}")
+        
+        # Get PO items
+        po_items = []
+        for item in po.items.all():
+            po_items.append({
+                'id': str(item.id),
+                'description': item.item_description,
+                'specifications': item.specifications,
+                'quantity': str(item.quantity),
+                'unit_of_measure': item.unit_of_measure,
+                'unit_price': str(item.unit_price),
+                'total_price': str(item.total_price),
+            })
+        
+        print(f"Found {len(po_items)} items")
+        
+        # Generate suggested invoice number based on supplier code and date
+        supplier_code = po.supplier.supplier_number[-4:] if len(po.supplier.supplier_number) >= 4 else po.supplier.supplier_number
+        date_code = timezone.now().strftime('%Y%m%d')
+        random_suffix = random.randint(100, 999)
+        suggested_invoice_number = f"INV-{supplier_code}-{date_code}-{random_suffix}"
+        
+        print(f"Generated suggested invoice number: {suggested_invoice_number}")
+        
+        return JsonResponse({
+            'success': True,
+            'po_number': po.po_number,
+            'po_date': po.po_date.strftime('%Y-%m-%d'),
+            'department': po.requisition.department.name,
+            'total_amount': str(po.total_amount),
+            'delivery_date': po.delivery_date.strftime('%Y-%m-%d'),
+            'items': po_items,
+            'suggested_invoice_number': suggested_invoice_number,
+        })
+        
+    except Exception as e:
+        print(f"ERROR in get_po_details: {e}")
+        print(traceback.format_exc())
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=400)
+
+
+@login_required
+def supplier_submit_invoice(request, po_id=None):
+    """Submit a new invoice"""
+    
+    print("=" * 80)
+    print("STARTING INVOICE SUBMISSION")
+    print("=" * 80)
+    
+    # Get supplier profile
+    try:
+        supplier = request.user.supplier_profile
+        print(f"✓ Supplier: {supplier.name} (ID: {supplier.id})")
+    except Exception as e:
+        print(f"✗ ERROR: Could not get supplier profile: {e}")
+        messages.error(request, "Supplier profile not found. Please contact administrator.")
+        return redirect('supplier_dashboard')
+    
+    # If PO specified, get it
+    po = None
+    if po_id:
+        try:
+            po = get_object_or_404(PurchaseOrder, id=po_id, supplier=supplier)
+            print(f"✓ Purchase Order: {po.po_number} (ID: {po.id})")
+            print(f"  Status: {po.status}")
+            print(f"  Total Amount: {po.total_amount}")
+        except Exception as e:
+            print(f"✗ ERROR: Could not get purchase order: {e}")
+            messages.error(request, "Purchase order not found.")
+            return redirect('supplier_invoices_list')
+    
+    if request.method == 'POST':
+        print("\n" + "=" * 80)
+        print("PROCESSING POST REQUEST")
+        print("=" * 80)
+        
+        # Debug: Print POST data
+        print("\nPOST Data:")
+        for key, value in request.POST.items():
+            if not key.startswith('items-'):  # Don't print all formset items
+                print(f"  {key}: {value}")
+        
+        invoice_form = InvoiceForm(request.POST, supplier=supplier)
+        item_formset = InvoiceItemFormSet(request.POST, prefix='items')
+        
+        print("\n--- Form Validation ---")
+        print(f"Invoice Form Valid: {invoice_form.is_valid()}")
+        if not invoice_form.is_valid():
+            print(f"Invoice Form Errors: {invoice_form.errors}")
+        
+        print(f"Item Formset Valid: {item_formset.is_valid()}")
+        if not item_formset.is_valid():
+            print(f"Item Formset Errors: {item_formset.errors}")
+            for i, form in enumerate(item_formset):
+                if form.errors:
+                    print(f"  Item {i} errors: {form.errors}")
+        
+        if invoice_form.is_valid() and item_formset.is_valid():
+            try:
+                print("\n--- Creating Invoice ---")
+                
+                # Create invoice
+                invoice = invoice_form.save(commit=False)
+                invoice.supplier = supplier
+                invoice.status = 'SUBMITTED'
+                invoice.submitted_by = request.user
+                
+                # CRITICAL FIX: Initialize money fields to avoid NULL constraint violation
+                invoice.subtotal = Decimal('0.00')
+                invoice.tax_amount = Decimal('0.00')
+                invoice.total_amount = Decimal('0.00')
+                
+                print(f"Invoice object created (not yet saved)")
+                print(f"  Supplier Invoice #: {invoice.supplier_invoice_number}")
+                print(f"  PO: {invoice.purchase_order.po_number if invoice.purchase_order else 'None'}")
+                print(f"  Invoice Date: {invoice.invoice_date}")
+                print(f"  Due Date: {invoice.due_date}")
+                print(f"  Initialized subtotal: {invoice.subtotal}")
+                print(f"  Initialized tax_amount: {invoice.tax_amount}")
+                print(f"  Initialized total_amount: {invoice.total_amount}")
+                
+                # Save invoice to get ID
+                invoice.save()
+                print(f"✓ Invoice saved with ID: {invoice.id}")
+                print(f"✓ System Invoice Number: {invoice.invoice_number}")
+                
+                # Save items and calculate totals
+                print("\n--- Saving Invoice Items ---")
+                items = item_formset.save(commit=False)
+                
+                if not items or len(items) == 0:
+                    print("✗ ERROR: No items to save!")
+                    messages.error(request, "Please add at least one invoice item.")
+                    invoice.delete()  # Clean up
+                    return redirect(request.path)
+                
+                subtotal = Decimal('0.00')
+                tax_total = Decimal('0.00')
+                
+                for idx, item in enumerate(items, 1):
+                    item.invoice = invoice
+                    
+                    # Ensure item totals are calculated
+                    if not item.total_price or item.total_price == 0:
+                        item.total_price = item.quantity * item.unit_price
+                    if not item.tax_amount or item.tax_amount == 0:
+                        item.tax_amount = item.total_price * (item.tax_rate / Decimal('100.0'))
+                    
+                    item.save()
+                    
+                    print(f"Item {idx}:")
+                    print(f"  Description: {item.description[:50]}...")
+                    print(f"  Quantity: {item.quantity}")
+                    print(f"  Unit Price: {item.unit_price}")
+                    print(f"  Tax Rate: {item.tax_rate}%")
+                    print(f"  Total Price: {item.total_price}")
+                    print(f"  Tax Amount: {item.tax_amount}")
+                    
+                    subtotal += item.total_price
+                    tax_total += item.tax_amount
+                
+                print(f"\n--- Calculating Totals ---")
+                print(f"Subtotal: {subtotal}")
+                print(f"Tax Total: {tax_total}")
+                print(f"Other Charges: {invoice.other_charges}")
+                
+                # Update invoice totals
+                invoice.subtotal = subtotal
+                invoice.tax_amount = tax_total
+                invoice.total_amount = subtotal + tax_total + (invoice.other_charges or Decimal('0.00'))
+                
+                # Also initialize balance fields
+                invoice.amount_paid = Decimal('0.00')
+                invoice.balance_due = invoice.total_amount
+                
+                duplicate = find_duplicate_invoice(
+                    supplier.id, invoice.supplier_invoice_number,
+                    invoice.total_amount, invoice.invoice_date, exclude_id=invoice.id
+                )
+                if duplicate:
+                    invoice.delete()  # Clean up
+                    messages.error(
+                        request,
+                        f"Invoice {invoice.supplier_invoice_number} for this amount has already "
+                        f"been submitted as {duplicate.invoice_number}."
+                    )
+                    return redirect(request.path)
+                
+                invoice.save()
+                
+                print(f"✓ Invoice totals updated")
+                print(f"  Final Subtotal: {invoice.subtotal}")
+                print(f"  Final Tax Amount: {invoice.tax_amount}")
+                print(f"  Final Total Amount: {invoice.total_amount}")
+                print(f"  Balance Due: {invoice.balance_due}")
+                
+                # Handle document uploads
+                print("\n--- Processing Documents ---")
+                documents = request.FILES.getlist('documents')
+                doc_names = request.POST.getlist('doc_names')
+                
+                print(f"Number of documents: {len(documents)}")
+                
+                for i, doc_file in enumerate(documents):
+                    doc_name = doc_names[i] if i < len(doc_names) and doc_names[i] else doc_file.name
+                    
+                    InvoiceDocument.objects.create(
+                        invoice=invoice,
+                        document_name=doc_name,
+                        file=doc_file
+                    )
+                    print(f"✓ Document {i+1} saved: {doc_name}")
+                
+                # Send email notification
+                print("\n--- Sending Email Notification ---")
+                try:
+                    send_invoice_notification_email(invoice)
+                    print("✓ Email sent successfully")
+                except Exception as email_error:
+                    print(f"✗ Email Error: {email_error}")
+                    print(traceback.format_exc())
+                    # Don't fail the entire process if email fails
+                    messages.warning(
+                        request, 
+                        f"Invoice submitted successfully but email notification failed. "
+                        f"Please contact procurement office directly."
+                    )
+                
+                print("\n" + "=" * 80)
+                print("✓ INVOICE SUBMISSION COMPLETED SUCCESSFULLY")
+                print("=" * 80)
+                
+                messages.success(
+                    request, 
+                    f"Invoice {invoice.invoice_number} submitted successfully!"
+                )
+                return redirect('supplier_invoice_detail', invoice_id=invoice.id)
+                
+            except Exception as e:
+                print("\n" + "=" * 80)
+                print("✗ ERROR DURING INVOICE CREATION")
+                print("=" * 80)
+                print(f"Error: {e}")
+                print(traceback.format_exc())
+                messages.error(
+                    request, 
+                    f"An error occurred while submitting the invoice: {str(e)}"
+                )
+        else:
+            print("\n✗ Form validation failed")
+            messages.error(request, "Please correct the errors below.")
+    
+    else:
+        print("\n--- GET Request - Initializing Forms ---")
+        
+        initial = {}
+        if po:
+            # Generate suggested invoice number
+            supplier_code = supplier.supplier_number[-4:] if len(supplier.supplier_number) >= 4 else supplier.supplier_number
+            date_code = timezone.now().strftime('%Y%m%d')
+            random_suffix = random.randint(100, 999)
+            suggested_invoice_number = f"INV-{supplier_code}-{date_code}-{random_suffix}"
+            
+            initial = {
+                'purchase_order': po,
+                'supplier_invoice_number': suggested_invoice_number,
+                'invoice_date': timezone.now().date(),
+                'due_date': timezone.now().date() + timedelta(days=30)
+            }
+            print(f"Initial data set for PO: {po.po_number}")
+            print(f"Suggested invoice number: {suggested_invoice_number}")
+        
+        invoice_form = InvoiceForm(initial=initial, supplier=supplier)
+        
+        # If PO specified, pre-fill items
+        if po:
+            po_items = PurchaseOrderItem.objects.filter(purchase_order=po)
+            print(f"Found {po_items.count()} PO items to pre-fill")
+            
+            item_formset = InvoiceItemFormSet(
+                prefix='items',
+                queryset=InvoiceItem.objects.none(),
+                initial=[{
+                    'po_item': item,
+                    'description': item.item_description,
+                    'quantity': item.quantity,
+                    'unit_price': item.unit_price,
+                    'tax_rate': 16,  # Default tax rate
+                } for item in po_items]
+            )
+        else:
+            item_formset = InvoiceItemFormSet(
+                prefix='items', 
+                queryset=InvoiceItem.objects.none()
+            )
+    
+    context = {
+        'invoice_form': invoice_form,
+        'item_formset': item_formset,
+        'po': po,
+    }
+    
+    return render(request, 'supplier/submit_invoice.html', context)
+
+
+def send_invoice_notification_email(invoice):
+    """
+    Send email notification to procurement officer about new invoice submission
+    
+    Args:
+        invoice: Invoice instance
+    """
+    print(f"\n--- Email Details ---")
+    print(f"Invoice: {invoice.invoice_number}")
+    print(f"Supplier: {invoice.supplier.name}")
+    print(f"Amount: {invoice.total_amount}")
+    
+    # Get procurement officer email
+    # Try to get from PO creator, then requisition department HOD, then procurement manager
+    recipient_email = None
+    recipient_name = "Procurement Officer"
+    
+    try:
+        if invoice.purchase_order:
+            po = invoice.purchase_order
+            
+            # Try PO creator
+            if po.created_by and po.created_by.email:
+                recipient_email = po.created_by.email
+                recipient_name = po.created_by.get_full_name()
+                print(f"Recipient: {recipient_name} (PO Creator)")
+            
+            # Try Department HOD
+            elif po.requisition.department.hod and po.requisition.department.hod.email:
+                recipient_email = po.requisition.department.hod.email
+                recipient_name = po.requisition.department.hod.get_full_name()
+                print(f"Recipient: {recipient_name} (Department HOD)")
+            
+            # Try to find any procurement officer
+            else:
+                from pms.models import User
+                procurement_officer = User.objects.filter(
+                    role='PROCUREMENT',
+                    is_active_user=True,
+                    email__isnull=False
+                ).exclude(email='').first()
+                
+                if procurement_officer:
+                    recipient_email = procurement_officer.email
+                    recipient_name = procurement_officer.get_full_name()
+                    print(f"Recipient: {recipient_name} (Procurement Officer)")
+    except Exception as e:
+        print(f"Error finding recipient: {e}")
+    
+    # Fallback to settings
+    if not recipient_email:
+        recipient_email = getattr(settings, 'PROCUREMENT_EMAIL', None)
+        if not recipient_email:
+            recipient_email = getattr(settings, 'DEFAULT_FROM_EMAIL', 'procurement@university.edu')
+        print(f"Using fallback email: {recipient_email}")
+    
+    # Email content
+    subject = f"New Invoice Submitted - {invoice.invoice_number}"
+    
+    message = f"""
+INVOICE SUBMISSION NOTIFICATION
+================================
+
+A new invoice has been submitted by {invoice.supplier.name}.
+
+INVOICE DETAILS:
+-----------------
+Invoice Number:     {invoice.invoice_number}
+Supplier Invoice #: {invoice.supplier_invoice_number}
+Supplier:           {invoice.supplier.name}
+Purchase Order:     {invoice.purchase_order.po_number if invoice.purchase_order else 'N/A'}
+Invoice Date:       {invoice.invoice_date.strftime('%B %d, %Y')}
+Due Date:           {invoice.due_date.strftime('%B %d, %Y')}
+
+AMOUNT:
+-------
+Subtotal:           KES {invoice.subtotal:,.2f}
+Tax:                KES {invoice.tax_amount:,.2f}
+Other Charges:      KES {invoice.other_charges:,.2f}
+TOTAL AMOUNT:       KES {invoice.total_amount:,.2f}
+
+ITEMS:
+------
+"""
+    
+    # Add items
+    for idx, item in enumerate(invoice.items.all(), 1):
+        message += f"""
+{idx}. {item.description[:80]}
+   Quantity: {item.quantity} x {item.unit_price} = {item.total_price:,.2f}
+"""
+    
+    message += f"""
+
+NOTES:
+------
+{invoice.notes if invoice.notes else 'No additional notes'}
+
+ACTION REQUIRED:
+----------------
+Please review and verify this invoice in the procurement system.
+
+Login to the system to view full details and take appropriate action.
+
+---
+This is an automated notification from the University Procurement System.
+Submitted by: {invoice.submitted_by.get_full_name() if invoice.submitted_by else invoice.supplier.name}
+Submission Date: {timezone.now().strftime('%B %d, %Y at %I:%M %p')}
+"""
+    
+    print(f"\nEmail Subject: {subject}")
+    print(f"Email To: {recipient_email}")
+    print(f"Email Length: {len(message)} characters")
+    
+    # Send email
+    from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@university.edu')
+    
+    try:
+        send_mail(
+            subject=subject,
+            message=message,
+            from_email=from_email,
+            recipient_list=[recipient_email],
+            fail_silently=False,
+        )
+        print("✓ Email sent via send_mail()")
+        
+        # Log the email
+        try:
+            from pms.models import EmailLog
+            EmailLog.objects.create(
+                recipient=recipient_email,
+                subject=subject,
+                body=message,
+                status='SENT',
+                sent_at=timezone.now()
+            )
+            print("✓ Email logged to database")
+        except Exception as log_error:
+            print(f"Warning: Could not log email: {log_error}")
+            
+    except Exception as e:
+        print(f"✗ Failed to send email: {e}")
+        print(traceback.format_exc())
+        
+        # Log the failed email
+        try:
+            from pms.models import EmailLog
+            EmailLog.objects.create(
+                recipient=recipient_email,
+                subject=subject,
+                body=message,
+                status='FAILED',
+                error_message=str(e)
+            )
+            print("✓ Failed email logged to database")
+        except Exception as log_error:
+            print(f"Warning: Could not log failed email: {log_error}")
+        
+        raise  # Re-raise to be caught by the calling function
+
+
+@login_required
+def supplier_payments(request):
+    """View payment information"""
+    
+    supplier = request.user.supplier_profile
+    
+    # Get all payments for supplier's invoices
+    payments = Payment.objects.filter(
+        invoice__supplier=supplier
+    ).select_related('invoice').order_by('-payment_date')
+    
+    # Statistics
+    stats = {
+        'total_paid': payments.filter(status='COMPLETED').aggregate(
+            total=Sum('payment_amount')
+        )['total'] or Decimal('0'),
+        'pending': payments.filter(status='PENDING').aggregate(
+            total=Sum('payment_amount')
+        )['total'] or Decimal('0'),
+        'this_month': payments.filter(
+            status='COMPLETED',
+            payment_date__gte=timezone.now().date().replace(day=1)
+        ).aggregate(total=Sum('payment_amount'))['total'] or Decimal('0'),
+    }
+    
+    # Pagination
+    paginator = Paginator(payments, 15)
+    page_number = request.GET.get('page')
+    payments_page = paginator.get_page(page_number)
+    
+    context = {
+        'payments': payments_page,
+        'stats': stats,
+    }
+    
+    return render(request, 'supplier/payments.html', context)
+
+
+@login_required
+def supplier_payment_history(request):
+    """Detailed payment history with filters"""
+    
+    supplier = request.user.supplier_profile
+    
+    # Date filters
+    start_date = request.GET.get('start_date')
+    end_date = request.GET.get('end_date')
+    status = request.GET.get('status', 'all')
+    
+    # Base query
+    payments = Payment.objects.filter(
+        invoice__supplier=supplier
+    ).select_related('invoice', 'invoice__purchase_order')
+    
+    # Apply filters
+    if start_date:
+        payments = payments.filter(payment_date__gte=start_date)
+    if end_date:
+        payments = payments.filter(payment_date__lte=end_date)
+    if status != 'all':
+        payments = payments.filter(status=status)
+    
+    payments = payments.order_by('-payment_date')
+    
+    # Calculate totals
+    totals = payments.aggregate(
+        total=Sum('payment_amount'),
+        count=Count('id')
+    )
+    
+    # Pagination
+    paginator = Paginator(payments, 20)
+    page_number = request.GET.get('page')
+    payments_page = paginator.get_page(page_number)
+    
+    context = {
+        'payments': payments_page,
+        'totals': totals,
+        'status_choices': Payment.PAYMENT_STATUS,
+        'current_status': status,
+        'start_date': start_date,
+        'end_date': end_date,
+    }
+    
+    return render(request, 'supplier/payment_history.html', context)
+
+
+# ============================================================================
+# SUPPLIER PROFILE & DOCUMENTS
+# ============================================================================
+
+@login_required
+def supplier_company_profile(request):
+    """View and edit company profile"""
+    
+    supplier = request.user.supplier_profile
+    
+    if request.method == 'POST':
+        form = SupplierProfileForm(request.POST, instance=supplier)
+        if form.is_valid():
+            form.save()
+            messages.success(request, "Company profile updated successfully!")
+            return redirect('supplier_company_profile')
+    else:
+        form = SupplierProfileForm(instance=supplier)
+    
+    # Performance statistics
+    performance_stats = SupplierPerformance.objects.filter(
+        supplier=supplier
+    ).aggregate(
+        avg_quality=Avg('quality_rating'),
+        avg_delivery=Avg('delivery_rating'),
+        avg_service=Avg('service_rating'),
+        avg_overall=Avg('overall_rating'),
+        count=Count('id')
+    )
+    
+    context = {
+        'form': form,
+        'supplier': supplier,
+        'performance_stats': performance_stats,
+    }
+    
+    return render(request, 'supplier/company_profile.html', context)
+
+@login_required
+def supplier_documents(request):
+    """Manage supplier documents"""
+    
+    supplier = request.user.supplier_profile
+    
+    # Get all documents
+    documents = SupplierDocument.objects.filter(
+        supplier=supplier
+    ).order_by('-uploaded_at')
+    
+    # Check for expiring documents
+    today = timezone.now().date()
+    expiring_threshold = today + timedelta(days=30)
+    
+    expiring_soon = documents.filter(
+        expiry_date__lte=expiring_threshold,
+        expiry_date__gte=today
+    )
+    
+    expired = documents.filter(expiry_date__lt=today)
+    
+    # Count verified documents
+    verified_count = documents.filter(is_verified=True).count()
+    
+    # Check which document types exist (for checklist)
+    has_registration = documents.filter(document_type='REGISTRATION').exists()
+    has_tax = documents.filter(document_type='TAX').exists()
+    has_bank = documents.filter(document_type='BANK').exists()
+    has_license = documents.filter(document_type='LICENSE').exists()
+    has_insurance = documents.filter(document_type='INSURANCE').exists()
+    
+    if request.method == 'POST':
+        form = SupplierDocumentForm(request.POST, request.FILES)
+        if form.is_valid():
+            doc = form.save(commit=False)
+            doc.supplier = supplier
+            doc.save()
+            from pms.compliance import refresh_supplier
+            refresh_supplier(supplier)
+            messages.success(request, "Document uploaded successfully!")
+            return redirect('supplier_documents')
+    else:
+        form = SupplierDocumentForm()
+    
+    context = {
+        'documents': documents,
+        'expiring_soon': expiring_soon,
+        'expired': expired,
+        'form': form,
+        'today': today,
+        'expiring_threshold': expiring_threshold,
+        'verified_count': verified_count,
+        'has_registration': has_registration,
+        'has_tax': has_tax,
+        'has_bank': has_bank,
+        'has_license': has_license,
+        'has_insurance': has_insurance,
+    }
+    
+    return render(request, 'supplier/documents.html', context)
+
+@login_required
+def supplier_certifications(request):
+    """View certifications and compliance status"""
+    
+    supplier = request.user.supplier_profile
+    
+    # Get certification documents
+    certifications = SupplierDocument.objects.filter(
+        supplier=supplier,
+        document_type__in=['REGISTRATION', 'LICENSE', 'INSURANCE']
+    ).order_by('-uploaded_at')
+
+    # Calculate dates
+    today = timezone.now().date()
+    expiring_threshold = today + timedelta(days=30)
+    
+    # Compliance status
+    compliance = {
+        'tax_compliant': supplier.tax_compliance_expiry and supplier.tax_compliance_expiry >= today,
+        'registration_valid': supplier.registration_expiry and supplier.registration_expiry >= today,
+        'documents_verified': certifications.filter(is_verified=True).count(),
+        'total_documents': certifications.count(),
+    }
+    
+    # Check which certificate types exist
+    has_license = certifications.filter(document_type='LICENSE').exists()
+    has_insurance = certifications.filter(document_type='INSURANCE').exists()
+
+    context = {
+        'certifications': certifications,
+        'compliance': compliance,
+        'supplier': supplier,
+        'today': today,
+        'expiring_threshold': expiring_threshold,
+        'has_license': has_license,
+        'has_insurance': has_insurance,
+    }
+
+    return render(request, 'supplier/certifications.html', context)
+
+#============================================================================
+#SUPPORT & HELP
+#============================================================================
+@login_required
+def supplier_help_center(request):
+    """Help center and FAQs"""
+    faqs = [
+        {
+            'question': 'How do I submit a bid?',
+            'answer': 'Navigate to "Available Tenders", select a tender, and click "Submit Bid". Fill in all required information and upload necessary documents.'
+        },
+        {
+            'question': 'When will I receive payment?',
+            'answer': 'Payments are typically processed within 30 days of invoice approval. You can track payment status in the "Payments" section.'
+        },
+        # Add more FAQs
+    ]
+
+    context = {
+        'faqs': faqs,
+    }
+
+    return render(request, 'supplier/help_center.html', context)
+
+@login_required
+def supplier_contact_support(request):
+    """Contact support form"""
+    if request.method == 'POST':
+        subject = request.POST.get('subject')
+        message = request.POST.get('message')
+        
+        # Send email or create support ticket
+        # Implementation depends on your requirements
+        
+        messages.success(request, "Your message has been sent. We'll get back to you soon!")
+        return redirect('supplier_dashboard')
+
+    return render(request, 'supplier/contact_support.html')
@@ -0,0 +1,3100 @@
+"""
+Tender and bid views: tenders, evaluation committees, bid opening,
+technical and financial evaluation, comparison and award.
+"""
+
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.mail import EmailMultiAlternatives, send_mail
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min, Q, Sum
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+from django.views.decorators.http import require_http_methods
+
+from pms.audit import record_audit
+from pms.models import (
+    Bid, BidEvaluation, BidTechnicalResponse, CombinedEvaluationResult,
+    CommitteeMember, EmailLog, EvaluationCommittee, EvaluationCriteria,
+    FinancialEvaluationScore, Notification, PurchaseOrder, Requisition,
+    Supplier, TechnicalEvaluationScore, Tender, TenderDocument, User,
+)
+from pms.notifications import bulk_notify, notify
+from pms.price_index import price_benchmark
+
+
+@login_required
+def tender_list(request):
+    """List all tenders with filters"""
+    # Check permissions
+    if request.user.role not in ['PROCUREMENT', 'ADMIN', 'HOD', 'FINANCE']:
+        messages.error(request, 'You do not have permission to access tenders.')
+        return redirect('dashboard')
+    
+    tenders = Tender.objects.select_related(
+        'requisition__department', 'created_by'
+    ).prefetch_related('invited_suppliers', 'bids')
+    
+    # Filters
+    status_filter = request.GET.get('status', '')
+    tender_type_filter = request.GET.get('tender_type', '')
+    method_filter = request.GET.get('method', '')
+    search_query = request.GET.get('search', '')
+    date_from = request.GET.get('date_from', '')
+    date_to = request.GET.get('date_to', '')
+    
+    if status_filter:
+        tenders = tenders.filter(status=status_filter)
+    
+    if tender_type_filter:
+        tenders = tenders.filter(tender_type=tender_type_filter)
+    
+    if method_filter:
+        tenders = tenders.filter(procurement_method=method_filter)
+    
+    if search_query:
+        tenders = tenders.filter(
+            Q(tender_number__icontains=search_query) |
+            Q(title__icontains=search_query) |
+            Q(description__icontains=search_query)
+        )
+    
+    if date_from:
+        tenders = tenders.filter(created_at__gte=date_from)
+    
+    if date_to:
+        tenders = tenders.filter(created_at__lte=date_to)
+    
+    # Statistics
+    total_count = tenders.count()
+    published_count = tenders.filter(status='PUBLISHED').count()
+    closed_count = tenders.filter(status='CLOSED').count()
+    evaluating_count = tenders.filter(status='EVALUATING').count()
+    awarded_count = tenders.filter(status='AWARDED').count()
+    total_value = tenders.aggregate(Sum('estimated_budget'))['estimated_budget__sum'] or 0
+    
+    # Pagination
+    paginator = Paginator(tenders.order_by('-created_at'), 15)
+    page_number = request.GET.get('page', 1)
+    page_obj = paginator.get_page(page_number)
+    
+    context = {
+        'tenders': page_obj,
+        'page_obj': page_obj,
+        'status_filter': status_filter,
+        'tender_type_filter': tender_type_filter,
+        'method_filter': method_filter,
+        'search_query': search_query,
+        'date_from': date_from,
+        'date_to': date_to,
+        'total_count': total_count,
+        'published_count': published_count,
+        'closed_count': closed_count,
+        'evaluating_count': evaluating_count,
+        'awarded_count': awarded_count,
+        'total_value': total_value,
+        'status_choices': Tender.STATUS_CHOICES,
+        'tender_type_choices': Tender.TENDER_TYPES,
+        'method_choices': Tender.METHOD_CHOICES,
+    }
+    
+    return render(request, 'tenders/tender_list.html', context)
+
+
+@login_required
+def tender_create(request):
+    """Create new tender"""
+    if request.user.role not in ['PROCUREMENT', 'ADMIN']:
+        messages.error(request, 'You do not have permission to create tenders.')
+        return redirect('tender_list')
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                # Get requisition
+                requisition_id = request.POST.get('requisition')
+                requisition = get_object_or_404(Requisition, id=requisition_id)
+                
+                # Create tender
+                tender = Tender.objects.create(
+                    requisition=requisition,
+                    title=request.POST.get('title'),
+                    tender_type=request.POST.get('tender_type'),
+                    procurement_method=request.POST.get('procurement_method'),
+                    description=request.POST.get('description'),
+                    closing_date=request.POST.get('closing_date'),
+                    bid_opening_date=request.POST.get('bid_opening_date'),
+                    estimated_budget=Decimal(request.POST.get('estimated_budget')),
+                    created_by=request.user,
+                    status='DRAFT'
+                )
+                
+                # Add invited suppliers if restricted tender
+                if tender.procurement_method == 'RESTRICTED':
+                    supplier_ids = request.POST.getlist('invited_suppliers')
+                    if supplier_ids:
+                        tender.invited_suppliers.set(supplier_ids)
+                
+                # Create evaluation criteria
+                criteria_json = request.POST.get('criteria_json', '[]')
+                if criteria_json and criteria_json != '[]':
+                    criteria_data = json.loads(criteria_json)
+                    for idx, criterion in enumerate(criteria_data, 1):
+                        EvaluationCriteria.objects.create(
+                            tender=tender,
+                            criterion_name=criterion.get('criterion_name', ''),
+                            criterion_type=criterion.get('criterion_type', 'GENERAL'),
+                            description=criterion.get('description', criterion.get('criterion_name', '')),
+                            weight=Decimal(str(criterion.get('weight', 0))),
+                            max_score=Decimal(str(criterion.get('max_score', 100))),
+                            is_mandatory=criterion.get('is_mandatory', False),
+                            sequence=idx
+                        )
+                
+                # Handle tender documents
+                document_count = 0
+                for key in request.POST.keys():
+                    if key.startswith('document_') and key.endswith('_file'):
+                        document_count += 1
+                
+                for i in range(1, document_count + 1):
+                    file_key = f'document_{i}_file'
+                    if file_key in request.FILES:
+                        file = request.FILES[file_key]
+                        description_key = f'document_{i}_description'
+                        mandatory_key = f'document_{i}_mandatory'
+                        
+                        TenderDocument.objects.create(
+                            tender=tender,
+                            document_name=file.name,
+                            file=file,
+                            description=request.POST.get(description_key, ''),
+                            is_mandatory=mandatory_key in request.POST
+                        )
+                
+                # Create audit log
+                record_audit(
+                    user=request.user,
+                    action='CREATE',
+                    model_name='Tender',
+                    object_id=str(tender.id),
+                    object_repr=tender.tender_number,
+                    changes={'status': 'DRAFT', 'created': True}
+                )
+                
+                messages.success(request, f'Tender {tender.tender_number} created successfully!')
+                
+                # Check if publish action
+                if request.POST.get('action') == 'publish':
+                    return redirect('tender_publish', pk=tender.id)
+                
+                return redirect('tender_detail', pk=tender.id)
+                
+        except Exception as e:
+            messages.error(request, f'Error creating tender: {str(e)}')
+            import traceback
+            print(traceback.format_exc())  # For debugging
+            return redirect('tender_create')
+    
+    # GET request - show form
+    # Get approved requisitions without tenders
+    requisitions = Requisition.objects.filter(
+        status='APPROVED',
+        tenders__isnull=True
+    ).select_related('department', 'requested_by')
+    
+    suppliers = Supplier.objects.filter(status='APPROVED').order_by('name')
+    
+    context = {
+        'requisitions': requisitions,
+        'suppliers': suppliers,
+        'tender_type_choices': Tender.TENDER_TYPES,
+        'method_choices': Tender.METHOD_CHOICES,
+    }
+    
+    return render(request, 'tenders/tender_create.html', context)
+
+
+@login_required
+def edit_tender(request, tender_id):
+    tender = get_object_or_404(Tender, id=tender_id)
+
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                # Update basic fields
+                tender.title = request.POST.get('title')
+                tender.tender_type = request.POST.get('tender_type')
+                tender.procurement_method = request.POST.get('procurement_method')
+                tender.description = request.POST.get('description')
+                tender.closing_date = request.POST.get('closing_date')
+                tender.bid_opening_date = request.POST.get('bid_opening_date')
+                tender.estimated_budget = request.POST.get('estimated_budget')
+                tender.status = request.POST.get('status')
+
+                # Optional publish date logic
+                if tender.status == 'PUBLISHED' and not tender.publish_date:
+                    tender.publish_date = timezone.now()
+
+                tender.save()
+
+                # Update invited suppliers - Filter out empty strings
+                supplier_ids = request.POST.getlist('invited_suppliers')
+                # Remove empty strings and invalid UUIDs
+                valid_supplier_ids = [
+                    sid for sid in supplier_ids 
+                    if sid and sid.strip()  # Only non-empty values
+                ]
+                
+                if valid_supplier_ids:
+                    tender.invited_suppliers.set(valid_supplier_ids)
+                else:
+                    # Clear all suppliers if none selected
+                    tender.invited_suppliers.clear()
+
+                # Handle document deletion
+                delete_doc_ids = request.POST.getlist('delete_documents')
+                # Filter out empty strings from delete_doc_ids too
+                valid_delete_ids = [
+                    did for did in delete_doc_ids 
+                    if did and did.strip()
+                ]
+                if valid_delete_ids:
+                    TenderDocument.objects.filter(
+                        id__in=valid_delete_ids,
+                        tender=tender
+                    ).delete()
+
+                # Handle new document uploads
+                document_count = 0
+                for key in request.POST.keys():
+                    if key.startswith('document_') and key.endswith('_file'):
+                        try:
+                            # Extract index from key like 'document_1_file'
+                            index = key.replace('document_', '').replace('_file', '')
+                            document_count = max(document_count, int(index))
+                        except ValueError:
+                            continue
+                
+                for i in range(1, document_count + 1):
+                    file_key = f'document_{i}_file'
+                    if file_key in request.FILES:
+                        file = request.FILES[file_key]
+                        description_key = f'document_{i}_description'
+                        mandatory_key = f'document_{i}_mandatory'
+                        
+                        TenderDocument.objects.create(
+                            tender=tender,
+                            document_name=file.name,
+                            file=file,
+                            description=request.POST.get(description_key, ''),
+                            is_mandatory=mandatory_key in request.POST
+                        )
+
+                # Create audit log
+                record_audit(
+                    user=request.user,
+                    action='UPDATE',
+                    model_name='Tender',
+                    object_id=str(tender.id),
+                    object_repr=tender.tender_number,
+                    changes={
+                        'title': tender.title,
+                        'status': tender.status,
+                        'suppliers_count': tender.invited_suppliers.count()
+                    }
+                )
+
+                messages.success(request, 'Tender updated successfully.')
+                return redirect('tender_detail', pk=tender.id)
+
+        except Exception as e:
+            messages.error(request, f'Error updating tender: {str(e)}')
+            import traceback
+            print(traceback.format_exc())  # For debugging
+
+    # GET request context
+    context = {
+        'tender': tender,
+        'existing_documents': tender.documents.all(),
+        'suppliers': Supplier.objects.filter(status='APPROVED').order_by('name'),
+        'tender_types': Tender.TENDER_TYPES,
+        'procurement_methods': Tender.METHOD_CHOICES,
+        'status_choices': Tender.STATUS_CHOICES,
+    }
+
+    return render(request, 'tenders/tender_edit.html', context)
+
+
+@login_required
+def tender_detail(request, pk):
+    """View tender details with evaluation committee"""
+    tender = get_object_or_404(
+        Tender.objects.select_related(
+            'requisition__department', 'created_by'
+        ).prefetch_related(
+            'documents',
+            'bids__supplier',
+            'bids__evaluations',
+            'evaluation_criteria',
+            'invited_suppliers'
+        ),
+        pk=pk
+    )
+    
+    # Check permissions
+    can_edit = False
+    can_publish = False
+    can_evaluate = False
+    can_award = False
+    can_manage_committee = False
+    
+    if request.user.role == 'ADMIN':
+        can_edit = True
+        can_publish = True
+        can_evaluate = True
+        can_award = True
+        can_manage_committee = True
+    elif request.user.role == 'PROCUREMENT':
+        can_edit = tender.status == 'DRAFT'
+        can_publish = tender.status == 'DRAFT'
+        can_evaluate = tender.status in ['CLOSED', 'EVALUATING']
+        can_award = tender.status == 'EVALUATING'
+        can_manage_committee = True
+    
+    # Get bids statistics
+    bids_stats = {
+        'total': tender.bids.count(),
+        'submitted': tender.bids.filter(status='SUBMITTED').count(),
+        'qualified': tender.bids.filter(status='QUALIFIED').count(),
+        'disqualified': tender.bids.filter(status='DISQUALIFIED').count(),
+        'lowest_bid': tender.bids.aggregate(Min('bid_amount'))['bid_amount__min'],
+        'highest_bid': tender.bids.aggregate(Max('bid_amount'))['bid_amount__max'],
+        'average_bid': tender.bids.aggregate(Avg('bid_amount'))['bid_amount__avg'],
+    }
+    
+    # Get evaluation summary
+    evaluation_complete = False
+    if tender.status == 'EVALUATING':
+        total_bids = tender.bids.exclude(status='DISQUALIFIED').count()
+        evaluated_bids = tender.bids.exclude(status='DISQUALIFIED').filter(
+            evaluations__isnull=False
+        ).distinct().count()
+        evaluation_complete = total_bids > 0 and total_bids == evaluated_bids
+    
+    # Get evaluation committee information
+    committee = None
+    committee_members = []
+    committee_summary = None
+    
+    if tender.status in ['PUBLISHED', 'CLOSED', 'EVALUATING', 'AWARDED']:
+        committee = EvaluationCommittee.objects.filter(
+            tender=tender,
+            status='ACTIVE'
+        ).select_related(
+            'chairperson',
+            'secretary'
+        ).prefetch_related(
+            'members__user__department',
+            'members__department'
+        ).first()
+        
+        if committee:
+            # Get total bids to evaluate
+            total_bids = tender.bids.exclude(status='DISQUALIFIED').count()
+            
+            # Build committee members list with evaluation status
+            for member in committee.members.filter(is_active=True).select_related('user', 'department'):
+                # Count evaluations done by this member
+                technical_evaluated = TechnicalEvaluationScore.objects.filter(
+                    evaluator=member.user,
+                    bid__tender=tender
+                ).values('bid').distinct().count()
+                
+                financial_evaluated = FinancialEvaluationScore.objects.filter(
+                    evaluator=member.user,
+                    bid__tender=tender
+                ).values('bid').distinct().count()
+                
+                # Determine evaluated count based on committee type
+                if committee.committee_type == 'TECHNICAL':
+                    evaluated_count = technical_evaluated
+                elif committee.committee_type == 'FINANCIAL':
+                    evaluated_count = financial_evaluated
+                else:  # COMBINED
+                    evaluated_count = min(technical_evaluated, financial_evaluated)
+                
+                progress = (evaluated_count / total_bids * 100) if total_bids > 0 else 0
+                
+                committee_members.append({
+                    'id': member.id,
+                    'user': member.user,
+                    'role': member.role,
+                    'role_display': member.get_role_display(),
+                    'department': member.department,
+                    'expertise_area': member.expertise_area,
+                    'has_conflict': member.has_conflict,
+                    'conflict_details': member.conflict_details,
+                    'appointed_at': member.appointed_at,
+                    'technical_evaluated': technical_evaluated,
+                    'financial_evaluated': financial_evaluated,
+                    'evaluated_count': evaluated_count,
+                    'total_bids': total_bids,
+                    'progress_percentage': round(progress, 2),
+                    'is_complete': evaluated_count >= total_bids if total_bids > 0 else False,
+                })
+            
+            # Committee summary
+            members_completed = sum(1 for m in committee_members if m['is_complete'])
+            committee_summary = {
+                'total_members': len(committee_members),
+                'members_completed': members_completed,
+                'total_bids': total_bids,
+                'completion_percentage': round(
+                    (members_completed / len(committee_members) * 100) if committee_members else 0,
+                    2
+                )
+            }
+    
+    context = {
+        'tender': tender,
+        'can_edit': can_edit,
+        'can_publish': can_publish,
+        'can_evaluate': can_evaluate,
+        'can_award': can_award,
+        'can_manage_committee': can_manage_committee,
+        'bids_stats': bids_stats,
+        'evaluation_complete': evaluation_complete,
+        'committee': committee,
+        'committee_members': committee_members,
+        'committee_summary': committee_summary,
+    }
+    
+    return render(request, 'tenders/tender_detail.html', context)
+
+
+@login_required
+@require_http_methods(["POST"])
+def create_evaluation_committee(request, tender_id):
+    """Create evaluation committee for a tender"""
+    
+    # Check permissions
+    if request.user.role not in ['ADMIN', 'PROCUREMENT']:
+        return JsonResponse({
+            'success': False,
+            'error': 'You do not have permission to create evaluation committees'
+        }, status=403)
+    
+    tender = get_object_or_404(Tender, pk=tender_id)
+    
+    # Check if tender can have committee
+    if tender.status not in ['PUBLISHED', 'CLOSED', 'EVALUATING']:
+        return JsonResponse({
+            'success': False,
+            'error': 'Committee can only be created for published/closed tenders'
+        }, status=400)
+    
+    try:
+        data = json.loads(request.body)
+        
+        with transaction.atomic():
+            # Create committee
+            committee = EvaluationCommittee.objects.create(
+                tender=tender,
+                committee_type=data.get('committee_type', 'COMBINED'),
+                name=data.get('name', f'Evaluation Committee - {tender.tender_number}'),
+                chairperson_id=data.get('chairperson_id'),
+                secretary_id=data.get('secretary_id'),
+                appointment_date=data.get('appointment_date', timezone.now().date()),
+                terms_of_reference=data.get('terms_of_reference', ''),
+                evaluation_guidelines=data.get('evaluation_guidelines', ''),
+            )
+            
+            # Add members
+            members_data = data.get('members', [])
+            for member_data in members_data:
+                CommitteeMember.objects.create(
+                    committee=committee,
+                    user_id=member_data['user_id'],
+                    role=member_data.get('role', 'MEMBER'),
+                    department_id=member_data.get('department_id'),
+                    expertise_area=member_data.get('expertise_area', ''),
+                    has_conflict=member_data.get('has_conflict', False),
+                    conflict_details=member_data.get('conflict_details', ''),
+                )
+            
+            return JsonResponse({
+                'success': True,
+                'message': 'Evaluation committee created successfully',
+                'committee_id': str(committee.id),
+                'committee_number': committee.committee_number
+            })
+            
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=400)
+
+
+@login_required
+@require_http_methods(["POST"])
+def add_committee_member(request, committee_id):
+    """Add a member to evaluation committee"""
+    
+    # Check permissions
+    if request.user.role not in ['ADMIN', 'PROCUREMENT']:
+        return JsonResponse({
+            'success': False,
+            'error': 'You do not have permission to add committee members'
+        }, status=403)
+    
+    committee = get_object_or_404(EvaluationCommittee, pk=committee_id)
+    
+    # Check if committee is active
+    if committee.status != 'ACTIVE':
+        return JsonResponse({
+            'success': False,
+            'error': 'Cannot add members to inactive committee'
+        }, status=400)
+    
+    try:
+        data = json.loads(request.body)
+        
+        # Check if user is already a member
+        if CommitteeMember.objects.filter(
+            committee=committee,
+            user_id=data['user_id']
+        ).exists():
+            return JsonResponse({
+                'success': False,
+                'error': 'User is already a member of this committee'
+            }, status=400)
+        
+        member = CommitteeMember.objects.create(
+            committee=committee,
+            user_id=data['user_id'],
+            role=data.get('role', 'MEMBER'),
+            department_id=data.get('department_id'),
+            expertise_area=data.get('expertise_area', ''),
+            has_conflict=data.get('has_conflict', False),
+            conflict_details=data.get('conflict_details', ''),
+        )
+        
+        return JsonResponse({
+            'success': True,
+            'message': 'Committee member added successfully',
+            'member_id': str(member.id)
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=400)
+
+
+@login_required
+@require_http_methods(["POST"])
+def remove_committee_member(request, member_id):
+    """Remove a member from evaluation committee"""
+    
+    # Check permissions
+    if request.user.role not in ['ADMIN', 'PROCUREMENT']:
+        return JsonResponse({
+            'success': False,
+            'error': 'You do not have permission to remove committee members'
+        }, status=403)
+    
+    member = get_object_or_404(CommitteeMember, pk=member_id)
+    
+    # Check if committee is active
+    if member.committee.status != 'ACTIVE':
+        return JsonResponse({
+            'success': False,
+            'error': 'Cannot remove members from inactive committee'
+        }, status=400)
+    
+    # Check if member has already evaluated
+    has_evaluated = (
+        TechnicalEvaluationScore.objects.filter(
+            evaluator=member.user,
+            bid__tender=member.committee.tender
+        ).exists() or
+        FinancialEvaluationScore.objects.filter(
+            evaluator=member.user,
+            bid__tender=member.committee.tender
+        ).exists()
+    )
+    
+    if has_evaluated:
+        return JsonResponse({
+            'success': False,
+            'error': 'Cannot remove member who has already evaluated bids'
+        }, status=400)
+    
+    member.delete()
+    
+    return JsonResponse({
+        'success': True,
+        'message': 'Committee member removed successfully'
+    })
+
+
+@login_required
+@require_http_methods(["GET"])
+def get_committee_members(request, tender_id):
+    """Get evaluation committee members for a tender with evaluation status"""
+    
+    tender = get_object_or_404(Tender, pk=tender_id)
+    
+    try:
+        # Get active committee for this tender
+        committee = EvaluationCommittee.objects.filter(
+            tender=tender,
+            status='ACTIVE'
+        ).select_related(
+            'chairperson',
+            'secretary'
+        ).prefetch_related(
+            'members__user',
+            'members__department'
+        ).first()
+        
+        if not committee:
+            return JsonResponse({
+                'success': True,
+                'has_committee': False,
+                'committee': None,
+                'members': []
+            })
+        
+        # Get all bids for this tender (excluding disqualified)
+        total_bids = tender.bids.exclude(status='DISQUALIFIED').count()
+        
+        # Build members list with evaluation status
+        members_list = []
+        for member in committee.members.filter(is_active=True):
+            # Count technical evaluations done by this member
+            technical_evaluated = TechnicalEvaluationScore.objects.filter(
+                evaluator=member.user,
+                bid__tender=tender
+            ).values('bid').distinct().count()
+            
+            # Count financial evaluations done by this member
+            financial_evaluated = FinancialEvaluationScore.objects.filter(
+                evaluator=member.user,
+                bid__tender=tender
+            ).values('bid').distinct().count()
+            
+            # Determine evaluation status based on committee type
+            if committee.committee_type == 'TECHNICAL':
+                evaluated_count = technical_evaluated
+            elif committee.committee_type == 'FINANCIAL':
+                evaluated_count = financial_evaluated
+            else:  # COMBINED
+                # For combined, member should evaluate both
+                evaluated_count = min(technical_evaluated, financial_evaluated)
+            
+            evaluation_progress = (evaluated_count / total_bids * 100) if total_bids > 0 else 0
+            
+            members_list.append({
+                'id': str(member.id),
+                'user': {
+                    'id': str(member.user.id),
+                    'name': member.user.get_full_name(),
+                    'email': member.user.email,
+                    'role': member.user.get_role_display(),
+                },
+                'role': member.role,
+                'role_display': member.get_role_display(),
+                'department': {
+                    'id': str(member.department.id) if member.department else None,
+                    'name': member.department.name if member.department else None,
+                } if member.department else None,
+                'expertise_area': member.expertise_area,
+                'has_conflict': member.has_conflict,
+                'conflict_details': member.conflict_details,
+                'appointed_at': member.appointed_at.isoformat(),
+                'evaluation_status': {
+                    'total_bids': total_bids,
+                    'technical_evaluated': technical_evaluated,
+                    'financial_evaluated': financial_evaluated,
+                    'evaluated_count': evaluated_count,
+                    'progress_percentage': round(evaluation_progress, 2),
+                    'is_complete': evaluated_count >= total_bids if total_bids > 0 else False,
+                }
+            })
+        
+        committee_data = {
+            'id': str(committee.id),
+            'committee_number': committee.committee_number,
+            'committee_type': committee.committee_type,
+            'committee_type_display': committee.get_committee_type_display(),
+            'name': committee.name,
+            'status': committee.status,
+            'chairperson': {
+                'id': str(committee.chairperson.id),
+                'name': committee.chairperson.get_full_name(),
+                'email': committee.chairperson.email,
+            } if committee.chairperson else None,
+            'secretary': {
+                'id': str(committee.secretary.id),
+                'name': committee.secretary.get_full_name(),
+                'email': committee.secretary.email,
+            } if committee.secretary else None,
+            'appointment_date': committee.appointment_date.isoformat(),
+            'completion_date': committee.completion_date.isoformat() if committee.completion_date else None,
+            'terms_of_reference': committee.terms_of_reference,
+            'evaluation_guidelines': committee.evaluation_guidelines,
+        }
+        
+        return JsonResponse({
+            'success': True,
+            'has_committee': True,
+            'committee': committee_data,
+            'members': members_list,
+            'total_members': len(members_list),
+            'evaluation_summary': {
+                'total_bids': total_bids,
+                'members_completed': sum(1 for m in members_list if m['evaluation_status']['is_complete']),
+                'total_members': len(members_list),
+            }
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=400)
+
+
+@login_required
+@require_http_methods(["GET"])
+def get_available_evaluators(request):
+    """Get list of users who can be evaluators"""
+    
+    # Only users with certain roles can be evaluators
+    evaluator_roles = ['HOD', 'PROCUREMENT', 'FINANCE', 'ADMIN']
+    
+    users = User.objects.filter(
+        role__in=evaluator_roles,
+        is_active=True,
+        is_active_user=True
+    ).select_related('department').order_by('first_name', 'last_name')
+    
+    users_list = [{
+        'id': str(user.id),
+        'name': user.get_full_name(),
+        'email': user.email,
+        'role': user.role,
+        'role_display': user.get_role_display(),
+        'department': {
+            'id': str(user.department.id),
+            'name': user.department.name,
+            'code': user.department.code,
+        } if user.department else None,
+    } for user in users]
+    
+    return JsonResponse({
+        'success': True,
+        'users': users_list,
+        'total': len(users_list)
+    })
+
+
+@login_required
+@require_http_methods(["POST"])
+def update_committee_member_conflict(request, member_id):
+    """Update conflict of interest declaration for a committee member"""
+    
+    member = get_object_or_404(CommitteeMember, pk=member_id)
+    
+    # Only the member themselves or admin/procurement can update
+    if request.user.id != member.user.id and request.user.role not in ['ADMIN', 'PROCUREMENT']:
+        return JsonResponse({
+            'success': False,
+            'error': 'You do not have permission to update this member'
+        }, status=403)
+    
+    try:
+        data = json.loads(request.body)
+        
+        member.has_conflict = data.get('has_conflict', False)
+        member.conflict_details = data.get('conflict_details', '')
+        member.save()
+        
+        return JsonResponse({
+            'success': True,
+            'message': 'Conflict of interest updated successfully'
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=400)
+
+
+@login_required
+def tender_publish(request, pk):
+    """Publish tender"""
+    tender = get_object_or_404(Tender, pk=pk)
+    
+    if request.user.role not in ['PROCUREMENT', 'ADMIN']:
+        messages.error(request, 'You do not have permission to publish tenders.')
+        return redirect('tender_detail', pk=pk)
+    
+    if tender.status != 'DRAFT':
+        messages.error(request, 'Only draft tenders can be published.')
+        return redirect('tender_detail', pk=pk)
+    
+    if not tender.evaluation_criteria.exists():
+        messages.error(request, 'Please add evaluation criteria before publishing.')
+        return redirect('tender_detail', pk=pk)
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                tender.status = 'PUBLISHED'
+                tender.publish_date = timezone.now()
+                tender.save()
+                
+                # Create notifications and send emails for invited suppliers (if restricted)
+                if tender.procurement_method == 'RESTRICTED':
+                    invited_suppliers = list(tender.invited_suppliers.all())
+                    
+                    # One bulk insert for every supplier with a linked user account
+                    notify(
+                        [supplier.user_id for supplier in invited_suppliers],
+                        notification_type='TENDER',
+                        priority='HIGH',
+                        title='New Tender Invitation',
+                        message=f'You are invited to bid on tender {tender.tender_number}: {tender.title}',
+                        link_url=f'/tenders/{tender.id}/'
+                    )
+                    
+                    for supplier in invited_suppliers:
+                        # Send email to supplier
+                        try:
+                            subject = f'Tender Invitation: {tender.tender_number}'
+                            
+                            message = f"""
+Dear {supplier.contact_person},
+
+You are invited to submit a bid for the following tender:
+
+Tender Number: {tender.tender_number}
+Title: {tender.title}
+Type: {tender.get_tender_type_display()}
+
+Closing Date: {tender.closing_date.strftime('%d %B %Y at %I:%M %p')}
+Bid Opening: {tender.bid_opening_date.strftime('%d %B %Y at %I:%M %p')}
+
+Estimated Budget: {tender.estimated_budget}
+
+Description:
+{tender.description}
+
+Please log in to the procurement system to view full tender documents and submit your bid.
+
+Best regards,
+Procurement Department
+                            """
+                            
+                            # Send email
+                            send_mail(
+                                subject=subject,
+                                message=message,
+                                from_email=settings.DEFAULT_FROM_EMAIL,
+                                recipient_list=[supplier.email],
+                                fail_silently=False,
+                            )
+                            
+                            # Log email
+                            EmailLog.objects.create(
+                                recipient=supplier.email,
+                                subject=subject,
+                                body=message,
+                                status='SENT',
+                                sent_at=timezone.now()
+                            )
+                            
+                        except Exception as email_error:
+                            # Log failed email
+                            EmailLog.objects.create(
+                                recipient=supplier.email,
+                                subject=subject,
+                                body=message,
+                                status='FAILED',
+                                error_message=str(email_error)
+                            )
+                            # Don't fail the entire transaction for email errors
+                            pass
+                
+                # For open tenders, optionally send general announcement
+                elif tender.procurement_method == 'OPEN':
+                    # Get all approved suppliers in relevant categories
+                    approved_suppliers = Supplier.objects.filter(
+                        status='APPROVED',
+                        categories__in=tender.requisition.items.values_list('item__category', flat=True).distinct()
+                    ).distinct()
+                    
+                    for supplier in approved_suppliers:
+                        try:
+                            subject = f'New Open Tender: {tender.tender_number}'
+                            
+                            message = f"""
+Dear {supplier.contact_person},
+
+A new open tender has been published that may be of interest to your company:
+
+Tender Number: {tender.tender_number}
+Title: {tender.title}
+Type: {tender.get_tender_type_display()}
+
+Closing Date: {tender.closing_date.strftime('%d %B %Y at %I:%M %p')}
+
+Visit the procurement portal to view details and submit your bid.
+
+Best regards,
+Procurement Department
+                            """
+                            
+                            send_mail(
+                                subject=subject,
+                                message=message,
+                                from_email=settings.DEFAULT_FROM_EMAIL,
+                                recipient_list=[supplier.email],
+                                fail_silently=True,  # Don't fail for open tender notifications
+                            )
+                            
+                            EmailLog.objects.create(
+                                recipient=supplier.email,
+                                subject=subject,
+                                body=message,
+                                status='SENT',
+                                sent_at=timezone.now()
+                            )
+                            
+                        except Exception:
+                            pass  # Silent fail for open tender announcements
+                
+                # Create audit log
+                record_audit(
+                    user=request.user,
+                    action='UPDATE',
+                    model_name='Tender',
+                    object_id=str(tender.id),
+                    object_repr=tender.tender_number,
+                    changes={'status': 'PUBLISHED', 'publish_date': str(timezone.now())}
+                )
+                
+                messages.success(
+                    request, 
+                    f'Tender {tender.tender_number} published successfully! '
+                    f'Email notifications sent to invited suppliers.'
+                )
+                return redirect('tender_detail', pk=pk)
+                
+        except Exception as e:
+            messages.error(request, f'Error publishing tender: {str(e)}')
+    
+    return render(request, 'tenders/tender_publish.html', {'tender': tender})
+
+@login_required
+def tender_close(request, pk):
+    """Close tender for bidding"""
+    tender = get_object_or_404(Tender, pk=pk)
+    
+    if request.user.role not in ['PROCUREMENT', 'ADMIN']:
+        messages.error(request, 'You do not have permission to close tenders.')
+        return redirect('tender_detail', pk=pk)
+    
+    if tender.status != 'PUBLISHED':
+        messages.error(request, 'Only published tenders can be closed.')
+        return redirect('tender_detail', pk=pk)
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                tender.status = 'CLOSED'
+                tender.save()
+                
+                # Update all submitted bids
+                tender.bids.filter(status='SUBMITTED').update(status='OPENED')
+                
+                # Create audit log
+                record_audit(
+                    user=request.user,
+                    action='UPDATE',
+                    model_name='Tender',
+                    object_id=str(tender.id),
+                    object_repr=tender.tender_number,
+                    changes={'status': 'CLOSED'}
+                )
+                
+                messages.success(request, f'Tender {tender.tender_number} closed successfully! You can now proceed to evaluation.')
+                return redirect('tender_detail', pk=pk)
+                
+        except Exception as e:
+            messages.error(request, f'Error closing tender: {str(e)}')
+    
+    return render(request, 'tenders/tender_close.html', {'tender': tender})
+
+
+@login_required
+def tender_evaluate(request, pk):
+    """Committee member evaluation of bids"""
+    tender = get_object_or_404(Tender, pk=pk)
+    
+    # Check if user is a committee member
+    active_committee = EvaluationCommittee.objects.filter(
+        tender=tender,
+        status='ACTIVE'
+    ).first()
+    
+    if not active_committee:
+        messages.error(request, 'No active evaluation committee found for this tender.')
+        return redirect('tender_detail', pk=pk)
+    
+    # Check if user is a committee member
+    membership = CommitteeMember.objects.filter(
+        committee=active_committee,
+        user=request.user,
+        is_active=True,
+        role__in=['CHAIRPERSON', 'MEMBER', 'SECRETARY']  # Exclude observers
+    ).first()
+    
+    if not membership and request.user.role != 'ADMIN':
+        messages.error(request, 'You are not a member of the evaluation committee for this tender.')
+        return redirect('tender_detail', pk=pk)
+    
+    # Check tender status
+    if tender.status not in ['CLOSED', 'EVALUATING']:
+        messages.error(request, 'Only closed tenders can be evaluated.')
+        return redirect('tender_detail', pk=pk)
+    
+    # Update tender status to evaluating if closed
+    if tender.status == 'CLOSED':
+        tender.status = 'EVALUATING'
+        tender.save()
+    
+    # Get bids for evaluation (exclude disqualified)
+    bids = tender.bids.exclude(status='DISQUALIFIED').select_related('supplier').prefetch_related(
+        'evaluations'
+    )
+    
+    # Check which bids current user has evaluated using BidEvaluation
+    for bid in bids:
+        existing_eval = BidEvaluation.objects.filter(
+            bid=bid,
+            evaluator=request.user
+        ).first()
+        
+        bid.user_has_evaluated = existing_eval is not None
+        if existing_eval:
+            bid.user_evaluation = existing_eval
+        
+        # Get other evaluators' evaluations (exclude current user)
+        bid.other_evaluations = bid.evaluations.exclude(
+            evaluator=request.user
+        ).select_related('evaluator')[:3]
+        
+        bid.other_evaluations_count = bid.evaluations.exclude(
+            evaluator=request.user
+        ).count()
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                bid_id = request.POST.get('bid_id')
+                bid = get_object_or_404(Bid, id=bid_id, tender=tender)
+                
+                # Get scores
+                technical_score = Decimal(request.POST.get('technical_score', 0))
+                financial_score = Decimal(request.POST.get('financial_score', 0))
+                
+                # Get compliance
+                technical_compliance = request.POST.get('technical_compliance') == 'on'
+                financial_compliance = request.POST.get('financial_compliance') == 'on'
+                
+                # Get comments
+                strengths = request.POST.get('strengths', '')
+                weaknesses = request.POST.get('weaknesses', '')
+                recommendation = request.POST.get('recommendation', '')
+                
+                # Calculate total score (70% technical, 30% financial)
+                total_score = (technical_score * Decimal('0.7')) + (financial_score * Decimal('0.3'))
+                
+                # Create or update BidEvaluation (the original evaluation model)
+                evaluation, created = BidEvaluation.objects.update_or_create(
+                    bid=bid,
+                    evaluator=request.user,
+                    defaults={
+                        'technical_compliance': technical_compliance,
+                        'financial_compliance': financial_compliance,
+                        'technical_score': technical_score,
+                        'financial_score': financial_score,
+                        'total_score': total_score,
+                        'strengths': strengths,
+                        'weaknesses': weaknesses,
+                        'recommendation': recommendation,
+                    }
+                )
+                
+                # Also create FinancialEvaluationScore for the new system
+                financial_eval, created = FinancialEvaluationScore.objects.update_or_create(
+                    bid=bid,
+                    evaluator=request.user,
+                    defaults={
+                        'quoted_amount': bid.bid_amount,
+                        'is_arithmetic_correct': True,
+                        'is_within_budget': bid.bid_amount <= tender.estimated_budget,
+                        'is_price_reasonable': financial_compliance,
+                        'variance_from_estimate': float(
+                            ((bid.bid_amount - tender.estimated_budget) / tender.estimated_budget * 100)
+                            if tender.estimated_budget > 0 else 0
+                        ),
+                        'financial_score': financial_score,
+                        'weighted_financial_score': financial_score * Decimal('0.3'),
+                        'comments': f"Strengths: {strengths}\n\nWeaknesses: {weaknesses}\n\nRecommendation: {recommendation}",
+                    }
+                )
+                
+                # Update bid status based on compliance
+                if not technical_compliance or not financial_compliance:
+                    bid.status = 'DISQUALIFIED'
+                    bid.disqualification_reason = request.POST.get('disqualification_reason', 
+                        'Failed compliance requirements')
+                    bid.save()
+                elif bid.status in ['OPENED', 'SUBMITTED']:
+                    bid.status = 'EVALUATING'
+                    bid.save()
+                
+                # Check if all committee members have evaluated this bid
+                total_members = active_committee.members.filter(
+                    is_active=True,
+                    role__in=['CHAIRPERSON', 'MEMBER', 'SECRETARY']
+                ).count()
+                
+                evaluations_count = BidEvaluation.objects.filter(
+                    bid=bid,
+                    evaluator__in=active_committee.members.filter(
+                        is_active=True,
+                        role__in=['CHAIRPERSON', 'MEMBER', 'SECRETARY']
+                    ).values_list('user_id', flat=True)
+                ).count()
+                
+                # If all members have evaluated, calculate combined result
+                if evaluations_count >= total_members:
+                    # Calculate average scores from BidEvaluation
+                    avg_scores = BidEvaluation.objects.filter(
+                        bid=bid,
+                        evaluator__in=active_committee.members.filter(
+                            is_active=True,
+                            role__in=['CHAIRPERSON', 'MEMBER', 'SECRETARY']
+                        ).values_list('user_id', flat=True)
+                    ).aggregate(
+                        avg_technical=Avg('technical_score'),
+                        avg_financial=Avg('financial_score'),
+                        avg_total=Avg('total_score')
+                    )
+                    
+                    avg_technical = avg_scores['avg_technical'] or Decimal('0')
+                    avg_financial = avg_scores['avg_financial'] or Decimal('0')
+                    avg_total = avg_scores['avg_total'] or Decimal('0')
+                    
+                    # Get or create technical pass mark
+                    technical_pass_mark = getattr(tender, 'technical_pass_mark', Decimal('70'))
+                    
+                    # Create or update combined evaluation result
+                    combined, created = CombinedEvaluationResult.objects.update_or_create(
+                        bid=bid,
+                        defaults={
+                            'average_technical_score': avg_technical,
+                            'technical_percentage': avg_technical,
+                            'is_technically_qualified': avg_technical >= technical_pass_mark,
+                            'technical_pass_mark': technical_pass_mark,
+                            'average_financial_score': avg_financial,
+                            'financial_percentage': avg_financial,
+                            'combined_score': avg_total,
+                            'evaluated_by_committee': active_committee,
+                            'evaluation_date': timezone.now().date(),
+                        }
+                    )
+                    
+                    # Update bid with combined scores
+                    bid.technical_score = avg_technical
+                    bid.financial_score = avg_financial
+                    bid.evaluation_score = avg_total
+                    
+                    if combined.is_technically_qualified and bid.status != 'DISQUALIFIED':
+                        bid.status = 'QUALIFIED'
+                    
+                    bid.save()
+                
+                # Create audit log
+                record_audit(
+                    user=request.user,
+                    action='UPDATE',
+                    model_name='Bid',
+                    object_id=str(bid.id),
+                    object_repr=bid.bid_number,
+                    changes={
+                        'action': 'evaluation_submitted',
+                        'technical_score': float(technical_score),
+                        'financial_score': float(financial_score),
+                        'total_score': float(total_score),
+                        'evaluator': request.user.get_full_name(),
+                    }
+                )
+                
+                messages.success(request, f'Your evaluation for bid {bid.bid_number} has been submitted successfully!')
+                return redirect('tender_evaluate', pk=pk)
+                
+        except Exception as e:
+            messages.error(request, f'Error submitting evaluation: {str(e)}')
+            import traceback
+            traceback.print_exc()
+    
+    # Get evaluation criteria for reference
+    criteria = tender.evaluation_criteria.all().order_by('sequence')
+    
+    context = {
+        'tender': tender,
+        'bids': bids,
+        'criteria': criteria,
+        'active_committee': active_committee,
+        'membership': membership,
+    }
+    
+    return render(request, 'tenders/tender_evaluate.html', context)
+
+
+def send_tender_award_email(winning_bid, tender, request):
+    """Send award notification email to winning supplier"""
+    try:
+        supplier = winning_bid.supplier
+        
+        # Get supplier email addresses
+        recipient_emails = []
+        
+        # Add supplier's primary email
+        if supplier.email:
+            recipient_emails.append(supplier.email)
+        
+        # Add contact person email
+        if supplier.contact_person_email:
+            recipient_emails.append(supplier.contact_person_email)
+        
+        # Add supplier user accounts
+        if hasattr(supplier, 'user') and supplier.user:
+            recipient_emails.append(supplier.user.email)
+        
+        # Remove duplicates
+        recipient_emails = list(set(recipient_emails))
+        
+        if not recipient_emails:
+            print(f"No email addresses found for supplier {supplier.name}")
+            return False
+        
+        # Prepare email context
+        context = {
+            'supplier_name': supplier.name,
+            'tender_number': tender.tender_number,
+            'tender_title': tender.title,
+            'bid_number': winning_bid.bid_number,
+            'bid_amount': winning_bid.bid_amount,
+            'awarded_by': request.user.get_full_name(),
+            'award_date': timezone.now().date(),
+            'contact_person': request.user.get_full_name(),
+            'contact_email': request.user.email,
+            'contact_phone': request.user.phone_number if hasattr(request.user, 'phone_number') else 'N/A',
+        }
+        
+        # Email subject
+        subject = f'Tender Award Notification - {tender.tender_number}'
+        
+        # Plain text email body
+        text_content = f"""
+Dear {supplier.name},
+
+TENDER AWARD NOTIFICATION
+
+We are pleased to inform you that your bid has been successful for the following tender:
+
+TENDER DETAILS:
+================
+Tender Number: {tender.tender_number}
+Tender Title: {tender.title}
+Your Bid Number: {winning_bid.bid_number}
+Bid Amount: KES {winning_bid.bid_amount:,.2f}
+Award Date: {timezone.now().date().strftime('%B %d, %Y')}
+
+NEXT STEPS:
+===========
+1. Contract Preparation: Our procurement team will contact you within 3 business days to initiate the contract preparation process.
+
+2. Required Documents: Please prepare the following documents:
+   - Valid Tax Compliance Certificate
+   - Certificate of Incorporation/Business Registration
+   - Banking details confirmation
+   - Insurance certificates (if applicable)
+   - Performance bond (if required)
+
+3. Contract Signing: You will be invited to sign the contract once all compliance requirements are met.
+
+4. Project Commencement: Work/delivery should commence as per the contract terms immediately after signing.
+
+IMPORTANT NOTES:
+================
+- This award is subject to final contract signing and compliance verification
+- Any misrepresentation of information may lead to disqualification
+- Delivery timelines commence from the contract signing date
+- Please adhere to all terms and conditions specified in the tender documents
+
+CONTACT INFORMATION:
+====================
+For any queries or clarifications, please contact:
+
+Name: {request.user.get_full_name()}
+Email: {request.user.email}
+Phone: {request.user.phone_number if hasattr(request.user, 'phone_number') else 'N/A'}
+
+Congratulations once again on this award. We look forward to a successful partnership.
+
+Best regards,
+Procurement Department
+{settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'procurement@university.ac.ke'}
+
+---
+This is an automated notification. Please do not reply to this email directly.
+"""
+        
+        # HTML email body (optional, more professional)
+        html_content = f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+        .header {{ background: #2563EB; color: white; padding: 20px; text-align: center; border-radius: 5px 5px 0 0; }}
+        .content {{ background: #f8f9fa; padding: 20px; }}
+        .section {{ background: white; padding: 15px; margin: 15px 0; border-radius: 5px; border-left: 4px solid #2563EB; }}
+        .section h3 {{ color: #2563EB; margin-top: 0; }}
+        .info-grid {{ display: grid; grid-template-columns: 150px 1fr; gap: 10px; }}
+        .info-label {{ font-weight: bold; color: #64748B; }}
+        .info-value {{ color: #334155; }}
+        .highlight {{ background: #FEF3C7; padding: 15px; border-radius: 5px; border-left: 4px solid #F59E0B; margin: 15px 0; }}
+        .steps {{ counter-reset: step; list-style: none; padding: 0; }}
+        .steps li {{ counter-increment: step; margin: 10px 0; padding-left: 30px; position: relative; }}
+        .steps li:before {{ content: counter(step); position: absolute; left: 0; top: 0; background: #2563EB; color: white; width: 25px; height: 25px; border-radius: 50%; text-align: center; line-height: 25px; font-weight: bold; }}
+        .footer {{ text-align: center; padding: 20px; color: #64748B; font-size: 12px; }}
+        .button {{ display: inline-block; background: #2563EB; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; margin: 10px 0; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>🎉 TENDER AWARD NOTIFICATION</h1>
+        </div>
+        
+        <div class="content">
+            <p>Dear <strong>{supplier.name}</strong>,</p>
+            
+            <div class="highlight">
+                <strong>Congratulations!</strong> We are pleased to inform you that your bid has been successful.
+            </div>
+            
+            <div class="section">
+                <h3>Tender Details</h3>
+                <div class="info-grid">
+                    <div class="info-label">Tender Number:</div>
+                    <div class="info-value">{tender.tender_number}</div>
+                    
+                    <div class="info-label">Tender Title:</div>
+                    <div class="info-value">{tender.title}</div>
+                    
+                    <div class="info-label">Your Bid Number:</div>
+                    <div class="info-value">{winning_bid.bid_number}</div>
+                    
+                    <div class="info-label">Bid Amount:</div>
+                    <div class="info-value"><strong>KES {winning_bid.bid_amount:,.2f}</strong></div>
+                    
+                    <div class="info-label">Award Date:</div>
+                    <div class="info-value">{timezone.now().date().strftime('%B %d, %Y')}</div>
+                </div>
+            </div>
+            
+            <div class="section">
+                <h3>Next Steps</h3>
+                <ol class="steps">
+                    <li><strong>Contract Preparation:</strong> Our team will contact you within 3 business days</li>
+                    <li><strong>Document Submission:</strong> Prepare required compliance documents</li>
+                    <li><strong>Contract Signing:</strong> Sign the contract after compliance verification</li>
+                    <li><strong>Project Commencement:</strong> Begin work/delivery as per contract terms</li>
+                </ol>
+            </div>
+            
+            <div class="section">
+                <h3>Required Documents</h3>
+                <ul>
+                    <li>Valid Tax Compliance Certificate</li>
+                    <li>Certificate of Incorporation/Business Registration</li>
+                    <li>Banking details confirmation</li>
+                    <li>Insurance certificates (if applicable)</li>
+                    <li>Performance bond (if required)</li>
+                </ul>
+            </div>
+            
+            <div class="section">
+                <h3>Contact Information</h3>
+                <p>For any queries or clarifications:</p>
+                <div class="info-grid">
+                    <div class="info-label">Name:</div>
+                    <div class="info-value">{request.user.get_full_name()}</div>
+                    
+                    <div class="info-label">Email:</div>
+                    <div class="info-value">{request.user.email}</div>
+                    
+                    <div class="info-label">Phone:</div>
+                    <div class="info-value">{request.user.phone_number if hasattr(request.user, 'phone_number') else 'N/A'}</div>
+                </div>
+            </div>
+        </div>
+        
+        <div class="footer">
+            <p>This is an automated notification from the Procurement Department.</p>
+            <p>Please do not reply to this email directly.</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+        
+        # Send email
+        for email in recipient_emails:
+            try:
+                # Create email with both plain text and HTML versions
+                email_message = EmailMultiAlternatives(
+                    subject=subject,
+                    body=text_content,
+                    from_email=settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@university.ac.ke',
+                    to=[email],
+                    reply_to=[request.user.email] if request.user.email else None
+                )
+                
+                # Attach HTML version
+                email_message.attach_alternative(html_content, "text/html")
+                
+                # Send email
+                email_message.send(fail_silently=False)
+                
+                # Log email
+                EmailLog.objects.create(
+                    recipient=email,
+                    subject=subject,
+                    body=text_content,
+                    status='SENT',
+                    sent_at=timezone.now()
+                )
+                
+                print(f"Award email sent successfully to {email}")
+                
+            except Exception as e:
+                # Log failed email
+                EmailLog.objects.create(
+                    recipient=email,
+                    subject=subject,
+                    body=text_content,
+                    status='FAILED',
+                    error_message=str(e)
+                )
+                print(f"Failed to send award email to {email}: {str(e)}")
+        
+        return True
+        
+    except Exception as e:
+        print(f"Error in send_tender_award_email: {str(e)}")
+        return False
+
+
+def send_tender_cancellation_emails(tender, reason, request):
+    """Send cancellation notification to all bidders"""
+    try:
+        # Get all bids for this tender
+        bids = tender.bids.all()
+        
+        if not bids.exists():
+            return False
+        
+        emails_sent = 0
+        
+        for bid in bids:
+            supplier = bid.supplier
+            
+            # Get supplier email addresses
+            recipient_emails = []
+            
+            if supplier.email:
+                recipient_emails.append(supplier.email)
+            if supplier.contact_person_email:
+                recipient_emails.append(supplier.contact_person_email)
+            if hasattr(supplier, 'user') and supplier.user:
+                recipient_emails.append(supplier.user.email)
+            
+            # Remove duplicates
+            recipient_emails = list(set(recipient_emails))
+            
+            if not recipient_emails:
+                continue
+            
+            # Email subject
+            subject = f'Tender Cancellation Notice - {tender.tender_number}'
+            
+            # Plain text email body
+            text_content = f"""
+Dear {supplier.name},
+
+TENDER CANCELLATION NOTICE
+
+We regret to inform you that the following tender has been cancelled:
+
+TENDER DETAILS:
+================
+Tender Number: {tender.tender_number}
+Tender Title: {tender.title}
+Your Bid Number: {bid.bid_number}
+Cancellation Date: {timezone.now().date().strftime('%B %d, %Y')}
+
+REASON FOR CANCELLATION:
+========================
+{reason}
+
+IMPACT ON YOUR BID:
+===================
+- Your bid {bid.bid_number} is no longer under consideration
+- Any bid security/bond will be returned as per tender conditions
+- No further action is required from your end
+
+We apologize for any inconvenience this may cause. We encourage you to participate in future tenders.
+
+For any questions or clarifications, please contact:
+
+Name: {request.user.get_full_name()}
+Email: {request.user.email}
+Phone: {request.user.phone_number if hasattr(request.user, 'phone_number') else 'N/A'}
+
+Thank you for your interest and participation.
+
+Best regards,
+Procurement Department
+{settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'procurement@university.ac.ke'}
+
+---
+This is an automated notification. Please do not reply to this email directly.
+"""
+            
+            # HTML email body
+            html_content = f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+        .header {{ background: #EF4444; color: white; padding: 20px; text-align: center; border-radius: 5px 5px 0 0; }}
+        .content {{ background: #f8f9fa; padding: 20px; }}
+        .section {{ background: white; padding: 15px; margin: 15px 0; border-radius: 5px; border-left: 4px solid #EF4444; }}
+        .section h3 {{ color: #EF4444; margin-top: 0; }}
+        .info-grid {{ display: grid; grid-template-columns: 150px 1fr; gap: 10px; }}
+        .info-label {{ font-weight: bold; color: #64748B; }}
+        .info-value {{ color: #334155; }}
+        .reason-box {{ background: #FEE2E2; padding: 15px; border-radius: 5px; border-left: 4px solid #EF4444; margin: 15px 0; }}
+        .footer {{ text-align: center; padding: 20px; color: #64748B; font-size: 12px; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>⚠️ TENDER CANCELLATION NOTICE</h1>
+        </div>
+        
+        <div class="content">
+            <p>Dear <strong>{supplier.name}</strong>,</p>
+            
+            <p>We regret to inform you that the following tender has been cancelled:</p>
+            
+            <div class="section">
+                <h3>Tender Details</h3>
+                <div class="info-grid">
+                    <div class="info-label">Tender Number:</div>
+                    <div class="info-value">{tender.tender_number}</div>
+                    
+                    <div class="info-label">Tender Title:</div>
+                    <div class="info-value">{tender.title}</div>
+                    
+                    <div class="info-label">Your Bid Number:</div>
+                    <div class="info-value">{bid.bid_number}</div>
+                    
+                    <div class="info-label">Cancellation Date:</div>
+                    <div class="info-value">{timezone.now().date().strftime('%B %d, %Y')}</div>
+                </div>
+            </div>
+            
+            <div class="reason-box">
+                <h3>Reason for Cancellation:</h3>
+                <p>{reason}</p>
+            </div>
+            
+            <div class="section">
+                <h3>Impact on Your Bid</h3>
+                <ul>
+                    <li>Your bid {bid.bid_number} is no longer under consideration</li>
+                    <li>Any bid security/bond will be returned as per tender conditions</li>
+                    <li>No further action is required from your end</li>
+                </ul>
+            </div>
+            
+            <div class="section">
+                <h3>Contact Information</h3>
+                <p>For any questions or clarifications:</p>
+                <div class="info-grid">
+                    <div class="info-label">Name:</div>
+                    <div class="info-value">{request.user.get_full_name()}</div>
+                    
+                    <div class="info-label">Email:</div>
+                    <div class="info-value">{request.user.email}</div>
+                    
+                    <div class="info-label">Phone:</div>
+                    <div class="info-value">{request.user.phone_number if hasattr(request.user, 'phone_number') else 'N/A'}</div>
+                </div>
+            </div>
+            
+            <p>We apologize for any inconvenience and encourage you to participate in future tenders.</p>
+        </div>
+        
+        <div class="footer">
+            <p>This is an automated notification from the Procurement Department.</p>
+            <p>Please do not reply to this email directly.</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+            
+            # Send to all recipient emails
+            for email in recipient_emails:
+                try:
+                    email_message = EmailMultiAlternatives(
+                        subject=subject,
+                        body=text_content,
+                        from_email=settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@university.ac.ke',
+                        to=[email],
+                        reply_to=[request.user.email] if request.user.email else None
+                    )
+                    
+                    email_message.attach_alternative(html_content, "text/html")
+                    email_message.send(fail_silently=False)
+                    
+                    # Log successful email
+                    EmailLog.objects.create(
+                        recipient=email,
+                        subject=subject,
+                        body=text_content,
+                        status='SENT',
+                        sent_at=timezone.now()
+                    )
+                    
+                    emails_sent += 1
+                    print(f"Cancellation email sent to {email}")
+                    
+                except Exception as e:
+                    # Log failed email
+                    EmailLog.objects.create(
+                        recipient=email,
+                        subject=subject,
+                        body=text_content,
+                        status='FAILED',
+                        error_message=str(e)
+                    )
+                    print(f"Failed to send cancellation email to {email}: {str(e)}")
+        
+        return emails_sent > 0
+        
+    except Exception as e:
+        print(f"Error in send_tender_cancellation_emails: {str(e)}")
+        return False
+
+
+@login_required
+def tender_award(request, pk):
+    """Award tender to winning bidder"""
+    tender = get_object_or_404(Tender, pk=pk)
+    
+    if request.user.role not in ['PROCUREMENT', 'ADMIN']:
+        messages.error(request, 'You do not have permission to award tenders.')
+        return redirect('tender_detail', pk=pk)
+    
+    if tender.status != 'EVALUATING':
+        messages.error(request, 'Only evaluated tenders can be awarded.')
+        return redirect('tender_detail', pk=pk)
+    
+    # Get qualified bids ranked by score
+    qualified_bids = tender.bids.filter(
+        status='QUALIFIED'
+    ).order_by('-evaluation_score', 'bid_amount')
+    
+    if not qualified_bids.exists():
+        messages.error(request, 'No qualified bids available for award.')
+        return redirect('tender_detail', pk=pk)
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                bid_id = request.POST.get('winning_bid')
+                winning_bid = get_object_or_404(Bid, id=bid_id, tender=tender)
+                
+                # Update tender status
+                tender.status = 'AWARDED'
+                tender.save()
+                
+                # Update winning bid
+                winning_bid.status = 'AWARDED'
+                winning_bid.save()
+                
+                # Rank all qualified bids
+                for idx, bid in enumerate(qualified_bids, 1):
+                    bid.rank = idx
+                    if bid.id != winning_bid.id:
+                        bid.status = 'REJECTED'
+                    bid.save()
+                
+                # Send email to winning supplier
+                email_sent = send_tender_award_email(winning_bid, tender, request)
+                
+                # Create in-app notification for winning supplier
+                if hasattr(winning_bid.supplier, 'user') and winning_bid.supplier.user:
+                    notify(
+                        winning_bid.supplier.user,
+                        notification_type='TENDER',
+                        priority='URGENT',
+                        title='Tender Award - Congratulations!',
+                        message=f'Your bid {winning_bid.bid_number} has been awarded for tender {tender.tender_number}. Check your email for details.',
+                        link_url=f'/bids/{winning_bid.id}/',
+                        sent_via_email=email_sent
+                    )
+                
+                # Send notifications to unsuccessful bidders
+                unsuccessful_bids = qualified_bids.exclude(
+                    id=winning_bid.id
+                ).select_related('supplier')
+                bulk_notify(
+                    Notification(
+                        user_id=bid.supplier.user_id,
+                        notification_type='TENDER',
+                        priority='MEDIUM',
+                        title='Tender Evaluation Complete',
+                        message=f'The evaluation for tender {tender.tender_number} has been completed. Your bid was not selected.',
+                        link_url=f'/bids/{bid.id}/'
+                    )
+                    for bid in unsuccessful_bids if bid.supplier.user_id
+                )
+                
+                # Create audit log
+                record_audit(
+                    durable=True,
+                    user=request.user,
+                    action='UPDATE',
+                    model_name='Tender',
+                    object_id=str(tender.id),
+                    object_repr=tender.tender_number,
+                    changes={
+                        'status': 'AWARDED',
+                        'winning_bid': winning_bid.bid_number,
+                        'winning_supplier': winning_bid.supplier.name,
+                        'award_amount': float(winning_bid.bid_amount),
+                        'email_sent': email_sent
+                    }
+                )
+                
+                success_msg = f'Tender {tender.tender_number} awarded to {winning_bid.supplier.name}!'
+                if email_sent:
+                    success_msg += ' Email notification sent successfully.'
+                else:
+                    success_msg += ' Warning: Email notification failed to send.'
+                
+                messages.success(request, success_msg)
+                return redirect('tender_detail', pk=pk)
+                
+        except Exception as e:
+            messages.error(request, f'Error awarding tender: {str(e)}')
+            import traceback
+            traceback.print_exc()
+    
+    context = {
+        'tender': tender,
+        'qualified_bids': qualified_bids,
+    }
+    
+    return render(request, 'tenders/tender_award.html', context)
+
+
+@login_required
+def tender_cancel(request, pk):
+    """Cancel tender"""
+    tender = get_object_or_404(Tender, pk=pk)
+    
+    if request.user.role not in ['PROCUREMENT', 'ADMIN']:
+        messages.error(request, 'You do not have permission to cancel tenders.')
+        return redirect('tender_detail', pk=pk)
+    
+    if tender.status == 'AWARDED':
+        messages.error(request, 'Cannot cancel awarded tenders.')
+        return redirect('tender_detail', pk=pk)
+    
+    if request.method == 'POST':
+        try:
+            with transaction.atomic():
+                cancellation_reason = request.POST.get('cancellation_reason')
+                
+                if not cancellation_reason or len(cancellation_reason.strip()) < 10:
+                    messages.error(request, 'Please provide a detailed cancellation reason (minimum 10 characters).')
+                    return render(request, 'tenders/tender_cancel.html', {'tender': tender})
+                
+                # Update tender status
+                old_status = tender.status
+                tender.status = 'CANCELLED'
+                tender.save()
+                
+                # Update all bids to cancelled
+                tender.bids.update(status='REJECTED')
+                
+                # Send cancellation emails to all bidders
+                emails_sent = send_tender_cancellation_emails(tender, cancellation_reason, request)
+                
+                # Create in-app notifications for all bidders
+                notify(
+                    tender.bids.filter(
+                        supplier__user__isnull=False
+                    ).values_list('supplier__user_id', flat=True),
+                    notification_type='TENDER',
+                    priority='HIGH',
+                    title='Tender Cancelled',
+                    message=f'Tender {tender.tender_number} has been cancelled. Check your email for details.',
+                    link_url=f'/tenders/{tender.id}/',
+                    sent_via_email=emails_sent
+                )
+                
+                # Create audit log
+                record_audit(
+                    user=request.user,
+                    action='UPDATE',
+                    model_name='Tender',
+                    object_id=str(tender.id),
+                    object_repr=tender.tender_number,
+                    changes={
+                        'status': 'CANCELLED',
+                        'old_status': old_status,
+                        'reason': cancellation_reason,
+                        'cancelled_by': request.user.get_full_name(),
+                        'emails_sent': emails_sent
+                    }
+                )
+                
+                success_msg = f'Tender {tender.tender_number} cancelled successfully!'
+                if emails_sent:
+                    success_msg += ' Email notifications sent to all bidders.'
+                else:
+                    success_msg += ' Warning: Failed to send email notifications.'
+                
+                messages.success(request, success_msg)
+                return redirect('tender_detail', pk=pk)
+                
+        except Exception as e:
+            messages.error(request, f'Error cancelling tender: {str(e)}')
+            import traceback
+            traceback.print_exc()
+    
+    return render(request, 'tenders/tender_cancel.html', {'tender': tender})
+
+
+# ============================================================================
+# BID MANAGEMENT VIEWS
+# ============================================================================
+
+@login_required
+def bid_list(request):
+    """List all bids in the system with filtering and statistics"""
+    
+    # Permission check
+    if request.user.role not in ['PROCUREMENT', 'ADMIN', 'SUPPLIER']:
+        messages.error(request, 'You do not have permission to view bids.')
+        return redirect('dashboard')
+    
+    # Base queryset
+    bids = Bid.objects.select_related(
+        'tender',
+        'supplier',
+        'opened_by'
+    ).prefetch_related(
+        'items__requisition_item',
+        'documents',
+        'evaluations'
+    ).annotate(
+        evaluation_count=Count('evaluations'),
+        items_count=Count('items')
+    )
+    
+    # Filter for suppliers - only show their own bids
+    if request.user.role == 'SUPPLIER':
+        try:
+            supplier = request.user.supplier_profile
+            bids = bids.filter(supplier=supplier)
+        except:
+            messages.error(request, 'Supplier profile not found.')
+            return redirect('dashboard')
+    
+    # Filters
+    status_filter = request.GET.get('status', '')
+    tender_filter = request.GET.get('tender', '')
+    supplier_filter = request.GET.get('supplier', '')
+    search_query = request.GET.get('search', '')
+    min_amount = request.GET.get('min_amount', '')
+    max_amount = request.GET.get('max_amount', '')
+    date_from = request.GET.get('date_from', '')
+    date_to = request.GET.get('date_to', '')
+    
+    if status_filter:
+        bids = bids.filter(status=status_filter)
+    
+    if tender_filter:
+        bids = bids.filter(tender_id=tender_filter)
+    
+    if supplier_filter and request.user.role in ['PROCUREMENT', 'ADMIN']:
+        bids = bids.filter(supplier_id=supplier_filter)
+    
+    if search_query:
+        bids = bids.filter(
+            Q(bid_number__icontains=search_query) |
+            Q(supplier__name__icontains=search_query) |
+            Q(supplier__supplier_number__icontains=search_query) |
+            Q(tender__tender_number__icontains=search_query) |
+            Q(tender__title__icontains=search_query)
+        )
+    
+    if min_amount:
+        try:
+            bids = bids.filter(bid_amount__gte=Decimal(min_amount))
+        except:
+            pass
+    
+    if max_amount:
+        try:
+            bids = bids.filter(bid_amount__lte=Decimal(max_amount))
+        except:
+            pass
+    
+    if date_from:
+        bids = bids.filter(submitted_at__date__gte=date_from)
+    
+    if date_to:
+        bids = bids.filter(submitted_at__date__lte=date_to)
+    
+    # Sorting
+    sort_by = request.GET.get('sort', '-submitted_at')
+    valid_sort_fields = [
+        'bid_amount', '-bid_amount', 
+        'submitted_at', '-submitted_at', 
+        'rank', '-rank',
+        'bid_number', '-bid_number'
+    ]
+    if sort_by in valid_sort_fields:
+        bids = bids.order_by(sort_by)
+    else:
+        bids = bids.order_by('-submitted_at')
+    
+    # Statistics (before pagination)
+    all_bids = Bid.objects.all()
+    if request.user.role == 'SUPPLIER':
+        all_bids = all_bids.filter(supplier=supplier)
+    
+    stats = {
+        'total': all_bids.count(),
+        'submitted': all_bids.filter(status='SUBMITTED').count(),
+        'opened': all_bids.filter(status='OPENED').count(),
+        'evaluating': all_bids.filter(status='EVALUATING').count(),
+        'qualified': all_bids.filter(status='QUALIFIED').count(),
+        'disqualified': all_bids.filter(status='DISQUALIFIED').count(),
+        'awarded': all_bids.filter(status='AWARDED').count(),
+        'rejected': all_bids.filter(status='REJECTED').count(),
+        'average_amount': all_bids.aggregate(Avg('bid_amount'))['bid_amount__avg'] or 0,
+        'total_value': all_bids.aggregate(Sum('bid_amount'))['bid_amount__sum'] or 0,
+    }
+    
+    # Get filter choices for dropdowns (only for procurement/admin)
+    tenders_list = []
+    suppliers_list = []
+    
+    if request.user.role in ['PROCUREMENT', 'ADMIN']:
+        tenders_list = Tender.objects.filter(
+            status__in=['PUBLISHED', 'CLOSED', 'EVALUATING']
+        ).order_by('-created_at')[:50]
+        
+        suppliers_list = Supplier.objects.filter(
+            status='APPROVED'
+        ).order_by('name')
+    
+    # Pagination
+    paginator = Paginator(bids, 25)
+    page_number = request.GET.get('page', 1)
+    page_obj = paginator.get_page(page_number)
+    
+    context = {
+        'bids': page_obj,
+        'page_obj': page_obj,
+        'status_filter': status_filter,
+        'tender_filter': tender_filter,
+        'supplier_filter': supplier_filter,
+        'search_query': search_query,
+        'min_amount': min_amount,
+        'max_amount': max_amount,
+        'date_from': date_from,
+        'date_to': date_to,
+        'sort_by': sort_by,
+        'stats': stats,
+        'status_choices': Bid.STATUS_CHOICES,
+        'tenders_list': tenders_list,
+        'suppliers_list': suppliers_list,
+        'total_count': paginator.count,
+    }
+    
+    return render(request, 'bids/bid_list.html', context)
+
+
+@login_required
+def bid_detail(request, pk):
+    """View detailed bid information with committee evaluation support"""
+    bid = get_object_or_404(
+        Bid.objects.select_related(
+            'tender',
+            'supplier',
+            'opened_by'
+        ).prefetch_related(
+            'items__requisition_item__item__price_index',
+            'documents',
+            'evaluations__evaluator',
+            'tender__evaluation_committees__members__user'
+        ),
+        pk=pk
+    )
+    
+    # Permission check
+    if request.user.role not in ['PROCUREMENT', 'ADMIN', 'SUPPLIER']:
+        messages.error(request, 'You do not have permission to view this bid.')
+        return redirect('dashboard')
+    
+    # Suppliers can only view their own bids
+    if request.user.role == 'SUPPLIER':
+        try:
+            supplier = request.user.supplier_profile
+            if bid.supplier != supplier:
+                messages.error(request, 'You can only view your own bids.')
+                return redirect('dashboard')
+        except:
+            messages.error(request, 'Supplier profile not found.')
+            return redirect('dashboard')
+    
+    # Calculate totals and statistics
+    items_total = bid.items.aggregate(Sum('quoted_total'))['quoted_total__sum'] or 0
+    items_count = bid.items.count()
+    
+    # Compare quoted prices with the item benchmarks (not shown to suppliers)
+    price_outliers = 0
+    if request.user.role != 'SUPPLIER':
+        for bid_item in bid.items.all():
+            bid_item.benchmark = price_benchmark(
+                bid_item.requisition_item.item, bid_item.quoted_unit_price
+            )
+            if bid_item.benchmark and bid_item.benchmark['flag']:
+                price_outliers += 1
+    
+    # Get evaluation summary
+    evaluations = bid.evaluations.all()
+    evaluation_summary = {
+        'count': evaluations.count(),
+        'avg_technical': evaluations.aggregate(Avg('technical_score'))['technical_score__avg'] or 0,
+        'avg_financial': evaluations.aggregate(Avg('financial_score'))['financial_score__avg'] or 0,
+        'avg_total': evaluations.aggregate(Avg('total_score'))['total_score__avg'] or 0,
+    }
+    
+    # Compare with tender estimated budget
+    variance = bid.bid_amount - bid.tender.estimated_budget
+    variance_percentage = (variance / bid.tender.estimated_budget * 100) if bid.tender.estimated_budget > 0 else 0
+    
+    # Check if user is a committee member for this tender
+    is_committee_member = False
+    committee_role = None
+    active_committee = None
+    
+    # Get active evaluation committee for this tender
+    active_committee = EvaluationCommittee.objects.filter(
+        tender=bid.tender,
+        status='ACTIVE'
+    ).select_related('chairperson', 'secretary').prefetch_related(
+        'members__user'
+    ).first()
+    
+    if active_committee and request.user.role in ['PROCUREMENT', 'ADMIN', 'HOD', 'FINANCE']:
+        # Check if user is a member
+        membership = active_committee.members.filter(
+            user=request.user,
+            is_active=True
+        ).first()
+        
+        if membership:
+            is_committee_member = True
+            committee_role = membership.role
+    
+    # Check if bid can be awarded
+    can_award = (
+        request.user.role in ['PROCUREMENT', 'ADMIN'] and
+        bid.status in ['QUALIFIED'] and
+        bid.tender.status in ['EVALUATING', 'CLOSED'] and
+        not PurchaseOrder.objects.filter(bid=bid).exists()
+    )
+    
+    # Check if bid can be opened
+    can_open = (
+        request.user.role in ['PROCUREMENT', 'ADMIN'] and
+        bid.status == 'SUBMITTED' and
+        bid.tender.closing_date <= timezone.now()
+    )
+    
+    # Check if bid can be evaluated (must be committee member)
+    can_evaluate = (
+        is_committee_member and
+        bid.status in ['OPENED', 'EVALUATING'] and
+        active_committee and
+        active_committee.status == 'ACTIVE'
+    )
+    
+    # Check if bid can be disqualified (committee chairperson or admin)
+    can_disqualify = (
+        (committee_role == 'CHAIRPERSON' or request.user.role == 'ADMIN') and
+        bid.status not in ['DISQUALIFIED', 'AWARDED', 'REJECTED']
+    )
+    
+    # Check if user has already evaluated this bid
+    user_has_evaluated = False
+    user_evaluation = None
+    
+    if is_committee_member:
+        # Check for technical evaluation
+        technical_scores = TechnicalEvaluationScore.objects.filter(
+            bid=bid,
+            evaluator=request.user
+        ).exists()
+        
+        # Check for financial evaluation
+        financial_scores = FinancialEvaluationScore.objects.filter(
+            bid=bid,
+            evaluator=request.user
+        ).exists()
+        
+        user_has_evaluated = technical_scores or financial_scores
+        
+        if user_has_evaluated:
+            user_evaluation = {
+                'technical_complete': technical_scores,
+                'financial_complete': financial_scores,
+            }
+    
+    # Get committee evaluation progress - FIXED VERSION
+    committee_progress = None
+    if active_committee:
+        # Get only active members who should evaluate (not observers)
+        active_evaluators = active_committee.members.filter(
+            is_active=True,
+            role__in=['CHAIRPERSON', 'MEMBER', 'SECRETARY']  # Exclude observers
+        )
+        
+        total_members = active_evaluators.count()
+        
+        if total_members > 0:
+            # Get list of evaluator user IDs
+            evaluator_ids = list(active_evaluators.values_list('user_id', flat=True))
+            
+            # Count unique evaluators who have submitted technical scores
+            technical_evaluators = TechnicalEvaluationScore.objects.filter(
+                bid=bid,
+                evaluator_id__in=evaluator_ids
+            ).values('evaluator_id').distinct().count()
+            
+            # Count unique evaluators who have submitted financial scores
+            financial_evaluators = FinancialEvaluationScore.objects.filter(
+                bid=bid,
+                evaluator_id__in=evaluator_ids
+            ).values('evaluator_id').distinct().count()
+            
+            # Calculate percentages
+            technical_percentage = (technical_evaluators / total_members * 100) if total_members > 0 else 0
+            financial_percentage = (financial_evaluators / total_members * 100) if total_members > 0 else 0
+            
+            committee_progress = {
+                'total_members': total_members,
+                'technical_completed': technical_evaluators,
+                'financial_completed': financial_evaluators,
+                'technical_percentage': round(technical_percentage, 2),
+                'financial_percentage': round(financial_percentage, 2),
+            }
+    
+    context = {
+        'bid': bid,
+        'items_total': items_total,
+        'items_count': items_count,
+        'price_outliers': price_outliers,
+        'evaluation_summary': evaluation_summary,
+        'variance': variance,
+        'variance_percentage': variance_percentage,
+        'can_award': can_award,
+        'can_open': can_open,
+        'can_evaluate': can_evaluate,
+        'can_disqualify': can_disqualify,
+        'is_committee_member': is_committee_member,
+        'committee_role': committee_role,
+        'active_committee': active_committee,
+        'user_has_evaluated': user_has_evaluated,
+        'user_evaluation': user_evaluation,
+        'committee_progress': committee_progress,
+    }
+    
+    return render(request, 'bids/bid_detail.html', context)
+
+
+# ============================================================================
+# TECHNICAL EVALUATION
+# ============================================================================
+
+@login_required
+def bid_evaluate_technical(request, pk):
+    """Technical evaluation of a bid by committee member"""
+    bid = get_object_or_404(
+        Bid.objects.select_related('tender', 'supplier'),
+        pk=pk
+    )
+    
+    # Check if user is committee member
+    active_committee = bid.tender.evaluation_committees.filter(
+        status='ACTIVE'
+    ).first()
+    
+    if not active_committee:
+        messages.error(request, 'No active evaluation committee for this tender.')
+        return redirect('bid_detail', pk=bid.id)
+    
+    membership = active_committee.members.filter(
+        user=request.user,
+        is_active=True
+    ).first()
+    
+    if not membership:
+        messages.error(request, 'You are not a member of the evaluation committee.')
+        return redirect('bid_detail', pk=bid.id)
+    
+    # Check if already evaluated
+    existing_scores = TechnicalEvaluationScore.objects.filter(
+        bid=bid,
+        evaluator=request.user
+    )
+    
+    # Get technical criteria for this tender
+    criteria = bid.tender.technical_criteria.all().order_by('sequence')
+    
+    if not criteria.exists():
+        messages.error(request, 'No technical evaluation criteria defined for this tender.')
+        return redirect('bid_detail', pk=bid.id)
+    
+    # Get bid's technical responses
+    responses = BidTechnicalResponse.objects.filter(bid=bid)
+    
+    if request.method == 'POST':
+        # Process technical evaluation
+        try:
+            # Delete existing scores to allow re-evaluation
+            existing_scores.delete()
+            
+            total_weighted_score = Decimal('0')
+            all_compliant = True
+            
+            for criterion in criteria:
+                score_value = request.POST.get(f'score_{criterion.id}')
+                is_compliant = request.POST.get(f'compliant_{criterion.id}') == 'on'
+                comments = request.POST.get(f'comments_{criterion.id}', '')
+                justification = request.POST.get(f'justification_{criterion.id}', '')
+                
+                if not score_value:
+                    messages.error(request, f'Please provide score for: {criterion.criterion_name}')
+                    return redirect('bid_evaluate_technical', pk=bid.id)
+                
+                score = Decimal(score_value)
+                
+                # Validate score
+                if score < 0 or score > criterion.max_score:
+                    messages.error(request, f'Score for {criterion.criterion_name} must be between 0 and {criterion.max_score}')
+                    return redirect('bid_evaluate_technical', pk=bid.id)
+                
+                # Check pass/fail criteria
+                if criterion.is_pass_fail and not is_compliant:
+                    all_compliant = False
+                
+                # Create score record
+                eval_score = TechnicalEvaluationScore.objects.create(
+                    bid=bid,
+                    criterion=criterion,
+                    evaluator=request.user,
+                    score=score,
+                    is_compliant=is_compliant,
+                    comments=comments,
+                    justification=justification
+                )
+                
+                total_weighted_score += eval_score.weighted_score
+            
+            # Update bid status
+            if bid.status == 'OPENED':
+                bid.status = 'EVALUATING'
+                bid.save()
+            
+            messages.success(request, 'Technical evaluation submitted successfully.')
+            return redirect('bid_detail', pk=bid.id)
+            
+        except Exception as e:
+            messages.error(request, f'Error submitting evaluation: {str(e)}')
+            return redirect('bid_evaluate_technical', pk=bid.id)
+    
+    # Prepare criteria with existing scores
+    criteria_data = []
+    for criterion in criteria:
+        existing_score = existing_scores.filter(criterion=criterion).first()
+        response = responses.filter(criterion=criterion).first()
+        
+        criteria_data.append({
+            'criterion': criterion,
+            'response': response,
+            'existing_score': existing_score,
+        })
+    
+    context = {
+        'bid': bid,
+        'committee': active_committee,
+        'membership': membership,
+        'criteria_data': criteria_data,
+        'is_reevaluation': existing_scores.exists(),
+    }
+    
+    return render(request, 'bids/evaluate_technical.html', context)
+
+
+# ============================================================================
+# FINANCIAL EVALUATION
+# ============================================================================
+
+@login_required
+def bid_evaluate_financial(request, pk):
+    """Financial evaluation of a bid by committee member"""
+    bid = get_object_or_404(
+        Bid.objects.select_related('tender', 'supplier'),
+        pk=pk
+    )
+    
+    # Check if user is committee member
+    active_committee = bid.tender.evaluation_committees.filter(
+        status='ACTIVE'
+    ).first()
+    
+    if not active_committee:
+        messages.error(request, 'No active evaluation committee for this tender.')
+        return redirect('bid_detail', pk=bid.id)
+    
+    membership = active_committee.members.filter(
+        user=request.user,
+        is_active=True
+    ).first()
+    
+    if not membership:
+        messages.error(request, 'You are not a member of the evaluation committee.')
+        return redirect('bid_detail', pk=bid.id)
+    
+    # Get financial criteria
+    try:
+        financial_criteria = bid.tender.financial_criteria
+    except:
+        messages.error(request, 'No financial evaluation criteria defined for this tender.')
+        return redirect('bid_detail', pk=bid.id)
+    
+    # Check if already evaluated
+    existing_score = FinancialEvaluationScore.objects.filter(
+        bid=bid,
+        evaluator=request.user
+    ).first()
+    
+    # Get all bids for this tender to calculate lowest price
+    all_bids = Bid.objects.filter(
+        tender=bid.tender,
+        status__in=['OPENED', 'EVALUATING', 'QUALIFIED']
+    ).order_by('bid_amount')
+    
+    lowest_bid = all_bids.first()
+    
+    if request.method == 'POST':
+        try:
+            # Get form data
+            is_arithmetic_correct = request.POST.get('arithmetic_correct') == 'on'
+            arithmetic_notes = request.POST.get('arithmetic_notes', '')
+            is_within_budget = request.POST.get('within_budget') == 'on'
+            is_price_reasonable = request.POST.get('price_reasonable') == 'on'
+            comments = request.POST.get('comments', '')
+            
+            # Calculate variance from estimate
+            variance = ((bid.bid_amount - bid.tender.estimated_budget) / bid.tender.estimated_budget * 100)
+            
+            # Calculate financial score based on evaluation method
+            if financial_criteria.evaluation_method == 'LOWEST_PRICE':
+                # Formula: (Lowest Price / Bid Price) × 100
+                if lowest_bid and bid.bid_amount > 0:
+                    financial_score = (lowest_bid.bid_amount / bid.bid_amount * 100)
+                else:
+                    financial_score = Decimal('100')
+            elif financial_criteria.evaluation_method == 'FIXED_BUDGET':
+                # Score based on how close to budget
+                if is_within_budget:
+                    financial_score = Decimal('100')
+                else:
+                    financial_score = Decimal('0')
+            else:  # QUALITY_COST
+                # Will be calculated later based on technical score
+                financial_score = Decimal('100')
+            
+            # Cap at 100
+            if financial_score > 100:
+                financial_score = Decimal('100')
+            
+            # Delete existing score if re-evaluating
+            if existing_score:
+                existing_score.delete()
+            
+            # Create financial evaluation score
+            eval_score = FinancialEvaluationScore.objects.create(
+                bid=bid,
+                evaluator=request.user,
+                quoted_amount=bid.bid_amount,
+                is_arithmetic_correct=is_arithmetic_correct,
+                arithmetic_notes=arithmetic_notes,
+                is_within_budget=is_within_budget,
+                is_price_reasonable=is_price_reasonable,
+                variance_from_estimate=variance,
+                financial_score=financial_score,
+                weighted_financial_score=financial_score * financial_criteria.financial_weight / 100,
+                comments=comments
+            )
+            
+            messages.success(request, 'Financial evaluation submitted successfully.')
+            return redirect('bid_detail', pk=bid.id)
+            
+        except Exception as e:
+            messages.error(request, f'Error submitting evaluation: {str(e)}')
+            return redirect('bid_evaluate_financial', pk=bid.id)
+    
+    # Calculate variance
+    variance = ((bid.bid_amount - bid.tender.estimated_budget) / bid.tender.estimated_budget * 100) if bid.tender.estimated_budget > 0 else 0
+    
+    context = {
+        'bid': bid,
+        'committee': active_committee,
+        'membership': membership,
+        'financial_criteria': financial_criteria,
+        'existing_score': existing_score,
+        'lowest_bid': lowest_bid,
+        'variance': variance,
+        'all_bids': all_bids,
+    }
+    
+    return render(request, 'bids/evaluate_financial.html', context)
+
+
+# ============================================================================
+# VIEW EVALUATION
+# ============================================================================
+
+@login_required
+def bid_view_evaluation(request, pk):
+    """View user's submitted evaluation"""
+    bid = get_object_or_404(Bid, pk=pk)
+    
+    # Get user's technical scores
+    technical_scores = TechnicalEvaluationScore.objects.filter(
+        bid=bid,
+        evaluator=request.user
+    ).select_related('criterion')
+    
+    # Get user's financial score
+    financial_score = FinancialEvaluationScore.objects.filter(
+        bid=bid,
+        evaluator=request.user
+    ).first()
+    
+    # Calculate totals
+    total_technical = technical_scores.aggregate(
+        total=Sum('weighted_score')
+    )['total'] or 0
+    
+    context = {
+        'bid': bid,
+        'technical_scores': technical_scores,
+        'financial_score': financial_score,
+        'total_technical': total_technical,
+    }
+    
+    return render(request, 'bids/view_evaluation.html', context)
+
+
+# ============================================================================
+# COMMITTEE EVALUATION SUMMARY
+# ============================================================================
+
+@login_required
+def committee_evaluation_summary(request, tender_id):
+    """Committee chairperson view of all evaluations"""
+    tender = get_object_or_404(Tender, pk=tender_id)
+    
+    # Check if user is chairperson
+    active_committee = tender.evaluation_committees.filter(
+        status='ACTIVE'
+    ).first()
+    
+    if not active_committee:
+        messages.error(request, 'No active evaluation committee for this tender.')
+        return redirect('tender_detail', pk=tender.id)
+    
+    if active_committee.chairperson != request.user and request.user.role != 'ADMIN':
+        messages.error(request, 'Only the committee chairperson can view this summary.')
+        return redirect('tender_detail', pk=tender.id)
+    
+    # Get all bids for this tender
+    bids = Bid.objects.filter(tender=tender).select_related('supplier')
+    
+    # Get evaluation statistics for each bid
+    bid_evaluations = []
+    for bid in bids:
+        # Technical evaluation stats
+        tech_scores = TechnicalEvaluationScore.objects.filter(bid=bid)
+        tech_avg = tech_scores.aggregate(
+            avg_score=Avg('weighted_score')
+        )['avg_score'] or 0
+        
+        # Financial evaluation stats
+        fin_scores = FinancialEvaluationScore.objects.filter(bid=bid)
+        fin_avg = fin_scores.aggregate(
+            avg_score=Avg('financial_score')
+        )['avg_score'] or 0
+        
+        # Count evaluators
+        tech_evaluators = tech_scores.values('evaluator').distinct().count()
+        fin_evaluators = fin_scores.values('evaluator').distinct().count()
+        
+        # Get or create combined result
+        combined, created = CombinedEvaluationResult.objects.get_or_create(
+            bid=bid,
+            defaults={
+                'average_technical_score': tech_avg,
+                'average_financial_score': fin_avg,
+                'technical_pass_mark': tender.technical_pass_mark,
+                'evaluated_by_committee': active_committee,
+                'evaluation_date': timezone.now().date()
+            }
+        )
+        
+        # Update if not created
+        if not created:
+            combined.average_technical_score = tech_avg
+            combined.average_financial_score = fin_avg
+            combined.save()
+            combined.calculate_combined_score()
+        
+        bid_evaluations.append({
+            'bid': bid,
+            'tech_avg': tech_avg,
+            'fin_avg': fin_avg,
+            'combined_score': combined.combined_score,
+            'tech_evaluators': tech_evaluators,
+            'fin_evaluators': fin_evaluators,
+            'is_qualified': combined.is_technically_qualified,
+            'combined_result': combined,
+        })
+    
+    # Sort by combined score
+    bid_evaluations.sort(key=lambda x: x['combined_score'], reverse=True)
+    
+    # Assign ranks
+    for rank, item in enumerate(bid_evaluations, start=1):
+        item['bid'].rank = rank
+        item['bid'].save()
+        item['rank'] = rank
+    
+    context = {
+        'tender': tender,
+        'committee': active_committee,
+        'bid_evaluations': bid_evaluations,
+        'total_members': active_committee.members.filter(is_active=True).count(),
+    }
+    
+    return render(request, 'bids/committee_summary.html', context)
+
+
+# ============================================================================
+# BID DISQUALIFICATION
+# ============================================================================
+
+@login_required
+def bid_disqualify(request, pk):
+    """Disqualify a bid"""
+    bid = get_object_or_404(Bid, pk=pk)
+    
+    # Permission check
+    active_committee = bid.tender.evaluation_committees.filter(
+        status='ACTIVE'
+    ).first()
+    
+    is_chairperson = active_committee and active_committee.chairperson == request.user
+    is_admin = request.user.role == 'ADMIN'
+    
+    if not (is_chairperson or is_admin):
+        messages.error(request, 'Only committee chairperson or admin can disqualify bids.')
+        return redirect('bid_detail', pk=bid.id)
+    
+    if bid.status in ['AWARDED', 'DISQUALIFIED']:
+        messages.error(request, f'Cannot disqualify a bid that is {bid.get_status_display()}.')
+        return redirect('bid_detail', pk=bid.id)
+    
+    if request.method == 'POST':
+        reason = request.POST.get('reason')
+        
+        if not reason:
+            messages.error(request, 'Please provide a reason for disqualification.')
+            return redirect('bid_disqualify', pk=bid.id)
+        
+        bid.status = 'DISQUALIFIED'
+        bid.disqualification_reason = reason
+        bid.save()
+        
+        # Update combined evaluation result
+        try:
+            combined = CombinedEvaluationResult.objects.get(bid=bid)
+            combined.is_disqualified = True
+            combined.disqualification_reason = reason
+            combined.save()
+        except:
+            pass
+        
+        messages.success(request, f'Bid {bid.bid_number} has been disqualified.')
+        return redirect('bid_detail', pk=bid.id)
+    
+    context = {
+        'bid': bid,
+        'committee': active_committee,
+    }
+    
+    return render(request, 'bids/disqualify.html', context)
+
+
+# ============================================================================
+# BID OPENING
+# ============================================================================
+
+@login_required
+def bid_open(request, pk):
+    """Open a submitted bid"""
+    bid = get_object_or_404(Bid, pk=pk)
+    
+    # Permission check
+    if request.user.role not in ['PROCUREMENT', 'ADMIN']:
+        messages.error(request, 'You do not have permission to open bids.')
+        return redirect('bid_detail', pk=bid.id)
+    
+    if bid.status != 'SUBMITTED':
+        messages.error(request, 'Only submitted bids can be opened.')
+        return redirect('bid_detail', pk=bid.id)
+    
+    if bid.tender.closing_date > timezone.now():
+        messages.error(request, 'Cannot open bids before tender closing date.')
+        return redirect('bid_detail', pk=bid.id)
+    
+    if request.method == 'POST':
+        bid.status = 'OPENED'
+        bid.opened_at = timezone.now()
+        bid.opened_by = request.user
+        bid.save()
+        
+        messages.success(request, f'Bid {bid.bid_number} has been opened.')
+        return redirect('bid_detail', pk=bid.id)
+    
+    context = {
+        'bid': bid,
+    }
+    
+    return render(request, 'bids/open_bid.html', context)
+
+
+# ============================================================================
+# BID AWARD
+# ============================================================================
+
+@login_required
+def bid_award(request, pk):
+    """Award tender to a bid"""
+    bid = get_object_or_404(Bid, pk=pk)
+    
+    # Permission check
+    if request.user.role not in ['PROCUREMENT', 'ADMIN']:
+        messages.error(request, 'You do not have permission to award tenders.')
+        return redirect('bid_detail', pk=bid.id)
+    
+    if bid.status != 'QUALIFIED':
+        messages.error(request, 'Only qualified bids can be awarded.')
+        return redirect('bid_detail', pk=bid.id)
+    
+    # Check if evaluations are complete
+    if not bid.tender.technical_evaluation_complete or not bid.tender.financial_evaluation_complete:
+        messages.error(request, 'Evaluations must be complete before awarding.')
+        return redirect('bid_detail', pk=bid.id)
+    
+    # Check if already awarded to another bid
+    existing_award = Bid.objects.filter(
+        tender=bid.tender,
+        status='AWARDED'
+    ).first()
+    
+    if existing_award and existing_award.id != bid.id:
+        messages.error(request, f'Tender already awarded to {existing_award.supplier.name}.')
+        return redirect('bid_detail', pk=bid.id)
+    
+    if request.method == 'POST':
+        # Award the bid
+        bid.status = 'AWARDED'
+        bid.save()
+        
+        # Update tender status
+        bid.tender.status = 'AWARDED'
+        bid.tender.save()
+        
+        # Mark other bids as rejected
+        Bid.objects.filter(tender=bid.tender).exclude(id=bid.id).update(
+            status='REJECTED'
+        )
+        
+        # Update combined evaluation
+        try:
+            combined = CombinedEvaluationResult.objects.get(bid=bid)
+            combined.is_recommended = True
+            combined.save()
+        except:
+            pass
+        
+        messages.success(request, f'Tender awarded to {bid.supplier.name}.')
+        return redirect('bid_detail', pk=bid.id)
+    
+    # Get combined evaluation result
+    try:
+        combined = CombinedEvaluationResult.objects.get(bid=bid)
+    except:
+        combined = None
+    
+    context = {
+        'bid': bid,
+        'combined': combined,
+    }
+    
+    return render(request, 'bids/award.html', context)
+
+
+# ============================================================================
+# BID COMPARISON
+# ============================================================================
+
+@login_required
+def bid_comparison(request, tender_id):
+    """Compare all bids for a tender"""
+    tender = get_object_or_404(Tender, pk=tender_id)
+    
+    # Permission check
+    if request.user.role not in ['PROCUREMENT', 'ADMIN']:
+        # Check if committee member
+        is_member = tender.evaluation_committees.filter(
+            status='ACTIVE',
+            members__user=request.user,
+            members__is_active=True
+        ).exists()
+        
+        if not is_member:
+            messages.error(request, 'You do not have permission to view this comparison.')
+            return redirect('tender_detail', pk=tender.id)
+    
+    # Get all bids with evaluations
+    bids = Bid.objects.filter(tender=tender).select_related('supplier')
+    
+    comparison_data = []
+    for bid in bids:
+        # Get combined evaluation
+        try:
+            combined = CombinedEvaluationResult.objects.get(bid=bid)
+        except:
+            combined = None
+        
+        comparison_data.append({
+            'bid': bid,
+            'combined': combined,
+            'variance': bid.bid_amount - tender.estimated_budget,
+            'variance_pct': ((bid.bid_amount - tender.estimated_budget) / tender.estimated_budget * 100) if tender.estimated_budget > 0 else 0,
+        })
+    
+    # Sort by rank or combined score
+    comparison_data.sort(key=lambda x: x['combined'].combined_score if x['combined'] else 0, reverse=True)
+    
+    context = {
+        'tender': tender,
+        'comparison_data': comparison_data,
+    }
+    
+    return render(request, 'bids/comparison.html', context)
+
+
+def to_decimal(value, default='0'):
+    """Safely convert value to Decimal"""
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, TypeError, ValueError):
+        return Decimal(default)
+
+
+@login_required
+def bid_evaluate(request, pk):
+    """Evaluate a bid"""
+    bid = get_object_or_404(Bid, pk=pk)
+    
+    # Permission check
+    if request.user.role not in ['PROCUREMENT', 'ADMIN']:
+        messages.error(request, 'You do not have permission to evaluate bids.')
+        return redirect('bid_detail', pk=pk)
+    
+    # Check if bid can be evaluated
+    if bid.status not in ['OPENED', 'EVALUATING']:
+        messages.error(request, 'This bid cannot be evaluated.')
+        return redirect('bid_detail', pk=pk)
+    
+    # Check if user already evaluated this bid
+    existing_evaluation = BidEvaluation.objects.filter(
+        bid=bid, 
+        evaluator=request.user
+    ).first()
+    
+    if request.method == 'POST':
+        technical_compliance = request.POST.get('technical_compliance') == 'on'
+        financial_compliance = request.POST.get('financial_compliance') == 'on'
+        
+        # Use to_decimal helper for safe conversion
+        technical_score = to_decimal(request.POST.get('technical_score', '0'))
+        financial_score = to_decimal(request.POST.get('financial_score', '0'))
+        
+        strengths = request.POST.get('strengths', '')
+        weaknesses = request.POST.get('weaknesses', '')
+        recommendation = request.POST.get('recommendation', '')
+        
+        # Validate scores
+        if technical_score < 0 or technical_score > 100:
+            messages.error(request, 'Technical score must be between 0 and 100.')
+            return redirect('bid_evaluate', pk=pk)
+        
+        if financial_score < 0 or financial_score > 100:
+            messages.error(request, 'Financial score must be between 0 and 100.')
+            return redirect('bid_evaluate', pk=pk)
+        
+        if existing_evaluation:
+            # Update existing evaluation
+            existing_evaluation.technical_compliance = technical_compliance
+            existing_evaluation.financial_compliance = financial_compliance
+            existing_evaluation.technical_score = technical_score
+            existing_evaluation.financial_score = financial_score
+            existing_evaluation.strengths = strengths
+            existing_evaluation.weaknesses = weaknesses
+            existing_evaluation.recommendation = recommendation
+            existing_evaluation.save()
+            
+            messages.success(request, 'Your evaluation has been updated successfully.')
+        else:
+            # Create new evaluation
+            BidEvaluation.objects.create(
+                bid=bid,
+                evaluator=request.user,
+                technical_compliance=technical_compliance,
+                financial_compliance=financial_compliance,
+                technical_score=technical_score,
+                financial_score=financial_score,
+                strengths=strengths,
+                weaknesses=weaknesses,
+                recommendation=recommendation
+            )
+            
+            messages.success(request, 'Bid evaluation submitted successfully.')
+        
+        # Update bid status to EVALUATING if it's OPENED
+        if bid.status == 'OPENED':
+            bid.status = 'EVALUATING'
+            bid.save()
+        
+        # Create audit log
+        record_audit(
+            user=request.user,
+            action='UPDATE',
+            model_name='Bid',
+            object_id=str(bid.id),
+            object_repr=str(bid),
+            changes={'evaluation_added': True},
+            ip_address=request.META.get('REMOTE_ADDR'),
+        )
+        
+        return redirect('bid_detail', pk=pk)
+    
+    # Get evaluation criteria for the tender
+    criteria = bid.tender.evaluation_criteria.all().order_by('sequence')
+    
+    context = {
+        'bid': bid,
+        'existing_evaluation': existing_evaluation,
+        'criteria': criteria,
+    }
+    
+    return render(request, 'bids/bid_evaluate.html', context)
+
+
+@login_required
+def bid_qualify(request, pk):
+    """Mark bid as qualified"""
+    bid = get_object_or_404(Bid, pk=pk)
+    
+    # Permission check
+    if request.user.role not in ['PROCUREMENT', 'ADMIN']:
+        messages.error(request, 'You do not have permission to qualify bids.')
+        return redirect('bid_detail', pk=pk)
+    
+    # Check if bid can be qualified
+    if bid.status not in ['EVALUATING']:
+        messages.error(request, 'Only bids under evaluation can be qualified.')
+        return redirect('bid_detail', pk=pk)
+    
+    if request.method == 'POST':
+        # Calculate average scores from evaluations
+        evaluations = bid.evaluations.all()
+        if evaluations.count() == 0:
+            messages.error(request, 'Bid must be evaluated before qualification.')
+            return redirect('bid_detail', pk=pk)
+        
+        avg_technical = evaluations.aggregate(Avg('technical_score'))['technical_score__avg']
+        avg_financial = evaluations.aggregate(Avg('financial_score'))['financial_score__avg']
+        
+        bid.technical_score = avg_technical
+        bid.financial_score = avg_financial
+        bid.evaluation_score = (avg_technical * Decimal('0.7')) + (avg_financial * Decimal('0.3'))
+        bid.status = 'QUALIFIED'
+        bid.save()
+        
+        # Update rankings for all qualified bids in this tender
+        qualified_bids = Bid.objects.filter(
+            tender=bid.tender,
+            status='QUALIFIED'
+        ).order_by('-evaluation_score')
+        
+        for idx, qualified_bid in enumerate(qualified_bids, start=1):
+            qualified_bid.rank = idx
+            qualified_bid.save()
+        
+        # Create audit log
+        record_audit(
+            user=request.user,
+            action='APPROVE',
+            model_name='Bid',
+            object_id=str(bid.id),
+            object_repr=str(bid),
+            changes={'status': 'QUALIFIED', 'rank': bid.rank},
+            ip_address=request.META.get('REMOTE_ADDR'),
+        )
+        
+        # Notify supplier
+        notify(
+            bid.supplier.user if hasattr(bid.supplier, 'user') else None,
+            notification_type='TENDER',
+            priority='MEDIUM',
+            title=f'Bid Qualified - {bid.tender.tender_number}',
+            message=f'Your bid {bid.bid_number} has been qualified and ranked #{bid.rank}.',
+            link_url=f'/bids/{bid.id}/'
+        )
+        
+        messages.success(request, f'Bid {bid.bid_number} has been qualified and ranked #{bid.rank}.')
+        return redirect('bid_detail', pk=pk)
+    
+    return render(request, 'bids/bid_qualify_confirm.html', {'bid': bid})
+
+
+# API ENDPOINTS
+
+@login_required
+def get_requisition_items(request, requisition_id):
+    """API: Get requisition items for tender creation"""
+    try:
+        requisition = Requisition.objects.get(id=requisition_id)
+        items = requisition.items.all().select_related('item')
+        
+        items_data = [{
+            'id': str(item.id),
+            'description': item.item_description,
+            'specifications': item.specifications,
+            'quantity': float(item.quantity),
+            'unit': item.unit_of_measure,
+            'estimated_price': float(item.estimated_unit_price),
+        } for item in items]
+        
+        return JsonResponse({
+            'success': True,
+            'items': items_data,
+            'total': float(requisition.estimated_amount)
+        })
+    except Requisition.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Requisition not found'}, status=404)
+
+
+@login_required
+def get_tender_statistics(request):
+    """API: Get tender statistics for dashboard"""
+    try:
+        stats = {
+            'total_tenders': Tender.objects.count(),
+            'active_tenders': Tender.objects.filter(status='PUBLISHED').count(),
+            'closed_tenders': Tender.objects.filter(status='CLOSED').count(),
+            'awarded_tenders': Tender.objects.filter(status='AWARDED').count(),
+            'total_value': float(Tender.objects.aggregate(Sum('estimated_budget'))['estimated_budget__sum'] or 0),
+            'average_bids': float(Tender.objects.annotate(
+                bid_count=Count('bids')
+            ).aggregate(Avg('bid_count'))['bid_count__avg'] or 0),
+        }
+        
+        return JsonResponse({'success': True, 'data': stats})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
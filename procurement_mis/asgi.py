@@ -3,6 +3,10 @@ ASGI config for procurement_mis project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with an ASGI server (e.g. ``uvicorn procurement_mis.asgi:application``)
+to enable the live notification stream at /api/events/stream/; under WSGI
+the browser falls back to polling /api/notifications/poll/.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -34,10 +34,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'pms.instrumentation.QueryInstrumentationMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'pms.db_routing.ReplicaRoutingMiddleware',
+    'pms.audit.AuditBufferMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -54,6 +57,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'pms.context_processors.notifications',
             ],
         },
     },
@@ -76,6 +80,56 @@ DATABASES = {
     }
 }
 
+# Connection reuse. DB_POOL selects how connections are shared:
+#   ''          persistent connections, reused for DB_CONN_MAX_AGE seconds
+#   'native'    Django's connection pool (requires psycopg 3 and psycopg_pool)
+#   'pgbouncer' connect through PgBouncer in transaction pooling mode
+# Health checks re-test a reused connection before the first query of a request.
+DB_POOL = os.getenv('DB_POOL', '')
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '60'))
+DB_CONN_HEALTH_CHECKS = os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True'
+DB_CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', '5'))
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '2'))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+
+# Optional read replica (pms.db_routing): GET requests to @read_replica views
+# (and to the URL names in REPLICA_VIEWS) read from it while its replication
+# lag is within REPLICA_MAX_LAG_SECONDS; every write still goes to 'default'
+if os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'USER': os.getenv('DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.getenv('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+for _database in DATABASES.values():
+    _database['CONN_HEALTH_CHECKS'] = DB_CONN_HEALTH_CHECKS
+    _database['OPTIONS'] = {'connect_timeout': DB_CONNECT_TIMEOUT}
+    if DB_POOL == 'native':
+        # Pooled connections are returned to the pool after each request
+        _database['CONN_MAX_AGE'] = 0
+        _database['OPTIONS']['pool'] = {
+            'min_size': DB_POOL_MIN_SIZE,
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': DB_POOL_TIMEOUT,
+        }
+    else:
+        _database['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+    if DB_POOL == 'pgbouncer':
+        # Transaction pooling cannot keep a server-side cursor open between queries
+        _database['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+DATABASE_ROUTERS = ['pms.db_routing.ReplicaRouter']
+REPLICA_DATABASE = 'replica'
+REPLICA_VIEWS = ()
+REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', '30'))
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv('REPLICA_LAG_CHECK_SECONDS', '5'))
+
 AUTH_USER_MODEL = 'pms.User'
 
 
@@ -123,6 +177,109 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]  # for dev
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Cache (shared between workers when REDIS_URL is set)
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Whether the default cache is shared by every worker (True with REDIS_URL).
+# Unread-notification counters and poll ETags (pms.notifications) and the
+# budget analytics cube (pms.budget_analytics) are invalidated through the
+# cache and only stay consistent across workers when it is shared; with a
+# per-process cache they are read from the database instead
+CACHE_SHARED = os.getenv('CACHE_SHARED', str(bool(os.getenv('REDIS_URL')))) == 'True'
+
+# Seconds before a cached unread-notification counter is recounted from the database
+NOTIFICATION_COUNTER_TTL = int(os.getenv('NOTIFICATION_COUNTER_TTL', '300'))
+
+# Seconds a budget year's analytics cube (pms.budget_analytics) stays cached.
+# Budget and payment changes invalidate it straight away; this bounds
+# staleness from changes made outside the application
+BUDGET_ANALYTICS_CACHE_TTL = int(os.getenv('BUDGET_ANALYTICS_CACHE_TTL', '900'))
+
+# Seconds the spend analysis page reuses the purchase orders it loaded for
+# a given set of filters (pms.spend_cube)
+SPEND_CUBE_CACHE_TTL = int(os.getenv('SPEND_CUBE_CACHE_TTL', '300'))
+
+# Cumulative spend share (percent) closing ABC classes A and B in the
+# supplier/item concentration analysis (pms.spend_concentration); the
+# rest is class C, the tail spend
+SPEND_ABC_A_SHARE = int(os.getenv('SPEND_ABC_A_SHARE', '80'))
+SPEND_ABC_B_SHARE = int(os.getenv('SPEND_ABC_B_SHARE', '95'))
+
+# Item price benchmarks (pms.price_index): recent PO/bid prices kept per
+# item, and how many are needed before bid lines are flagged and the
+# median is suggested in requisition forms
+PRICE_INDEX_WINDOW = int(os.getenv('PRICE_INDEX_WINDOW', '50'))
+PRICE_INDEX_MIN_SAMPLES = int(os.getenv('PRICE_INDEX_MIN_SAMPLES', '3'))
+
+# Live event stream (server-sent events, served by procurement_mis.asgi)
+SSE_KEEPALIVE_SECONDS = int(os.getenv('SSE_KEEPALIVE_SECONDS', '15'))
+SSE_FALLBACK_POLL_SECONDS = int(os.getenv('SSE_FALLBACK_POLL_SECONDS', '60'))
+
+# Audit log writer (pms.audit): entries are buffered per request and flushed
+# in one INSERT; these actions are always written synchronously
+AUDIT_LOG_DURABLE_ACTIONS = ('LOGIN', 'LOGOUT', 'DELETE')
+AUDIT_LOG_BACKGROUND_FLUSH = os.getenv('AUDIT_LOG_BACKGROUND_FLUSH', 'False') == 'True'
+AUDIT_LOG_FLUSH_INTERVAL = float(os.getenv('AUDIT_LOG_FLUSH_INTERVAL', '2'))
+
+# Audit log retention (pms.audit_storage): months older than this are moved to
+# compressed files by the archive_audit_logs command
+AUDIT_RETENTION_MONTHS = int(os.getenv('AUDIT_RETENTION_MONTHS', '24'))
+AUDIT_ARCHIVE_DIR = os.getenv('AUDIT_ARCHIVE_DIR', os.path.join(BASE_DIR, 'audit_archive'))
+
+# Rendered PDFs (pms.documents) are cached here, one file per document version;
+# the directory can be cleared at any time and must be shared by all workers
+PDF_CACHE_DIR = os.getenv('PDF_CACHE_DIR', os.path.join(BASE_DIR, 'pdf_cache'))
+
+# Batch printing (print_documents): documents not cached yet are rendered in a
+# pool of this many processes (0: one per CPU); larger selections are refused
+PDF_RENDER_WORKERS = int(os.getenv('PDF_RENDER_WORKERS', '0'))
+PDF_BATCH_MAX_DOCUMENTS = int(os.getenv('PDF_BATCH_MAX_DOCUMENTS', '1000'))
+
+# Procurement plan spreadsheet import (pms.plan_import): files with more item
+# rows than this are refused
+PLAN_IMPORT_MAX_ROWS = int(os.getenv('PLAN_IMPORT_MAX_ROWS', '5000'))
+
+# Audit red-flag rules (pms.red_flags): per-rule parameter overrides, e.g.
+# {'SPLIT_PURCHASE': {'window_days': 30}, 'ROUND_AMOUNT': {'enabled': False}}
+AUDIT_RULES = {}
+AUDIT_EXTRA_RULES = []
+
+# Duplicate invoice/payment detection (pms.duplicates): invoice dates are
+# compared in buckets of this many days (plus the neighbouring buckets).
+# Stored keys embed the bucket: run rebuild_duplicate_keys after changing it
+DUPLICATE_DATE_BUCKET_DAYS = int(os.getenv('DUPLICATE_DATE_BUCKET_DAYS', '7'))
+
+# Per-view query/latency instrumentation (pms.instrumentation). Budgets cap the
+# SQL queries per request by URL name; QUERY_BUDGET_RAISE turns overruns into
+# errors instead of warnings (enable it when running the test suite).
+# Budgets are the highest count run_benchmarks measured for any role on a
+# generate_load_dataset database, plus about 25% headroom; none of these
+# views' counts grow with the data (dashboard peaks at 49, for auditors)
+INSTRUMENTATION_ENABLED = os.getenv('INSTRUMENTATION_ENABLED', 'True') == 'True'
+INSTRUMENTATION_SAMPLES = int(os.getenv('INSTRUMENTATION_SAMPLES', '500'))
+QUERY_BUDGET_DEFAULT = int(os.getenv('QUERY_BUDGET_DEFAULT', '0')) or None
+QUERY_BUDGET_RAISE = os.getenv('QUERY_BUDGET_RAISE', 'False') == 'True'
+QUERY_BUDGETS = {
+    'dashboard': 60,
+    'requisition_list': 16,
+    'po_list': 12,
+    'tender_list': 16,
+    'supplier_list': 12,
+    'notifications_list': 6,
+}
+
 # Email Configuration
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'  # or your email provider